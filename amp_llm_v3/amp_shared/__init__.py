@@ -0,0 +1,15 @@
+"""
+Code shared by the standalone services and the webapp.
+
+The services run as separate processes from their own directories and
+don't import each other, so modules they all need live here, once, rather
+than as copies in each service:
+
+- ``metrics``: the Prometheus / OpenMetrics registry behind ``/metrics``.
+- ``job_events``: the SSE job-list hub (snapshot, then per-job deltas).
+- ``ctgov_mirror``: the offline CT.gov study mirror (SQLite).
+
+Each service keeps a thin module of the old name that puts ``amp_llm_v3/``
+on ``sys.path``, re-exports from here and owns its singleton, so import
+sites are unchanged. The webapp already has ``amp_llm_v3/`` on its path.
+"""
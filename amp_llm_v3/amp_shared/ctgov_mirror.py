@@ -0,0 +1,277 @@
+"""
+Offline ClinicalTrials.gov mirror: compressed, NCT-indexed study records.
+
+Our NCT universe (1,844 trials in ``Final Agent Annotations``) rarely
+changes, yet Phase 1 fetched every protocol from the live API. The mirror
+is one SQLite file shared by agent_annotate and nct_lookup (default
+``amp_llm_v3/ct_database/ctgov_mirror.db``):
+
+    studies(nct_id PRIMARY KEY, last_update_post_date, checked_at, body)
+
+``body`` is the zlib-compressed v2 study JSON, exactly as
+``/api/v2/studies/{nct_id}`` returns it. ``checked_at`` records when the
+record was last confirmed current. Records checked within
+``orchestrator.ctgov_mirror_max_age_days`` (agent_annotate) or
+``CTGOV_MIRROR_MAX_AGE_DAYS`` (nct_lookup) are served at disk speed. Older
+records are re-validated against CT.gov's ``lastUpdatePostDate``, one
+lightweight query per chunk of IDs (agent_annotate's
+agents/research/ctgov_bulk.py), and only changed or missing studies are
+downloaded again.
+
+Filling it (from agent_annotate/):
+    python scripts/ctgov_mirror.py import ctg-studies.json.zip [--ncts FILE]
+    python scripts/ctgov_mirror.py sync --ncts FILE    # delta refresh
+    python scripts/ctgov_mirror.py stats
+
+``import`` reads the official bulk download (a zip of one JSON per study),
+or a directory of study JSON files, and streams it in batched transactions.
+This module does no network I/O. agent_annotate imports it as
+agents.research.ctgov_mirror and nct_lookup through nct_mirror.py.
+"""
+
+from __future__ import annotations
+
+import json
+import logging
+import sqlite3
+import threading
+import time
+import zipfile
+import zlib
+from pathlib import Path
+from typing import Iterable, Iterator, Optional
+
+logger = logging.getLogger(__name__)
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS studies (
+    nct_id TEXT PRIMARY KEY,
+    last_update_post_date TEXT NOT NULL DEFAULT '',
+    checked_at REAL NOT NULL,
+    body BLOB NOT NULL
+)
+"""
+
+# Keeps IN (...) lists under SQLite's default host-parameter limit.
+_SQL_CHUNK = 500
+
+
+def study_nct_id(study: dict) -> str:
+    """NCT ID of a v2 study record ('' when the record has none)."""
+    ident = study.get("protocolSection", {}).get("identificationModule", {})
+    return (ident.get("nctId") or "").strip().upper()
+
+
+def last_update_post_date(study: dict) -> str:
+    """``lastUpdatePostDate`` of a v2 study record (YYYY-MM-DD or '')."""
+    status = study.get("protocolSection", {}).get("statusModule", {})
+    return (status.get("lastUpdatePostDateStruct") or {}).get("date", "") or ""
+
+
+def _encode(study: dict) -> bytes:
+    return zlib.compress(json.dumps(study, separators=(",", ":")).encode("utf-8"), 6)
+
+
+def _decode(body: bytes) -> dict:
+    return json.loads(zlib.decompress(body))
+
+
+def _chunks(items: list, size: int = _SQL_CHUNK) -> Iterator[list]:
+    for i in range(0, len(items), size):
+        yield items[i:i + size]
+
+
+class CTGovMirror:
+    """SQLite-backed store of CT.gov v2 study records, keyed by NCT ID.
+
+    One connection is shared across threads behind a lock. Writes are
+    single transactions, so a reader never sees half an import batch. WAL
+    mode lets another process (nct_lookup) read during an import.
+    """
+
+    def __init__(self, path: Path) -> None:
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(str(self.path), check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.execute(_SCHEMA)
+        self._conn.commit()
+        self.served = 0
+
+    def close(self) -> None:
+        with self._lock:
+            self._conn.close()
+
+    # -- reads --------------------------------------------------------------
+
+    def get(self, nct_id: str, max_age: Optional[float] = None) -> Optional[dict]:
+        """The mirrored study, or None when missing or older than ``max_age`` seconds."""
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT checked_at, body FROM studies WHERE nct_id = ?",
+                (nct_id.strip().upper(),),
+            ).fetchone()
+        if row is None:
+            return None
+        if max_age is not None and time.time() - row[0] > max_age:
+            return None
+        self.served += 1
+        return _decode(row[1])
+
+    def status(
+        self, nct_ids: Iterable[str], max_age: Optional[float] = None,
+    ) -> tuple[list[str], dict[str, str], list[str]]:
+        """Split ``nct_ids`` into (fresh, stale, missing).
+
+        ``stale`` maps each stale NCT to its mirrored lastUpdatePostDate.
+        With ``max_age=None`` nothing is stale.
+        """
+        ids = list(dict.fromkeys(n.strip().upper() for n in nct_ids if n.strip()))
+        rows: dict[str, tuple[str, float]] = {}
+        with self._lock:
+            for chunk in _chunks(ids):
+                marks = ",".join("?" * len(chunk))
+                for nct, updated, checked in self._conn.execute(
+                    f"SELECT nct_id, last_update_post_date, checked_at "
+                    f"FROM studies WHERE nct_id IN ({marks})", chunk,
+                ):
+                    rows[nct] = (updated, checked)
+        now = time.time()
+        fresh, stale, missing = [], {}, []
+        for nct in ids:
+            if nct not in rows:
+                missing.append(nct)
+            elif max_age is not None and now - rows[nct][1] > max_age:
+                stale[nct] = rows[nct][0]
+            else:
+                fresh.append(nct)
+        return fresh, stale, missing
+
+    def nct_ids(self) -> list[str]:
+        with self._lock:
+            return [r[0] for r in self._conn.execute("SELECT nct_id FROM studies ORDER BY nct_id")]
+
+    def stats(self) -> dict:
+        with self._lock:
+            count, oldest, newest = self._conn.execute(
+                "SELECT COUNT(*), MIN(checked_at), MAX(checked_at) FROM studies"
+            ).fetchone()
+        size = self.path.stat().st_size if self.path.exists() else 0
+        return {
+            "path": str(self.path),
+            "studies": count,
+            "size_mb": round(size / 1e6, 1),
+            "oldest_check_age_days": round((time.time() - oldest) / 86400, 1) if oldest else None,
+            "newest_check_age_days": round((time.time() - newest) / 86400, 1) if newest else None,
+            "served": self.served,
+        }
+
+    # -- writes -------------------------------------------------------------
+
+    def put_many(self, studies: Iterable[dict], checked_at: Optional[float] = None) -> int:
+        """Insert or replace studies; returns how many were stored."""
+        at = time.time() if checked_at is None else checked_at
+        rows = []
+        for study in studies:
+            nct = study_nct_id(study)
+            if nct:
+                rows.append((nct, last_update_post_date(study), at, _encode(study)))
+        if not rows:
+            return 0
+        with self._lock, self._conn:
+            self._conn.executemany(
+                "INSERT OR REPLACE INTO studies "
+                "(nct_id, last_update_post_date, checked_at, body) VALUES (?, ?, ?, ?)",
+                rows,
+            )
+        return len(rows)
+
+    def put(self, study: dict) -> bool:
+        return self.put_many([study]) == 1
+
+    def mark_checked(self, nct_ids: Iterable[str], checked_at: Optional[float] = None) -> None:
+        """Record that these studies were confirmed unchanged upstream."""
+        at = time.time() if checked_at is None else checked_at
+        ids = [n.strip().upper() for n in nct_ids]
+        with self._lock, self._conn:
+            for chunk in _chunks(ids):
+                marks = ",".join("?" * len(chunk))
+                self._conn.execute(
+                    f"UPDATE studies SET checked_at = ? WHERE nct_id IN ({marks})",
+                    [at, *chunk],
+                )
+
+    def import_archive(
+        self,
+        source: Path,
+        only: Optional[set[str]] = None,
+        checked_at: Optional[float] = None,
+        batch_size: int = 500,
+    ) -> int:
+        """Load the CT.gov bulk download (zip) or a directory of study JSONs.
+
+        ``only`` restricts the import to a set of NCT IDs (e.g. our universe).
+        Records are stamped with the archive's mtime unless ``checked_at`` is
+        given, so a week-old download is re-validated on first use.
+        """
+        source = Path(source)
+        at = source.stat().st_mtime if checked_at is None else checked_at
+        wanted = {n.upper() for n in only} if only else None
+        imported = 0
+        batch: list[dict] = []
+        for study in _iter_archive(source):
+            if wanted is not None and study_nct_id(study) not in wanted:
+                continue
+            batch.append(study)
+            if len(batch) >= batch_size:
+                imported += self.put_many(batch, checked_at=at)
+                batch = []
+        imported += self.put_many(batch, checked_at=at)
+        logger.info(f"CT.gov mirror: imported {imported} studies from {source}")
+        return imported
+
+
+def _iter_archive(source: Path) -> Iterator[dict]:
+    """Yield study records from a zip or directory of ``*.json`` files.
+
+    A file may hold one study or a list of studies (API page dumps with a
+    ``studies`` key are accepted too). Unreadable members are skipped.
+    """
+    def records(data) -> Iterator[dict]:
+        if isinstance(data, dict) and "studies" in data:
+            data = data["studies"]
+        if isinstance(data, dict):
+            yield data
+        elif isinstance(data, list):
+            yield from (s for s in data if isinstance(s, dict))
+
+    if source.is_dir():
+        for path in sorted(source.rglob("*.json")):
+            try:
+                yield from records(json.loads(path.read_bytes()))
+            except (OSError, ValueError) as e:
+                logger.warning(f"CT.gov mirror: skipping {path}: {e}")
+        return
+    with zipfile.ZipFile(source) as zf:
+        for name in zf.namelist():
+            if not name.endswith(".json"):
+                continue
+            try:
+                yield from records(json.loads(zf.read(name)))
+            except (OSError, ValueError, zipfile.BadZipFile) as e:
+                logger.warning(f"CT.gov mirror: skipping {name}: {e}")
+
+
+_MIRRORS: dict[Path, CTGovMirror] = {}
+_MIRRORS_LOCK = threading.Lock()
+
+
+def open_mirror(path: Path) -> CTGovMirror:
+    """Process-wide CTGovMirror for ``path`` (opened once)."""
+    key = Path(path).resolve()
+    with _MIRRORS_LOCK:
+        if key not in _MIRRORS:
+            _MIRRORS[key] = CTGovMirror(key)
+        return _MIRRORS[key]
@@ -0,0 +1,232 @@
+"""
+Job status event stream: one snapshot, then deltas, pushed over SSE.
+
+The webapp's jobs badge used to poll ``GET /api/jobs`` every 10 s per open
+browser tab, and every poll rebuilt the full job list. ``JobEventHub`` keeps
+the last list it published and only pushes what changed:
+
+- The hub reads rows (one JSON-ready dict per job, keyed by ``key``) from a
+  ``source`` callable. Producers call ``notify()`` when a job changes, and
+  the hub also re-reads every ``interval`` seconds to pick up fields that
+  tick without a notify (elapsed time). Bursts of ``notify()`` are coalesced.
+- A subscriber first gets ``{"type": "snapshot", "seq", "jobs"}``, then
+  ``{"type": "delta", "seq", "upsert", "remove"}``. An ``upsert`` entry is a
+  full row for a new job, or the key plus the changed fields. ``seq`` goes up
+  by one per delta, so a client that sees a gap can reconnect for a new
+  snapshot.
+- A subscriber whose queue fills up (a stalled client) has its backlog
+  dropped and gets a fresh snapshot instead of unbounded buffering.
+- The diff loop runs only while someone is subscribed. With no subscribers
+  ``notify()`` is a no-op.
+
+``sse()`` renders the stream as ``text/event-stream`` with keep-alive
+comments, for a ``StreamingResponse``.
+
+agent_annotate (app/services/job_events.py) and chat_with_llm
+(job_events.py) each publish a hub; the webapp merges their streams
+(webapp/job_stream.py).
+"""
+
+from __future__ import annotations
+
+import asyncio
+import json
+import logging
+from typing import AsyncIterator, Callable, Iterable, Optional
+
+logger = logging.getLogger(__name__)
+
+Row = dict
+Source = Callable[[], Iterable[Row]]
+
+
+def format_sse(event: dict) -> str:
+    """One SSE frame: ``id`` is the event's seq, ``event`` its type."""
+    data = json.dumps(event, separators=(",", ":"), default=str)
+    return f"id: {event['seq']}\nevent: {event['type']}\ndata: {data}\n\n"
+
+
+def diff_rows(old: dict[str, Row], new: dict[str, Row], key: str) -> tuple[list[Row], list[str]]:
+    """``(upsert, remove)`` turning ``old`` into ``new``.
+
+    New rows are sent whole; changed rows as the key plus changed fields
+    (a field that disappeared is sent as None).
+    """
+    upsert: list[Row] = []
+    for k, row in new.items():
+        prev = old.get(k)
+        if prev is None:
+            upsert.append(row)
+            continue
+        changed = {f: v for f, v in row.items() if f not in prev or prev[f] != v}
+        for f in prev.keys() - row.keys():
+            changed[f] = None
+        if changed:
+            changed[key] = row[key]
+            upsert.append(changed)
+    remove = [k for k in old if k not in new]
+    return upsert, remove
+
+
+def apply_delta(rows: dict[str, Row], event: dict, key: str) -> None:
+    """Apply a snapshot or delta event to ``rows`` in place (client side)."""
+    if event["type"] == "snapshot":
+        rows.clear()
+        rows.update({str(r[key]): dict(r) for r in event["jobs"]})
+        return
+    for k in event.get("remove", ()):
+        rows.pop(k, None)
+    for change in event.get("upsert", ()):
+        k = str(change[key])
+        rows[k] = {**rows.get(k, {}), **change}
+
+
+class JobEventHub:
+    """Diffs a job list against what was last published and fans it out."""
+
+    def __init__(
+        self,
+        source: Optional[Source] = None,
+        *,
+        key: str = "job_id",
+        interval: float = 2.0,
+        coalesce: float = 0.25,
+        queue_size: int = 256,
+    ) -> None:
+        self._source = source
+        self.key = key
+        self.interval = interval
+        self.coalesce = coalesce
+        self.queue_size = queue_size
+        self._rows: dict[str, Row] = {}
+        self._seq = 0
+        self._subscribers: set[asyncio.Queue] = set()
+        self._wake: Optional[asyncio.Event] = None
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._pump_task: Optional[asyncio.Task] = None
+        self._stats = {"deltas": 0, "resyncs": 0, "source_errors": 0}
+
+    def set_source(self, source: Source) -> None:
+        self._source = source
+
+    # -- producer side --------------------------------------------------------
+
+    def notify(self) -> None:
+        """A job changed; publish soon. Safe to call from any thread."""
+        if self._pump_task is None or self._wake is None:
+            return
+        try:
+            running = asyncio.get_running_loop()
+        except RuntimeError:
+            running = None
+        if running is self._loop:
+            self._wake.set()
+        else:
+            self._loop.call_soon_threadsafe(self._wake.set)
+
+    def _read_source(self) -> Optional[dict[str, Row]]:
+        if self._source is None:
+            return {}
+        try:
+            # Copy: a source handing back the same dicts would hide changes.
+            return {str(r[self.key]): dict(r) for r in self._source()}
+        except Exception as e:
+            # Keep the last published state; the next tick retries.
+            self._stats["source_errors"] += 1
+            logger.warning("Job event source failed: %s", e)
+            return None
+
+    def refresh(self) -> Optional[dict]:
+        """Re-read the source and publish a delta if anything changed."""
+        rows = self._read_source()
+        if rows is None:
+            return None
+        upsert, remove = diff_rows(self._rows, rows, self.key)
+        self._rows = rows
+        if not upsert and not remove:
+            return None
+        self._seq += 1
+        self._stats["deltas"] += 1
+        event = {"type": "delta", "seq": self._seq, "upsert": upsert, "remove": remove}
+        for q in list(self._subscribers):
+            self._offer(q, event)
+        return event
+
+    def snapshot(self) -> dict:
+        return {"type": "snapshot", "seq": self._seq, "jobs": list(self._rows.values())}
+
+    def _offer(self, q: asyncio.Queue, event: dict) -> None:
+        try:
+            q.put_nowait(event)
+        except asyncio.QueueFull:
+            # The client stopped reading. Replace its backlog with the
+            # current state rather than buffering without bound.
+            while not q.empty():
+                q.get_nowait()
+            q.put_nowait(self.snapshot())
+            self._stats["resyncs"] += 1
+
+    async def _pump(self) -> None:
+        try:
+            while self._subscribers:
+                try:
+                    await asyncio.wait_for(self._wake.wait(), self.interval)
+                except asyncio.TimeoutError:
+                    pass
+                self._wake.clear()
+                self.refresh()
+                await asyncio.sleep(self.coalesce)
+        finally:
+            if self._pump_task is asyncio.current_task():
+                self._pump_task = None
+
+    # -- subscriber side --------------------------------------------------------
+
+    def _attach(self) -> asyncio.Queue:
+        self.refresh()
+        q: asyncio.Queue = asyncio.Queue(maxsize=self.queue_size)
+        q.put_nowait(self.snapshot())
+        self._subscribers.add(q)
+        if self._pump_task is None:
+            self._loop = asyncio.get_running_loop()
+            self._wake = asyncio.Event()
+            self._pump_task = asyncio.create_task(self._pump())
+        return q
+
+    def _detach(self, q: asyncio.Queue) -> None:
+        self._subscribers.discard(q)
+        if not self._subscribers and self._pump_task is not None:
+            self._pump_task.cancel()
+            self._pump_task = None
+
+    async def events(self, heartbeat: Optional[float] = None) -> AsyncIterator[Optional[dict]]:
+        """Snapshot, then deltas. Yields None after ``heartbeat`` idle seconds."""
+        q = self._attach()
+        try:
+            while True:
+                try:
+                    yield await asyncio.wait_for(q.get(), heartbeat)
+                except asyncio.TimeoutError:
+                    yield None
+        finally:
+            self._detach(q)
+
+    async def sse(self, heartbeat: float = 15.0) -> AsyncIterator[str]:
+        """``events()`` as SSE frames, with comment lines as keep-alives."""
+        # Tell EventSource to wait 5 s before reconnecting after a drop.
+        yield "retry: 5000\n\n"
+        events = self.events(heartbeat)
+        try:
+            async for event in events:
+                yield ": keep-alive\n\n" if event is None else format_sse(event)
+        finally:
+            await events.aclose()
+
+    def stats(self) -> dict:
+        return {
+            **self._stats,
+            "subscribers": len(self._subscribers),
+            "jobs": len(self._rows),
+            "seq": self._seq,
+        }
+
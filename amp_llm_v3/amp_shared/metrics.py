@@ -0,0 +1,319 @@
+"""
+Process-wide metrics registry with Prometheus / OpenMetrics text exposition.
+
+Performance telemetry used to be scattered: ad-hoc dicts on the Ollama
+client, ``drug_cache.stats()`` read once at job end, and timings on the job
+object. Producers now record into one registry, and ``GET /metrics`` renders
+it for Prometheus so throughput regressions can be graphed across releases.
+
+- ``counter`` / ``gauge`` / ``histogram`` create (or return) a metric
+  family. Families are declared at module level next to the code that
+  feeds them, and labelled children come from ``.labels(...)``.
+- ``register_collector`` adds a callback that is polled at scrape time.
+  Components that already keep their own counters (caches, queues) use
+  it, so they don't double-book every event.
+
+prometheus_client isn't a dependency; this implements the subset we use.
+Each service creates its own registry, with its metric-name namespace, in
+its ``metrics`` module (agent_annotate/app/services/metrics.py,
+chat_with_llm/metrics.py, runner/metrics.py).
+"""
+
+from __future__ import annotations
+
+import math
+import threading
+import time
+from contextlib import contextmanager
+from typing import Callable, Iterable, Iterator, Optional, Sequence
+
+PROMETHEUS_CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+OPENMETRICS_CONTENT_TYPE = "application/openmetrics-text; version=1.0.0; charset=utf-8"
+
+# Seconds. Covers sub-10ms cache/disk calls up to 10-minute LLM generations.
+DEFAULT_BUCKETS = (
+    0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0,
+    30.0, 60.0, 120.0, 300.0, 600.0,
+)
+
+# (labels, value) pairs yielded for one family by a collector.
+Samples = Iterable[tuple[dict, float]]
+# A collector yields (name, type, help, samples) per family.
+Collector = Callable[[], Iterable[tuple[str, str, str, Samples]]]
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _fmt_labels(labels: dict) -> str:
+    if not labels:
+        return ""
+    return "{" + ",".join(f'{k}="{_escape(str(v))}"' for k, v in labels.items()) + "}"
+
+
+def _fmt_value(value: float) -> str:
+    if math.isinf(value):
+        return "+Inf" if value > 0 else "-Inf"
+    if math.isnan(value):
+        return "NaN"
+    if float(value).is_integer():
+        return str(int(value))
+    return repr(float(value))
+
+
+class _Family:
+    type = ""
+
+    def __init__(self, name: str, help: str, labelnames: Sequence[str] = ()) -> None:
+        self.name = name
+        self.help = help
+        self.labelnames = tuple(labelnames)
+        self._lock = threading.Lock()
+        self._children: dict[tuple, object] = {}
+
+    def labels(self, *values, **kw):
+        if kw:
+            values = tuple(kw[n] for n in self.labelnames)
+        if len(values) != len(self.labelnames):
+            raise ValueError(f"{self.name} expects labels {self.labelnames}")
+        key = tuple(str(v) for v in values)
+        with self._lock:
+            child = self._children.get(key)
+            if child is None:
+                child = self._children[key] = self._new_child()
+        return child
+
+    def _new_child(self):
+        raise NotImplementedError
+
+    def _items(self) -> list[tuple[dict, object]]:
+        with self._lock:
+            items = list(self._children.items())
+        return [(dict(zip(self.labelnames, k)), c) for k, c in items]
+
+
+class _Value:
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self.value = 0.0
+
+    def inc(self, amount: float = 1.0) -> None:
+        with self._lock:
+            self.value += amount
+
+    def dec(self, amount: float = 1.0) -> None:
+        with self._lock:
+            self.value -= amount
+
+    def set(self, value: float) -> None:
+        with self._lock:
+            self.value = float(value)
+
+
+class Counter(_Family):
+    type = "counter"
+
+    def _new_child(self):
+        return _Value()
+
+    def inc(self, amount: float = 1.0) -> None:
+        self.labels().inc(amount)
+
+
+class Gauge(_Family):
+    type = "gauge"
+
+    def _new_child(self):
+        return _Value()
+
+    def set(self, value: float) -> None:
+        self.labels().set(value)
+
+    def inc(self, amount: float = 1.0) -> None:
+        self.labels().inc(amount)
+
+    def dec(self, amount: float = 1.0) -> None:
+        self.labels().dec(amount)
+
+
+class _HistogramValue:
+    def __init__(self, buckets: tuple[float, ...]) -> None:
+        self._lock = threading.Lock()
+        self.buckets = buckets
+        self.counts = [0] * len(buckets)
+        self.sum = 0.0
+        self.count = 0
+
+    def observe(self, value: float) -> None:
+        with self._lock:
+            self.sum += value
+            self.count += 1
+            for i, bound in enumerate(self.buckets):
+                if value <= bound:
+                    self.counts[i] += 1
+                    break
+
+    @contextmanager
+    def time(self) -> Iterator[None]:
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(time.perf_counter() - start)
+
+
+class Histogram(_Family):
+    type = "histogram"
+
+    def __init__(self, name, help, labelnames=(), buckets: Sequence[float] = DEFAULT_BUCKETS):
+        super().__init__(name, help, labelnames)
+        self.buckets = tuple(sorted(float(b) for b in buckets))
+
+    def _new_child(self):
+        return _HistogramValue(self.buckets)
+
+    def observe(self, value: float) -> None:
+        self.labels().observe(value)
+
+    def time(self):
+        return self.labels().time()
+
+
+class MetricsRegistry:
+    def __init__(self, namespace: str = "") -> None:
+        self.namespace = namespace
+        self._lock = threading.Lock()
+        self._families: dict[str, _Family] = {}
+        self._collectors: list[Collector] = []
+
+    def _get(self, cls, name: str, help: str, labelnames: Sequence[str], **kw) -> _Family:
+        with self._lock:
+            family = self._families.get(name)
+            if family is None:
+                family = self._families[name] = cls(name, help, labelnames, **kw)
+            elif not isinstance(family, cls) or family.labelnames != tuple(labelnames):
+                raise ValueError(f"metric {name} already registered differently")
+            return family
+
+    def counter(self, name: str, help: str, labelnames: Sequence[str] = ()) -> Counter:
+        return self._get(Counter, name, help, labelnames)
+
+    def gauge(self, name: str, help: str, labelnames: Sequence[str] = ()) -> Gauge:
+        return self._get(Gauge, name, help, labelnames)
+
+    def histogram(
+        self, name: str, help: str, labelnames: Sequence[str] = (),
+        buckets: Sequence[float] = DEFAULT_BUCKETS,
+    ) -> Histogram:
+        return self._get(Histogram, name, help, labelnames, buckets=buckets)
+
+    def register_collector(self, collector: Collector) -> Collector:
+        with self._lock:
+            self._collectors.append(collector)
+        return collector
+
+    def register_cache(
+        self,
+        cache: str,
+        stats: Callable[[], dict],
+        hits: str = "hits",
+        misses: str = "misses",
+        size: Optional[str] = None,
+    ) -> None:
+        """Expose a component's own hit/miss counters as ``<ns>_cache_*{cache=...}``.
+
+        ``stats`` returns the component's stats dict; ``hits``/``misses``/
+        ``size`` name its keys. Hit ratio is a query-time division.
+        """
+        prefix = f"{self.namespace}_" if self.namespace else ""
+
+        def collect():
+            s = stats()
+            label = {"cache": cache}
+            yield (f"{prefix}cache_hits_total", "counter", "Cache hits by cache",
+                   [(label, s.get(hits, 0))])
+            yield (f"{prefix}cache_misses_total", "counter", "Cache misses by cache",
+                   [(label, s.get(misses, 0))])
+            if size:
+                yield (f"{prefix}cache_entries", "gauge", "Entries held by cache",
+                       [(label, s.get(size, 0))])
+
+        self.register_collector(collect)
+
+    def render(self, openmetrics: bool = False) -> str:
+        """Text exposition (Prometheus 0.0.4, or OpenMetrics 1.0)."""
+        lines: list[str] = []
+        with self._lock:
+            families = sorted(self._families.values(), key=lambda f: f.name)
+            collectors = list(self._collectors)
+
+        def header(name: str, type_: str, help: str) -> None:
+            # OpenMetrics names the counter family without the _total suffix.
+            if openmetrics and type_ == "counter" and name.endswith("_total"):
+                name = name[: -len("_total")]
+            lines.append(f"# HELP {name} {_escape(help)}")
+            lines.append(f"# TYPE {name} {type_}")
+
+        for family in families:
+            header(family.name, family.type, family.help)
+            for labels, child in family._items():
+                if isinstance(child, _HistogramValue):
+                    with child._lock:
+                        counts, total, count = list(child.counts), child.sum, child.count
+                    cumulative = 0
+                    for bound, n in zip(child.buckets, counts):
+                        cumulative += n
+                        le = _fmt_labels({**labels, "le": _fmt_value(bound)})
+                        lines.append(f"{family.name}_bucket{le} {cumulative}")
+                    le = _fmt_labels({**labels, "le": "+Inf"})
+                    lines.append(f"{family.name}_bucket{le} {count}")
+                    lines.append(f"{family.name}_sum{_fmt_labels(labels)} {_fmt_value(total)}")
+                    lines.append(f"{family.name}_count{_fmt_labels(labels)} {count}")
+                else:
+                    lines.append(f"{family.name}{_fmt_labels(labels)} {_fmt_value(child.value)}")
+
+        # Several collectors may feed one family (e.g. cache hits per cache);
+        # merge them so each family gets a single HELP/TYPE header.
+        collected: dict[str, tuple[str, str, list]] = {}
+        for collector in collectors:
+            try:
+                families_out = list(collector())
+            except Exception as e:  # a broken collector must not break the scrape
+                lines.append(f"# collector error: {_escape(str(e))}")
+                continue
+            for name, type_, help, samples in families_out:
+                collected.setdefault(name, (type_, help, []))[2].extend(samples)
+        for name, (type_, help, samples) in sorted(collected.items()):
+            header(name, type_, help)
+            for labels, value in samples:
+                lines.append(f"{name}{_fmt_labels(labels)} {_fmt_value(value)}")
+
+        if openmetrics:
+            lines.append("# EOF")
+        return "\n".join(lines) + "\n"
+
+    def sample(self, name: str, **labels) -> Optional[float]:
+        """Current value of a counter/gauge child (histograms: count). For tests."""
+        family = self._families.get(name)
+        if family is None:
+            return None
+        for child_labels, child in family._items():
+            if child_labels == {k: str(v) for k, v in labels.items()}:
+                return child.count if isinstance(child, _HistogramValue) else child.value
+        return None
+
+    def values(self, name: str) -> list[tuple[dict, float]]:
+        """(labels, value) for every child of a family; histograms give their sum."""
+        family = self._families.get(name)
+        if family is None:
+            return []
+        return [
+            (labels, child.sum if isinstance(child, _HistogramValue) else child.value)
+            for labels, child in family._items()
+        ]
+
+
+def wants_openmetrics(accept: str) -> bool:
+    return "application/openmetrics-text" in (accept or "")
+
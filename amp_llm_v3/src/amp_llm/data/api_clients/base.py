@@ -38,7 +38,18 @@ class BaseAPIClient(ABC):
     - Async context manager support
     """
     
-    def __init__(self, config: Optional[APIConfig] = None):
+    def __init__(
+        self,
+        config: Optional[APIConfig] = None,
+        rate_limiter: Optional[AsyncRateLimiter] = None,
+    ):
+        """
+        Args:
+            config: API settings (defaults to the global AppConfig)
+            rate_limiter: Shared limiter, for clients that hit the same
+                host (PubMed and PMC both count against NCBI's per-IP
+                E-utilities limit).
+        """
         # Use provided config or create from global AppConfig
         if config is None:
             try:
@@ -57,10 +68,11 @@ class BaseAPIClient(ABC):
         
         self.config = config
         self.session: Optional[aiohttp.ClientSession] = None
+        self._owns_session = True
         self._last_request_time = 0
         
         # Initialize rate limiter from config
-        self.rate_limiter = AsyncRateLimiter(
+        self.rate_limiter = rate_limiter or AsyncRateLimiter(
             max_requests=self.config.rate_limit_requests,
             time_period=self.config.rate_limit_period
         )
@@ -106,15 +118,25 @@ class BaseAPIClient(ABC):
     
     async def _ensure_session(self):
         """Ensure aiohttp session exists."""
+        if not self._owns_session:
+            return
         if self.session is None or self.session.closed:
             self.session = aiohttp.ClientSession(
                 timeout=aiohttp.ClientTimeout(total=self.config.timeout)
             )
             logger.debug(f"{self.name}: Created new session")
     
+    def use_session(self, session: aiohttp.ClientSession):
+        """Send requests through a session owned by the caller.
+        
+        close() then leaves it open; the owner closes it.
+        """
+        self.session = session
+        self._owns_session = False
+    
     async def close(self):
-        """Close session."""
-        if self.session and not self.session.closed:
+        """Close session (a shared session is left to its owner)."""
+        if self._owns_session and self.session and not self.session.closed:
             await self.session.close()
             logger.debug(f"{self.name}: Closed session")
     
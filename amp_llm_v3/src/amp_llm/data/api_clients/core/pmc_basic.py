@@ -17,6 +17,8 @@ logger = get_logger(__name__)
 # Configuration
 DEFAULT_TIMEOUT = 15
 SLEEP_BETWEEN_REQUESTS = 0.34
+# esummary accepts long ID lists, but NCBI asks for POST above ~200.
+ESUMMARY_BATCH_SIZE = 200
 
 # =============================================================================
 # NEW: Async Client Class
@@ -103,6 +105,51 @@ class PMCBasicClient(BaseAPIClient):
                 "pmcid": pmcid
             }
     
+    async def fetch_by_ids(self, pmcids: List[str]) -> Dict[str, Dict[str, Any]]:
+        """
+        Fetch metadata for several PMC IDs with one esummary per batch.
+        
+        Args:
+            pmcids: PMC IDs (duplicates are fetched once)
+            
+        Returns:
+            PMC ID -> metadata, with the same per-ID error entries
+            fetch_by_id() would return
+        """
+        unique = list(dict.fromkeys(p for p in pmcids if p))
+        batches = [
+            unique[i:i + ESUMMARY_BATCH_SIZE]
+            for i in range(0, len(unique), ESUMMARY_BATCH_SIZE)
+        ]
+        results = await asyncio.gather(*(self._fetch_batch(b) for b in batches))
+        
+        merged: Dict[str, Dict[str, Any]] = {}
+        for batch_result in results:
+            merged.update(batch_result)
+        return merged
+    
+    async def _fetch_batch(self, pmcids: List[str]) -> Dict[str, Dict[str, Any]]:
+        """esummary one batch of PMC IDs."""
+        url = f"{self.base_url}/esummary.fcgi"
+        params = {
+            "db": "pmc",
+            "id": ",".join(pmcids),
+            "retmode": "json"
+        }
+        
+        try:
+            async with await self._request("GET", url, params=params) as resp:
+                data = await resp.json()
+                logger.info(f"{self.name}: fetched metadata for {len(pmcids)} article(s)")
+        except Exception as e:
+            logger.error(f"{self.name} esummary error for {len(pmcids)} ID(s): {e}")
+            return {
+                pmcid: {"error": str(e), "source": "pmc_esummary", "pmcid": pmcid}
+                for pmcid in pmcids
+            }
+        
+        return {pmcid: self._convert_summary(data, pmcid) for pmcid in pmcids}
+    
     def _convert_summary(self, esummary: Dict, pmcid: str) -> Dict[str, Any]:
         """Extract metadata from esummary response."""
         result = esummary.get("result", {})
@@ -13,6 +13,9 @@ from amp_llm.config import get_logger
 
 logger = get_logger(__name__)
 
+# NCBI asks for POST above ~200 IDs; stay under it and batch with GET.
+EFETCH_BATCH_SIZE = 200
+
 
 class PubMedClient(BaseAPIClient):
     """
@@ -100,6 +103,64 @@ class PubMedClient(BaseAPIClient):
             logger.error(f"{self.name} fetch error for {pmid}: {e}")
             return {"error": str(e), "pmid": pmid}
     
+    async def fetch_by_ids(self, pmids: List[str]) -> Dict[str, Dict[str, Any]]:
+        """
+        Fetch several PubMed articles with one efetch per batch.
+        
+        Args:
+            pmids: PubMed IDs (duplicates are fetched once)
+            
+        Returns:
+            PMID -> article metadata, with the same per-ID error entries
+            fetch_by_id() would return
+        """
+        unique = list(dict.fromkeys(p for p in pmids if p))
+        batches = [
+            unique[i:i + EFETCH_BATCH_SIZE]
+            for i in range(0, len(unique), EFETCH_BATCH_SIZE)
+        ]
+        results = await asyncio.gather(*(self._fetch_batch(b) for b in batches))
+        
+        merged: Dict[str, Dict[str, Any]] = {}
+        for batch_result in results:
+            merged.update(batch_result)
+        return merged
+    
+    async def _fetch_batch(self, pmids: List[str]) -> Dict[str, Dict[str, Any]]:
+        """efetch one batch of PMIDs."""
+        url = f"{self.base_url}/efetch.fcgi"
+        params = {
+            "db": "pubmed",
+            "id": ",".join(pmids),
+            "retmode": "xml"
+        }
+        
+        logger.info(f"{self.name}: Fetching {len(pmids)} PMID(s)")
+        
+        try:
+            async with await self._request("GET", url, params=params) as resp:
+                xml_content = await resp.text()
+        except Exception as e:
+            logger.error(f"{self.name} batch fetch error for {len(pmids)} PMID(s): {e}")
+            return {pmid: {"error": str(e), "pmid": pmid} for pmid in pmids}
+        
+        try:
+            root = ET.fromstring(xml_content)
+        except Exception as e:
+            logger.error(f"XML parse error for batch of {len(pmids)}: {e}")
+            return {pmid: {"pmid": pmid, "error": str(e)} for pmid in pmids}
+        
+        found = {}
+        for record in root.iter("PubmedArticle"):
+            pmid_elem = record.find(".//MedlineCitation/PMID")
+            if pmid_elem is not None and pmid_elem.text in pmids:
+                found[pmid_elem.text] = self._parse_article(record, pmid_elem.text)
+        
+        return {
+            pmid: found.get(pmid, {"pmid": pmid, "error": "No article data"})
+            for pmid in pmids
+        }
+    
     async def search_by_title_authors(
         self,
         title: str,
@@ -142,6 +203,14 @@ class PubMedClient(BaseAPIClient):
         """Parse PubMed XML response."""
         try:
             root = ET.fromstring(xml_content)
+        except Exception as e:
+            logger.error(f"XML parse error for {pmid}: {e}")
+            return {"pmid": pmid, "error": str(e)}
+        return self._parse_article(root, pmid)
+    
+    def _parse_article(self, root: ET.Element, pmid: str) -> Dict[str, Any]:
+        """Parse the first Article under ``root`` (a response or one PubmedArticle)."""
+        try:
             article = root.find(".//Article")
             
             if article is None:
@@ -34,6 +34,7 @@ class UnifiedAPIManager:
         
         self._core_clients = {}
         self._extended_clients = {}
+        self._eutils_session = None
         
         self._init_core_clients()
         
@@ -46,9 +47,18 @@ class UnifiedAPIManager:
         from amp_llm.data.api_clients.core.pubmed import PubMedClient
         from amp_llm.data.api_clients.core.pmc_basic import PMCBasicClient
         
+        from amp_llm.data.api_clients.rate_limiter import AsyncRateLimiter
+        
+        # NCBI rate-limits E-utilities per IP, not per endpoint, so PubMed
+        # and PMC draw from one budget.
+        eutils_limiter = AsyncRateLimiter(
+            max_requests=self.api_config.rate_limit_requests,
+            time_period=self.api_config.rate_limit_period
+        )
+        
         self._core_clients['clinical_trials'] = ClinicalTrialsClient(self.api_config)
-        self._core_clients['pubmed'] = PubMedClient(self.api_config)
-        self._core_clients['pmc_basic'] = PMCBasicClient(self.api_config)
+        self._core_clients['pubmed'] = PubMedClient(self.api_config, rate_limiter=eutils_limiter)
+        self._core_clients['pmc_basic'] = PMCBasicClient(self.api_config, rate_limiter=eutils_limiter)
     
     def _init_extended_clients(self):
         """Initialize extended clients (optional)."""
@@ -77,61 +87,69 @@ class UnifiedAPIManager:
         
         Replaces: fetch_clinical_trial_and_pubmed_pmc()
         """
-        import asyncio
-        
-        # Fetch clinical trial
         ct_data = await self._core_clients['clinical_trials'].fetch_by_id(nct_id)
         
         if 'error' in ct_data:
             return ct_data
         
-        # Extract references
-        references = self._extract_references(ct_data)
+        return await self._fetch_literature(nct_id, ct_data)
+    
+    async def _fetch_literature(
+        self,
+        nct_id: str,
+        ct_data: Dict[str, Any]
+    ) -> Dict[str, Any]:
+        """
+        PubMed + PMC stage of fetch_core().
         
-        # Search PubMed and PMC for each reference
-        pubmed_tasks = []
-        pmc_tasks = []
+        All reference searches run in one gather, then the PubMed and PMC
+        metadata are fetched in batches, concurrently. Both clients share
+        one session and one NCBI rate limiter. Lists keep reference
+        order, the same as fetching one ID at a time.
+        """
+        import asyncio
         
+        await self._ensure_eutils_session()
+        pubmed = self._core_clients['pubmed']
+        pmc = self._core_clients['pmc_basic']
+        
+        references = self._extract_references(ct_data)
+        searches = []
         for ref in references:
             title = ref.get('title', '')
             authors = ref.get('authors', [])
-            
-            # PubMed search
-            pubmed_tasks.append(
-                self._core_clients['pubmed'].search_by_title_authors(title, authors)
-            )
-            
-            # PMC search
-            pmc_tasks.append(
-                self._core_clients['pmc_basic'].search(title)
-            )
+            searches.append(pubmed.search_by_title_authors(title, authors))
+            searches.append(pmc.search(title))
         
-        # Execute concurrently
-        pubmed_results = await asyncio.gather(*pubmed_tasks)
-        pmc_results = await asyncio.gather(*pmc_tasks)
-        
-        # Fetch full metadata for found articles
-        pubmed_data = []
-        for pmid in pubmed_results:
-            if pmid:
-                data = await self._core_clients['pubmed'].fetch_by_id(pmid)
-                pubmed_data.append(data)
-        
-        pmc_data = []
-        for pmcids in pmc_results:
-            for pmcid in pmcids:
-                data = await self._core_clients['pmc_basic'].fetch_by_id(pmcid)
-                pmc_data.append(data)
+        found = await asyncio.gather(*searches)
+        pmids = [pmid for pmid in found[0::2] if pmid]
+        pmcids = [pmcid for ids in found[1::2] for pmcid in ids]
+        
+        pubmed_by_id, pmc_by_id = await asyncio.gather(
+            pubmed.fetch_by_ids(pmids),
+            pmc.fetch_by_ids(pmcids),
+        )
         
         return {
             "nct_id": nct_id,
             "sources": {
                 "clinical_trials": ct_data,
-                "pubmed": pubmed_data,
-                "pmc": pmc_data
+                "pubmed": [pubmed_by_id[pmid] for pmid in pmids],
+                "pmc": [pmc_by_id[pmcid] for pmcid in pmcids]
             }
         }
     
+    async def _ensure_eutils_session(self):
+        """Open the session PubMed and PMC share (both call E-utilities)."""
+        import aiohttp
+        
+        if self._eutils_session is None or self._eutils_session.closed:
+            self._eutils_session = aiohttp.ClientSession(
+                timeout=aiohttp.ClientTimeout(total=self.api_config.timeout)
+            )
+            self._core_clients['pubmed'].use_session(self._eutils_session)
+            self._core_clients['pmc_basic'].use_session(self._eutils_session)
+    
     async def fetch_extended(
         self,
         nct_id: str,
@@ -195,23 +213,31 @@ class UnifiedAPIManager:
         """
         Fetch both core and extended data.
         
+        Extended searches only need the trial record, so they run
+        alongside the PubMed/PMC stage instead of after it.
+        
         Args:
             nct_id: NCT number
             
         Returns:
             Complete data from all sources
         """
-        # Fetch core data
-        core = await self.fetch_core(nct_id)
+        import asyncio
         
-        if 'error' in core:
-            return core
+        ct_data = await self._core_clients['clinical_trials'].fetch_by_id(nct_id)
         
-        # Fetch extended data if enabled
-        if self.config.use_extended_apis:
-            extended = await self.fetch_extended(nct_id, core)
-            core['extended_apis'] = extended
+        if 'error' in ct_data:
+            return ct_data
+        
+        if not self.config.use_extended_apis:
+            return await self._fetch_literature(nct_id, ct_data)
         
+        trial_only = {"sources": {"clinical_trials": ct_data}}
+        core, extended = await asyncio.gather(
+            self._fetch_literature(nct_id, ct_data),
+            self.fetch_extended(nct_id, trial_only),
+        )
+        core['extended_apis'] = extended
         return core
     
     def _extract_references(self, ct_data: Dict[str, Any]) -> List[Dict[str, Any]]:
@@ -253,4 +279,6 @@ class UnifiedAPIManager:
     async def close_all(self):
         """Close all client sessions."""
         for client in list(self._core_clients.values()) + list(self._extended_clients.values()):
-            await client.close()
\ No newline at end of file
+            await client.close()
+        if self._eutils_session and not self._eutils_session.closed:
+            await self._eutils_session.close()
\ No newline at end of file
@@ -3,8 +3,9 @@ Persistent session manager for Ollama API connections.
 Supports smart connection strategy: auto, direct, or tunnel.
 """
 import asyncio
+import json
 import aiohttp
-from typing import Optional, List
+from typing import AsyncIterator, Optional, List
 from amp_llm.config import get_logger, get_config
 from amp_llm.llm.utils.tunnel_manager import OllamaTunnelManager
 
@@ -296,4 +297,41 @@ class OllamaSessionManager:
                 logger.warning(f"Attempt {attempt + 1}/{max_retries} failed: {e}")
                 await asyncio.sleep(2)
 
-        return f"Error: Could not reach Ollama after {max_retries} attempts"
\ No newline at end of file
+        return f"Error: Could not reach Ollama after {max_retries} attempts"
+
+    async def stream_prompt(self, model: str, prompt: str, temperature=0.7) -> AsyncIterator[str]:
+        """
+        Stream a completion from Ollama, one text chunk per NDJSON line.
+
+        Chunks are read only as fast as the caller consumes them. Closing
+        the generator (or cancelling its task) closes the response, which
+        stops the generation. Errors are raised, not returned as text.
+        """
+        if not self.session or self.session.closed:
+            await self.start_session()
+
+        url = f"{self.base_url}/api/generate"
+        payload = {
+            "model": model,
+            "prompt": prompt,
+            "stream": True,
+            "options": {"temperature": temperature}
+        }
+
+        # No total deadline: sock_read bounds the gap between lines.
+        timeout = aiohttp.ClientTimeout(total=None, sock_read=600)
+        async with self.session.post(url, json=payload, timeout=timeout) as resp:
+            if resp.status != 200:
+                text = await resp.text()
+                raise RuntimeError(f"API returned {resp.status}: {text}")
+
+            async for line in resp.content:
+                if not line.strip():
+                    continue
+                chunk = json.loads(line)
+                if chunk.get("error"):
+                    raise RuntimeError(chunk["error"])
+                if chunk.get("response"):
+                    yield chunk["response"]
+                if chunk.get("done"):
+                    break
\ No newline at end of file
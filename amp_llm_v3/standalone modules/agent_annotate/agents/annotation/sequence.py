@@ -39,6 +39,7 @@ import logging
 from typing import Optional
 
 from agents.base import BaseAnnotationAgent
+from agents.lexicon import DrugLexicon
 from app.models.research import ResearchResult, SourceCitation
 from app.models.annotation import FieldAnnotation
 
@@ -265,6 +266,20 @@ _KNOWN_SEQUENCE_ALIASES: dict[str, str] = {
 }
 
 
+# Compiled once at import: resolve_known_sequence runs per intervention from
+# the agent, the peptide cascade and the orchestrator's consistency passes.
+# Ranks are longest-first (sorted() is stable, so equal lengths keep table
+# order), which makes first_match() return what the linear scan did.
+_KNOWN_SEQUENCE_LEXICON = DrugLexicon(
+    sorted(_KNOWN_SEQUENCES, key=len, reverse=True)
+)
+# Aliases whose canonical key has no sequence never resolve, so leave them out.
+_KNOWN_SEQUENCE_ALIAS_LEXICON = DrugLexicon(
+    alias for alias in sorted(_KNOWN_SEQUENCE_ALIASES, key=len, reverse=True)
+    if _KNOWN_SEQUENCES.get(_KNOWN_SEQUENCE_ALIASES[alias])
+)
+
+
 def resolve_known_sequence(name_lower: str) -> tuple[str, str] | None:
     """Look up a drug name in _KNOWN_SEQUENCES with alias fallback.
 
@@ -282,23 +297,19 @@ def resolve_known_sequence(name_lower: str) -> tuple[str, str] | None:
     if name_lower in _KNOWN_SEQUENCES:
         return name_lower, _KNOWN_SEQUENCES[name_lower]
 
-    # Longest-substring key match — sort by key length descending so a more
-    # specific name like 'glucagon-like peptide 1' wins over 'glucagon'.
-    # name_lower-in-drug ('peptide YY' input matches drug 'peptide YY...')
-    # uses the same order.
-    sorted_keys = sorted(_KNOWN_SEQUENCES.keys(), key=len, reverse=True)
-    for drug in sorted_keys:
-        if drug in name_lower or name_lower in drug:
-            return drug, _KNOWN_SEQUENCES[drug]
+    # Longest-substring key match — the lexicon ranks keys by length
+    # descending so a more specific name like 'glucagon-like peptide 1' wins
+    # over 'glucagon'. name_lower-in-drug ('peptide YY' input matches drug
+    # 'peptide YY...') uses the same order.
+    drug = _KNOWN_SEQUENCE_LEXICON.first_match(name_lower)
+    if drug is not None:
+        return drug, _KNOWN_SEQUENCES[drug]
 
     # Alias lookup (also longest-first for consistency)
-    sorted_aliases = sorted(_KNOWN_SEQUENCE_ALIASES.keys(), key=len, reverse=True)
-    for alias in sorted_aliases:
-        if alias in name_lower or name_lower in alias:
-            canonical = _KNOWN_SEQUENCE_ALIASES[alias]
-            seq = _KNOWN_SEQUENCES.get(canonical)
-            if seq:
-                return canonical, seq
+    alias = _KNOWN_SEQUENCE_ALIAS_LEXICON.first_match(name_lower)
+    if alias is not None:
+        canonical = _KNOWN_SEQUENCE_ALIASES[alias]
+        return canonical, _KNOWN_SEQUENCES[canonical]
 
     return None
 
@@ -7,6 +7,7 @@ from typing import Optional
 
 from app.models.research import ResearchResult, SourceCitation
 from app.models.annotation import FieldAnnotation
+from agents.evidence import evidence_bundles
 
 # Source reliability weights - used to compute quality scores
 SOURCE_WEIGHTS = {
@@ -209,187 +210,17 @@ class BaseAnnotationAgent(ABC):
         agents need to reason about the data. This helps 8B models find
         the right information without scanning through irrelevant citations.
 
+        Grouping, dedup keys, noise and relevance flags come from the trial's
+        precomputed EvidenceBundle (agents/evidence.py); this only applies
+        the field's weights and citation budget.
+
         Returns (evidence_text, cited_sources_list).
         """
-        # Collect citations grouped by semantic category
-        sections: dict[str, list[tuple[SourceCitation, float]]] = {
-            "TRIAL METADATA": [],       # ClinicalTrials.gov, WHO ICTRP, OpenFDA
-            "PUBLISHED RESULTS": [],     # PubMed, PMC, Europe PMC
-            "DRUG/PEPTIDE DATA": [],     # ChEMBL, UniProt, DRAMP, IUPHAR
-            "ANTIMICROBIAL DATA": [],    # DBAASP, APD
-            "STRUCTURAL DATA": [],       # RCSB PDB, PDBe, EBI Proteins
-            "WEB SOURCES": [],           # DuckDuckGo
-        }
-
-        _SOURCE_TO_SECTION = {
-            "clinicaltrials_gov": "TRIAL METADATA",
-            "who_ictrp": "TRIAL METADATA",
-            "pubmed": "PUBLISHED RESULTS",
-            "pmc": "PUBLISHED RESULTS",
-            "pmc_bioc": "PUBLISHED RESULTS",
-            "europe_pmc": "PUBLISHED RESULTS",
-            "semantic_scholar": "PUBLISHED RESULTS",
-            "chembl": "DRUG/PEPTIDE DATA",
-            "uniprot": "DRUG/PEPTIDE DATA",
-            "dramp": "DRUG/PEPTIDE DATA",
-            "iuphar": "DRUG/PEPTIDE DATA",
-            "dbaasp": "ANTIMICROBIAL DATA",
-            "apd": "ANTIMICROBIAL DATA",
-            "rcsb_pdb": "STRUCTURAL DATA",
-            "pdbe": "STRUCTURAL DATA",
-            "ebi_proteins": "STRUCTURAL DATA",
-            "duckduckgo": "WEB SOURCES",
-            "openfda": "TRIAL METADATA",
-            "openalex": "PUBLISHED RESULTS",
-            "crossref": "PUBLISHED RESULTS",
-        }
-
-        # Extract intervention names for relevance filtering
-        _intervention_names: set[str] = set()
-        for result in research_results:
-            if result.agent_name == "clinical_protocol" and result.raw_data:
-                protocol = result.raw_data.get("protocol_section", {})
-                arms_mod = protocol.get("armsInterventionsModule", {})
-                for interv in arms_mod.get("interventions", []):
-                    name = interv.get("name", "")
-                    if name:
-                        _intervention_names.add(name.lower())
-
-        def _is_relevant_to_trial(citation: SourceCitation) -> bool:
-            """Check if a database result is actually about our intervention
-            rather than a fuzzy text-search false positive.
-
-            IntAct searching "Peptide T" returned CFTR, MAPT, HTT — generic
-            high-connectivity proteins with no relation to the trial. IUPHAR
-            searching "Peptide T" returned GLP-1, PYY — different peptides.
-            This filter catches those by checking if the citation mentions
-            any of the actual intervention names.
-            """
-            # Always keep trial metadata and published results — they're NCT-specific
-            section = _SOURCE_TO_SECTION.get(citation.source_name, "")
-            if section in ("TRIAL METADATA", "PUBLISHED RESULTS"):
-                return True
-            # For database results, check relevance
-            if not _intervention_names:
-                return True  # No names to filter against
-            snippet_lower = (citation.snippet or "").lower()
-            title_lower = (citation.title or "").lower()
-            ident_lower = (citation.identifier or "").lower()
-            combined = f"{snippet_lower} {title_lower} {ident_lower}"
-            return any(name in combined for name in _intervention_names)
-
-        for result in research_results:
-            weight = self.relevance_weight(result.agent_name)
-            for citation in result.citations:
-                section = _SOURCE_TO_SECTION.get(
-                    citation.source_name, "WEB SOURCES"
-                )
-                sections[section].append((citation, weight))
-
-        # Sort within each section by weight, then by snippet length (richer
-        # versions win dedup when multiple sources find the same paper).
-        for section in sections.values():
-            section.sort(key=lambda x: (x[1], len(x[0].snippet or "")), reverse=True)
-
-        # Deduplicate and filter low-value citations
-        # v31: Added identifier-based dedup (PMID/DOI) to prevent the same
-        # paper from consuming budget slots when found by multiple sources
-        # (PubMed + OpenAlex + Semantic Scholar).
-        seen_snippets: set[str] = set()
-        seen_identifiers: set[str] = set()
-
-        def _is_duplicate(citation: SourceCitation) -> bool:
-            ident = (citation.identifier or "").upper().strip()
-            if ident and ident in seen_identifiers:
-                return True
-            key = (citation.snippet or "")[:60].lower()
-            if key in seen_snippets:
-                return True
-            seen_snippets.add(key)
-            if ident:
-                seen_identifiers.add(ident)
-            return False
-
-        def _is_noise(citation: SourceCitation) -> bool:
-            """Filter out citations that waste LLM tokens without adding
-            information: negative search results, empty JSON responses,
-            irrelevant fuzzy matches from broad text searches."""
-            snippet = (citation.snippet or "").lower()
-
-            # Negative search results — searched but found nothing useful
-            if "no exact match" in snippet or "no results found" in snippet:
-                return True
-            if "searched: true" in snippet and "found: false" in snippet:
-                return True
-
-            # Empty or near-empty snippets
-            if len(snippet.strip()) < 15:
-                return True
-
-            # JSON/dict artifacts that leaked into snippets
-            if snippet.count("{") > 3 or snippet.count("[") > 4:
-                return True
-
-            return False
-
-        # Build text with section headers, budget-limited per section.
-        # Budgets scale with max_citations so server profile (50 cites)
-        # gets proportionally more per section than mac_mini (20-30).
-        budget_per_section = {
-            "TRIAL METADATA": max(max_citations // 3, 6),
-            "PUBLISHED RESULTS": max(max_citations // 4, 5),
-            "DRUG/PEPTIDE DATA": max(max_citations // 4, 4),
-            "ANTIMICROBIAL DATA": max(max_citations // 6, 3),
-            "STRUCTURAL DATA": max(max_citations // 8, 2),
-            "WEB SOURCES": max(max_citations // 10, 2),
-        }
-
-        lines = [f"Trial: {nct_id}\n"]
-        cited_sources: list[SourceCitation] = []
-        total_used = 0
-
-        for section_name in [
-            "TRIAL METADATA",
-            "PUBLISHED RESULTS",
-            "DRUG/PEPTIDE DATA",
-            "ANTIMICROBIAL DATA",
-            "STRUCTURAL DATA",
-            "WEB SOURCES",
-        ]:
-            cites = sections[section_name]
-            if not cites:
-                continue
-
-            budget = budget_per_section.get(section_name, 3)
-            if total_used >= max_citations:
-                break
-
-            section_lines = []
-            section_count = 0
-            for citation, _ in cites:
-                if section_count >= budget or total_used >= max_citations:
-                    break
-                if _is_noise(citation) or _is_duplicate(citation):
-                    continue
-                if not _is_relevant_to_trial(citation):
-                    continue
-                # Truncate long snippets to keep total evidence compact
-                snippet = citation.snippet or ""
-                if len(snippet) > max_snippet_chars:
-                    snippet = snippet[:max_snippet_chars].rsplit(" ", 1)[0] + "..."
-                line = (
-                    f"[{citation.source_name}] "
-                    f"{citation.identifier or ''}: "
-                    f"{snippet}"
-                )
-                section_lines.append(line)
-                cited_sources.append(citation)
-                section_count += 1
-                total_used += 1
-
-            if section_lines:
-                lines.append(f"\n=== {section_name} ===")
-                lines.extend(section_lines)
-
-        evidence_text = "\n".join(lines)
-        return evidence_text, cited_sources
+        bundle, view = evidence_bundles.view(nct_id, research_results)
+        return bundle.structured_evidence(
+            view,
+            weight=self.relevance_weight,
+            weight_key=self.field_name,
+            max_citations=max_citations,
+            max_snippet_chars=max_snippet_chars,
+        )
@@ -0,0 +1,446 @@
+"""
+Per-trial evidence bundle shared by annotators and verifiers.
+
+``BaseAnnotationAgent.build_structured_evidence`` and ``BlindVerifier.verify``
+used to re-group, re-sort, re-dedupe and re-filter the same citations for
+every field and again for every verifier model, each with its own copy of the
+source→section table and its own scan of clinical_protocol for intervention
+names. The ``EvidenceBundle`` does that work once per trial:
+
+- every citation is normalized once (section, noise flag, identifier and
+  snippet dedup keys);
+- intervention names for the relevance filter are extracted once;
+- per-field section orderings are computed on first use and memoized.
+
+Agents then only slice the bundle by their citation budget. Slices produce
+exactly the text the old per-agent code produced.
+
+The orchestrator builds the bundle right after Phase 1 and persists its index
+next to the research (``evidence_index`` in research/{job}/{nct}.json), so a
+resumed job reuses it instead of rebuilding. Agents look bundles up through the
+``evidence_bundles`` cache. When a caller passes research the cache hasn't seen,
+a bundle is built on the spot, so agents work unchanged outside the
+orchestrator (tests, scripts).
+"""
+
+from __future__ import annotations
+
+import logging
+import threading
+from collections import OrderedDict
+from dataclasses import dataclass
+from types import MappingProxyType
+from typing import Callable, Iterable, Optional
+
+from app.models.research import ResearchResult, SourceCitation
+from app.services.metrics import metrics
+
+logger = logging.getLogger("agent_annotate.evidence")
+
+# Bump when the index layout or any precomputed flag's definition changes;
+# persisted indexes with another version are rebuilt.
+EVIDENCE_INDEX_VERSION = 1
+
+TRIAL_METADATA = "TRIAL METADATA"
+PUBLISHED_RESULTS = "PUBLISHED RESULTS"
+DRUG_PEPTIDE_DATA = "DRUG/PEPTIDE DATA"
+ANTIMICROBIAL_DATA = "ANTIMICROBIAL DATA"
+STRUCTURAL_DATA = "STRUCTURAL DATA"
+WEB_SOURCES = "WEB SOURCES"
+
+SECTION_ORDER = (
+    TRIAL_METADATA,
+    PUBLISHED_RESULTS,
+    DRUG_PEPTIDE_DATA,
+    ANTIMICROBIAL_DATA,
+    STRUCTURAL_DATA,
+    WEB_SOURCES,
+)
+
+# Semantic section for each citation source; unknown sources go to WEB SOURCES.
+SOURCE_TO_SECTION = MappingProxyType({
+    "clinicaltrials_gov": TRIAL_METADATA,
+    "who_ictrp": TRIAL_METADATA,
+    "openfda": TRIAL_METADATA,
+    "pubmed": PUBLISHED_RESULTS,
+    "pmc": PUBLISHED_RESULTS,
+    "pmc_bioc": PUBLISHED_RESULTS,
+    "europe_pmc": PUBLISHED_RESULTS,
+    "semantic_scholar": PUBLISHED_RESULTS,
+    "openalex": PUBLISHED_RESULTS,
+    "crossref": PUBLISHED_RESULTS,
+    "chembl": DRUG_PEPTIDE_DATA,
+    "uniprot": DRUG_PEPTIDE_DATA,
+    "dramp": DRUG_PEPTIDE_DATA,
+    "iuphar": DRUG_PEPTIDE_DATA,
+    "dbaasp": ANTIMICROBIAL_DATA,
+    "apd": ANTIMICROBIAL_DATA,
+    "rcsb_pdb": STRUCTURAL_DATA,
+    "pdbe": STRUCTURAL_DATA,
+    "ebi_proteins": STRUCTURAL_DATA,
+    "duckduckgo": WEB_SOURCES,
+})
+
+# Sections whose citations are NCT-specific by construction and therefore
+# never dropped by the intervention-name relevance filter.
+_ALWAYS_RELEVANT = frozenset((TRIAL_METADATA, PUBLISHED_RESULTS))
+
+# The verifier reads at most this many citations from each research agent.
+VERIFIER_CITATIONS_PER_RESULT = 8
+
+
+def section_for(source_name: str) -> str:
+    return SOURCE_TO_SECTION.get(source_name, WEB_SOURCES)
+
+
+def _is_noise(snippet: str) -> bool:
+    """Citations that waste LLM tokens without adding information: negative
+    search results, empty JSON responses, JSON/dict artifacts."""
+    snippet = snippet.lower()
+    # Negative search results — searched but found nothing useful
+    if "no exact match" in snippet or "no results found" in snippet:
+        return True
+    if "searched: true" in snippet and "found: false" in snippet:
+        return True
+    # Empty or near-empty snippets
+    if len(snippet.strip()) < 15:
+        return True
+    # JSON/dict artifacts that leaked into snippets
+    if snippet.count("{") > 3 or snippet.count("[") > 4:
+        return True
+    return False
+
+
+def _intervention_names(result: ResearchResult) -> frozenset[str]:
+    if result.agent_name != "clinical_protocol" or not result.raw_data:
+        return frozenset()
+    protocol = result.raw_data.get("protocol_section", {})
+    arms_mod = protocol.get("armsInterventionsModule", {})
+    return frozenset(
+        interv["name"].lower()
+        for interv in arms_mod.get("interventions", [])
+        if interv.get("name", "")
+    )
+
+
+@dataclass(frozen=True)
+class EvidenceCitation:
+    """One citation with everything the evidence builders derive from it."""
+
+    citation: SourceCitation
+    result_index: int
+    section: str
+    noise: bool
+    ident_key: str      # identifier, upper-cased (PMID/DOI dedup)
+    snippet_key: str    # first 60 chars, lower-cased (snippet dedup)
+
+    def relevant_to(self, names: frozenset[str]) -> bool:
+        """Is a database hit actually about one of the trial's interventions?
+
+        IntAct searching "Peptide T" returned CFTR, MAPT, HTT; IUPHAR
+        returned GLP-1, PYY. Trial metadata and published results are
+        always kept (they're NCT-specific).
+        """
+        if self.section in _ALWAYS_RELEVANT or not names:
+            return True
+        c = self.citation
+        combined = f"{(c.snippet or '').lower()} {(c.title or '').lower()} {(c.identifier or '').lower()}"
+        return any(name in combined for name in names)
+
+
+class EvidenceBundle:
+    """Immutable, indexed view of one trial's research citations."""
+
+    __slots__ = (
+        "nct_id", "results", "citations", "intervention_names",
+        "_by_result", "_names_by_result", "_index_of", "_memo", "_lock",
+    )
+
+    def __init__(
+        self,
+        nct_id: str,
+        results: Iterable[ResearchResult],
+        index: Optional[dict] = None,
+    ):
+        results = tuple(results)
+        by_result: list[tuple[EvidenceCitation, ...]] = []
+        names_by_result: list[frozenset[str]] = []
+        flags = _usable_index(index, results)
+        for ri, result in enumerate(results):
+            entries = []
+            for ci, c in enumerate(result.citations):
+                snippet = c.snippet or ""
+                if flags is not None:
+                    section, noise = flags["citations"][ri][ci]
+                else:
+                    section, noise = section_for(c.source_name), _is_noise(snippet)
+                ident = c.identifier or ""
+                entries.append(EvidenceCitation(
+                    citation=c,
+                    result_index=ri,
+                    section=section,
+                    noise=noise,
+                    ident_key=ident.upper().strip(),
+                    snippet_key=snippet[:60].lower(),
+                ))
+            by_result.append(tuple(entries))
+            if flags is not None:
+                names_by_result.append(frozenset(flags["intervention_names"][ri]))
+            else:
+                names_by_result.append(_intervention_names(result))
+
+        set_ = object.__setattr__
+        set_(self, "nct_id", nct_id)
+        set_(self, "results", results)
+        set_(self, "_by_result", tuple(by_result))
+        set_(self, "_names_by_result", tuple(names_by_result))
+        set_(self, "citations", tuple(e for entries in by_result for e in entries))
+        set_(self, "intervention_names", frozenset().union(*names_by_result))
+        set_(self, "_index_of", MappingProxyType({id(r): i for i, r in enumerate(results)}))
+        # Memoized per-field section orderings; derived data only.
+        set_(self, "_memo", {})
+        set_(self, "_lock", threading.Lock())
+
+    def __setattr__(self, name, value):
+        raise AttributeError("EvidenceBundle is immutable")
+
+    # -- identity -------------------------------------------------------------
+
+    def covers(self, results: Iterable[ResearchResult]) -> Optional[tuple[int, ...]]:
+        """Indexes of ``results`` in this bundle, or None if any is foreign."""
+        idx = []
+        for r in results:
+            i = self._index_of.get(id(r))
+            if i is None or self.results[i] is not r:
+                return None
+            idx.append(i)
+        return tuple(idx)
+
+    def sections(self, view: Optional[tuple[int, ...]] = None) -> dict[str, list[EvidenceCitation]]:
+        """Citations bucketed by section, in research order."""
+        view = tuple(range(len(self.results))) if view is None else view
+        buckets: dict[str, list[EvidenceCitation]] = {s: [] for s in SECTION_ORDER}
+        for ri in view:
+            for e in self._by_result[ri]:
+                buckets[e.section].append(e)
+        return buckets
+
+    # -- annotator slice ------------------------------------------------------
+
+    def structured_evidence(
+        self,
+        view: tuple[int, ...],
+        weight: Callable[[str], float],
+        weight_key: str,
+        max_citations: int = 30,
+        max_snippet_chars: int = 250,
+    ) -> tuple[str, list[SourceCitation]]:
+        """Section-grouped, budget-limited evidence text for one annotator.
+
+        ``weight`` maps a research agent name to its relevance for the
+        field; ``weight_key`` (the field name) keys the memoized ordering.
+        """
+        ordered = self._ordered_sections(view, weight, weight_key)
+        names = frozenset().union(*(self._names_by_result[ri] for ri in view))
+
+        # Budgets scale with max_citations so server profile (50 cites)
+        # gets proportionally more per section than mac_mini (20-30).
+        budget_per_section = {
+            TRIAL_METADATA: max(max_citations // 3, 6),
+            PUBLISHED_RESULTS: max(max_citations // 4, 5),
+            DRUG_PEPTIDE_DATA: max(max_citations // 4, 4),
+            ANTIMICROBIAL_DATA: max(max_citations // 6, 3),
+            STRUCTURAL_DATA: max(max_citations // 8, 2),
+            WEB_SOURCES: max(max_citations // 10, 2),
+        }
+        # v31: identifier-based dedup (PMID/DOI) so the same paper found by
+        # PubMed + OpenAlex + Semantic Scholar uses one budget slot.
+        seen_snippets: set[str] = set()
+        seen_identifiers: set[str] = set()
+
+        lines = [f"Trial: {self.nct_id}\n"]
+        cited_sources: list[SourceCitation] = []
+        total_used = 0
+        for section_name in SECTION_ORDER:
+            cites = ordered[section_name]
+            if not cites:
+                continue
+            budget = budget_per_section[section_name]
+            if total_used >= max_citations:
+                break
+            section_lines = []
+            section_count = 0
+            for e in cites:
+                if section_count >= budget or total_used >= max_citations:
+                    break
+                if e.noise:
+                    continue
+                # Duplicate check records keys even for citations the
+                # relevance filter then drops (matches the original order
+                # of checks, so the same citations win).
+                if e.ident_key and e.ident_key in seen_identifiers:
+                    continue
+                if e.snippet_key in seen_snippets:
+                    continue
+                seen_snippets.add(e.snippet_key)
+                if e.ident_key:
+                    seen_identifiers.add(e.ident_key)
+                if not e.relevant_to(names):
+                    continue
+                c = e.citation
+                # Truncate long snippets to keep total evidence compact
+                snippet = c.snippet or ""
+                if len(snippet) > max_snippet_chars:
+                    snippet = snippet[:max_snippet_chars].rsplit(" ", 1)[0] + "..."
+                section_lines.append(f"[{c.source_name}] {c.identifier or ''}: {snippet}")
+                cited_sources.append(c)
+                section_count += 1
+                total_used += 1
+            if section_lines:
+                lines.append(f"\n=== {section_name} ===")
+                lines.extend(section_lines)
+
+        return "\n".join(lines), cited_sources
+
+    def _ordered_sections(
+        self, view: tuple[int, ...], weight: Callable[[str], float], weight_key: str,
+    ) -> dict[str, list[EvidenceCitation]]:
+        key = (weight_key, view)
+        with self._lock:
+            cached = self._memo.get(key)
+        if cached is not None:
+            return cached
+        weights = {ri: weight(self.results[ri].agent_name) for ri in view}
+        ordered = self.sections(view)
+        # Sort within each section by weight, then by snippet length (richer
+        # versions win dedup when multiple sources find the same paper).
+        for cites in ordered.values():
+            cites.sort(
+                key=lambda e: (weights[e.result_index], len(e.citation.snippet or "")),
+                reverse=True,
+            )
+        ordered = {s: tuple(c) for s, c in ordered.items()}
+        with self._lock:
+            self._memo[key] = ordered
+        return ordered
+
+    # -- verifier slice -------------------------------------------------------
+
+    def verifier_evidence(self, view: tuple[int, ...], max_citations: int) -> list[str]:
+        """Section-grouped evidence lines for a blind verifier.
+
+        Up to ``VERIFIER_CITATIONS_PER_RESULT`` citations per successful
+        research agent, snippet-deduped, full snippets, in research order.
+        """
+        sections: dict[str, list[str]] = {}
+        seen: set[str] = set()
+        total = 0
+        for ri in view:
+            if self.results[ri].error:
+                continue
+            for e in self._by_result[ri][:VERIFIER_CITATIONS_PER_RESULT]:
+                if total >= max_citations:
+                    break
+                if e.snippet_key in seen:
+                    continue
+                seen.add(e.snippet_key)
+                c = e.citation
+                sections.setdefault(e.section, []).append(
+                    f"[{c.source_name}] {c.identifier or ''}: {c.snippet}"
+                )
+                total += 1
+
+        parts = [f"Trial: {self.nct_id}\n"]
+        for sec_name in SECTION_ORDER:
+            if sec_name in sections:
+                parts.append(f"\n=== {sec_name} ===")
+                parts.extend(sections[sec_name])
+        return parts
+
+    # -- persistence ----------------------------------------------------------
+
+    def to_index(self) -> dict:
+        """Compact, JSON-safe index persisted next to the research results."""
+        return {
+            "version": EVIDENCE_INDEX_VERSION,
+            "citations": [
+                [[e.section, e.noise] for e in entries] for entries in self._by_result
+            ],
+            "intervention_names": [sorted(n) for n in self._names_by_result],
+        }
+
+
+def _usable_index(index: Optional[dict], results: tuple[ResearchResult, ...]) -> Optional[dict]:
+    """Return ``index`` if it was built by this version for these results."""
+    if not index or index.get("version") != EVIDENCE_INDEX_VERSION:
+        return None
+    cites = index.get("citations") or []
+    names = index.get("intervention_names") or []
+    if len(cites) != len(results) or len(names) != len(results):
+        return None
+    if any(len(c) != len(r.citations) for c, r in zip(cites, results)):
+        return None
+    return index
+
+
+class EvidenceBundleCache:
+    """Process-wide LRU of bundles, most recent per trial.
+
+    Keyed by NCT ID; a hit requires the caller's research results to be the
+    very objects the bundle was built from, so research from another job
+    (or a re-run) never reads a stale bundle. A trial evicted before its
+    annotation simply gets its bundle rebuilt on first use.
+    """
+
+    def __init__(self, max_trials: int = 512):
+        self._max = max_trials
+        self._bundles: OrderedDict[str, EvidenceBundle] = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.builds = 0
+
+    def register(self, bundle: EvidenceBundle) -> EvidenceBundle:
+        with self._lock:
+            self._bundles[bundle.nct_id] = bundle
+            self._bundles.move_to_end(bundle.nct_id)
+            while len(self._bundles) > self._max:
+                self._bundles.popitem(last=False)
+        return bundle
+
+    def build(
+        self, nct_id: str, results: Iterable[ResearchResult], index: Optional[dict] = None,
+    ) -> EvidenceBundle:
+        """Build (or restore from a persisted index) and cache a bundle."""
+        with self._lock:
+            self.builds += 1
+        return self.register(EvidenceBundle(nct_id, results, index=index))
+
+    def view(
+        self, nct_id: str, results: list[ResearchResult],
+    ) -> tuple[EvidenceBundle, tuple[int, ...]]:
+        """The bundle covering ``results`` plus their indexes within it."""
+        with self._lock:
+            bundle = self._bundles.get(nct_id)
+        if bundle is not None:
+            view = bundle.covers(results)
+            if view is not None:
+                with self._lock:
+                    self.hits += 1
+                    self._bundles.move_to_end(nct_id)
+                return bundle, view
+        fresh = EvidenceBundle(nct_id, results)
+        with self._lock:
+            self.builds += 1
+        # Don't evict the trial's Phase 1 bundle for an ad-hoc list of other
+        # objects; only replace a bundle none of these results belong to.
+        if bundle is None or not any(bundle.covers([r]) for r in results):
+            self.register(fresh)
+        return fresh, tuple(range(len(fresh.results)))
+
+    def stats(self) -> dict:
+        return {"trials": len(self._bundles), "hits": self.hits, "builds": self.builds}
+
+
+# Module-level singleton shared by every agent in the process.
+evidence_bundles = EvidenceBundleCache()
+metrics.register_cache("evidence_bundle", evidence_bundles.stats, misses="builds", size="trials")
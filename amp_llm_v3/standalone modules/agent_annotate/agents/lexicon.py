@@ -0,0 +1,130 @@
+"""
+Precompiled drug-name lexicon: exact, contained-in and containing lookups.
+
+``resolve_known_sequence`` used to re-sort the known-sequence table on every
+call and then scan it with ``key in name or name in key``. It runs for every
+intervention of every trial, from the sequence agent, the peptide cascade
+and the orchestrator's consistency passes. A ``DrugLexicon`` compiles its
+terms once:
+
+- an exact-match dict;
+- an Aho-Corasick automaton that finds every term contained in a name in
+  one pass over the name;
+- a sorted suffix array of the terms. Every term containing a name as a
+  substring has a suffix that starts with the name, and those suffixes form
+  one contiguous run found by bisection.
+
+Terms are ranked by the order they are given in. ``first_match`` returns the
+best-ranked term that is in the name or contains it, which is the result of a
+linear scan over that order. Callers choose the order. The known-sequence
+table passes longest-first, so 'glucagon-like peptide 1' wins over
+'glucagon'.
+
+Terms are matched as given, so pass them lowercased and query with
+lowercased names. Other agents can build their own lexicon from any
+list of drug names.
+"""
+
+from __future__ import annotations
+
+from bisect import bisect_left
+from collections import deque
+from typing import Iterable, Iterator, Optional
+
+
+class DrugLexicon:
+    """Immutable set of ranked terms with precompiled substring lookups."""
+
+    def __init__(self, terms: Iterable[str]) -> None:
+        self.terms: tuple[str, ...] = tuple(dict.fromkeys(terms))
+        self._rank = {t: i for i, t in enumerate(self.terms)}
+        self._max_len = max((len(t) for t in self.terms), default=0)
+        self._build_automaton()
+        self._suffixes = sorted(
+            (t[i:], rank) for rank, t in enumerate(self.terms) for i in range(len(t))
+        )
+        self._suffix_keys = [s for s, _ in self._suffixes]
+
+    def __len__(self) -> int:
+        return len(self.terms)
+
+    def __contains__(self, name: str) -> bool:
+        return name in self._rank
+
+    # -- Aho-Corasick ---------------------------------------------------------
+
+    def _build_automaton(self) -> None:
+        goto: list[dict[str, int]] = [{}]
+        out: list[list[int]] = [[]]
+        for rank, term in enumerate(self.terms):
+            node = 0
+            for ch in term:
+                nxt = goto[node].get(ch)
+                if nxt is None:
+                    nxt = len(goto)
+                    goto[node][ch] = nxt
+                    goto.append({})
+                    out.append([])
+                node = nxt
+            out[node].append(rank)
+
+        # Depth-1 states fall back to the root; deeper ones follow their
+        # parent's fail chain (breadth-first, so the chain is already built).
+        fail = [0] * len(goto)
+        queue = deque(goto[0].values())
+        while queue:
+            node = queue.popleft()
+            for ch, nxt in goto[node].items():
+                queue.append(nxt)
+                if node:
+                    f = fail[node]
+                    while f and ch not in goto[f]:
+                        f = fail[f]
+                    fail[nxt] = goto[f].get(ch, 0)
+                # Every term ending at the fallback state also ends here.
+                out[nxt] = out[nxt] + out[fail[nxt]]
+        self._goto = goto
+        self._fail = fail
+        self._out = [tuple(o) for o in out]
+
+    def _ranks_in(self, text: str) -> Iterator[int]:
+        goto, fail, out = self._goto, self._fail, self._out
+        node = 0
+        for ch in text:
+            while node and ch not in goto[node]:
+                node = fail[node]
+            node = goto[node].get(ch, 0)
+            yield from out[node]
+
+    # -- suffix array -----------------------------------------------------------
+
+    def _ranks_containing(self, fragment: str) -> Iterator[int]:
+        if len(fragment) > self._max_len:
+            return
+        if not fragment:  # "" is in every term
+            yield from range(len(self.terms))
+            return
+        keys = self._suffix_keys
+        i = bisect_left(keys, fragment)
+        while i < len(keys) and keys[i].startswith(fragment):
+            yield self._suffixes[i][1]
+            i += 1
+
+    # -- lookups ----------------------------------------------------------------
+
+    def exact(self, name: str) -> Optional[str]:
+        return name if name in self._rank else None
+
+    def contained_in(self, text: str) -> list[str]:
+        """Terms occurring in ``text``, best-ranked first."""
+        return [self.terms[r] for r in sorted(set(self._ranks_in(text)))]
+
+    def containing(self, fragment: str) -> list[str]:
+        """Terms that contain ``fragment``, best-ranked first."""
+        return [self.terms[r] for r in sorted(set(self._ranks_containing(fragment)))]
+
+    def first_match(self, name: str) -> Optional[str]:
+        """The best-ranked term with ``term in name or name in term``."""
+        best = min(self._ranks_in(name), default=len(self.terms))
+        best = min(best, min(self._ranks_containing(name), default=best))
+        return self.terms[best] if best < len(self.terms) else None
@@ -15,13 +15,12 @@ from datetime import datetime
 import httpx
 
 from agents.base import BaseResearchAgent
+from agents.research.ctgov_bulk import CT_GOV_API, ctgov_studies
 from agents.research.http_utils import resilient_get
 from app.models.research import ResearchResult, SourceCitation
 
 logger = logging.getLogger("agent_annotate.research.clinical_protocol")
 
-CT_GOV_API = "https://clinicaltrials.gov/api/v2/studies"
-
 
 class ClinicalProtocolAgent(BaseResearchAgent):
     """Retrieves clinical protocol data from ClinicalTrials.gov and OpenFDA."""
@@ -34,14 +33,23 @@ class ClinicalProtocolAgent(BaseResearchAgent):
         raw_data = {}
 
         async with httpx.AsyncClient(timeout=30) as client:
-            # 1. Fetch directly from ClinicalTrials.gov API v2
+            # 1. ClinicalTrials.gov API v2: the record prefetched in bulk for
+            # the job or served by the offline mirror
+            # (agents/research/ctgov_bulk.py), else a direct fetch.
             protocol = {}
             try:
-                resp = await resilient_get(
-                    f"{CT_GOV_API}/{nct_id}", client=client
-                )
-                if resp.status_code == 200:
-                    ct_data = resp.json()
+                ct_data = await ctgov_studies.take(nct_id)
+                if ct_data is None:
+                    resp = await resilient_get(
+                        f"{CT_GOV_API}/{nct_id}", client=client
+                    )
+                    if resp.status_code == 200:
+                        ct_data = resp.json()
+                        await ctgov_studies.remember(ct_data)
+                    else:
+                        raw_data["clinicaltrials_error"] = f"HTTP {resp.status_code}"
+                        logger.warning(f"  ClinicalTrials.gov: HTTP {resp.status_code} for {nct_id}")
+                if ct_data is not None:
                     protocol = ct_data.get("protocolSection", {})
                     raw_data["protocol_section"] = protocol
 
@@ -56,9 +64,6 @@ class ClinicalProtocolAgent(BaseResearchAgent):
                         citations.extend(self._extract_results_citations(nct_id, has_results, results_section))
 
                     logger.info(f"  ClinicalTrials.gov: {len(citations)} citations for {nct_id} (hasResults={has_results})")
-                else:
-                    raw_data["clinicaltrials_error"] = f"HTTP {resp.status_code}"
-                    logger.warning(f"  ClinicalTrials.gov: HTTP {resp.status_code} for {nct_id}")
             except Exception as e:
                 raw_data["clinicaltrials_error"] = str(e)
                 logger.error(f"  ClinicalTrials.gov fetch failed for {nct_id}: {e}")
@@ -0,0 +1,322 @@
+"""
+Bulk ClinicalTrials.gov v2 prefetch for a job's NCT list.
+
+ClinicalProtocolAgent fetched ``/api/v2/studies/{nct_id}`` once per trial,
+so a full-corpus job spent ~1,800 requests of the clinicaltrials.gov host
+budget before any other agent queried it. The v2 search endpoint returns
+the same full study records for a list of IDs:
+
+    GET /api/v2/studies?filter.ids=NCT1,NCT2,...&pageSize=1000[&pageToken=...]
+
+Phase 1 calls ``prefetch()`` with the job's remaining NCTs. IDs are sent in
+chunks of ``orchestrator.ctgov_bulk_ids_per_request``, and each chunk is paged
+with ``nextPageToken``. ClinicalProtocolAgent then calls ``take()`` first and
+only issues the per-trial GET when a trial wasn't prefetched. That happens
+when a chunk failed, the search index doesn't have the ID yet, or the
+prefetch is disabled.
+
+Without a mirror the store is process-local and holds each record only
+until it is used: ``take()`` pops it, and ``release()`` drops whatever a job
+prefetched but never consumed (adopted or cancelled trials). Two jobs
+prefetching the same NCT share one entry; the later consumer falls back to
+the per-trial GET.
+
+With ``orchestrator.ctgov_mirror`` on, records live in the offline mirror
+(agents/research/ctgov_mirror.py) instead of memory:
+
+- Fresh mirror records cost no request.
+- Stale records are re-validated with one ``fields=NCTId,LastUpdatePostDate``
+  query per chunk. Unchanged ones are only re-stamped.
+- Only changed and missing studies are downloaded and written back.
+- ``take()`` reads the mirror at disk speed, and ``remember()`` stores
+  records that ClinicalProtocolAgent had to fetch one by one.
+
+Usage:
+    from agents.research.ctgov_bulk import ctgov_studies
+    await ctgov_studies.prefetch(nct_ids)
+    study = await ctgov_studies.take(nct_id)   # full study JSON or None
+"""
+
+from __future__ import annotations
+
+import asyncio
+import logging
+from typing import Iterable, Optional
+
+import httpx
+
+from agents.research.ctgov_mirror import (
+    CTGovMirror,
+    last_update_post_date,
+    open_mirror,
+    study_nct_id,
+)
+from agents.research.http_utils import resilient_get
+from app.services.metrics import metrics
+
+logger = logging.getLogger("agent_annotate.research.ctgov_bulk")
+
+CT_GOV_API = "https://clinicaltrials.gov/api/v2/studies"
+
+# The v2 API caps pageSize at 1000.
+MAX_PAGE_SIZE = 1000
+_DEFAULT_IDS_PER_REQUEST = 250
+_DEFAULT_MIRROR_MAX_AGE_DAYS = 7.0
+
+
+def _setting(name: str, default):
+    try:
+        from app.services.config_service import config_service
+        return getattr(config_service.get().orchestrator, name, default)
+    except Exception:
+        return default
+
+
+class CTGovStudyStore:
+    """Prefetched CT.gov v2 study records, in memory or in the offline mirror."""
+
+    def __init__(
+        self,
+        mirror: Optional[CTGovMirror] = None,
+        max_age_days: Optional[float] = None,
+    ) -> None:
+        self._studies: dict[str, dict] = {}
+        self._mirror_override = mirror
+        self._max_age_days = max_age_days
+        self.requests = 0
+        self.prefetched = 0
+        self.failed_chunks = 0
+        self.hits = 0
+        self.misses = 0
+        self.mirror_hits = 0
+        self.mirror_confirmed = 0
+        self.mirror_updated = 0
+
+    def stats(self) -> dict:
+        return {
+            "held": len(self._studies),
+            "requests": self.requests,
+            "prefetched": self.prefetched,
+            "failed_chunks": self.failed_chunks,
+            "hits": self.hits,
+            "misses": self.misses,
+            "mirror_hits": self.mirror_hits,
+            "mirror_confirmed": self.mirror_confirmed,
+            "mirror_updated": self.mirror_updated,
+        }
+
+    # -- settings -----------------------------------------------------------
+
+    def mirror(self) -> Optional[CTGovMirror]:
+        """The offline mirror when enabled, else None."""
+        if self._mirror_override is not None:
+            return self._mirror_override
+        if not _setting("ctgov_mirror", False):
+            return None
+        try:
+            from app.config import CTGOV_MIRROR_PATH
+            return open_mirror(CTGOV_MIRROR_PATH)
+        except Exception as e:
+            logger.warning(f"CT.gov mirror unavailable ({e}); using the live API")
+            return None
+
+    def _max_age(self) -> float:
+        days = self._max_age_days
+        if days is None:
+            days = _setting("ctgov_mirror_max_age_days", _DEFAULT_MIRROR_MAX_AGE_DAYS)
+        return float(days) * 86400
+
+    @staticmethod
+    def _ids_per_request() -> int:
+        n = _setting("ctgov_bulk_ids_per_request", _DEFAULT_IDS_PER_REQUEST)
+        return max(1, min(int(n), MAX_PAGE_SIZE))
+
+    # -- prefetch -----------------------------------------------------------
+
+    async def prefetch(
+        self,
+        nct_ids: Iterable[str],
+        client: Optional[httpx.AsyncClient] = None,
+        ids_per_request: Optional[int] = None,
+    ) -> int:
+        """Make every study in ``nct_ids`` available to ``take()``.
+
+        Returns the number of studies downloaded. Errors are logged and leave
+        the affected trials to the per-trial fallback; this never raises.
+        """
+        wanted = [
+            n for n in dict.fromkeys(n.strip().upper() for n in nct_ids)
+            if n and n not in self._studies
+        ]
+        if not wanted:
+            return 0
+
+        mirror = self.mirror()
+        stale: dict[str, str] = {}
+        to_fetch = wanted
+        if mirror is not None:
+            fresh, stale, to_fetch = await asyncio.to_thread(
+                mirror.status, wanted, self._max_age(),
+            )
+            if not stale and not to_fetch:
+                logger.info(f"CT.gov mirror: all {len(fresh)} studies fresh")
+                return 0
+
+        size = ids_per_request or self._ids_per_request()
+        if client is None:
+            async with httpx.AsyncClient(timeout=60) as own_client:
+                unchanged, changed, studies = await self._download(
+                    stale, to_fetch, own_client, size,
+                )
+        else:
+            unchanged, changed, studies = await self._download(stale, to_fetch, client, size)
+
+        if mirror is not None:
+            await asyncio.to_thread(mirror.mark_checked, unchanged)
+            await asyncio.to_thread(mirror.put_many, studies)
+            self.mirror_confirmed += len(unchanged)
+            self.mirror_updated += sum(1 for s in studies if study_nct_id(s) in stale)
+            logger.info(
+                f"CT.gov mirror: {len(wanted) - len(stale) - len(to_fetch)} fresh, "
+                f"{len(unchanged)} confirmed, {len(changed)} changed, "
+                f"{len(studies)}/{len(to_fetch) + len(changed)} downloaded"
+            )
+        else:
+            for study in studies:
+                self._studies[study_nct_id(study)] = study
+            logger.info(f"CT.gov bulk prefetch: {len(studies)}/{len(wanted)} studies")
+        return len(studies)
+
+    async def _download(
+        self,
+        stale: dict[str, str],
+        missing: list[str],
+        client: httpx.AsyncClient,
+        size: int,
+    ) -> tuple[list[str], set[str], list[dict]]:
+        """Re-validate ``stale`` by date, then fetch changed + missing studies.
+
+        Returns (unchanged, changed, studies). A stale record whose date
+        query failed is in neither set and stays stale.
+        """
+        unchanged: list[str] = []
+        changed: set[str] = set()
+        stale_ids = list(stale)
+        for i in range(0, len(stale_ids), size):
+            chunk = stale_ids[i:i + size]
+            for rec in await self._query(chunk, client, fields="NCTId,LastUpdatePostDate"):
+                nct = study_nct_id(rec)
+                if nct not in stale:
+                    continue
+                if last_update_post_date(rec) == stale[nct]:
+                    unchanged.append(nct)
+                else:
+                    changed.add(nct)
+        fetch = list(missing) + sorted(changed)
+        studies: list[dict] = []
+        for i in range(0, len(fetch), size):
+            studies.extend(await self._query(fetch[i:i + size], client))
+        self.prefetched += len(studies)
+        return unchanged, changed, studies
+
+    async def _query(
+        self,
+        chunk: list[str],
+        client: httpx.AsyncClient,
+        fields: Optional[str] = None,
+    ) -> list[dict]:
+        """All records for one chunk of IDs, following nextPageToken.
+
+        On failure, returns the pages that arrived before it.
+        """
+        wanted = set(chunk)
+        params = {
+            "filter.ids": ",".join(chunk),
+            "pageSize": min(MAX_PAGE_SIZE, len(chunk)),
+            "countTotal": "false",
+        }
+        if fields:
+            params["fields"] = fields
+        found: dict[str, dict] = {}
+        while True:
+            self.requests += 1
+            try:
+                resp = await resilient_get(CT_GOV_API, client=client, params=params)
+                if resp.status_code != 200:
+                    raise RuntimeError(f"HTTP {resp.status_code}")
+                page = resp.json()
+            except Exception as e:
+                self.failed_chunks += 1
+                logger.warning(
+                    f"CT.gov bulk query failed for a chunk of {len(chunk)} "
+                    f"IDs ({e}); those trials fall back to per-trial fetches"
+                )
+                break
+            for study in page.get("studies", []):
+                nct = study_nct_id(study)
+                if nct in wanted:
+                    found.setdefault(nct, study)
+            token = page.get("nextPageToken")
+            if not token:
+                break
+            params["pageToken"] = token
+        return list(found.values())
+
+    # -- consumers ----------------------------------------------------------
+
+    async def take(self, nct_id: str) -> Optional[dict]:
+        """The prefetched or fresh mirrored study for ``nct_id``, else None.
+
+        In-memory records are popped; mirrored ones stay on disk and are
+        read (SQLite + zlib) in a worker thread.
+        """
+        key = nct_id.strip().upper()
+        study = self._studies.pop(key, None)
+        if study is None:
+            study = await asyncio.to_thread(self._mirror_get, key)
+            if study is not None:
+                self.mirror_hits += 1
+        if study is None:
+            self.misses += 1
+        else:
+            self.hits += 1
+        return study
+
+    async def remember(self, study: dict) -> None:
+        """Store a study fetched one by one, so the mirror serves it next time."""
+        await asyncio.to_thread(self._mirror_put, study)
+
+    def _mirror_get(self, key: str) -> Optional[dict]:
+        mirror = self.mirror()
+        if mirror is None:
+            return None
+        try:
+            return mirror.get(key, max_age=self._max_age())
+        except Exception as e:
+            logger.warning(f"CT.gov mirror read failed for {key}: {e}")
+            return None
+
+    def _mirror_put(self, study: dict) -> None:
+        mirror = self.mirror()
+        if mirror is None:
+            return
+        try:
+            mirror.put(study)
+        except Exception as e:
+            logger.warning(f"CT.gov mirror write failed: {e}")
+
+    def release(self, nct_ids: Iterable[str]) -> None:
+        """Drop in-memory studies that were never taken."""
+        for nct in nct_ids:
+            self._studies.pop(nct.strip().upper(), None)
+
+    def clear(self) -> None:
+        self._studies.clear()
+        self.requests = self.prefetched = self.failed_chunks = 0
+        self.hits = self.misses = 0
+        self.mirror_hits = self.mirror_confirmed = self.mirror_updated = 0
+
+
+# Module-level singleton shared by every job in the process.
+ctgov_studies = CTGovStudyStore()
+metrics.register_cache("ctgov_study", ctgov_studies.stats, size="held")
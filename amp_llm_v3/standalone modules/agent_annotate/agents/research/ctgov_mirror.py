@@ -0,0 +1,22 @@
+"""
+Offline ClinicalTrials.gov mirror.
+
+The implementation is shared with nct_lookup and lives in
+``amp_llm_v3/amp_shared/ctgov_mirror.py``; this module re-exports it.
+"""
+
+import sys
+from pathlib import Path
+
+_AMP_ROOT = str(Path(__file__).resolve().parents[4])
+if _AMP_ROOT not in sys.path:
+    sys.path.append(_AMP_ROOT)
+
+from amp_shared.ctgov_mirror import (  # noqa: E402
+    CTGovMirror,
+    last_update_post_date,
+    open_mirror,
+    study_nct_id,
+)
+
+__all__ = ["CTGovMirror", "last_update_post_date", "open_mirror", "study_nct_id"]
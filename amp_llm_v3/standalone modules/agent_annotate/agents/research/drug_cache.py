@@ -36,6 +36,8 @@ import asyncio
 import logging
 from typing import Any, Awaitable, Callable, Optional
 
+from app.services.metrics import metrics
+
 logger = logging.getLogger("agent_annotate.research.drug_cache")
 
 
@@ -110,3 +112,4 @@ class DrugResearchCache:
 
 # Module-level singleton. Shared across all research agents in the process.
 drug_cache = DrugResearchCache()
+metrics.register_cache("drug_research", drug_cache.stats, size="size")
@@ -16,12 +16,27 @@ Rate limits (approximate):
 
 import asyncio
 import logging
+import time
 from urllib.parse import urlparse
 
 import httpx
 
+from app.services.metrics import metrics
+from app.services.tracing import tracer
+
 logger = logging.getLogger("agent_annotate.research.http")
 
+HTTP_LATENCY = metrics.histogram(
+    "agent_annotate_http_request_duration_seconds",
+    "Research HTTP request latency per attempt (excludes semaphore wait)",
+    ["host"],
+)
+HTTP_REQUESTS = metrics.counter(
+    "agent_annotate_http_requests_total",
+    "Research HTTP attempts by host and status code ('error' = no response)",
+    ["host", "status"],
+)
+
 # Per-host concurrency semaphores — lazily initialized so they bind
 # to the running event loop, not to import-time state.
 _HOST_SEMAPHORES: dict[str, asyncio.Semaphore] = {}
@@ -81,7 +96,23 @@ async def resilient_get(
     Semaphore is released between retries so other requests to the
     same host can proceed while this one waits.
     """
-    host = urlparse(url).hostname or "unknown"
+    parsed = urlparse(url)
+    host = parsed.hostname or "unknown"
+    with tracer.span(f"GET {host}", "http", path=parsed.path) as span:
+        resp = await _resilient_get(url, host, client, params, headers, timeout, max_retries)
+        span.set(status=resp.status_code)
+        return resp
+
+
+async def _resilient_get(
+    url: str,
+    host: str,
+    client: httpx.AsyncClient,
+    params: dict | None,
+    headers: dict | None,
+    timeout: float | None,
+    max_retries: int,
+) -> httpx.Response:
     sem = _get_host_semaphore(host)
 
     # v29: NCBI endpoints get more retries — sustained 429s during batch
@@ -98,7 +129,15 @@ async def resilient_get(
     for attempt in range(max_retries + 1):
         try:
             async with sem:
-                resp = await client.get(url, **kwargs)
+                started = time.perf_counter()
+                try:
+                    resp = await client.get(url, **kwargs)
+                except Exception:
+                    HTTP_REQUESTS.labels(host, "error").inc()
+                    raise
+                finally:
+                    HTTP_LATENCY.labels(host).observe(time.perf_counter() - started)
+            HTTP_REQUESTS.labels(host, str(resp.status_code)).inc()
             last_resp = resp
 
             if resp.status_code < 400:
@@ -112,7 +151,7 @@ async def resilient_get(
                         f"Rate limited by {host} (429), "
                         f"retry in {delay:.1f}s ({attempt+1}/{max_retries+1})"
                     )
-                    await asyncio.sleep(delay)
+                    await _backoff(host, 429, delay)
                     continue
                 logger.warning(f"Rate limited by {host}, exhausted {max_retries} retries")
                 return resp
@@ -125,7 +164,7 @@ async def resilient_get(
                         f"Server error {resp.status_code} from {host}, "
                         f"retry in {delay}s ({attempt+1}/{max_retries+1})"
                     )
-                    await asyncio.sleep(delay)
+                    await _backoff(host, resp.status_code, delay)
                     continue
                 return resp
 
@@ -139,7 +178,7 @@ async def resilient_get(
                     f"{type(e).__name__} to {host}, "
                     f"retry in {delay}s ({attempt+1}/{max_retries+1})"
                 )
-                await asyncio.sleep(delay)
+                await _backoff(host, type(e).__name__, delay)
                 continue
             raise
 
@@ -149,6 +188,12 @@ async def resilient_get(
     raise RuntimeError(f"resilient_get exhausted retries for {url}")
 
 
+async def _backoff(host: str, reason, delay: float) -> None:
+    """Sleep before a retry, as a span so 429 waits show up in traces."""
+    with tracer.span("backoff", "http", host=host, reason=reason, delay_s=delay):
+        await asyncio.sleep(delay)
+
+
 def _parse_retry_after(resp: httpx.Response, attempt: int) -> float:
     """Parse Retry-After header, falling back to exponential backoff."""
     raw = resp.headers.get("Retry-After", "")
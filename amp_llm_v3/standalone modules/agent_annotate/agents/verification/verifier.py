@@ -15,6 +15,7 @@ from typing import Optional
 
 from app.models.verification import ModelOpinion
 from app.models.research import ResearchResult
+from agents.evidence import evidence_bundles
 
 logger = logging.getLogger("agent_annotate.verification.verifier")
 
@@ -339,58 +340,10 @@ class BlindVerifier:
         budget = _FIELD_BUDGETS.get(field_name, (35, 15))
         max_citations = max_citations_override or (budget[0] if is_server else budget[1])
 
-        # Build structured evidence from research (raw data only, no primary answer)
-        _SOURCE_TO_SECTION = {
-            "clinicaltrials_gov": "TRIAL METADATA",
-            "who_ictrp": "TRIAL METADATA",
-            "openfda": "TRIAL METADATA",
-            "pubmed": "PUBLISHED RESULTS",
-            "pmc": "PUBLISHED RESULTS",
-            "pmc_bioc": "PUBLISHED RESULTS",
-            "europe_pmc": "PUBLISHED RESULTS",
-            "semantic_scholar": "PUBLISHED RESULTS",
-            "chembl": "DRUG/PEPTIDE DATA",
-            "uniprot": "DRUG/PEPTIDE DATA",
-            "dramp": "DRUG/PEPTIDE DATA",
-            "iuphar": "DRUG/PEPTIDE DATA",
-            "dbaasp": "ANTIMICROBIAL DATA",
-            "apd": "ANTIMICROBIAL DATA",
-            "rcsb_pdb": "STRUCTURAL DATA",
-            "pdbe": "STRUCTURAL DATA",
-            "ebi_proteins": "STRUCTURAL DATA",
-            "duckduckgo": "WEB SOURCES",
-        }
-        sections: dict[str, list[str]] = {}
-        seen: set[str] = set()
-        total = 0
-        for result in research_results:
-            if result.error:
-                continue
-            for citation in result.citations[:8]:
-                if total >= max_citations:
-                    break
-                key = (citation.snippet or "")[:60].lower()
-                if key in seen:
-                    continue
-                seen.add(key)
-                section = _SOURCE_TO_SECTION.get(citation.source_name, "WEB SOURCES")
-                line = (
-                    f"[{citation.source_name}] "
-                    f"{citation.identifier or ''}: "
-                    f"{citation.snippet}"
-                )
-                sections.setdefault(section, []).append(line)
-                total += 1
-
-        evidence_parts = [f"Trial: {nct_id}\n"]
-
-        for sec_name in [
-            "TRIAL METADATA", "PUBLISHED RESULTS", "DRUG/PEPTIDE DATA",
-            "ANTIMICROBIAL DATA", "STRUCTURAL DATA", "WEB SOURCES",
-        ]:
-            if sec_name in sections:
-                evidence_parts.append(f"\n=== {sec_name} ===")
-                evidence_parts.extend(sections[sec_name])
+        # Build structured evidence from research (raw data only, no primary
+        # answer), sliced from the trial's precomputed EvidenceBundle.
+        bundle, view = evidence_bundles.view(nct_id, research_results)
+        evidence_parts = bundle.verifier_evidence(view, max_citations)
 
         # v27e: Structured facts go AFTER evidence, not before.
         # Small models are primed by what they see first — putting facts
@@ -17,6 +17,16 @@ if _WEBAPP_ENV.exists():
 # --- Server ---
 AGENT_ANNOTATE_PORT = int(os.getenv("AGENT_ANNOTATE_PORT", "9005"))
 
+# Cross-branch gate: wait for the other branch (8005 <-> 9005) to go idle
+# before starting a job. Disable for extra local instances (e.g. shard
+# workers on other ports) that don't share the prod/dev port pair.
+CROSS_BRANCH_GATE = os.getenv("AGENT_ANNOTATE_CROSS_BRANCH_GATE", "1").strip() != "0"
+
+# --- Coordinator / shard workers ---
+# Shared secret a coordinator sends as X-Shard-Token; a worker with the same
+# value set accepts it in place of an amp_auth cookie.
+SHARD_TOKEN = os.getenv("AGENT_ANNOTATE_SHARD_TOKEN", "")
+
 # --- Ollama ---
 OLLAMA_HOST = os.getenv("OLLAMA_HOST", "localhost")
 OLLAMA_PORT = int(os.getenv("OLLAMA_PORT", "11434"))
@@ -44,8 +54,15 @@ CORS_ORIGINS = os.getenv(
 # --- Paths ---
 CONFIG_DIR = _PROJECT_ROOT / "config"
 DEFAULT_CONFIG_PATH = CONFIG_DIR / "default_config.yaml"
-RESULTS_DIR = _PROJECT_ROOT / "results"
+# Overridable so several instances can run from one checkout (shard workers).
+RESULTS_DIR = Path(os.getenv("AGENT_ANNOTATE_RESULTS_DIR") or _PROJECT_ROOT / "results")
 LOGS_DIR = _PROJECT_ROOT / "logs"
+# Offline CT.gov mirror (orchestrator.ctgov_mirror). The default sits in
+# amp_llm_v3/ct_database/ so nct_lookup can share the same file.
+CTGOV_MIRROR_PATH = Path(
+    os.getenv("AGENT_ANNOTATE_CTGOV_MIRROR")
+    or _PROJECT_ROOT.parent.parent / "ct_database" / "ctgov_mirror.db"
+)
 FRONTEND_DIR = _PROJECT_ROOT / "app" / "static" / "spa"
 
 # Ensure output directories exist
@@ -2,6 +2,8 @@
 Agent Annotate - FastAPI application entry point.
 """
 
+import asyncio
+import hmac
 import logging
 from contextlib import asynccontextmanager
 from logging.handlers import RotatingFileHandler
@@ -12,13 +14,13 @@ from fastapi.staticfiles import StaticFiles
 from fastapi.responses import FileResponse, JSONResponse
 from starlette.middleware.base import BaseHTTPMiddleware
 
-from app.config import CORS_ORIGINS, FRONTEND_DIR, LOGS_DIR
+from app.config import CORS_ORIGINS, FRONTEND_DIR, LOGS_DIR, SHARD_TOKEN
 from app.auth_client import get_token_from_request, validate_token
 
 PATH_PREFIX = "/agent-annotate"
 from app.services.config_service import config_service
 
-from app.routers import health, jobs, status, results, review, settings, concordance
+from app.routers import health, jobs, status, results, review, settings, concordance, metrics
 
 # API paths that do NOT require authentication
 # (health/readiness used by auto-updater, active jobs used before restart)
@@ -52,10 +54,12 @@ def setup_logging():
     ch.setFormatter(fmt)
     ch.setLevel(logging.INFO)
 
-    root = logging.getLogger("agent_annotate")
-    root.setLevel(logging.INFO)
-    root.addHandler(fh)
-    root.addHandler(ch)
+    # amp_shared holds modules shared with the other services (ctgov_mirror, ...)
+    for name in ("agent_annotate", "amp_shared"):
+        root = logging.getLogger(name)
+        root.setLevel(logging.INFO)
+        root.addHandler(fh)
+        root.addHandler(ch)
 
     # Suppress noisy third-party loggers
     logging.getLogger("httpx").setLevel(logging.WARNING)
@@ -83,6 +87,9 @@ async def lifespan(app: FastAPI):
     orchestrator.restore_queued_jobs()
     yield
     logger.info("Agent Annotate shutting down...")
+    from app.services.persistence_writer import persistence_writer
+    if not await asyncio.to_thread(persistence_writer.flush, 30.0):
+        logger.warning("Persistence writer did not drain within 30s of shutdown")
 
 
 app = FastAPI(
@@ -128,6 +135,11 @@ class AuthMiddleware(BaseHTTPMiddleware):
                 or path.startswith("/api/agreement/")
                 or (path == "/api/jobs" and request.method == "POST")
             )
+            # Coordinator → worker calls carry the shared shard token
+            if not is_exempt and SHARD_TOKEN:
+                is_exempt = hmac.compare_digest(
+                    request.headers.get("X-Shard-Token", ""), SHARD_TOKEN
+                )
             if not is_exempt:
                 token = get_token_from_request(request)
                 user = validate_token(token, app_slug="amp-llm") if token else None
@@ -163,6 +175,7 @@ app.include_router(review.router)
 app.include_router(settings.router)
 app.include_router(concordance.router)
 app.include_router(concordance.legacy_router)
+app.include_router(metrics.router)
 
 # Serve frontend SPA (production build)
 if FRONTEND_DIR.exists():
@@ -166,6 +166,56 @@ class OrchestratorConfig(BaseModel):
     # loads at a time regardless, so this does not change peak RAM.
     mini_batch_size: int = 5
 
+    # Trial-level scheduler (app/services/work_scheduler.py). Jobs with at most
+    # this many NCTs run in the interactive lane: they start immediately
+    # alongside a running batch job and get the Ollama slot ahead of it at
+    # every mini-batch boundary. 0 sends every job to the batch lane (the
+    # old strictly-FIFO behavior).
+    interactive_lane_max_trials: int = 25
+    # Cross-job dedup of (nct_id, config_hash, commit) work items. When two
+    # jobs share a trial under identical config and code, research and
+    # annotation run once and the persisted result is copied to the other job.
+    cross_job_dedup: bool = True
+    # Coordinator mode (POST /api/jobs/sharded). Default worker base URLs
+    # used when a request doesn't list its own. A worker is declared dead
+    # after shard_dead_after_failures consecutive failed polls and its shards
+    # are resubmitted elsewhere; a shard that has been submitted more than
+    # shard_max_attempts times fails the coordinator job.
+    shard_workers: list[str] = []
+    shard_poll_seconds: float = 15.0
+    shard_dead_after_failures: int = 3
+    shard_max_attempts: int = 3
+    # Per-trial files and job state are written by a background thread
+    # (persistence_writer) so multi-MB JSON dumps don't stall the event loop.
+    # Past persistence_queue_size pending writes, callers write inline
+    # (backpressure). persistence_fsync makes each batch durable before
+    # it's reported written; persistence_readable restores indent=2 output
+    # instead of compact JSON.
+    persistence_queue_size: int = 256
+    persistence_fsync: bool = True
+    persistence_readable: bool = False
+    # Phase 1 pulls every protocol for the job from the CT.gov v2 /studies
+    # search endpoint (filter.ids, nextPageToken paging) before research
+    # starts, and clinical_protocol reads the prefetched record instead of
+    # issuing one GET per trial. ctgov_bulk_ids_per_request caps the NCT IDs
+    # per query so the URL stays well under CT.gov's request-line limit.
+    # Trials the bulk query misses fall back to the per-trial GET.
+    ctgov_bulk_prefetch: bool = True
+    ctgov_bulk_ids_per_request: int = 250
+    # Offline CT.gov mirror (agents/research/ctgov_mirror.py, file at
+    # AGENT_ANNOTATE_CTGOV_MIRROR). When on, protocols come from the local
+    # store. Records not confirmed current within ctgov_mirror_max_age_days
+    # are re-validated against CT.gov's lastUpdatePostDate, and only changed
+    # or missing studies are downloaded. Off by default so a fresh checkout
+    # keeps reading live CT.gov.
+    ctgov_mirror: bool = False
+    ctgov_mirror_max_age_days: float = 7.0
+    # Span tracing (services/tracing.py): every research agent, HTTP call,
+    # backoff, LLM call and post-processing step becomes a timed span in
+    # results/traces/{job_id}.trace.json (Chrome Trace Event format, served
+    # by GET /api/jobs/{id}/trace). A full-corpus job writes tens of MB.
+    trace_spans: bool = True
+
 
 class OllamaConfig(BaseModel):
     host: str = "localhost"
@@ -25,6 +25,7 @@ class JobProgress(BaseModel):
     """Progress tracking within a running job."""
     total_trials: int = 0
     completed_trials: int = 0
+    flagged_trials: int = 0                # Completed trials flagged for manual review
     current_nct_id: Optional[str] = None
     current_stage: str = "queued"  # queued | researching | annotating | verifying | done | error
     errors: list[str] = []
@@ -50,6 +51,22 @@ class JobProgress(BaseModel):
     eff_firings: dict[str, int] = {}            # "pregate" / "amp_skip" / ...
 
 
+class ShardInfo(BaseModel):
+    """One slice of a coordinator job, run as an ordinary job on a worker."""
+    index: int
+    nct_ids: list[str] = []
+    worker_url: Optional[str] = None
+    remote_job_id: Optional[str] = None
+    status: str = "pending"  # pending | queued | running | completed | failed
+    completed_trials: int = 0
+    attempts: int = 0           # times submitted to a worker
+    last_seen: Optional[datetime] = None
+    commit_hash: str = ""       # worker's commit, from its job record
+    error: Optional[str] = None
+    # Earlier (worker_url, remote_job_id, reason) assignments, newest last.
+    history: list[dict] = []
+
+
 class AnnotationJob(BaseModel):
     """A single annotation pipeline run."""
     job_id: str
@@ -59,7 +76,6 @@ class AnnotationJob(BaseModel):
     nct_ids: list[str] = []
     config_snapshot: dict = {}  # Frozen copy of config at job start
     progress: JobProgress = Field(default_factory=JobProgress)
-    results: list[dict] = []  # List of VerifiedAnnotation dicts
     error: Optional[str] = None
     resumed: bool = False
     resumed_at: Optional[datetime] = None
@@ -68,6 +84,13 @@ class AnnotationJob(BaseModel):
     finished_at: Optional[datetime] = None
     commit_hash: str = ""
     timezone: str = "America/Los_Angeles"
+    # Scheduler lane: "interactive" (small jobs, Ollama priority) | "batch"
+    lane: str = "batch"
+    # Coordinator mode: non-empty when this job's trials run on remote
+    # workers (see services/shard_coordinator.py) instead of locally.
+    shards: list[ShardInfo] = []
+    workers: list[str] = []    # worker base URLs shards may be assigned to
+    submit_options: dict = {}  # allow_test_batch / allow_external / priority for workers
 
 
 class JobSummary(BaseModel):
@@ -83,6 +106,8 @@ class JobSummary(BaseModel):
     elapsed_seconds: float = 0.0
     avg_seconds_per_trial: float = 0.0
     commit_hash: str = ""
+    lane: str = "batch"
+    sharded: bool = False
     # v17: Diagnostics summary for UI
     warnings_count: int = 0
     timeouts_count: int = 0
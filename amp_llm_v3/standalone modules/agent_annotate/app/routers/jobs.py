@@ -1,19 +1,31 @@
 """
 Job management endpoints - create, list, cancel, queue annotation jobs.
 
-Jobs are queued and processed sequentially by a background worker.
-Multiple jobs can be submitted — they will run one at a time. The
-queue worker also checks the other branch's service (cross-branch
-gatekeeper) since both branches share the same Ollama instance.
+Jobs are queued per scheduler lane and processed by a background worker
+per lane. Small jobs go to the "interactive" lane and run alongside (and
+ahead of, for Ollama time) a large job in the "batch" lane; within a lane
+jobs run one at a time. The queue workers also check the other branch's
+service (cross-branch gatekeeper) since both branches share the same
+Ollama instance.
+
+``POST /api/jobs/sharded`` creates a coordinator job instead: its trials
+are split across other agent_annotate instances and merged back here
+(see services/shard_coordinator.py).
 """
 
+import asyncio
 import logging
 import re
+from typing import Optional
+
 from fastapi import APIRouter, HTTPException
+from fastapi.responses import StreamingResponse
 from pydantic import BaseModel, Field
 
+from app.services.job_events import job_events
 from app.services.orchestrator import orchestrator
 from app.services.ollama_client import ollama_client
+from app.services.tracing import tracer
 from app.services.memory.edam_config import TRAINING_NCTS, ALL_GT_NCTS, TEST_BATCH_NCTS, ALL_SUBMITTABLE_NCTS, MASTER_NCTS
 
 logger = logging.getLogger("agent_annotate.jobs")
@@ -38,14 +50,15 @@ class CreateJobRequest(BaseModel):
     # learns from TRAINING_NCTS, so external NCTs never contaminate memory.
     # Use this for dataset-extension runs on trials with no/partial human GT.
     allow_external: bool = False
+    # Scheduler lane override: "interactive" | "batch". None picks by size
+    # (orchestrator.interactive_lane_max_trials).
+    priority: Optional[str] = Field(default=None, pattern="^(interactive|batch)$")
 
 
-@router.post("")
-async def create_job(req: CreateJobRequest):
-    """Create and queue a new annotation pipeline job.
+def _validate_nct_ids(req: CreateJobRequest, max_size: int = MAX_BATCH_SIZE) -> tuple[list[str], list]:
+    """Normalize, size-check, dedup and allow-set-check a submission.
 
-    Jobs are queued and processed sequentially. If a job is already running,
-    the new job will wait in the queue until the current one finishes.
+    Returns ``(valid_ids, invalid_ids)``; raises HTTPException on rejection.
     """
     if not req.nct_ids:
         raise HTTPException(status_code=400, detail="nct_ids list cannot be empty")
@@ -67,18 +80,10 @@ async def create_job(req: CreateJobRequest):
         )
 
     # Batch size limit (16GB RAM constraint)
-    if len(valid_ids) > MAX_BATCH_SIZE:
+    if len(valid_ids) > max_size:
         raise HTTPException(
             status_code=400,
-            detail=f"Batch too large: {len(valid_ids)} trials. Maximum is {MAX_BATCH_SIZE}.",
-        )
-
-    # Pre-check Ollama
-    ollama_ok = await ollama_client.health_check()
-    if not ollama_ok:
-        raise HTTPException(
-            status_code=503,
-            detail="Ollama is unreachable. Ensure Ollama is running at localhost:11434.",
+            detail=f"Batch too large: {len(valid_ids)} trials. Maximum is {max_size}.",
         )
 
     # Deduplicate
@@ -125,16 +130,37 @@ async def create_job(req: CreateJobRequest):
                 "allow_external=True. These annotations will NOT contaminate EDAM (gated on TRAINING_NCTS).",
                 n_ext,
             )
+    return valid_ids, invalid_ids
+
+
+@router.post("")
+async def create_job(req: CreateJobRequest):
+    """Create and queue a new annotation pipeline job.
+
+    Jobs are queued in their lane. A small (interactive) job starts even
+    while a batch job is running; within a lane, a new job waits until the
+    current one finishes.
+    """
+    valid_ids, invalid_ids = _validate_nct_ids(req)
+
+    # Pre-check Ollama
+    ollama_ok = await ollama_client.health_check()
+    if not ollama_ok:
+        raise HTTPException(
+            status_code=503,
+            detail="Ollama is unreachable. Ensure Ollama is running at localhost:11434.",
+        )
 
-    job = orchestrator.create_job(valid_ids)
+    job = orchestrator.create_job(valid_ids, priority=req.priority)
     orchestrator.enqueue_job(job.job_id)
 
-    position = orchestrator.queue_size()
+    position = orchestrator.queue_size(job.lane)
     response = {
         "job_id": job.job_id,
         "status": job.status,
         "total_trials": len(valid_ids),
         "queue_position": position,
+        "lane": job.lane,
     }
     if position > 0:
         response["message"] = f"Job queued. {position} job(s) ahead in queue."
@@ -144,12 +170,76 @@ async def create_job(req: CreateJobRequest):
     return response
 
 
+class CreateShardedJobRequest(CreateJobRequest):
+    # Worker base URLs (e.g. "http://localhost:9105"). Empty uses
+    # orchestrator.shard_workers from config.
+    workers: list[str] = []
+    # Number of shards; defaults to one per worker. More shards than workers
+    # gives finer-grained reassignment when a worker dies.
+    shards: Optional[int] = Field(default=None, ge=1)
+
+
+@router.post("/sharded")
+async def create_sharded_job(req: CreateShardedJobRequest):
+    """Create a coordinator job whose trials run on remote workers.
+
+    The NCT list is split into shards, each submitted to a worker as a
+    normal job. Progress rolls up into this job (``GET /api/jobs/{id}``,
+    ``/api/results/{id}/partial``); shards on dead workers are resubmitted;
+    the merged output lands in this instance's results/json + CSV.
+    """
+    from app.services.shard_coordinator import shard_coordinator
+
+    workers = req.workers or shard_coordinator.default_workers()
+    if not workers:
+        raise HTTPException(
+            status_code=400,
+            detail="No workers given and orchestrator.shard_workers is empty",
+        )
+    n_shards = req.shards or len(workers)
+    valid_ids, invalid_ids = _validate_nct_ids(req, max_size=MAX_BATCH_SIZE * n_shards)
+
+    job = shard_coordinator.start(
+        valid_ids,
+        workers,
+        shards=n_shards,
+        submit_options={
+            "allow_test_batch": req.allow_test_batch,
+            "allow_external": req.allow_external,
+            "priority": req.priority,
+        },
+    )
+    response = {
+        "job_id": job.job_id,
+        "status": job.status,
+        "total_trials": len(valid_ids),
+        "workers": job.workers,
+        "shards": [{"index": s.index, "trials": len(s.nct_ids)} for s in job.shards],
+    }
+    if invalid_ids:
+        response["warning"] = f"{len(invalid_ids)} invalid IDs skipped: {invalid_ids[:5]}"
+    return response
+
+
 @router.get("")
 async def list_jobs():
     """List all jobs with summary info."""
     return orchestrator.list_jobs()
 
 
+@router.get("/events")
+async def job_event_stream():
+    """Server-sent job list: a snapshot, then per-job deltas as jobs change.
+
+    Replaces polling ``GET /api/jobs`` (see services/job_events.py).
+    """
+    return StreamingResponse(
+        job_events.sse(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+
 @router.get("/active")
 async def active_jobs():
     """Return count of active jobs (for graceful restart checks)."""
@@ -158,7 +248,15 @@ async def active_jobs():
 
 @router.get("/queue")
 async def queue_status():
-    """Return queue status: running job, queued jobs, and queue size."""
+    """Return queue status: running job(s), queued jobs, and queue size.
+
+    ``running`` / ``queued`` / ``queue_size`` keep their pre-lane meaning
+    (any lane); ``lanes`` breaks them down per scheduler lane.
+    """
+    from app.services.persistence_writer import persistence_writer
+    from app.services.shard_coordinator import shard_coordinator
+    from app.services.work_scheduler import LANES, work_scheduler
+
     running = None
     for j in orchestrator.list_jobs():
         if j.status == "running":
@@ -168,6 +266,17 @@ async def queue_status():
         "running": running,
         "queued": orchestrator.queued_jobs(),
         "queue_size": orchestrator.queue_size(),
+        "lanes": {
+            lane: {
+                "running": orchestrator.running_job_id(lane),
+                "queued": orchestrator.queued_jobs(lane),
+                "queue_size": orchestrator.queue_size(lane),
+            }
+            for lane in LANES
+        },
+        "scheduler": work_scheduler.stats(),
+        "coordinator": shard_coordinator.stats(),
+        "persistence": persistence_writer.stats(),
     }
 
 
@@ -180,6 +289,19 @@ async def get_job(job_id: str):
     return job
 
 
+@router.get("/{job_id}/trace")
+async def get_job_trace(job_id: str):
+    """Span trace of a job in Chrome Trace Event format.
+
+    Open it in ui.perfetto.dev or chrome://tracing. Available mid-run;
+    resumed jobs append to the same trace.
+    """
+    trace = await asyncio.to_thread(tracer.load, job_id)
+    if trace is None:
+        raise HTTPException(status_code=404, detail="No trace for this job")
+    return trace
+
+
 class ResumeJobRequest(BaseModel):
     force: bool = False
 
@@ -213,7 +335,7 @@ async def resume_job(job_id: str, req: ResumeJobRequest):
     persistence = PersistenceService(RESULTS_DIR)
     validation = persistence.validate_resume(job_id, get_git_commit_full())
 
-    position = orchestrator.queue_size()
+    position = orchestrator.queue_size(job.lane)
     return {
         "job_id": job.job_id,
         "status": job.status,
@@ -0,0 +1,28 @@
+"""
+Prometheus / OpenMetrics scrape endpoint.
+
+Served at /metrics (outside /api, so the auth middleware doesn't gate it;
+bind or firewall the port if the numbers shouldn't be public).
+"""
+
+from fastapi import APIRouter, Request
+from fastapi.responses import PlainTextResponse
+
+from app.services.metrics import (
+    OPENMETRICS_CONTENT_TYPE,
+    PROMETHEUS_CONTENT_TYPE,
+    metrics,
+    wants_openmetrics,
+)
+
+router = APIRouter(tags=["metrics"])
+
+
+@router.get("/metrics", response_class=PlainTextResponse)
+async def scrape(request: Request):
+    """Render the process-wide registry; OpenMetrics when the scraper asks for it."""
+    openmetrics = wants_openmetrics(request.headers.get("accept", ""))
+    return PlainTextResponse(
+        metrics.render(openmetrics=openmetrics),
+        media_type=OPENMETRICS_CONTENT_TYPE if openmetrics else PROMETHEUS_CONTENT_TYPE,
+    )
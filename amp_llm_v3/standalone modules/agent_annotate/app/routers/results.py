@@ -4,19 +4,19 @@ Results and CSV export endpoints.
 
 import json
 from pathlib import Path
-from typing import Optional
+from typing import Iterable, Optional
 
 from fastapi import APIRouter, HTTPException, Query
-from fastapi.responses import PlainTextResponse
+from fastapi.responses import StreamingResponse
 
 from app.config import RESULTS_DIR
 from app.services.orchestrator import orchestrator
 from app.services.output_service import (
-    generate_standard_csv,
-    generate_full_csv,
-    save_csv,
+    iter_csv,
     load_json_output,
+    stream_csv_to_file,
 )
+from app.services.persistence_service import PersistenceService
 from app.services.version_service import get_version_info
 
 router = APIRouter(prefix="/api/results", tags=["results"])
@@ -66,7 +66,7 @@ async def get_results(job_id: str):
         return {
             "job_id": job.job_id,
             "version": get_version_info().model_dump(),
-            "trials": job.results,
+            "trials": list(PersistenceService(RESULTS_DIR).iter_annotations(job_id, job.nct_ids)),
             "timing": {
                 "started_at": job.started_at.isoformat() if job.started_at else None,
                 "finished_at": job.finished_at.isoformat() if job.finished_at else None,
@@ -79,37 +79,76 @@ async def get_results(job_id: str):
     return data
 
 
+def _iter_job_trials(job_id: str) -> tuple[Optional[Iterable[dict]], dict]:
+    """Trials for an export, as an iterable, plus the config snapshot.
+
+    Finished jobs are served from their final JSON. Running (or resumed)
+    jobs, and jobs whose final JSON is missing, stream the per-trial files
+    (results/annotations/{job_id}/) in job NCT order without loading them
+    all at once. Returns (None, {}) if nothing exists.
+    """
+    job = orchestrator.get_job(job_id)
+    active = job is not None and job.status in ("queued", "running")
+    if not active:
+        data = load_json_output(job_id)
+        if data:
+            return data.get("trials", []), data.get("config_snapshot", {})
+
+    persistence = PersistenceService(RESULTS_DIR)
+    if (RESULTS_DIR / "annotations" / job_id).exists():
+        if job:
+            nct_ids = job.nct_ids
+        else:
+            nct_ids = (persistence.load_research_meta(job_id) or {}).get("nct_ids")
+        config_snapshot = job.config_snapshot if job else {}
+        return persistence.iter_annotations(job_id, nct_ids or None), config_snapshot
+    return None, {}
+
+
 @router.get("/{job_id}/csv")
 async def export_csv(
     job_id: str,
     format: str = Query(default="standard", pattern="^(standard|full)$"),
 ):
-    """Export results as CSV download."""
-    data = load_json_output(job_id)
-    if not data:
-        job = orchestrator.get_job(job_id)
-        if not job or job.status != "completed":
-            raise HTTPException(status_code=404, detail="Results not found")
-        trials = job.results
-    else:
-        trials = data.get("trials", [])
+    """Export results as a streamed CSV download.
 
-    if format == "full":
-        config_snapshot = data.get("config_snapshot", {}) if data else {}
-        csv_content = generate_full_csv(trials, config_snapshot=config_snapshot,
-                                        job_id=job_id)
-    else:
-        csv_content = generate_standard_csv(trials, job_id=job_id)
+    Rows are produced one trial at a time, so large jobs start downloading
+    immediately; a running job exports the trials finished so far. The
+    export is also archived under results/csv/ as before.
+    """
+    trials, config_snapshot = _iter_job_trials(job_id)
+    if trials is None:
+        raise HTTPException(status_code=404, detail="Results not found")
 
-    path = save_csv(job_id, csv_content, label=format)
+    chunks = iter_csv(trials, full=(format == "full"),
+                      config_snapshot=config_snapshot, job_id=job_id)
+    path, body = stream_csv_to_file(chunks, job_id, label=format)
 
-    return PlainTextResponse(
-        content=csv_content,
+    return StreamingResponse(
+        body,
         media_type="text/csv",
         headers={"Content-Disposition": f"attachment; filename={path.name}"},
     )
 
 
+@router.get("/{job_id}/jsonl")
+async def export_jsonl(job_id: str):
+    """Stream raw per-trial outputs as JSON Lines (one trial per line)."""
+    trials, _ = _iter_job_trials(job_id)
+    if trials is None:
+        raise HTTPException(status_code=404, detail="Results not found")
+
+    def _lines():
+        for trial in trials:
+            yield json.dumps(trial, default=str, separators=(",", ":")) + "\n"
+
+    return StreamingResponse(
+        _lines(),
+        media_type="application/x-ndjson",
+        headers={"Content-Disposition": f"attachment; filename={job_id}.jsonl"},
+    )
+
+
 @router.get("/{job_id}/partial")
 async def get_partial_results(job_id: str):
     """Return trials completed so far for a running (or any) job.
@@ -191,16 +230,12 @@ async def results_summary(job_id: str):
     job = orchestrator.get_job(job_id)
     if not job:
         raise HTTPException(status_code=404, detail="Job not found")
-    flagged = sum(
-        1 for r in job.results
-        if isinstance(r, dict) and r.get("verification", {}).get("flagged_for_review", False)
-    )
     return {
         "job_id": job.job_id,
         "status": job.status,
         "total_trials": job.progress.total_trials,
         "completed_trials": job.progress.completed_trials,
-        "manual_review": flagged,
+        "manual_review": job.progress.flagged_trials,
         "timing": {
             "started_at": job.started_at.isoformat() if job.started_at else None,
             "finished_at": job.finished_at.isoformat() if job.finished_at else None,
@@ -57,14 +57,12 @@ async def field_values():
 @router.get("/stats")
 async def review_stats():
     """Summary stats for the review queue."""
-    all_items = review_service.get_all()
-    pending = [i for i in all_items if i.status == "pending"]
-    decided = [i for i in all_items if i.status in ("approved", "overridden")]
+    counts = review_service.stats()
     return {
-        "total": len(all_items),
-        "pending": len(pending),
-        "decided": len(decided),
-        "skipped": sum(1 for i in all_items if i.status == "skipped"),
+        "total": sum(counts.values()),
+        "pending": counts.get("pending", 0),
+        "decided": counts.get("approved", 0) + counts.get("overridden", 0),
+        "skipped": counts.get("skipped", 0),
     }
 
 
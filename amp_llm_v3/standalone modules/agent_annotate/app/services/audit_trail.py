@@ -99,6 +99,10 @@ class AuditRecorder:
             new["stage"] = stage
         return _ctx.set(new)
 
+    def current_context(self) -> dict:
+        """A copy of the current (nct_id, field, stage) context."""
+        return dict(_ctx.get() or {})
+
     def reset(self, token) -> None:
         try:
             _ctx.reset(token)
@@ -21,8 +21,9 @@ any EDAM component fails.
 import csv
 import logging
 from pathlib import Path
+from typing import Callable, Iterable, Union
 
-from app.services.memory.memory_store import MemoryStore, memory_store
+from app.services.memory.memory_store import IngestBatch, MemoryStore, memory_store
 from app.services.memory.stability_tracker import StabilityTracker
 from app.services.memory.correction_learner import CorrectionLearner
 from app.services.memory.self_audit import SelfAuditor
@@ -123,7 +124,7 @@ def _normalize_agent_value(field_name: str, value: str) -> str:
 
 async def _ground_truth_comparison(
     job_id: str,
-    all_trial_results: list[dict],
+    all_trial_results: Iterable[dict],
     config_hash: str,
     git_commit: str,
 ) -> dict:
@@ -143,6 +144,8 @@ async def _ground_truth_comparison(
     # Fields worth learning from (skip sequence — human agreement only 52%)
     learnable_fields = {"classification", "delivery_mode", "outcome", "peptide"}
 
+    # Collected here, written in one transaction after the loop
+    batch = IngestBatch()
     corrections_stored = 0
     agreements = 0
     disagreements = 0
@@ -180,7 +183,7 @@ async def _ground_truth_comparison(
                     disagreements += 1
                     # Store as ground truth correction
                     try:
-                        memory_store.store_correction(
+                        batch.add_correction(
                             nct_id=nct_id,
                             field_name=field,
                             job_id=job_id,
@@ -225,7 +228,7 @@ async def _ground_truth_comparison(
             else:
                 disagreements += 1
                 try:
-                    memory_store.store_correction(
+                    batch.add_correction(
                         nct_id=nct_id,
                         field_name=field,
                         job_id=job_id,
@@ -250,6 +253,8 @@ async def _ground_truth_comparison(
                         nct_id, field, e,
                     )
 
+    ingested = memory_store.ingest(batch)
+
     logger.info(
         "EDAM GT comparison: %d agreements, %d disagreements, "
         "%d corrections stored, %d skipped (not in GT)",
@@ -260,14 +265,20 @@ async def _ground_truth_comparison(
         "disagreements": disagreements,
         "corrections_stored": corrections_stored,
         "skipped": skipped,
+        "ingest": {"corrections": ingested["corrections"], "seconds": ingested["seconds"]},
     }
 
 
-async def edam_post_job_hook(job_id: str, all_trial_results: list[dict],
+async def edam_post_job_hook(job_id: str,
+                             all_trial_results: Union[list[dict], Callable[[], Iterable[dict]]],
                              config_snapshot: dict) -> dict:
     """
     Post-job hook called by the orchestrator after every completed job.
 
+    ``all_trial_results`` is a list, or a zero-arg callable returning a fresh
+    iterable per loop (the orchestrator re-reads the per-trial files rather
+    than holding the whole job in memory).
+
     v38 redesign: 3 active loops, 2 disabled.
       Active:
         1. Stability tracking (cross-run consistency)
@@ -283,19 +294,21 @@ async def edam_post_job_hook(job_id: str, all_trial_results: list[dict],
     config_str = str(sorted(str(config_snapshot)))
     config_hash = hashlib.sha256(config_str.encode()).hexdigest()[:12]
     git_commit = get_git_commit_short()
+    trials = all_trial_results if callable(all_trial_results) else (lambda: all_trial_results)
 
     summary = {
         "job_id": job_id,
         "stability": None,
         "ground_truth": None,
         "self_audit": None,
+        "ingest": None,
         "errors": [],
     }
 
     # --- Loop 1: Stability tracking (always runs) ---
     try:
         stability_result = await stability_tracker.analyze_job(
-            job_id, all_trial_results, config_hash, git_commit
+            job_id, trials(), config_hash, git_commit
         )
         summary["stability"] = stability_result
     except Exception as e:
@@ -305,7 +318,7 @@ async def edam_post_job_hook(job_id: str, all_trial_results: list[dict],
     # --- Loop 2: Ground truth comparison (v38 — replaces self-review) ---
     try:
         gt_result = await _ground_truth_comparison(
-            job_id, all_trial_results, config_hash, git_commit,
+            job_id, trials(), config_hash, git_commit,
         )
         summary["ground_truth"] = gt_result
     except Exception as e:
@@ -314,10 +327,10 @@ async def edam_post_job_hook(job_id: str, all_trial_results: list[dict],
 
     # --- Loop 2b: Self-audit ALL trials for evidence consistency ---
     try:
-        audit_trials = all_trial_results
+        audit_trials = trials()
         if TRAINING_NCTS:
-            audit_trials = [t for t in all_trial_results
-                           if t.get("nct_id", "").upper() in TRAINING_NCTS]
+            audit_trials = (t for t in audit_trials
+                            if t.get("nct_id", "").upper() in TRAINING_NCTS)
         audit_result = await self_auditor.audit_job(
             job_id, audit_trials, config_hash, git_commit
         )
@@ -330,14 +343,24 @@ async def edam_post_job_hook(job_id: str, all_trial_results: list[dict],
     # Never ran a single experiment (7 variants, 0 trials, 0 accuracy).
     # Disabled to reduce complexity.
 
+    # Rows written by the loops above (each ingests in bulk)
+    ingest = {"experiences": 0, "stability": 0, "corrections": 0, "seconds": 0.0}
+    for loop in ("stability", "ground_truth", "self_audit"):
+        for key, value in ((summary[loop] or {}).get("ingest") or {}).items():
+            ingest[key] += value
+    ingest["seconds"] = round(ingest["seconds"], 3)
+    summary["ingest"] = ingest
+
     logger.info(
         "EDAM post-job complete for %s: stability=%s, ground_truth=%s, "
-        "self_audit=%s, errors=%d",
+        "self_audit=%s, errors=%d, ingest=%d rows in %.2fs",
         job_id,
         "OK" if summary["stability"] else "skipped",
         "OK" if summary["ground_truth"] else "skipped",
         "OK" if summary["self_audit"] else "skipped",
         len(summary["errors"]),
+        ingest["experiences"] + ingest["stability"] + ingest["corrections"],
+        ingest["seconds"],
     )
 
     return summary
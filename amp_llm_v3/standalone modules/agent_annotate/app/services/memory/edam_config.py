@@ -127,6 +127,19 @@ OPTIMIZATION_INTERVAL_JOBS = 3     # run optimizer every Nth job
 # ---------------------------------------------------------------------------
 SELF_REVIEW_ENABLED = True         # can be toggled off
 
+# ---------------------------------------------------------------------------
+# Correction guidance
+# ---------------------------------------------------------------------------
+# Render reliable-source corrections ([PAST CORRECTIONS], [REASONING
+# PATTERNS]) and the trial's own instability note into annotation prompts.
+# Off keeps prompts as the pipeline has always built them: the old
+# correction loop failed on sqlite3.Row.get() and get_edam_guidance()
+# swallowed it, so a field with any such correction got no guidance at all,
+# and other fields got only stable exemplars and anomaly warnings.
+# Turning this on changes prompts; a trial's own ground_truth rows are never
+# shown to it either way.
+CORRECTION_GUIDANCE_ENABLED = False
+
 # ---------------------------------------------------------------------------
 # Embedding model (local via Ollama)
 # ---------------------------------------------------------------------------
@@ -14,6 +14,9 @@ import json
 import logging
 import sqlite3
 import struct
+import threading
+import time
+from dataclasses import dataclass, field
 from datetime import datetime
 from pathlib import Path
 from typing import Optional
@@ -28,9 +31,11 @@ from app.services.memory.edam_config import (
     EMBEDDING_MODEL, EMBEDDING_MAX_TEXT,
     SIMILARITY_MIN_THRESHOLD, SIMILARITY_TOP_K,
     PURGE_BATCH_SIZE, ANOMALY_THRESHOLD, ANOMALY_MIN_TRIALS,
-    FIELD_CORRECTION_WEIGHTS,
+    FIELD_CORRECTION_WEIGHTS, CORRECTION_GUIDANCE_ENABLED,
+    STABILITY_EXEMPLAR_MIN_RUNS, STABILITY_EXEMPLAR_MIN_SCORE,
     get_profile,
 )
+from app.services.metrics import metrics
 
 logger = logging.getLogger("agent_annotate.edam.store")
 
@@ -120,6 +125,7 @@ CREATE TABLE IF NOT EXISTS corrections (
     UNIQUE(nct_id, field_name, job_id, source)
 );
 CREATE INDEX IF NOT EXISTS idx_corr_field ON corrections(field_name);
+CREATE INDEX IF NOT EXISTS idx_corr_nct_field ON corrections(nct_id, field_name);
 
 CREATE TABLE IF NOT EXISTS prompt_variants (
     id              INTEGER PRIMARY KEY AUTOINCREMENT,
@@ -232,6 +238,76 @@ def compute_weight(experience_epoch: int, current_epoch: int,
         return max(EXPERIENCE_FLOOR, base * (EXPERIENCE_DECAY_RATE ** epoch_distance))
 
 
+@dataclass
+class FieldGuidance:
+    """The trial-independent part of a field's guidance, rendered for one epoch.
+
+    Lines are stored unbudgeted; build_guidance applies the caller's token
+    budget. Corrections are (row id, nct_id, line) so build_guidance can
+    leave out the annotated trial's own rows, which it looks up separately.
+    has_corrections records whether the field has any reliable-source
+    correction at all, rendered or decayed (see CORRECTION_GUIDANCE_ENABLED).
+    """
+    field_name: str
+    epoch: int
+    has_corrections: bool
+    corrections: list[tuple[int, str, str]]
+    exemplars: list[str]
+    patterns: list[str]
+    warnings: list[str]
+
+
+@dataclass
+class IngestBatch:
+    """Experiences, corrections and stability rows for MemoryStore.ingest().
+
+    The post-job loops collect into a batch instead of calling
+    store_experience / store_correction / upsert_stability per row, each of
+    which commits (one fsync) and may run a purge. ingest() writes each
+    table in one transaction and enforces limits once.
+    """
+    experiences: list[tuple] = field(default_factory=list)
+    corrections: list[tuple] = field(default_factory=list)
+    stability: list[tuple] = field(default_factory=list)
+
+    def add_experience(self, nct_id: str, field_name: str, job_id: str,
+                       value: str, confidence: float, consensus_reached: bool,
+                       evidence_summary: str, reasoning: str,
+                       config_hash: str, git_commit: str,
+                       prompt_version: str = "base") -> None:
+        self.experiences.append((
+            nct_id, field_name, job_id, value, confidence, consensus_reached,
+            (evidence_summary or "")[:2000], (reasoning or "")[:1000],
+            config_hash, git_commit, prompt_version,
+        ))
+
+    def add_correction(self, nct_id: str, field_name: str, job_id: str,
+                       original_value: str, corrected_value: str,
+                       source: str, reflection: str,
+                       evidence_citations: list[dict],
+                       config_hash: str, git_commit: str,
+                       reviewer_note: str = None) -> None:
+        if not evidence_citations:
+            raise ValueError("Corrections require at least one evidence citation")
+        self.corrections.append((
+            nct_id, field_name, job_id, original_value, corrected_value,
+            source, reflection, json.dumps(evidence_citations), reviewer_note,
+            config_hash, git_commit,
+        ))
+
+    def add_stability(self, nct_id: str, field_name: str,
+                      stability_score: float, majority_value: str,
+                      evidence_grade: str, total_runs: int,
+                      distinct_values: int) -> None:
+        self.stability.append((
+            nct_id, field_name, stability_score, majority_value, evidence_grade,
+            total_runs, distinct_values,
+        ))
+
+    def __len__(self) -> int:
+        return len(self.experiences) + len(self.corrections) + len(self.stability)
+
+
 class MemoryStore:
     """SQLite-backed experience database with embedding search."""
 
@@ -246,6 +322,12 @@ class MemoryStore:
         self._conn.execute("PRAGMA journal_mode=WAL")
         self._conn.execute("PRAGMA busy_timeout=5000")
         self._init_schema()
+        # Field-level guidance by (field, epoch); any write that feeds
+        # guidance clears it (see _invalidate_guidance).
+        self._guidance: dict[tuple[str, int], FieldGuidance] = {}
+        self._guidance_generation = 0
+        self._guidance_lock = threading.Lock()
+        self._guidance_stats = {"hits": 0, "misses": 0, "invalidations": 0}
         logger.info("EDAM memory store initialized at %s", db_path)
 
     def _init_schema(self):
@@ -306,6 +388,7 @@ class MemoryStore:
              config_hash, git_commit, prompt_version, epoch, _now_iso()),
         )
         self._conn.commit()
+        self._invalidate_guidance()  # anomaly counts
         row = self._conn.execute("SELECT last_insert_rowid()").fetchone()
         self._enforce_limits("experiences", self._get_limit("max_experiences", 10000))
         return row[0]
@@ -350,6 +433,7 @@ class MemoryStore:
              reviewer_note, config_hash, epoch, _now_iso()),
         )
         self._conn.commit()
+        self._invalidate_guidance()
         row = self._conn.execute("SELECT last_insert_rowid()").fetchone()
         self._enforce_limits("corrections", self._get_limit("max_corrections", 5000))
         return row[0]
@@ -370,6 +454,69 @@ class MemoryStore:
         ).fetchall()
         return [dict(r) for r in rows]
 
+    # --- Bulk ingestion ---
+
+    def ingest(self, batch: IngestBatch) -> dict:
+        """Write a batch: one transaction per table, limits enforced once.
+
+        Rows behave as the per-row methods would (INSERT OR REPLACE, later
+        rows win). Returns row counts per table and the elapsed seconds.
+        """
+        start = time.perf_counter()
+        now = _now_iso()
+        epochs: dict[tuple[str, str], int] = {}
+
+        def epoch(config_hash: str, git_commit: str) -> int:
+            key = (config_hash, git_commit)
+            if key not in epochs:
+                epochs[key] = self.get_or_create_epoch(config_hash, git_commit)
+            return epochs[key]
+
+        if batch.experiences:
+            rows = [(*r, epoch(r[8], r[9]), now) for r in batch.experiences]
+            with self._conn:
+                self._conn.executemany(
+                    "INSERT OR REPLACE INTO experiences "
+                    "(nct_id, field_name, job_id, value, confidence, consensus_reached, "
+                    "evidence_summary, reasoning, config_hash, git_commit, prompt_version, "
+                    "epoch, created_at) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                    rows,
+                )
+        if batch.corrections:
+            # The corrections table has no git_commit column; it only picks the epoch.
+            rows = [(*r[:10], epoch(r[9], r[10]), now) for r in batch.corrections]
+            with self._conn:
+                self._conn.executemany(
+                    "INSERT OR REPLACE INTO corrections "
+                    "(nct_id, field_name, job_id, original_value, corrected_value, "
+                    "source, reflection, evidence_citations, reviewer_note, "
+                    "config_hash, epoch, created_at) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                    rows,
+                )
+        if batch.stability:
+            with self._conn:
+                self._conn.executemany(
+                    "INSERT OR REPLACE INTO stability_index "
+                    "(nct_id, field_name, stability_score, majority_value, evidence_grade, "
+                    "total_runs, distinct_values, last_computed) "
+                    "VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                    [(*r, now) for r in batch.stability],
+                )
+
+        if batch.experiences:
+            self._enforce_limits_fully("experiences", self._get_limit("max_experiences", 10000))
+        if batch.corrections:
+            self._enforce_limits_fully("corrections", self._get_limit("max_corrections", 5000))
+        if len(batch):
+            self._invalidate_guidance()
+
+        return {
+            "experiences": len(batch.experiences),
+            "corrections": len(batch.corrections),
+            "stability": len(batch.stability),
+            "seconds": round(time.perf_counter() - start, 3),
+        }
+
     # --- Embedding operations ---
 
     async def generate_embedding(self, text: str) -> list[float]:
@@ -451,6 +598,7 @@ class MemoryStore:
              total_runs, distinct_values, _now_iso()),
         )
         self._conn.commit()
+        self._invalidate_guidance()
 
     def get_stability(self, nct_id: str = None, field_name: str = None,
                       min_score: float = None, max_score: float = None,
@@ -641,6 +789,176 @@ class MemoryStore:
     # self_review is kept but low priority.
     _RELIABLE_SOURCES = ("ground_truth", "self_audit", "consistency_override", "self_review")
 
+    _SOURCE_ORDER = (
+        "CASE source "
+        "  WHEN 'ground_truth' THEN 0 "
+        "  WHEN 'self_audit' THEN 1 "
+        "  WHEN 'consistency_override' THEN 2 "
+        "  ELSE 3 "
+        "END, epoch DESC, id DESC"
+    )
+
+    def _invalidate_guidance(self) -> None:
+        with self._guidance_lock:
+            self._guidance_generation += 1
+            if self._guidance:
+                self._guidance.clear()
+                self._guidance_stats["invalidations"] += 1
+
+    def _render_correction(self, c: dict, current_epoch: int) -> Optional[str]:
+        """One [PAST CORRECTIONS] line, or None if the correction has decayed."""
+        weight = compute_weight(
+            c["epoch"], current_epoch, c["source"],
+            field_name=c.get("field_name", ""),
+            reflection=c.get("reflection", ""),
+        )
+        if weight < 0.1:
+            return None
+        source_tag = f"[{c['source']}] " if c["source"] == "ground_truth" else ""
+        return (
+            f"- {source_tag}{c['nct_id']}/{c['field_name']}: corrected from "
+            f"'{c['original_value']}' to '{c['corrected_value']}' — "
+            f"{c['reflection'][:200]}"
+        )
+
+    def _compile_field_guidance(self, field_name: str,
+                                current_epoch: int) -> FieldGuidance:
+        # 1. Corrections from reliable sources, ground_truth first
+        try:
+            placeholders = ",".join("?" for _ in self._RELIABLE_SOURCES)
+            rows = self._conn.execute(
+                f"SELECT * FROM corrections "
+                f"WHERE field_name = ? AND source IN ({placeholders}) "
+                f"ORDER BY {self._SOURCE_ORDER} LIMIT 15",
+                (field_name, *self._RELIABLE_SOURCES),
+            ).fetchall()
+        except Exception:
+            rows = []
+        corrections = []
+        for row in rows:
+            c = dict(row)
+            line = self._render_correction(c, current_epoch)
+            if line:
+                corrections.append((c["id"], c["nct_id"], line))
+
+        # v38: Semantic similarity search REMOVED (embedding generation disabled)
+
+        # 2. Stable exemplars
+        exemplars = [
+            f"- {ex['nct_id']}: consistently '{ex['majority_value']}' "
+            f"({ex['total_runs']} runs, evidence={ex['evidence_grade']})"
+            for ex in self.get_stable_exemplars(field_name, limit=5)
+        ]
+
+        # 3. Reasoning patterns from reliable sources
+        patterns = []
+        try:
+            pattern_corrections = self._conn.execute(
+                "SELECT field_name, reflection, source, corrected_value "
+                "FROM corrections "
+                "WHERE field_name = ? AND source IN ('ground_truth', 'consistency_override', 'self_audit') "
+                "ORDER BY epoch DESC, id DESC LIMIT 20",
+                (field_name,),
+            ).fetchall()
+            seen_patterns = set()
+            for pc in pattern_corrections:
+                rule = self._extract_reasoning_pattern(
+                    field_name, pc["reflection"] or "", pc["corrected_value"],
+                )
+                if rule and rule not in seen_patterns:
+                    seen_patterns.add(rule)
+                    patterns.append(f"- {field_name}: {rule}")
+        except Exception:
+            pass
+
+        # 4. Anomaly warnings
+        warnings = [a["warning"] for a in self.detect_anomalies(field_name)]
+
+        return FieldGuidance(field_name, current_epoch, bool(rows), corrections,
+                             exemplars, patterns, warnings)
+
+    def field_guidance(self, field_name: str,
+                       current_epoch: Optional[int] = None) -> FieldGuidance:
+        """The field's trial-independent guidance, compiled once per epoch."""
+        if current_epoch is None:
+            current_epoch = self.get_current_epoch()
+        key = (field_name, current_epoch)
+        with self._guidance_lock:
+            cached = self._guidance.get(key)
+            if cached is not None:
+                self._guidance_stats["hits"] += 1
+                return cached
+            self._guidance_stats["misses"] += 1
+            generation = self._guidance_generation
+        compiled = self._compile_field_guidance(field_name, current_epoch)
+        with self._guidance_lock:
+            # A write landed while compiling: use the result, don't keep it.
+            if generation == self._guidance_generation:
+                self._guidance[key] = compiled
+        return compiled
+
+    def precompile_guidance(self, field_names: list[str]) -> int:
+        """Compile guidance for ``field_names`` up front (e.g. at job start).
+
+        Returns the number of fields compiled. Cheap when already cached.
+        """
+        current_epoch = self.get_current_epoch()
+        if current_epoch == 0:
+            return 0
+        for field_name in field_names:
+            self.field_guidance(field_name, current_epoch)
+        return len(field_names)
+
+    def _trial_guidance(self, nct_id: str, field_name: str,
+                        current_epoch: int) -> tuple[list[tuple[int, str]], Optional[str]]:
+        """This trial's own corrections and stability note (indexed lookups).
+
+        Its ground_truth rows are left out: they hold the answer being asked for.
+        """
+        corrections = []
+        sources = [s for s in self._RELIABLE_SOURCES if s != "ground_truth"]
+        try:
+            placeholders = ",".join("?" for _ in sources)
+            rows = self._conn.execute(
+                f"SELECT * FROM corrections "
+                f"WHERE nct_id = ? AND field_name = ? AND source IN ({placeholders}) "
+                f"ORDER BY {self._SOURCE_ORDER} LIMIT 5",
+                (nct_id, field_name, *sources),
+            ).fetchall()
+        except Exception:
+            rows = []
+        for row in rows:
+            c = dict(row)
+            line = self._render_correction(c, current_epoch)
+            if line:
+                corrections.append((c["id"], line))
+
+        stability = None
+        row = self._conn.execute(
+            "SELECT * FROM stability_index WHERE nct_id = ? AND field_name = ?",
+            (nct_id, field_name),
+        ).fetchone()
+        if (row and row["total_runs"] >= STABILITY_EXEMPLAR_MIN_RUNS
+                and row["stability_score"] < STABILITY_EXEMPLAR_MIN_SCORE):
+            stability = (
+                f"- Earlier runs of this trial disagreed: {row['distinct_values']} "
+                f"different values over {row['total_runs']} runs "
+                f"(majority '{row['majority_value']}', {row['stability_score']:.0%}). "
+                f"Decide from the evidence."
+            )
+        return corrections, stability
+
+    @staticmethod
+    def _take(lines, budget: int) -> list[str]:
+        """Leading lines that fit in ``budget`` characters."""
+        taken, used = [], 0
+        for line in lines:
+            if used + len(line) > budget:
+                break
+            taken.append(line)
+            used += len(line)
+        return taken
+
     async def build_guidance(self, nct_id: str, field_name: str,
                              evidence_text: str,
                              max_tokens: int = 0) -> str:
@@ -651,6 +969,15 @@ class MemoryStore:
         similarity search (depended on expensive embeddings). Kept stable
         exemplars and anomaly warnings.
 
+        The field-level blocks come from field_guidance(), compiled once per
+        (field, epoch) and dropped whenever corrections, experiences or
+        stability rows are written. With CORRECTION_GUIDANCE_ENABLED, the
+        trial's own non-ground_truth corrections (listed first) and a note if
+        its earlier runs were unstable are queried per call; other trials'
+        corrections come from the compiled list. With it off, the output is
+        what the pipeline has always received: empty for a field with any
+        reliable-source correction, otherwise exemplars and anomaly warnings.
+
         Respects token budget. Returns empty string if no relevant memories.
         """
         current_epoch = self.get_current_epoch()
@@ -662,112 +989,47 @@ class MemoryStore:
 
         parts = []
         budget_chars = max_tokens * CHARS_PER_TOKEN
+        compiled = self.field_guidance(field_name, current_epoch)
+        if CORRECTION_GUIDANCE_ENABLED:
+            own_corrections, stability = self._trial_guidance(nct_id, field_name, current_epoch)
+        elif compiled.has_corrections:
+            return ""
+        else:
+            own_corrections, stability = [], None
 
-        # --- 1. Corrections from reliable sources only (50% budget) ---
-        corr_budget = int(budget_chars * BUDGET_ALLOCATION["corrections"])
-        # v38: Filter to reliable sources, prioritize ground_truth
-        try:
-            placeholders = ",".join("?" for _ in self._RELIABLE_SOURCES)
-            corrections = self._conn.execute(
-                f"SELECT * FROM corrections "
-                f"WHERE field_name = ? AND source IN ({placeholders}) "
-                f"ORDER BY "
-                f"  CASE source "
-                f"    WHEN 'ground_truth' THEN 0 "
-                f"    WHEN 'self_audit' THEN 1 "
-                f"    WHEN 'consistency_override' THEN 2 "
-                f"    ELSE 3 "
-                f"  END, epoch DESC, id DESC "
-                f"LIMIT 15",
-                (field_name, *self._RELIABLE_SOURCES),
-            ).fetchall()
-        except Exception:
-            corrections = []
-
-        if corrections:
-            corr_lines = []
-            corr_used = 0
-            for c in corrections:
-                weight = compute_weight(
-                    c["epoch"], current_epoch, c["source"],
-                    field_name=c.get("field_name", ""),
-                    reflection=c.get("reflection", ""),
-                )
-                if weight < 0.1:
-                    continue
-                source_tag = f"[{c['source']}] " if c["source"] == "ground_truth" else ""
-                line = (
-                    f"- {source_tag}{c['nct_id']}/{c['field_name']}: corrected from "
-                    f"'{c['original_value']}' to '{c['corrected_value']}' — "
-                    f"{c['reflection'][:200]}"
-                )
-                if corr_used + len(line) > corr_budget:
-                    break
-                corr_lines.append(line)
-                corr_used += len(line)
-            if corr_lines:
-                parts.append("[PAST CORRECTIONS]")
-                parts.extend(corr_lines)
-
-        # v38: Semantic similarity search REMOVED (embedding generation disabled)
+        # --- 1. Corrections from reliable sources, this trial's first ---
+        corr_lines = self._take(
+            [line for _, line in own_corrections]
+            + [line for _, nct, line in compiled.corrections if nct != nct_id],
+            int(budget_chars * BUDGET_ALLOCATION["corrections"]),
+        )
+        if corr_lines:
+            parts.append("[PAST CORRECTIONS]")
+            parts.extend(corr_lines)
 
         # --- 2. Stable exemplars (25% budget) ---
-        exemplar_budget = int(budget_chars * BUDGET_ALLOCATION["stable_exemplars"])
-        exemplars = self.get_stable_exemplars(field_name, limit=5)
-        if exemplars:
-            ex_lines = []
-            ex_used = 0
-            for ex in exemplars:
-                line = (
-                    f"- {ex['nct_id']}: consistently '{ex['majority_value']}' "
-                    f"({ex['total_runs']} runs, evidence={ex['evidence_grade']})"
-                )
-                if ex_used + len(line) > exemplar_budget:
-                    break
-                ex_lines.append(line)
-                ex_used += len(line)
-            if ex_lines:
-                parts.append("[STABLE PATTERNS]")
-                parts.extend(ex_lines)
+        ex_lines = self._take(
+            compiled.exemplars, int(budget_chars * BUDGET_ALLOCATION["stable_exemplars"]),
+        )
+        if ex_lines:
+            parts.append("[STABLE PATTERNS]")
+            parts.extend(ex_lines)
 
         # --- 3. Reasoning patterns from reliable sources (15% budget) ---
-        pattern_budget = int(budget_chars * BUDGET_ALLOCATION["reasoning_patterns"])
-        try:
-            pattern_corrections = self._conn.execute(
-                "SELECT field_name, reflection, source, corrected_value "
-                "FROM corrections "
-                "WHERE field_name = ? AND source IN ('ground_truth', 'consistency_override', 'self_audit') "
-                "ORDER BY epoch DESC, id DESC LIMIT 20",
-                (field_name,),
-            ).fetchall()
-            if pattern_corrections:
-                seen_patterns = set()
-                pattern_lines = []
-                pattern_used = 0
-                for pc in pattern_corrections:
-                    reflection = pc["reflection"] or ""
-                    rule = self._extract_reasoning_pattern(
-                        field_name, reflection, pc["corrected_value"],
-                    )
-                    if rule and rule not in seen_patterns:
-                        seen_patterns.add(rule)
-                        line = f"- {field_name}: {rule}"
-                        if pattern_used + len(line) > pattern_budget:
-                            break
-                        pattern_lines.append(line)
-                        pattern_used += len(line)
-                if pattern_lines:
-                    parts.append("[REASONING PATTERNS]")
-                    parts.extend(pattern_lines)
-        except Exception:
-            pass
+        pattern_lines = self._take(
+            compiled.patterns, int(budget_chars * BUDGET_ALLOCATION["reasoning_patterns"]),
+        )
+        if pattern_lines:
+            parts.append("[REASONING PATTERNS]")
+            parts.extend(pattern_lines)
 
         # --- 4. Anomaly warnings (10% budget) ---
-        anomalies = self.detect_anomalies(field_name)
-        if anomalies:
+        warnings = [f"- {w}" for w in compiled.warnings]
+        if stability:
+            warnings.append(stability)
+        if warnings:
             parts.append("[WARNINGS]")
-            for a in anomalies:
-                parts.append(f"- {a['warning']}")
+            parts.extend(warnings)
 
         if not parts:
             return ""
@@ -850,42 +1112,52 @@ class MemoryStore:
     async def get_anomaly_warnings(self, field_name: str,
                                    max_tokens: int = 200) -> str:
         """Get only anomaly warnings (safe for verifier injection)."""
-        anomalies = self.detect_anomalies(field_name)
-        if not anomalies:
+        warnings = self.field_guidance(field_name).warnings
+        if not warnings:
             return ""
         lines = ["[EDAM WARNING]"]
-        for a in anomalies:
-            lines.append(a["warning"])
+        lines.extend(warnings)
         text = "\n".join(lines)
         max_chars = max_tokens * CHARS_PER_TOKEN
         return text[:max_chars]
 
     # --- Maintenance ---
 
-    def _enforce_limits(self, table: str, max_entries: int) -> None:
-        """Purge oldest low-weight entries if over limit."""
+    def _enforce_limits(self, table: str, max_entries: int) -> int:
+        """Purge oldest low-weight entries if over limit. Returns rows deleted."""
         row = self._conn.execute(f"SELECT COUNT(*) as cnt FROM {table}").fetchone()
         if row["cnt"] <= max_entries:
-            return
+            return 0
         overflow = row["cnt"] - max_entries
         to_delete = min(overflow + PURGE_BATCH_SIZE, row["cnt"] // 4)
         if table == "corrections":
             # Never purge human corrections
-            self._conn.execute(
+            cur = self._conn.execute(
                 f"DELETE FROM {table} WHERE id IN ("
                 f"SELECT id FROM {table} WHERE source != 'human_review' "
                 f"ORDER BY epoch ASC, id ASC LIMIT ?)",
                 (to_delete,),
             )
         else:
-            self._conn.execute(
+            cur = self._conn.execute(
                 f"DELETE FROM {table} WHERE id IN ("
                 f"SELECT id FROM {table} ORDER BY epoch ASC, id ASC LIMIT ?)",
                 (to_delete,),
             )
         self._conn.commit()
+        self._invalidate_guidance()
         logger.info("EDAM: purged %d entries from %s (was %d, limit %d)",
                      to_delete, table, row["cnt"], max_entries)
+        return cur.rowcount
+
+    def _enforce_limits_fully(self, table: str, max_entries: int) -> None:
+        """_enforce_limits until under the limit.
+
+        One purge removes at most a quarter of the table; per-row inserts
+        catch up over later inserts, a bulk ingest has no later insert.
+        """
+        while self._enforce_limits(table, max_entries) > 0:
+            pass
 
     def get_stats(self) -> dict:
         """Return table counts and database size for monitoring."""
@@ -897,8 +1169,14 @@ class MemoryStore:
             stats[table] = row["cnt"]
         stats["db_size_mb"] = round(self._db_path.stat().st_size / (1024 * 1024), 2)
         stats["current_epoch"] = self.get_current_epoch()
+        stats["guidance_cache"] = self.guidance_stats()
         return stats
 
+    def guidance_stats(self) -> dict:
+        with self._guidance_lock:
+            return {**self._guidance_stats, "entries": len(self._guidance)}
+
 
 # Module-level singleton
 memory_store = MemoryStore()
+metrics.register_cache("edam_guidance", memory_store.guidance_stats, size="entries")
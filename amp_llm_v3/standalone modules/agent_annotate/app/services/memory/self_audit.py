@@ -26,9 +26,9 @@ and weighted as "self_review" (moderate decay, evidence-grounded).
 import json
 import logging
 import re
-from typing import Optional
+from typing import Iterable, Optional
 
-from app.services.memory.memory_store import MemoryStore
+from app.services.memory.memory_store import IngestBatch, MemoryStore
 
 logger = logging.getLogger("agent_annotate.edam.self_audit")
 
@@ -140,12 +140,14 @@ class SelfAuditor:
         self._memory = memory
 
     async def audit_trial(self, nct_id: str, trial_result: dict,
-                          config_hash: str, git_commit: str) -> list[dict]:
+                          config_hash: str, git_commit: str,
+                          batch: IngestBatch | None = None) -> list[dict]:
         """
         Audit a single trial's annotations against its research evidence.
 
         Returns a list of correction dicts for any inconsistencies found.
-        Each correction has concrete evidence citations.
+        Each correction has concrete evidence citations. Corrections are
+        stored now (with an embedding), or added to ``batch`` if given.
         """
         corrections = []
 
@@ -229,29 +231,33 @@ class SelfAuditor:
 
         # Store any corrections found
         for corr in corrections:
+            row = dict(
+                nct_id=nct_id,
+                field_name=corr["field_name"],
+                job_id=corr.get("job_id", ""),
+                original_value=corr["original_value"],
+                corrected_value=corr["corrected_value"],
+                source="self_audit",
+                reflection=corr["reflection"],
+                evidence_citations=corr["evidence_citations"],
+                config_hash=config_hash,
+                git_commit=git_commit,
+            )
             try:
-                corr_id = self._memory.store_correction(
-                    nct_id=nct_id,
-                    field_name=corr["field_name"],
-                    job_id=corr.get("job_id", ""),
-                    original_value=corr["original_value"],
-                    corrected_value=corr["corrected_value"],
-                    source="self_audit",
-                    reflection=corr["reflection"],
-                    evidence_citations=corr["evidence_citations"],
-                    config_hash=config_hash,
-                    git_commit=git_commit,
-                )
-                # Store embedding for similarity search
-                embed_text = (
-                    f"Trial {nct_id}, field {corr['field_name']}: "
-                    f"corrected from '{corr['original_value']}' to "
-                    f"'{corr['corrected_value']}'. {corr['reflection'][:200]}"
-                )
-                try:
-                    await self._memory.store_embedding("corrections", corr_id, embed_text)
-                except Exception:
-                    pass
+                if batch is not None:
+                    batch.add_correction(**row)
+                else:
+                    corr_id = self._memory.store_correction(**row)
+                    # Store embedding for similarity search
+                    embed_text = (
+                        f"Trial {nct_id}, field {corr['field_name']}: "
+                        f"corrected from '{corr['original_value']}' to "
+                        f"'{corr['corrected_value']}'. {corr['reflection'][:200]}"
+                    )
+                    try:
+                        await self._memory.store_embedding("corrections", corr_id, embed_text)
+                    except Exception:
+                        pass
 
                 logger.info(
                     "EDAM self-audit: %s/%s — '%s' → '%s' (%s)",
@@ -579,13 +585,14 @@ class SelfAuditor:
             "evidence_citations": [citation] if citation else [],
         }
 
-    async def audit_job(self, job_id: str, all_trial_results: list[dict],
+    async def audit_job(self, job_id: str, all_trial_results: Iterable[dict],
                         config_hash: str, git_commit: str) -> dict:
         """
         Audit all trials in a completed job.
 
         Returns summary dict with correction counts.
         """
+        batch = IngestBatch()
         total_corrections = 0
         dm_corrections = 0
         pep_corrections = 0
@@ -598,7 +605,7 @@ class SelfAuditor:
                 continue
 
             corrections = await self.audit_trial(
-                nct_id, trial, config_hash, git_commit
+                nct_id, trial, config_hash, git_commit, batch=batch
             )
 
             for c in corrections:
@@ -613,12 +620,15 @@ class SelfAuditor:
                 elif c["field_name"] == "classification":
                     class_corrections += 1
 
+        ingested = self._memory.ingest(batch)
+
         summary = {
             "total_corrections": total_corrections,
             "delivery_mode_corrections": dm_corrections,
             "peptide_corrections": pep_corrections,
             "outcome_corrections": outcome_corrections,
             "classification_corrections": class_corrections,
+            "ingest": {"corrections": ingested["corrections"], "seconds": ingested["seconds"]},
         }
 
         logger.info(
@@ -12,8 +12,9 @@ Runs automatically after every job completes.
 import logging
 from collections import Counter
 from pathlib import Path
+from typing import Iterable
 
-from app.services.memory.memory_store import MemoryStore, compute_weight
+from app.services.memory.memory_store import IngestBatch, MemoryStore, compute_weight
 from app.services.memory.edam_config import (
     STABILITY_EXEMPLAR_MIN_RUNS, STABILITY_EXEMPLAR_MIN_SCORE,
     EVIDENCE_GRADE_STRONG_MIN_CONFIDENCE, EVIDENCE_GRADE_STRONG_MIN_CONSENSUS,
@@ -31,7 +32,7 @@ class StabilityTracker:
     def __init__(self, memory: MemoryStore):
         self._memory = memory
 
-    async def analyze_job(self, job_id: str, job_results: list[dict],
+    async def analyze_job(self, job_id: str, job_results: Iterable[dict],
                           config_hash: str, git_commit: str) -> dict:
         """
         Post-job hook: store experiences and compute stability for every
@@ -42,14 +43,17 @@ class StabilityTracker:
         epoch = self._memory.get_or_create_epoch(config_hash, git_commit)
         stored = 0
         embedded = 0
+        experiences = IngestBatch()
 
         # Step 1: Store all annotation outcomes as experiences
         # v18: Only learn from training set NCTs (held-out test set excluded)
         skipped_ncts = 0
+        nct_ids = set()  # for Step 2; job_results may be a one-shot iterator
         for trial in job_results:
             nct_id = trial.get("nct_id", "")
             if not nct_id:
                 continue
+            nct_ids.add(nct_id)
             if TRAINING_NCTS and nct_id.upper() not in TRAINING_NCTS:
                 skipped_ncts += 1
                 continue
@@ -77,7 +81,7 @@ class StabilityTracker:
                         evidence_parts.append(f"[{src}] {snippet}")
                 evidence_summary = " | ".join(evidence_parts)
 
-                exp_id = self._memory.store_experience(
+                experiences.add_experience(
                     nct_id=nct_id, field_name=field_name, job_id=job_id,
                     value=final_value, confidence=confidence,
                     consensus_reached=consensus,
@@ -95,6 +99,8 @@ class StabilityTracker:
 
         if skipped_ncts:
             logger.info("EDAM: skipped %d non-training NCTs (stored %d)", skipped_ncts, stored)
+        # Written before Step 2, which reads them back.
+        ingested = [self._memory.ingest(experiences)]
 
         # Step 2: Compute stability for all (nct_id, field) pairs in this job
         stable_count = 0
@@ -102,14 +108,14 @@ class StabilityTracker:
         newly_unstable = []
 
         # v18: Only compute stability for training NCTs
-        nct_ids = set(t.get("nct_id", "") for t in job_results if t.get("nct_id"))
         if TRAINING_NCTS:
             nct_ids = {n for n in nct_ids if n.upper() in TRAINING_NCTS}
         fields = ["classification", "delivery_mode", "outcome", "reason_for_failure", "peptide"]
 
+        stability = IngestBatch()
         for nct_id in nct_ids:
             for field_name in fields:
-                result = self.compute_stability(nct_id, field_name)
+                result = self.compute_stability(nct_id, field_name, batch=stability)
                 if result["total_runs"] < 2:
                     continue  # not enough data yet
                 if result["stability_score"] >= STABILITY_EXEMPLAR_MIN_SCORE:
@@ -119,6 +125,8 @@ class StabilityTracker:
                     if result["total_runs"] == 2:  # newly unstable
                         newly_unstable.append((nct_id, field_name))
 
+        ingested.append(self._memory.ingest(stability))
+
         # Step 3: Detect anomalies
         anomalies = []
         for field_name in fields:
@@ -132,6 +140,11 @@ class StabilityTracker:
             "unstable_count": unstable_count,
             "newly_unstable": newly_unstable,
             "anomalies": anomalies,
+            "ingest": {
+                "experiences": ingested[0]["experiences"],
+                "stability": ingested[1]["stability"],
+                "seconds": round(sum(i["seconds"] for i in ingested), 3),
+            },
         }
 
         logger.info(
@@ -145,10 +158,13 @@ class StabilityTracker:
 
         return summary
 
-    def compute_stability(self, nct_id: str, field_name: str) -> dict:
+    def compute_stability(self, nct_id: str, field_name: str,
+                          batch: IngestBatch | None = None) -> dict:
         """
         Compare all experiences for this (nct_id, field) across jobs.
         Returns stability score, majority value, evidence grade, etc.
+
+        The stability row is upserted now, or added to ``batch`` if given.
         """
         experiences = self._memory.get_experiences(
             nct_id=nct_id, field_name=field_name, limit=100
@@ -187,7 +203,8 @@ class StabilityTracker:
         evidence_grade = self._grade_evidence(experiences, majority_value)
 
         # Update stability index in DB
-        self._memory.upsert_stability(
+        upsert = batch.add_stability if batch is not None else self._memory.upsert_stability
+        upsert(
             nct_id=nct_id, field_name=field_name,
             stability_score=round(stability_score, 3),
             majority_value=majority_value,
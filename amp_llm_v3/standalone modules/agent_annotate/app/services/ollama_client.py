@@ -13,13 +13,47 @@ Larger models (qwen3:14b) keep 600s for annotation/reconciliation work.
 
 import asyncio
 import logging
+import time
 import httpx
 from typing import Optional
 
 from app.config import OLLAMA_BASE_URL, OLLAMA_TIMEOUT
+from app.services.metrics import metrics
+from app.services.tracing import tracer
 
 logger = logging.getLogger("agent_annotate.ollama")
 
+LLM_LATENCY = metrics.histogram(
+    "agent_annotate_llm_request_duration_seconds",
+    "Ollama /api/generate latency per model (excludes the model-lock wait)",
+    ["model"],
+)
+LLM_LOCK_WAIT = metrics.histogram(
+    "agent_annotate_llm_lock_wait_seconds",
+    "Time a generate call waited for the single-model Ollama lock",
+)
+LLM_REQUESTS = metrics.counter(
+    "agent_annotate_llm_requests_total",
+    "Ollama generate calls by model and outcome (ok / timeout / error)",
+    ["model", "outcome"],
+)
+LLM_TOKENS = metrics.counter(
+    "agent_annotate_llm_tokens_total",
+    "Tokens processed by Ollama, by model and kind (prompt / completion)",
+    ["model", "kind"],
+)
+LLM_TOKENS_PER_SECOND = metrics.histogram(
+    "agent_annotate_llm_tokens_per_second",
+    "Completion tokens per second of eval time, per model",
+    ["model"],
+    buckets=(1, 2, 5, 10, 15, 20, 30, 40, 60, 80, 100, 150, 200),
+)
+LLM_LOAD = metrics.histogram(
+    "agent_annotate_llm_model_load_seconds",
+    "Ollama load_duration per call (model swaps show up here)",
+    ["model"],
+)
+
 # How long to keep models loaded in Ollama after use.
 # On Mac Mini (16GB): short keep-alive to free RAM for next model.
 # On Server (240GB+): long keep-alive to avoid reload churn.
@@ -149,6 +183,16 @@ class OllamaAnnotationClient:
 
         Auto-pulls the model if not available locally (first call only).
         """
+        with tracer.span(f"llm {model}", "llm", model=model, prompt_chars=len(prompt)):
+            return await self._generate(model, prompt, temperature, system)
+
+    async def _generate(
+        self,
+        model: str,
+        prompt: str,
+        temperature: float,
+        system: Optional[str],
+    ) -> dict:
         # Ensure model is available (cached after first check)
         await self.ensure_model(model)
 
@@ -169,7 +213,12 @@ class OllamaAnnotationClient:
         # v17: Per-model timeout
         model_timeout = self._get_timeout_for_model(model)
 
+        wait_start = time.perf_counter()
         async with self._lock:
+            started = time.perf_counter()
+            LLM_LOCK_WAIT.observe(started - wait_start)
+            span = tracer.current()
+            span.set(lock_wait_s=round(started - wait_start, 3))
             try:
                 async with httpx.AsyncClient(timeout=model_timeout) as client:
                     resp = await client.post(
@@ -178,6 +227,12 @@ class OllamaAnnotationClient:
                     )
                     resp.raise_for_status()
                     result = resp.json()
+                    self._record_metrics(model, result, time.perf_counter() - started)
+                    span.set(
+                        prompt_tokens=result.get("prompt_eval_count"),
+                        completion_tokens=result.get("eval_count"),
+                        load_s=round((result.get("load_duration") or 0) / 1e9, 3),
+                    )
                     # Audit trail: capture the exact input (prompt + system) and
                     # raw output of every LLM call, attributed to the current
                     # trial/field via the audit contextvar. Best-effort — must
@@ -195,12 +250,14 @@ class OllamaAnnotationClient:
                         pass
                     return result
             except httpx.ConnectError:
+                LLM_REQUESTS.labels(model, "error").inc()
                 logger.error("Ollama unreachable at %s", self._base_url)
                 raise RuntimeError(
                     f"Ollama is unreachable at {self._base_url}. "
                     "Ensure Ollama is running (ollama serve)."
                 )
             except httpx.TimeoutException:
+                LLM_REQUESTS.labels(model, "timeout").inc()
                 self._timeout_stats[model] = self._timeout_stats.get(model, 0) + 1
                 logger.error(
                     "Ollama timeout after %ds for model %s (timeout #%d for this model)",
@@ -212,6 +269,7 @@ class OllamaAnnotationClient:
                     f"(timeout #{self._timeout_stats[model]} for this model)"
                 )
             except httpx.HTTPStatusError as e:
+                LLM_REQUESTS.labels(model, "error").inc()
                 if e.response.status_code == 404:
                     # Model vanished after ensure_model — clear cache and retry once
                     self._verified_models.discard(model)
@@ -222,6 +280,24 @@ class OllamaAnnotationClient:
                 logger.error("Ollama HTTP error %d: %s", e.response.status_code, e.response.text[:200])
                 raise
 
+    @staticmethod
+    def _record_metrics(model: str, result: dict, elapsed: float) -> None:
+        """Record latency, token counts and throughput of one generate call.
+
+        Ollama reports durations in nanoseconds.
+        """
+        LLM_REQUESTS.labels(model, "ok").inc()
+        LLM_LATENCY.labels(model).observe(elapsed)
+        prompt_tokens = result.get("prompt_eval_count") or 0
+        completion_tokens = result.get("eval_count") or 0
+        LLM_TOKENS.labels(model, "prompt").inc(prompt_tokens)
+        LLM_TOKENS.labels(model, "completion").inc(completion_tokens)
+        eval_ns = result.get("eval_duration") or 0
+        if completion_tokens and eval_ns:
+            LLM_TOKENS_PER_SECOND.labels(model).observe(completion_tokens / (eval_ns / 1e9))
+        if result.get("load_duration"):
+            LLM_LOAD.labels(model).observe(result["load_duration"] / 1e9)
+
     async def list_models(self) -> list[dict]:
         """Return list of locally available models."""
         try:
@@ -5,6 +5,9 @@ Two-phase architecture:
   Phase 1 (Research): All trials run fully parallel -> persisted to disk
   Phase 2 (Annotate): Sequential per trial -> annotate + verify -> persisted to disk
 
+Scheduling across jobs (interactive/batch lanes, shared Ollama slot, and
+cross-job dedup of identical trials) lives in work_scheduler.
+
 Persistence enables crash resilience, resume from where left off,
 and re-annotation without re-researching.
 """
@@ -13,20 +16,32 @@ import asyncio
 import logging
 import traceback
 import uuid
+from collections import Counter
 from datetime import datetime
 from typing import Optional
 
-from app.models.job import AnnotationJob, JobSummary, JobProgress, now_pacific
+from app.models.job import AnnotationJob, JobSummary, JobProgress, ShardInfo, now_pacific
 from app.models.research import ResearchResult
 from app.models.annotation import FieldAnnotation, TrialMetadata, AnnotationResult
 from app.models.verification import ConsensusResult, VerifiedAnnotation
 from app.services.config_service import config_service
-from app.services.output_service import save_json_output
+from app.services.output_service import (
+    append_live_output, init_live_outputs, save_json_output,
+)
 from app.services.version_service import get_version_stamp, get_git_commit_full, get_git_commit_short
 from app.services.persistence_service import PersistenceService
+from app.services.persistence_writer import persistence_writer
+from app.services.job_events import job_events
+from app.services.metrics import metrics
 from app.services.audit_trail import audit_recorder
-from app.config import RESULTS_DIR
+from app.services.tracing import tracer
+from app.services.work_scheduler import (
+    LANES, LANE_BATCH, STAGE_ANNOTATION, STAGE_RESEARCH, WorkItemKey, work_scheduler,
+)
+from app.config import CROSS_BRANCH_GATE, RESULTS_DIR
+from agents.evidence import evidence_bundles
 from agents.research import RESEARCH_AGENTS
+from agents.research.ctgov_bulk import ctgov_studies
 from agents.annotation import ANNOTATION_AGENTS
 from agents.verification import BlindVerifier, ConsensusChecker, ReconciliationAgent
 from app.services.review_service import review_service
@@ -34,21 +49,120 @@ from app.models.job import ReviewItem
 
 logger = logging.getLogger("agent_annotate.orchestrator")
 
+PHASE_DURATION = metrics.histogram(
+    "agent_annotate_phase_duration_seconds",
+    "Wall time of each pipeline phase per job", ("phase",),
+)
+TRIAL_DURATION = metrics.histogram(
+    "agent_annotate_trial_duration_seconds",
+    "Wall time from a trial's annotation start to its result",
+)
+FIELD_DURATION = metrics.histogram(
+    "agent_annotate_field_duration_seconds",
+    "Wall time per annotated field", ("field",),
+)
+EFF_FIRINGS = metrics.counter(
+    "agent_annotate_eff_firings_total",
+    "Efficiency short-circuits taken (AMP-skip, deterministic pregate)", ("kind",),
+)
+
+
+def _process_counters() -> dict:
+    """Process-wide counters that per-job diagnostics report as deltas."""
+    from app.services.ollama_client import ollama_client
+    try:
+        from agents.research.drug_cache import drug_cache
+        cache = drug_cache.stats()
+    except Exception:
+        cache = {}
+    return {"timeouts": ollama_client.get_timeout_stats(), "drug_cache": cache}
+
+
+def _counter_delta(
+    now: dict, start: dict, keys: Optional[tuple] = None, keep_zero: bool = False,
+) -> dict:
+    """``now - start`` per key (all of ``now``'s keys unless given)."""
+    delta = {k: now.get(k, 0) - start.get(k, 0) for k in (keys or now)}
+    return delta if keep_zero else {k: v for k, v in delta.items() if v}
+
+
+def _precompile_edam_guidance() -> None:
+    """Compile EDAM guidance for every annotation field (blocking; non-fatal)."""
+    try:
+        from app.services.memory import memory_store
+        compiled = memory_store.precompile_guidance(list(ANNOTATION_AGENTS))
+        if compiled:
+            logger.info(f"EDAM guidance precompiled for {compiled} fields")
+    except Exception as e:
+        logger.warning(f"EDAM guidance precompile failed (non-fatal): {e}")
+
+
+class _TrialTally:
+    """Running aggregates over a job's trial outputs, fed one trial at a time.
+
+    The final JSON header, diagnostics and the post-job log only need these
+    counts, so phase 2 keeps them instead of every trial dict.
+    """
+
+    def __init__(self) -> None:
+        self.total = 0
+        self.successful = 0
+        self.flagged = 0
+        self.grade_counts: dict[str, Counter] = {}
+        self.error_in_value = 0
+        self.empty_values = 0
+        self.zero_conf_with_value = 0
+
+    @property
+    def failed(self) -> int:
+        return self.total - self.successful
+
+    def add(self, trial: dict) -> None:
+        self.total += 1
+        annotations = trial.get("annotations") or []
+        if annotations:
+            self.successful += 1
+        verification = trial.get("verification")
+        if verification and verification.get("flagged_for_review"):
+            self.flagged += 1
+        for ann in annotations:
+            if not isinstance(ann, dict):
+                ann = ann.model_dump()
+            self.grade_counts.setdefault(ann.get("field_name", "?"), Counter())[
+                ann.get("evidence_grade", "llm")
+            ] += 1
+            value = ann.get("value")
+            if not value and ann.get("field_name") != "sequence":
+                self.empty_values += 1
+            if ann.get("confidence") == 0.0 and value:
+                self.zero_conf_with_value += 1
+            # Error text in values
+            if any(p in (value or "").lower() for p in ("timeout", "error", "failed")):
+                self.error_in_value += 1
+
+    def evidence_grades(self) -> dict[str, dict[str, int]]:
+        return {field: dict(c) for field, c in self.grade_counts.items()}
+
 
 class PipelineOrchestrator:
     """Creates, tracks, and runs annotation pipeline jobs.
 
-    Jobs are queued and processed sequentially by a background worker.
-    Only one job runs at a time (Ollama bottleneck), but multiple jobs
-    can be queued. The worker starts automatically on first job submission.
+    Jobs are queued per scheduler lane ("interactive" / "batch") and each
+    lane's background worker runs one job at a time. The two lanes run
+    concurrently; Ollama contention between them is arbitrated per
+    mini-batch by work_scheduler.ollama_slot (interactive first). Workers
+    start automatically on first job submission.
     """
 
     def __init__(self):
         self._jobs: dict[str, AnnotationJob] = {}
-        self._queue: asyncio.Queue[str] = asyncio.Queue()
-        self._worker_running = False
+        self._queues: dict[str, asyncio.Queue[str]] = {
+            lane: asyncio.Queue() for lane in LANES
+        }
+        self._worker_running: dict[str, bool] = {lane: False for lane in LANES}
         self._pending_requeue: list[str] = []
         self._pending_resume: list[str] = []
+        self._pending_shard_resume: list[str] = []
         # Reload persisted job states from disk
         self._reload_persisted_jobs()
 
@@ -65,7 +179,7 @@ class PipelineOrchestrator:
         for job_id in list(self._pending_resume):
             try:
                 job = self.resume_job(job_id, force=True)
-                self._queue.put_nowait(job_id)
+                self._lane_queue(job).put_nowait(job_id)
                 logger.info(f"Auto-resuming interrupted job {job_id}")
             except Exception as e:
                 logger.warning(f"Failed to auto-resume job {job_id}: {e}")
@@ -75,12 +189,22 @@ class PipelineOrchestrator:
         for job_id in self._pending_requeue:
             job = self._jobs.get(job_id)
             if job and job.status == "queued":
-                self._queue.put_nowait(job_id)
-                logger.info(f"Re-enqueued persisted job {job_id}")
+                self._lane_queue(job).put_nowait(job_id)
+                logger.info(f"Re-enqueued persisted job {job_id} ({job.lane} lane)")
         self._pending_requeue.clear()
 
-        if not self._queue.empty():
-            self._ensure_worker()
+        # Coordinator jobs keep running on their workers across our restart;
+        # pick the polling loop back up.
+        if self._pending_shard_resume:
+            from app.services.shard_coordinator import shard_coordinator
+            for job_id in self._pending_shard_resume:
+                shard_coordinator.resume(job_id)
+                logger.info(f"Resumed shard coordination for job {job_id}")
+            self._pending_shard_resume.clear()
+
+        for lane, queue in self._queues.items():
+            if not queue.empty():
+                self._ensure_worker(lane)
 
     def _reload_persisted_jobs(self) -> None:
         """Reload job states from disk on startup.
@@ -110,10 +234,18 @@ class PipelineOrchestrator:
                     current_stage=progress.get("current_stage", ""),
                 ),
                 commit_hash=state.get("commit_hash", ""),
+                lane=state.get("lane") or work_scheduler.lane_for(len(nct_ids)),
+                shards=[ShardInfo(**s) for s in state.get("shards") or []],
+                workers=state.get("workers") or [],
+                submit_options=state.get("submit_options") or {},
             )
 
+            # Coordinator jobs: the shards kept running remotely
+            if job.shards and status == "running":
+                job.status = "running"
+                self._pending_shard_resume.append(job_id)
             # Jobs that were running at crash time -> mark failed, auto-resume
-            if status == "running":
+            elif status == "running":
                 job.status = "failed"
                 job.error = "Service restarted while job was running"
                 job.progress.current_stage = "interrupted"
@@ -152,6 +284,7 @@ class PipelineOrchestrator:
             "started_at": job.started_at.isoformat() if job.started_at else None,
             "finished_at": job.finished_at.isoformat() if job.finished_at else None,
             "commit_hash": job.commit_hash,
+            "lane": job.lane,
             "resumed": job.resumed,
             "progress": {
                 "total_trials": job.progress.total_trials,
@@ -169,9 +302,18 @@ class PipelineOrchestrator:
             },
             "trial_times": trial_times or [],
         }
-        persistence.save_job_state(job.job_id, job_data)
+        if job.shards:
+            job_data["shards"] = [s.model_dump(mode="json") for s in job.shards]
+            job_data["workers"] = job.workers
+            job_data["submit_options"] = job.submit_options
+        persistence.save_job_state(job.job_id, job_data, update_index=True)
+        job_events.notify()
+
+    def persist_job(self, job: AnnotationJob) -> None:
+        """Persist a job driven outside the local pipeline (shard coordinator)."""
+        self._persist_job(job)
 
-    def create_job(self, nct_ids: list[str]) -> AnnotationJob:
+    def create_job(self, nct_ids: list[str], priority: Optional[str] = None) -> AnnotationJob:
         job_id = uuid.uuid4().hex[:12]
         job = AnnotationJob(
             job_id=job_id,
@@ -179,50 +321,58 @@ class PipelineOrchestrator:
             config_snapshot=config_service.snapshot(),
             progress=JobProgress(total_trials=len(nct_ids)),
             commit_hash=get_git_commit_short(),
+            lane=work_scheduler.lane_for(len(nct_ids), priority),
         )
         self._jobs[job_id] = job
         self._persist_job(job)
         return job
 
+    def _lane_queue(self, job: AnnotationJob) -> asyncio.Queue:
+        return self._queues.get(job.lane) or self._queues[LANE_BATCH]
+
     def enqueue_job(self, job_id: str) -> None:
-        """Add a job to the processing queue."""
-        self._queue.put_nowait(job_id)
-        self._ensure_worker()
+        """Add a job to its lane's processing queue."""
+        job = self._jobs.get(job_id)
+        lane = job.lane if job and job.lane in self._queues else LANE_BATCH
+        self._queues[lane].put_nowait(job_id)
+        self._ensure_worker(lane)
 
-    def queue_size(self) -> int:
-        """Number of jobs waiting in the queue (not including the running one)."""
-        return self._queue.qsize()
+    def queue_size(self, lane: Optional[str] = None) -> int:
+        """Number of jobs waiting (not running), across lanes or for one lane."""
+        if lane is not None:
+            return self._queues[lane].qsize() if lane in self._queues else 0
+        return sum(q.qsize() for q in self._queues.values())
 
-    def queued_jobs(self) -> list[str]:
+    def queued_jobs(self, lane: Optional[str] = None) -> list[str]:
         """Return job IDs currently waiting in the queue."""
         return [j.job_id for j in self._jobs.values()
-                if j.status == "queued" and j.job_id not in
-                {jid for jid in [self._running_job_id()] if jid}]
+                if j.status == "queued" and (lane is None or j.lane == lane)]
 
-    def _running_job_id(self) -> Optional[str]:
-        """Return the job_id of the currently running job, if any."""
+    def running_job_id(self, lane: Optional[str] = None) -> Optional[str]:
+        """Return the job_id of a currently running job, if any."""
         for j in self._jobs.values():
-            if j.status == "running":
+            if j.status == "running" and (lane is None or j.lane == lane):
                 return j.job_id
         return None
 
-    def _ensure_worker(self) -> None:
-        """Start the queue worker if not already running."""
-        if not self._worker_running:
-            self._worker_running = True
-            asyncio.ensure_future(self._queue_worker())
+    def _ensure_worker(self, lane: str = LANE_BATCH) -> None:
+        """Start the lane's queue worker if not already running."""
+        if not self._worker_running.get(lane):
+            self._worker_running[lane] = True
+            asyncio.ensure_future(self._queue_worker(lane))
 
-    async def _queue_worker(self) -> None:
-        """Background worker that processes queued jobs sequentially.
+    async def _queue_worker(self, lane: str = LANE_BATCH) -> None:
+        """Background worker that processes one lane's queued jobs sequentially.
 
         Waits for the other branch to finish before starting a job,
         since both branches share the same Ollama instance.
         """
-        logger.info("Job queue worker started")
+        logger.info(f"Job queue worker started ({lane} lane)")
+        queue = self._queues[lane]
         try:
             while True:
                 # Wait for next job (blocks until one is available)
-                job_id = await asyncio.wait_for(self._queue.get(), timeout=60)
+                job_id = await asyncio.wait_for(queue.get(), timeout=60)
                 job = self._jobs.get(job_id)
                 if not job:
                     logger.warning(f"Queue worker: job {job_id} not found, skipping")
@@ -234,16 +384,19 @@ class PipelineOrchestrator:
                 # Wait for other branch to finish (cross-branch gatekeeper)
                 await self._wait_for_other_branch(job_id)
 
-                logger.info(f"Queue worker: starting job {job_id} ({job.progress.total_trials} trials)")
+                logger.info(
+                    f"Queue worker: starting job {job_id} "
+                    f"({job.progress.total_trials} trials, {lane} lane)"
+                )
                 await self.run_pipeline(job_id)
                 logger.info(f"Queue worker: job {job_id} finished with status '{job.status}'")
         except asyncio.TimeoutError:
             # No jobs for 60s — shut down worker, will restart on next enqueue
-            logger.info("Job queue worker idle, shutting down")
+            logger.info(f"Job queue worker idle, shutting down ({lane} lane)")
         except Exception as e:
-            logger.error(f"Job queue worker crashed: {e}", exc_info=True)
+            logger.error(f"Job queue worker crashed ({lane} lane): {e}", exc_info=True)
         finally:
-            self._worker_running = False
+            self._worker_running[lane] = False
 
     async def _wait_for_other_branch(self, job_id: str) -> None:
         """Wait until the other branch's agent-annotate has no active jobs.
@@ -254,6 +407,9 @@ class PipelineOrchestrator:
         """
         import httpx
 
+        if not CROSS_BRANCH_GATE:
+            return
+
         # Detect our actual port by checking which one we're serving on
         our_port = self._detect_our_port()
         other_port = 9005 if our_port == 8005 else 8005
@@ -363,6 +519,8 @@ class PipelineOrchestrator:
                     elapsed_seconds=job.progress.elapsed_seconds,
                     avg_seconds_per_trial=job.progress.avg_seconds_per_trial,
                     commit_hash=job.commit_hash,
+                    lane=job.lane,
+                    sharded=bool(job.shards),
                     warnings_count=len(job.progress.warnings),
                     timeouts_count=sum(job.progress.timeouts.values()) if job.progress.timeouts else 0,
                     retries_count=sum(job.progress.retries.values()) if job.progress.retries else 0,
@@ -408,6 +566,7 @@ class PipelineOrchestrator:
             resumed=True,
             resumed_at=now_pacific(),
             commit_hash=get_git_commit_short(),
+            lane=original_job.lane if original_job else work_scheduler.lane_for(len(nct_ids)),
         )
         self._jobs[job_id] = job
         return job
@@ -418,6 +577,9 @@ class PipelineOrchestrator:
         if not job:
             return
 
+        trace_token = None
+        if getattr(config_service.get().orchestrator, "trace_spans", True):
+            trace_token = tracer.bind_job(job_id)
         try:
             await self._run_pipeline_inner(job)
         except Exception as e:
@@ -428,6 +590,11 @@ class PipelineOrchestrator:
             job.finished_at = now_pacific()
             job.updated_at = now_pacific()
             self._persist_job(job)
+        finally:
+            # Wake any other job waiting on trials this job claimed but
+            # never finished (cancel / crash / per-trial error).
+            work_scheduler.release_job(job_id)
+            tracer.unbind_job(job_id, trace_token)
 
     async def _run_pipeline_inner(self, job: AnnotationJob) -> None:
         """Inner pipeline logic with two-phase architecture.
@@ -451,6 +618,9 @@ class PipelineOrchestrator:
         model_timeouts = getattr(config.ollama, "model_timeouts", {})
         if model_timeouts:
             ollama_client.set_model_timeouts(model_timeouts)
+        # Ollama timeouts and drug_cache counters are process-wide; snapshot
+        # them so the diagnostics report this job's share.
+        counters_at_start = _process_counters()
         pipeline_start = _time.monotonic()
         # If resumed, offset the start time backward to account for previous elapsed time
         if job.resumed and job.progress.elapsed_seconds > 0:
@@ -458,40 +628,55 @@ class PipelineOrchestrator:
 
         persistence = PersistenceService(RESULTS_DIR)
         version_stamp = get_version_stamp()
+        # Work-item scope for cross-job dedup: identical (nct, config, commit)
+        # items in other jobs are computed once and copied here.
+        config_hash = version_stamp.get("config_hash", "")
 
         # Determine resume state
         skip_research = set()
         skip_annotations = set()
         if job.resumed:
-            skip_research = persistence.get_completed_research(job_id)
-            skip_annotations = persistence.get_completed_annotations(job_id)
+            # Journal replay hashes every completed file; keep it off the loop.
+            skip_research = await asyncio.to_thread(persistence.get_completed_research, job_id)
+            skip_annotations = await asyncio.to_thread(
+                persistence.get_completed_annotations, job_id
+            )
             logger.info(
                 f"[{job_id}] Resuming: {len(skip_research)} research, "
                 f"{len(skip_annotations)} annotations already on disk"
             )
 
+        # EDAM per-field guidance is compiled in a thread while phase 1
+        # runs, so the first annotations don't compile it on the loop.
+        guidance_warmup = asyncio.ensure_future(asyncio.to_thread(_precompile_edam_guidance))
+
         # --- Phase 1: Research (all trials, fully parallel) ---
         if len(skip_research) < len(job.nct_ids):
             persistence.init_research_dir(
                 job_id, job.nct_ids, version_stamp, job.config_snapshot
             )
-            research_data = await self._run_phase1_research(
-                job, config, persistence, skip_research, pipeline_start
-            )
+            with PHASE_DURATION.labels("research").time():
+                research_data = await self._run_phase1_research(
+                    job, config, persistence, skip_research, pipeline_start,
+                    config_hash=config_hash,
+                )
         else:
             research_data = {}
             for nct_id in job.nct_ids:
-                loaded = persistence.load_research(job_id, nct_id)
-                research_data[nct_id] = loaded if loaded is not None else []
+                research_data[nct_id] = self._load_research(persistence, job_id, nct_id)
             job.progress.researched_trials = len(job.nct_ids)
             job.progress.current_stage = "research_complete"
             logger.info(f"[{job_id}] All research loaded from disk")
 
+        await guidance_warmup
+
         # --- Phase 2: Annotation + Verification ---
         persistence.init_annotations_dir(job_id)
-        all_trial_results, trial_times = await self._run_phase2_annotate(
-            job, config, research_data, persistence, skip_annotations, pipeline_start
-        )
+        with PHASE_DURATION.labels("annotation").time():
+            tally, trial_times = await self._run_phase2_annotate(
+                job, config, research_data, persistence, skip_annotations, pipeline_start,
+                config_hash=config_hash,
+            )
 
         # --- Save final results ---
         job.progress.current_stage = "saving"
@@ -502,19 +687,14 @@ class PipelineOrchestrator:
                 job.progress.elapsed_seconds / job.progress.completed_trials, 1
             )
         version = get_version_stamp()
-        flagged = sum(
-            1 for r in all_trial_results
-            if r.get("verification") and r["verification"].get("flagged_for_review")
-        )
         output = {
             "version": version,
             "status": job.status,
             "config_snapshot": job.config_snapshot,
-            "trials": all_trial_results,
-            "total_trials": len(all_trial_results),
-            "successful": sum(1 for r in all_trial_results if r.get("annotations")),
-            "failed": sum(1 for r in all_trial_results if not r.get("annotations")),
-            "manual_review": flagged,
+            "total_trials": tally.total,
+            "successful": tally.successful,
+            "failed": tally.failed,
+            "manual_review": tally.flagged,
             "timing": {
                 "started_at": job.started_at.isoformat() if job.started_at else None,
                 "finished_at": now_pacific().isoformat(),
@@ -529,42 +709,32 @@ class PipelineOrchestrator:
             output["resumed_at"] = job.resumed_at.isoformat() if job.resumed_at else None
 
         # v17: Populate timeouts from Ollama client at job completion
-        from app.services.ollama_client import ollama_client
-        job.progress.timeouts = ollama_client.get_timeout_stats()
-
-        # v17: Add diagnostics to output
         # v42.6.19 (2026-04-25): include drug_cache stats so we can validate
         # the cache is hitting on high-drug-repetition batches without having
-        # to add a separate API call. cleared==True means the cache was reset
-        # before this job (clean baseline measurement).
-        try:
-            from agents.research.drug_cache import drug_cache
-            cache_stats = drug_cache.stats()
-        except Exception:
-            cache_stats = {}
-
-        # v42.7.1 (2026-04-26): aggregate evidence_grade distribution across
-        # all annotations. Lets downstream see how many fields ended up at
-        # each grade per job — basis for commit_accuracy reporting and
-        # roadmap §11 calibrated-decline. Counts per (field_name, grade).
-        from collections import Counter as _Counter
-        grade_counts: dict = {}
-        try:
-            for trial_result in all_trial_results:
-                if not isinstance(trial_result, dict):
-                    continue
-                for ann in trial_result.get("annotations", []) or []:
-                    if isinstance(ann, dict):
-                        fld = ann.get("field_name", "?")
-                        grade = ann.get("evidence_grade", "llm")
-                    else:
-                        fld = getattr(ann, "field_name", "?")
-                        grade = getattr(ann, "evidence_grade", "llm")
-                    grade_counts.setdefault(fld, _Counter())[grade] += 1
-            # serialize Counters → dicts
-            grade_counts = {f: dict(c) for f, c in grade_counts.items()}
-        except Exception:
-            grade_counts = {}
+        # to add a separate API call.
+        # Both are deltas since this job started. A job running in the other
+        # lane at the same time adds to them too.
+        counters = _process_counters()
+        job.progress.timeouts = _counter_delta(
+            counters["timeouts"], counters_at_start["timeouts"]
+        )
+        cache_stats = {}
+        if counters["drug_cache"]:
+            delta = _counter_delta(
+                counters["drug_cache"], counters_at_start["drug_cache"],
+                keys=("hits", "misses"), keep_zero=True,
+            )
+            hits, misses = delta["hits"], delta["misses"]
+            cache_stats = {
+                "hits": hits,
+                "misses": misses,
+                "hit_rate": round(hits / (hits + misses), 3) if hits + misses else 0.0,
+                "size": counters["drug_cache"].get("size", 0),  # process-wide
+            }
+
+        # v42.7.1: per (field_name, evidence_grade) counts, tallied as
+        # trials landed in phase 2.
+        grade_counts = tally.evidence_grades()
 
         output["diagnostics"] = {
             "warnings": job.progress.warnings,
@@ -574,11 +744,25 @@ class PipelineOrchestrator:
             "quality_issues": len([w for w in job.progress.warnings if "QUALITY" in w]),
             "drug_cache": cache_stats,
             "evidence_grades": grade_counts,
+            # Process-global snapshots at job end (shared with other jobs
+            # and earlier runs in this process), not per-job figures.
+            "process": {
+                "work_scheduler": work_scheduler.stats(),
+                "persistence": persistence_writer.stats(),
+                "evidence_bundles": evidence_bundles.stats(),
+                "ctgov_bulk": ctgov_studies.stats(),
+            },
         }
 
-        save_json_output(job_id, output)
+        # Trials are streamed from the per-trial files (successes and
+        # persisted failures) in job NCT order, one at a time, off the loop.
+        await asyncio.to_thread(
+            save_json_output,
+            job_id, output, trials=persistence.iter_annotations(job_id, job.nct_ids),
+        )
+        # Per-trial files must be durable before the job reports completed.
+        await asyncio.to_thread(persistence_writer.flush)
 
-        job.results = all_trial_results
         if job.status != "cancelled":
             job.status = "completed"
         job.finished_at = now_pacific()
@@ -595,16 +779,18 @@ class PipelineOrchestrator:
         job.progress.field_timings = {}
         job.updated_at = now_pacific()
         self._persist_job(job)
-        logger.info(f"[{job_id}] Pipeline {job.status}: {len(all_trial_results)} trials")
+        logger.info(f"[{job_id}] Pipeline {job.status}: {tally.total} trials")
 
         # --- v17: Post-job diagnostics summary ---
-        self._log_job_diagnostics(job_id, all_trial_results, trial_times)
+        self._log_job_diagnostics(job_id, tally, trial_times, job.progress.timeouts)
 
         # --- EDAM post-job hook: self-learning feedback loops ---
         try:
             from app.services.memory import edam_post_job_hook
+            # Trials are re-read from disk for each loop, not held in RAM.
             edam_summary = await edam_post_job_hook(
-                job_id, all_trial_results, job.config_snapshot
+                job_id, lambda: persistence.iter_annotations(job_id, job.nct_ids),
+                job.config_snapshot,
             )
             if edam_summary.get("errors"):
                 logger.warning("[%s] EDAM completed with errors: %s",
@@ -619,11 +805,14 @@ class PipelineOrchestrator:
         persistence: PersistenceService,
         skip_nct_ids: set[str],
         pipeline_start: float,
+        config_hash: str = "",
     ) -> dict[str, list[ResearchResult]]:
         """Phase 1: Run research for all trials in parallel.
 
         Research agents make external API calls (no Ollama) so all trials
-        can be researched concurrently, bounded by a semaphore.
+        can be researched concurrently, bounded by a semaphore. Trials that
+        another job already researched (or is researching) under the same
+        config and commit are copied from that job instead.
         """
         import time as _time
 
@@ -637,28 +826,48 @@ class PipelineOrchestrator:
 
         # Load already-completed research from disk
         for nct_id in skip_nct_ids:
-            loaded = persistence.load_research(job.job_id, nct_id)
-            research_data[nct_id] = loaded if loaded is not None else []
+            research_data[nct_id] = self._load_research(persistence, job.job_id, nct_id)
             job.progress.researched_trials += 1
 
         remaining = [nct for nct in job.nct_ids if nct not in skip_nct_ids]
 
+        dedup = work_scheduler.is_enabled()
+
         async def research_one(nct_id: str) -> None:
             if job.status == "cancelled":
                 return
+            key = WorkItemKey(nct_id, config_hash, job.commit_hash)
             async with sem:
                 if job.status == "cancelled":
                     return
-                logger.info(f"[{job.job_id}] Researching {nct_id}")
-                try:
-                    results = await self._run_research(nct_id, config, job)
-                    persistence.save_research(job.job_id, nct_id, results)
-                    research_data[nct_id] = results
-                except Exception as e:
-                    logger.error(
-                        f"[{job.job_id}] Research failed for {nct_id}: {e}"
-                    )
-                    research_data[nct_id] = []
+                # Claim only once a research slot is free, so a later job is
+                # never stuck behind this job's not-yet-started trials.
+                with tracer.span(f"research {nct_id}", "trial", nct_id=nct_id) as span:
+                    adopted = None
+                    if dedup:
+                        adopted = await self._adopt_research(job, nct_id, key, persistence)
+                    if adopted is not None:
+                        research_data[nct_id] = adopted
+                        span.set(adopted=True)
+                    else:
+                        logger.info(f"[{job.job_id}] Researching {nct_id}")
+                        try:
+                            results = await self._run_research(nct_id, config, job)
+                            # Index citations once for every annotator/verifier.
+                            with tracer.span("evidence_bundle", "post", nct_id=nct_id):
+                                bundle = evidence_bundles.build(nct_id, results)
+                            persistence.save_research(
+                                job.job_id, nct_id, results, evidence_index=bundle.to_index(),
+                            )
+                            research_data[nct_id] = results
+                            if dedup:
+                                work_scheduler.complete(STAGE_RESEARCH, key, job.job_id)
+                        except Exception as e:
+                            logger.error(
+                                f"[{job.job_id}] Research failed for {nct_id}: {e}"
+                            )
+                            research_data[nct_id] = []
+                            work_scheduler.abandon(STAGE_RESEARCH, key)
                 async with progress_lock:
                     job.progress.researched_trials += 1
                     job.progress.elapsed_seconds = round(
@@ -671,10 +880,20 @@ class PipelineOrchestrator:
                 f"[{job.job_id}] Phase 1: researching {len(remaining)} trials "
                 f"({len(skip_nct_ids)} cached)"
             )
-            await asyncio.gather(
-                *(research_one(nct) for nct in remaining),
-                return_exceptions=True,
-            )
+            # One bulk CT.gov query per chunk of NCTs instead of one GET per
+            # trial in clinical_protocol.
+            prefetch = getattr(config.orchestrator, "ctgov_bulk_prefetch", True)
+            if prefetch and "clinical_protocol" in config.research_agents:
+                with tracer.span("ctgov_bulk_prefetch", "http", trials=len(remaining)):
+                    await ctgov_studies.prefetch(remaining)
+            try:
+                await asyncio.gather(
+                    *(research_one(nct) for nct in remaining),
+                    return_exceptions=True,
+                )
+            finally:
+                ctgov_studies.release(remaining)
+            tracer.flush(job.job_id)
 
         job.progress.current_stage = "research_complete"
         job.progress.elapsed_seconds = round(_time.monotonic() - pipeline_start, 1)
@@ -692,7 +911,8 @@ class PipelineOrchestrator:
         persistence: PersistenceService,
         skip_nct_ids: set[str],
         pipeline_start: float,
-    ) -> list[dict]:
+        config_hash: str = "",
+    ) -> tuple["_TrialTally", list[float]]:
         """Phase 2: Annotate and verify in mini-batches.
 
         Mini-batch processing reduces Ollama model switches by grouping:
@@ -704,459 +924,659 @@ class PipelineOrchestrator:
         Batch size of 5 reduces model switches from ~4-5/trial to ~0.8/trial.
         On interruption, at most batch_size trials of annotation work are lost
         (research is cached, persisted trials are safe).
+
+        Each mini-batch holds the shared Ollama slot for its lane. Trials that
+        another job already annotated under the same (nct, config, commit) key
+        are copied from that job rather than re-annotated.
         """
         import time as _time
 
         MINI_BATCH_SIZE = getattr(config.orchestrator, "mini_batch_size", 5) or 5
 
         job.progress.current_phase = "annotation"
-        all_trial_results = []
+        tally = _TrialTally()
+        done_ncts: set[str] = set()
         trial_times: list[float] = []
 
+        # Live standard CSV + JSONL, appended as each trial lands on disk so
+        # large jobs have usable output long before the final JSON. On resume
+        # rows of trials that will be retried are dropped first.
+        try:
+            live_ncts = init_live_outputs(job.job_id, keep=set(skip_nct_ids))
+        except Exception as e:
+            logger.warning(f"[{job.job_id}] Live CSV/JSONL disabled: {e}")
+            live_ncts = None
+
+        def record(trial_output: dict) -> None:
+            nct_id = trial_output.get("nct_id", "")
+            if nct_id in done_ncts:
+                return
+            done_ncts.add(nct_id)
+            tally.add(trial_output)
+            job.progress.flagged_trials = tally.flagged
+            if live_ncts is None or nct_id in live_ncts:
+                return
+            try:
+                append_live_output(job.job_id, trial_output)
+                live_ncts.add(nct_id)
+            except Exception as e:
+                logger.debug(f"live output append failed for {nct_id}: {e}")
+
         # Filter out already-completed trials (resume support)
         pending_ncts = []
         for nct_id in job.nct_ids:
             if nct_id in skip_nct_ids:
                 cached = persistence.load_annotation(job.job_id, nct_id)
                 if cached:
-                    all_trial_results.append(cached)
+                    record(cached)
                     job.progress.completed_trials += 1
                     logger.info(f"[{job.job_id}] Loaded cached annotation for {nct_id}")
                     continue
             pending_ncts.append(nct_id)
 
+        dedup = work_scheduler.is_enabled()
+        # Trials that another job is annotating right now under the same work
+        # item key. They are awaited only when this job has nothing else
+        # queued, and never while holding the Ollama slot (that would deadlock
+        # against the owning job waiting for the slot).
+        deferred: list[tuple[str, asyncio.Future]] = []
+        queue = list(pending_ncts)
+
         # Process in mini-batches
-        for batch_start in range(0, len(pending_ncts), MINI_BATCH_SIZE):
+        while queue or deferred:
             if job.status == "cancelled":
                 break
 
-            batch_ncts = pending_ncts[batch_start:batch_start + MINI_BATCH_SIZE]
-            batch_idx_offset = len(job.nct_ids) - len(pending_ncts) + batch_start
-            logger.info(
-                f"[{job.job_id}] Mini-batch: {len(batch_ncts)} trials "
-                f"({batch_idx_offset+1}-{batch_idx_offset+len(batch_ncts)}/{len(job.nct_ids)})"
-            )
-
-            # =================================================================
-            # Phase A: Annotate all trials in batch (annotation model stays loaded)
-            # =================================================================
-            job.progress.current_stage = "annotating"
-            batch_annotations = {}  # nct_id → (annotations, research, trial_start)
-            batch_errors = {}       # nct_id → error string
-
-            for j, nct_id in enumerate(batch_ncts):
-                if job.status == "cancelled":
-                    break
-
-                trial_start = _time.monotonic()
-                job.progress.current_nct_id = nct_id
-                job.progress.elapsed_seconds = round(_time.monotonic() - pipeline_start, 1)
-                job.updated_at = now_pacific()
-                research = research_data.get(nct_id, [])
-                logger.info(
-                    f"[{job.job_id}] Annotating {nct_id} "
-                    f"({batch_idx_offset+j+1}/{len(job.nct_ids)}, "
-                    f"batch {j+1}/{len(batch_ncts)})"
+            if not queue:
+                nct_id, owner = deferred.pop(0)
+                await owner
+                trial_output = self._adopt_annotation(
+                    job, nct_id, WorkItemKey(nct_id, config_hash, job.commit_hash),
+                    persistence,
                 )
-
-                try:
-                    # Audit trail: bind every LLM call made while annotating this
-                    # trial to its nct_id. Reset afterwards so the batched
-                    # cross-trial verifier calls (which run without a trial
-                    # context) are not misattributed to the last trial.
-                    _trial_audit_token = audit_recorder.set_context(
-                        nct_id=nct_id, field="", stage="annotation"
-                    )
-                    try:
-                        annotations = await self._run_annotation(
-                            nct_id, research, config, job
-                        )
-                    finally:
-                        audit_recorder.reset(_trial_audit_token)
-                    # Snapshot pre-consistency values for EDAM learning
-                    pre_consistency = {a.field_name: a.value for a in annotations}
-                    self._enforce_consistency(annotations, research_data=research)
-                    # Store consistency overrides as EDAM corrections
-                    self._store_consistency_overrides(
-                        nct_id, job.job_id, annotations,
-                        pre_consistency, job.config_snapshot,
-                    )
-                    batch_annotations[nct_id] = (annotations, research, trial_start)
-                except Exception as e:
-                    logger.error(f"[{job.job_id}] Annotation error for {nct_id}: {e}")
-                    batch_errors[nct_id] = str(e)
-                    audit_recorder.discard(nct_id)  # drop any captured calls
-                    # Persist error result immediately
-                    metadata = TrialMetadata(nct_id=nct_id)
-                    trial_output = {
-                        "nct_id": nct_id,
-                        "metadata": metadata.model_dump(),
-                        "annotations": [],
-                        "verification": None,
-                        "research_used": [],
-                        "research_results": [r.model_dump() for r in research],
-                        "error": str(e),
-                    }
-                    all_trial_results.append(trial_output)
+                if trial_output is not None:
+                    record(trial_output)
                     job.progress.completed_trials += 1
-                    self._update_timing(job, trial_start, pipeline_start, trial_times)
                     self._persist_job(job, trial_times)
+                else:
+                    queue.append(nct_id)  # owner gave up — compute it here
+                continue
 
-            if not batch_annotations:
-                continue  # all errored
-
-            # =================================================================
-            # Phase B: Verify all trials model-grouped (3 model switches total)
-            # =================================================================
-            job.progress.current_stage = "verifying"
-            job.progress.elapsed_seconds = round(_time.monotonic() - pipeline_start, 1)
-            job.updated_at = now_pacific()
-
-            batch_verified = {}  # nct_id → (annotations, verified)
-
-            # Collect all annotations that need verification across ALL trials
-            # Structure: {nct_id: {field_name: annotation}}
-            all_trial_annotations = {}
-            for nct_id, (annotations, research, _) in batch_annotations.items():
-                all_trial_annotations[nct_id] = {a.field_name: a for a in annotations}
-
-            # Separate skip vs verify across all trials
-            skip_results = {}     # nct_id → [ConsensusResult]
-            verify_items = []     # [(nct_id, annotation)]
-            any_flagged_by_trial = {nct_id: False for nct_id in batch_annotations}
-            flag_reasons_by_trial = {nct_id: [] for nct_id in batch_annotations}
-
-            for nct_id, (annotations, _, _) in batch_annotations.items():
-                skip_results[nct_id] = []
-                for annotation in annotations:
-                    if annotation.skip_verification:
-                        skip_results[nct_id].append(ConsensusResult(
-                            field_name=annotation.field_name,
-                            original_value=annotation.value,
-                            final_value=annotation.value,
-                            consensus_reached=True,
-                            agreement_ratio=1.0,
-                            opinions=[],
-                        ))
-                    elif annotation.confidence < 0.2 and "[Below threshold" in (annotation.reasoning or ""):
-                        skip_results[nct_id].append(ConsensusResult(
-                            field_name=annotation.field_name,
-                            original_value=annotation.value,
-                            final_value="",
-                            consensus_reached=False,
-                            agreement_ratio=0.0,
-                            opinions=[],
-                            flag_reason="insufficient_evidence",
-                        ))
-                        any_flagged_by_trial[nct_id] = True
-                        flag_reasons_by_trial[nct_id].append(f"{annotation.field_name}: insufficient evidence")
-                    else:
-                        verify_items.append((nct_id, annotation))
+            batch_ncts = []
+            while queue and len(batch_ncts) < MINI_BATCH_SIZE:
+                nct_id = queue.pop(0)
+                if dedup:
+                    key = WorkItemKey(nct_id, config_hash, job.commit_hash)
+                    trial_output = self._adopt_annotation(job, nct_id, key, persistence)
+                    if trial_output is not None:
+                        record(trial_output)
+                        job.progress.completed_trials += 1
+                        continue
+                    owner = work_scheduler.claim(STAGE_ANNOTATION, key, job.job_id)
+                    if owner is not None:
+                        deferred.append((nct_id, owner))
+                        continue
+                batch_ncts.append(nct_id)
+            if not batch_ncts:
+                self._persist_job(job, trial_times)
+                continue
 
-            # Model-grouped verification across ALL trials in batch
-            verifier = BlindVerifier()
-            verifier_models = [
-                (key, m) for key, m in config.verification.models.items()
-                if m.role == "verifier"
-            ]
-            server_verifiers = getattr(config.orchestrator, "server_verifiers", [])
-            if config.orchestrator.hardware_profile == "server" and server_verifiers:
-                from app.models.config_models import ModelConfig
-                upgraded = []
-                for vi, (key, m) in enumerate(verifier_models):
-                    if vi < len(server_verifiers):
-                        upgraded.append((key, ModelConfig(name=server_verifiers[vi], role="verifier")))
-                    else:
-                        upgraded.append((key, m))
-                verifier_models = upgraded
-            # v42.6.7 Eff #7: fast-model verifier override. When set,
-            # replaces verifier_1/2/3 names with smaller/faster models to
-            # 3x verifier throughput on high-volume jobs. Reconciliation
-            # still uses the reconciler model (larger); only the blind
-            # verifier pool gets downsized.
-            verifier_fast_models = getattr(config.orchestrator, "verifier_fast_models", [])
-            if verifier_fast_models:
-                from app.models.config_models import ModelConfig
-                downsized = []
-                for vi, (key, m) in enumerate(verifier_models):
-                    if vi < len(verifier_fast_models):
-                        downsized.append((key, ModelConfig(name=verifier_fast_models[vi], role="verifier")))
-                    else:
-                        downsized.append((key, m))
-                verifier_models = downsized
-            # v42.6.7b Eff #7b: verifier_count cap. When non-zero, only the
-            # first N verifiers from the pool are used. Saves N*field LLM
-            # calls per trial on throughput runs.
-            verifier_count = getattr(config.orchestrator, "verifier_count", 0)
-            if verifier_count and 0 < verifier_count < len(verifier_models):
-                verifier_models = verifier_models[:verifier_count]
-
-            all_opinions = {}  # (nct_id, field_name) → [opinions]
-            for nct_id, ann in verify_items:
-                all_opinions[(nct_id, ann.field_name)] = []
-
-            total_verify = len(verify_items)
-            for model_key, model_cfg in verifier_models:
-                job.progress.current_agent = model_key
-                job.progress.current_model = model_cfg.name
-                logger.info(
-                    f"  Verifier {model_key} ({model_cfg.name}): "
-                    f"{total_verify} fields across {len(batch_annotations)} trials"
-                )
+            batch_idx_offset = job.progress.completed_trials
+            logger.info(
+                f"[{job.job_id}] Mini-batch: {len(batch_ncts)} trials "
+                f"({batch_idx_offset+1}-{batch_idx_offset+len(batch_ncts)}/{len(job.nct_ids)}, "
+                f"{job.lane} lane)"
+            )
 
-                for vi, (nct_id, annotation) in enumerate(verify_items):
+            # Ollama is shared with jobs in the other lane; hold the slot for
+            # the whole annotate→verify→finalize cycle so model-grouping holds.
+            job.progress.current_stage = "waiting_for_ollama"
+            async with work_scheduler.ollama_slot(job.lane):
+                # =================================================================
+                # Phase A: Annotate all trials in batch (annotation model stays loaded)
+                # =================================================================
+                job.progress.current_stage = "annotating"
+                batch_annotations = {}  # nct_id → (annotations, research, trial_start)
+                batch_errors = {}       # nct_id → error string
+
+                for j, nct_id in enumerate(batch_ncts):
                     if job.status == "cancelled":
                         break
+
+                    trial_start = _time.monotonic()
                     job.progress.current_nct_id = nct_id
-                    job.progress.current_field = annotation.field_name
-                    job.progress.verification_progress = (
-                        f"{model_key}: {vi+1}/{total_verify} fields"
+                    job.progress.elapsed_seconds = round(_time.monotonic() - pipeline_start, 1)
+                    job.updated_at = now_pacific()
+                    research = research_data.get(nct_id, [])
+                    logger.info(
+                        f"[{job.job_id}] Annotating {nct_id} "
+                        f"({batch_idx_offset+j+1}/{len(job.nct_ids)}, "
+                        f"batch {j+1}/{len(batch_ncts)})"
                     )
 
-                    research = batch_annotations[nct_id][1]
-                    opinion = await verifier.verify(
-                        nct_id=nct_id,
-                        field_name=annotation.field_name,
-                        research_results=research,
-                        model_name=model_key,
-                        ollama_model=model_cfg.name,
-                    )
-                    # v17: Retry once on timeout/failure
-                    # v28: Also retry parse failures; use reduced evidence (8 citations)
-                    should_retry = (
-                        (opinion.confidence == 0.0
-                         and opinion.suggested_value is None
-                         and "failed" in (opinion.reasoning or "").lower())
-                        or opinion.parse_failed
-                    )
-                    if should_retry:
-                        logger.warning(
-                            f"  Verifier {model_key} failed for {nct_id}/{annotation.field_name} — "
-                            f"retrying with reduced evidence..."
-                        )
-                        import asyncio as _asyncio
-                        await _asyncio.sleep(5)
-                        retry_opinion = await verifier.verify(
-                            nct_id=nct_id,
-                            field_name=annotation.field_name,
-                            research_results=research,
-                            model_name=model_key,
-                            ollama_model=model_cfg.name,
-                            max_citations_override=8,
+                    try:
+                        # Audit trail: bind every LLM call made while annotating this
+                        # trial to its nct_id. Reset afterwards so the batched
+                        # cross-trial verifier calls (which run without a trial
+                        # context) are not misattributed to the last trial.
+                        _trial_audit_token = audit_recorder.set_context(
+                            nct_id=nct_id, field="", stage="annotation"
                         )
-                        if retry_opinion.suggested_value is not None:
-                            logger.info(
-                                f"  Verifier {model_key} retry SUCCEEDED for "
-                                f"{nct_id}/{annotation.field_name}: {retry_opinion.suggested_value}"
-                            )
-                            opinion = retry_opinion
-                        else:
-                            logger.warning(
-                                f"  Verifier {model_key} retry FAILED for "
-                                f"{nct_id}/{annotation.field_name} — accepting failure"
-                            )
-                            job.progress.warnings.append(
-                                f"TIMEOUT [{nct_id}]: {model_key} ({model_cfg.name}) "
-                                f"failed for {annotation.field_name} after retry"
-                            )
-                        job.progress.retries["verification"] = (
-                            job.progress.retries.get("verification", 0) + 1
+                        try:
+                            with tracer.span(f"annotate {nct_id}", "trial"):
+                                annotations = await self._run_annotation(
+                                    nct_id, research, config, job
+                                )
+                        finally:
+                            audit_recorder.reset(_trial_audit_token)
+                        # Snapshot pre-consistency values for EDAM learning
+                        pre_consistency = {a.field_name: a.value for a in annotations}
+                        with tracer.span("enforce_consistency", "post", nct_id=nct_id):
+                            self._enforce_consistency(annotations, research_data=research)
+                        # Store consistency overrides as EDAM corrections
+                        self._store_consistency_overrides(
+                            nct_id, job.job_id, annotations,
+                            pre_consistency, job.config_snapshot,
                         )
-                    all_opinions[(nct_id, annotation.field_name)].append(opinion)
-
-            # Consensus checks (no LLM calls)
-            job.progress.current_agent = "consensus"
-            job.progress.current_model = None
-            job.progress.verification_progress = "checking consensus"
-
-            checker = ConsensusChecker()
-            threshold = config.verification.consensus_threshold
-            reconcile_queue = []  # [(nct_id, annotation, consensus)]
-            consensus_by_trial = {nct_id: list(skip_results[nct_id]) for nct_id in batch_annotations}
-
-            for nct_id, annotation in verify_items:
-                opinions = all_opinions[(nct_id, annotation.field_name)]
-                consensus = checker.check(
-                    field_name=annotation.field_name,
-                    primary_value=annotation.value,
-                    primary_model="primary",
-                    verifier_opinions=opinions,
-                    threshold=threshold,
-                )
-                consensus.primary_confidence = annotation.confidence
-
-                if not consensus.consensus_reached:
-                    # High-confidence primary protection.
-                    # v31: Two paths to protect the primary:
-                    #   1. At least one verifier agrees (agreement_ratio > 0)
-                    #   2. Unanimous dissent, but all dissenters are low-confidence
-                    #      (avg < 0.55) — uncertain models shouldn't override
-                    #      a confident primary.
-                    dissenting = [o for o in consensus.opinions if not o.agrees]
-                    verifier_max_conf = max(
-                        (o.confidence for o in dissenting),
-                        default=0.0,
-                    )
-                    avg_dissent_conf = (
-                        sum(o.confidence for o in dissenting) / len(dissenting)
-                        if dissenting else 0.0
-                    )
-                    # v31: Also check evidence grade — db-confirmed annotations
-                    # require stronger dissent to override
-                    evidence_grade = getattr(annotation, "evidence_grade", "llm")
-                    override_conf_bar = 0.8 if evidence_grade == "db_confirmed" else 0.7
-
-                    if (annotation.confidence > 0.85
-                            and verifier_max_conf <= override_conf_bar
-                            and (consensus.agreement_ratio > 0.0
-                                 or avg_dissent_conf < 0.55)):
-                        consensus.final_value = annotation.value
-                        consensus.consensus_reached = True
-                        consensus.reconciler_used = False
-                        consensus.reconciler_reasoning = (
-                            f"Primary override: confidence {annotation.confidence:.2f} "
-                            f"> 0.85, dissenting verifiers avg {avg_dissent_conf:.2f}"
+                        batch_annotations[nct_id] = (annotations, research, trial_start)
+                    except Exception as e:
+                        logger.error(f"[{job.job_id}] Annotation error for {nct_id}: {e}")
+                        batch_errors[nct_id] = str(e)
+                        audit_recorder.discard(nct_id)  # drop any captured calls
+                        work_scheduler.abandon(
+                            STAGE_ANNOTATION, WorkItemKey(nct_id, config_hash, job.commit_hash)
                         )
-                    else:
-                        reconcile_queue.append((nct_id, annotation, consensus))
-                        continue
-
-                if not consensus.consensus_reached:
-                    any_flagged_by_trial[nct_id] = True
-                    flag_reasons_by_trial[nct_id].append(f"{annotation.field_name}: model disagreement")
+                        # Persist error result immediately
+                        metadata = TrialMetadata(nct_id=nct_id)
+                        trial_output = {
+                            "nct_id": nct_id,
+                            "metadata": metadata.model_dump(),
+                            "annotations": [],
+                            "verification": None,
+                            "research_used": [],
+                            "research_results": [r.model_dump() for r in research],
+                            "error": str(e),
+                        }
+                        persistence.save_annotation_error(job.job_id, nct_id, trial_output)
+                        record(trial_output)
+                        job.progress.completed_trials += 1
+                        self._update_timing(job, trial_start, pipeline_start, trial_times)
+                        self._persist_job(job, trial_times)
+
+                if not batch_annotations:
+                    continue  # all errored
+
+                # =================================================================
+                # Phase B: Verify all trials model-grouped (3 model switches total)
+                # =================================================================
+                job.progress.current_stage = "verifying"
+                job.progress.elapsed_seconds = round(_time.monotonic() - pipeline_start, 1)
+                job.updated_at = now_pacific()
 
-                consensus_by_trial[nct_id].append(consensus)
+                batch_verified = {}  # nct_id → (annotations, verified)
+
+                # Collect all annotations that need verification across ALL trials
+                # Structure: {nct_id: {field_name: annotation}}
+                all_trial_annotations = {}
+                for nct_id, (annotations, research, _) in batch_annotations.items():
+                    all_trial_annotations[nct_id] = {a.field_name: a for a in annotations}
+
+                # Separate skip vs verify across all trials
+                skip_results = {}     # nct_id → [ConsensusResult]
+                verify_items = []     # [(nct_id, annotation)]
+                any_flagged_by_trial = {nct_id: False for nct_id in batch_annotations}
+                flag_reasons_by_trial = {nct_id: [] for nct_id in batch_annotations}
+
+                for nct_id, (annotations, _, _) in batch_annotations.items():
+                    skip_results[nct_id] = []
+                    for annotation in annotations:
+                        if annotation.skip_verification:
+                            skip_results[nct_id].append(ConsensusResult(
+                                field_name=annotation.field_name,
+                                original_value=annotation.value,
+                                final_value=annotation.value,
+                                consensus_reached=True,
+                                agreement_ratio=1.0,
+                                opinions=[],
+                            ))
+                        elif annotation.confidence < 0.2 and "[Below threshold" in (annotation.reasoning or ""):
+                            skip_results[nct_id].append(ConsensusResult(
+                                field_name=annotation.field_name,
+                                original_value=annotation.value,
+                                final_value="",
+                                consensus_reached=False,
+                                agreement_ratio=0.0,
+                                opinions=[],
+                                flag_reason="insufficient_evidence",
+                            ))
+                            any_flagged_by_trial[nct_id] = True
+                            flag_reasons_by_trial[nct_id].append(f"{annotation.field_name}: insufficient evidence")
+                        else:
+                            verify_items.append((nct_id, annotation))
 
-            # Batch reconciliation (one model load)
-            if reconcile_queue:
-                reconciler_model = None
-                for key, m in config.verification.models.items():
-                    if m.role == "reconciler":
-                        reconciler_model = m.name
-                        break
-                if config.orchestrator.hardware_profile == "server":
-                    reconciler_model = getattr(
-                        config.orchestrator, "server_premium_model", reconciler_model
+                # Model-grouped verification across ALL trials in batch
+                verifier = BlindVerifier()
+                verifier_models = [
+                    (key, m) for key, m in config.verification.models.items()
+                    if m.role == "verifier"
+                ]
+                server_verifiers = getattr(config.orchestrator, "server_verifiers", [])
+                if config.orchestrator.hardware_profile == "server" and server_verifiers:
+                    from app.models.config_models import ModelConfig
+                    upgraded = []
+                    for vi, (key, m) in enumerate(verifier_models):
+                        if vi < len(server_verifiers):
+                            upgraded.append((key, ModelConfig(name=server_verifiers[vi], role="verifier")))
+                        else:
+                            upgraded.append((key, m))
+                    verifier_models = upgraded
+                # v42.6.7 Eff #7: fast-model verifier override. When set,
+                # replaces verifier_1/2/3 names with smaller/faster models to
+                # 3x verifier throughput on high-volume jobs. Reconciliation
+                # still uses the reconciler model (larger); only the blind
+                # verifier pool gets downsized.
+                verifier_fast_models = getattr(config.orchestrator, "verifier_fast_models", [])
+                if verifier_fast_models:
+                    from app.models.config_models import ModelConfig
+                    downsized = []
+                    for vi, (key, m) in enumerate(verifier_models):
+                        if vi < len(verifier_fast_models):
+                            downsized.append((key, ModelConfig(name=verifier_fast_models[vi], role="verifier")))
+                        else:
+                            downsized.append((key, m))
+                    verifier_models = downsized
+                # v42.6.7b Eff #7b: verifier_count cap. When non-zero, only the
+                # first N verifiers from the pool are used. Saves N*field LLM
+                # calls per trial on throughput runs.
+                verifier_count = getattr(config.orchestrator, "verifier_count", 0)
+                if verifier_count and 0 < verifier_count < len(verifier_models):
+                    verifier_models = verifier_models[:verifier_count]
+
+                all_opinions = {}  # (nct_id, field_name) → [opinions]
+                for nct_id, ann in verify_items:
+                    all_opinions[(nct_id, ann.field_name)] = []
+
+                total_verify = len(verify_items)
+                for model_key, model_cfg in verifier_models:
+                    job.progress.current_agent = model_key
+                    job.progress.current_model = model_cfg.name
+                    logger.info(
+                        f"  Verifier {model_key} ({model_cfg.name}): "
+                        f"{total_verify} fields across {len(batch_annotations)} trials"
                     )
 
-                if reconciler_model:
-                    reconciler = ReconciliationAgent()
-                    job.progress.current_agent = "reconciler"
-                    job.progress.current_model = reconciler_model
-                    job.progress.verification_progress = f"reconciling {len(reconcile_queue)} fields"
-
-                    for nct_id, annotation, consensus in reconcile_queue:
+                    for vi, (nct_id, annotation) in enumerate(verify_items):
+                        if job.status == "cancelled":
+                            break
                         job.progress.current_nct_id = nct_id
                         job.progress.current_field = annotation.field_name
-                        research = batch_annotations[nct_id][1]
-
-                        consensus = await reconciler.reconcile(
-                            field_name=annotation.field_name,
-                            consensus_result=consensus,
-                            research_results=research,
-                            reconciler_model=reconciler_model,
-                            primary_confidence=annotation.confidence,
+                        job.progress.verification_progress = (
+                            f"{model_key}: {vi+1}/{total_verify} fields"
                         )
 
-                        if not consensus.consensus_reached:
-                            any_flagged_by_trial[nct_id] = True
-                            flag_reasons_by_trial[nct_id].append(
-                                f"{annotation.field_name}: model disagreement"
+                        research = batch_annotations[nct_id][1]
+                        with tracer.span(
+                            f"verify {annotation.field_name}", "verify", nct_id=nct_id,
+                            field=annotation.field_name, verifier=model_key,
+                        ):
+                            opinion = await verifier.verify(
+                                nct_id=nct_id,
+                                field_name=annotation.field_name,
+                                research_results=research,
+                                model_name=model_key,
+                                ollama_model=model_cfg.name,
+                            )
+                        # v17: Retry once on timeout/failure
+                        # v28: Also retry parse failures; use reduced evidence (8 citations)
+                        should_retry = (
+                            (opinion.confidence == 0.0
+                             and opinion.suggested_value is None
+                             and "failed" in (opinion.reasoning or "").lower())
+                            or opinion.parse_failed
+                        )
+                        if should_retry:
+                            logger.warning(
+                                f"  Verifier {model_key} failed for {nct_id}/{annotation.field_name} — "
+                                f"retrying with reduced evidence..."
+                            )
+                            import asyncio as _asyncio
+                            await _asyncio.sleep(5)
+                            with tracer.span(
+                                f"verify {annotation.field_name} (retry)", "verify",
+                                nct_id=nct_id, field=annotation.field_name, verifier=model_key,
+                            ):
+                                retry_opinion = await verifier.verify(
+                                    nct_id=nct_id,
+                                    field_name=annotation.field_name,
+                                    research_results=research,
+                                    model_name=model_key,
+                                    ollama_model=model_cfg.name,
+                                    max_citations_override=8,
+                                )
+                            if retry_opinion.suggested_value is not None:
+                                logger.info(
+                                    f"  Verifier {model_key} retry SUCCEEDED for "
+                                    f"{nct_id}/{annotation.field_name}: {retry_opinion.suggested_value}"
+                                )
+                                opinion = retry_opinion
+                            else:
+                                logger.warning(
+                                    f"  Verifier {model_key} retry FAILED for "
+                                    f"{nct_id}/{annotation.field_name} — accepting failure"
+                                )
+                                job.progress.warnings.append(
+                                    f"TIMEOUT [{nct_id}]: {model_key} ({model_cfg.name}) "
+                                    f"failed for {annotation.field_name} after retry"
+                                )
+                            job.progress.retries["verification"] = (
+                                job.progress.retries.get("verification", 0) + 1
                             )
+                        all_opinions[(nct_id, annotation.field_name)].append(opinion)
 
-                        consensus_by_trial[nct_id].append(consensus)
+                # Consensus checks (no LLM calls)
+                job.progress.current_agent = "consensus"
+                job.progress.current_model = None
+                job.progress.verification_progress = "checking consensus"
 
-            # =================================================================
-            # Phase C: Finalize + persist each trial
-            # =================================================================
-            job.progress.current_stage = "saving"
-            job.progress.verification_progress = None
-            job.progress.current_field = None
-            job.progress.current_agent = None
-            job.progress.current_model = None
+                checker = ConsensusChecker()
+                threshold = config.verification.consensus_threshold
+                reconcile_queue = []  # [(nct_id, annotation, consensus)]
+                consensus_by_trial = {nct_id: list(skip_results[nct_id]) for nct_id in batch_annotations}
 
-            for nct_id, (annotations, research, trial_start) in batch_annotations.items():
-                try:
-                    verified = VerifiedAnnotation(
-                        nct_id=nct_id,
-                        fields=consensus_by_trial.get(nct_id, []),
-                        overall_consensus=not any_flagged_by_trial.get(nct_id, False),
-                        flagged_for_review=any_flagged_by_trial.get(nct_id, False),
-                        flag_reason="; ".join(flag_reasons_by_trial.get(nct_id, [])) or None,
+                for nct_id, annotation in verify_items:
+                    opinions = all_opinions[(nct_id, annotation.field_name)]
+                    consensus = checker.check(
+                        field_name=annotation.field_name,
+                        primary_value=annotation.value,
+                        primary_model="primary",
+                        verifier_opinions=opinions,
+                        threshold=threshold,
                     )
+                    consensus.primary_confidence = annotation.confidence
+
+                    if not consensus.consensus_reached:
+                        # High-confidence primary protection.
+                        # v31: Two paths to protect the primary:
+                        #   1. At least one verifier agrees (agreement_ratio > 0)
+                        #   2. Unanimous dissent, but all dissenters are low-confidence
+                        #      (avg < 0.55) — uncertain models shouldn't override
+                        #      a confident primary.
+                        dissenting = [o for o in consensus.opinions if not o.agrees]
+                        verifier_max_conf = max(
+                            (o.confidence for o in dissenting),
+                            default=0.0,
+                        )
+                        avg_dissent_conf = (
+                            sum(o.confidence for o in dissenting) / len(dissenting)
+                            if dissenting else 0.0
+                        )
+                        # v31: Also check evidence grade — db-confirmed annotations
+                        # require stronger dissent to override
+                        evidence_grade = getattr(annotation, "evidence_grade", "llm")
+                        override_conf_bar = 0.8 if evidence_grade == "db_confirmed" else 0.7
+
+                        if (annotation.confidence > 0.85
+                                and verifier_max_conf <= override_conf_bar
+                                and (consensus.agreement_ratio > 0.0
+                                     or avg_dissent_conf < 0.55)):
+                            consensus.final_value = annotation.value
+                            consensus.consensus_reached = True
+                            consensus.reconciler_used = False
+                            consensus.reconciler_reasoning = (
+                                f"Primary override: confidence {annotation.confidence:.2f} "
+                                f"> 0.85, dissenting verifiers avg {avg_dissent_conf:.2f}"
+                            )
+                        else:
+                            reconcile_queue.append((nct_id, annotation, consensus))
+                            continue
 
-                    # Peptide cascade re-verification
-                    annotations, verified = await self._peptide_cascade_check(
-                        nct_id, annotations, verified, research, config
-                    )
-                    self._enforce_post_verification_consistency(verified)
-                    self._normalize_final_values(verified)
-
-                    # v38: Reconciliation corrections DISABLED for EDAM learning.
-                    # Reconciler decisions are unreliable (hallucinations, assumptions,
-                    # overriding correct answers) and dominated 91.6% of EDAM corrections,
-                    # poisoning the learning signal. Logged for diagnostics only.
-                    # self._store_reconciliation_corrections(
-                    #     nct_id, job.job_id, verified,
-                    #     ann_by_field, job.config_snapshot,
-                    # )
-
-                    metadata = self._extract_metadata(nct_id, research)
-                    research_coverage = self._build_research_coverage(research)
-
-                    trial_output = {
-                        "nct_id": nct_id,
-                        "metadata": metadata.model_dump(),
-                        "annotations": [a.model_dump() for a in annotations],
-                        "verification": verified.model_dump(),
-                        "research_used": [r.agent_name for r in research],
-                        "research_results": [r.model_dump() for r in research],
-                        "research_coverage": research_coverage,
-                    }
-                    persistence.save_annotation(job.job_id, nct_id, trial_output)
-                    # Audit trail: write the per-trial LLM input/output document
-                    # next to the annotation JSON. Best-effort — never fail the job.
-                    try:
-                        audit_md = audit_recorder.render_markdown(
-                            nct_id, trial_output, audit_recorder.pop_calls(nct_id)
+                    if not consensus.consensus_reached:
+                        any_flagged_by_trial[nct_id] = True
+                        flag_reasons_by_trial[nct_id].append(f"{annotation.field_name}: model disagreement")
+
+                    consensus_by_trial[nct_id].append(consensus)
+
+                # Batch reconciliation (one model load)
+                if reconcile_queue:
+                    reconciler_model = None
+                    for key, m in config.verification.models.items():
+                        if m.role == "reconciler":
+                            reconciler_model = m.name
+                            break
+                    if config.orchestrator.hardware_profile == "server":
+                        reconciler_model = getattr(
+                            config.orchestrator, "server_premium_model", reconciler_model
                         )
-                        persistence.save_audit(job.job_id, nct_id, audit_md)
-                    except Exception as _audit_e:
-                        logger.debug(f"audit-trail write failed for {nct_id}: {_audit_e}")
-                    all_trial_results.append(trial_output)
-
-                    if verified.flagged_for_review:
-                        self._queue_for_review(
-                            job.job_id, nct_id, annotations, verified,
-                            commit_hash=job.commit_hash,
-                            created_at=job.started_at.isoformat() if job.started_at else "",
+
+                    if reconciler_model:
+                        reconciler = ReconciliationAgent()
+                        job.progress.current_agent = "reconciler"
+                        job.progress.current_model = reconciler_model
+                        job.progress.verification_progress = f"reconciling {len(reconcile_queue)} fields"
+
+                        for nct_id, annotation, consensus in reconcile_queue:
+                            job.progress.current_nct_id = nct_id
+                            job.progress.current_field = annotation.field_name
+                            research = batch_annotations[nct_id][1]
+
+                            with tracer.span(
+                                f"reconcile {annotation.field_name}", "verify",
+                                nct_id=nct_id, field=annotation.field_name,
+                            ):
+                                consensus = await reconciler.reconcile(
+                                    field_name=annotation.field_name,
+                                    consensus_result=consensus,
+                                    research_results=research,
+                                    reconciler_model=reconciler_model,
+                                    primary_confidence=annotation.confidence,
+                                )
+
+                            if not consensus.consensus_reached:
+                                any_flagged_by_trial[nct_id] = True
+                                flag_reasons_by_trial[nct_id].append(
+                                    f"{annotation.field_name}: model disagreement"
+                                )
+
+                            consensus_by_trial[nct_id].append(consensus)
+
+                # =================================================================
+                # Phase C: Finalize + persist each trial
+                # =================================================================
+                job.progress.current_stage = "saving"
+                job.progress.verification_progress = None
+                job.progress.current_field = None
+                job.progress.current_agent = None
+                job.progress.current_model = None
+
+                for nct_id, (annotations, research, trial_start) in batch_annotations.items():
+                    try:
+                        verified = VerifiedAnnotation(
+                            nct_id=nct_id,
+                            fields=consensus_by_trial.get(nct_id, []),
+                            overall_consensus=not any_flagged_by_trial.get(nct_id, False),
+                            flagged_for_review=any_flagged_by_trial.get(nct_id, False),
+                            flag_reason="; ".join(flag_reasons_by_trial.get(nct_id, [])) or None,
                         )
 
-                    job.progress.completed_trials += 1
-                    self._update_timing(job, trial_start, pipeline_start, trial_times)
+                        # Peptide cascade re-verification
+                        with tracer.span("peptide_cascade_check", "post", nct_id=nct_id):
+                            annotations, verified = await self._peptide_cascade_check(
+                                nct_id, annotations, verified, research, config
+                            )
+                        with tracer.span("post_verification", "post", nct_id=nct_id):
+                            self._enforce_post_verification_consistency(verified)
+                            self._normalize_final_values(verified)
+
+                        # v38: Reconciliation corrections DISABLED for EDAM learning.
+                        # Reconciler decisions are unreliable (hallucinations, assumptions,
+                        # overriding correct answers) and dominated 91.6% of EDAM corrections,
+                        # poisoning the learning signal. Logged for diagnostics only.
+                        # self._store_reconciliation_corrections(
+                        #     nct_id, job.job_id, verified,
+                        #     ann_by_field, job.config_snapshot,
+                        # )
+
+                        metadata = self._extract_metadata(nct_id, research)
+                        research_coverage = self._build_research_coverage(research)
 
-                except Exception as e:
-                    logger.error(f"[{job.job_id}] Finalize error for {nct_id}: {e}")
-                    # Only append if this NCT wasn't already added (avoids duplicates
-                    # when persistence fails after annotation succeeded)
-                    if not any(t["nct_id"] == nct_id for t in all_trial_results):
-                        metadata = TrialMetadata(nct_id=nct_id)
                         trial_output = {
                             "nct_id": nct_id,
                             "metadata": metadata.model_dump(),
                             "annotations": [a.model_dump() for a in annotations],
-                            "verification": None,
+                            "verification": verified.model_dump(),
                             "research_used": [r.agent_name for r in research],
                             "research_results": [r.model_dump() for r in research],
-                            "error": str(e),
+                            "research_coverage": research_coverage,
                         }
-                        all_trial_results.append(trial_output)
-                    job.progress.completed_trials += 1
-                    self._update_timing(job, trial_start, pipeline_start, trial_times)
+                        persistence.save_annotation(job.job_id, nct_id, trial_output)
+                        if dedup:
+                            work_scheduler.complete(
+                                STAGE_ANNOTATION,
+                                WorkItemKey(nct_id, config_hash, job.commit_hash),
+                                job.job_id,
+                            )
+                        # Audit trail: write the per-trial LLM input/output document
+                        # next to the annotation JSON. Best-effort — never fail the job.
+                        try:
+                            audit_md = audit_recorder.render_markdown(
+                                nct_id, trial_output, audit_recorder.pop_calls(nct_id)
+                            )
+                            persistence.save_audit(job.job_id, nct_id, audit_md)
+                        except Exception as _audit_e:
+                            logger.debug(f"audit-trail write failed for {nct_id}: {_audit_e}")
+                        record(trial_output)
+                        tracer.flush(job.job_id)
+
+                        if verified.flagged_for_review:
+                            self._queue_for_review(
+                                job.job_id, nct_id, annotations, verified,
+                                commit_hash=job.commit_hash,
+                                created_at=job.started_at.isoformat() if job.started_at else "",
+                            )
+
+                        job.progress.completed_trials += 1
+                        self._update_timing(job, trial_start, pipeline_start, trial_times)
+
+                    except Exception as e:
+                        logger.error(f"[{job.job_id}] Finalize error for {nct_id}: {e}")
+                        work_scheduler.abandon(
+                            STAGE_ANNOTATION, WorkItemKey(nct_id, config_hash, job.commit_hash)
+                        )
+                        # Only append if this NCT wasn't already added (avoids duplicates
+                        # when persistence fails after annotation succeeded)
+                        if nct_id not in done_ncts:
+                            metadata = TrialMetadata(nct_id=nct_id)
+                            trial_output = {
+                                "nct_id": nct_id,
+                                "metadata": metadata.model_dump(),
+                                "annotations": [a.model_dump() for a in annotations],
+                                "verification": None,
+                                "research_used": [r.agent_name for r in research],
+                                "research_results": [r.model_dump() for r in research],
+                                "error": str(e),
+                            }
+                            try:
+                                persistence.save_annotation_error(job.job_id, nct_id, trial_output)
+                            except Exception as _persist_e:
+                                logger.debug(f"error-result write failed for {nct_id}: {_persist_e}")
+                            record(trial_output)
+                        job.progress.completed_trials += 1
+                        self._update_timing(job, trial_start, pipeline_start, trial_times)
+
+                self._persist_job(job, trial_times)
+
+        return tally, trial_times
+
+    @staticmethod
+    def _load_research(
+        persistence: PersistenceService, job_id: str, nct_id: str
+    ) -> list[ResearchResult]:
+        """Load a trial's persisted research and register its EvidenceBundle.
+
+        The persisted evidence index is reused when it matches; research
+        saved before bundles existed gets its bundle built here.
+        """
+        loaded = persistence.load_research_with_index(job_id, nct_id)
+        if loaded is None:
+            return []
+        results, index = loaded
+        return list(evidence_bundles.build(nct_id, results, index=index).results)
+
+    async def _adopt_research(
+        self,
+        job: AnnotationJob,
+        nct_id: str,
+        key: WorkItemKey,
+        persistence: PersistenceService,
+    ) -> Optional[list[ResearchResult]]:
+        """Reuse research another job produced for the same work item.
+
+        Waits for an in-flight owner if there is one. Returns the copied
+        results, or None when this job must research the trial itself (it
+        then holds the claim and must complete or abandon it).
+        """
+        while True:
+            src = work_scheduler.completed_source(STAGE_RESEARCH, key)
+            if src and src != job.job_id:
+                loaded = persistence.load_research_with_index(src, nct_id)
+                if loaded is not None:
+                    bundle = evidence_bundles.build(nct_id, loaded[0], index=loaded[1])
+                    persistence.save_research(
+                        job.job_id, nct_id, list(bundle.results),
+                        evidence_index=bundle.to_index(),
+                    )
+                    loaded = list(bundle.results)
+                    work_scheduler.record_reuse(STAGE_RESEARCH)
+                    logger.info(f"[{job.job_id}] Reused research for {nct_id} from job {src}")
+                    return loaded
+                work_scheduler.forget(STAGE_RESEARCH, key)
+            owner = work_scheduler.claim(STAGE_RESEARCH, key, job.job_id)
+            if owner is None:
+                return None
+            await owner
+
+    def _adopt_annotation(
+        self,
+        job: AnnotationJob,
+        nct_id: str,
+        key: WorkItemKey,
+        persistence: PersistenceService,
+    ) -> Optional[dict]:
+        """Copy a finished annotation for the same work item from another job.
 
-            self._persist_job(job, trial_times)
+        The trial output, its audit trail and any review-queue entries are
+        duplicated under this job. Returns None if no usable result exists.
+        """
+        src = work_scheduler.completed_source(STAGE_ANNOTATION, key)
+        if not src or src == job.job_id:
+            return None
+        trial_output = persistence.load_annotation(src, nct_id)
+        if not trial_output or trial_output.get("error"):
+            work_scheduler.forget(STAGE_ANNOTATION, key)
+            return None
 
-        return all_trial_results, trial_times
+        trial_output = {**trial_output, "deduplicated_from": src}
+        persistence.save_annotation(job.job_id, nct_id, trial_output)
+        audit_md = persistence.load_audit(src, nct_id)
+        if audit_md:
+            persistence.save_audit(job.job_id, nct_id, audit_md)
+
+        verification = trial_output.get("verification") or {}
+        if verification.get("flagged_for_review"):
+            try:
+                self._queue_for_review(
+                    job.job_id, nct_id,
+                    [FieldAnnotation(**a) for a in trial_output.get("annotations", [])],
+                    VerifiedAnnotation(**verification),
+                    commit_hash=job.commit_hash,
+                    created_at=job.started_at.isoformat() if job.started_at else "",
+                )
+            except Exception as e:
+                logger.debug(f"review-queue copy failed for {nct_id}: {e}")
+
+        work_scheduler.record_reuse(STAGE_ANNOTATION)
+        logger.info(f"[{job.job_id}] Reused annotation for {nct_id} from job {src}")
+        return trial_output
 
     async def _run_research(
         self,
@@ -1178,7 +1598,7 @@ class PipelineOrchestrator:
         if proto_config and "clinical_protocol" in RESEARCH_AGENTS:
             proto_agent = RESEARCH_AGENTS["clinical_protocol"]()
             try:
-                proto_result = await proto_agent.research(nct_id)
+                proto_result = await self._traced_research(proto_agent, nct_id)
                 results.append(proto_result)
                 logger.info(f"  clinical_protocol: {len(proto_result.citations)} citations")
 
@@ -1231,7 +1651,11 @@ class PipelineOrchestrator:
 
                     # Layer 1: Resolve drug names (abbreviations/brand names → generic + synonyms)
                     try:
-                        await self._resolve_drug_names(proto_result, interventions, config, nct_id)
+                        with tracer.span("resolve_drug_names", "research", nct_id=nct_id,
+                                         interventions=len(interventions)):
+                            await self._resolve_drug_names(
+                                proto_result, interventions, config, nct_id
+                            )
                         logger.info(
                             f"  Resolved drug names: "
                             f"{[(i['name'], i.get('resolved', [])) for i in interventions]}"
@@ -1266,6 +1690,7 @@ class PipelineOrchestrator:
             job.progress.eff_firings["amp_skip"] = (
                 job.progress.eff_firings.get("amp_skip", 0) + 1
             )
+            EFF_FIRINGS.labels("amp_skip").inc()
 
         # Step 2: Run all other agents in parallel with metadata
         tasks = {}
@@ -1278,7 +1703,7 @@ class PipelineOrchestrator:
             if not agent_config:
                 continue
             agent = agent_cls()
-            tasks[agent_name] = agent.research(nct_id, metadata=metadata)
+            tasks[agent_name] = self._traced_research(agent, nct_id, metadata=metadata)
 
         if config.orchestrator.parallel_research and len(tasks) > 1:
             # Run in parallel
@@ -1317,6 +1742,17 @@ class PipelineOrchestrator:
 
         return results
 
+    @staticmethod
+    async def _traced_research(agent, nct_id: str, metadata: Optional[dict] = None):
+        """Run one research agent inside a trace span."""
+        with tracer.span(agent.agent_name, "research", nct_id=nct_id) as span:
+            if metadata is None:
+                result = await agent.research(nct_id)
+            else:
+                result = await agent.research(nct_id, metadata=metadata)
+            span.set(citations=len(result.citations), error=result.error)
+            return result
+
     async def _resolve_drug_names(
         self,
         proto_result: ResearchResult,
@@ -1579,7 +2015,10 @@ class PipelineOrchestrator:
             # audit document attributes each input/output to the right field.
             _af_token = audit_recorder.set_context(field=field_name, stage="annotation")
             try:
-                return await _annotate_field_impl(field_name, metadata)
+                with tracer.span(f"annotate {field_name}", "annotate") as span:
+                    ann = await _annotate_field_impl(field_name, metadata)
+                    span.set(value=ann.value, model=getattr(ann, "model_name", None))
+                    return ann
             finally:
                 audit_recorder.reset(_af_token)
 
@@ -1661,6 +2100,7 @@ class PipelineOrchestrator:
             job.progress.eff_firings["pregate"] = (
                 job.progress.eff_firings.get("pregate", 0) + 1
             )
+            EFF_FIRINGS.labels("pregate").inc()
         else:
             try:
                 peptide_ann = await annotate_field("peptide")
@@ -1671,7 +2111,7 @@ class PipelineOrchestrator:
                     reasoning=f"Agent error: {e}",
                 )
         annotations.append(peptide_ann)
-        job.progress.field_timings["peptide"] = round(_field_time.monotonic() - _field_start, 1)
+        self._record_field_timing(job, "peptide", _field_time.monotonic() - _field_start)
         job.progress.current_model = getattr(peptide_ann, "model_name", None)
         shared_metadata["peptide_result"] = peptide_ann.value
 
@@ -1816,12 +2256,12 @@ class PipelineOrchestrator:
                         value="Unknown",
                         reasoning=f"Agent error: {e}",
                     ))
-                job.progress.field_timings[field] = round(_field_time.monotonic() - _sf, 1)
+                self._record_field_timing(job, field, _field_time.monotonic() - _sf)
         # Record step 2 timing for parallel fields
         if config.orchestrator.parallel_annotation:
-            step2_elapsed = round(_field_time.monotonic() - _step2_start, 1)
+            step2_elapsed = _field_time.monotonic() - _step2_start
             for field in step2_fields:
-                job.progress.field_timings[field] = step2_elapsed
+                self._record_field_timing(job, field, step2_elapsed)
             for ann in annotations:
                 if ann.field_name in step2_fields and hasattr(ann, "model_name"):
                     job.progress.current_model = ann.model_name
@@ -1870,7 +2310,9 @@ class PipelineOrchestrator:
                     reasoning=f"Agent error: {e}",
                 )
             annotations.append(failure_ann)
-            job.progress.field_timings["reason_for_failure"] = round(_field_time.monotonic() - _rf_start, 1)
+            self._record_field_timing(
+                job, "reason_for_failure", _field_time.monotonic() - _rf_start
+            )
 
         # v42 B3: shadow-mode reason_for_failure_atomic. Gated on its own shadow
         # flag AND on outcome_atomic having produced a failed label — the agent
@@ -1889,8 +2331,8 @@ class PipelineOrchestrator:
                     reasoning=f"Agent error: {e}",
                 )
             annotations.append(fra_ann)
-            job.progress.field_timings["reason_for_failure_atomic"] = round(
-                _field_time.monotonic() - _fra_start, 1
+            self._record_field_timing(
+                job, "reason_for_failure_atomic", _field_time.monotonic() - _fra_start
             )
 
         # v42 Phase 6 cut-over: failure_reason prefer-atomic swap. Must run
@@ -3060,6 +3502,12 @@ class PipelineOrchestrator:
 
         return issues
 
+    @staticmethod
+    def _record_field_timing(job: AnnotationJob, field: str, seconds: float) -> None:
+        """Record a field's wall time on the job and in the metrics registry."""
+        job.progress.field_timings[field] = round(seconds, 1)
+        FIELD_DURATION.labels(field).observe(seconds)
+
     @staticmethod
     def _update_timing(
         job: AnnotationJob,
@@ -3077,6 +3525,7 @@ class PipelineOrchestrator:
 
         trial_elapsed = _time.monotonic() - trial_start
         trial_times.append(trial_elapsed)
+        TRIAL_DURATION.observe(trial_elapsed)
 
         total_elapsed = _time.monotonic() - pipeline_start
         job.progress.elapsed_seconds = round(total_elapsed, 1)
@@ -3122,8 +3571,9 @@ class PipelineOrchestrator:
     @staticmethod
     def _log_job_diagnostics(
         job_id: str,
-        all_trial_results: list[dict],
+        tally: "_TrialTally",
         trial_times: list[float],
+        timeout_stats: dict[str, int],
     ) -> None:
         """v17: Post-job diagnostics summary.
 
@@ -3152,8 +3602,7 @@ class PipelineOrchestrator:
                     f"({total_excess/60:.1f} min) above average"
                 )
 
-        # 2. Timeout stats from Ollama client
-        timeout_stats = ollama_client.get_timeout_stats()
+        # 2. Timeout stats from Ollama client (this job's share)
         if timeout_stats:
             total_timeouts = sum(timeout_stats.values())
             logger.warning(
@@ -3162,20 +3611,10 @@ class PipelineOrchestrator:
         else:
             logger.info(f"[{job_id}] Timeouts: none")
 
-        # 3. Quality issues in results
-        quality_issue_count = 0
-        empty_value_count = 0
-        zero_conf_count = 0
-        for trial in all_trial_results:
-            for ann in trial.get("annotations", []):
-                if not ann.get("value") and ann.get("field_name") != "sequence":
-                    empty_value_count += 1
-                if ann.get("confidence") == 0.0 and ann.get("value"):
-                    zero_conf_count += 1
-                # Check for error text in values
-                val = (ann.get("value") or "").lower()
-                if any(p in val for p in ["timeout", "error", "failed"]):
-                    quality_issue_count += 1
+        # 3. Quality issues in results (tallied as trials landed)
+        quality_issue_count = tally.error_in_value
+        empty_value_count = tally.empty_values
+        zero_conf_count = tally.zero_conf_with_value
 
         if quality_issue_count or empty_value_count or zero_conf_count:
             logger.warning(
@@ -3581,3 +4020,14 @@ class PipelineOrchestrator:
 
 # Module-level singleton
 orchestrator = PipelineOrchestrator()
+job_events.set_source(lambda: [s.model_dump(mode="json") for s in orchestrator.list_jobs()])
+
+
+@metrics.register_collector
+def _collect_orchestrator():
+    yield ("agent_annotate_queue_depth", "gauge", "Pending items per internal queue",
+           [({"queue": f"jobs_{lane}"}, orchestrator.queue_size(lane)) for lane in LANES])
+    yield ("agent_annotate_jobs_running", "gauge", "Jobs currently running",
+           [({}, orchestrator.active_count())])
+    yield ("agent_annotate_job_event_subscribers", "gauge", "Open job event streams",
+           [({}, job_events.stats()["subscribers"])])
@@ -11,8 +11,10 @@ Includes full citation/source traceability for each annotation field:
 import csv
 import io
 import json
+import os
 from pathlib import Path
 from datetime import datetime
+from typing import Iterable, Iterator, Optional
 
 from app.config import RESULTS_DIR
 from app.services.version_service import get_version_stamp
@@ -201,10 +203,11 @@ def _get_review_decisions(job_id: str) -> dict[str, "ReviewItem"]:
     reflect the latest review state.
     """
     decisions = {}
-    for item in review_service.get_all(job_id=job_id):
-        if item.status in ("approved", "overridden", "skipped"):
-            key = f"{item.nct_id}:{item.field_name}"
-            decisions[key] = item
+    for item in review_service.get_all(
+        job_id=job_id, status=("approved", "overridden", "skipped"),
+    ):
+        key = f"{item.nct_id}:{item.field_name}"
+        decisions[key] = item
     return decisions
 
 
@@ -371,45 +374,155 @@ def _extract_row(trial: dict, full: bool = False, version_info: dict = None,
     return row
 
 
-def generate_standard_csv(trials: list[dict], job_id: str = None) -> str:
-    output = io.StringIO()
+def iter_csv(trials: Iterable[dict], full: bool = False, config_snapshot: dict = None,
+             job_id: str = None) -> Iterator[str]:
+    """Yield a standard/full CSV export chunk by chunk: header, then one row per trial.
+
+    ``trials`` may be any iterable (e.g. PersistenceService.iter_annotations),
+    so a large job is never materialized as one string.
+    """
     version = get_version_stamp()
-    output.write(f"# Agent Annotate v{version['version']} | commit: {version['git_commit']} | {version['timestamp']}\n")
-    writer = csv.DictWriter(output, fieldnames=STANDARD_COLUMNS, extrasaction="ignore")
+    label = " (Full)" if full else ""
+    buf = io.StringIO()
+    buf.write(f"# Agent Annotate v{version['version']}{label} | commit: {version['git_commit']} | {version['timestamp']}\n")
+    writer = csv.DictWriter(buf, fieldnames=FULL_COLUMNS if full else STANDARD_COLUMNS,
+                            extrasaction="ignore")
     writer.writeheader()
+    yield buf.getvalue()
+    buf.seek(0)
+    buf.truncate()
     # Dynamically read review state each time (not cached from completion)
     review_decisions = _get_review_decisions(job_id) if job_id else {}
     for trial in trials:
-        writer.writerow(_extract_row(trial, full=False, review_decisions=review_decisions))
-    return output.getvalue()
+        if full:
+            writer.writerow(_extract_row(trial, full=True, version_info=version,
+                                         config_snapshot=config_snapshot,
+                                         review_decisions=review_decisions))
+        else:
+            writer.writerow(_extract_row(trial, full=False, review_decisions=review_decisions))
+        if buf.tell() >= 64 * 1024:
+            yield buf.getvalue()
+            buf.seek(0)
+            buf.truncate()
+    yield buf.getvalue()
+
+
+def generate_standard_csv(trials: list[dict], job_id: str = None) -> str:
+    return "".join(iter_csv(trials, full=False, job_id=job_id))
 
 
 def generate_full_csv(trials: list[dict], config_snapshot: dict = None,
                       job_id: str = None) -> str:
-    output = io.StringIO()
-    version = get_version_stamp()
-    output.write(f"# Agent Annotate v{version['version']} (Full) | commit: {version['git_commit']} | {version['timestamp']}\n")
-    writer = csv.DictWriter(output, fieldnames=FULL_COLUMNS, extrasaction="ignore")
-    writer.writeheader()
-    # Dynamically read review state each time (not cached from completion)
-    review_decisions = _get_review_decisions(job_id) if job_id else {}
-    for trial in trials:
-        writer.writerow(_extract_row(trial, full=True, version_info=version,
-                                     config_snapshot=config_snapshot,
-                                     review_decisions=review_decisions))
-    return output.getvalue()
+    return "".join(iter_csv(trials, full=True, config_snapshot=config_snapshot, job_id=job_id))
 
 
-def save_csv(job_id: str, csv_content: str, label: str = "standard") -> Path:
+def _csv_export_path(job_id: str, label: str) -> Path:
     csv_dir = RESULTS_DIR / "csv"
     csv_dir.mkdir(parents=True, exist_ok=True)
     timestamp = now_pacific().strftime("%Y%m%d_%H%M%S")
-    filename = f"{job_id}_{label}_{timestamp}.csv"
-    path = csv_dir / filename
+    return csv_dir / f"{job_id}_{label}_{timestamp}.csv"
+
+
+def save_csv(job_id: str, csv_content: str, label: str = "standard") -> Path:
+    path = _csv_export_path(job_id, label)
     path.write_text(csv_content)
     return path
 
 
+def stream_csv_to_file(chunks: Iterable[str], job_id: str,
+                       label: str = "standard") -> tuple[Path, Iterator[str]]:
+    """Tee a streamed CSV export into the same archive file save_csv writes.
+
+    Returns ``(path, generator)``; the file is complete once the generator
+    (e.g. a StreamingResponse body) is exhausted.
+    """
+    path = _csv_export_path(job_id, label)
+
+    def _tee() -> Iterator[str]:
+        with open(path, "w", newline="") as f:
+            for chunk in chunks:
+                f.write(chunk)
+                yield chunk
+
+    return path, _tee()
+
+
+# --- Live per-trial outputs (appended while a job runs) ---
+
+def live_output_paths(job_id: str) -> tuple[Path, Path]:
+    """Paths of a job's live standard CSV and JSONL."""
+    return (
+        RESULTS_DIR / "csv" / f"{job_id}_standard_live.csv",
+        RESULTS_DIR / "jsonl" / f"{job_id}.jsonl",
+    )
+
+
+def _write_live_csv_header(f, comment: Optional[str] = None) -> None:
+    if comment is None:
+        version = get_version_stamp()
+        comment = f"# Agent Annotate v{version['version']} (live) | commit: {version['git_commit']} | {version['timestamp']}\n"
+    f.write(comment)
+    csv.DictWriter(f, fieldnames=STANDARD_COLUMNS, extrasaction="ignore").writeheader()
+
+
+def init_live_outputs(job_id: str, keep: Optional[set[str]] = None) -> set[str]:
+    """Create a job's live CSV (with header) and JSONL if missing.
+
+    Existing files (a resumed job) are kept and appended to. Returns the NCT
+    IDs already written, so the caller appends only trials not yet there.
+    Repeated rows, and when ``keep`` is given rows for other NCTs (failed
+    trials the resume will retry), are dropped first so a retried trial
+    ends up with a single row. The rewrite streams the JSONL one line at a
+    time and rebuilds the CSV from it.
+    """
+    csv_path, jsonl_path = live_output_paths(job_id)
+    csv_path.parent.mkdir(parents=True, exist_ok=True)
+    jsonl_path.parent.mkdir(parents=True, exist_ok=True)
+    if not csv_path.exists() or not jsonl_path.exists():
+        with open(csv_path, "w", newline="") as f:
+            _write_live_csv_header(f)
+        jsonl_path.write_text("")
+        return set()
+
+    written: set[str] = set()
+    with open(csv_path) as f:
+        comment = f.readline()
+    csv_tmp = csv_path.with_suffix(".csv.tmp")
+    jsonl_tmp = jsonl_path.with_suffix(".jsonl.tmp")
+    with open(jsonl_path) as src, open(jsonl_tmp, "w") as jf, open(csv_tmp, "w", newline="") as cf:
+        _write_live_csv_header(cf, comment if comment.startswith("#") else None)
+        writer = csv.DictWriter(cf, fieldnames=STANDARD_COLUMNS, extrasaction="ignore")
+        for line in src:
+            try:
+                trial = json.loads(line)
+            except ValueError:
+                continue  # torn last line from a crash mid-append
+            nct_id = trial.get("nct_id", "")
+            if nct_id in written or (keep is not None and nct_id not in keep):
+                continue
+            written.add(nct_id)
+            jf.write(line if line.endswith("\n") else line + "\n")
+            writer.writerow(_extract_row(trial, full=False))
+    os.replace(jsonl_tmp, jsonl_path)
+    os.replace(csv_tmp, csv_path)
+    return written
+
+
+def append_live_output(job_id: str, trial: dict) -> None:
+    """Append one finished trial to the job's live CSV row and JSONL line.
+
+    Rows reflect the trial as annotated; review decisions made later show
+    up in the regular /csv export, not here.
+    """
+    csv_path, jsonl_path = live_output_paths(job_id)
+    with open(csv_path, "a", newline="") as f:
+        csv.DictWriter(f, fieldnames=STANDARD_COLUMNS, extrasaction="ignore").writerow(
+            _extract_row(trial, full=False)
+        )
+    with open(jsonl_path, "a") as f:
+        f.write(json.dumps(trial, default=str, separators=(",", ":")) + "\n")
+
+
 def _enrich_trial_json(trial: dict, config_snapshot: dict = None,
                        review_decisions: dict = None) -> dict:
     """Add structured traceability metadata to a trial dict for JSON output.
@@ -498,8 +611,15 @@ def _enrich_trial_json(trial: dict, config_snapshot: dict = None,
     return enriched
 
 
-def save_json_output(job_id: str, data: dict) -> Path:
-    """Save JSON output with traceability enrichment on each trial's annotations."""
+def save_json_output(job_id: str, data: dict,
+                     trials: Optional[Iterable[dict]] = None) -> Path:
+    """Save JSON output with traceability enrichment on each trial's annotations.
+
+    Trials come from ``data["trials"]`` or, when given, the ``trials``
+    iterable (e.g. PersistenceService.iter_annotations). They are enriched
+    and written one at a time, one compact trial per line, so the enriched
+    job is never built in memory. The file is replaced atomically.
+    """
     json_dir = RESULTS_DIR / "json"
     json_dir.mkdir(parents=True, exist_ok=True)
 
@@ -508,26 +628,32 @@ def save_json_output(job_id: str, data: dict) -> Path:
     # Dynamically read review state each time (not cached from completion)
     review_decisions = _get_review_decisions(job_id)
 
+    if trials is None:
+        trials = data.get("trials", [])
+
+    path = json_dir / f"{job_id}.json"
+    tmp_path = path.with_suffix(".json.tmp")
     # Deduplicate trials by nct_id (keep first occurrence)
     seen_ncts: set[str] = set()
-    unique_trials = []
-    for trial in data.get("trials", []):
-        nct_id = trial.get("nct_id", "")
-        if nct_id not in seen_ncts:
+    with open(tmp_path, "w") as f:
+        f.write("{\n")
+        for key, value in data.items():
+            if key != "trials":
+                f.write(f"  {json.dumps(key)}: {json.dumps(value, default=str)},\n")
+        f.write('  "trials": [')
+        sep = "\n    "
+        for trial in trials:
+            nct_id = trial.get("nct_id", "")
+            if nct_id in seen_ncts:
+                continue
             seen_ncts.add(nct_id)
-            unique_trials.append(trial)
-
-    # Enrich trials with traceability metadata
-    enriched_data = dict(data)
-    enriched_trials = []
-    for trial in unique_trials:
-        enriched_trials.append(_enrich_trial_json(trial, config_snapshot,
-                                                  review_decisions=review_decisions))
-    enriched_data["trials"] = enriched_trials
-
-    path = json_dir / f"{job_id}.json"
-    with open(path, "w") as f:
-        json.dump(enriched_data, f, indent=2, default=str)
+            f.write(sep)
+            json.dump(_enrich_trial_json(trial, config_snapshot,
+                                         review_decisions=review_decisions),
+                      f, default=str)
+            sep = ",\n    "
+        f.write("\n  ]\n}\n")
+    os.replace(tmp_path, path)
     return path
 
 
@@ -2,22 +2,58 @@
 Persistence service for intermediate pipeline state.
 
 Saves research and annotation results to disk for crash resilience
-and resumability. All writes are atomic (write to .tmp, then rename).
+and resumability. All writes are atomic (write to .tmp, then rename). Per-trial
+files and job state are written by the background ``persistence_writer``
+thread; loaders see queued writes before they land.
+
+Two indexes keep startup and resume from rescanning the results dir:
+
+- ``jobs/<job_id>.journal.jsonl``: an append-only journal with one record
+  per completed research / annotation step (with the file's sha256). The
+  writer appends a record only after the file has landed, so resume reads
+  the completed set from the journal. A trial whose file exists without a
+  record was cut off mid-write and is redone, as is one whose file no
+  longer matches its latest record's size and sha256. Jobs started before
+  journals existed have no ``begin`` record and fall back to listing
+  their dirs.
+- ``jobs/_index.json``: compact state of every job, updated on status
+  changes. When nothing in ``jobs/`` changed after it was written, startup
+  reads it plus the full state of active jobs and nothing else. Otherwise
+  it lists the dir, and reads full state files only for active jobs and
+  for files changed since the index was written.
 """
 
+import hashlib
 import json
-import os
 import logging
 from datetime import datetime
 from pathlib import Path
-from typing import Optional
+from typing import Iterator, Optional
 
 from app.models.job import now_pacific
 
 from app.models.research import ResearchResult
+from app.services.persistence_writer import (
+    DELETE,
+    append_lines,
+    persistence_writer,
+    serialize,
+    write_atomic,
+)
 
 logger = logging.getLogger("agent_annotate.persistence")
 
+# Statuses whose full state file is read on startup; the index has the rest.
+_ACTIVE_STATUSES = ("running", "queued")
+# Progress keys kept in the job index (what startup rebuilds a job from).
+_INDEX_PROGRESS_KEYS = (
+    "total_trials", "completed_trials", "researched_trials",
+    "elapsed_seconds", "avg_seconds_per_trial", "current_stage",
+)
+# results_dir -> {job_id: compact state}. Shared by every PersistenceService
+# instance for that dir, so status changes can be indexed without a reread.
+_job_indexes: dict[Path, dict[str, dict]] = {}
+
 
 class PersistenceService:
     """Manages disk I/O for intermediate pipeline state."""
@@ -54,12 +90,22 @@ class PersistenceService:
         meta_path = rdir / "_meta.json"
         if not meta_path.exists():
             self._atomic_write(meta_path, meta)
+            # A new job: from here on its journal is the completion record.
+            self._append_journal_now(job_id, {"step": "begin", "nct_ids": len(nct_ids)})
         return rdir
 
     def save_research(
-        self, job_id: str, nct_id: str, results: list[ResearchResult]
+        self,
+        job_id: str,
+        nct_id: str,
+        results: list[ResearchResult],
+        evidence_index: Optional[dict] = None,
     ) -> Path:
-        """Atomically save research results for a single trial."""
+        """Atomically save research results for a single trial.
+
+        ``evidence_index`` is the trial's EvidenceBundle index
+        (agents/evidence.py), stored alongside so resume doesn't rebuild it.
+        """
         rdir = self._research_dir(job_id)
         path = rdir / f"{nct_id}.json"
         data = {
@@ -67,19 +113,30 @@ class PersistenceService:
             "completed_at": now_pacific().strftime("%Y-%m-%d %H:%M:%S PT"),
             "results": [r.model_dump() for r in results],
         }
-        self._atomic_write(path, data)
+        if evidence_index is not None:
+            data["evidence_index"] = evidence_index
+        persistence_writer.submit(
+            path, data, journal=self._journal_entry(job_id, "research", nct_id)
+        )
         logger.debug(f"Saved research for {nct_id} -> {path}")
         return path
 
     def load_research(self, job_id: str, nct_id: str) -> Optional[list[ResearchResult]]:
         """Load research results for a single trial, or None if not found."""
+        loaded = self.load_research_with_index(job_id, nct_id)
+        return loaded[0] if loaded is not None else None
+
+    def load_research_with_index(
+        self, job_id: str, nct_id: str
+    ) -> Optional[tuple[list[ResearchResult], Optional[dict]]]:
+        """Load a trial's research results and its persisted evidence index."""
         path = self._research_dir(job_id) / f"{nct_id}.json"
-        if not path.exists():
-            return None
         try:
-            with open(path, "r") as f:
-                data = json.load(f)
-            return [ResearchResult(**r) for r in data.get("results", [])]
+            data = self._read_json(path)
+            if data is None:
+                return None
+            results = [ResearchResult(**r) for r in data.get("results", [])]
+            return results, data.get("evidence_index")
         except Exception as e:
             logger.warning(f"Failed to load research for {nct_id}: {e}")
             return None
@@ -96,16 +153,23 @@ class PersistenceService:
             logger.warning(f"Failed to load research meta for {job_id}: {e}")
             return None
 
-    def get_completed_research(self, job_id: str) -> set[str]:
-        """Return set of nct_ids that have completed research on disk."""
+    def get_completed_research(self, job_id: str, verify: bool = True) -> set[str]:
+        """Return set of nct_ids that have completed research on disk.
+
+        ``verify=False`` skips hashing the files against the journal (for
+        counts shown to users; resume itself verifies).
+        """
+        journal = self.read_journal(job_id)
+        if journal is not None:
+            return self._verified_steps(journal, "research", self._research_dir(job_id), verify)
         rdir = self._research_dir(job_id)
         if not rdir.exists():
             return set()
-        completed = set()
-        for f in rdir.iterdir():
-            if f.suffix == ".json" and f.name != "_meta.json" and not f.name.endswith(".tmp"):
-                completed.add(f.stem)
-        return completed
+        names = self._names_with_pending(rdir)
+        return {
+            n[: -len(".json")] for n in names
+            if n.endswith(".json") and n != "_meta.json"
+        }
 
     def research_exists(self, job_id: str) -> bool:
         """Check if research directory with meta exists for this job."""
@@ -127,51 +191,195 @@ class PersistenceService:
         """Atomically save annotation result for a single trial."""
         adir = self._annotations_dir(job_id)
         path = adir / f"{nct_id}.json"
-        self._atomic_write(path, trial_output)
+        persistence_writer.submit(
+            path, trial_output,
+            journal=self._journal_entry(
+                job_id, "annotation", nct_id,
+                verified=bool(trial_output.get("verification")),
+            ),
+        )
+        # A success supersedes an earlier failed attempt (resume retry).
+        error_path = adir / f"{nct_id}.error.json"
+        if error_path.exists() or persistence_writer.pending(error_path) is not None:
+            persistence_writer.submit(error_path, DELETE)
         logger.debug(f"Saved annotation for {nct_id} -> {path}")
         return path
 
+    def save_annotation_error(self, job_id: str, nct_id: str, trial_output: dict) -> Path:
+        """Atomically save a failed trial's output as ``{nct_id}.error.json``.
+
+        Kept apart from ``{nct_id}.json`` so resume still retries the trial;
+        exports and the final JSON read it via ``iter_annotations``.
+        """
+        adir = self._annotations_dir(job_id)
+        adir.mkdir(parents=True, exist_ok=True)
+        path = adir / f"{nct_id}.error.json"
+        persistence_writer.submit(
+            path, trial_output,
+            journal=self._journal_entry(job_id, "annotation_error", nct_id),
+        )
+        return path
+
     def save_audit(self, job_id: str, nct_id: str, markdown: str) -> Optional[Path]:
         """Write the per-trial LLM audit-trail Markdown next to its annotation.
 
         Best-effort: a failure here must not fail the annotation. Returns the
-        path written, or None on error.
+        path queued for writing, or None on error.
         """
         try:
-            adir = self._annotations_dir(job_id)
-            adir.mkdir(parents=True, exist_ok=True)
-            path = adir / f"{nct_id}.audit.md"
-            tmp_path = path.with_suffix(path.suffix + ".tmp")
-            with open(tmp_path, "w") as f:
-                f.write(markdown)
-            os.rename(tmp_path, path)
+            path = self._annotations_dir(job_id) / f"{nct_id}.audit.md"
+            persistence_writer.submit(path, markdown)
             return path
         except Exception as e:
             logger.warning(f"Failed to save audit trail for {nct_id}: {e}")
             return None
 
+    def load_audit(self, job_id: str, nct_id: str) -> Optional[str]:
+        """Read a trial's audit-trail Markdown, or None if absent/unreadable."""
+        path = self._annotations_dir(job_id) / f"{nct_id}.audit.md"
+        pending = persistence_writer.pending(path)
+        if pending is not None:
+            return None if pending is DELETE else pending
+        try:
+            return path.read_text() if path.exists() else None
+        except Exception as e:
+            logger.warning(f"Failed to load audit trail for {nct_id}: {e}")
+            return None
+
     def load_annotation(self, job_id: str, nct_id: str) -> Optional[dict]:
         """Load annotation result for a single trial."""
         path = self._annotations_dir(job_id) / f"{nct_id}.json"
-        if not path.exists():
-            return None
         try:
-            with open(path, "r") as f:
-                return json.load(f)
+            return self._read_json(path)
         except Exception as e:
             logger.warning(f"Failed to load annotation for {nct_id}: {e}")
             return None
 
-    def get_completed_annotations(self, job_id: str) -> set[str]:
-        """Return set of nct_ids that have completed annotations on disk."""
+    def get_completed_annotations(self, job_id: str, verify: bool = True) -> set[str]:
+        """Return set of nct_ids that have completed annotations on disk.
+
+        ``verify`` as for get_completed_research.
+        """
+        journal = self.read_journal(job_id)
+        if journal is not None:
+            return self._verified_steps(journal, "annotation", self._annotations_dir(job_id), verify)
         adir = self._annotations_dir(job_id)
         if not adir.exists():
             return set()
-        completed = set()
-        for f in adir.iterdir():
-            if f.suffix == ".json" and not f.name.endswith(".tmp"):
-                completed.add(f.stem)
-        return completed
+        return {
+            n[: -len(".json")] for n in self._names_with_pending(adir)
+            if n.endswith(".json") and not n.endswith(".error.json")
+        }
+
+    def iter_annotations(
+        self, job_id: str, nct_ids: Optional[list[str]] = None
+    ) -> Iterator[dict]:
+        """Yield persisted trial outputs one at a time (successes and failures).
+
+        In ``nct_ids`` order when given (NCTs with nothing on disk are
+        skipped), else every trial on disk in filename order. Lets exports
+        and the final JSON stream a job without holding all trials in RAM.
+        """
+        adir = self._annotations_dir(job_id)
+        if not adir.exists():
+            return
+        if nct_ids is None:
+            nct_ids = sorted({
+                n[: -len(".error.json")] if n.endswith(".error.json") else n[: -len(".json")]
+                for n in self._names_with_pending(adir) if n.endswith(".json")
+            })
+        for nct_id in nct_ids:
+            for path in (adir / f"{nct_id}.json", adir / f"{nct_id}.error.json"):
+                try:
+                    trial = self._read_json(path)
+                    if trial is None:
+                        continue
+                    yield trial
+                    break
+                except Exception as e:
+                    logger.warning(f"Failed to load annotation for {nct_id}: {e}")
+
+    # --- Journal ---
+
+    def _journal_path(self, job_id: str) -> Path:
+        return self._results_dir / "jobs" / f"{job_id}.journal.jsonl"
+
+    def _journal_entry(self, job_id: str, step: str, nct_id: str, **extra) -> tuple[Path, dict]:
+        record = {
+            "step": step,
+            "nct_id": nct_id,
+            "at": now_pacific().strftime("%Y-%m-%d %H:%M:%S PT"),
+            **extra,
+        }
+        return self._journal_path(job_id), record
+
+    def _append_journal_now(self, job_id: str, record: dict) -> None:
+        record = {"at": now_pacific().strftime("%Y-%m-%d %H:%M:%S PT"), **record}
+        line = json.dumps(record, separators=(",", ":")).encode("utf-8") + b"\n"
+        append_lines(self._journal_path(job_id), [line])
+
+    def read_journal(self, job_id: str) -> Optional[list[dict]]:
+        """The job's journal records (queued ones included), oldest first.
+
+        None when the job has no journal ``begin`` record (started before
+        journals existed), meaning callers must scan the job's dirs instead.
+        A torn final line from a crash is skipped.
+        """
+        path = self._journal_path(job_id)
+        records = []
+        bad = 0
+        try:
+            with open(path, "rb") as f:
+                for line in f:
+                    try:
+                        record = json.loads(line)
+                    except ValueError:
+                        bad += 1
+                        continue
+                    if isinstance(record, dict) and record.get("step"):
+                        records.append(record)
+                    else:
+                        bad += 1
+        except FileNotFoundError:
+            return None
+        if bad:
+            logger.warning(f"[{job_id}] Skipped {bad} unreadable journal record(s)")
+        if not records or records[0].get("step") != "begin":
+            return None
+        return records + persistence_writer.pending_journal(path)
+
+    def _verified_steps(
+        self, journal: list[dict], step: str, directory: Path, verify: bool = True,
+    ) -> set[str]:
+        """NCTs whose latest ``step`` record still matches the file on disk.
+
+        Queued records (no sha256 yet) count as done. A file whose size or
+        sha256 differs from its record (bit rot, an out-of-band edit, a
+        partial copy) is reported and redone.
+        """
+        latest: dict[str, dict] = {}
+        for record in journal:
+            if record.get("step") == step and record.get("nct_id"):
+                latest[record["nct_id"]] = record
+        if not verify:
+            return set(latest)
+        done = set()
+        for nct_id, record in latest.items():
+            if "sha256" not in record or self._matches_record(directory / f"{nct_id}.json", record):
+                done.add(nct_id)
+            else:
+                logger.warning(f"{directory.name}/{nct_id}.json does not match its journal record; redoing {step}")
+        return done
+
+    @staticmethod
+    def _matches_record(path: Path, record: dict) -> bool:
+        try:
+            if "bytes" in record and path.stat().st_size != record["bytes"]:
+                return False
+            with open(path, "rb") as f:
+                return hashlib.sha256(f.read()).hexdigest() == record["sha256"]
+        except OSError:
+            return False
 
     # --- Resume validation ---
 
@@ -201,9 +409,9 @@ class PersistenceService:
         config_hash = meta.get("config_hash", "")
         config_match = config_hash == current_config_hash
 
-        research_completed = len(self.get_completed_research(job_id))
+        research_completed = len(self.get_completed_research(job_id, verify=False))
         research_total = meta.get("total_trials", 0)
-        annotations_completed = len(self.get_completed_annotations(job_id))
+        annotations_completed = len(self.get_completed_annotations(job_id, verify=False))
 
         warnings = []
         if not commit_match:
@@ -228,37 +436,172 @@ class PersistenceService:
 
     # --- Job state ---
 
-    def save_job_state(self, job_id: str, job_data: dict) -> None:
-        """Persist job state to disk. Called after each trial and status change."""
-        jobs_dir = self._results_dir / "jobs"
-        jobs_dir.mkdir(exist_ok=True)
-        path = jobs_dir / f"{job_id}.json"
-        with open(path, "w") as f:
-            json.dump(job_data, f, indent=2, default=str)
+    def save_job_state(self, job_id: str, job_data: dict, update_index: bool = False) -> None:
+        """Persist job state to disk. Called after each trial and status change.
+
+        ``job_data`` shares live references with the in-memory job, so it is
+        serialized here and only the bytes are queued. Back-to-back saves of
+        the same job coalesce into one write. With ``update_index`` the job
+        index is rewritten too, but only when the status changed or the job
+        has finished, so the per-trial saves of a running job skip it.
+        """
+        path = self._results_dir / "jobs" / f"{job_id}.json"
+        persistence_writer.submit(
+            path, serialize(job_data, readable=persistence_writer.readable())
+        )
+        if not update_index:
+            return
+        index = self._job_index()
+        status = job_data.get("status")
+        cached = index.get(job_id)
+        if cached is not None and cached.get("status") == status and status in _ACTIVE_STATUSES:
+            return
+        index[job_id] = self._compact_job_state(job_data)
+        persistence_writer.submit(self._job_index_path(), serialize({"jobs": index}))
 
     def load_all_job_states(self) -> dict[str, dict]:
-        """Load all persisted job states. Called on startup."""
+        """Load all persisted job states. Called on startup.
+
+        Finished jobs come from the job index. If the index is the last
+        thing renamed into ``jobs/`` (state files are written by rename,
+        which bumps the dir's mtime), only active jobs' state files are
+        read and the dir is not listed. Otherwise full state files are read for active jobs,
+        jobs missing from the index, and files written after it. Those
+        reads are folded back into the index, so the next startup skips
+        them.
+        """
         jobs_dir = self._results_dir / "jobs"
         if not jobs_dir.exists():
             return {}
+        index_path = self._job_index_path()
+        index = self._job_index()
+        try:
+            st = index_path.stat()
+            # ctime is when the index was renamed into place (POSIX); where
+            # it isn't, the check below just fails safe to the scan.
+            index_mtime, index_landed = st.st_mtime_ns, max(st.st_mtime_ns, st.st_ctime_ns)
+        except OSError:
+            index_mtime = index_landed = -1
+        pending = persistence_writer.pending_in(jobs_dir)
+        try:
+            index_fresh = 0 <= jobs_dir.stat().st_mtime_ns <= index_landed and not pending
+        except OSError:
+            index_fresh = False
+        if index_fresh:
+            states = {}
+            for job_id, cached in index.items():
+                if cached.get("status") not in _ACTIVE_STATUSES:
+                    states[job_id] = cached
+                    continue
+                try:
+                    state = self._read_json(jobs_dir / f"{job_id}.json")
+                except Exception:
+                    state = None
+                if state is not None:
+                    states[job_id] = state
+            return states
+
         states = {}
-        for path in jobs_dir.glob("*.json"):
+        changed = False
+        for name in self._names_with_pending(jobs_dir):
+            if not name.endswith(".json") or name.startswith("_"):
+                continue
+            job_id = name[: -len(".json")]
+            cached = index.get(job_id)
+            if (
+                cached is not None
+                and cached.get("status") not in _ACTIVE_STATUSES
+                and name not in pending
+            ):
+                try:
+                    fresh = (jobs_dir / name).stat().st_mtime_ns <= index_mtime
+                except OSError:
+                    fresh = False
+                if fresh:
+                    states[job_id] = cached
+                    continue
             try:
-                with open(path) as f:
-                    states[path.stem] = json.load(f)
+                state = self._read_json(jobs_dir / name)
             except Exception:
-                pass
+                continue
+            if state is None:
+                continue
+            states[job_id] = state
+            if state.get("status") not in _ACTIVE_STATUSES:
+                index[job_id] = self._compact_job_state(state)
+                changed = True
+        for job_id in set(index) - set(states):
+            del index[job_id]
+            changed = True
+        if changed:
+            # Through the writer, so a queued older index can't land on top.
+            persistence_writer.submit(index_path, serialize({"jobs": index}))
         return states
 
+    def _job_index_path(self) -> Path:
+        return self._results_dir / "jobs" / "_index.json"
+
+    def _job_index(self) -> dict[str, dict]:
+        """The in-memory job index for this results dir, loaded on first use."""
+        index = _job_indexes.get(self._results_dir)
+        if index is None:
+            try:
+                index = (self._read_json(self._job_index_path()) or {}).get("jobs", {})
+            except Exception as e:
+                logger.warning(f"Job index unreadable, rebuilding: {e}")
+                index = {}
+            _job_indexes[self._results_dir] = index
+        return index
+
+    @staticmethod
+    def _compact_job_state(state: dict) -> dict:
+        """Job state minus what startup doesn't need (per-trial timings etc.)."""
+        compact = {k: v for k, v in state.items() if k != "trial_times"}
+        progress = state.get("progress")
+        if isinstance(progress, dict):
+            compact["progress"] = {
+                k: progress[k] for k in _INDEX_PROGRESS_KEYS if k in progress
+            }
+        # Detach from the live job (save_job_state passes shared references).
+        return json.loads(serialize(compact))
+
     # --- Internal helpers ---
 
     @staticmethod
     def _atomic_write(path: Path, data: dict) -> None:
-        """Write JSON atomically: write to .tmp, then rename."""
-        tmp_path = path.with_suffix(path.suffix + ".tmp")
-        with open(tmp_path, "w") as f:
-            json.dump(data, f, indent=2, default=str)
-        os.rename(tmp_path, path)
+        """Write JSON atomically and synchronously: write to .tmp, then rename."""
+        write_atomic(path, serialize(data, readable=persistence_writer.readable()))
+
+    @staticmethod
+    def _read_json(path: Path) -> Optional[dict]:
+        """Load a JSON file, preferring a queued write that hasn't landed yet.
+
+        Returns None when the file is absent (or pending deletion). Parse
+        errors propagate so callers can log them.
+        """
+        pending = persistence_writer.pending(path)
+        if pending is not None:
+            if pending is DELETE:
+                return None
+            # Round-trip rather than hand out the queued object: callers may
+            # mutate what they load, and disk semantics (datetimes as str)
+            # should not depend on whether the write has landed.
+            return json.loads(serialize(pending))
+        if not path.exists():
+            return None
+        with open(path, "rb") as f:
+            return json.loads(f.read())
+
+    @staticmethod
+    def _names_with_pending(directory: Path) -> set[str]:
+        """File names in ``directory``, adjusted for queued writes/deletes."""
+        names = {f.name for f in directory.iterdir() if not f.name.endswith(".tmp")}
+        for name, payload in persistence_writer.pending_in(directory).items():
+            if payload is DELETE:
+                names.discard(name)
+            else:
+                names.add(name)
+        return names
 
     @staticmethod
     def _cleanup_tmp_files(directory: Path) -> None:
@@ -0,0 +1,380 @@
+"""
+Background writer for per-trial persistence.
+
+PersistenceService used to ``json.dump(indent=2)`` and rename on the asyncio
+event loop. A batch job with 20 concurrent researches writes multi-MB
+research bundles plus a job-state snapshot after every trial, and each write
+stalled every other coroutine, including the status endpoints. Writes now
+go through one writer thread:
+
+- **Bounded queue.** ``submit()`` never blocks the loop. When more than
+  ``orchestrator.persistence_queue_size`` writes are pending, the caller
+  writes inline instead. That fallback is the backpressure, and it is counted
+  in ``stats()``.
+- **Off-loop serialization.** Payloads are serialized in the writer thread:
+  orjson when installed, else compact stdlib JSON. ``persistence_readable:
+  true`` restores the old indent=2 layout for hand inspection. Loaders read
+  either layout.
+- **Coalescing.** A write to a path that already has a pending write
+  replaces it. Job state is rewritten after every trial, so this drops most
+  of those writes. Each file is fsynced before its atomic rename, and each
+  directory touched by a batch is fsynced once per batch
+  (``persistence_fsync``).
+- **Read-your-writes.** Until a write lands, ``pending()`` returns its
+  payload, and PersistenceService's loaders check it first. ``flush()`` is
+  the barrier for job end, shutdown and tests.
+- **Journal records.** ``submit(..., journal=(path, record))`` appends
+  ``record`` to an append-only JSONL journal once the file has landed. The
+  record gets the sha256 and size of the bytes written. Appends run after
+  the batch's files and directory fsyncs, so a journal line never refers
+  to a file that isn't on disk. A coalesced write drops the superseded
+  record along with its payload.
+
+Callers hand over ownership of the payload: it must not be mutated after
+``submit()``. Job state holds live references, so it is serialized by the
+caller and submitted as bytes.
+"""
+
+from __future__ import annotations
+
+import atexit
+import hashlib
+import json
+import logging
+import os
+import threading
+import time
+from collections import deque
+from pathlib import Path
+from typing import Any, Optional
+
+from app.services.metrics import metrics
+
+try:
+    import orjson
+except ImportError:  # optional speed-up; stdlib JSON is the fallback
+    orjson = None
+
+logger = logging.getLogger("agent_annotate.persistence_writer")
+
+# Payload marker for "unlink this path" (e.g. a superseded .error.json).
+DELETE = object()
+
+_DEFAULT_QUEUE_SIZE = 256
+
+WRITE_LATENCY = metrics.histogram(
+    "agent_annotate_persistence_write_latency_seconds",
+    "Time from submit() to the write landing on disk",
+)
+
+
+def serialize(data: Any, readable: bool = False) -> bytes:
+    """Encode a payload for disk. ``str``/``bytes`` are written verbatim."""
+    if isinstance(data, bytes):
+        return data
+    if isinstance(data, str):
+        return data.encode("utf-8")
+    if readable:
+        return json.dumps(data, indent=2, default=str).encode("utf-8")
+    if orjson is not None:
+        try:
+            # Passthrough keeps datetimes on default=str, so the output
+            # matches the stdlib path byte-for-byte in content.
+            return orjson.dumps(
+                data,
+                default=str,
+                option=orjson.OPT_NON_STR_KEYS | orjson.OPT_PASSTHROUGH_DATETIME,
+            )
+        except TypeError:
+            pass  # e.g. ints wider than 64 bits
+    return json.dumps(data, default=str, separators=(",", ":")).encode("utf-8")
+
+
+def write_atomic(path: Path, payload: bytes, fsync: bool = False) -> None:
+    """Write ``payload`` to ``path`` via a .tmp file and an atomic rename."""
+    tmp_path = path.with_suffix(path.suffix + ".tmp")
+    with open(tmp_path, "wb") as f:
+        f.write(payload)
+        if fsync:
+            f.flush()
+            os.fsync(f.fileno())
+    os.replace(tmp_path, path)
+
+
+def append_lines(path: Path, lines: list[bytes], fsync: bool = False) -> None:
+    """Append newline-terminated ``lines`` to ``path``.
+
+    A torn final line (crash mid-append) is closed off first so it can't
+    swallow the next record.
+    """
+    path.parent.mkdir(parents=True, exist_ok=True)
+    with open(path, "a+b") as f:
+        if f.tell() > 0:
+            f.seek(-1, os.SEEK_END)
+            if f.read(1) != b"\n":
+                f.write(b"\n")
+        f.write(b"".join(lines))
+        if fsync:
+            f.flush()
+            os.fsync(f.fileno())
+
+
+def _journal_line(record: dict, written: bytes) -> bytes:
+    record = {
+        **record,
+        "sha256": hashlib.sha256(written).hexdigest(),
+        "bytes": len(written),
+    }
+    return json.dumps(record, default=str, separators=(",", ":")).encode("utf-8") + b"\n"
+
+
+def _fsync_dir(directory: Path) -> None:
+    try:
+        fd = os.open(directory, os.O_RDONLY)
+    except OSError:
+        return  # e.g. Windows: directories can't be opened
+    try:
+        os.fsync(fd)
+    except OSError:
+        pass
+    finally:
+        os.close(fd)
+
+
+class PersistenceWriter:
+    """Single writer thread fed by a bounded, path-coalescing queue."""
+
+    def __init__(self, max_queue: Optional[int] = None) -> None:
+        self._max_queue = max_queue
+        self._cond = threading.Condition()
+        # path -> (payload, readable, enqueued_at, journal). Insertion-ordered;
+        # a re-submitted path keeps its slot and takes the newer payload.
+        self._queued: dict[Path, tuple[Any, bool, float, Any]] = {}
+        # Batch currently being written; still visible to pending().
+        self._inflight: dict[Path, tuple[Any, bool, float, Any]] = {}
+        self._thread: Optional[threading.Thread] = None
+        self._latencies: deque[float] = deque(maxlen=2000)
+        self.written = 0
+        self.journaled = 0
+        self.deleted = 0
+        self.coalesced = 0
+        self.inline_writes = 0
+        self.errors = 0
+        self.batches = 0
+        self.fsyncs = 0
+        self.max_depth = 0
+
+    # -- settings -----------------------------------------------------------
+
+    @staticmethod
+    def _setting(name: str, default: Any) -> Any:
+        try:
+            from app.services.config_service import config_service
+            return getattr(config_service.get().orchestrator, name, default)
+        except Exception:
+            return default
+
+    def _limit(self) -> int:
+        if self._max_queue is not None:
+            return self._max_queue
+        return max(1, int(self._setting("persistence_queue_size", _DEFAULT_QUEUE_SIZE)))
+
+    def readable(self) -> bool:
+        return bool(self._setting("persistence_readable", False))
+
+    # -- producer side ------------------------------------------------------
+
+    def submit(
+        self,
+        path: Path,
+        payload: Any,
+        journal: Optional[tuple[Path, dict]] = None,
+    ) -> None:
+        """Queue a write (or ``DELETE``) for ``path``.
+
+        Falls back to an inline write when the queue is full. A path that is
+        already queued or being written always queues, so a newer payload can
+        never be overtaken by an older one. ``journal`` is a (journal path,
+        record) pair appended once this payload is on disk.
+        """
+        readable = self.readable()
+        with self._cond:
+            if path in self._queued:
+                self.coalesced += 1
+                self._queued[path] = (payload, readable, self._queued[path][2], journal)
+                return
+            if len(self._queued) >= self._limit() and path not in self._inflight:
+                self.inline_writes += 1
+                inline = True
+            else:
+                self._queued[path] = (payload, readable, time.monotonic(), journal)
+                self.max_depth = max(self.max_depth, self.depth())
+                inline = False
+                self._ensure_thread()
+                self._cond.notify()
+        if inline:
+            try:
+                written = self._apply(path, payload, readable, fsync=False)
+                if journal is not None and written is not None:
+                    append_lines(journal[0], [_journal_line(journal[1], written)])
+                    self.journaled += 1
+            except Exception as e:
+                with self._cond:
+                    self.errors += 1
+                logger.warning(f"Inline persistence write failed for {path}: {e}")
+
+    def pending(self, path: Path) -> Any:
+        """Payload of a write to ``path`` that hasn't landed yet, else None.
+
+        Returns ``DELETE`` for a pending unlink.
+        """
+        with self._cond:
+            entry = self._queued.get(path) or self._inflight.get(path)
+        return entry[0] if entry is not None else None
+
+    def pending_journal(self, journal_path: Path) -> list[dict]:
+        """Journal records for ``journal_path`` whose files haven't landed.
+
+        Records of the in-flight batch may already be appended as well, so
+        readers must tolerate duplicates.
+        """
+        with self._cond:
+            entries = list(self._inflight.values()) + list(self._queued.values())
+        return [e[3][1] for e in entries if e[3] is not None and e[3][0] == journal_path]
+
+    def pending_in(self, directory: Path) -> dict[str, Any]:
+        """Pending payloads under ``directory``, keyed by file name."""
+        with self._cond:
+            entries = {**self._inflight, **self._queued}
+        return {p.name: e[0] for p, e in entries.items() if p.parent == directory}
+
+    def depth(self) -> int:
+        return len(self._queued) + len(self._inflight)
+
+    def flush(self, timeout: Optional[float] = None) -> bool:
+        """Block until everything submitted so far is on disk."""
+        deadline = None if timeout is None else time.monotonic() + timeout
+        with self._cond:
+            while self._queued or self._inflight:
+                if self._thread is None or not self._thread.is_alive():
+                    self._ensure_thread()
+                remaining = None if deadline is None else deadline - time.monotonic()
+                if remaining is not None and remaining <= 0:
+                    return False
+                self._cond.wait(remaining)
+        return True
+
+    # -- writer thread ------------------------------------------------------
+
+    def _ensure_thread(self) -> None:
+        # Caller holds self._cond.
+        if self._thread is None or not self._thread.is_alive():
+            self._thread = threading.Thread(
+                target=self._run, name="persistence-writer", daemon=True,
+            )
+            self._thread.start()
+
+    def _run(self) -> None:
+        while True:
+            with self._cond:
+                while not self._queued:
+                    self._cond.wait()
+                batch, self._queued = self._queued, {}
+                self._inflight = batch
+            self._write_batch(batch)
+            with self._cond:
+                self._inflight = {}
+                self._cond.notify_all()
+
+    def _write_batch(self, batch: dict[Path, tuple[Any, bool, float, Any]]) -> None:
+        fsync = bool(self._setting("persistence_fsync", True))
+        dirs: set[Path] = set()
+        journal_lines: dict[Path, list[bytes]] = {}
+        for path, (payload, readable, enqueued, journal) in batch.items():
+            try:
+                written = self._apply(path, payload, readable, fsync=fsync)
+                dirs.add(path.parent)
+                latency = time.monotonic() - enqueued
+                self._latencies.append(latency)
+                WRITE_LATENCY.observe(latency)
+                if journal is not None and written is not None:
+                    journal_lines.setdefault(journal[0], []).append(
+                        _journal_line(journal[1], written)
+                    )
+            except Exception as e:
+                self.errors += 1
+                logger.warning(f"Persistence write failed for {path}: {e}")
+        if fsync:
+            for d in dirs:
+                _fsync_dir(d)
+                self.fsyncs += 1
+        # Only after the files (and their renames) are durable.
+        for journal_path, lines in journal_lines.items():
+            try:
+                append_lines(journal_path, lines, fsync=fsync)
+                self.journaled += len(lines)
+            except Exception as e:
+                self.errors += 1
+                logger.warning(f"Journal append failed for {journal_path}: {e}")
+        self.batches += 1
+
+    def _apply(self, path: Path, payload: Any, readable: bool, fsync: bool) -> Optional[bytes]:
+        """Write or delete ``path``; returns the bytes written (None for a delete)."""
+        if payload is DELETE:
+            path.unlink(missing_ok=True)
+            self.deleted += 1
+            return None
+        path.parent.mkdir(parents=True, exist_ok=True)
+        data = serialize(payload, readable)
+        write_atomic(path, data, fsync=fsync)
+        if fsync:
+            self.fsyncs += 1
+        self.written += 1
+        return data
+
+    # -- diagnostics --------------------------------------------------------
+
+    def stats(self) -> dict:
+        lat = sorted(self._latencies)
+
+        def pct(p: float) -> Optional[float]:
+            if not lat:
+                return None
+            return round(lat[min(len(lat) - 1, int(p * len(lat)))] * 1000, 2)
+
+        return {
+            "serializer": "orjson" if orjson is not None else "json",
+            "queue_depth": self.depth(),
+            "max_queue_depth": self.max_depth,
+            "queue_limit": self._limit(),
+            "written": self.written,
+            "journaled": self.journaled,
+            "deleted": self.deleted,
+            "coalesced": self.coalesced,
+            "inline_writes": self.inline_writes,
+            "batches": self.batches,
+            "fsyncs": self.fsyncs,
+            "errors": self.errors,
+            "write_latency_ms": {
+                "p50": pct(0.50),
+                "p95": pct(0.95),
+                "max": round(lat[-1] * 1000, 2) if lat else None,
+            },
+        }
+
+
+# Module-level singleton shared by every PersistenceService in the process.
+persistence_writer = PersistenceWriter()
+atexit.register(persistence_writer.flush, 10.0)
+
+
+@metrics.register_collector
+def _collect_persistence():
+    s = persistence_writer.stats()
+    yield ("agent_annotate_queue_depth", "gauge", "Pending items per internal queue",
+           [({"queue": "persistence"}, s["queue_depth"])])
+    yield ("agent_annotate_persistence_operations_total", "counter",
+           "Persistence writer operations by kind",
+           [({"kind": k}, s[k]) for k in
+            ("written", "journaled", "deleted", "coalesced", "inline_writes", "fsyncs",
+             "errors")])
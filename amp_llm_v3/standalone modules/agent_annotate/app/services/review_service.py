@@ -1,100 +1,188 @@
 """
 Human review queue service - manages flagged annotations.
 
-Persists the review queue as JSON at results/review_queue.json so it
-survives restarts.  Uses atomic write (tmp + rename) to prevent corruption.
+Persists the review queue in SQLite at results/review_queue.db so it
+survives restarts:
+
+    review_items(job_id, nct_id, field_name, status, created_at, body)
+
+``body`` is the ReviewItem as JSON; ``status`` and ``created_at`` are
+copied out of it so listings, stats and export lookups are indexed queries
+(``(job_id, status, field_name)`` and ``(status, created_at)``) rather than
+scans of every item ever flagged. ``add`` and ``decide`` write one row in
+one transaction.
+
+The queue used to be a JSON file (results/review_queue.json) rewritten
+whole on every change. On first start with an empty database that file is
+imported in one transaction and renamed to ``review_queue.json.imported``.
+
+The database is opened on first use, not at import, so importing the
+orchestrator or the output service doesn't create results/review_queue.db.
 """
 
 import json
 import logging
-import os
-import tempfile
+import sqlite3
+import threading
 from pathlib import Path
-from typing import Optional
+from typing import Iterable, Optional, Union
 
 from app.models.job import ReviewItem
+from app.services.metrics import metrics
 
 logger = logging.getLogger("agent_annotate.review_service")
 
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS review_items (
+    job_id TEXT NOT NULL,
+    nct_id TEXT NOT NULL,
+    field_name TEXT NOT NULL,
+    status TEXT NOT NULL DEFAULT 'pending',
+    created_at TEXT NOT NULL DEFAULT '',
+    body TEXT NOT NULL,
+    PRIMARY KEY (job_id, nct_id, field_name)
+);
+CREATE INDEX IF NOT EXISTS idx_review_job_status_field
+    ON review_items(job_id, status, field_name);
+CREATE INDEX IF NOT EXISTS idx_review_status_created
+    ON review_items(status, created_at);
+"""
+
+
+def _row(item: ReviewItem) -> tuple:
+    return (
+        item.job_id, item.nct_id, item.field_name, item.status,
+        item.created_at or "", json.dumps(item.model_dump(mode="json"), default=str),
+    )
+
 
 class ReviewService:
-    """Disk-backed review queue for flagged annotations."""
-
-    def __init__(self, persist_path: Optional[Path] = None):
-        self._queue: dict[str, ReviewItem] = {}  # key: "{job_id}:{nct_id}:{field_name}"
-        if persist_path is not None:
-            self._persist_path = persist_path
-        else:
-            # Default: results/review_queue.json relative to project root
-            from app.config import RESULTS_DIR
-            self._persist_path = RESULTS_DIR / "review_queue.json"
-        self._load()
+    """SQLite-backed review queue for flagged annotations.
+
+    One connection is shared across threads behind a lock (the orchestrator
+    adds items from worker threads while the API reads). It is opened, and
+    the legacy JSON imported, the first time the queue is used.
+    """
 
-    def _key(self, job_id: str, nct_id: str, field_name: str) -> str:
-        return f"{job_id}:{nct_id}:{field_name}"
+    def __init__(self, db_path: Optional[Path] = None, legacy_json: Optional[Path] = None):
+        if db_path is None:
+            # Default: results/review_queue.db relative to project root
+            from app.config import RESULTS_DIR
+            db_path = RESULTS_DIR / "review_queue.db"
+        self._db_path = Path(db_path)
+        self._legacy_json = (Path(legacy_json) if legacy_json is not None
+                             else self._db_path.with_suffix(".json"))
+        self._lock = threading.Lock()
+        self._open_lock = threading.Lock()
+        self._db: Optional[sqlite3.Connection] = None
+
+    @property
+    def _conn(self) -> sqlite3.Connection:
+        if self._db is None:
+            with self._open_lock:
+                if self._db is None:
+                    self._db = self._open()
+        return self._db
+
+    def close(self) -> None:
+        with self._lock:
+            if self._db is not None:
+                self._db.close()
+                self._db = None
 
     # -- persistence helpers --------------------------------------------------
 
-    def _load(self) -> None:
-        """Load the review queue from disk on startup."""
-        if not self._persist_path.exists():
-            logger.info("No existing review queue file; starting empty.")
+    def _open(self) -> sqlite3.Connection:
+        self._db_path.parent.mkdir(parents=True, exist_ok=True)
+        conn = sqlite3.connect(str(self._db_path), check_same_thread=False)
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute("PRAGMA synchronous=NORMAL")
+        conn.executescript(_SCHEMA)
+        conn.commit()
+        self._import_legacy_json(conn)
+        return conn
+
+    def _import_legacy_json(self, conn: sqlite3.Connection) -> None:
+        """Import results/review_queue.json into an empty database, once."""
+        if not self._legacy_json.exists():
+            return
+        if conn.execute("SELECT 1 FROM review_items LIMIT 1").fetchone():
+            logger.warning(
+                f"Review queue {self._db_path} already has items; "
+                f"not importing {self._legacy_json}"
+            )
             return
         try:
-            raw = json.loads(self._persist_path.read_text(encoding="utf-8"))
-            for key, item_dict in raw.items():
-                self._queue[key] = ReviewItem(**item_dict)
-            logger.info(f"Loaded {len(self._queue)} review items from {self._persist_path}")
+            raw = json.loads(self._legacy_json.read_text(encoding="utf-8"))
+            items = [ReviewItem(**item_dict) for item_dict in raw.values()]
         except Exception as exc:
-            logger.warning(f"Failed to load review queue from {self._persist_path}: {exc}")
-
-    def _save(self) -> None:
-        """Atomically persist the review queue to disk (write tmp then rename)."""
-        self._persist_path.parent.mkdir(parents=True, exist_ok=True)
-        data = {k: v.model_dump(mode="json") for k, v in self._queue.items()}
-        try:
-            fd, tmp_path = tempfile.mkstemp(
-                dir=str(self._persist_path.parent),
-                prefix=".review_queue_",
-                suffix=".tmp",
+            logger.warning(f"Failed to load review queue from {self._legacy_json}: {exc}")
+            return
+        with conn:
+            conn.executemany(
+                "INSERT OR REPLACE INTO review_items "
+                "(job_id, nct_id, field_name, status, created_at, body) "
+                "VALUES (?, ?, ?, ?, ?, ?)",
+                [_row(i) for i in items],
             )
-            try:
-                with os.fdopen(fd, "w", encoding="utf-8") as f:
-                    json.dump(data, f, indent=2, default=str)
-                os.replace(tmp_path, str(self._persist_path))
-            except BaseException:
-                # Clean up temp file on any write/rename failure
-                try:
-                    os.unlink(tmp_path)
-                except OSError:
-                    pass
-                raise
-        except Exception as exc:
-            logger.error(f"Failed to save review queue: {exc}")
+        self._legacy_json.rename(self._legacy_json.with_name(self._legacy_json.name + ".imported"))
+        logger.info(f"Imported {len(items)} review items from {self._legacy_json}")
+
+    def _select(
+        self,
+        job_id: Optional[str],
+        status: Union[str, Iterable[str], None],
+    ) -> list[ReviewItem]:
+        clauses, params = [], []
+        if job_id:
+            clauses.append("job_id = ?")
+            params.append(job_id)
+        if status is not None:
+            statuses = [status] if isinstance(status, str) else list(status)
+            clauses.append(f"status IN ({','.join('?' * len(statuses))})")
+            params.extend(statuses)
+        where = f"WHERE {' AND '.join(clauses)}" if clauses else ""
+        with self._lock:
+            rows = self._conn.execute(
+                f"SELECT body FROM review_items {where} ORDER BY created_at DESC",
+                params,
+            ).fetchall()
+        return [ReviewItem(**json.loads(body)) for (body,) in rows]
 
     # -- public API (unchanged signatures) ------------------------------------
 
     def add(self, item: ReviewItem) -> None:
-        """Add an item to the review queue and persist."""
-        key = self._key(item.job_id, item.nct_id, item.field_name)
-        self._queue[key] = item
-        self._save()
+        """Add an item to the review queue (replacing the same job/trial/field)."""
+        with self._lock, self._conn:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO review_items "
+                "(job_id, nct_id, field_name, status, created_at, body) "
+                "VALUES (?, ?, ?, ?, ?, ?)",
+                _row(item),
+            )
 
     def get_pending(self, job_id: Optional[str] = None) -> list[ReviewItem]:
         """Return all pending review items, optionally filtered by job."""
-        items = [v for v in self._queue.values() if v.status == "pending"]
-        if job_id:
-            items = [i for i in items if i.job_id == job_id]
-        items.sort(key=lambda i: i.created_at or "", reverse=True)
-        return items
+        return self._select(job_id, "pending")
 
-    def get_all(self, job_id: Optional[str] = None) -> list[ReviewItem]:
-        """Return all review items regardless of status."""
-        items = list(self._queue.values())
+    def get_all(
+        self,
+        job_id: Optional[str] = None,
+        status: Union[str, Iterable[str], None] = None,
+    ) -> list[ReviewItem]:
+        """Return review items, newest first, optionally filtered by job and status."""
+        return self._select(job_id, status)
+
+    def stats(self, job_id: Optional[str] = None) -> dict[str, int]:
+        """Item counts per status (one aggregate query)."""
+        sql = "SELECT status, COUNT(*) FROM review_items"
+        params: tuple = ()
         if job_id:
-            items = [i for i in items if i.job_id == job_id]
-        items.sort(key=lambda i: i.created_at or "", reverse=True)
-        return items
+            sql += " WHERE job_id = ?"
+            params = (job_id,)
+        with self._lock:
+            rows = self._conn.execute(sql + " GROUP BY status", params).fetchall()
+        return dict(rows)
 
     def decide(
         self,
@@ -106,26 +194,38 @@ class ReviewService:
         note: Optional[str] = None,
     ) -> Optional[ReviewItem]:
         """Apply a review decision (approve / override / skip) and persist."""
-        key = self._key(job_id, nct_id, field_name)
-        item = self._queue.get(key)
-        if not item:
-            return None
-        item.status = action  # "approved" | "overridden" | "skipped"
-        if value is not None:
-            item.reviewer_value = value
-        if note is not None:
-            item.reviewer_note = note
-        self._save()
+        key = (job_id, nct_id, field_name)
+        with self._lock, self._conn:
+            row = self._conn.execute(
+                "SELECT body FROM review_items "
+                "WHERE job_id = ? AND nct_id = ? AND field_name = ?",
+                key,
+            ).fetchone()
+            if not row:
+                return None
+            item = ReviewItem(**json.loads(row[0]))
+            item.status = action  # "approved" | "overridden" | "skipped"
+            if value is not None:
+                item.reviewer_value = value
+            if note is not None:
+                item.reviewer_note = note
+            self._conn.execute(
+                "UPDATE review_items SET status = ?, body = ? "
+                "WHERE job_id = ? AND nct_id = ? AND field_name = ?",
+                (item.status, _row(item)[5], *key),
+            )
         return item
 
     def retry(self, job_id: str) -> int:
         """Reset all pending items for a job back to pending (no-op currently)."""
-        count = 0
-        for item in self._queue.values():
-            if item.job_id == job_id and item.status == "pending":
-                count += 1
-        return count
+        return self.stats(job_id).get("pending", 0)
 
 
-# Module-level singleton
+# Module-level singleton; the database is opened on first use.
 review_service = ReviewService()
+
+
+@metrics.register_collector
+def _collect_review_queue():
+    yield ("agent_annotate_review_items", "gauge", "Review queue items by status",
+           [({"status": s}, n) for s, n in sorted(review_service.stats().items())])
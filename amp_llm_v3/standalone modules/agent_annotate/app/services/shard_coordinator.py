@@ -0,0 +1,565 @@
+"""
+Coordinator mode — one job sharded across several agent_annotate workers.
+
+A full-corpus run used to be split by hand (``--full-corpus-1`` /
+``--full-corpus-2``), submitted to each box separately, and stitched
+together afterwards with ``scripts/merge_full_corpus_results.py``. The
+coordinator does the same thing from one job:
+
+1. ``start()`` splits the job's NCT list into contiguous shards and records
+   them on the (local) ``AnnotationJob``. No trial runs locally.
+2. Each shard is submitted to a worker as an ordinary ``POST /api/jobs``.
+   Workers are plain agent_annotate instances (identified by base URL), so
+   they keep their own lanes, dedup, persistence and auto-resume.
+3. Every ``orchestrator.shard_poll_seconds`` the coordinator polls each
+   shard's ``/api/jobs/{id}`` and ``/api/results/{id}/partial`` and rolls
+   the counts up into the local job's progress.
+4. A worker that fails ``shard_dead_after_failures`` consecutive requests is
+   declared dead and its unfinished shards are resubmitted to a live worker
+   (the whole shard — a dead worker's partial output is unreachable). If the
+   worker later answers ``/api/health`` again, the orphaned remote jobs are
+   cancelled so they stop competing for its Ollama.
+5. When a shard completes, its trials are pulled from ``/api/results/{id}``
+   into ``results/annotations/{job_id}/`` (so ``/partial`` and ``/csv`` on
+   the coordinator fill in shard by shard). Once every shard is terminal
+   the trials are streamed in the job's NCT order into the canonical
+   ``results/json/{job_id}.json`` and standard CSV.
+
+Shard state lives on the job record and is persisted with it, so a
+coordinator restart picks polling back up (``resume()``) while the workers
+carry on. For local testing, run extra instances on other ports with their
+own ``AGENT_ANNOTATE_RESULTS_DIR`` and ``AGENT_ANNOTATE_CROSS_BRANCH_GATE=0``
+(see docs/PERFORMANCE.md).
+"""
+
+from __future__ import annotations
+
+import asyncio
+import logging
+from pathlib import Path
+from typing import Optional
+
+import httpx
+
+from app.config import RESULTS_DIR, SHARD_TOKEN
+from app.models.job import AnnotationJob, ShardInfo, now_pacific
+from app.services.config_service import config_service
+from app.services.persistence_service import PersistenceService
+from app.services.persistence_writer import persistence_writer
+
+logger = logging.getLogger("agent_annotate.shard_coordinator")
+
+SHARD_TERMINAL = ("completed", "failed")
+# Request fields forwarded to workers' POST /api/jobs.
+FORWARDED_OPTIONS = ("allow_test_batch", "allow_external", "priority")
+
+
+def split_shards(nct_ids: list[str], n: int) -> list[list[str]]:
+    """Split into ``n`` contiguous, near-equal chunks (no empty chunks)."""
+    n = max(1, min(n, len(nct_ids)))
+    size, extra = divmod(len(nct_ids), n)
+    chunks, start = [], 0
+    for i in range(n):
+        end = start + size + (1 if i < extra else 0)
+        chunks.append(nct_ids[start:end])
+        start = end
+    return [c for c in chunks if c]
+
+
+class ShardCoordinator:
+    """Drives coordinator jobs: assign, poll, reassign, merge."""
+
+    def __init__(
+        self,
+        orchestrator=None,
+        results_dir: Optional[Path] = None,
+        transport: Optional[httpx.AsyncBaseTransport] = None,
+    ) -> None:
+        # orchestrator is resolved lazily: it imports this module's callers.
+        self._orchestrator = orchestrator
+        self._results_dir = results_dir or RESULTS_DIR
+        self._transport = transport
+        self._tasks: dict[str, asyncio.Task] = {}
+        self._failures: dict[str, int] = {}
+        self._dead: set[str] = set()
+
+    @property
+    def orchestrator(self):
+        if self._orchestrator is None:
+            from app.services.orchestrator import orchestrator
+            self._orchestrator = orchestrator
+        return self._orchestrator
+
+    @staticmethod
+    def _settings() -> dict:
+        try:
+            orch = config_service.get().orchestrator
+        except Exception:
+            orch = None
+        return {
+            "poll": float(getattr(orch, "shard_poll_seconds", 15.0)),
+            "dead_after": int(getattr(orch, "shard_dead_after_failures", 3)),
+            "max_attempts": int(getattr(orch, "shard_max_attempts", 3)),
+        }
+
+    @staticmethod
+    def default_workers() -> list[str]:
+        try:
+            return list(getattr(config_service.get().orchestrator, "shard_workers", []) or [])
+        except Exception:
+            return []
+
+    @staticmethod
+    def _headers() -> dict:
+        return {"X-Shard-Token": SHARD_TOKEN} if SHARD_TOKEN else {}
+
+    def _client(self) -> httpx.AsyncClient:
+        return httpx.AsyncClient(timeout=30.0, transport=self._transport)
+
+    # -- lifecycle ----------------------------------------------------------
+
+    def start(
+        self,
+        nct_ids: list[str],
+        workers: list[str],
+        shards: Optional[int] = None,
+        submit_options: Optional[dict] = None,
+    ) -> AnnotationJob:
+        """Create a coordinator job and start driving it in the background."""
+        workers = list(dict.fromkeys(w.strip().rstrip("/") for w in workers if w.strip()))
+        if not workers:
+            raise ValueError("Coordinator mode needs at least one worker URL")
+        if not nct_ids:
+            raise ValueError("nct_ids list cannot be empty")
+
+        job = self.orchestrator.create_job(nct_ids)
+        job.workers = workers
+        job.submit_options = {
+            k: v for k, v in (submit_options or {}).items()
+            if k in FORWARDED_OPTIONS and v not in (None, False)
+        }
+        job.shards = [
+            ShardInfo(index=i, nct_ids=chunk)
+            for i, chunk in enumerate(split_shards(nct_ids, shards or len(workers)))
+        ]
+        job.status = "running"
+        job.started_at = now_pacific()
+        job.updated_at = now_pacific()
+        job.progress.current_stage = "sharded"
+        PersistenceService(self._results_dir).init_annotations_dir(job.job_id)
+        self.orchestrator.persist_job(job)
+        logger.info(
+            f"[{job.job_id}] Coordinator job: {len(nct_ids)} trials in "
+            f"{len(job.shards)} shard(s) across {len(workers)} worker(s)"
+        )
+        self._spawn(job.job_id)
+        return job
+
+    def resume(self, job_id: str) -> None:
+        """Pick polling back up after a coordinator restart."""
+        self._spawn(job_id)
+
+    def _spawn(self, job_id: str) -> None:
+        task = self._tasks.get(job_id)
+        if task is None or task.done():
+            self._tasks[job_id] = asyncio.ensure_future(self.run(job_id))
+
+    async def run(self, job_id: str) -> None:
+        """Poll loop for one coordinator job, until every shard is terminal."""
+        job = self.orchestrator.get_job(job_id)
+        if not job or not job.shards:
+            return
+        try:
+            async with self._client() as client:
+                while True:
+                    if job.status == "cancelled":
+                        await self._cancel_remote(client, job)
+                        job.progress.current_stage = "cancelled"
+                        job.finished_at = now_pacific()
+                        self.orchestrator.persist_job(job)
+                        logger.info(f"[{job_id}] Coordinator job cancelled")
+                        return
+                    await self.tick(client, job)
+                    if all(s.status in SHARD_TERMINAL for s in job.shards):
+                        await self.finish(job)
+                        return
+                    self.orchestrator.persist_job(job)
+                    await asyncio.sleep(self._settings()["poll"])
+        except Exception as e:
+            logger.exception(f"[{job_id}] Coordinator loop failed: {e}")
+            job.status = "failed"
+            job.error = str(e)
+            job.progress.current_stage = "error"
+            job.finished_at = now_pacific()
+            job.updated_at = now_pacific()
+            self.orchestrator.persist_job(job)
+        finally:
+            self._tasks.pop(job_id, None)
+
+    async def tick(self, client: httpx.AsyncClient, job: AnnotationJob) -> None:
+        """One pass over the shards: submit unassigned ones, poll the rest."""
+        for shard in job.shards:
+            if shard.status in SHARD_TERMINAL:
+                continue
+            if not shard.remote_job_id:
+                await self._assign(client, job, shard)
+            else:
+                await self._poll(client, job, shard)
+        self._update_progress(job)
+
+    # -- assignment ---------------------------------------------------------
+
+    async def _assign(self, client: httpx.AsyncClient, job: AnnotationJob, shard: ShardInfo) -> None:
+        settings = self._settings()
+        if shard.attempts >= settings["max_attempts"]:
+            last = shard.history[-1]["reason"] if shard.history else "unknown"
+            shard.status = "failed"
+            shard.error = f"Gave up after {shard.attempts} attempt(s); last: {last}"
+            logger.error(f"[{job.job_id}] Shard {shard.index}: {shard.error}")
+            return
+
+        url = await self._pick_worker(client, job, shard)
+        if url is None:
+            shard.status = "pending"
+            return
+
+        payload = {"nct_ids": shard.nct_ids, **job.submit_options}
+        try:
+            resp = await client.post(f"{url}/api/jobs", json=payload, headers=self._headers())
+        except httpx.HTTPError as e:
+            self._record_failure(url, e)
+            return
+        if resp.status_code >= 500:
+            # e.g. 503 "Ollama is unreachable" — the worker, not the shard
+            self._record_failure(url, f"HTTP {resp.status_code}")
+            return
+        if resp.status_code >= 400:
+            # Validation errors are deterministic; another worker would agree.
+            shard.status = "failed"
+            shard.error = f"{url} rejected shard: {_detail(resp)}"
+            logger.error(f"[{job.job_id}] Shard {shard.index}: {shard.error}")
+            return
+
+        self._record_ok(url)
+        data = resp.json()
+        shard.worker_url = url
+        shard.remote_job_id = data.get("job_id")
+        shard.status = data.get("status", "queued")
+        shard.attempts += 1
+        shard.completed_trials = 0
+        shard.last_seen = now_pacific()
+        logger.info(
+            f"[{job.job_id}] Shard {shard.index} ({len(shard.nct_ids)} trials) -> "
+            f"{url} job {shard.remote_job_id} (attempt {shard.attempts})"
+        )
+
+    async def _pick_worker(
+        self, client: httpx.AsyncClient, job: AnnotationJob, shard: ShardInfo,
+    ) -> Optional[str]:
+        """Least-loaded live worker, avoiding the one this shard just left."""
+        live = [w for w in job.workers if w not in self._dead]
+        if not live:
+            for url in job.workers:
+                if await self._revive(client, job, url):
+                    live.append(url)
+        if not live:
+            return None
+        previous = shard.history[-1]["worker_url"] if shard.history else None
+        if previous in live and len(live) > 1:
+            live.remove(previous)
+        load = {w: 0 for w in live}
+        for other in job.shards:
+            if other.worker_url in load and other.status not in SHARD_TERMINAL:
+                load[other.worker_url] += 1
+        return min(live, key=lambda w: load[w])
+
+    def _reassign(self, job: AnnotationJob, shard: ShardInfo, reason: str) -> None:
+        shard.history.append({
+            "worker_url": shard.worker_url,
+            "remote_job_id": shard.remote_job_id,
+            "reason": reason,
+            "at": now_pacific().isoformat(),
+        })
+        logger.warning(
+            f"[{job.job_id}] Shard {shard.index}: {reason} — reassigning "
+            f"({len(shard.nct_ids)} trials)"
+        )
+        shard.worker_url = None
+        shard.remote_job_id = None
+        shard.status = "pending"
+        shard.completed_trials = 0
+
+    # -- polling ------------------------------------------------------------
+
+    async def _poll(self, client: httpx.AsyncClient, job: AnnotationJob, shard: ShardInfo) -> None:
+        url, rid = shard.worker_url, shard.remote_job_id
+        try:
+            resp = await client.get(f"{url}/api/jobs/{rid}", headers=self._headers())
+            if resp.status_code == 404:
+                # Worker came back with a different results dir, or lost state.
+                self._record_ok(url)
+                self._reassign(job, shard, f"job {rid} not found on {url}")
+                return
+            resp.raise_for_status()
+            remote = resp.json()
+            completed = (remote.get("progress") or {}).get("completed_trials", 0)
+            partial = await client.get(f"{url}/api/results/{rid}/partial", headers=self._headers())
+            if partial.status_code == 200:
+                completed = partial.json().get("count", {}).get("completed", completed)
+        except (httpx.HTTPError, ValueError) as e:
+            if self._record_failure(url, e):
+                self._reassign(job, shard, f"worker {url} unreachable")
+            return
+
+        self._record_ok(url)
+        shard.last_seen = now_pacific()
+        shard.commit_hash = remote.get("commit_hash", "") or shard.commit_hash
+        shard.completed_trials = min(int(completed or 0), len(shard.nct_ids))
+        status = remote.get("status", "")
+
+        if status == "completed":
+            await self._collect(client, job, shard)
+        elif status == "failed":
+            await self._resume_remote(client, job, shard, remote.get("error") or "remote job failed")
+        elif status == "cancelled":
+            self._reassign(job, shard, f"job {rid} cancelled on {url}")
+        else:
+            shard.status = status or shard.status
+
+    async def _resume_remote(
+        self, client: httpx.AsyncClient, job: AnnotationJob, shard: ShardInfo, reason: str,
+    ) -> None:
+        """Resume a failed remote job in place (keeps its progress), else reassign."""
+        if shard.attempts < self._settings()["max_attempts"]:
+            try:
+                resp = await client.post(
+                    f"{shard.worker_url}/api/jobs/{shard.remote_job_id}/resume",
+                    json={"force": True}, headers=self._headers(),
+                )
+                if resp.status_code == 200:
+                    shard.attempts += 1
+                    shard.status = "queued"
+                    logger.info(
+                        f"[{job.job_id}] Shard {shard.index}: resumed failed job "
+                        f"{shard.remote_job_id} on {shard.worker_url} ({reason})"
+                    )
+                    return
+                reason = f"{reason}; resume refused: {_detail(resp)}"
+            except httpx.HTTPError as e:
+                reason = f"{reason}; resume failed: {e}"
+        self._reassign(job, shard, reason)
+
+    async def _collect(self, client: httpx.AsyncClient, job: AnnotationJob, shard: ShardInfo) -> None:
+        """Pull a finished shard's trials into the coordinator's annotations dir."""
+        try:
+            resp = await client.get(
+                f"{shard.worker_url}/api/results/{shard.remote_job_id}", headers=self._headers(),
+            )
+            resp.raise_for_status()
+            data = resp.json()
+        except (httpx.HTTPError, ValueError) as e:
+            # Retried next tick; reassigned only if the worker goes dead.
+            if self._record_failure(shard.worker_url, e):
+                self._reassign(job, shard, f"worker {shard.worker_url} unreachable")
+            return
+
+        persistence = PersistenceService(self._results_dir)
+        wanted = set(shard.nct_ids)
+        saved = 0
+        for trial in data.get("trials") or []:
+            nct = (trial.get("nct_id") or "").upper()
+            if nct in wanted:
+                if trial.get("error"):
+                    persistence.save_annotation_error(job.job_id, nct, trial)
+                else:
+                    persistence.save_annotation(job.job_id, nct, trial)
+                wanted.discard(nct)
+                saved += 1
+        if wanted:
+            shard.error = f"{len(wanted)} trial(s) missing from worker output"
+            logger.warning(f"[{job.job_id}] Shard {shard.index}: {shard.error}: {sorted(wanted)[:10]}")
+        shard.status = "completed"
+        shard.completed_trials = saved
+        logger.info(
+            f"[{job.job_id}] Shard {shard.index} completed on {shard.worker_url}: "
+            f"{saved}/{len(shard.nct_ids)} trials collected"
+        )
+
+    async def _cancel_remote(self, client: httpx.AsyncClient, job: AnnotationJob) -> None:
+        for shard in job.shards:
+            if shard.status in SHARD_TERMINAL or not shard.remote_job_id:
+                continue
+            try:
+                await client.post(
+                    f"{shard.worker_url}/api/jobs/{shard.remote_job_id}/cancel",
+                    headers=self._headers(),
+                )
+            except httpx.HTTPError:
+                pass
+
+    # -- worker health ------------------------------------------------------
+
+    def _record_failure(self, url: str, err) -> bool:
+        """Count a failed request; returns True once the worker is dead."""
+        self._failures[url] = self._failures.get(url, 0) + 1
+        if url not in self._dead and self._failures[url] >= self._settings()["dead_after"]:
+            self._dead.add(url)
+            logger.warning(f"Shard worker {url} marked dead after {self._failures[url]} failures: {err}")
+        return url in self._dead
+
+    def _record_ok(self, url: str) -> None:
+        self._failures[url] = 0
+        self._dead.discard(url)
+
+    async def _revive(self, client: httpx.AsyncClient, job: AnnotationJob, url: str) -> bool:
+        """Health-check a dead worker; on success cancel its orphaned shard jobs."""
+        try:
+            resp = await client.get(f"{url}/api/health")
+            if resp.status_code != 200:
+                return False
+        except httpx.HTTPError:
+            return False
+        self._record_ok(url)
+        logger.info(f"Shard worker {url} is reachable again")
+        for shard in job.shards:
+            for entry in shard.history:
+                if entry.get("worker_url") != url or entry.get("cancelled"):
+                    continue
+                try:
+                    await client.post(
+                        f"{url}/api/jobs/{entry['remote_job_id']}/cancel", headers=self._headers(),
+                    )
+                except httpx.HTTPError:
+                    continue
+                entry["cancelled"] = True
+        return True
+
+    # -- progress / merge ---------------------------------------------------
+
+    def _update_progress(self, job: AnnotationJob) -> None:
+        progress = job.progress
+        progress.total_trials = len(job.nct_ids)
+        progress.completed_trials = sum(s.completed_trials for s in job.shards)
+        if job.started_at:
+            progress.elapsed_seconds = round(
+                (now_pacific() - job.started_at).total_seconds(), 1
+            )
+        if progress.completed_trials:
+            progress.avg_seconds_per_trial = round(
+                progress.elapsed_seconds / progress.completed_trials, 1
+            )
+            progress.estimated_remaining_seconds = round(
+                progress.avg_seconds_per_trial
+                * (progress.total_trials - progress.completed_trials), 1
+            )
+        job.updated_at = now_pacific()
+
+    async def finish(self, job: AnnotationJob) -> None:
+        """Merge collected shard trials into the canonical job JSON + CSV.
+
+        Collected trials go through the background writer, so it is flushed
+        before the merge reads them back. The merge itself (file reads and
+        writes) runs in a worker thread.
+        """
+        await asyncio.to_thread(persistence_writer.flush)
+
+        failed_shards = [s for s in job.shards if s.status != "completed"]
+        commits = sorted({s.commit_hash for s in job.shards if s.commit_hash})
+        if len(commits) > 1:
+            job.progress.warnings.append(
+                f"SHARDS: workers ran different commits {commits}; merged output is heterogeneous"
+            )
+        if failed_shards:
+            job.status = "failed"
+            job.error = "; ".join(f"shard {s.index}: {s.error}" for s in failed_shards)
+        else:
+            job.status = "completed"
+        self._update_progress(job)
+
+        total = await asyncio.to_thread(self._merge_outputs, job)
+        job.progress.completed_trials = total
+
+        job.finished_at = now_pacific()
+        job.progress.current_stage = "done" if job.status == "completed" else "error"
+        job.updated_at = now_pacific()
+        self.orchestrator.persist_job(job)
+        logger.info(
+            f"[{job.job_id}] Coordinator job {job.status}: {total}/"
+            f"{len(job.nct_ids)} trials merged from {len(job.shards)} shard(s)"
+        )
+
+    def _merge_outputs(self, job: AnnotationJob) -> int:
+        """Write the merged JSON and CSV; returns the number of trials.
+
+        Trials are streamed from the coordinator's per-trial files in job NCT
+        order (one counting pass, then the JSON and CSV writes), so the
+        merged job is never held in memory.
+        """
+        from app.services.output_service import iter_csv, save_json_output, stream_csv_to_file
+        from app.services.version_service import get_version_stamp
+
+        persistence = PersistenceService(self._results_dir)
+
+        def trials():
+            return persistence.iter_annotations(job.job_id, job.nct_ids)
+
+        total = successful = flagged = 0
+        for t in trials():
+            total += 1
+            successful += 1 if t.get("annotations") else 0
+            flagged += 1 if (t.get("verification") or {}).get("flagged_for_review") else 0
+
+        output = {
+            "version": get_version_stamp(),
+            "status": job.status,
+            "config_snapshot": job.config_snapshot,
+            "total_trials": total,
+            "successful": successful,
+            "failed": total - successful,
+            "manual_review": flagged,
+            "timing": {
+                "started_at": job.started_at.isoformat() if job.started_at else None,
+                "finished_at": now_pacific().isoformat(),
+                "elapsed_seconds": job.progress.elapsed_seconds,
+                "avg_seconds_per_trial": job.progress.avg_seconds_per_trial,
+                "commit_hash": job.commit_hash,
+                "timezone": "America/Los_Angeles",
+            },
+            "shards": [
+                {
+                    "index": s.index,
+                    "worker_url": s.worker_url,
+                    "remote_job_id": s.remote_job_id,
+                    "commit_hash": s.commit_hash,
+                    "status": s.status,
+                    "trials": len(s.nct_ids),
+                    "attempts": s.attempts,
+                    "error": s.error,
+                }
+                for s in job.shards
+            ],
+            "diagnostics": {"warnings": job.progress.warnings},
+        }
+        save_json_output(job.job_id, output, trials=trials())
+        _, chunks = stream_csv_to_file(iter_csv(trials(), job_id=job.job_id), job.job_id)
+        for _chunk in chunks:
+            pass
+        return total
+
+    def stats(self) -> dict:
+        return {
+            "active_jobs": sorted(self._tasks),
+            "dead_workers": sorted(self._dead),
+            "worker_failures": {u: n for u, n in self._failures.items() if n},
+        }
+
+
+def _detail(resp: httpx.Response) -> str:
+    try:
+        return str(resp.json().get("detail", resp.text))[:300]
+    except ValueError:
+        return resp.text[:300]
+
+
+# Module-level singleton
+shard_coordinator = ShardCoordinator()
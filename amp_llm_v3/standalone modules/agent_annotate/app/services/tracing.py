@@ -0,0 +1,294 @@
+"""
+Per-job span tracing of the annotation pipeline.
+
+Why this exists
+---------------
+``trial_times`` and ``field_timings`` say a trial took 400 seconds, not
+where those seconds went: the CT.gov fetch, NCBI 429 back-off, drug-name
+resolution, the peptide cascade, three verifiers or the reconciler. This
+module records nested, timed spans for every research agent, HTTP call,
+LLM call and post-processing step. Each job gets one trace file that opens
+in a flame-chart viewer (ui.perfetto.dev or chrome://tracing).
+
+Design
+------
+- Same mechanism as ``audit_trail``: ``contextvars`` carry the active trace
+  (bound once per job with ``bind_job``) and the current span. Tasks
+  spawned with ``asyncio.gather`` inherit both, so spans nest across agents
+  without threading trace args through every call. Each span is also tagged
+  with the audit context's nct_id / field / stage.
+- Output is the Chrome Trace Event format, as complete (``"ph": "X"``)
+  events. Concurrent children of one span can't share a track, so a span
+  that starts while a sibling is still open moves to a free track.
+  Sequential work stays on its parent's track and reads as a flame graph.
+- Events are appended to ``results/traces/<job_id>.trace.json`` in the
+  JSON-array form (no closing bracket), so a crash loses nothing and a
+  resumed job appends to the same file. ``load()`` returns the
+  ``{"traceEvents": [...]}`` object that ``GET /api/jobs/{id}/trace`` serves.
+
+Everything is best-effort: tracing must never break annotation. Outside a
+bound job, ``span()`` is a no-op.
+"""
+
+from __future__ import annotations
+
+import contextvars
+import json
+import logging
+import os
+import threading
+import time
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Any, Iterator, Optional
+
+from app.services.audit_trail import audit_recorder
+
+logger = logging.getLogger("agent_annotate.tracing")
+
+# Flush a job's buffer to disk once this many events are pending, even
+# between the orchestrator's explicit flush points.
+_FLUSH_EVERY = 2000
+
+
+class _Trace:
+    """Event buffer and track allocator for one job."""
+
+    def __init__(self, job_id: str, path: Path) -> None:
+        self.job_id = job_id
+        self.path = path
+        self.pid = os.getpid()
+        self._lock = threading.Lock()
+        self._events: list[dict] = []
+        self._free_tids: list[int] = []
+        self._next_tid = 1
+        self.spans = 0
+        self._events.append({
+            "name": "process_name", "ph": "M", "pid": self.pid, "tid": 0,
+            "args": {"name": f"job {job_id}"},
+        })
+
+    def acquire_tid(self) -> int:
+        with self._lock:
+            if self._free_tids:
+                return self._free_tids.pop()
+            tid = self._next_tid
+            self._next_tid += 1
+            self._events.append({
+                "name": "thread_name", "ph": "M", "pid": self.pid, "tid": tid,
+                "args": {"name": f"track {tid}"},
+            })
+            return tid
+
+    def release_tid(self, tid: int) -> None:
+        with self._lock:
+            self._free_tids.append(tid)
+            self._free_tids.sort(reverse=True)  # lowest track first
+
+    def add(self, event: dict) -> int:
+        with self._lock:
+            self._events.append(event)
+            self.spans += 1
+            return len(self._events)
+
+    def drain(self) -> list[dict]:
+        with self._lock:
+            events, self._events = self._events, []
+        return events
+
+
+class Span:
+    """One timed operation. ``set()`` attaches args shown in the viewer."""
+
+    __slots__ = ("trace", "parent", "name", "cat", "args", "tid", "owns_tid",
+                 "open_children", "start_us", "_t0")
+
+    def __init__(self, trace: _Trace, parent: Optional["Span"], name: str, cat: str,
+                 args: dict) -> None:
+        self.trace = trace
+        self.parent = parent
+        self.name = name
+        self.cat = cat
+        self.args = args
+        self.open_children = 0
+        if parent is not None and parent.trace is trace and parent.open_children == 0:
+            self.tid, self.owns_tid = parent.tid, False
+        else:
+            self.tid, self.owns_tid = trace.acquire_tid(), True
+        if parent is not None:
+            parent.open_children += 1
+        self.start_us = time.time_ns() // 1000
+        self._t0 = time.perf_counter()
+
+    def set(self, **args: Any) -> None:
+        self.args.update(args)
+
+    def finish(self) -> int:
+        dur_us = int((time.perf_counter() - self._t0) * 1_000_000)
+        if self.parent is not None:
+            self.parent.open_children -= 1
+        if self.owns_tid:
+            self.trace.release_tid(self.tid)
+        return self.trace.add({
+            "name": self.name, "cat": self.cat, "ph": "X",
+            "ts": self.start_us, "dur": max(dur_us, 1),
+            "pid": self.trace.pid, "tid": self.tid,
+            "args": {k: v for k, v in self.args.items() if v not in (None, "")},
+        })
+
+
+class _NullSpan:
+    def set(self, **args: Any) -> None:
+        pass
+
+
+_NULL_SPAN = _NullSpan()
+
+_trace_ctx: contextvars.ContextVar[Optional[_Trace]] = contextvars.ContextVar(
+    "trace_ctx", default=None
+)
+_span_ctx: contextvars.ContextVar[Optional[Span]] = contextvars.ContextVar(
+    "span_ctx", default=None
+)
+
+
+class Tracer:
+    """Records spans per job and persists them as Chrome trace files."""
+
+    def __init__(self, traces_dir: Optional[Path] = None) -> None:
+        self._enabled = True
+        self._traces_dir = traces_dir
+        self._traces: dict[str, _Trace] = {}
+        self._io_lock = threading.Lock()  # flushes come from the loop and to_thread
+
+    # -- toggling -----------------------------------------------------------
+    def set_enabled(self, value: bool) -> None:
+        self._enabled = bool(value)
+
+    def is_enabled(self) -> bool:
+        return self._enabled
+
+    def traces_dir(self) -> Path:
+        if self._traces_dir is None:
+            from app.config import RESULTS_DIR
+            self._traces_dir = RESULTS_DIR / "traces"
+        return self._traces_dir
+
+    def path_for(self, job_id: str) -> Path:
+        return self.traces_dir() / f"{job_id}.trace.json"
+
+    # -- job binding --------------------------------------------------------
+    def bind_job(self, job_id: str):
+        """Route spans in the current context to ``job_id``'s trace.
+
+        Returns a token for ``unbind_job``, or None when tracing is off.
+        """
+        if not self._enabled:
+            return None
+        trace = self._traces.get(job_id)
+        if trace is None:
+            trace = self._traces[job_id] = _Trace(job_id, self.path_for(job_id))
+        return _trace_ctx.set(trace)
+
+    def unbind_job(self, job_id: str, token) -> None:
+        """Flush and drop the job's trace, then restore the previous context."""
+        self.flush(job_id)
+        self._traces.pop(job_id, None)
+        if token is not None:
+            try:
+                _trace_ctx.reset(token)
+            except Exception:  # token from a different context — best-effort
+                pass
+
+    # -- spans --------------------------------------------------------------
+    @contextmanager
+    def span(self, name: str, cat: str = "", **args: Any) -> Iterator[Any]:
+        """Time the enclosed block as a child of the current span.
+
+        Usable around ``await`` in coroutines. Yields the span (or a no-op
+        stand-in when no job is bound) so callers can ``.set()`` results.
+        """
+        trace = _trace_ctx.get()
+        if trace is None:
+            yield _NULL_SPAN
+            return
+        try:
+            ctx = audit_recorder.current_context()
+            for key in ("nct_id", "field", "stage"):
+                if ctx.get(key) and key not in args:
+                    args[key] = ctx[key]
+            span = Span(trace, _span_ctx.get(), name, cat, args)
+            token = _span_ctx.set(span)
+        except Exception as e:  # tracing must never break annotation
+            logger.debug("span start failed: %s", e)
+            yield _NULL_SPAN
+            return
+        try:
+            yield span
+        except BaseException as e:
+            span.set(error=type(e).__name__)
+            raise
+        finally:
+            _span_ctx.reset(token)
+            try:
+                if span.finish() >= _FLUSH_EVERY:
+                    self.flush(trace.job_id)
+            except Exception as e:
+                logger.debug("span finish failed: %s", e)
+
+    def current(self) -> Any:
+        """The innermost open span, or a no-op stand-in."""
+        span = _span_ctx.get()
+        return span if span is not None else _NULL_SPAN
+
+    # -- persistence --------------------------------------------------------
+    def flush(self, job_id: str) -> None:
+        """Append the job's buffered events to its trace file."""
+        trace = self._traces.get(job_id)
+        if trace is None:
+            return
+        try:
+            with self._io_lock:
+                events = trace.drain()
+                if not events:
+                    return
+                trace.path.parent.mkdir(parents=True, exist_ok=True)
+                new_file = not trace.path.exists()
+                with open(trace.path, "a") as f:
+                    if new_file:
+                        f.write("[\n")
+                    f.write("".join(json.dumps(e, separators=(",", ":")) + ",\n" for e in events))
+        except Exception as e:
+            logger.debug("trace flush failed for %s: %s", job_id, e)
+
+    def load(self, job_id: str) -> Optional[dict]:
+        """The job's trace as a Chrome trace object, or None if none exists."""
+        self.flush(job_id)
+        path = self.path_for(job_id)
+        if not path.exists():
+            return None
+        events = []
+        with open(path) as f:
+            for line in f:
+                line = line.strip().rstrip(",")
+                if not line or line in ("[", "]"):
+                    continue
+                try:
+                    events.append(json.loads(line))
+                except ValueError:  # torn last line after a crash
+                    continue
+        return {
+            "traceEvents": events,
+            "displayTimeUnit": "ms",
+            "otherData": {"job_id": job_id},
+        }
+
+    def stats(self) -> dict:
+        return {
+            "active_traces": len(self._traces),
+            "spans": sum(t.spans for t in self._traces.values()),
+        }
+
+
+# Module-level singleton.
+tracer = Tracer()
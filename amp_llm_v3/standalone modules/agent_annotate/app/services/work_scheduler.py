@@ -0,0 +1,275 @@
+"""
+Trial-level work scheduler shared by all annotation jobs.
+
+Jobs used to run strictly FIFO, one whole job at a time. Two problems fell
+out of that:
+
+1. Overlapping jobs (holdout slices, production-gate sets, full-corpus
+   batches) share hundreds of NCTs, and every shared trial was researched
+   and annotated once per job.
+2. A 20-NCT interactive check submitted behind a 600-NCT overnight batch
+   waited ~2 days to start.
+
+This module fixes both without changing the per-job pipeline:
+
+- **Work items.** Each trial in a job is a ``WorkItemKey(nct_id,
+  config_hash, commit)``. Two jobs that would produce the same item (same
+  trial, same config, same code) compute it once. The first job to reach an
+  item *claims* it; other jobs either await the in-flight claim or, once it
+  completes, copy the persisted result from the owning job's directory.
+  Results are fanned out through the persistence layer rather than held in
+  memory, so the registry only stores ``(stage, key) -> job_id``.
+- **Priority lanes.** Jobs are assigned to the ``interactive`` lane (small)
+  or the ``batch`` lane (large). Each lane runs its own job at a time, so an
+  interactive job never waits for a batch job to *finish*. Ollama is still
+  one machine, so every annotate→verify mini-batch takes the Ollama slot
+  via ``ollama_slot(lane)``. Waiting interactive mini-batches always get the
+  slot ahead of waiting batch mini-batches. An interactive job therefore waits
+  at most one in-progress batch mini-batch.
+
+The registry is process-local (like ``drug_cache``): it is lost on restart,
+after which jobs simply recompute or resume from their own persisted state.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import logging
+from collections import deque
+from contextlib import asynccontextmanager
+from dataclasses import dataclass
+from typing import AsyncIterator, Optional
+
+from app.services.metrics import metrics
+
+logger = logging.getLogger("agent_annotate.work_scheduler")
+
+LANE_INTERACTIVE = "interactive"
+LANE_BATCH = "batch"
+LANES = (LANE_INTERACTIVE, LANE_BATCH)
+
+STAGE_RESEARCH = "research"
+STAGE_ANNOTATION = "annotation"
+
+
+@dataclass(frozen=True)
+class WorkItemKey:
+    """Identity of one unit of trial work.
+
+    Two jobs that share a key would produce byte-for-byte equivalent
+    research / annotation output, so only one of them needs to compute it.
+    """
+
+    nct_id: str
+    config_hash: str
+    commit: str
+
+
+class _PriorityGate:
+    """Single-holder async lock that hands off to interactive waiters first.
+
+    Within a lane, waiters are served FIFO.
+    """
+
+    def __init__(self) -> None:
+        self._held = False
+        self._holder_lane: Optional[str] = None
+        self._waiters: dict[str, deque[asyncio.Future]] = {
+            lane: deque() for lane in LANES
+        }
+
+    @property
+    def held(self) -> bool:
+        return self._held
+
+    @property
+    def holder_lane(self) -> Optional[str]:
+        return self._holder_lane
+
+    def waiting(self) -> dict[str, int]:
+        return {lane: len(q) for lane, q in self._waiters.items()}
+
+    async def acquire(self, lane: str) -> None:
+        if lane not in self._waiters:
+            lane = LANE_BATCH
+        if not self._held and not any(self._waiters.values()):
+            self._held = True
+            self._holder_lane = lane
+            return
+
+        fut: asyncio.Future = asyncio.get_running_loop().create_future()
+        self._waiters[lane].append(fut)
+        try:
+            await fut
+        except asyncio.CancelledError:
+            if fut.done() and not fut.cancelled():
+                # Ownership was handed to us just as we were cancelled —
+                # pass it on so the gate isn't leaked.
+                self.release()
+            else:
+                try:
+                    self._waiters[lane].remove(fut)
+                except ValueError:
+                    pass
+            raise
+        self._holder_lane = lane
+
+    def release(self) -> None:
+        for lane in LANES:
+            queue = self._waiters[lane]
+            while queue:
+                fut = queue.popleft()
+                if not fut.done():
+                    # Hand the gate over directly; _held stays True.
+                    self._holder_lane = lane
+                    fut.set_result(None)
+                    return
+        self._held = False
+        self._holder_lane = None
+
+
+class TrialWorkScheduler:
+    """Lane assignment, the shared Ollama slot, and cross-job item dedup."""
+
+    def __init__(self) -> None:
+        self._gate = _PriorityGate()
+        # (stage, key) -> future resolving to the owning job_id on success,
+        # or None if the owner gave up (error / cancel) and waiters should
+        # compute the item themselves.
+        self._inflight: dict[tuple[str, WorkItemKey], asyncio.Future] = {}
+        self._inflight_owner: dict[tuple[str, WorkItemKey], str] = {}
+        # (stage, key) -> job_id whose persisted output holds the result.
+        self._completed: dict[tuple[str, WorkItemKey], str] = {}
+        self.reused = {STAGE_RESEARCH: 0, STAGE_ANNOTATION: 0}
+        self.computed = {STAGE_RESEARCH: 0, STAGE_ANNOTATION: 0}
+
+    # -- lanes --------------------------------------------------------------
+
+    @staticmethod
+    def lane_for(total_trials: int, priority: Optional[str] = None) -> str:
+        """Pick a lane for a new job.
+
+        An explicit ``priority`` wins. Otherwise jobs at or under
+        ``orchestrator.interactive_lane_max_trials`` go to the interactive lane.
+        """
+        if priority in LANES:
+            return priority
+        try:
+            from app.services.config_service import config_service
+            limit = getattr(
+                config_service.get().orchestrator, "interactive_lane_max_trials", 25
+            )
+        except Exception:
+            limit = 25
+        return LANE_INTERACTIVE if 0 < total_trials <= limit else LANE_BATCH
+
+    @asynccontextmanager
+    async def ollama_slot(self, lane: str) -> AsyncIterator[None]:
+        """Hold the shared Ollama slot for one annotate→verify mini-batch."""
+        await self._gate.acquire(lane)
+        try:
+            yield
+        finally:
+            self._gate.release()
+
+    # -- work-item dedup ----------------------------------------------------
+
+    @staticmethod
+    def is_enabled() -> bool:
+        """``orchestrator.cross_job_dedup`` flag. Fails open like drug_cache."""
+        try:
+            from app.services.config_service import config_service
+            return getattr(config_service.get().orchestrator, "cross_job_dedup", True)
+        except Exception:
+            return True
+
+    def completed_source(self, stage: str, key: WorkItemKey) -> Optional[str]:
+        """Job ID holding a finished result for this item, if any."""
+        return self._completed.get((stage, key))
+
+    def claim(
+        self, stage: str, key: WorkItemKey, job_id: str
+    ) -> Optional[asyncio.Future]:
+        """Try to take ownership of a work item.
+
+        Returns None when the caller now owns the item and must compute it,
+        then call ``complete`` or ``abandon``. Returns the in-flight future
+        when another job owns it. The caller should await that future outside
+        any Ollama slot.
+        """
+        slot = (stage, key)
+        fut = self._inflight.get(slot)
+        if fut is not None and not fut.done():
+            if self._inflight_owner.get(slot) == job_id:
+                return None
+            return fut
+        self._inflight[slot] = asyncio.get_running_loop().create_future()
+        self._inflight_owner[slot] = job_id
+        return None
+
+    def complete(self, stage: str, key: WorkItemKey, job_id: str) -> None:
+        """Record a finished item and wake any jobs waiting on it."""
+        slot = (stage, key)
+        self._completed[slot] = job_id
+        self.computed[stage] = self.computed.get(stage, 0) + 1
+        self._resolve(slot, job_id)
+
+    def abandon(self, stage: str, key: WorkItemKey) -> None:
+        """Give up ownership without a result; waiters compute it themselves."""
+        self._resolve((stage, key), None)
+
+    def record_reuse(self, stage: str) -> None:
+        self.reused[stage] = self.reused.get(stage, 0) + 1
+
+    def forget(self, stage: str, key: WorkItemKey) -> None:
+        """Drop a completed entry whose persisted output turned out unusable."""
+        self._completed.pop((stage, key), None)
+
+    def release_job(self, job_id: str) -> int:
+        """Abandon every item still claimed by ``job_id``.
+
+        Called when a job ends for any reason (finish, cancel, crash). Other
+        jobs waiting on those items wake and compute them themselves.
+        """
+        owned = [s for s, owner in self._inflight_owner.items() if owner == job_id]
+        for slot in owned:
+            self._resolve(slot, None)
+        if owned:
+            logger.info(f"[{job_id}] Released {len(owned)} unfinished work item claim(s)")
+        return len(owned)
+
+    def _resolve(self, slot: tuple[str, WorkItemKey], job_id: Optional[str]) -> None:
+        fut = self._inflight.pop(slot, None)
+        self._inflight_owner.pop(slot, None)
+        if fut is not None and not fut.done():
+            fut.set_result(job_id)
+
+    # -- diagnostics --------------------------------------------------------
+
+    def stats(self) -> dict:
+        return {
+            "ollama_slot_held": self._gate.held,
+            "ollama_slot_lane": self._gate.holder_lane,
+            "ollama_slot_waiting": self._gate.waiting(),
+            "inflight_items": len(self._inflight),
+            "completed_items": len(self._completed),
+            "computed": dict(self.computed),
+            "reused": dict(self.reused),
+        }
+
+
+# Module-level singleton shared by every job in the process.
+work_scheduler = TrialWorkScheduler()
+
+
+@metrics.register_collector
+def _collect_scheduler():
+    s = work_scheduler.stats()
+    yield ("agent_annotate_queue_depth", "gauge", "Pending items per internal queue",
+           [({"queue": f"ollama_slot_{lane}"}, n)
+            for lane, n in s["ollama_slot_waiting"].items()])
+    yield ("agent_annotate_work_items_total", "counter",
+           "Cross-job work items computed vs reused from another job",
+           [({"stage": stage, "outcome": outcome}, n)
+            for outcome in ("computed", "reused")
+            for stage, n in s[outcome].items()])
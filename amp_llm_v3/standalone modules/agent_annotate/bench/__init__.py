@@ -0,0 +1,14 @@
+"""
+Offline benchmark harness for the annotation pipeline.
+
+- ``fake_ollama``: stand-in Ollama server with a latency model, replaying
+  replies from audit trails.
+- ``http_fixtures``: record/replay transport for every outbound research
+  request.
+- ``hot_paths``: micro-benchmarks of the deterministic (non-LLM) code,
+  run by ``scripts/bench_hot_paths.py``.
+
+``scripts/bench_pipeline.py`` combines the first two to run ``PipelineOrchestrator``
+on a fixed NCT slice and report trials/hour, per-phase time, LLM calls per
+trial and peak RSS. See docs/PERFORMANCE.md ("Benchmark harness").
+"""
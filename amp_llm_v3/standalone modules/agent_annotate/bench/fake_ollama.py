@@ -0,0 +1,318 @@
+"""
+Stand-in Ollama server for offline, deterministic pipeline benchmarks.
+
+Serves the endpoints ``OllamaAnnotationClient`` and the EDAM memory store
+use: ``/api/tags``, ``/api/generate``, ``/api/pull`` (streamed),
+``/api/embeddings``, ``/api/show`` and ``/api/ps``.
+
+Replies
+-------
+``/api/generate`` answers from a replay index built from per-trial audit
+trails (``results/annotations/<job_id>/NCT*.audit.md``), keyed by model +
+system + prompt, falling back to system + prompt when the model changed.
+With the HTTP fixtures replaying, a pipeline run sends the same prompts as
+the recorded job, so a benchmark reproduces its LLM decisions exactly.
+Unknown prompts get ``CANNED_REPLY``, a fixed answer that carries every
+label the annotators, verifiers and reconciler parse. Misses are counted.
+
+Latency model
+-------------
+Each generate call costs ``load_s`` the first time a model is used, plus
+prompt tokens / ``prompt_tokens_per_second`` and reply tokens /
+``tokens_per_second`` (tokens ≈ chars / 4). ``parallel`` requests run at
+once, like ``OLLAMA_NUM_PARALLEL``; ``time_scale`` multiplies every sleep
+(0 = no waiting). Reported durations are the modelled ones, unscaled.
+
+In-process use (what scripts/bench_pipeline.py does)::
+
+    fake = FakeOllama(FakeOllamaSettings(tokens_per_second=20))
+    fake.load_audits(Path("results/annotations/<job_id>"))
+    transport = httpx.ASGITransport(app=fake.app)
+
+Standalone, for a pipeline running in another process::
+
+    python3 -m bench.fake_ollama --port 11435 --audits results/annotations/<job_id>
+    OLLAMA_PORT=11435 uvicorn app.main:app ...
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import hashlib
+import json
+import logging
+import re
+import time
+from dataclasses import asdict, dataclass
+from pathlib import Path
+from typing import Iterable, Optional
+
+from fastapi import FastAPI, Request
+from fastapi.responses import JSONResponse, StreamingResponse
+
+logger = logging.getLogger("agent_annotate.bench.fake_ollama")
+
+# Valid for every parser: peptide annotator and verifiers, classification,
+# delivery mode, outcome (incl. the 2-pass "trial status" / "is this a
+# failure" extraction), reason for failure, reconciler and verifier
+# confidence. Peptide is True so the full field cascade runs.
+CANNED_REPLY = (
+    "Molecular class: peptide\n"
+    "Trial status: completed\n"
+    "Is this a failure: no\n"
+    "Peptide: True\n"
+    "Classification: Other\n"
+    "Delivery Mode: Injection/Infusion\n"
+    "Outcome: Unknown\n"
+    "Reason for Failure: EMPTY\n"
+    "Final Answer: Other\n"
+    "Confidence: Medium\n"
+    "Reasoning: Canned benchmark reply; no recorded response for this prompt.\n"
+)
+
+EMBEDDING_DIM = 768
+
+_CALL_RE = re.compile(r"^### \d+\. .*? — `([^`]*)`", re.MULTILINE)
+_BLOCK_RE = re.compile(r"\*\*(System|Input \(prompt \+ evidence\)|Output \(raw model reply\))\*\*\n\n```\n")
+
+
+def _tokens(text: str) -> int:
+    return max(1, len(text or "") // 4)
+
+
+def _key(*parts: str) -> str:
+    h = hashlib.sha256()
+    for part in parts:
+        h.update((part or "").encode())
+        h.update(b"\0")
+    return h.hexdigest()
+
+
+def _unfence(text: str) -> str:
+    # audit_trail._fence escapes ``` inside blocks as ʼʼʼ
+    return text.replace("ʼʼʼ", "```")
+
+
+def parse_audit(markdown: str) -> list[tuple[str, str, str, str]]:
+    """(model, system, prompt, response) for each call in one audit document."""
+    calls = []
+    heads = list(_CALL_RE.finditer(markdown))
+    for i, head in enumerate(heads):
+        end = heads[i + 1].start() if i + 1 < len(heads) else len(markdown)
+        section = markdown[head.end():end]
+        blocks: dict[str, str] = {}
+        for m in _BLOCK_RE.finditer(section):
+            close = section.find("\n```", m.end())
+            if close < 0:
+                break
+            blocks[m.group(1)] = _unfence(section[m.end():close])
+        if "Input (prompt + evidence)" in blocks and "Output (raw model reply)" in blocks:
+            calls.append((
+                head.group(1),
+                blocks.get("System", ""),
+                blocks["Input (prompt + evidence)"],
+                blocks["Output (raw model reply)"],
+            ))
+    return calls
+
+
+@dataclass
+class FakeOllamaSettings:
+    tokens_per_second: float = 20.0
+    prompt_tokens_per_second: float = 400.0
+    load_s: float = 5.0
+    parallel: int = 1
+    time_scale: float = 1.0
+
+
+class FakeOllama:
+    """ASGI app plus the replay index and request counters behind it."""
+
+    def __init__(self, settings: Optional[FakeOllamaSettings] = None) -> None:
+        self.settings = settings or FakeOllamaSettings()
+        self._replies: dict[str, str] = {}
+        self._loaded: set[str] = set()
+        self._pulled: set[str] = set()
+        self._slots: Optional[asyncio.Semaphore] = None
+        self.generate_calls = 0
+        self.replay_hits = 0
+        self.replay_misses = 0
+        self.embedding_calls = 0
+        self.app = self._build_app()
+
+    # -- replay index -------------------------------------------------------
+
+    def add_reply(self, model: str, system: str, prompt: str, response: str) -> None:
+        self._replies.setdefault(_key(model, system, prompt), response)
+        self._replies.setdefault(_key("", system, prompt), response)
+
+    def load_audits(self, paths: Iterable[Path]) -> int:
+        """Index every call in the given audit files / directories of them."""
+        if isinstance(paths, (str, Path)):
+            paths = [paths]
+        files: list[Path] = []
+        for p in map(Path, paths):
+            files.extend(sorted(p.rglob("*.audit.md")) if p.is_dir() else [p])
+        n = 0
+        for f in files:
+            for call in parse_audit(f.read_text(errors="replace")):
+                self.add_reply(*call)
+                n += 1
+        logger.info("fake ollama: %d recorded replies from %d audit files", n, len(files))
+        return n
+
+    def reply_for(self, model: str, system: str, prompt: str) -> str:
+        reply = self._replies.get(_key(model, system, prompt))
+        if reply is None:
+            reply = self._replies.get(_key("", system, prompt))
+        if reply is None:
+            self.replay_misses += 1
+            return CANNED_REPLY
+        self.replay_hits += 1
+        return reply
+
+    def stats(self) -> dict:
+        return {
+            "generate_calls": self.generate_calls,
+            "replay_hits": self.replay_hits,
+            "replay_misses": self.replay_misses,
+            "embedding_calls": self.embedding_calls,
+            "indexed_replies": len(self._replies) // 2,
+            "settings": asdict(self.settings),
+        }
+
+    # -- latency model ------------------------------------------------------
+
+    async def _generate(self, body: dict) -> dict:
+        s = self.settings
+        if self._slots is None:
+            self._slots = asyncio.Semaphore(max(1, s.parallel))
+        model = body.get("model", "")
+        system = body.get("system") or ""
+        prompt = body.get("prompt") or ""
+        self.generate_calls += 1
+        response = self.reply_for(model, system, prompt)
+        prompt_tokens = _tokens(system) + _tokens(prompt)
+        eval_tokens = _tokens(response)
+        async with self._slots:
+            load = 0.0 if model in self._loaded else s.load_s
+            self._loaded.add(model)
+            prompt_eval = prompt_tokens / max(s.prompt_tokens_per_second, 1e-9)
+            evaluation = eval_tokens / max(s.tokens_per_second, 1e-9)
+            total = load + prompt_eval + evaluation
+            if s.time_scale > 0:
+                await asyncio.sleep(total * s.time_scale)
+        return {
+            "model": model,
+            "created_at": time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime()),
+            "response": response,
+            "done": True,
+            "done_reason": "stop",
+            "total_duration": int(total * 1e9),
+            "load_duration": int(load * 1e9),
+            "prompt_eval_count": prompt_tokens,
+            "prompt_eval_duration": int(prompt_eval * 1e9),
+            "eval_count": eval_tokens,
+            "eval_duration": int(evaluation * 1e9),
+        }
+
+    def _embedding(self, text: str) -> list[float]:
+        # Deterministic unit-ish vector from the text hash.
+        seed = hashlib.sha256((text or "").encode()).digest()
+        return [((seed[i % 32] + i) % 256) / 255.0 - 0.5 for i in range(EMBEDDING_DIM)]
+
+    # -- routes -------------------------------------------------------------
+
+    def _build_app(self) -> FastAPI:
+        app = FastAPI(title="fake-ollama")
+
+        @app.get("/api/tags")
+        async def tags():
+            return {"models": [{"name": m, "model": m, "size": 0} for m in sorted(self._pulled)]}
+
+        @app.get("/api/ps")
+        async def ps():
+            return {"models": [{"name": m, "model": m} for m in sorted(self._loaded)]}
+
+        @app.post("/api/show")
+        async def show(request: Request):
+            body = await request.json()
+            return {"modelfile": "", "details": {"family": "fake"}, "model": body.get("model") or body.get("name")}
+
+        @app.post("/api/pull")
+        async def pull(request: Request):
+            body = await request.json()
+            name = body.get("name") or body.get("model") or ""
+            self._pulled.add(name)
+            if body.get("stream") is False:
+                return {"status": "success"}
+
+            async def progress():
+                for status in ("pulling manifest", "verifying sha256 digest", "success"):
+                    yield json.dumps({"status": status}) + "\n"
+
+            return StreamingResponse(progress(), media_type="application/x-ndjson")
+
+        @app.post("/api/generate")
+        async def generate(request: Request):
+            body = await request.json()
+            if not body.get("prompt") and not body.get("system"):
+                # Ollama answers an empty prompt by loading the model.
+                self._loaded.add(body.get("model", ""))
+                return {"model": body.get("model", ""), "response": "", "done": True}
+            return JSONResponse(await self._generate(body))
+
+        @app.post("/api/embeddings")
+        async def embeddings(request: Request):
+            body = await request.json()
+            self.embedding_calls += 1
+            return {"embedding": self._embedding(body.get("prompt", ""))}
+
+        @app.post("/api/embed")
+        async def embed(request: Request):
+            body = await request.json()
+            inputs = body.get("input") or ""
+            if isinstance(inputs, str):
+                inputs = [inputs]
+            self.embedding_calls += len(inputs)
+            return {"model": body.get("model", ""), "embeddings": [self._embedding(t) for t in inputs]}
+
+        @app.get("/_fake/stats")
+        async def fake_stats():
+            return self.stats()
+
+        return app
+
+
+def main() -> int:
+    ap = argparse.ArgumentParser(description="Stand-in Ollama server for benchmarks")
+    ap.add_argument("--host", default="127.0.0.1")
+    ap.add_argument("--port", type=int, default=11435)
+    ap.add_argument("--audits", type=Path, nargs="*", default=[],
+                    help="audit .md files or directories to replay replies from")
+    ap.add_argument("--tokens-per-second", type=float, default=20.0)
+    ap.add_argument("--prompt-tokens-per-second", type=float, default=400.0)
+    ap.add_argument("--load-s", type=float, default=5.0)
+    ap.add_argument("--parallel", type=int, default=1)
+    ap.add_argument("--time-scale", type=float, default=1.0)
+    args = ap.parse_args()
+
+    import uvicorn
+
+    logging.basicConfig(level=logging.INFO)
+    fake = FakeOllama(FakeOllamaSettings(
+        tokens_per_second=args.tokens_per_second,
+        prompt_tokens_per_second=args.prompt_tokens_per_second,
+        load_s=args.load_s,
+        parallel=args.parallel,
+        time_scale=args.time_scale,
+    ))
+    if args.audits:
+        fake.load_audits(args.audits)
+    uvicorn.run(fake.app, host=args.host, port=args.port, log_level="warning")
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
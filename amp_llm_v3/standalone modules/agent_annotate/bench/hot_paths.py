@@ -0,0 +1,468 @@
+"""
+Micro-benchmarks for the deterministic (non-LLM) hot paths.
+
+Each case times one function over a corpus:
+
+- research bundles: the newest ``results/research/<job_id>/NCT*.json`` per
+  trial. When none are on disk, a seeded synthetic corpus shaped like
+  them is used (same agents, raw_data layout and snippet sizes).
+- sequences: the annotated sequences and annotator pairs from
+  ``docs/human_ground_truth_*_df.csv``.
+
+A case is ``prepare(corpus) -> (setup, run)``. ``setup()`` builds fresh
+inputs outside the timed region, for functions that mutate their input.
+``run(state)`` makes one pass and returns the number of calls. ``measure``
+repeats passes until ``min_time`` has elapsed and keeps the fastest
+per-call time, which is the least noisy statistic on a shared machine.
+
+``scripts/bench_hot_paths.py`` runs the suite, appends reports to a
+per-commit history and fails when a case regressed past a threshold.
+"""
+
+from __future__ import annotations
+
+import csv
+import json
+import logging
+import random
+import statistics
+import time
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any, Callable, Optional
+
+from app.models.annotation import FieldAnnotation
+from app.models.research import ResearchResult, SourceCitation
+
+logger = logging.getLogger("agent_annotate.bench.hot_paths")
+
+PKG_ROOT = Path(__file__).resolve().parent.parent
+GROUND_TRUTH_CSVS = sorted((PKG_ROOT / "docs").glob("human_ground_truth_*_df.csv"))
+
+
+@dataclass
+class Corpus:
+    trials: list[tuple[str, list[ResearchResult]]]
+    sequences: list[str]
+    sequence_pairs: list[tuple[str, str, str]]  # (nct_id, ann1, ann2)
+    drug_names: list[str]
+    source: str
+    dossiers: list[tuple[str, dict]] = field(default_factory=list)
+
+
+# -- corpus -------------------------------------------------------------------
+
+def load_research_bundles(research_dir: Path, limit: int = 0) -> list[tuple[str, list[ResearchResult]]]:
+    """The newest persisted research per NCT across all jobs."""
+    files = sorted(research_dir.glob("*/NCT*.json"), key=lambda p: p.stat().st_mtime, reverse=True)
+    trials: dict[str, list[ResearchResult]] = {}
+    for path in files:
+        nct = path.stem
+        if nct in trials:
+            continue
+        try:
+            data = json.loads(path.read_text())
+            trials[nct] = [ResearchResult(**r) for r in data.get("results", [])]
+        except Exception as e:
+            logger.debug("skipping %s: %s", path, e)
+            continue
+        if limit and len(trials) >= limit:
+            break
+    return sorted(trials.items())
+
+
+_WORDS = (
+    "peptide trial patients dose response safety efficacy randomized placebo "
+    "cohort antimicrobial infection wound topical injection receptor analogue "
+    "phase primary endpoint secondary outcome week month baseline improvement "
+    "tolerated adverse events immune vaccine antibody clearance plasma study"
+).split()
+_FINDINGS = (
+    "met the primary endpoint", "did not meet the primary endpoint",
+    "was well tolerated", "showed no significant difference", "induces immune response",
+    "improved clinical outcomes", "was discontinued due to adverse events", "",
+)
+_STATUSES = ("COMPLETED", "TERMINATED", "WITHDRAWN", "RECRUITING", "ACTIVE_NOT_RECRUITING", "UNKNOWN")
+_AGENTS_PUB = (("literature", "pubmed", 12), ("openalex", "openalex", 8),
+               ("semantic_scholar", "semantic_scholar", 6), ("crossref", "crossref", 5),
+               ("biorxiv", "biorxiv", 2))
+
+
+def _text(rng: random.Random, words: int) -> str:
+    return " ".join(rng.choice(_WORDS) for _ in range(words))
+
+
+def synthetic_bundles(n: int = 40, seed: int = 0) -> list[tuple[str, list[ResearchResult]]]:
+    """Research bundles shaped like Phase 1 output, for trees with no results/."""
+    from agents.annotation.sequence import _KNOWN_SEQUENCES
+
+    rng = random.Random(seed)
+    known = sorted(_KNOWN_SEQUENCES)
+    trials = []
+    for i in range(n):
+        nct = f"NCT{10_000_000 + i * 7919:08d}"
+        drug = rng.choice(known) if rng.random() < 0.5 else f"XR-{rng.randint(100, 9999)}"
+        status = rng.choice(_STATUSES)
+        year = rng.randint(2003, 2022)
+        sponsor = f"{rng.choice(_WORDS).title()} Therapeutics, Inc."
+        pmids = [str(rng.randint(10_000_000, 39_999_999)) for _ in range(rng.randint(0, 3))]
+        proto = {
+            "identificationModule": {"nctId": nct, "briefTitle": f"A study of {drug} in {_text(rng, 4)}"},
+            "statusModule": {
+                "overallStatus": status, "hasResults": rng.random() < 0.3,
+                "whyStopped": _text(rng, 6) if status in ("TERMINATED", "WITHDRAWN") else "",
+                "startDateStruct": {"date": f"{year}-0{rng.randint(1, 9)}"},
+                "primaryCompletionDateStruct": {"date": f"{year + 2}-0{rng.randint(1, 9)}-15"},
+            },
+            "designModule": {"phases": [rng.choice(("PHASE1", "PHASE2", "PHASE3"))]},
+            "armsInterventionsModule": {"interventions": [
+                {"type": "DRUG", "name": drug, "description": _text(rng, 25)},
+                {"type": "DRUG", "name": "Placebo", "description": _text(rng, 10)},
+            ]},
+            "sponsorCollaboratorsModule": {"leadSponsor": {"name": sponsor}},
+            "referencesModule": {"references": [{"pmid": p, "type": "RESULT"} for p in pmids]},
+            "conditionsModule": {"conditions": [_text(rng, 2) for _ in range(2)]},
+            "descriptionModule": {"briefSummary": _text(rng, 120)},
+        }
+        raw = {"protocol_section": proto}
+        if proto["statusModule"]["hasResults"]:
+            raw["resultsSection"] = {"outcomeMeasuresModule": {"outcomeMeasures": [{
+                "title": _text(rng, 6), "description": _text(rng, 30),
+                "analyses": [{"pValue": f"{rng.random() / 10:.3f}", "statisticalComment": _text(rng, 8)}],
+                "groups": [{"title": drug}, {"title": "Placebo"}],
+            }]}}
+        results = [ResearchResult(
+            agent_name="clinical_protocol", nct_id=nct, raw_data=raw,
+            citations=[SourceCitation(source_name="clinicaltrials_gov", identifier=nct,
+                                      snippet=f"{status} {_text(rng, 40)}", quality_score=0.95)],
+        )]
+        for agent, source, count in _AGENTS_PUB:
+            cites = []
+            for j in range(rng.randint(count // 2, count)):
+                mention = nct if rng.random() < 0.15 else ""
+                pub_year = year + rng.randint(-2, 6)
+                snippet = (
+                    f"Title: {drug} {_text(rng, 10)} {mention}\nAuthors: {_text(rng, 4)}\n"
+                    f"Journal: {_text(rng, 3).title()} ({pub_year})\n"
+                    f"Abstract: {_text(rng, 60)} {sponsor if rng.random() < 0.2 else ''} "
+                    f"{drug} {rng.choice(_FINDINGS)}. {_text(rng, 20)}"
+                )
+                cites.append(SourceCitation(
+                    source_name=source, snippet=snippet, title=_text(rng, 8),
+                    identifier=f"PMID:{pmids[0]}" if pmids and j == 0 else f"PMID:{rng.randint(10_000_000, 39_999_999)}",
+                    quality_score=round(rng.uniform(0.4, 0.9), 2),
+                ))
+            results.append(ResearchResult(agent_name=agent, nct_id=nct, citations=cites))
+        results.extend([
+            ResearchResult(agent_name="peptide_identity", nct_id=nct, citations=[
+                SourceCitation(source_name="uniprot", identifier=f"P{rng.randint(10000, 99999)}",
+                               snippet=f"{drug} {_text(rng, 30)}", quality_score=0.8)
+                for _ in range(rng.randint(0, 4))
+            ]),
+            ResearchResult(agent_name="dbaasp", nct_id=nct, citations=[
+                SourceCitation(source_name="dbaasp", snippet=f"{drug} {_text(rng, 20)}", quality_score=0.85)
+                for _ in range(rng.randint(0, 3))
+            ]),
+            ResearchResult(agent_name="chembl", nct_id=nct, raw_data={
+                f"chembl_{drug.lower()}_molecules": [{"max_phase": rng.choice((None, 1, 2, 3, 4))}],
+            }, citations=[SourceCitation(source_name="chembl", snippet=_text(rng, 25), quality_score=0.85)]),
+            ResearchResult(agent_name="fda_drugs", nct_id=nct, raw_data={
+                f"fda_drugs_{drug.lower()}_approved": rng.random() < 0.2,
+                f"fda_drugs_{drug.lower()}_indication": _text(rng, 12),
+            }),
+            ResearchResult(agent_name="press_release", nct_id=nct, raw_data={
+                "press_release_evidence": [
+                    {"title": f"{sponsor} {rng.choice(_FINDINGS)}", "link": f"https://news.example/{k}",
+                     "date": f"{year + 2}-06-01", "source": "wire", "classification": "neutral"}
+                    for k in range(rng.randint(0, 3))
+                ],
+                "has_positive_pr": rng.random() < 0.2, "has_negative_pr": rng.random() < 0.1,
+            }),
+            ResearchResult(agent_name="drug_code_resolver", nct_id=nct, raw_data={
+                "resolved_drug_names": {drug: [{"name": drug.lower()}, {"name": _text(rng, 1)}]},
+            }),
+            ResearchResult(agent_name="web_context", nct_id=nct, citations=[
+                SourceCitation(source_name="duckduckgo", snippet=_text(rng, 40), quality_score=0.3)
+                for _ in range(rng.randint(0, 5))
+            ]),
+        ])
+        trials.append((nct, results))
+    return trials
+
+
+def load_ground_truth_sequences() -> tuple[list[str], list[tuple[str, str, str]]]:
+    sequences: list[str] = []
+    pairs: list[tuple[str, str, str]] = []
+    for path in GROUND_TRUTH_CSVS:
+        with open(path, newline="") as f:
+            for row in csv.DictReader(f):
+                a, b = row.get("Sequence_ann1") or "", row.get("Sequence_ann2") or ""
+                sequences.extend(s for s in (a, b) if s)
+                if a or b:
+                    pairs.append((row.get("nct_id", "").upper(), a, b))
+    return sequences, pairs
+
+
+def build_corpus(research_dir: Optional[Path] = None, limit: int = 0, seed: int = 0) -> Corpus:
+    trials: list[tuple[str, list[ResearchResult]]] = []
+    source = ""
+    if research_dir is not None and research_dir.exists():
+        trials = load_research_bundles(research_dir, limit)
+        source = f"{research_dir} ({len(trials)} trials)"
+    if not trials:
+        trials = synthetic_bundles(limit or 40, seed)
+        source = f"synthetic (seed={seed}, {len(trials)} trials)"
+    sequences, pairs = load_ground_truth_sequences()
+    names: list[str] = []
+    for _, results in trials:
+        for r in results:
+            if r.agent_name != "clinical_protocol":
+                continue
+            proto = r.raw_data.get("protocol_section", r.raw_data.get("protocolSection", {}))
+            for intv in proto.get("armsInterventionsModule", {}).get("interventions", []) or []:
+                if isinstance(intv, dict) and intv.get("name"):
+                    names.append(intv["name"].lower())
+    return Corpus(trials, sequences, pairs, names, source)
+
+
+# -- cases --------------------------------------------------------------------
+
+Prepared = tuple[Callable[[], Any], Callable[[Any], int]]
+CASES: dict[str, Callable[[Corpus], Prepared]] = {}
+
+
+def case(name: str):
+    def register(fn: Callable[[Corpus], Prepared]):
+        CASES[name] = fn
+        return fn
+    return register
+
+
+def _dossiers(corpus: Corpus) -> list[tuple[str, dict]]:
+    from agents.annotation.outcome import _build_evidence_dossier
+
+    if not corpus.dossiers:
+        corpus.dossiers = [(nct, _build_evidence_dossier(r, nct)) for nct, r in corpus.trials]
+    return corpus.dossiers
+
+
+@case("outcome.build_evidence_dossier")
+def _case_dossier(corpus: Corpus) -> Prepared:
+    from agents.annotation.outcome import _build_evidence_dossier
+
+    def run(_):
+        for nct, results in corpus.trials:
+            _build_evidence_dossier(results, nct)
+        return len(corpus.trials)
+    return (lambda: None), run
+
+
+@case("outcome.format_dossier_for_llm")
+def _case_format(corpus: Corpus) -> Prepared:
+    from agents.annotation.outcome import _format_dossier_for_llm
+
+    dossiers = _dossiers(corpus)
+
+    def run(_):
+        for nct, dossier in dossiers:
+            _format_dossier_for_llm(dossier, nct)
+        return len(dossiers)
+    return (lambda: None), run
+
+
+@case("pub_trial_matcher.classify_pub_relevance")
+def _case_matcher(corpus: Corpus) -> Prepared:
+    from app.services.pub_trial_matcher import classify_pub_relevance
+
+    calls = []
+    for nct, d in _dossiers(corpus):
+        meta = {
+            "nct_id": nct, "sponsor_name": d["sponsor_name"],
+            "interventions": d["intervention_names"], "start_year": d["trial_start_year"],
+            "registered_pmids": d["registered_pmids"],
+        }
+        for pub in d["publications"]:
+            calls.append(({"pmid": pub.get("pmid"), "text": pub.get("title", ""), "year": pub.get("year")}, meta))
+
+    def run(_):
+        for pub, meta in calls:
+            classify_pub_relevance(pub, meta)
+        return len(calls)
+    return (lambda: None), run
+
+
+@case("base.build_structured_evidence")
+def _case_structured(corpus: Corpus) -> Prepared:
+    from agents.annotation import ANNOTATION_AGENTS
+    from agents.evidence import evidence_bundles
+
+    agent = ANNOTATION_AGENTS["classification"]()
+    # As in Phase 2: the trial's bundle was built once after research.
+    for nct, results in corpus.trials:
+        evidence_bundles.build(nct, results)
+
+    def run(_):
+        for nct, results in corpus.trials:
+            agent.build_structured_evidence(nct, results)
+        return len(corpus.trials)
+    return (lambda: None), run
+
+
+@case("evidence.bundle_build")
+def _case_bundle(corpus: Corpus) -> Prepared:
+    from agents.evidence import EvidenceBundle
+
+    def run(_):
+        for nct, results in corpus.trials:
+            EvidenceBundle(nct, results)
+        return len(corpus.trials)
+    return (lambda: None), run
+
+
+@case("sequence.normalize_sequence")
+def _case_normalize(corpus: Corpus) -> Prepared:
+    from agents.annotation.sequence import normalize_sequence
+
+    raws = [part for s in corpus.sequences for part in s.split(" | ")]
+
+    def run(_):
+        for raw in raws:
+            normalize_sequence(raw)
+        return len(raws)
+    return (lambda: None), run
+
+
+@case("sequence.parse_helm_sequence")
+def _case_helm(corpus: Corpus) -> Prepared:
+    from agents.annotation.sequence import _parse_helm_sequence
+
+    helms = [
+        "PEPTIDE1{" + ".".join(c for c in part.strip().upper() if c.isalpha()) + "}$$$$"
+        for s in corpus.sequences for part in s.split(" | ") if part.strip()
+    ]
+
+    def run(_):
+        for helm in helms:
+            _parse_helm_sequence(helm)
+        return len(helms)
+    return (lambda: None), run
+
+
+@case("sequence.resolve_known_sequence")
+def _case_resolve(corpus: Corpus) -> Prepared:
+    from agents.annotation.sequence import resolve_known_sequence
+
+    names = corpus.drug_names or ["placebo"]
+
+    def run(_):
+        for name in names:
+            resolve_known_sequence(name)
+        return len(names)
+    return (lambda: None), run
+
+
+@case("concordance.compare_sequences")
+def _case_compare(corpus: Corpus) -> Prepared:
+    from app.services.concordance_service import _compare_sequences
+
+    pairs = corpus.sequence_pairs
+
+    def run(_):
+        for nct, a, b in pairs:
+            _compare_sequences(a, b, nct)
+        return len(pairs)
+    return (lambda: None), run
+
+
+@case("orchestrator.enforce_consistency")
+def _case_consistency(corpus: Corpus) -> Prepared:
+    from app.services.orchestrator import PipelineOrchestrator
+
+    rng = random.Random(1)
+    templates = []
+    for nct, results in corpus.trials:
+        templates.append((results, [
+            {"field_name": "peptide", "value": rng.choice(("True", "False"))},
+            {"field_name": "classification", "value": rng.choice(("AMP", "Other"))},
+            {"field_name": "outcome", "value": rng.choice(("Positive", "Unknown", "Terminated"))},
+            {"field_name": "reason_for_failure", "value": rng.choice(("", "Business Reason"))},
+            {"field_name": "sequence", "value": rng.choice(("", "ASTTTNYT", "KRIHIGPGRAFYT"))},
+        ]))
+
+    def setup():
+        # The rules rewrite values in place; each pass starts from the originals.
+        return [
+            (results, [FieldAnnotation(reasoning="r", **a) for a in anns])
+            for results, anns in templates
+        ]
+
+    def run(state):
+        for results, anns in state:
+            PipelineOrchestrator._enforce_consistency(anns, results)
+        return len(state)
+    return setup, run
+
+
+# -- timing -------------------------------------------------------------------
+
+def measure(prepared: Prepared, min_time: float = 0.2, repeats: int = 5) -> dict:
+    """Per-call time of a case: best and median over ``repeats`` rounds.
+
+    Each round runs passes until ``min_time / repeats`` has elapsed.
+    """
+    setup, run = prepared
+    per_call: list[float] = []
+    calls = 0
+    budget = min_time / max(repeats, 1)
+    for _ in range(max(repeats, 1)):
+        elapsed = 0.0
+        n = 0
+        while True:
+            state = setup()
+            start = time.perf_counter()
+            calls = run(state)
+            elapsed += time.perf_counter() - start
+            n += 1
+            if elapsed >= budget:
+                break
+        per_call.append(elapsed / n / max(calls, 1))
+    return {
+        "per_call_us": round(min(per_call) * 1e6, 3),
+        "median_us": round(statistics.median(per_call) * 1e6, 3),
+        "calls_per_pass": calls,
+    }
+
+
+def run_suite(
+    corpus: Corpus,
+    names: Optional[list[str]] = None,
+    min_time: float = 0.2,
+    repeats: int = 5,
+) -> dict[str, dict]:
+    # The consistency rules log every override at INFO.
+    previous = logging.getLogger("agent_annotate").level
+    logging.getLogger("agent_annotate").setLevel(logging.WARNING)
+    try:
+        results = {}
+        for name, prepare in CASES.items():
+            if names and not any(n in name for n in names):
+                continue
+            results[name] = measure(prepare(corpus), min_time, repeats)
+        return results
+    finally:
+        logging.getLogger("agent_annotate").setLevel(previous)
+
+
+def regressions(
+    current: dict[str, dict], baseline: dict[str, dict], threshold: float,
+) -> list[tuple[str, float, float, float]]:
+    """Cases whose per-call time grew by more than ``threshold`` (0.25 = 25%)."""
+    slower = []
+    for name, cur in current.items():
+        base = baseline.get(name)
+        if not base or not base.get("per_call_us"):
+            continue
+        ratio = cur["per_call_us"] / base["per_call_us"]
+        if ratio > 1 + threshold:
+            slower.append((name, base["per_call_us"], cur["per_call_us"], ratio))
+    return slower
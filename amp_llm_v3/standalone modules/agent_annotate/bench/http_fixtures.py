@@ -0,0 +1,231 @@
+"""
+Record / replay HTTP fixtures for the research clients.
+
+Every research client under ``agents/research/`` opens its own
+``httpx.AsyncClient``. ``install()`` patches the client constructor so a
+client created without an explicit transport gets a ``FixtureTransport``:
+
+- ``record``: requests go to the network and each response (status,
+  content-type, body, elapsed time) is appended to
+  ``<fixtures_dir>/<host>.jsonl.gz``. 429s and 5xx are not recorded, so the
+  client's retry lands the real answer.
+- ``replay``: responses come from the fixture files only. A request with
+  no fixture gets a 404, which every client already treats as "nothing
+  found", and is counted in ``stats()["misses"]`` so a benchmark can tell
+  when its fixtures no longer cover the code under test.
+
+Requests for the routed hosts (the Ollama base URL) go to an in-process
+ASGI app instead, e.g. ``bench.fake_ollama``.
+
+Fixture keys are method + URL with sorted query params + a hash of the
+body. Credentials (``api_key``, ``email``, ``tool``, ``mailto``) are left
+out of the key and the stored URL, so fixtures recorded with an NCBI key
+replay without one.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import base64
+import gzip
+import hashlib
+import json
+import logging
+import threading
+from pathlib import Path
+from typing import Optional
+from urllib.parse import urlencode
+
+import httpx
+
+logger = logging.getLogger("agent_annotate.bench.http_fixtures")
+
+MODES = ("record", "replay")
+
+_REDACTED_PARAMS = frozenset({"api_key", "apikey", "email", "tool", "mailto"})
+_HOP_HEADERS = frozenset({"content-encoding", "content-length", "transfer-encoding"})
+
+
+def fixture_key(method: str, url: httpx.URL, body: bytes = b"") -> str:
+    params = sorted(
+        (k, v) for k, v in url.params.multi_items() if k.lower() not in _REDACTED_PARAMS
+    )
+    key = f"{method.upper()} {url.scheme}://{url.host}{url.path}"
+    if params:
+        key += "?" + urlencode(params)
+    if body:
+        key += " #" + hashlib.sha256(body).hexdigest()[:16]
+    return key
+
+
+class FixtureStore:
+    """Fixture records per host, loaded lazily and appended when recording."""
+
+    def __init__(self, root: Path, mode: str = "replay", replay_latency: bool = True) -> None:
+        if mode not in MODES:
+            raise ValueError(f"mode must be one of {MODES}")
+        self.root = Path(root)
+        self.mode = mode
+        self.replay_latency = replay_latency
+        self._hosts: dict[str, dict[str, dict]] = {}
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.recorded = 0
+        self.misses_by_host: dict[str, int] = {}
+        self.requests_by_host: dict[str, int] = {}
+
+    def _path(self, host: str) -> Path:
+        return self.root / f"{host}.jsonl.gz"
+
+    def _records(self, host: str) -> dict[str, dict]:
+        with self._lock:
+            records = self._hosts.get(host)
+            if records is not None:
+                return records
+            records = {}
+            path = self._path(host)
+            if path.exists():
+                with gzip.open(path, "rt") as f:
+                    for line in f:
+                        try:
+                            rec = json.loads(line)
+                        except ValueError:  # torn last line from an interrupted recording
+                            continue
+                        records.setdefault(rec["key"], rec)
+            self._hosts[host] = records
+            return records
+
+    def get(self, host: str, key: str) -> Optional[dict]:
+        self.requests_by_host[host] = self.requests_by_host.get(host, 0) + 1
+        rec = self._records(host).get(key)
+        if rec is None:
+            self.misses += 1
+            self.misses_by_host[host] = self.misses_by_host.get(host, 0) + 1
+        else:
+            self.hits += 1
+        return rec
+
+    def put(self, host: str, key: str, url: str, response: httpx.Response,
+            content: bytes, elapsed: float) -> None:
+        records = self._records(host)
+        if key in records:
+            return
+        try:
+            body = {"text": content.decode("utf-8")}
+        except UnicodeDecodeError:
+            body = {"b64": base64.b64encode(content).decode("ascii")}
+        rec = {
+            "key": key,
+            "url": url,
+            "status": response.status_code,
+            "content_type": response.headers.get("content-type", ""),
+            "elapsed_ms": round(elapsed * 1000, 1),
+            **body,
+        }
+        with self._lock:
+            records[key] = rec
+            self.root.mkdir(parents=True, exist_ok=True)
+            with gzip.open(self._path(host), "at") as f:
+                f.write(json.dumps(rec, separators=(",", ":")) + "\n")
+            self.recorded += 1
+
+    def stats(self) -> dict:
+        return {
+            "mode": self.mode,
+            "hits": self.hits,
+            "misses": self.misses,
+            "recorded": self.recorded,
+            "requests_by_host": dict(sorted(self.requests_by_host.items())),
+            "misses_by_host": dict(sorted(self.misses_by_host.items())),
+        }
+
+
+def _redacted_url(url: httpx.URL) -> str:
+    params = [(k, v) for k, v in url.params.multi_items() if k.lower() not in _REDACTED_PARAMS]
+    return str(url.copy_with(query=urlencode(params).encode() if params else None))
+
+
+class FixtureTransport(httpx.AsyncBaseTransport):
+    """Serves one client's requests from a ``FixtureStore`` (or records them)."""
+
+    def __init__(
+        self,
+        store: FixtureStore,
+        routes: Optional[dict[str, httpx.AsyncBaseTransport]] = None,
+        inner: Optional[httpx.AsyncBaseTransport] = None,
+    ) -> None:
+        self.store = store
+        self.routes = routes or {}
+        self.inner = inner
+
+    async def handle_async_request(self, request: httpx.Request) -> httpx.Response:
+        netloc = request.url.netloc.decode()
+        routed = self.routes.get(netloc)
+        if routed is not None:
+            return await routed.handle_async_request(request)
+
+        host = request.url.host
+        body = await request.aread()
+        key = fixture_key(request.method, request.url, body)
+
+        if self.store.mode == "record":
+            loop = asyncio.get_running_loop()
+            start = loop.time()
+            response = await self.inner.handle_async_request(request)
+            content = await response.aread()
+            await response.aclose()
+            elapsed = loop.time() - start
+            if response.status_code != 429 and response.status_code < 500:
+                self.store.put(host, key, _redacted_url(request.url), response, content, elapsed)
+            # content is already decoded, so drop the encoding/length headers
+            headers = [
+                (k, v) for k, v in response.headers.multi_items()
+                if k.lower() not in _HOP_HEADERS
+            ]
+            return httpx.Response(
+                response.status_code, headers=headers, content=content, request=request,
+            )
+
+        rec = self.store.get(host, key)
+        if rec is None:
+            return httpx.Response(
+                404, json={"error": "no fixture", "key": key}, request=request,
+            )
+        if self.store.replay_latency and rec.get("elapsed_ms"):
+            await asyncio.sleep(rec["elapsed_ms"] / 1000)
+        content = (
+            rec["text"].encode("utf-8") if "text" in rec
+            else base64.b64decode(rec.get("b64", ""))
+        )
+        headers = {"content-type": rec["content_type"]} if rec.get("content_type") else {}
+        return httpx.Response(rec["status"], headers=headers, content=content, request=request)
+
+    async def aclose(self) -> None:
+        if self.inner is not None:
+            await self.inner.aclose()
+
+
+_original_init = httpx.AsyncClient.__init__
+
+
+def install(store: FixtureStore, routes: Optional[dict[str, httpx.AsyncBaseTransport]] = None) -> None:
+    """Give every ``httpx.AsyncClient`` built without a transport a fixture transport.
+
+    ``routes`` maps ``host:port`` to a transport that bypasses the fixtures
+    (the fake Ollama app).
+    """
+
+    def patched_init(client, *args, **kwargs):
+        if kwargs.get("transport") is None and not kwargs.get("mounts"):
+            inner = None
+            if store.mode == "record":
+                inner = httpx.AsyncHTTPTransport(verify=kwargs.get("verify", True))
+            kwargs["transport"] = FixtureTransport(store, routes, inner)
+        _original_init(client, *args, **kwargs)
+
+    httpx.AsyncClient.__init__ = patched_init
+
+
+def uninstall() -> None:
+    httpx.AsyncClient.__init__ = _original_init
@@ -0,0 +1,153 @@
+#!/usr/bin/env python3
+"""
+Micro-benchmarks for the deterministic hot paths (bench/hot_paths.py).
+
+Times _build_evidence_dossier, _format_dossier_for_llm, the pub-to-trial
+matcher, build_structured_evidence / EvidenceBundle, normalize_sequence,
+_parse_helm_sequence, resolve_known_sequence, _compare_sequences and
+_enforce_consistency over the research bundles in results/research/ (or a
+seeded synthetic corpus when there are none) and the ground-truth sequences.
+
+Usage:
+    python3 scripts/bench_hot_paths.py                      # print timings
+    python3 scripts/bench_hot_paths.py --save               # + append to history
+    python3 scripts/bench_hot_paths.py --check a1b2c3d      # fail on >25% regressions
+    python3 scripts/bench_hot_paths.py --check base.json --threshold 0.1 --cases sequence
+
+--check takes a report file (--out) or a commit in the history file
+(results/bench/hot_paths.jsonl); "last" means the newest entry from another
+commit. Exit status is 1 when any case regressed past --threshold, so CI
+can run it on the baseline commit with --save and then on the PR with
+--check.
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import platform
+import subprocess
+import sys
+from datetime import datetime, timezone
+from pathlib import Path
+
+THIS_DIR = Path(__file__).resolve().parent
+PKG_ROOT = THIS_DIR.parent
+if str(PKG_ROOT) not in sys.path:
+    sys.path.insert(0, str(PKG_ROOT))
+
+from app.config import RESULTS_DIR  # noqa: E402
+from bench.hot_paths import CASES, build_corpus, regressions, run_suite  # noqa: E402
+
+DEFAULT_HISTORY = RESULTS_DIR / "bench" / "hot_paths.jsonl"
+
+
+def git_commit() -> str:
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], cwd=PKG_ROOT,
+            capture_output=True, text=True,
+        ).stdout.strip()
+    except OSError:
+        return ""
+
+
+def read_history(path: Path) -> list[dict]:
+    if not path.exists():
+        return []
+    entries = []
+    for line in path.read_text().splitlines():
+        try:
+            entries.append(json.loads(line))
+        except ValueError:
+            continue
+    return entries
+
+
+def resolve_baseline(ref: str, history: list[dict], commit: str) -> dict:
+    path = Path(ref)
+    if path.exists():
+        return json.loads(path.read_text())
+    if ref == "last":
+        candidates = [e for e in history if e.get("commit") != commit]
+    else:
+        candidates = [e for e in history if e.get("commit", "").startswith(ref)]
+    if not candidates:
+        raise SystemExit(f"No baseline for {ref!r} (history has {len(history)} entries)")
+    return candidates[-1]
+
+
+def main() -> int:
+    ap = argparse.ArgumentParser(description=__doc__.split("\n")[1])
+    ap.add_argument("--research-dir", type=Path, default=RESULTS_DIR / "research")
+    ap.add_argument("--limit", type=int, default=0, help="max trials (default: all / 40 synthetic)")
+    ap.add_argument("--seed", type=int, default=0, help="synthetic corpus seed")
+    ap.add_argument("--synthetic", action="store_true", help="ignore results/research")
+    ap.add_argument("--cases", nargs="*", help="only cases whose name contains one of these")
+    ap.add_argument("--min-time", type=float, default=1.0, help="seconds per case")
+    ap.add_argument("--repeats", type=int, default=5)
+    ap.add_argument("--history", type=Path, default=DEFAULT_HISTORY)
+    ap.add_argument("--save", action="store_true", help="append this run to the history")
+    ap.add_argument("--out", type=Path, help="write this run's report here")
+    ap.add_argument("--check", help="baseline report file, commit in history, or 'last'")
+    ap.add_argument("--threshold", type=float, default=0.25,
+                    help="allowed per-call slowdown before --check fails (0.25 = 25%%)")
+    ap.add_argument("--list", action="store_true", help="list cases and exit")
+    args = ap.parse_args()
+
+    if args.list:
+        print("\n".join(CASES))
+        return 0
+
+    corpus = build_corpus(None if args.synthetic else args.research_dir, args.limit, args.seed)
+    print(f"Hot-path benchmarks — corpus: {corpus.source}, "
+          f"{len(corpus.sequences)} GT sequences, {len(corpus.sequence_pairs)} pairs")
+    cases = run_suite(corpus, args.cases, args.min_time, args.repeats)
+    commit = git_commit()
+    report = {
+        "commit": commit,
+        "timestamp": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+        "python": platform.python_version(),
+        "machine": platform.node(),
+        "corpus": corpus.source,
+        "cases": cases,
+    }
+
+    baseline = None
+    if args.check:
+        baseline = resolve_baseline(args.check, read_history(args.history), commit)
+    base_cases = baseline["cases"] if baseline else {}
+    header = f"{'case':<42} {'µs/call':>10} {'median':>10} {'calls':>7}"
+    if baseline:
+        header += f" {'base ' + baseline.get('commit', '')[:7]:>13} {'change':>8}"
+    print(header)
+    for name, r in cases.items():
+        line = f"{name:<42} {r['per_call_us']:>10.2f} {r['median_us']:>10.2f} {r['calls_per_pass']:>7}"
+        base = base_cases.get(name)
+        if base and base.get("per_call_us"):
+            line += f" {base['per_call_us']:>13.2f} {(r['per_call_us'] / base['per_call_us'] - 1) * 100:>+7.1f}%"
+        print(line)
+
+    if args.out:
+        args.out.write_text(json.dumps(report, indent=2) + "\n")
+    if args.save:
+        args.history.parent.mkdir(parents=True, exist_ok=True)
+        with open(args.history, "a") as f:
+            f.write(json.dumps(report) + "\n")
+        print(f"Saved to {args.history}")
+
+    if baseline:
+        if baseline.get("corpus") != report["corpus"]:
+            print(f"Note: baseline corpus was {baseline.get('corpus')!r}")
+        slower = regressions(cases, base_cases, args.threshold)
+        if slower:
+            print(f"\nFAIL: {len(slower)} case(s) slower than baseline by >{args.threshold:.0%}:")
+            for name, base, cur, ratio in slower:
+                print(f"  ✗ {name}: {base:.2f} → {cur:.2f} µs/call ({ratio:.2f}x)")
+            return 1
+        print(f"\nOK: no case slower than baseline by >{args.threshold:.0%}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
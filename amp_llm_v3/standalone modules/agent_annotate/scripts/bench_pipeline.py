@@ -0,0 +1,267 @@
+#!/usr/bin/env python3
+"""
+Offline pipeline benchmark: run PipelineOrchestrator on a fixed NCT slice.
+
+Research HTTP is served from recorded fixtures (bench/http_fixtures.py) and
+Ollama by the stand-in server (bench/fake_ollama.py), so two runs on the same
+slice do the same work and a perf PR can be compared against its baseline
+commit without network, GPU or run-to-run API noise.
+
+Usage:
+    # Once per slice, with network + a real Ollama: record fixtures and
+    # the audit trails the fake Ollama replays.
+    python3 scripts/bench_pipeline.py --slice scripts/fast_learning_batch_25.txt \\
+        --limit 10 --record --ollama live --keep-results bench/fixtures/fast10/audits
+
+    # Offline benchmark (baseline commit, then the PR):
+    python3 scripts/bench_pipeline.py --slice scripts/fast_learning_batch_25.txt \\
+        --limit 10 --out /tmp/base.json
+    python3 scripts/bench_pipeline.py --slice scripts/fast_learning_batch_25.txt \\
+        --limit 10 --compare /tmp/base.json
+
+--slice accepts any text file (txt/csv/json); every NCT ID in it is used, in
+order. Fixtures default to bench/fixtures/<slice stem>[_<limit>]/, and the
+fake Ollama replays audit trails from <fixtures>/audits/ when present.
+
+Reports trials/hour, per-phase wall time, LLM calls per trial (total and by
+model), HTTP requests and fixture misses, and peak RSS.
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import json
+import os
+import re
+import resource
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+THIS_DIR = Path(__file__).resolve().parent
+PKG_ROOT = THIS_DIR.parent
+if str(PKG_ROOT) not in sys.path:
+    sys.path.insert(0, str(PKG_ROOT))
+
+NCT_RE = re.compile(r"NCT\d{8}", re.IGNORECASE)
+
+# Reported metrics compared by --compare, with the direction that is better.
+COMPARED = (
+    ("trials_per_hour", "higher"),
+    ("wall_seconds", "lower"),
+    ("phase_seconds.research", "lower"),
+    ("phase_seconds.annotation", "lower"),
+    ("llm_calls_per_trial", "lower"),
+    ("http_requests", "lower"),
+    ("peak_rss_mb", "lower"),
+)
+
+
+def read_ncts(path: Path) -> list[str]:
+    return list(dict.fromkeys(m.upper() for m in NCT_RE.findall(path.read_text())))
+
+
+def git_commit() -> tuple[str, bool]:
+    def git(*args: str) -> str:
+        return subprocess.run(
+            ["git", *args], cwd=PKG_ROOT, capture_output=True, text=True,
+        ).stdout.strip()
+    try:
+        return git("rev-parse", "--short", "HEAD"), bool(git("status", "--porcelain", "--", "."))
+    except OSError:
+        return "", False
+
+
+def peak_rss_mb() -> float:
+    rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # KiB on Linux, bytes on macOS
+    return round(rss / (1024 * 1024 if sys.platform == "darwin" else 1024), 1)
+
+
+def _totals(name: str, by: str = "") -> dict[str, float]:
+    from app.services.metrics import metrics
+    out: dict[str, float] = {}
+    for labels, value in metrics.values(name):
+        key = labels.get(by, "") if by else ""
+        out[key] = out.get(key, 0.0) + value
+    return out
+
+
+def _delta(after: dict[str, float], before: dict[str, float]) -> dict[str, float]:
+    return {k: round(v - before.get(k, 0.0), 3) for k, v in after.items() if v - before.get(k, 0.0)}
+
+
+async def run_benchmark(args: argparse.Namespace, nct_ids: list[str]) -> dict:
+    import httpx
+
+    from app.config import OLLAMA_BASE_URL
+    from bench import http_fixtures
+    from bench.fake_ollama import FakeOllama, FakeOllamaSettings
+
+    fixtures_dir: Path = args.fixtures
+    store = http_fixtures.FixtureStore(
+        fixtures_dir, mode="record" if args.record else "replay",
+        replay_latency=not args.no_http_latency,
+    )
+    fake = None
+    ollama_netloc = httpx.URL(OLLAMA_BASE_URL).netloc.decode()
+    if args.ollama == "fake":
+        fake = FakeOllama(FakeOllamaSettings(
+            tokens_per_second=args.tokens_per_second,
+            prompt_tokens_per_second=args.prompt_tokens_per_second,
+            load_s=args.load_s,
+            parallel=args.parallel,
+            time_scale=args.time_scale,
+        ))
+        audits = args.audits or fixtures_dir / "audits"
+        if audits.exists():
+            fake.load_audits(audits)
+        routes = {ollama_netloc: httpx.ASGITransport(app=fake.app)}
+    else:
+        routes = {ollama_netloc: httpx.AsyncHTTPTransport()}
+    http_fixtures.install(store, routes)
+
+    import app.services.memory as memory
+    from app.services.orchestrator import PHASE_DURATION, orchestrator  # noqa: F401
+
+    if args.no_edam:
+        async def _skip_edam(*a, **k):
+            return {}
+        memory.edam_post_job_hook = _skip_edam
+
+    phases_before = _totals("agent_annotate_phase_duration_seconds", "phase")
+    llm_before = _totals("agent_annotate_llm_requests_total", "model")
+
+    job = orchestrator.create_job(nct_ids)
+    started = time.perf_counter()
+    orchestrator.enqueue_job(job.job_id)
+    while job.status not in ("completed", "failed", "cancelled"):
+        await asyncio.sleep(0.2)
+    wall = time.perf_counter() - started
+    http_fixtures.uninstall()
+
+    llm_by_model = _delta(_totals("agent_annotate_llm_requests_total", "model"), llm_before)
+    llm_calls = sum(llm_by_model.values())
+    completed = job.progress.completed_trials
+    commit, dirty = git_commit()
+    http = store.stats()
+    return {
+        "commit": commit,
+        "dirty": dirty,
+        "slice": str(args.slice),
+        "job_id": job.job_id,
+        "status": job.status,
+        "error": job.error,
+        "trials": len(nct_ids),
+        "completed_trials": completed,
+        "wall_seconds": round(wall, 2),
+        "trials_per_hour": round(completed / wall * 3600, 2) if wall else 0.0,
+        "phase_seconds": _delta(
+            _totals("agent_annotate_phase_duration_seconds", "phase"), phases_before,
+        ),
+        "llm_calls": int(llm_calls),
+        "llm_calls_per_trial": round(llm_calls / completed, 2) if completed else 0.0,
+        "llm_calls_by_model": llm_by_model,
+        "http_requests": sum(http["requests_by_host"].values()) if not args.record else http["recorded"],
+        "http": http,
+        "fake_ollama": fake.stats() if fake else None,
+        "peak_rss_mb": peak_rss_mb(),
+    }
+
+
+def _lookup(report: dict, dotted: str):
+    value = report
+    for part in dotted.split("."):
+        if not isinstance(value, dict):
+            return None
+        value = value.get(part)
+    return value
+
+
+def compare(current: dict, baseline: dict) -> str:
+    lines = [
+        f"{'metric':<26} {'baseline':>12} {'current':>12} {'change':>9}",
+        f"{'':<26} {baseline.get('commit', '?'):>12} {current.get('commit', '?'):>12}",
+    ]
+    for name, better in COMPARED:
+        a, b = _lookup(baseline, name), _lookup(current, name)
+        if a is None and b is None:
+            continue
+        change = ""
+        if isinstance(a, (int, float)) and isinstance(b, (int, float)) and a:
+            pct = (b - a) / a * 100
+            good = pct > 0 if better == "higher" else pct < 0
+            change = f"{pct:+.1f}%{'' if abs(pct) < 0.05 else (' ✓' if good else ' ✗')}"
+        lines.append(f"{name:<26} {a if a is not None else '—':>12} {b if b is not None else '—':>12} {change:>9}")
+    return "\n".join(lines)
+
+
+def main() -> int:
+    ap = argparse.ArgumentParser(description=__doc__.split("\n")[1])
+    ap.add_argument("--slice", type=Path, required=True, help="file with the NCT IDs to run")
+    ap.add_argument("--limit", type=int, default=0, help="only the first N NCTs of the slice")
+    ap.add_argument("--fixtures", type=Path, help="fixture directory (default: bench/fixtures/<slice>)")
+    ap.add_argument("--record", action="store_true", help="hit the network and record fixtures")
+    ap.add_argument("--no-http-latency", action="store_true",
+                    help="replay fixtures instantly instead of with their recorded latency")
+    ap.add_argument("--ollama", choices=("fake", "live"), default="fake",
+                    help="stand-in server (default) or the OLLAMA_HOST/OLLAMA_PORT one")
+    ap.add_argument("--audits", type=Path, help="audit trails to replay (default: <fixtures>/audits)")
+    ap.add_argument("--tokens-per-second", type=float, default=20.0)
+    ap.add_argument("--prompt-tokens-per-second", type=float, default=400.0)
+    ap.add_argument("--load-s", type=float, default=5.0, help="fake model load time, first call per model")
+    ap.add_argument("--parallel", type=int, default=1, help="fake OLLAMA_NUM_PARALLEL")
+    ap.add_argument("--time-scale", type=float, default=1.0,
+                    help="multiply fake LLM sleeps (0 = no LLM latency)")
+    ap.add_argument("--no-edam", action="store_true", help="skip the EDAM post-job hook")
+    ap.add_argument("--keep-results", type=Path,
+                    help="copy the job's audit trails here (use with --record to seed replays)")
+    ap.add_argument("--out", type=Path, help="write the report JSON here")
+    ap.add_argument("--compare", type=Path, help="baseline report JSON to compare against")
+    args = ap.parse_args()
+
+    nct_ids = read_ncts(args.slice)
+    if args.limit:
+        nct_ids = nct_ids[:args.limit]
+    if not nct_ids:
+        print(f"No NCT IDs in {args.slice}", file=sys.stderr)
+        return 2
+    if args.fixtures is None:
+        name = args.slice.stem + (f"_{args.limit}" if args.limit else "")
+        args.fixtures = PKG_ROOT / "bench" / "fixtures" / name
+
+    # Isolate the run: fresh results dir (no cross-job dedup, no EDAM state
+    # from earlier runs) and no waiting on the other branch's port.
+    results_dir = Path(tempfile.mkdtemp(prefix="bench_results_"))
+    os.environ["AGENT_ANNOTATE_RESULTS_DIR"] = str(results_dir)
+    os.environ["AGENT_ANNOTATE_CROSS_BRANCH_GATE"] = "0"
+
+    print(f"Benchmark: {len(nct_ids)} NCTs from {args.slice}")
+    print(f"  fixtures: {args.fixtures} ({'record' if args.record else 'replay'}), ollama: {args.ollama}")
+    try:
+        report = asyncio.run(run_benchmark(args, nct_ids))
+        if args.keep_results:
+            args.keep_results.mkdir(parents=True, exist_ok=True)
+            for audit in (results_dir / "annotations" / report["job_id"]).glob("*.audit.md"):
+                shutil.copy2(audit, args.keep_results / audit.name)
+    finally:
+        shutil.rmtree(results_dir, ignore_errors=True)
+
+    print(json.dumps(report, indent=2, default=str))
+    if args.out:
+        args.out.write_text(json.dumps(report, indent=2, default=str) + "\n")
+    if args.compare:
+        print()
+        print(compare(report, json.loads(args.compare.read_text())))
+    if report["http"]["misses"]:
+        print(f"\nWARNING: {report['http']['misses']} requests had no fixture "
+              f"(re-record with --record): {report['http']['misses_by_host']}")
+    return 0 if report["status"] == "completed" else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,81 @@
+#!/usr/bin/env python3
+"""Fill and refresh the offline ClinicalTrials.gov mirror.
+
+The mirror (agents/research/ctgov_mirror.py) serves protocols to Phase 1
+and nct_lookup at disk speed once `orchestrator.ctgov_mirror: true` (or
+CTGOV_MIRROR=1 for nct_lookup). Default file:
+amp_llm_v3/ct_database/ctgov_mirror.db (override with
+AGENT_ANNOTATE_CTGOV_MIRROR or --db).
+
+Usage:
+    # Official bulk download (zip of study JSONs), limited to our universe:
+    python3 scripts/ctgov_mirror.py import ctg-studies.json.zip \\
+        --ncts "Final Agent Annotations/ALL_consolidated__full_universe__1844_NCTs.csv"
+
+    # Delta refresh: re-check lastUpdatePostDate, download changed/missing.
+    python3 scripts/ctgov_mirror.py sync --ncts FILE    # or --all
+    python3 scripts/ctgov_mirror.py stats
+
+--ncts accepts any text file (txt/csv/json); every NCT ID in it is used.
+"""
+from __future__ import annotations
+
+import argparse
+import asyncio
+import json
+import re
+import sys
+from pathlib import Path
+
+HERE = Path(__file__).resolve().parent
+ROOT = HERE.parent
+sys.path.insert(0, str(ROOT))
+
+NCT_RE = re.compile(r"NCT\d{8}", re.IGNORECASE)
+
+
+def read_ncts(path: Path) -> list[str]:
+    return list(dict.fromkeys(m.upper() for m in NCT_RE.findall(path.read_text())))
+
+
+def main() -> int:
+    ap = argparse.ArgumentParser(description=__doc__.split("\n")[0])
+    ap.add_argument("--db", type=Path, help="mirror file (default: app.config.CTGOV_MIRROR_PATH)")
+    sub = ap.add_subparsers(dest="cmd", required=True)
+
+    imp = sub.add_parser("import", help="load a bulk download zip or a directory of study JSONs")
+    imp.add_argument("source", type=Path)
+    imp.add_argument("--ncts", type=Path, help="only import NCT IDs listed in this file")
+
+    syn = sub.add_parser("sync", help="delta refresh against the live API")
+    group = syn.add_mutually_exclusive_group(required=True)
+    group.add_argument("--ncts", type=Path, help="NCT IDs to refresh (missing ones are added)")
+    group.add_argument("--all", action="store_true", help="every study already in the mirror")
+    syn.add_argument("--max-age-days", type=float, default=0.0,
+                     help="skip records confirmed within this many days (default: check all)")
+
+    sub.add_parser("stats", help="record count, size and check ages")
+    args = ap.parse_args()
+
+    from agents.research.ctgov_mirror import open_mirror
+    if args.db is None:
+        from app.config import CTGOV_MIRROR_PATH
+        args.db = CTGOV_MIRROR_PATH
+    mirror = open_mirror(args.db)
+
+    if args.cmd == "import":
+        only = set(read_ncts(args.ncts)) if args.ncts else None
+        n = mirror.import_archive(args.source, only=only)
+        print(f"imported {n} studies into {mirror.path}")
+    elif args.cmd == "sync":
+        from agents.research.ctgov_bulk import CTGovStudyStore
+        ncts = mirror.nct_ids() if args.all else read_ncts(args.ncts)
+        store = CTGovStudyStore(mirror=mirror, max_age_days=args.max_age_days)
+        asyncio.run(store.prefetch(ncts))
+        print(json.dumps(store.stats(), indent=2))
+    print(json.dumps(mirror.stats(), indent=2))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
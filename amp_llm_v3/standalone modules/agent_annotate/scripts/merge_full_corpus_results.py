@@ -15,9 +15,15 @@ Outputs:
 
 Usage:
     python3 scripts/merge_full_corpus_results.py JOB_ID_1 JOB_ID_2
+    python3 scripts/merge_full_corpus_results.py JOB_ID_1 JOB_ID_2 --json-dir /path/to/results/json
 
 Prereq: both job IDs must have completed (status=completed) and their
-result JSONs must be on disk in the prod results path.
+result JSONs must be on disk under --json-dir (default: this checkout's
+results/json).
+
+Superseded by coordinator mode (POST /api/jobs/sharded), which shards one
+job across workers and writes the merged JSON/CSV itself; kept for
+re-merging the legacy two-batch outputs.
 """
 from __future__ import annotations
 
@@ -26,15 +32,12 @@ import json
 import sys
 from pathlib import Path
 
-PROD_JSON_BASE = Path(
-    "/Users/amphoraxe/Developer/amphoraxe/llm.amphoraxe.ca/amp_llm_v3/"
-    "standalone modules/agent_annotate/results/json"
-)
 HERE = Path(__file__).resolve().parent
+DEFAULT_JSON_DIR = HERE.parent / "results" / "json"
 
 
-def load_job(job_id: str) -> dict:
-    p = PROD_JSON_BASE / f"{job_id}.json"
+def load_job(job_id: str, json_dir: Path = DEFAULT_JSON_DIR) -> dict:
+    p = json_dir / f"{job_id}.json"
     if not p.exists():
         raise SystemExit(f"job result not found: {p}")
     return json.load(p.open())
@@ -46,10 +49,12 @@ def main() -> int:
     ap.add_argument("job_id_2", help="full-corpus batch 2 job ID")
     ap.add_argument("--label", default="full_corpus_merged",
                     help="output filename prefix (default: full_corpus_merged)")
+    ap.add_argument("--json-dir", type=Path, default=DEFAULT_JSON_DIR,
+                    help=f"directory holding <job_id>.json (default: {DEFAULT_JSON_DIR})")
     args = ap.parse_args()
 
-    job1 = load_job(args.job_id_1)
-    job2 = load_job(args.job_id_2)
+    job1 = load_job(args.job_id_1, args.json_dir)
+    job2 = load_job(args.job_id_2, args.json_dir)
 
     trials_1 = job1.get("trials") or job1.get("results") or []
     trials_2 = job2.get("trials") or job2.get("results") or []
@@ -0,0 +1,239 @@
+#!/usr/bin/env python3
+"""
+Unit tests for the offline benchmark harness (bench/, scripts/bench_pipeline.py).
+
+No network: the fake Ollama runs in-process behind httpx.ASGITransport and
+recording goes through an httpx.MockTransport. Verifies:
+  1. The fake Ollama replays replies parsed from a rendered audit trail
+     (incl. escaped code fences), falls back to the canned reply on a miss,
+     and reports durations from its latency model.
+  2. Pulled models show up in /api/tags; embeddings are deterministic.
+  3. Fixtures round-trip: record writes per-host gzip JSONL without 429s
+     or credentials, replay serves the same bytes regardless of param
+     order, and a miss is a counted 404.
+  4. install() injects the fixture transport only into clients built
+     without one, routes the Ollama host to its app, and uninstall()
+     restores httpx.
+  5. metrics.values() sums histograms; compare() marks regressions.
+
+Usage:
+    cd <agent_annotate_dir>
+    python3 scripts/test_bench_harness.py
+"""
+
+from __future__ import annotations
+
+import asyncio
+import gzip
+import json
+import sys
+import tempfile
+from pathlib import Path
+
+THIS_DIR = Path(__file__).resolve().parent
+PKG_ROOT = THIS_DIR.parent
+if str(PKG_ROOT) not in sys.path:
+    sys.path.insert(0, str(PKG_ROOT))
+
+import httpx  # noqa: E402
+
+from app.services.audit_trail import LLMCall, audit_recorder  # noqa: E402
+from bench import http_fixtures  # noqa: E402
+from bench.fake_ollama import CANNED_REPLY, FakeOllama, FakeOllamaSettings  # noqa: E402
+
+
+def _fake(**settings) -> FakeOllama:
+    return FakeOllama(FakeOllamaSettings(time_scale=0, **settings))
+
+
+def test_fake_ollama_replay():
+    reply = "Peptide: False\nReasoning: small molecule ```not a fence```\n"
+    call = LLMCall(
+        nct_id="NCT00000001", field="peptide", stage="annotation", model="qwen3:14b",
+        temperature=0.1, system="You are an annotator.", prompt="Evidence:\n```\nx\n```",
+        response=reply, prompt_chars=0, response_chars=0, timestamp="t",
+    )
+    audit_dir = Path(tempfile.mkdtemp())
+    (audit_dir / "NCT00000001.audit.md").write_text(
+        audit_recorder.render_markdown("NCT00000001", {}, [call])
+    )
+    fake = _fake(tokens_per_second=10, prompt_tokens_per_second=100, load_s=2)
+    assert fake.load_audits(audit_dir) == 1
+
+    async def run():
+        async with httpx.AsyncClient(transport=httpx.ASGITransport(app=fake.app),
+                                     base_url="http://ollama") as client:
+            first = (await client.post("/api/generate", json={
+                "model": "qwen3:14b", "system": call.system, "prompt": call.prompt,
+            })).json()
+            other_model = (await client.post("/api/generate", json={
+                "model": "gemma3:12b", "system": call.system, "prompt": call.prompt,
+            })).json()
+            miss = (await client.post("/api/generate", json={
+                "model": "qwen3:14b", "prompt": "unseen",
+            })).json()
+            return first, other_model, miss
+
+    first, other_model, miss = asyncio.run(run())
+    assert first["response"] == reply
+    assert other_model["response"] == reply  # model-agnostic fallback key
+    assert miss["response"] == CANNED_REPLY
+    assert first["load_duration"] == 2_000_000_000  # first call per model loads
+    assert miss["load_duration"] == 0
+    assert first["eval_count"] == len(reply) // 4
+    assert first["eval_duration"] == int(first["eval_count"] / 10 * 1e9)
+    assert fake.stats()["replay_hits"] == 2 and fake.stats()["replay_misses"] == 1
+    print("  ✓ fake Ollama replays audit trails, canned reply on a miss, modelled timings")
+
+
+def test_fake_ollama_models():
+    fake = _fake()
+
+    async def run():
+        transport = httpx.ASGITransport(app=fake.app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://ollama") as client:
+            assert (await client.get("/api/tags")).json() == {"models": []}
+            lines = []
+            async with client.stream("POST", "/api/pull", json={"name": "qwen3:8b"}) as resp:
+                async for line in resp.aiter_lines():
+                    if line:
+                        lines.append(json.loads(line)["status"])
+            tags = (await client.get("/api/tags")).json()
+            e1 = (await client.post("/api/embeddings", json={"prompt": "abc"})).json()
+            e2 = (await client.post("/api/embeddings", json={"prompt": "abc"})).json()
+            return lines, tags, e1, e2
+
+    lines, tags, e1, e2 = asyncio.run(run())
+    assert lines[-1] == "success"
+    assert [m["name"] for m in tags["models"]] == ["qwen3:8b"]
+    assert e1 == e2 and len(e1["embedding"]) == 768
+    print("  ✓ pulled models are listed by /api/tags; embeddings are deterministic")
+
+
+def test_fixture_round_trip():
+    root = Path(tempfile.mkdtemp())
+    seen = []
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        seen.append(str(request.url))
+        if request.url.path == "/busy":
+            return httpx.Response(429)
+        return httpx.Response(200, json={"path": request.url.path, "n": len(seen)})
+
+    async def fetch(store: http_fixtures.FixtureStore, inner=None):
+        transport = http_fixtures.FixtureTransport(store, inner=inner)
+        async with httpx.AsyncClient(transport=transport) as client:
+            a = await client.get("https://api.example.org/x",
+                                 params={"b": "2", "a": "1", "api_key": "SECRET"})
+            busy = await client.get("https://api.example.org/busy")
+            return a, busy
+
+    recorder = http_fixtures.FixtureStore(root, mode="record")
+    a, busy = asyncio.run(fetch(recorder, httpx.MockTransport(handler)))
+    assert a.json() == {"path": "/x", "n": 1} and busy.status_code == 429
+    assert recorder.stats()["recorded"] == 1  # 429 not recorded
+    raw = gzip.open(root / "api.example.org.jsonl.gz", "rt").read()
+    assert "SECRET" not in raw and len(raw.splitlines()) == 1
+
+    player = http_fixtures.FixtureStore(root, mode="replay", replay_latency=False)
+
+    async def replay():
+        transport = http_fixtures.FixtureTransport(player)
+        async with httpx.AsyncClient(transport=transport) as client:
+            hit = await client.get("https://api.example.org/x?a=1&b=2&api_key=OTHER")
+            miss = await client.get("https://api.example.org/busy")
+            return hit, miss
+
+    hit, miss = asyncio.run(replay())
+    assert hit.status_code == 200 and hit.json() == {"path": "/x", "n": 1}
+    assert miss.status_code == 404
+    stats = player.stats()
+    assert stats["hits"] == 1 and stats["misses_by_host"] == {"api.example.org": 1}
+    assert len(seen) == 2  # replay never reached the handler
+    print("  ✓ fixtures record (no 429s, no credentials) and replay; misses are 404s")
+
+
+def test_install_routes():
+    fake = _fake()
+    store = http_fixtures.FixtureStore(Path(tempfile.mkdtemp()), mode="replay")
+    original = httpx.AsyncClient.__init__
+    http_fixtures.install(store, {"ollama.test:11434": httpx.ASGITransport(app=fake.app)})
+    try:
+        async def run():
+            async with httpx.AsyncClient(timeout=5) as client:
+                research = await client.get("https://eutils.ncbi.nlm.nih.gov/x")
+                gen = await client.post("http://ollama.test:11434/api/generate",
+                                        json={"model": "m", "prompt": "p"})
+            mock = httpx.MockTransport(lambda r: httpx.Response(204))
+            async with httpx.AsyncClient(transport=mock) as client:
+                explicit = await client.get("https://eutils.ncbi.nlm.nih.gov/x")
+            return research, gen, explicit
+
+        research, gen, explicit = asyncio.run(run())
+    finally:
+        http_fixtures.uninstall()
+    assert httpx.AsyncClient.__init__ is original
+    assert research.status_code == 404 and store.misses == 1
+    assert gen.json()["response"] == CANNED_REPLY and fake.generate_calls == 1
+    assert explicit.status_code == 204
+    print("  ✓ install() patches transport-less clients and routes Ollama to the fake")
+
+
+def test_report_helpers():
+    import importlib.util
+
+    from app.services.metrics import MetricsRegistry
+
+    reg = MetricsRegistry()
+    h = reg.histogram("bench_phase_seconds", "Phase", ("phase",))
+    h.labels("research").observe(1.5)
+    h.labels("research").observe(2.0)
+    reg.counter("bench_calls_total", "Calls").inc(3)
+    assert reg.values("bench_phase_seconds") == [({"phase": "research"}, 3.5)]
+    assert reg.values("bench_calls_total") == [({}, 3.0)]
+    assert reg.values("missing") == []
+
+    spec = importlib.util.spec_from_file_location("bench_pipeline", THIS_DIR / "bench_pipeline.py")
+    bench_pipeline = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(bench_pipeline)
+    table = bench_pipeline.compare(
+        {"commit": "new", "trials_per_hour": 90.0, "llm_calls_per_trial": 12.0},
+        {"commit": "old", "trials_per_hour": 100.0, "llm_calls_per_trial": 15.0},
+    )
+    rows = {line.split()[0]: line for line in table.splitlines()[2:]}
+    assert "-10.0% ✗" in rows["trials_per_hour"]
+    assert "-20.0% ✓" in rows["llm_calls_per_trial"]
+    assert bench_pipeline.read_ncts(THIS_DIR / "test_batch_50.json")[0] == "NCT00000391"
+    print("  ✓ metrics.values() sums histograms; compare() marks better / worse")
+
+
+def main() -> int:
+    print("Benchmark harness tests")
+    print("-" * 60)
+    tests = [
+        test_fake_ollama_replay,
+        test_fake_ollama_models,
+        test_fixture_round_trip,
+        test_install_routes,
+        test_report_helpers,
+    ]
+    failed = 0
+    for t in tests:
+        try:
+            t()
+        except AssertionError as e:
+            print(f"  ✗ {t.__name__}: {e}")
+            failed += 1
+        except Exception as e:
+            print(f"  ✗ {t.__name__}: {type(e).__name__}: {e}")
+            failed += 1
+    print("-" * 60)
+    if failed:
+        print(f"FAIL: {failed}/{len(tests)}")
+        return 1
+    print(f"OK: {len(tests)}/{len(tests)}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,199 @@
+#!/usr/bin/env python3
+"""
+Unit tests for the bulk ClinicalTrials.gov v2 prefetch (agents/research/ctgov_bulk.py).
+
+No network: requests go to an httpx.MockTransport. Verifies:
+  1. NCT IDs are deduplicated and chunked (ids_per_request), each chunk
+     is one /studies?filter.ids= query paged with nextPageToken.
+  2. take() pops a study once; release() drops untaken studies; records
+     for IDs that weren't asked for are ignored.
+  3. A failing chunk is counted and leaves its trials to the fallback,
+     while other chunks still land.
+  4. ClinicalProtocolAgent builds its result from the prefetched record
+     without issuing the per-trial GET.
+
+Usage:
+    cd <agent_annotate_dir>
+    python3 scripts/test_ctgov_bulk.py
+"""
+
+from __future__ import annotations
+
+import asyncio
+import sys
+from pathlib import Path
+
+THIS_DIR = Path(__file__).resolve().parent
+PKG_ROOT = THIS_DIR.parent
+if str(PKG_ROOT) not in sys.path:
+    sys.path.insert(0, str(PKG_ROOT))
+
+import httpx  # noqa: E402
+
+import agents.research.clinical_protocol as clinical_protocol  # noqa: E402
+from agents.research.ctgov_bulk import CTGovStudyStore  # noqa: E402
+
+
+def _study(nct: str) -> dict:
+    return {
+        "protocolSection": {
+            "identificationModule": {"nctId": nct, "briefTitle": f"Trial {nct}"},
+            "statusModule": {"overallStatus": "COMPLETED"},
+        },
+        "hasResults": False,
+    }
+
+
+class FakeCTGov:
+    """Serves /studies?filter.ids= with a small page size to force paging."""
+
+    def __init__(self, page_size: int = 2, fail_ids: frozenset = frozenset()):
+        self.page_size = page_size
+        self.fail_ids = fail_ids
+        self.calls: list[httpx.URL] = []
+
+    def handler(self, request: httpx.Request) -> httpx.Response:
+        self.calls.append(request.url)
+        if request.url.path != "/api/v2/studies":
+            return httpx.Response(200, json=_study(request.url.path.rsplit("/", 1)[-1]))
+        ids = request.url.params["filter.ids"].split(",")
+        if self.fail_ids & set(ids):
+            return httpx.Response(400, json={"message": "bad"})
+        # NCT99999999 has no record (e.g. not yet indexed).
+        found = [i for i in ids if i != "NCT99999999"]
+        start = int(request.url.params.get("pageToken", "0"))
+        page = {"studies": [_study(i) for i in found[start:start + self.page_size]]}
+        if start == 0:
+            page["studies"].append(_study("NCT12345678"))  # not requested
+        if start + self.page_size < len(found):
+            page["nextPageToken"] = str(start + self.page_size)
+        return httpx.Response(200, json=page)
+
+    def client(self) -> httpx.AsyncClient:
+        return httpx.AsyncClient(transport=httpx.MockTransport(self.handler))
+
+
+def _ncts(n: int) -> list[str]:
+    return [f"NCT{i:08d}" for i in range(1, n + 1)]
+
+
+def test_chunking_and_paging():
+    api = FakeCTGov(page_size=2)
+    store = CTGovStudyStore()
+
+    async def run():
+        async with api.client() as client:
+            ids = _ncts(5) + ["nct00000001", "NCT99999999"]
+            return await store.prefetch(ids, client=client, ids_per_request=3)
+
+    assert asyncio.run(run()) == 5
+    # chunk 1: 3 ids -> 2 pages; chunk 2: 3 ids (one missing) -> 1 page
+    assert [c.params["filter.ids"] for c in api.calls] == [
+        "NCT00000001,NCT00000002,NCT00000003",
+        "NCT00000001,NCT00000002,NCT00000003",
+        "NCT00000004,NCT00000005,NCT99999999",
+    ]
+    assert [c.params.get("pageToken") for c in api.calls] == [None, "2", None]
+    assert api.calls[0].params["pageSize"] == "3"
+    stats = store.stats()
+    assert stats["requests"] == 3 and stats["prefetched"] == 5 and stats["held"] == 5
+    print("  ✓ IDs deduped, chunked and paged with nextPageToken")
+
+
+def test_take_and_release():
+    api = FakeCTGov(page_size=10)
+    store = CTGovStudyStore()
+
+    async def run():
+        async with api.client() as client:
+            await store.prefetch(_ncts(3), client=client)
+
+    asyncio.run(run())
+    assert asyncio.run(store.take("nct00000002"))["protocolSection"]["identificationModule"]["nctId"] == "NCT00000002"
+    assert asyncio.run(store.take("NCT00000002")) is None
+    assert asyncio.run(store.take("NCT12345678")) is None  # returned but never requested
+    store.release(_ncts(3))
+    assert store.stats()["held"] == 0
+    assert store.stats()["hits"] == 1 and store.stats()["misses"] == 2
+    print("  ✓ take() pops once; release() drops untaken studies")
+
+
+def test_failed_chunk_falls_back():
+    api = FakeCTGov(page_size=10, fail_ids=frozenset({"NCT00000004"}))
+    store = CTGovStudyStore()
+
+    async def run():
+        async with api.client() as client:
+            return await store.prefetch(_ncts(6), client=client, ids_per_request=3)
+
+    assert asyncio.run(run()) == 3
+    assert store.stats()["failed_chunks"] == 1
+    assert asyncio.run(store.take("NCT00000001")) is not None
+    assert asyncio.run(store.take("NCT00000005")) is None
+    print("  ✓ a failed chunk leaves only its trials to the per-trial GET")
+
+
+def test_clinical_protocol_uses_prefetched_record():
+    api = FakeCTGov(page_size=10)
+    store = CTGovStudyStore()
+    original_store = clinical_protocol.ctgov_studies
+    original_client = clinical_protocol.httpx.AsyncClient
+    clinical_protocol.ctgov_studies = store
+
+    class Client(original_client):
+        def __init__(self, *args, **kwargs):
+            kwargs["transport"] = httpx.MockTransport(api.handler)
+            super().__init__(*args, **kwargs)
+
+    clinical_protocol.httpx.AsyncClient = Client
+    try:
+        async def run():
+            async with api.client() as client:
+                await store.prefetch(["NCT00000001"], client=client)
+            agent = clinical_protocol.ClinicalProtocolAgent()
+            return [await agent.research(n) for n in ("NCT00000001", "NCT00000002")]
+
+        api.calls.clear()
+        prefetched, fetched = asyncio.run(run())
+    finally:
+        clinical_protocol.ctgov_studies = original_store
+        clinical_protocol.httpx.AsyncClient = original_client
+
+    assert [c.path for c in api.calls] == ["/api/v2/studies", "/api/v2/studies/NCT00000002"]
+    assert prefetched.raw_data["protocol_section"]["identificationModule"]["nctId"] == "NCT00000001"
+    assert prefetched.citations and not prefetched.error
+    assert [c.snippet for c in prefetched.citations] == [
+        c.snippet.replace("NCT00000002", "NCT00000001") for c in fetched.citations
+    ]
+    print("  ✓ clinical_protocol reads the prefetched record, GETs only on a miss")
+
+
+def main() -> int:
+    print("CT.gov bulk prefetch tests")
+    print("-" * 60)
+    tests = [
+        test_chunking_and_paging,
+        test_take_and_release,
+        test_failed_chunk_falls_back,
+        test_clinical_protocol_uses_prefetched_record,
+    ]
+    failed = 0
+    for t in tests:
+        try:
+            t()
+        except AssertionError as e:
+            print(f"  ✗ {t.__name__}: {e}")
+            failed += 1
+        except Exception as e:
+            print(f"  ✗ {t.__name__}: {type(e).__name__}: {e}")
+            failed += 1
+    print("-" * 60)
+    if failed:
+        print(f"FAIL: {failed}/{len(tests)}")
+        return 1
+    print(f"OK: {len(tests)}/{len(tests)}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
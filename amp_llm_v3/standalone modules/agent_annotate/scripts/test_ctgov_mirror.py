@@ -0,0 +1,224 @@
+#!/usr/bin/env python3
+"""
+Unit tests for the offline ClinicalTrials.gov mirror (agents/research/ctgov_mirror.py).
+
+No network: the live API is an httpx.MockTransport. Verifies:
+  1. import_archive loads a bulk-download zip (and a directory), honours
+     an NCT filter, stamps records with the archive mtime, stores them
+     compressed, and round-trips the study JSON exactly.
+  2. status() splits IDs into fresh / stale (with stored date) / missing.
+  3. Delta refresh through CTGovStudyStore.prefetch: fresh records cost no
+     request, stale ones cost one dates-only query per chunk, and only
+     changed and missing studies are downloaded. Unchanged ones are
+     re-stamped, and a failed date query leaves them stale.
+  4. take() serves fresh records from the mirror; remember() stores
+     per-trial fetches.
+
+Usage:
+    cd <agent_annotate_dir>
+    python3 scripts/test_ctgov_mirror.py
+"""
+
+from __future__ import annotations
+
+import asyncio
+import json
+import os
+import sys
+import tempfile
+import time
+import zipfile
+from pathlib import Path
+
+THIS_DIR = Path(__file__).resolve().parent
+PKG_ROOT = THIS_DIR.parent
+if str(PKG_ROOT) not in sys.path:
+    sys.path.insert(0, str(PKG_ROOT))
+
+import httpx  # noqa: E402
+
+from agents.research.ctgov_bulk import CTGovStudyStore  # noqa: E402
+from agents.research.ctgov_mirror import CTGovMirror  # noqa: E402
+
+DAY = 86400
+
+
+def _study(nct: str, updated: str = "2024-01-01", title: str = "") -> dict:
+    return {
+        "protocolSection": {
+            "identificationModule": {"nctId": nct, "briefTitle": title or f"Trial {nct}"},
+            "statusModule": {"lastUpdatePostDateStruct": {"date": updated, "type": "ACTUAL"}},
+            "descriptionModule": {"briefSummary": "peptide " * 200},
+        },
+        "hasResults": False,
+    }
+
+
+class LiveCTGov:
+    """Current upstream records; serves full and dates-only /studies queries."""
+
+    def __init__(self, studies: dict[str, dict], fail_fields: bool = False):
+        self.studies = studies
+        self.fail_fields = fail_fields
+        self.calls: list[httpx.URL] = []
+
+    def handler(self, request: httpx.Request) -> httpx.Response:
+        self.calls.append(request.url)
+        ids = request.url.params["filter.ids"].split(",")
+        found = [self.studies[i] for i in ids if i in self.studies]
+        if "fields" in request.url.params:
+            if self.fail_fields:
+                return httpx.Response(400)
+            found = [{"protocolSection": {
+                "identificationModule": s["protocolSection"]["identificationModule"],
+                "statusModule": s["protocolSection"]["statusModule"],
+            }} for s in found]
+        return httpx.Response(200, json={"studies": found})
+
+    def client(self) -> httpx.AsyncClient:
+        return httpx.AsyncClient(transport=httpx.MockTransport(self.handler))
+
+
+def _mirror() -> CTGovMirror:
+    return CTGovMirror(Path(tempfile.mkdtemp()) / "mirror.db")
+
+
+def test_import_archive():
+    tmp = Path(tempfile.mkdtemp())
+    archive = tmp / "ctg-studies.json.zip"
+    with zipfile.ZipFile(archive, "w") as zf:
+        for nct in ("NCT00000001", "NCT00000002", "NCT00000003"):
+            zf.writestr(f"ctg-studies/{nct}.json", json.dumps(_study(nct)))
+        zf.writestr("ctg-studies/broken.json", "{not json")
+        zf.writestr("README.txt", "not a study")
+    week_ago = time.time() - 7 * DAY
+    os.utime(archive, (week_ago, week_ago))
+
+    mirror = _mirror()
+    assert mirror.import_archive(archive, only={"nct00000001", "NCT00000003"}) == 2
+    assert mirror.nct_ids() == ["NCT00000001", "NCT00000003"]
+    assert mirror.get("nct00000001") == _study("NCT00000001")
+    assert mirror.get("NCT00000001", max_age=DAY) is None  # stamped a week ago
+    assert mirror.get("NCT00000002") is None
+    raw = len(json.dumps(_study("NCT00000001")))
+    body = mirror._conn.execute("SELECT length(body) FROM studies LIMIT 1").fetchone()[0]
+    assert body < raw / 5
+
+    (tmp / "dir" / "sub").mkdir(parents=True)
+    (tmp / "dir" / "sub" / "page.json").write_text(json.dumps(
+        {"studies": [_study("NCT00000004"), _study("NCT00000005")]}
+    ))
+    assert mirror.import_archive(tmp / "dir", checked_at=time.time()) == 2
+    assert mirror.stats()["studies"] == 4
+    print("  ✓ bulk zip / directory import, NCT filter, mtime stamp, compressed")
+
+
+def test_status_partition():
+    mirror = _mirror()
+    now = time.time()
+    mirror.put_many([_study("NCT00000001")], checked_at=now)
+    mirror.put_many([_study("NCT00000002", "2023-05-05")], checked_at=now - 10 * DAY)
+    fresh, stale, missing = mirror.status(
+        ["nct00000001", "NCT00000002", "NCT00000009", "NCT00000001"], max_age=7 * DAY,
+    )
+    assert fresh == ["NCT00000001"]
+    assert stale == {"NCT00000002": "2023-05-05"}
+    assert missing == ["NCT00000009"]
+    assert mirror.status(["NCT00000002"])[0] == ["NCT00000002"]  # no max_age
+    print("  ✓ status() splits fresh / stale / missing")
+
+
+def test_delta_refresh():
+    mirror = _mirror()
+    now = time.time()
+    old = now - 30 * DAY
+    mirror.put_many([_study("NCT00000001")], checked_at=now)           # fresh
+    mirror.put_many([_study("NCT00000002"), _study("NCT00000003")], checked_at=old)
+    live = LiveCTGov({
+        "NCT00000001": _study("NCT00000001"),
+        "NCT00000002": _study("NCT00000002"),                          # unchanged
+        "NCT00000003": _study("NCT00000003", "2024-06-01", "Amended"),  # changed
+        "NCT00000004": _study("NCT00000004"),                          # missing
+    })
+    store = CTGovStudyStore(mirror=mirror, max_age_days=7)
+
+    async def run(ids):
+        async with live.client() as client:
+            return await store.prefetch(ids, client=client, ids_per_request=10)
+
+    assert asyncio.run(run(["NCT00000001", "NCT00000002", "NCT00000003", "NCT00000004"])) == 2
+    assert [("fields" in c.params, c.params["filter.ids"]) for c in live.calls] == [
+        (True, "NCT00000002,NCT00000003"),
+        (False, "NCT00000004,NCT00000003"),
+    ]
+    assert mirror.get("NCT00000003")["protocolSection"]["identificationModule"]["briefTitle"] == "Amended"
+    _, stale, missing = mirror.status(["NCT00000002", "NCT00000003", "NCT00000004"], max_age=DAY)
+    assert not stale and not missing
+    assert store.stats()["mirror_confirmed"] == 1 and store.stats()["mirror_updated"] == 1
+    assert store.stats()["held"] == 0  # mirrored records aren't held in memory
+
+    live.calls.clear()
+    assert asyncio.run(run(["NCT00000001", "NCT00000004"])) == 0
+    assert live.calls == []
+    print("  ✓ fresh: no request; stale: dates-only check; only changed/missing download")
+
+
+def test_failed_date_check_stays_stale():
+    mirror = _mirror()
+    mirror.put_many([_study("NCT00000002")], checked_at=time.time() - 30 * DAY)
+    live = LiveCTGov({"NCT00000002": _study("NCT00000002")}, fail_fields=True)
+    store = CTGovStudyStore(mirror=mirror, max_age_days=7)
+
+    async def run():
+        async with live.client() as client:
+            await store.prefetch(["NCT00000002"], client=client)
+
+    asyncio.run(run())
+    assert mirror.status(["NCT00000002"], max_age=7 * DAY)[1] == {"NCT00000002": "2024-01-01"}
+    assert asyncio.run(store.take("NCT00000002")) is None  # clinical_protocol will GET it
+    print("  ✓ a failed date check leaves records stale for the per-trial GET")
+
+
+def test_take_and_remember():
+    mirror = _mirror()
+    store = CTGovStudyStore(mirror=mirror, max_age_days=7)
+    assert asyncio.run(store.take("NCT00000007")) is None
+    asyncio.run(store.remember(_study("NCT00000007")))
+    assert asyncio.run(store.take("nct00000007")) == _study("NCT00000007")
+    assert asyncio.run(store.take("NCT00000007")) is not None  # mirror records aren't popped
+    stats = store.stats()
+    assert stats["mirror_hits"] == 2 and stats["misses"] == 1
+    assert CTGovStudyStore(mirror=None).mirror() is None  # config default: off
+    print("  ✓ take() reads the mirror; remember() stores per-trial fetches")
+
+
+def main() -> int:
+    print("CT.gov mirror tests")
+    print("-" * 60)
+    tests = [
+        test_import_archive,
+        test_status_partition,
+        test_delta_refresh,
+        test_failed_date_check_stays_stale,
+        test_take_and_remember,
+    ]
+    failed = 0
+    for t in tests:
+        try:
+            t()
+        except AssertionError as e:
+            print(f"  ✗ {t.__name__}: {e}")
+            failed += 1
+        except Exception as e:
+            print(f"  ✗ {t.__name__}: {type(e).__name__}: {e}")
+            failed += 1
+    print("-" * 60)
+    if failed:
+        print(f"FAIL: {failed}/{len(tests)}")
+        return 1
+    print(f"OK: {len(tests)}/{len(tests)}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,249 @@
+#!/usr/bin/env python3
+"""
+Unit tests for the precompiled EDAM guidance cache (memory_store.py).
+
+No network, no LLM. Each test uses its own MemoryStore on a temp database.
+Verifies:
+  1. build_guidance compiles a field's trial-independent blocks once per
+     epoch; later calls for other trials only run the per-trial lookups.
+  2. A trial's own corrections are listed first without duplicates, and a
+     trial whose earlier runs disagreed gets a stability warning.
+  3. Writing corrections, experiences or stability rows drops the cache,
+     and a compile that raced a write isn't kept.
+  4. The caller's token budget is applied per call to the cached lines.
+  5. With CORRECTION_GUIDANCE_ENABLED off (the default) the text is exactly
+     what the pipeline received before the cache; with it on, a trial never
+     sees its own ground_truth corrections.
+
+Usage:
+    cd <agent_annotate_dir>
+    python3 scripts/test_edam_guidance.py
+"""
+
+from __future__ import annotations
+
+import asyncio
+import importlib
+import sys
+import tempfile
+from contextlib import contextmanager
+from pathlib import Path
+
+THIS_DIR = Path(__file__).resolve().parent
+PKG_ROOT = THIS_DIR.parent
+if str(PKG_ROOT) not in sys.path:
+    sys.path.insert(0, str(PKG_ROOT))
+
+from app.services.memory.memory_store import MemoryStore  # noqa: E402
+
+# The package re-exports the memory_store singleton under the module's name.
+store_module = importlib.import_module("app.services.memory.memory_store")
+
+CITATION = [{"source": "test", "text": "fixture"}]
+
+
+def _store() -> MemoryStore:
+    return MemoryStore(Path(tempfile.mkdtemp()) / "edam.db")
+
+
+def _correct(store: MemoryStore, nct: str, field: str, job: str,
+             source: str = "ground_truth", to: str = "Other") -> int:
+    return store.store_correction(
+        nct_id=nct, field_name=field, job_id=job,
+        original_value="AMP", corrected_value=to, source=source,
+        reflection=f"Agent said 'AMP' but R1 says '{to}' for {nct}.",
+        evidence_citations=CITATION, config_hash="cfg1", git_commit="abc",
+    )
+
+
+def _seed(store: MemoryStore) -> None:
+    for i in range(1, 4):
+        _correct(store, f"NCT0000000{i}", "classification", "j1")
+    store.upsert_stability("NCT00000005", "classification", 1.0, "Other", "A", 4, 1)
+    store.upsert_stability("NCT00000006", "classification", 0.5, "AMP", "B", 4, 2)
+
+
+@contextmanager
+def _correction_guidance(enabled: bool = True):
+    previous = store_module.CORRECTION_GUIDANCE_ENABLED
+    store_module.CORRECTION_GUIDANCE_ENABLED = enabled
+    try:
+        yield
+    finally:
+        store_module.CORRECTION_GUIDANCE_ENABLED = previous
+
+
+def _count_statements(store: MemoryStore) -> list[str]:
+    statements: list[str] = []
+    store._conn.set_trace_callback(statements.append)
+    return statements
+
+
+@_correction_guidance()
+def test_compiled_once_per_epoch():
+    store = _store()
+    _seed(store)
+    first = asyncio.run(store.build_guidance("NCT00000009", "classification", ""))
+    assert "[PAST CORRECTIONS]" in first and "[STABLE PATTERNS]" in first
+    assert "NCT00000005: consistently 'Other'" in first
+    assert store.guidance_stats()["misses"] == 1
+
+    statements = _count_statements(store)
+    second = asyncio.run(store.build_guidance("NCT00000008", "classification", ""))
+    store._conn.set_trace_callback(None)
+    assert second == first
+    # MAX(epoch), the trial's corrections, its stability row
+    assert len(statements) == 3, statements
+    assert store.guidance_stats()["hits"] == 1
+    assert store.precompile_guidance(["classification", "peptide"]) == 2
+    assert store.guidance_stats()["entries"] == 2
+    print("  ✓ field blocks compiled once; other trials only run per-trial lookups")
+
+
+@_correction_guidance()
+def test_trial_specific_parts():
+    store = _store()
+    _seed(store)
+    # Twenty other trials' corrections crowd out the older ones in the
+    # field-level top 15; the trial's own correction still comes first.
+    own_id = _correct(store, "NCT00000042", "classification", "j0", source="self_audit")
+    for i in range(20):
+        _correct(store, f"NCT1{i:07d}", "classification", "j2")
+    text = asyncio.run(store.build_guidance("NCT00000042", "classification", ""))
+    lines = text.splitlines()
+    corrections = lines[lines.index("[PAST CORRECTIONS]") + 1:]
+    assert corrections[0].startswith("- NCT00000042/classification"), corrections[0]
+    assert sum("NCT00000042" in line for line in lines) == 1
+    assert own_id not in {cid for cid, _, _ in store.field_guidance("classification").corrections}
+
+    unstable = asyncio.run(store.build_guidance("NCT00000006", "classification", ""))
+    assert "Earlier runs of this trial disagreed: 2 different values over 4 runs" in unstable
+    stable = asyncio.run(store.build_guidance("NCT00000005", "classification", ""))
+    assert "Earlier runs of this trial" not in stable
+    print("  ✓ own corrections first, deduplicated; unstable trials are flagged")
+
+
+@_correction_guidance()
+def test_invalidation():
+    store = _store()
+    _seed(store)
+    asyncio.run(store.build_guidance("NCT00000009", "classification", ""))
+    assert store.guidance_stats()["entries"] == 1
+
+    _correct(store, "NCT00000077", "classification", "j3")
+    assert store.guidance_stats()["entries"] == 0
+    text = asyncio.run(store.build_guidance("NCT00000009", "classification", ""))
+    assert "NCT00000077" in text
+
+    store.upsert_stability("NCT00000078", "classification", 1.0, "Other", "A", 5, 1)
+    assert store.guidance_stats()["entries"] == 0
+    asyncio.run(store.build_guidance("NCT00000009", "classification", ""))
+    store.store_experience("NCT00000078", "classification", "j3", "Other", 0.9, True,
+                           "", "", "cfg1", "abc")
+    assert store.guidance_stats()["entries"] == 0
+
+    # A write during compilation: the compiled result isn't cached.
+    original = store.detect_anomalies
+
+    def racing(field_name, recent_epochs=3):
+        _correct(store, "NCT00000079", "classification", "j4")
+        return original(field_name, recent_epochs)
+
+    store.detect_anomalies = racing
+    store.field_guidance("classification")
+    store.detect_anomalies = original
+    assert store.guidance_stats()["entries"] == 0
+    assert any("NCT00000079" in line
+               for _, _, line in store.field_guidance("classification").corrections)
+    assert store.guidance_stats()["invalidations"] >= 3
+    print("  ✓ EDAM writes drop the cache; a compile racing a write isn't kept")
+
+
+@_correction_guidance()
+def test_budget_per_call():
+    store = _store()
+    _seed(store)
+    full = asyncio.run(store.build_guidance("NCT00000009", "classification", "", max_tokens=2000))
+    small = asyncio.run(store.build_guidance("NCT00000009", "classification", "", max_tokens=150))
+    assert len(small) <= 150 * 4 and len(small) < len(full)
+    assert small.count("corrected from") < full.count("corrected from")
+    assert store.guidance_stats()["misses"] == 1
+    print("  ✓ token budget applied per call to the shared cached lines")
+
+
+def _seed_peptide(store: MemoryStore) -> None:
+    store.store_experience("NCT00000005", "peptide", "j1", "True", 0.9, True,
+                           "", "", "cfg1", "abc")
+    store.upsert_stability("NCT00000005", "peptide", 1.0, "True", "A", 4, 1)
+
+
+def test_default_matches_previous_pipeline():
+    store = _store()
+    _seed(store)
+    _seed_peptide(store)
+    # A field with corrections got no guidance: the old loop raised on
+    # sqlite3.Row.get() and get_edam_guidance() returned "".
+    assert asyncio.run(store.build_guidance("NCT00000002", "classification", "")) == ""
+    assert asyncio.run(store.build_guidance("NCT00000006", "classification", "")) == ""
+    assert asyncio.run(store.build_guidance("NCT00000002", "peptide", "")) == (
+        "=== EDAM GUIDANCE ===\n"
+        "[STABLE PATTERNS]\n"
+        "- NCT00000005: consistently 'True' (4 runs, evidence=A)\n"
+        "=== END GUIDANCE ==="
+    )
+    print("  ✓ default guidance is byte-identical to the pre-cache pipeline")
+
+
+@_correction_guidance()
+def test_own_ground_truth_hidden():
+    store = _store()
+    _seed(store)
+    text = asyncio.run(store.build_guidance("NCT00000002", "classification", ""))
+    assert text == (
+        "=== EDAM GUIDANCE ===\n"
+        "[PAST CORRECTIONS]\n"
+        "- [ground_truth] NCT00000003/classification: corrected from 'AMP' to 'Other'"
+        " — Agent said 'AMP' but R1 says 'Other' for NCT00000003.\n"
+        "- [ground_truth] NCT00000001/classification: corrected from 'AMP' to 'Other'"
+        " — Agent said 'AMP' but R1 says 'Other' for NCT00000001.\n"
+        "[STABLE PATTERNS]\n"
+        "- NCT00000005: consistently 'Other' (4 runs, evidence=A)\n"
+        "[REASONING PATTERNS]\n"
+        "- classification: Agent said 'AMP' but R1 says 'Other' for trial.\n"
+        "=== END GUIDANCE ==="
+    ), text
+    assert "NCT00000002" not in text
+    print("  ✓ with corrections on, a trial never sees its own ground truth")
+
+
+def main() -> int:
+    print("EDAM guidance cache tests")
+    print("-" * 60)
+    tests = [
+        test_compiled_once_per_epoch,
+        test_trial_specific_parts,
+        test_invalidation,
+        test_budget_per_call,
+        test_default_matches_previous_pipeline,
+        test_own_ground_truth_hidden,
+    ]
+    failed = 0
+    for t in tests:
+        try:
+            t()
+        except AssertionError as e:
+            print(f"  ✗ {t.__name__}: {e}")
+            failed += 1
+        except Exception as e:
+            print(f"  ✗ {t.__name__}: {type(e).__name__}: {e}")
+            failed += 1
+    print("-" * 60)
+    if failed:
+        print(f"FAIL: {failed}/{len(tests)}")
+        return 1
+    print(f"OK: {len(tests)}/{len(tests)}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
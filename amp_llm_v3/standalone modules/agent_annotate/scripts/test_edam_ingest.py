@@ -0,0 +1,198 @@
+#!/usr/bin/env python3
+"""
+Unit tests for bulk EDAM post-job ingestion (MemoryStore.ingest / IngestBatch).
+
+No network, no LLM. Each test uses its own MemoryStore on a temp database;
+the post-job hook test swaps it into the memory package (restored after).
+Verifies:
+  1. ingest() leaves the same rows as the per-row store_* / upsert_*
+     methods, later duplicates winning, with one commit per table.
+  2. Row limits are enforced once, after the batch, down to the limit.
+  3. The post-job hook's stability, ground-truth and self-audit loops write
+     through ingest() (a handful of commits for a whole job) and report the
+     rows and seconds under summary["ingest"].
+
+Usage:
+    cd <agent_annotate_dir>
+    python3 scripts/test_edam_ingest.py
+"""
+
+from __future__ import annotations
+
+import asyncio
+import sys
+import tempfile
+from pathlib import Path
+
+THIS_DIR = Path(__file__).resolve().parent
+PKG_ROOT = THIS_DIR.parent
+if str(PKG_ROOT) not in sys.path:
+    sys.path.insert(0, str(PKG_ROOT))
+
+import app.services.memory as memory  # noqa: E402
+from app.services.memory.edam_config import TRAINING_NCTS  # noqa: E402
+from app.services.memory.memory_store import IngestBatch, MemoryStore  # noqa: E402
+from app.services.memory.self_audit import SelfAuditor  # noqa: E402
+from app.services.memory.stability_tracker import StabilityTracker  # noqa: E402
+
+CITATION = [{"source": "test", "text": "fixture"}]
+FIELDS = ("classification", "delivery_mode", "outcome", "reason_for_failure", "peptide")
+
+
+def _store() -> MemoryStore:
+    return MemoryStore(Path(tempfile.mkdtemp()) / "edam.db")
+
+
+def _trace(store: MemoryStore) -> list[str]:
+    statements: list[str] = []
+    store._conn.set_trace_callback(statements.append)
+    return statements
+
+
+def _rows(store: MemoryStore, table: str, columns: str) -> list[tuple]:
+    return [tuple(r) for r in store._conn.execute(
+        f"SELECT {columns} FROM {table} ORDER BY {columns}"
+    ).fetchall()]
+
+
+def test_ingest_matches_per_row_writes():
+    per_row, bulk = _store(), _store()
+    batch = IngestBatch()
+    experiences = [
+        ("NCT1", "peptide", "j1", "True", 0.9, True, "ev", "why"),
+        ("NCT2", "peptide", "j1", "False", 0.4, False, "", ""),
+        ("NCT1", "peptide", "j1", "False", 0.7, True, "ev2", "again"),  # replaces
+    ]
+    for e in experiences:
+        per_row.store_experience(*e, config_hash="cfg", git_commit="abc")
+        batch.add_experience(*e, config_hash="cfg", git_commit="abc")
+    per_row.store_correction("NCT1", "peptide", "j1", "True", "False", "ground_truth",
+                             "R1 says False", CITATION, "cfg", "abc")
+    batch.add_correction("NCT1", "peptide", "j1", "True", "False", "ground_truth",
+                         "R1 says False", CITATION, "cfg", "abc")
+    per_row.upsert_stability("NCT1", "peptide", 0.5, "False", "weak", 2, 2)
+    batch.add_stability("NCT1", "peptide", 0.5, "False", "weak", 2, 2)
+    try:
+        batch.add_correction("NCT3", "peptide", "j1", "a", "b", "self_audit", "r", [], "cfg", "abc")
+        raise AssertionError("a correction without citations was accepted")
+    except ValueError:
+        pass
+
+    statements = _trace(bulk)
+    result = bulk.ingest(batch)
+    bulk._conn.set_trace_callback(None)
+    assert result["experiences"] == 3 and result["corrections"] == 1 and result["stability"] == 1
+    assert result["seconds"] >= 0
+    assert statements.count("COMMIT") == 4, statements  # epoch insert + one per table
+
+    columns = {
+        "experiences": "nct_id, field_name, job_id, value, confidence, consensus_reached, "
+                       "evidence_summary, reasoning, epoch",
+        "corrections": "nct_id, field_name, job_id, original_value, corrected_value, source, "
+                       "reflection, evidence_citations, config_hash, epoch",
+        "stability_index": "nct_id, field_name, stability_score, majority_value, total_runs",
+    }
+    for table, cols in columns.items():
+        assert _rows(bulk, table, cols) == _rows(per_row, table, cols), table
+    assert bulk.ingest(IngestBatch())["experiences"] == 0
+    print("  ✓ ingest() writes the same rows as per-row calls, one commit per table")
+
+
+def test_limits_enforced_once():
+    store = _store()
+    store._get_limit = lambda key, fallback=10000: 50
+    batch = IngestBatch()
+    for i in range(400):
+        batch.add_experience(f"NCT{i:08d}", "peptide", "j1", "True", 0.9, True, "", "",
+                             config_hash="cfg", git_commit="abc")
+    statements = _trace(store)
+    store.ingest(batch)
+    store._conn.set_trace_callback(None)
+    purges = [s for s in statements if s.startswith("DELETE FROM experiences")]
+    assert store.get_stats()["experiences"] <= 50
+    # 400 -> 300 -> 225 -> ... a few purges, not one per row
+    assert 0 < len(purges) < 15, len(purges)
+    print("  ✓ limits are enforced after the batch, down to the limit")
+
+
+def _trial(nct: str, run: int) -> dict:
+    fields = [
+        {"field_name": f, "final_value": "AMP" if (f == "classification" and run % 2) else "Other",
+         "consensus_reached": True}
+        for f in FIELDS
+    ]
+    fields[1]["final_value"] = "Other/Unspecified"
+    return {
+        "nct_id": nct,
+        "verification": {"fields": fields},
+        "annotations": [{"field_name": f, "confidence": 0.8, "reasoning": "r", "evidence": []}
+                        for f in FIELDS],
+        "research_results": [{"citations": [{
+            "source_name": "openfda", "identifier": "x",
+            "snippet": "Route of administration: intravenous",
+        }]}],
+    }
+
+
+def test_post_job_hook_bulk():
+    store = _store()
+    ncts = sorted(TRAINING_NCTS)[:20] or [f"NCT{i:08d}" for i in range(20)]
+    saved = (memory.memory_store, memory.stability_tracker, memory.self_auditor, memory._gt_cache)
+    memory.memory_store = store
+    memory.stability_tracker = StabilityTracker(store)
+    memory.self_auditor = SelfAuditor(store)
+    memory._gt_cache = {n: {"classification": "Other", "peptide": "TRUE"} for n in ncts}
+    try:
+        for run in range(2):
+            results = [_trial(n, run) for n in ncts]
+            if run:
+                # The orchestrator passes a callable re-reading trials per loop
+                results = (lambda rs: lambda: iter(rs))(results)
+            statements = _trace(store)
+            summary = asyncio.run(memory.edam_post_job_hook(f"job{run}", results, {"v": 1}))
+            store._conn.set_trace_callback(None)
+            assert not summary["errors"], summary["errors"]
+            ingest = summary["ingest"]
+            assert ingest["experiences"] == len(ncts) * len(FIELDS), ingest
+            assert ingest["stability"] == len(ncts) * len(FIELDS), ingest
+            # ground truth: peptide disagrees (and classification on run 1);
+            # self-audit: delivery_mode is unspecific
+            assert ingest["corrections"] == (2 + run) * len(ncts), ingest
+            assert ingest["seconds"] >= 0, ingest
+            assert statements.count("COMMIT") <= 6, statements.count("COMMIT")
+        assert summary["stability"]["unstable_count"] == len(ncts), summary["stability"]  # classification flipped
+        assert store.get_stats()["stability_index"] == len(ncts) * len(FIELDS), store.get_stats()
+    finally:
+        (memory.memory_store, memory.stability_tracker,
+         memory.self_auditor, memory._gt_cache) = saved
+    print("  ✓ post-job loops ingest in bulk and report rows and seconds")
+
+
+def main() -> int:
+    print("EDAM bulk ingestion tests")
+    print("-" * 60)
+    tests = [
+        test_ingest_matches_per_row_writes,
+        test_limits_enforced_once,
+        test_post_job_hook_bulk,
+    ]
+    failed = 0
+    for t in tests:
+        try:
+            t()
+        except AssertionError as e:
+            print(f"  ✗ {t.__name__}: {e}")
+            failed += 1
+        except Exception as e:
+            print(f"  ✗ {t.__name__}: {type(e).__name__}: {e}")
+            failed += 1
+    print("-" * 60)
+    if failed:
+        print(f"FAIL: {failed}/{len(tests)}")
+        return 1
+    print(f"OK: {len(tests)}/{len(tests)}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,200 @@
+#!/usr/bin/env python3
+"""
+Unit tests for the per-trial EvidenceBundle (agents/evidence.py).
+
+No network, no LLM. Verifies:
+  1. build_structured_evidence (now a bundle slice): section grouping,
+     weight ordering, noise filter, PMID/snippet dedup, intervention
+     relevance filter, per-section budgets.
+  2. verifier_evidence: research order, 8 citations per agent, errored
+     agents skipped, one shared source→section table (openalex/crossref
+     are PUBLISHED RESULTS for verifiers too).
+  3. Cache: per-field research subsets hit the Phase 1 bundle; unknown
+     research objects get a fresh bundle without evicting it.
+  4. The index persists with the research and restores the bundle; a
+     stale index version is rebuilt. Bundles are immutable.
+
+Usage:
+    cd <agent_annotate_dir>
+    python3 scripts/test_evidence_bundle.py
+"""
+
+from __future__ import annotations
+
+import sys
+import tempfile
+from pathlib import Path
+
+THIS_DIR = Path(__file__).resolve().parent
+PKG_ROOT = THIS_DIR.parent
+if str(PKG_ROOT) not in sys.path:
+    sys.path.insert(0, str(PKG_ROOT))
+
+from agents.base import BaseAnnotationAgent  # noqa: E402
+from agents.evidence import (  # noqa: E402
+    EVIDENCE_INDEX_VERSION,
+    EvidenceBundle,
+    EvidenceBundleCache,
+    evidence_bundles,
+)
+from app.models.research import ResearchResult, SourceCitation  # noqa: E402
+from app.services.persistence_service import PersistenceService  # noqa: E402
+from app.services.persistence_writer import persistence_writer  # noqa: E402
+
+
+class _Agent(BaseAnnotationAgent):
+    field_name = "peptide"
+
+    async def annotate(self, nct_id, research_results, metadata=None):
+        raise NotImplementedError
+
+
+def _cite(source: str, snippet: str, ident: str = "", title: str = "") -> SourceCitation:
+    return SourceCitation(source_name=source, snippet=snippet, identifier=ident, title=title)
+
+
+def _research(nct: str = "NCT00000001") -> list[ResearchResult]:
+    protocol = ResearchResult(
+        agent_name="clinical_protocol", nct_id=nct,
+        citations=[_cite("clinicaltrials_gov", "Phase 2 trial of Peptide T in HIV neuropathy", "NCT00000001")],
+        raw_data={"protocol_section": {"armsInterventionsModule": {
+            "interventions": [{"name": "Peptide T"}],
+        }}},
+    )
+    literature = ResearchResult(
+        agent_name="literature", nct_id=nct,
+        citations=[
+            _cite("pubmed", "Peptide T improved pain scores in a small cohort", "PMID:1"),
+            _cite("openalex", "Same paper found again via OpenAlex index", "pmid:1 "),
+            _cite("pubmed", "no results found"),
+        ],
+    )
+    identity = ResearchResult(
+        agent_name="peptide_identity", nct_id=nct,
+        citations=[
+            _cite("uniprot", "CFTR chloride channel, unrelated protein", "P13569"),
+            _cite("uniprot", "Peptide T octapeptide derived from gp120 V2", "PT1"),
+        ],
+    )
+    failed = ResearchResult(
+        agent_name="web_context", nct_id=nct, error="timeout",
+        citations=[_cite("duckduckgo", "a web page mentioning Peptide T trial")],
+    )
+    return [protocol, literature, identity, failed]
+
+
+def test_structured_evidence_slice():
+    research = _research()
+    ok = [r for r in research if not r.error]
+    text, cited = _Agent().build_structured_evidence("NCT00000001", ok, max_citations=30)
+    lines = text.splitlines()
+    assert lines[0] == "Trial: NCT00000001"
+    assert "=== TRIAL METADATA ===" in lines and "=== DRUG/PEPTIDE DATA ===" in lines
+    assert "[pubmed] PMID:1: Peptide T improved pain scores in a small cohort" in lines
+    assert not any("OpenAlex" in ln for ln in lines)        # PMID dedup
+    assert not any("no results found" in ln for ln in lines)  # noise
+    assert not any("CFTR" in ln for ln in lines)            # not about the intervention
+    assert [c.identifier for c in cited] == ["NCT00000001", "PMID:1", "PT1"]
+
+    text, cited = _Agent().build_structured_evidence("NCT00000001", ok, max_snippet_chars=20)
+    assert "[pubmed] PMID:1: Peptide T improved..." in text.splitlines()
+    print("  ✓ annotator slice: sections, dedup, noise, relevance, truncation")
+
+
+def test_verifier_slice():
+    research = _research()
+    research.append(ResearchResult(
+        agent_name="chembl", nct_id="NCT00000001",
+        citations=[_cite("chembl", f"ChEMBL hit number {i} for Peptide T") for i in range(12)],
+    ))
+    bundle, view = evidence_bundles.view("NCT00000001", research)
+    parts = bundle.verifier_evidence(view, max_citations=35)
+    assert parts[0] == "Trial: NCT00000001\n"
+    published = parts.index("\n=== PUBLISHED RESULTS ===")
+    assert parts[published + 2].startswith("[openalex]")  # no longer WEB SOURCES
+    assert sum(1 for p in parts if p.startswith("[chembl]")) == 8
+    assert not any(p.startswith("[duckduckgo]") for p in parts)  # errored agent
+    assert any("CFTR" in p for p in parts)  # verifiers see raw hits unfiltered
+    assert len(bundle.verifier_evidence(view, max_citations=3)) == 3 + 1 + 2
+    print("  ✓ verifier slice: 8 per agent, errors skipped, shared section table")
+
+
+def test_cache_views_share_phase1_bundle():
+    cache = EvidenceBundleCache()
+    research = _research("NCT00000002")
+    bundle = cache.build("NCT00000002", research)
+    for _ in range(3):  # one subset per field, as the orchestrator does
+        got, view = cache.view("NCT00000002", [r for r in research if not r.error])
+        assert got is bundle and view == (0, 1, 2)
+    got, view = cache.view("NCT00000002", research)
+    assert got is bundle and view == (0, 1, 2, 3)
+    assert cache.stats() == {"trials": 1, "hits": 4, "builds": 1}
+
+    other = _research("NCT00000002")  # equal content, different objects
+    fresh, _ = cache.view("NCT00000002", other)
+    assert fresh is not bundle
+    partial = [research[0], other[1]]
+    mixed, _ = cache.view("NCT00000002", partial)
+    assert cache.view("NCT00000002", partial[:1])[0] is not mixed
+    print("  ✓ field subsets reuse the Phase 1 bundle; foreign research rebuilds")
+
+
+def test_index_persists_and_bundle_is_immutable():
+    research = _research("NCT00000003")
+    bundle = EvidenceBundle("NCT00000003", research)
+    index = bundle.to_index()
+    assert index["version"] == EVIDENCE_INDEX_VERSION
+    assert index["intervention_names"][0] == ["peptide t"]
+
+    p = PersistenceService(Path(tempfile.mkdtemp()))
+    p.init_research_dir("j1", ["NCT00000003"], {}, {})
+    p.save_research("j1", "NCT00000003", research, evidence_index=index)
+    persistence_writer.flush()
+    results, loaded_index = p.load_research_with_index("j1", "NCT00000003")
+    assert loaded_index == index
+    restored = EvidenceBundle("NCT00000003", results, index=loaded_index)
+    assert restored.to_index() == index
+    assert [e.section for e in restored.citations] == [e.section for e in bundle.citations]
+
+    # A stale or mismatched index is ignored, not trusted.
+    stale = dict(index, version=EVIDENCE_INDEX_VERSION + 1,
+                 intervention_names=[["bogus"]] * len(research))
+    assert EvidenceBundle("NCT00000003", results, index=stale).intervention_names == {"peptide t"}
+
+    try:
+        bundle.nct_id = "NCT9"
+        raise AssertionError("bundle accepted an attribute write")
+    except AttributeError:
+        pass
+    print("  ✓ index persists with research, restores the bundle; bundles are immutable")
+
+
+def main() -> int:
+    print("EvidenceBundle tests")
+    print("-" * 60)
+    tests = [
+        test_structured_evidence_slice,
+        test_verifier_slice,
+        test_cache_views_share_phase1_bundle,
+        test_index_persists_and_bundle_is_immutable,
+    ]
+    failed = 0
+    for t in tests:
+        try:
+            t()
+        except AssertionError as e:
+            print(f"  ✗ {t.__name__}: {e}")
+            failed += 1
+        except Exception as e:
+            print(f"  ✗ {t.__name__}: {type(e).__name__}: {e}")
+            failed += 1
+    print("-" * 60)
+    if failed:
+        print(f"FAIL: {failed}/{len(tests)}")
+        return 1
+    print(f"OK: {len(tests)}/{len(tests)}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,144 @@
+#!/usr/bin/env python3
+"""
+Unit tests for the hot-path micro-benchmarks (bench/hot_paths.py).
+
+No network, tiny time budgets. Verifies:
+  1. The synthetic corpus is deterministic per seed and exercises the
+     dossier (registry status, publications, matcher inputs).
+  2. Persisted research bundles are loaded newest-per-NCT across jobs and
+     preferred over the synthetic corpus.
+  3. Every registered case runs, and measure() reports per-call timings.
+     Mutating cases get fresh inputs each pass.
+  4. regressions() flags only cases slower than the threshold.
+
+Usage:
+    cd <agent_annotate_dir>
+    python3 scripts/test_hot_paths_bench.py
+"""
+
+from __future__ import annotations
+
+import os
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+THIS_DIR = Path(__file__).resolve().parent
+PKG_ROOT = THIS_DIR.parent
+if str(PKG_ROOT) not in sys.path:
+    sys.path.insert(0, str(PKG_ROOT))
+
+from app.models.research import ResearchResult  # noqa: E402
+from bench.hot_paths import (  # noqa: E402
+    CASES,
+    build_corpus,
+    measure,
+    regressions,
+    run_suite,
+    synthetic_bundles,
+)
+
+
+def test_synthetic_corpus():
+    from agents.annotation.outcome import _build_evidence_dossier
+
+    a, b = synthetic_bundles(5, seed=3), synthetic_bundles(5, seed=3)
+    assert [n for n, _ in a] == [n for n, _ in b]
+    assert [r.model_dump() for r in a[2][1]] == [r.model_dump() for r in b[2][1]]
+    assert synthetic_bundles(5, seed=4)[0][1][0].model_dump() != a[0][1][0].model_dump()
+    nct, results = a[0]
+    dossier = _build_evidence_dossier(results, nct)
+    assert dossier["registry_status"] and dossier["sponsor_name"]
+    assert dossier["publication_count"] > 0 and dossier["intervention_names"]
+    print("  ✓ synthetic corpus is seeded and fills the outcome dossier")
+
+
+def test_loads_persisted_research():
+    from app.services.persistence_service import PersistenceService
+    from app.services.persistence_writer import persistence_writer
+
+    root = Path(tempfile.mkdtemp())
+    svc = PersistenceService(root)
+    old = ResearchResult(agent_name="literature", nct_id="NCT00000001")
+    new = ResearchResult(agent_name="clinical_protocol", nct_id="NCT00000001")
+    svc.save_research("job_old", "NCT00000001", [old])
+    svc.save_research("job_old", "NCT00000002", [old])
+    persistence_writer.flush()
+    past = time.time() - 60
+    for p in (root / "research" / "job_old").glob("*.json"):
+        os.utime(p, (past, past))
+    svc.save_research("job_new", "NCT00000001", [new])
+    persistence_writer.flush()
+
+    corpus = build_corpus(root / "research")
+    assert corpus.source.endswith("(2 trials)"), corpus.source
+    trials = dict(corpus.trials)
+    assert [r.agent_name for r in trials["NCT00000001"]] == ["clinical_protocol"]
+    assert build_corpus(root / "missing", limit=3).source.startswith("synthetic")
+    print("  ✓ newest persisted research per NCT is preferred over synthetic")
+
+
+def test_cases_run():
+    corpus = build_corpus(None, limit=4)
+    results = run_suite(corpus, min_time=0.001, repeats=1)
+    assert set(results) == set(CASES)
+    for name, r in results.items():
+        assert r["calls_per_pass"] > 0 and r["per_call_us"] > 0, name
+
+    passes = []
+
+    def setup():
+        passes.append(0)
+        return [1, 2, 3]
+
+    def run(state):
+        assert state == [1, 2, 3]
+        state.clear()  # mutates its input
+        return 3
+
+    r = measure((setup, run), min_time=0.0, repeats=3)
+    assert len(passes) == 3 and r["calls_per_pass"] == 3
+    print(f"  ✓ all {len(CASES)} cases run; mutating cases get fresh inputs")
+
+
+def test_regressions():
+    base = {"a": {"per_call_us": 10.0}, "b": {"per_call_us": 10.0}, "c": {"per_call_us": 0}}
+    cur = {"a": {"per_call_us": 12.0}, "b": {"per_call_us": 13.0},
+           "c": {"per_call_us": 5.0}, "d": {"per_call_us": 1.0}}
+    slower = regressions(cur, base, 0.25)
+    assert [s[0] for s in slower] == ["b"]
+    assert abs(slower[0][3] - 1.3) < 1e-9
+    assert regressions(cur, base, 0.1)[0][0] == "a"
+    print("  ✓ regressions() flags cases past the threshold only")
+
+
+def main() -> int:
+    print("Hot-path benchmark tests")
+    print("-" * 60)
+    tests = [
+        test_synthetic_corpus,
+        test_loads_persisted_research,
+        test_cases_run,
+        test_regressions,
+    ]
+    failed = 0
+    for t in tests:
+        try:
+            t()
+        except AssertionError as e:
+            print(f"  ✗ {t.__name__}: {e}")
+            failed += 1
+        except Exception as e:
+            print(f"  ✗ {t.__name__}: {type(e).__name__}: {e}")
+            failed += 1
+    print("-" * 60)
+    if failed:
+        print(f"FAIL: {failed}/{len(tests)}")
+        return 1
+    print(f"OK: {len(tests)}/{len(tests)}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
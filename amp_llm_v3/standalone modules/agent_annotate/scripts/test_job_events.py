@@ -0,0 +1,208 @@
+#!/usr/bin/env python3
+"""
+Unit tests for the job status event stream (app/services/job_events.py).
+
+No network. Each test drives its own JobEventHub over a mutable job list.
+Verifies:
+  1. A subscriber gets a snapshot, then deltas carrying only changed fields,
+     new rows whole and removed keys; seq increases by one per delta.
+  2. A burst of notify() calls is coalesced into one delta, and a quiet
+     interval still picks up changes made without a notify.
+  3. A subscriber that stops reading gets a fresh snapshot in place of its
+     backlog; the diff loop stops once the last subscriber leaves.
+  4. apply_delta rebuilds the source rows from the SSE frames, and a failing
+     source keeps the last published state.
+
+Usage:
+    cd <agent_annotate_dir>
+    python3 scripts/test_job_events.py
+"""
+
+from __future__ import annotations
+
+import asyncio
+import json
+import sys
+from pathlib import Path
+
+THIS_DIR = Path(__file__).resolve().parent
+PKG_ROOT = THIS_DIR.parent
+if str(PKG_ROOT) not in sys.path:
+    sys.path.insert(0, str(PKG_ROOT))
+
+from app.services.job_events import JobEventHub, apply_delta, diff_rows  # noqa: E402
+
+
+def _job(job_id: str, status: str = "queued", done: int = 0) -> dict:
+    return {"job_id": job_id, "status": status, "completed_trials": done, "total_trials": 3}
+
+
+def _run(coro):
+    return asyncio.run(asyncio.wait_for(coro, 5))
+
+
+def test_snapshot_then_deltas():
+    jobs = {"a": _job("a", "running", 1), "b": _job("b")}
+    hub = JobEventHub(lambda: list(jobs.values()), interval=60, coalesce=0)
+
+    async def go():
+        stream = hub.events()
+        snap = await stream.__anext__()
+        assert snap["type"] == "snapshot"
+        seq = snap["seq"]
+        assert sorted(j["job_id"] for j in snap["jobs"]) == ["a", "b"]
+
+        jobs["a"] = _job("a", "running", 2)
+        jobs["c"] = _job("c")
+        del jobs["b"]
+        hub.notify()
+        delta = await stream.__anext__()
+        assert delta["seq"] == seq + 1
+        assert delta["remove"] == ["b"]
+        assert {"job_id": "a", "completed_trials": 2} in delta["upsert"]
+        assert _job("c") in delta["upsert"] and len(delta["upsert"]) == 2
+
+        jobs["a"] = _job("a", "completed", 3)
+        hub.notify()
+        delta = await stream.__anext__()
+        assert delta["seq"] == seq + 2
+        assert delta["upsert"] == [{"job_id": "a", "status": "completed", "completed_trials": 3}]
+        await stream.aclose()
+
+    _run(go())
+    upsert, remove = diff_rows({"x": {"job_id": "x", "e": 1}}, {"x": {"job_id": "x"}}, "job_id")
+    assert upsert == [{"job_id": "x", "e": None}] and remove == []
+    print("  ✓ snapshot first, then deltas with only the changed fields")
+
+
+def test_coalescing_and_interval():
+    jobs = {"a": _job("a")}
+    reads = []
+
+    def source():
+        reads.append(1)
+        return list(jobs.values())
+
+    hub = JobEventHub(source, interval=0.2, coalesce=0.1)
+
+    async def go():
+        stream = hub.events()
+        seq = (await stream.__anext__())["seq"]
+        for done in range(1, 4):
+            jobs["a"] = _job("a", "running", done)
+            hub.notify()
+        delta = await stream.__anext__()
+        assert delta["seq"] == seq + 1 and delta["upsert"][0]["completed_trials"] == 3
+        before = len(reads)
+
+        # No notify: the interval tick still notices.
+        jobs["a"] = _job("a", "completed", 3)
+        delta = await stream.__anext__()
+        assert delta["seq"] == seq + 2 and delta["upsert"][0]["status"] == "completed"
+        assert len(reads) - before <= 4
+        await stream.aclose()
+
+    _run(go())
+    print("  ✓ notify bursts coalesce; the interval tick catches silent changes")
+
+
+def test_slow_subscriber_and_shutdown():
+    jobs = {"a": _job("a")}
+    hub = JobEventHub(lambda: list(jobs.values()), interval=60, coalesce=0, queue_size=2)
+
+    async def go():
+        slow = hub.events()
+        seq = (await slow.__anext__())["seq"]
+        for done in range(1, 6):
+            jobs["a"] = _job("a", "running", done)
+            hub.refresh()
+        event = await slow.__anext__()
+        assert event["type"] == "snapshot" and event["seq"] == seq + 5
+        assert event["jobs"][0]["completed_trials"] == 5
+        assert hub.stats()["resyncs"] >= 1
+
+        # Heartbeats while idle.
+        fast = hub.events(heartbeat=0.05)
+        await fast.__anext__()
+        assert await fast.__anext__() is None
+
+        await slow.aclose()
+        await fast.aclose()
+        await asyncio.sleep(0)
+        assert hub.stats()["subscribers"] == 0 and hub._pump_task is None
+        hub.notify()  # no-op with nobody listening
+
+    _run(go())
+    print("  ✓ stalled subscribers are resynced; the diff loop stops when idle")
+
+
+def test_sse_round_trip():
+    jobs = {"a": _job("a"), "b": _job("b")}
+    calls = {"fail": False}
+
+    def source():
+        if calls["fail"]:
+            raise RuntimeError("orchestrator not ready")
+        return list(jobs.values())
+
+    hub = JobEventHub(source, interval=60, coalesce=0)
+
+    async def go():
+        frames = hub.sse(heartbeat=5)
+        assert (await frames.__anext__()).startswith("retry:")
+        rows: dict = {}
+
+        async def next_event():
+            frame = await frames.__anext__()
+            lines = frame.rstrip("\n").split("\n")
+            assert lines[0].startswith("id: ") and lines[1].startswith("event: ")
+            event = json.loads(lines[2][len("data: "):])
+            apply_delta(rows, event, "job_id")
+            return event
+
+        await next_event()
+        jobs["a"] = _job("a", "running", 2)
+        del jobs["b"]
+        hub.notify()
+        await next_event()
+        assert rows == {k: v for k, v in jobs.items()}
+
+        calls["fail"] = True
+        assert hub.refresh() is None
+        assert hub.stats()["source_errors"] == 1
+        assert hub.snapshot()["jobs"] == list(jobs.values())
+        await frames.aclose()
+
+    _run(go())
+    print("  ✓ SSE frames rebuild the job list; source errors keep the last state")
+
+
+def main() -> int:
+    print("Job event stream tests")
+    print("-" * 60)
+    tests = [
+        test_snapshot_then_deltas,
+        test_coalescing_and_interval,
+        test_slow_subscriber_and_shutdown,
+        test_sse_round_trip,
+    ]
+    failed = 0
+    for t in tests:
+        try:
+            t()
+        except AssertionError as e:
+            print(f"  ✗ {t.__name__}: {e}")
+            failed += 1
+        except Exception as e:
+            print(f"  ✗ {t.__name__}: {type(e).__name__}: {e}")
+            failed += 1
+    print("-" * 60)
+    if failed:
+        print(f"FAIL: {failed}/{len(tests)}")
+        return 1
+    print(f"OK: {len(tests)}/{len(tests)}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
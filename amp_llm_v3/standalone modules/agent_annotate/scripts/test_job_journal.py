@@ -0,0 +1,342 @@
+#!/usr/bin/env python3
+"""
+Unit tests for the per-job checkpoint journal and the job index
+(persistence_service / persistence_writer).
+
+No network, no LLM. Each test swaps a private PersistenceWriter into
+persistence_service (restored afterwards) and uses a temp results dir.
+Verifies:
+  1. A new job's journal gets a record per research / annotation step once
+     the file has landed, with the sha256 of the bytes on disk; resume's
+     completed sets come from it, queued records included.
+  2. A file without a journal record (crash between rename and append)
+     counts as not done; a torn final line is skipped and can't swallow
+     the next record; a coalesced write drops the superseded record.
+  3. Jobs started before journals existed fall back to listing their dirs.
+  4. Startup reads full state only for active jobs and state files newer
+     than the index; a missing index is rebuilt from a full scan, written
+     through the writer. An index newer than everything in jobs/ is used
+     without listing the dir.
+  5. Replay checks each step's file against its latest record's size and
+     sha256 and redoes mismatches; unreadable journal lines are skipped.
+
+Usage:
+    cd <agent_annotate_dir>
+    python3 scripts/test_job_journal.py
+"""
+
+from __future__ import annotations
+
+import hashlib
+import json
+import os
+import sys
+import tempfile
+import threading
+import time
+from pathlib import Path
+
+THIS_DIR = Path(__file__).resolve().parent
+PKG_ROOT = THIS_DIR.parent
+if str(PKG_ROOT) not in sys.path:
+    sys.path.insert(0, str(PKG_ROOT))
+
+import app.services.persistence_service as persistence_service  # noqa: E402
+from app.models.research import ResearchResult  # noqa: E402
+from app.services.persistence_service import PersistenceService  # noqa: E402
+from app.services.persistence_writer import PersistenceWriter  # noqa: E402
+
+
+class GatedWriter(PersistenceWriter):
+    """Writer whose thread blocks before each batch until ``gate`` is set."""
+
+    def __init__(self):
+        super().__init__()
+        self.gate = threading.Event()
+        self.gate.set()
+        self.in_batch = threading.Event()
+
+    def _write_batch(self, batch):
+        self.in_batch.set()
+        self.gate.wait(5)
+        super()._write_batch(batch)
+
+
+def _with_writer(fn):
+    def wrapper():
+        original = persistence_service.persistence_writer
+        writer = GatedWriter()
+        persistence_service.persistence_writer = writer
+        root = Path(tempfile.mkdtemp())
+        try:
+            fn(writer, PersistenceService(root))
+        finally:
+            writer.gate.set()
+            writer.flush(5)
+            persistence_service.persistence_writer = original
+            persistence_service._job_indexes.pop(root, None)
+    wrapper.__name__ = fn.__name__
+    return wrapper
+
+
+def _research(nct: str, agent: str = "clinical_protocol") -> list[ResearchResult]:
+    return [ResearchResult(agent_name=agent, nct_id=nct)]
+
+
+def _trial(nct: str, verified: bool = True) -> dict:
+    out = {"nct_id": nct, "annotations": []}
+    if verified:
+        out["verification"] = {"flagged_for_review": False}
+    return out
+
+
+@_with_writer
+def test_journal_records_landed_steps(writer, p):
+    ncts = ["NCT00000001", "NCT00000002"]
+    p.init_research_dir("j1", ncts, {}, {})
+    p.init_annotations_dir("j1")
+    p.save_research("j1", ncts[0], _research(ncts[0]))
+    p.save_research("j1", ncts[1], _research(ncts[1]))
+    p.save_annotation("j1", ncts[0], _trial(ncts[0]))
+    p.save_annotation_error("j1", ncts[1], {"nct_id": ncts[1], "error": "timeout"})
+    assert writer.flush(5)
+
+    journal = p.read_journal("j1")
+    assert [r["step"] for r in journal] == [
+        "begin", "research", "research", "annotation", "annotation_error",
+    ]
+    ann = journal[3]
+    on_disk = (p._annotations_dir("j1") / f"{ncts[0]}.json").read_bytes()
+    assert ann["sha256"] == hashlib.sha256(on_disk).hexdigest()
+    assert ann["bytes"] == len(on_disk) and ann["verified"] is True
+    assert p.get_completed_research("j1") == set(ncts)
+    assert p.get_completed_annotations("j1") == {ncts[0]}
+
+    # Queued steps are visible before they land (read-your-writes).
+    writer.gate.clear()
+    p.save_annotation("j1", "NCT00000009", _trial("NCT00000009"))
+    assert writer.in_batch.wait(5)
+    p.save_annotation("j1", ncts[1], _trial(ncts[1], verified=False))
+    assert p.get_completed_annotations("j1") == {ncts[0], ncts[1], "NCT00000009"}
+    writer.gate.set()
+    assert writer.flush(5)
+    assert writer.stats()["journaled"] == 6
+    print("  ✓ each landed step is journaled with its file hash; queued ones count")
+
+
+@_with_writer
+def test_unjournaled_and_torn(writer, p):
+    nct = "NCT00000001"
+    p.init_research_dir("j2", [nct, "NCT00000002"], {}, {})
+    p.init_annotations_dir("j2")
+    # Crash after the rename but before the journal append.
+    (p._annotations_dir("j2") / f"{nct}.json").write_text(json.dumps(_trial(nct)))
+    assert p.get_completed_annotations("j2") == set()
+
+    # Crash mid-append leaves a torn line without a newline.
+    with open(p._journal_path("j2"), "ab") as f:
+        f.write(b'{"step":"research","nct_id":"NCT0000')
+    p.save_research("j2", nct, _research(nct))
+    assert writer.flush(5)
+    assert p.get_completed_research("j2") == {nct}
+
+    # A coalesced write drops the superseded payload's record too.
+    writer.gate.clear()
+    p.save_annotation("j2", "NCT00000003", _trial("NCT00000003"))
+    assert writer.in_batch.wait(5)
+    p.save_research("j2", "NCT00000002", _research("NCT00000002", "v1"))
+    p.save_research("j2", "NCT00000002", _research("NCT00000002", "v2"))
+    writer.gate.set()
+    assert writer.flush(5)
+    records = [r for r in p.read_journal("j2") if r.get("nct_id") == "NCT00000002"]
+    on_disk = (p._research_dir("j2") / "NCT00000002.json").read_bytes()
+    assert len(records) == 1 and b'"v2"' in on_disk
+    assert records[0]["sha256"] == hashlib.sha256(on_disk).hexdigest()
+    print("  ✓ unjournaled files are redone; torn lines and superseded writes are dropped")
+
+
+@_with_writer
+def test_legacy_job_scans(writer, p):
+    nct = "NCT00000001"
+    rdir = p._research_dir("old")
+    rdir.mkdir(parents=True)
+    (rdir / "_meta.json").write_text(json.dumps({"job_id": "old", "nct_ids": [nct]}))
+    (rdir / f"{nct}.json").write_text(json.dumps({"nct_id": nct, "results": []}))
+    # Resuming writes journal records, but with no begin record the dirs
+    # stay authoritative.
+    p.init_research_dir("old", [nct, "NCT00000002"], {}, {})
+    p.save_research("old", "NCT00000002", _research("NCT00000002"))
+    assert writer.flush(5)
+    assert p.read_journal("old") is None
+    assert p.get_completed_research("old") == {nct, "NCT00000002"}
+    print("  ✓ pre-journal jobs fall back to listing their dirs")
+
+
+def _state(job_id: str, status: str) -> dict:
+    return {
+        "job_id": job_id,
+        "nct_ids": ["NCT00000001"],
+        "status": status,
+        "progress": {"total_trials": 1, "completed_trials": 1, "field_timings": {"x": 1}},
+        "trial_times": [1.0] * 50,
+    }
+
+
+@_with_writer
+def test_startup_reads_active_jobs_only(writer, p):
+    jobs_dir = p._results_dir / "jobs"
+    for job_id in ("a", "b", "c"):
+        p.save_job_state(job_id, _state(job_id, "queued"), update_index=True)
+        p.save_job_state(job_id, _state(job_id, "running"), update_index=True)
+    for job_id in ("a", "b"):
+        p.save_job_state(job_id, _state(job_id, "completed"), update_index=True)
+    assert writer.flush(5)
+    # Per-trial saves of a running job don't rewrite the index.
+    p.save_job_state("c", _state("c", "running"), update_index=True)
+    assert writer.pending(jobs_dir / "_index.json") is None
+    assert writer.flush(5)
+    past = time.time() - 60
+    for job_id in ("a", "b", "c"):
+        os.utime(jobs_dir / f"{job_id}.json", (past, past))
+
+    reads = []
+    original = PersistenceService._read_json
+
+    def counting(path):
+        reads.append(path.name)
+        return original(path)
+
+    PersistenceService._read_json = staticmethod(counting)
+    try:
+        persistence_service._job_indexes.clear()
+        states = p.load_all_job_states()
+        assert sorted(reads) == ["_index.json", "c.json"], reads
+        assert {k: v["status"] for k, v in states.items()} == {
+            "a": "completed", "b": "completed", "c": "running",
+        }
+        assert "trial_times" not in states["a"]
+        assert states["a"]["progress"] == {"total_trials": 1, "completed_trials": 1}
+
+        # A state file written after the index is reread and re-indexed.
+        os.utime(jobs_dir / "_index.json", (past, past))
+        p.save_job_state("b", _state("b", "failed"))
+        assert writer.flush(5)
+        reads.clear()
+        persistence_service._job_indexes.clear()
+        assert p.load_all_job_states()["b"]["status"] == "failed"
+        assert "b.json" in reads
+        assert writer.flush(5)  # the refreshed index goes through the writer
+        reads.clear()
+        persistence_service._job_indexes.clear()
+        assert p.load_all_job_states()["b"]["status"] == "failed"
+        assert "b.json" not in reads
+
+        # No index (first start after upgrade): full scan, then indexed.
+        (jobs_dir / "_index.json").unlink()
+        reads.clear()
+        persistence_service._job_indexes.clear()
+        assert set(p.load_all_job_states()) == {"a", "b", "c"}
+        assert {"a.json", "b.json", "c.json"} <= set(reads)
+        assert writer.flush(5)
+        assert set(json.loads((jobs_dir / "_index.json").read_text())["jobs"]) == {"a", "b"}
+    finally:
+        PersistenceService._read_json = staticmethod(original)
+    print("  ✓ startup reads the index plus active / changed job states only")
+
+
+@_with_writer
+def test_fresh_index_skips_dir_listing(writer, p):
+    jobs_dir = p._results_dir / "jobs"
+    p.save_job_state("a", _state("a", "running"), update_index=True)
+    p.save_job_state("b", _state("b", "completed"), update_index=True)
+    p.save_job_state("a", _state("a", "running"))  # per-trial save, after the index
+    assert writer.flush(5)
+
+    listed = []
+    original = PersistenceService._names_with_pending
+
+    def counting(directory):
+        listed.append(directory.name)
+        return original(directory)
+
+    PersistenceService._names_with_pending = staticmethod(counting)
+    try:
+        persistence_service._job_indexes.clear()
+        assert set(p.load_all_job_states()) == {"a", "b"}
+        assert listed == ["jobs"]  # a state file landed after the index: scan
+        assert writer.flush(5)
+
+        # The index is the newest entry in jobs/: no listing at all.
+        p.save_job_state("b", _state("b", "failed"), update_index=True)
+        assert writer.flush(5)
+        listed.clear()
+        persistence_service._job_indexes.clear()
+        states = p.load_all_job_states()
+        assert listed == [], listed
+        assert states["b"]["status"] == "failed"
+        assert states["a"]["status"] == "running" and "trial_times" in states["a"]
+    finally:
+        PersistenceService._names_with_pending = staticmethod(original)
+    print("  ✓ a fresh index is used without listing jobs/")
+
+
+@_with_writer
+def test_replay_verifies_file_hashes(writer, p):
+    ncts = ["NCT00000001", "NCT00000002", "NCT00000003"]
+    p.init_research_dir("j5", ncts, {}, {})
+    p.init_annotations_dir("j5")
+    for nct in ncts:
+        p.save_research("j5", nct, _research(nct))
+        p.save_annotation("j5", nct, _trial(nct))
+    assert writer.flush(5)
+    adir, rdir = p._annotations_dir("j5"), p._research_dir("j5")
+
+    # Same size, different bytes; and a truncated research file.
+    data = (adir / f"{ncts[0]}.json").read_bytes()
+    (adir / f"{ncts[0]}.json").write_bytes(data.replace(b"NCT00000001", b"NCT00000009"))
+    (rdir / f"{ncts[1]}.json").write_bytes(b"{")
+    # A garbage line mid-journal is skipped, not fatal.
+    with open(p._journal_path("j5"), "ab") as f:
+        f.write(b"\x00\x00 not json\n")
+    assert p.get_completed_annotations("j5") == {ncts[1], ncts[2]}
+    assert p.get_completed_research("j5") == {ncts[0], ncts[2]}
+    assert p.get_completed_research("j5", verify=False) == set(ncts)  # counts only
+
+    # Redoing the step journals the new bytes, which then match again.
+    p.save_annotation("j5", ncts[0], _trial(ncts[0]))
+    assert writer.flush(5)
+    assert p.get_completed_annotations("j5") == set(ncts)
+    print("  ✓ replay redoes steps whose file no longer matches its sha256")
+
+
+def main() -> int:
+    print("Job journal / index tests")
+    print("-" * 60)
+    tests = [
+        test_journal_records_landed_steps,
+        test_unjournaled_and_torn,
+        test_legacy_job_scans,
+        test_startup_reads_active_jobs_only,
+        test_fresh_index_skips_dir_listing,
+        test_replay_verifies_file_hashes,
+    ]
+    failed = 0
+    for t in tests:
+        try:
+            t()
+        except AssertionError as e:
+            print(f"  ✗ {t.__name__}: {e}")
+            failed += 1
+        except Exception as e:
+            print(f"  ✗ {t.__name__}: {type(e).__name__}: {e}")
+            failed += 1
+    print("-" * 60)
+    if failed:
+        print(f"FAIL: {failed}/{len(tests)}")
+        return 1
+    print(f"OK: {len(tests)}/{len(tests)}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
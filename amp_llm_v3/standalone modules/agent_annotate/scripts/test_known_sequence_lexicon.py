@@ -0,0 +1,138 @@
+#!/usr/bin/env python3
+"""
+Unit tests for the precompiled drug-name lexicon (agents/lexicon.py) and
+resolve_known_sequence on top of it.
+
+Verifies:
+  1. DrugLexicon's exact / contained_in / containing / first_match agree with
+     brute-force scans, including overlapping terms and the empty name.
+  2. resolve_known_sequence returns exactly what the old sort-and-scan
+     implementation did for every key, alias, their substrings and
+     superstrings, and seeded random names.
+  3. The GLP-1 / glucagon longest-match fix still holds through the lexicon.
+
+Usage:
+    cd <agent_annotate_dir>
+    python3 scripts/test_known_sequence_lexicon.py
+"""
+
+from __future__ import annotations
+
+import random
+import sys
+from pathlib import Path
+
+THIS_DIR = Path(__file__).resolve().parent
+PKG_ROOT = THIS_DIR.parent
+if str(PKG_ROOT) not in sys.path:
+    sys.path.insert(0, str(PKG_ROOT))
+
+from agents.annotation.sequence import (  # noqa: E402
+    _KNOWN_SEQUENCE_ALIASES,
+    _KNOWN_SEQUENCES,
+    resolve_known_sequence,
+)
+from agents.lexicon import DrugLexicon  # noqa: E402
+
+
+def _scan_resolve(name_lower: str):
+    """resolve_known_sequence as it was before the lexicon (v42.6.18)."""
+    if name_lower in _KNOWN_SEQUENCES:
+        return name_lower, _KNOWN_SEQUENCES[name_lower]
+    for drug in sorted(_KNOWN_SEQUENCES.keys(), key=len, reverse=True):
+        if drug in name_lower or name_lower in drug:
+            return drug, _KNOWN_SEQUENCES[drug]
+    for alias in sorted(_KNOWN_SEQUENCE_ALIASES.keys(), key=len, reverse=True):
+        if alias in name_lower or name_lower in alias:
+            canonical = _KNOWN_SEQUENCE_ALIASES[alias]
+            seq = _KNOWN_SEQUENCES.get(canonical)
+            if seq:
+                return canonical, seq
+    return None
+
+
+def _probe_names(seed: int = 0) -> list[str]:
+    rng = random.Random(seed)
+    terms = list(_KNOWN_SEQUENCES) + list(_KNOWN_SEQUENCE_ALIASES)
+    names = {"", " ", "placebo", "saline", "glp-1 receptor agonist therapy"}
+    for t in terms:
+        names.add(t)
+        names.add(t.upper().lower() + " injection")
+        names.add("low dose " + t)
+        names.add(t + "/" + rng.choice(terms))
+        for _ in range(3):
+            i = rng.randrange(len(t))
+            names.add(t[i:rng.randrange(i, len(t)) + 1])
+    alphabet = "abcdeglmnoprstuy -1"
+    for _ in range(500):
+        names.add("".join(rng.choice(alphabet) for _ in range(rng.randrange(1, 12))))
+    return sorted(names)
+
+
+def test_lexicon_matches_brute_force():
+    terms = ["he", "she", "his", "hers", "ushers", "h", "s", "e"]
+    lex = DrugLexicon(terms)
+    assert len(lex) == len(terms) and "hers" in lex and "her" not in lex
+    assert lex.exact("she") == "she" and lex.exact("sh") is None
+    rng = random.Random(1)
+    probes = ["", "ushers", "ahishers", "xyz", "sh", "er"] + [
+        "".join(rng.choice("hersuix") for _ in range(rng.randrange(0, 9)))
+        for _ in range(300)
+    ]
+    for name in probes:
+        assert lex.contained_in(name) == [t for t in terms if t in name], name
+        assert lex.containing(name) == [t for t in terms if name in t], name
+        expected = next((t for t in terms if t in name or name in t), None)
+        assert lex.first_match(name) == expected, name
+    assert DrugLexicon([]).first_match("anything") is None
+    assert DrugLexicon(["a", "a", "b"]).terms == ("a", "b")
+    print(f"  ✓ lexicon lookups agree with brute force on {len(probes)} names")
+
+
+def test_resolver_equivalence():
+    names = _probe_names()
+    hits = 0
+    for name in names:
+        got = resolve_known_sequence(name)
+        assert got == _scan_resolve(name), (name, got, _scan_resolve(name))
+        hits += got is not None
+    assert hits > len(_KNOWN_SEQUENCES)
+    print(f"  ✓ resolve_known_sequence matches the linear scan on {len(names)} names ({hits} hits)")
+
+
+def test_longest_match_preserved():
+    drug, seq = resolve_known_sequence("glucagon-like peptide 1 (7-37)")
+    assert drug == "glucagon-like peptide 1", drug
+    assert seq.startswith("HAEGTFTSDV"), seq
+    assert resolve_known_sequence("glucagon")[0] == "glucagon"
+    print("  ✓ GLP-1 still beats glucagon through the lexicon")
+
+
+def main() -> int:
+    print("Known-sequence lexicon tests")
+    print("-" * 60)
+    tests = [
+        test_lexicon_matches_brute_force,
+        test_resolver_equivalence,
+        test_longest_match_preserved,
+    ]
+    failed = 0
+    for t in tests:
+        try:
+            t()
+        except AssertionError as e:
+            print(f"  ✗ {t.__name__}: {e}")
+            failed += 1
+        except Exception as e:
+            print(f"  ✗ {t.__name__}: {type(e).__name__}: {e}")
+            failed += 1
+    print("-" * 60)
+    if failed:
+        print(f"FAIL: {failed}/{len(tests)}")
+        return 1
+    print(f"OK: {len(tests)}/{len(tests)}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,207 @@
+#!/usr/bin/env python3
+"""
+Unit tests for the metrics registry (app/services/metrics.py) and /metrics.
+
+No network: outbound HTTP goes through an httpx.MockTransport. Verifies:
+  1. Counters, gauges and labelled children render in Prometheus text
+     format, with label values escaped.
+  2. Histogram buckets are cumulative, with +Inf, _sum and _count.
+  3. Collectors feeding one family are merged under a single HELP/TYPE
+     header, and a broken collector doesn't break the scrape.
+  4. OpenMetrics mode drops the counter _total suffix from the family
+     name and ends with # EOF.
+  5. Producers record: resilient_get per host/status, the Ollama client
+     per model (latency, tokens, tokens/sec), and the registered caches.
+  6. GET /metrics serves the registry with the negotiated content type.
+
+Usage:
+    cd <agent_annotate_dir>
+    python3 scripts/test_metrics_registry.py
+"""
+
+from __future__ import annotations
+
+import asyncio
+import sys
+from pathlib import Path
+
+THIS_DIR = Path(__file__).resolve().parent
+PKG_ROOT = THIS_DIR.parent
+if str(PKG_ROOT) not in sys.path:
+    sys.path.insert(0, str(PKG_ROOT))
+
+import httpx  # noqa: E402
+
+from app.services.metrics import (  # noqa: E402
+    OPENMETRICS_CONTENT_TYPE,
+    PROMETHEUS_CONTENT_TYPE,
+    MetricsRegistry,
+    metrics,
+)
+
+
+def test_counter_gauge_render():
+    reg = MetricsRegistry()
+    requests = reg.counter("app_requests_total", "Requests", ("route",))
+    requests.labels("/a").inc()
+    requests.labels(route="/a").inc(2)
+    requests.labels('/b"x').inc()
+    depth = reg.gauge("app_depth", "Queue depth")
+    depth.set(5)
+    depth.dec()
+    assert reg.counter("app_requests_total", "Requests", ("route",)) is requests
+    try:
+        reg.gauge("app_requests_total", "Requests")
+        raise AssertionError("re-registering with another type must fail")
+    except ValueError:
+        pass
+
+    lines = reg.render().splitlines()
+    assert "# TYPE app_requests_total counter" in lines
+    assert 'app_requests_total{route="/a"} 3' in lines
+    assert 'app_requests_total{route="/b\\"x"} 1' in lines
+    assert "app_depth 4" in lines
+    assert reg.sample("app_requests_total", route="/a") == 3
+    print("  ✓ counters / gauges / labels render in Prometheus text format")
+
+
+def test_histogram_buckets():
+    reg = MetricsRegistry()
+    h = reg.histogram("app_latency_seconds", "Latency", ("host",), buckets=(0.1, 1, 10))
+    for v in (0.05, 0.5, 0.7, 5, 50):
+        h.labels("x").observe(v)
+    lines = reg.render().splitlines()
+    assert 'app_latency_seconds_bucket{host="x",le="0.1"} 1' in lines
+    assert 'app_latency_seconds_bucket{host="x",le="1"} 3' in lines
+    assert 'app_latency_seconds_bucket{host="x",le="10"} 4' in lines
+    assert 'app_latency_seconds_bucket{host="x",le="+Inf"} 5' in lines
+    assert 'app_latency_seconds_sum{host="x"} 56.25' in lines
+    assert 'app_latency_seconds_count{host="x"} 5' in lines
+    with h.labels("y").time():
+        pass
+    assert reg.sample("app_latency_seconds", host="y") == 1
+    print("  ✓ histogram buckets are cumulative with +Inf / _sum / _count")
+
+
+def test_collectors_merge():
+    reg = MetricsRegistry(namespace="app")
+    reg.register_cache("alpha", lambda: {"hits": 3, "misses": 1, "size": 7}, size="size")
+    reg.register_cache("beta", lambda: {"found": 2, "builds": 5}, hits="found", misses="builds")
+
+    @reg.register_collector
+    def broken():
+        raise RuntimeError("boom")
+        yield  # pragma: no cover
+
+    text = reg.render()
+    assert text.count("# TYPE app_cache_hits_total counter") == 1
+    assert 'app_cache_hits_total{cache="alpha"} 3' in text
+    assert 'app_cache_hits_total{cache="beta"} 2' in text
+    assert 'app_cache_misses_total{cache="beta"} 5' in text
+    assert 'app_cache_entries{cache="alpha"} 7' in text
+    assert 'cache_entries{cache="beta"}' not in text
+    assert "# collector error: boom" in text
+    print("  ✓ collectors merge per family; a broken collector is skipped")
+
+
+def test_openmetrics():
+    reg = MetricsRegistry()
+    reg.counter("app_jobs_total", "Jobs").inc()
+    text = reg.render(openmetrics=True)
+    assert "# TYPE app_jobs counter" in text
+    assert "app_jobs_total 1" in text
+    assert text.endswith("# EOF\n")
+    assert "# EOF" not in reg.render()
+    print("  ✓ OpenMetrics: counter family without _total, trailing # EOF")
+
+
+def test_producers_record():
+    from agents.research.http_utils import resilient_get
+    from app.services.ollama_client import OllamaAnnotationClient
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        return httpx.Response(404 if "missing" in request.url.path else 200, json={})
+
+    async def run():
+        async with httpx.AsyncClient(transport=httpx.MockTransport(handler)) as client:
+            await resilient_get("https://metrics-test.example/ok", client=client)
+            await resilient_get("https://metrics-test.example/missing", client=client)
+
+    asyncio.run(run())
+    host = "metrics-test.example"
+    assert metrics.sample("agent_annotate_http_requests_total", host=host, status="200") == 1
+    assert metrics.sample("agent_annotate_http_requests_total", host=host, status="404") == 1
+    assert metrics.sample("agent_annotate_http_request_duration_seconds", host=host) == 2
+
+    OllamaAnnotationClient._record_metrics("metrics-test:1b", {
+        "prompt_eval_count": 120, "eval_count": 40,
+        "eval_duration": 2_000_000_000, "load_duration": 500_000_000,
+    }, 3.0)
+    model = "metrics-test:1b"
+    assert metrics.sample("agent_annotate_llm_requests_total", model=model, outcome="ok") == 1
+    assert metrics.sample("agent_annotate_llm_tokens_total", model=model, kind="prompt") == 120
+    assert metrics.sample("agent_annotate_llm_tokens_total", model=model, kind="completion") == 40
+    text = metrics.render()
+    assert 'agent_annotate_llm_tokens_per_second_bucket{model="metrics-test:1b",le="15"} 0' in text
+    assert 'agent_annotate_llm_tokens_per_second_bucket{model="metrics-test:1b",le="20"} 1' in text
+
+    import agents.evidence  # noqa: F401  (registers evidence_bundle)
+    import agents.research.ctgov_bulk  # noqa: F401
+    import agents.research.drug_cache  # noqa: F401
+    text = metrics.render()
+    for cache in ("drug_research", "evidence_bundle", "ctgov_study"):
+        assert f'agent_annotate_cache_hits_total{{cache="{cache}"}}' in text, cache
+    print("  ✓ resilient_get, Ollama client and caches record into the registry")
+
+
+def test_endpoint():
+    from fastapi import FastAPI
+    from fastapi.testclient import TestClient
+
+    from app.routers import metrics as metrics_router
+
+    app = FastAPI()
+    app.include_router(metrics_router.router)
+    client = TestClient(app)
+    resp = client.get("/metrics")
+    assert resp.status_code == 200
+    assert resp.headers["content-type"] == PROMETHEUS_CONTENT_TYPE
+    assert "# TYPE agent_annotate_http_requests_total counter" in resp.text
+
+    resp = client.get("/metrics", headers={"Accept": "application/openmetrics-text"})
+    assert resp.headers["content-type"] == OPENMETRICS_CONTENT_TYPE
+    assert resp.text.endswith("# EOF\n")
+    print("  ✓ GET /metrics negotiates Prometheus text vs OpenMetrics")
+
+
+def main() -> int:
+    print("Metrics registry tests")
+    print("-" * 60)
+    tests = [
+        test_counter_gauge_render,
+        test_histogram_buckets,
+        test_collectors_merge,
+        test_openmetrics,
+        test_producers_record,
+        test_endpoint,
+    ]
+    failed = 0
+    for t in tests:
+        try:
+            t()
+        except AssertionError as e:
+            print(f"  ✗ {t.__name__}: {e}")
+            failed += 1
+        except Exception as e:
+            print(f"  ✗ {t.__name__}: {type(e).__name__}: {e}")
+            failed += 1
+    print("-" * 60)
+    if failed:
+        print(f"FAIL: {failed}/{len(tests)}")
+        return 1
+    print(f"OK: {len(tests)}/{len(tests)}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
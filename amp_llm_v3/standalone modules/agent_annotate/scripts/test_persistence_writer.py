@@ -0,0 +1,216 @@
+#!/usr/bin/env python3
+"""
+Unit tests for the background persistence writer.
+
+No network, no LLM. Each test swaps a private PersistenceWriter into
+persistence_service (restored afterwards) whose writer thread can be held
+on a gate. Verifies:
+  1. Compact output by default, indent=2 with readable=True; loaders read
+     both layouts (files written before this change stay loadable).
+  2. Read-your-writes: while a write is queued, load_*/get_completed_*/
+     iter_annotations already see it; a queued delete hides the file.
+  3. Repeated writes to one path coalesce and the newest payload lands.
+  4. A full queue makes the caller write inline (backpressure) without
+     letting an older queued payload overwrite it.
+  5. flush() is a barrier; stats() reports depth, counters and latency.
+
+Usage:
+    cd <agent_annotate_dir>
+    python3 scripts/test_persistence_writer.py
+"""
+
+from __future__ import annotations
+
+import json
+import sys
+import tempfile
+import threading
+from pathlib import Path
+
+THIS_DIR = Path(__file__).resolve().parent
+PKG_ROOT = THIS_DIR.parent
+if str(PKG_ROOT) not in sys.path:
+    sys.path.insert(0, str(PKG_ROOT))
+
+import app.services.persistence_service as persistence_service  # noqa: E402
+from app.models.research import ResearchResult  # noqa: E402
+from app.services.persistence_service import PersistenceService  # noqa: E402
+from app.services.persistence_writer import (  # noqa: E402
+    PersistenceWriter,
+    serialize,
+)
+
+
+class GatedWriter(PersistenceWriter):
+    """Writer whose thread blocks before each write until ``gate`` is set."""
+
+    def __init__(self, max_queue=None):
+        super().__init__(max_queue=max_queue)
+        self.gate = threading.Event()
+        self.gate.set()
+        self.in_batch = threading.Event()
+
+    def _write_batch(self, batch):
+        self.in_batch.set()
+        self.gate.wait(5)
+        super()._write_batch(batch)
+
+
+def _with_writer(max_queue=None):
+    """Run the test against a private GatedWriter and a temp results dir.
+
+    The wrapper deliberately doesn't use functools.wraps: pytest would then
+    see the test's parameters and look for fixtures of those names.
+    """
+    def deco(fn):
+        def wrapper():
+            original = persistence_service.persistence_writer
+            writer = GatedWriter(max_queue=max_queue)
+            persistence_service.persistence_writer = writer
+            try:
+                fn(writer, PersistenceService(Path(tempfile.mkdtemp())))
+            finally:
+                writer.gate.set()
+                writer.flush(5)
+                persistence_service.persistence_writer = original
+        wrapper.__name__ = fn.__name__
+        return wrapper
+    return deco
+
+
+def _trial(nct: str, value: str = "AMP") -> dict:
+    return {"nct_id": nct, "annotations": [{"field_name": "classification", "value": value}]}
+
+
+@_with_writer()
+def test_compact_and_readable_layouts(writer, p):
+    data = {"a": [1, 2], "b": {"c": None}}
+    compact = serialize(data)
+    assert b"\n" not in compact and b": " not in compact
+    assert json.loads(compact) == data
+    assert serialize(data, readable=True) == json.dumps(data, indent=2).encode()
+    assert serialize("# md\n") == b"# md\n"
+
+    p.init_annotations_dir("j1")
+    p.save_annotation("j1", "NCT00000001", _trial("NCT00000001"))
+    writer.flush()
+    path = p._annotations_dir("j1") / "NCT00000001.json"
+    assert b"\n" not in path.read_bytes()
+    # A pre-existing indent=2 file still loads.
+    legacy = p._annotations_dir("j1") / "NCT00000002.json"
+    legacy.write_text(json.dumps(_trial("NCT00000002"), indent=2))
+    assert p.load_annotation("j1", "NCT00000002")["nct_id"] == "NCT00000002"
+    print("  ✓ compact by default, readable on request, legacy files load")
+
+
+@_with_writer()
+def test_read_your_writes(writer, p):
+    p.init_annotations_dir("j2")
+    p.init_research_dir("j2", ["NCT00000001"], {}, {})
+    writer.gate.clear()
+    p.save_annotation_error("j2", "NCT00000009", {"nct_id": "NCT00000009", "error": "x"})
+    assert writer.in_batch.wait(5)  # thread now holds the error write in flight
+    p.save_annotation("j2", "NCT00000001", _trial("NCT00000001"))
+    p.save_research("j2", "NCT00000001", [ResearchResult(agent_name="a", nct_id="NCT00000001")])
+    p.save_audit("j2", "NCT00000001", "# audit")
+    adir = p._annotations_dir("j2")
+    assert not (adir / "NCT00000001.json").exists()
+
+    assert p.get_completed_annotations("j2") == {"NCT00000001"}
+    assert p.get_completed_research("j2") == {"NCT00000001"}
+    assert p.load_research("j2", "NCT00000001")[0].agent_name == "a"
+    assert p.load_audit("j2", "NCT00000001") == "# audit"
+    loaded = p.load_annotation("j2", "NCT00000001")
+    loaded["mutated"] = True  # must not leak into the queued payload
+    assert [t["nct_id"] for t in p.iter_annotations("j2")] == ["NCT00000001", "NCT00000009"]
+
+    # Success supersedes the in-flight error file via a queued delete.
+    p.save_annotation("j2", "NCT00000009", _trial("NCT00000009"))
+    assert "error" not in p.load_annotation("j2", "NCT00000009")
+    writer.gate.set()
+    assert writer.flush(5)
+    assert not (adir / "NCT00000009.error.json").exists()
+    assert "mutated" not in json.loads((adir / "NCT00000001.json").read_text())
+    print("  ✓ queued writes/deletes visible to loaders before they land")
+
+
+@_with_writer()
+def test_coalescing(writer, p):
+    writer.gate.clear()
+    p.save_job_state("jA", {"n": 0})
+    assert writer.in_batch.wait(5)
+    for n in range(1, 5):
+        p.save_job_state("jA", {"n": n})
+    assert writer.coalesced == 3
+    writer.gate.set()
+    writer.flush(5)
+    assert p.load_all_job_states() == {"jA": {"n": 4}}
+    assert writer.written == 2  # the in-flight write + one coalesced write
+    print("  ✓ repeated job-state saves coalesce; newest payload lands")
+
+
+@_with_writer(max_queue=1)
+def test_backpressure_inline_write(writer, p):
+    p.init_annotations_dir("j3")
+    writer.gate.clear()
+    p.save_annotation("j3", "NCT00000001", _trial("NCT00000001", "v1"))
+    assert writer.in_batch.wait(5)
+    p.save_annotation("j3", "NCT00000002", _trial("NCT00000002"))  # queued (1/1)
+    p.save_annotation("j3", "NCT00000003", _trial("NCT00000003"))  # full → inline
+    assert writer.inline_writes == 1
+    assert (p._annotations_dir("j3") / "NCT00000003.json").exists()
+    # A path that is in flight still queues, so v2 lands after v1.
+    p.save_annotation("j3", "NCT00000001", _trial("NCT00000001", "v2"))
+    assert writer.inline_writes == 1
+    writer.gate.set()
+    writer.flush(5)
+    assert p.load_annotation("j3", "NCT00000001")["annotations"][0]["value"] == "v2"
+    print("  ✓ full queue writes inline; in-flight paths never reorder")
+
+
+@_with_writer()
+def test_flush_and_stats(writer, p):
+    p.init_annotations_dir("j4")
+    for i in range(5):
+        p.save_annotation("j4", f"NCT0000000{i}", _trial(f"NCT0000000{i}"))
+    assert writer.flush(5)
+    stats = writer.stats()
+    assert stats["queue_depth"] == 0 and stats["errors"] == 0
+    assert stats["written"] == 5 and stats["max_queue_depth"] >= 1
+    assert stats["write_latency_ms"]["p95"] is not None
+    assert stats["serializer"] in ("orjson", "json")
+    assert len(list(p._annotations_dir("j4").glob("*.json"))) == 5
+    assert not list(p._annotations_dir("j4").glob("*.tmp"))
+    print("  ✓ flush() drains the queue; stats report depth and latency")
+
+
+def main() -> int:
+    print("Persistence writer tests")
+    print("-" * 60)
+    tests = [
+        test_compact_and_readable_layouts,
+        test_read_your_writes,
+        test_coalescing,
+        test_backpressure_inline_write,
+        test_flush_and_stats,
+    ]
+    failed = 0
+    for t in tests:
+        try:
+            t()
+        except AssertionError as e:
+            print(f"  ✗ {t.__name__}: {e}")
+            failed += 1
+        except Exception as e:
+            print(f"  ✗ {t.__name__}: {type(e).__name__}: {e}")
+            failed += 1
+    print("-" * 60)
+    if failed:
+        print(f"FAIL: {failed}/{len(tests)}")
+        return 1
+    print(f"OK: {len(tests)}/{len(tests)}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,179 @@
+#!/usr/bin/env python3
+"""
+Unit tests for the SQLite-backed review queue (review_service.py).
+
+No network, no LLM. Each test uses its own ReviewService on a temp database.
+Verifies:
+  1. add / get_pending / get_all / decide behave as the JSON-backed queue
+     did: newest first, job filter, re-adding replaces, unknown key -> None.
+  2. A decision writes one row in one transaction and survives a reopen;
+     stats() counts by status with a single aggregate query.
+  3. An existing review_queue.json is imported once into an empty database
+     and renamed, and listings and the export lookup use the indexes.
+  4. The database is created on first use, not when the module is imported.
+
+Usage:
+    cd <agent_annotate_dir>
+    python3 scripts/test_review_queue.py
+"""
+
+from __future__ import annotations
+
+import json
+import os
+import subprocess
+import sys
+import tempfile
+from pathlib import Path
+
+THIS_DIR = Path(__file__).resolve().parent
+PKG_ROOT = THIS_DIR.parent
+if str(PKG_ROOT) not in sys.path:
+    sys.path.insert(0, str(PKG_ROOT))
+
+from app.models.job import ReviewItem  # noqa: E402
+from app.services.review_service import ReviewService  # noqa: E402
+
+
+def _item(job: str, nct: str, field: str = "classification", day: int = 1, **kw) -> ReviewItem:
+    return ReviewItem(
+        job_id=job, nct_id=nct, field_name=field, original_value="AMP",
+        suggested_values=["Other"], opinions=[{"model": "m", "value": "Other"}],
+        created_at=f"2026-01-{day:02d}T00:00:00", **kw,
+    )
+
+
+def _trace(service: ReviewService) -> list[str]:
+    statements: list[str] = []
+    service._conn.set_trace_callback(statements.append)
+    return statements
+
+
+def test_queue_api():
+    service = ReviewService(Path(tempfile.mkdtemp()) / "review_queue.db")
+    service.add(_item("j1", "NCT1", day=1))
+    service.add(_item("j1", "NCT2", day=3))
+    service.add(_item("j2", "NCT1", day=2))
+    assert [i.nct_id for i in service.get_pending()] == ["NCT2", "NCT1", "NCT1"]
+    assert [i.job_id for i in service.get_pending()] == ["j1", "j2", "j1"]
+    assert [i.nct_id for i in service.get_pending(job_id="j1")] == ["NCT2", "NCT1"]
+
+    service.add(_item("j1", "NCT1", day=4, primary_reasoning="again"))  # replaces
+    assert len(service.get_all()) == 3
+    assert service.get_all(job_id="j1")[0].primary_reasoning == "again"
+    assert service.get_all()[0].opinions == [{"model": "m", "value": "Other"}]
+
+    assert service.decide("j9", "NCT1", "classification", "approved") is None
+    item = service.decide("j1", "NCT1", "classification", "overridden", value="Other", note="n")
+    assert item.status == "overridden" and item.reviewer_value == "Other"
+    assert [i.nct_id for i in service.get_pending(job_id="j1")] == ["NCT2"]
+    assert service.retry("j1") == 1
+    print("  ✓ add / list / decide behave as before")
+
+
+def test_decisions_incremental():
+    path = Path(tempfile.mkdtemp()) / "review_queue.db"
+    service = ReviewService(path)
+    for n in range(200):
+        service.add(_item("j1", f"NCT{n:08d}", day=1 + n % 28))
+
+    statements = _trace(service)
+    service.decide("j1", "NCT00000007", "classification", "approved")
+    service._conn.set_trace_callback(None)
+    writes = [s for s in statements if s.split()[0] in ("INSERT", "UPDATE", "DELETE")]
+    assert len(writes) == 1 and statements.count("COMMIT") == 1, statements
+
+    service.decide("j1", "NCT00000008", "classification", "skipped", note="later")
+    statements = _trace(service)
+    counts = service.stats()
+    service._conn.set_trace_callback(None)
+    assert counts == {"pending": 198, "approved": 1, "skipped": 1}, counts
+    assert len(statements) == 1 and "GROUP BY status" in statements[0], statements
+    assert service.stats(job_id="j2") == {}
+    service.close()
+
+    reopened = ReviewService(path)
+    decided = reopened.get_all(job_id="j1", status=("approved", "skipped"))
+    assert {(i.nct_id, i.status, i.reviewer_note) for i in decided} == {
+        ("NCT00000007", "approved", None), ("NCT00000008", "skipped", "later"),
+    }
+    print("  ✓ one row per decision, one commit; stats by aggregate query")
+
+
+def test_legacy_json_import():
+    root = Path(tempfile.mkdtemp())
+    legacy = root / "review_queue.json"
+    items = [_item("j1", "NCT1", day=2), _item("j1", "NCT2", day=1, status="approved")]
+    legacy.write_text(json.dumps({
+        f"{i.job_id}:{i.nct_id}:{i.field_name}": i.model_dump(mode="json") for i in items
+    }))
+    service = ReviewService(root / "review_queue.db")
+    assert [i.nct_id for i in service.get_pending()] == ["NCT1"]
+    assert not legacy.exists() and (root / "review_queue.json.imported").exists()
+    assert service.stats() == {"pending": 1, "approved": 1}
+
+    # A stray JSON next to a populated database is left alone.
+    legacy.write_text(json.dumps({"j3:NCT3:peptide": _item("j3", "NCT3").model_dump(mode="json")}))
+    service.close()
+    service = ReviewService(root / "review_queue.db")
+    assert legacy.exists() and len(service.get_all()) == 2
+
+    for sql in (
+        "SELECT body FROM review_items WHERE job_id = 'j1' AND status IN ('pending') "
+        "ORDER BY created_at DESC",
+        "SELECT body FROM review_items WHERE status IN ('pending') ORDER BY created_at DESC",
+    ):
+        plan = " ".join(r[3] for r in service._conn.execute("EXPLAIN QUERY PLAN " + sql))
+        assert "USING INDEX" in plan or "USING COVERING INDEX" in plan, plan
+    print("  ✓ legacy JSON imported once and renamed; queries use the indexes")
+
+
+def test_opened_on_first_use():
+    results = Path(tempfile.mkdtemp())
+    subprocess.run(
+        [sys.executable, "-c", "import app.services.orchestrator, app.services.output_service"],
+        cwd=PKG_ROOT, env={**os.environ, "AGENT_ANNOTATE_RESULTS_DIR": str(results)},
+        check=True, capture_output=True,
+    )
+    assert not (results / "review_queue.db").exists()
+
+    db = Path(tempfile.mkdtemp()) / "sub" / "review_queue.db"
+    service = ReviewService(db)
+    assert not db.exists() and not db.parent.exists()
+    assert service.stats() == {}
+    assert db.exists()
+    service.close()
+    service.close()  # closing twice, or before first use, is a no-op
+    assert ReviewService(db).get_all() == []
+    print("  ✓ the database is created on first use, not at import")
+
+
+def main() -> int:
+    print("Review queue store tests")
+    print("-" * 60)
+    tests = [
+        test_queue_api,
+        test_decisions_incremental,
+        test_legacy_json_import,
+        test_opened_on_first_use,
+    ]
+    failed = 0
+    for t in tests:
+        try:
+            t()
+        except AssertionError as e:
+            print(f"  ✗ {t.__name__}: {e}")
+            failed += 1
+        except Exception as e:
+            print(f"  ✗ {t.__name__}: {type(e).__name__}: {e}")
+            failed += 1
+    print("-" * 60)
+    if failed:
+        print(f"FAIL: {failed}/{len(tests)}")
+        return 1
+    print(f"OK: {len(tests)}/{len(tests)}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
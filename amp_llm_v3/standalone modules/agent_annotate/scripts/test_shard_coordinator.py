@@ -0,0 +1,290 @@
+#!/usr/bin/env python3
+"""
+Unit tests for ShardCoordinator (coordinator mode, POST /api/jobs/sharded).
+
+Workers are in-process fakes behind an httpx.MockTransport keyed by host:port,
+so no network, no LLM. Verifies:
+  1. split_shards: contiguous, near-equal, non-empty chunks.
+  2. Shards are submitted least-loaded, progress rolls up from /partial, and
+     completed shards merge into the canonical JSON + CSV in NCT order.
+  3. A worker that stops answering is declared dead after
+     shard_dead_after_failures polls; its shard is resubmitted elsewhere,
+     and the orphaned remote job is cancelled once the worker comes back.
+  4. A failed remote job is resumed in place; a 4xx submission fails the
+     shard (and the job) without retrying other workers.
+  5. run() drives a job to completion and honours cancellation.
+
+Usage:
+    cd <agent_annotate_dir>
+    python3 scripts/test_shard_coordinator.py
+"""
+
+from __future__ import annotations
+
+import asyncio
+import functools
+import json
+import sys
+import tempfile
+from pathlib import Path
+
+THIS_DIR = Path(__file__).resolve().parent
+PKG_ROOT = THIS_DIR.parent
+if str(PKG_ROOT) not in sys.path:
+    sys.path.insert(0, str(PKG_ROOT))
+
+import httpx  # noqa: E402
+
+import app.services.output_service as output_service  # noqa: E402
+from app.services.persistence_writer import persistence_writer  # noqa: E402
+from app.models.job import AnnotationJob, JobProgress  # noqa: E402
+from app.services.shard_coordinator import (  # noqa: E402
+    ShardCoordinator,
+    split_shards,
+)
+
+NCTS = [f"NCT{n:08d}" for n in range(1, 8)]
+
+
+class FakeWorker:
+    """Just enough of the agent_annotate API for the coordinator."""
+
+    def __init__(self, port: int, polls_to_finish: int = 1):
+        self.url = f"http://localhost:{port}"
+        self.alive = True
+        self.polls_to_finish = polls_to_finish
+        self.reject = False
+        self.jobs: dict[str, dict] = {}
+        self.cancelled: list[str] = []
+        self.resumed: list[str] = []
+
+    def handle(self, request: httpx.Request) -> httpx.Response:
+        if not self.alive:
+            raise httpx.ConnectError("connection refused", request=request)
+        path, method = request.url.path, request.method
+        if path == "/api/health":
+            return httpx.Response(200, json={"status": "ok"})
+        if path == "/api/jobs" and method == "POST":
+            if self.reject:
+                return httpx.Response(400, json={"detail": "NCT IDs outside the allowed set"})
+            body = json.loads(request.content)
+            rid = f"w{request.url.port}j{len(self.jobs)}"
+            self.jobs[rid] = {"nct_ids": body["nct_ids"], "polls": 0, "status": "queued"}
+            return httpx.Response(200, json={"job_id": rid, "status": "queued"})
+        parts = path.strip("/").split("/")
+        rid = parts[2]
+        job = self.jobs.get(rid)
+        if job is None:
+            return httpx.Response(404, json={"detail": "Job not found"})
+        if parts[:2] == ["api", "jobs"] and len(parts) == 3:
+            job["polls"] += 1
+            if job["status"] in ("queued", "running"):
+                job["status"] = "completed" if job["polls"] >= self.polls_to_finish else "running"
+            return httpx.Response(200, json={
+                "job_id": rid, "status": job["status"], "commit_hash": "abc1234",
+                "progress": {"completed_trials": 0},
+            })
+        if parts[-1] == "cancel":
+            self.cancelled.append(rid)
+            job["status"] = "cancelled"
+            return httpx.Response(200, json={"job_id": rid, "status": "cancelled"})
+        if parts[-1] == "resume":
+            self.resumed.append(rid)
+            job["status"] = "queued"
+            return httpx.Response(200, json={"job_id": rid, "status": "queued"})
+        if parts[-1] == "partial":
+            done = len(job["nct_ids"]) if job["status"] == "completed" else min(job["polls"], len(job["nct_ids"]))
+            return httpx.Response(200, json={"count": {"completed": done, "total": len(job["nct_ids"])}})
+        # GET /api/results/{rid}
+        trials = [
+            {"nct_id": n, "annotations": [{"field_name": "classification", "value": "AMP"}],
+             "worker": self.url}
+            for n in job["nct_ids"]
+        ]
+        return httpx.Response(200, json={"trials": trials})
+
+
+class FakeOrchestrator:
+    def __init__(self):
+        self.jobs: dict[str, AnnotationJob] = {}
+
+    def create_job(self, nct_ids, priority=None):
+        job = AnnotationJob(
+            job_id=f"coord{len(self.jobs)}", nct_ids=nct_ids,
+            progress=JobProgress(total_trials=len(nct_ids)),
+        )
+        self.jobs[job.job_id] = job
+        return job
+
+    def get_job(self, job_id):
+        return self.jobs.get(job_id)
+
+    def persist_job(self, job):
+        pass
+
+
+class FastCoordinator(ShardCoordinator):
+    @staticmethod
+    def _settings():
+        return {"poll": 0.0, "dead_after": 2, "max_attempts": 3}
+
+
+def _isolated(fn):
+    """Restore output_service.RESULTS_DIR (pointed at a temp dir by _setup)."""
+    @functools.wraps(fn)
+    async def wrapper():
+        original = output_service.RESULTS_DIR
+        try:
+            await fn()
+        finally:
+            output_service.RESULTS_DIR = original
+    return wrapper
+
+
+def _setup(*workers: FakeWorker):
+    by_port = {w.url.rsplit(":", 1)[1]: w for w in workers}
+    transport = httpx.MockTransport(lambda req: by_port[str(req.url.port)].handle(req))
+    tmp = Path(tempfile.mkdtemp())
+    output_service.RESULTS_DIR = tmp
+    coord = FastCoordinator(orchestrator=FakeOrchestrator(), results_dir=tmp, transport=transport)
+    coord._spawn = lambda job_id: None  # tests drive ticks explicitly
+    return coord, tmp
+
+
+async def test_split_shards():
+    assert split_shards(NCTS, 3) == [NCTS[0:3], NCTS[3:5], NCTS[5:7]]
+    assert split_shards(NCTS, 1) == [NCTS]
+    assert split_shards(NCTS[:2], 5) == [[NCTS[0]], [NCTS[1]]]
+    print("  ✓ split_shards")
+
+
+@_isolated
+async def test_happy_path_merges_in_order():
+    a, b = FakeWorker(9105, polls_to_finish=2), FakeWorker(9205, polls_to_finish=2)
+    coord, tmp = _setup(a, b)
+    job = coord.start(NCTS, [a.url, b.url + "/"])
+    assert [len(s.nct_ids) for s in job.shards] == [4, 3]
+
+    async with coord._client() as client:
+        await coord.tick(client, job)  # submit
+        assert {s.worker_url for s in job.shards} == {a.url, b.url}
+        await coord.tick(client, job)  # running, 1 trial each via /partial
+        assert job.progress.completed_trials == 2, job.progress
+        await coord.tick(client, job)  # completed + collected
+    assert all(s.status == "completed" for s in job.shards)
+    persistence_writer.flush()
+    assert len(list((tmp / "annotations" / job.job_id).glob("*.json"))) == len(NCTS)
+
+    await coord.finish(job)
+    assert job.status == "completed"
+    out = json.loads((tmp / "json" / f"{job.job_id}.json").read_text())
+    assert [t["nct_id"] for t in out["trials"]] == NCTS
+    assert len(out["shards"]) == 2 and out["total_trials"] == len(NCTS)
+    assert (tmp / "csv").exists() and any((tmp / "csv").iterdir())
+    print("  ✓ shards submitted, progress rolled up, merged JSON/CSV in NCT order")
+
+
+@_isolated
+async def test_dead_worker_shard_reassigned():
+    a, b = FakeWorker(9105, polls_to_finish=3), FakeWorker(9205, polls_to_finish=99)
+    coord, _ = _setup(a, b)
+    job = coord.start(NCTS, [a.url, b.url])
+    async with coord._client() as client:
+        await coord.tick(client, job)
+        lost = next(s for s in job.shards if s.worker_url == b.url)
+        orphan = lost.remote_job_id
+        b.alive = False
+        await coord.tick(client, job)  # failure 1
+        assert lost.worker_url == b.url
+        await coord.tick(client, job)  # failure 2 → dead → reassigned
+        assert lost.worker_url is None and lost.history[-1]["worker_url"] == b.url
+        await coord.tick(client, job)  # resubmitted to A
+        assert lost.worker_url == a.url and lost.attempts == 2
+        assert coord.stats()["dead_workers"] == [b.url]
+
+        # B comes back: reviving it cancels the orphaned job.
+        b.alive = True
+        assert await coord._revive(client, job, b.url)
+        assert b.cancelled == [orphan]
+        for _ in range(4):
+            await coord.tick(client, job)
+    assert all(s.status == "completed" for s in job.shards)
+    await coord.finish(job)
+    assert job.status == "completed" and job.progress.completed_trials == len(NCTS)
+    print("  ✓ dead worker's shard resubmitted; orphan cancelled on revival")
+
+
+@_isolated
+async def test_failed_remote_resumed_and_rejection_fails_job():
+    a = FakeWorker(9105, polls_to_finish=2)
+    coord, _ = _setup(a)
+    job = coord.start(NCTS[:3], [a.url])
+    async with coord._client() as client:
+        await coord.tick(client, job)
+        rid = job.shards[0].remote_job_id
+        a.jobs[rid]["status"] = "failed"
+        await coord.tick(client, job)
+        assert a.resumed == [rid] and job.shards[0].attempts == 2
+        assert job.shards[0].remote_job_id == rid
+
+    bad = FakeWorker(9305)
+    bad.reject = True
+    coord2, _ = _setup(bad)
+    job2 = coord2.start(NCTS[:2], [bad.url])
+    async with coord2._client() as client:
+        await coord2.tick(client, job2)
+    assert job2.shards[0].status == "failed" and "rejected" in job2.shards[0].error
+    await coord2.finish(job2)
+    assert job2.status == "failed" and "shard 0" in job2.error
+    print("  ✓ failed remote job resumed in place; 4xx submission fails the job")
+
+
+@_isolated
+async def test_run_loop_and_cancel():
+    a, b = FakeWorker(9105), FakeWorker(9205)
+    coord, _ = _setup(a, b)
+    job = coord.start(NCTS, [a.url, b.url])
+    await asyncio.wait_for(coord.run(job.job_id), timeout=5)
+    assert job.status == "completed" and job.progress.current_stage == "done"
+
+    slow = FakeWorker(9305, polls_to_finish=10**9)
+    coord2, _ = _setup(slow)
+    job2 = coord2.start(NCTS[:2], [slow.url])
+    task = asyncio.ensure_future(coord2.run(job2.job_id))
+    await asyncio.sleep(0.05)
+    job2.status = "cancelled"
+    await asyncio.wait_for(task, timeout=5)
+    assert slow.cancelled == [job2.shards[0].remote_job_id]
+    print("  ✓ run() completes the job; cancellation cancels remote shards")
+
+
+async def main() -> int:
+    print("ShardCoordinator tests")
+    print("-" * 60)
+    tests = [
+        test_split_shards,
+        test_happy_path_merges_in_order,
+        test_dead_worker_shard_reassigned,
+        test_failed_remote_resumed_and_rejection_fails_job,
+        test_run_loop_and_cancel,
+    ]
+    failed = 0
+    for t in tests:
+        try:
+            await t()
+        except AssertionError as e:
+            print(f"  ✗ {t.__name__}: {e}")
+            failed += 1
+        except Exception as e:
+            print(f"  ✗ {t.__name__}: {type(e).__name__}: {e}")
+            failed += 1
+    print("-" * 60)
+    if failed:
+        print(f"FAIL: {failed}/{len(tests)}")
+        return 1
+    print(f"OK: {len(tests)}/{len(tests)}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(asyncio.run(main()))
@@ -0,0 +1,256 @@
+#!/usr/bin/env python3
+"""
+Unit tests for streaming / incremental result export.
+
+No network, no LLM. Verifies:
+  1. Failed trials persist as {nct}.error.json: resume still retries them,
+     iter_annotations yields them, and a later success replaces them.
+  2. save_json_output streams trials from an iterator: valid JSON, job NCT
+     order, first-wins dedup, traceability enrichment, atomic replace.
+  3. iter_csv chunks join to exactly generate_standard_csv's output.
+  4. Live CSV/JSONL: created once with a header, appended per trial, kept
+     across a resume minus rows of retried trials and repeats.
+  5. GET /api/results/{id}/csv streams from per-trial files (also while a
+     job is running) and archives the export; /jsonl streams one trial per line.
+  6. Finished jobs export from the final JSON; running jobs, or a missing
+     final JSON, use the per-trial files.
+
+Usage:
+    cd <agent_annotate_dir>
+    python3 scripts/test_streaming_export.py
+"""
+
+from __future__ import annotations
+
+import csv
+import io
+import json
+import sys
+import tempfile
+from pathlib import Path
+
+THIS_DIR = Path(__file__).resolve().parent
+PKG_ROOT = THIS_DIR.parent
+if str(PKG_ROOT) not in sys.path:
+    sys.path.insert(0, str(PKG_ROOT))
+
+import app.services.output_service as output_service  # noqa: E402
+from app.services.persistence_service import PersistenceService  # noqa: E402
+from app.services.persistence_writer import persistence_writer  # noqa: E402
+
+
+def _trial(nct: str, value: str = "AMP", error: str = "") -> dict:
+    t = {
+        "nct_id": nct,
+        "metadata": {"nct_id": nct, "title": f"Trial {nct}"},
+        "annotations": [] if error else [
+            {"field_name": "classification", "value": value, "confidence": 0.9,
+             "model_name": "m", "evidence": []},
+        ],
+        "verification": None,
+    }
+    if error:
+        t["error"] = error
+    return t
+
+
+def _isolated(fn):
+    """Point output_service / the results router at a temp RESULTS_DIR.
+
+    The wrapper deliberately doesn't use functools.wraps: pytest would then
+    see ``fn``'s ``tmp`` parameter and look for a fixture of that name.
+    """
+    def wrapper():
+        import app.routers.results as results_router
+        original = (output_service.RESULTS_DIR, results_router.RESULTS_DIR)
+        tmp = Path(tempfile.mkdtemp())
+        output_service.RESULTS_DIR = tmp
+        results_router.RESULTS_DIR = tmp
+        try:
+            fn(tmp)
+        finally:
+            output_service.RESULTS_DIR, results_router.RESULTS_DIR = original
+    wrapper.__name__ = fn.__name__
+    return wrapper
+
+
+@_isolated
+def test_error_files_and_iter_annotations(tmp: Path):
+    p = PersistenceService(tmp)
+    p.init_annotations_dir("j1")
+    p.save_annotation("j1", "NCT00000001", _trial("NCT00000001"))
+    p.save_annotation_error("j1", "NCT00000002", _trial("NCT00000002", error="boom"))
+
+    assert p.get_completed_annotations("j1") == {"NCT00000001"}
+    got = list(p.iter_annotations("j1", ["NCT00000002", "NCT00000009", "NCT00000001"]))
+    assert [t["nct_id"] for t in got] == ["NCT00000002", "NCT00000001"]
+    assert [t["nct_id"] for t in p.iter_annotations("j1")] == ["NCT00000001", "NCT00000002"]
+
+    p.save_annotation("j1", "NCT00000002", _trial("NCT00000002"))
+    persistence_writer.flush()
+    assert not (tmp / "annotations" / "j1" / "NCT00000002.error.json").exists()
+    assert "error" not in next(iter(p.iter_annotations("j1", ["NCT00000002"])))
+    print("  ✓ .error.json persisted, skipped by resume, superseded by success")
+
+
+@_isolated
+def test_save_json_output_streams_iterator(tmp: Path):
+    yielded = []
+
+    def trials():
+        for t in (_trial("NCT00000003"), _trial("NCT00000001"), _trial("NCT00000003", "Other")):
+            yielded.append(t["nct_id"])
+            yield t
+
+    path = output_service.save_json_output(
+        "j2", {"status": "completed", "total_trials": 2, "config_snapshot": {}},
+        trials=trials(),
+    )
+    data = json.loads(path.read_text())
+    assert [t["nct_id"] for t in data["trials"]] == ["NCT00000003", "NCT00000001"]
+    assert data["trials"][0]["annotations"][0]["value"] == "AMP"  # first wins
+    assert "traceability" in data["trials"][0]["annotations"][0]
+    assert data["status"] == "completed" and data["total_trials"] == 2
+    assert len(yielded) == 3
+    assert not list((tmp / "json").glob("*.tmp"))
+    # data["trials"] still works for callers that pass a list
+    output_service.save_json_output("j3", {"trials": [_trial("NCT00000004")]})
+    assert json.loads((tmp / "json" / "j3.json").read_text())["trials"][0]["nct_id"] == "NCT00000004"
+    print("  ✓ save_json_output streams an iterator (order, dedup, enrichment)")
+
+
+def test_iter_csv_matches_generate():
+    trials = [_trial(f"NCT0000000{i}") for i in range(1, 4)] + [_trial("NCT00000009", error="x")]
+    chunks = list(output_service.iter_csv(iter(trials)))
+    assert len(chunks) >= 2  # header is flushed before the first row
+    joined = "".join(chunks)
+    assert joined == output_service.generate_standard_csv(trials)
+    rows = list(csv.DictReader(io.StringIO(joined.split("\n", 1)[1])))
+    assert [r["NCT ID"] for r in rows] == [t["nct_id"] for t in trials]
+    full = "".join(output_service.iter_csv(trials, full=True))
+    assert full == output_service.generate_full_csv(trials)
+    print("  ✓ iter_csv chunks == generate_standard_csv / generate_full_csv")
+
+
+@_isolated
+def test_live_outputs(tmp: Path):
+    assert output_service.init_live_outputs("j4") == set()
+    output_service.append_live_output("j4", _trial("NCT00000001"))
+    output_service.append_live_output("j4", _trial("NCT00000002", error="boom"))
+    output_service.append_live_output("j4", _trial("NCT00000001"))  # crash-replayed append
+    # Resume: NCT00000002 failed and will be retried, so its row is dropped
+    assert output_service.init_live_outputs("j4", keep={"NCT00000001"}) == {"NCT00000001"}
+    output_service.append_live_output("j4", _trial("NCT00000002"))
+    output_service.append_live_output("j4", _trial("NCT00000003"))
+
+    csv_path, jsonl_path = output_service.live_output_paths("j4")
+    comment, body = csv_path.read_text().split("\n", 1)
+    assert comment.startswith("# Agent Annotate") and "(live)" in comment
+    rows = list(csv.DictReader(io.StringIO(body)))
+    assert [r["NCT ID"] for r in rows] == ["NCT00000001", "NCT00000002", "NCT00000003"]
+    lines = [json.loads(x) for x in jsonl_path.read_text().splitlines()]
+    assert [t["nct_id"] for t in lines] == ["NCT00000001", "NCT00000002", "NCT00000003"]
+    assert "error" not in lines[1]
+    assert not list(csv_path.parent.glob("*.tmp")) and not list(jsonl_path.parent.glob("*.tmp"))
+    print("  ✓ live CSV/JSONL appended per trial; resume drops retried and repeated rows")
+
+
+@_isolated
+def test_csv_endpoint_streams_per_trial_files(tmp: Path):
+    from fastapi import FastAPI
+    from fastapi.testclient import TestClient
+    from app.routers import results as results_router
+
+    p = PersistenceService(tmp)
+    p.init_annotations_dir("j5")
+    for nct in ("NCT00000002", "NCT00000001"):
+        p.save_annotation("j5", nct, _trial(nct))
+    p.save_annotation_error("j5", "NCT00000003", _trial("NCT00000003", error="boom"))
+
+    app = FastAPI()
+    app.include_router(results_router.router)
+    client = TestClient(app)
+
+    resp = client.get("/api/results/j5/csv")
+    assert resp.status_code == 200 and resp.headers["content-type"].startswith("text/csv")
+    rows = list(csv.DictReader(io.StringIO(resp.text.split("\n", 1)[1])))
+    assert sorted(r["NCT ID"] for r in rows) == ["NCT00000001", "NCT00000002", "NCT00000003"]
+    archived = list((tmp / "csv").glob("j5_standard_*.csv"))
+    assert len(archived) == 1 and archived[0].read_bytes() == resp.content
+
+    resp = client.get("/api/results/j5/jsonl")
+    assert resp.status_code == 200
+    assert len(resp.text.splitlines()) == 3
+    assert client.get("/api/results/nope/csv").status_code == 404
+    print("  ✓ /csv and /jsonl stream from per-trial files and archive the export")
+
+
+@_isolated
+def test_finished_job_served_from_final_json(tmp: Path):
+    from fastapi import FastAPI
+    from fastapi.testclient import TestClient
+    from app.models.job import AnnotationJob
+    from app.routers import results as results_router
+    from app.services.orchestrator import orchestrator
+
+    p = PersistenceService(tmp)
+    p.init_annotations_dir("j6")
+    p.save_annotation("j6", "NCT00000001", _trial("NCT00000001", value="Other"))
+    persistence_writer.flush()
+    output_service.save_json_output(
+        "j6", {"status": "completed", "config_snapshot": {}},
+        trials=[_trial("NCT00000001")],
+    )
+    app = FastAPI()
+    app.include_router(results_router.router)
+    client = TestClient(app)
+
+    def values() -> list[str]:
+        return [json.loads(x)["annotations"][0]["value"]
+                for x in client.get("/api/results/j6/jsonl").text.splitlines()]
+
+    job = AnnotationJob(job_id="j6", nct_ids=["NCT00000001"], status="completed")
+    orchestrator._jobs["j6"] = job
+    try:
+        assert values() == ["AMP"]  # final JSON
+        job.status = "running"  # e.g. resumed: per-trial files are current
+        assert values() == ["Other"]
+        job.status = "completed"
+        (tmp / "json" / "j6.json").unlink()
+        assert values() == ["Other"]  # final JSON missing
+    finally:
+        orchestrator._jobs.pop("j6", None)
+    print("  ✓ finished jobs export the final JSON; running jobs the per-trial files")
+
+
+def main() -> int:
+    print("Streaming export tests")
+    print("-" * 60)
+    tests = [
+        test_error_files_and_iter_annotations,
+        test_save_json_output_streams_iterator,
+        test_iter_csv_matches_generate,
+        test_live_outputs,
+        test_csv_endpoint_streams_per_trial_files,
+        test_finished_job_served_from_final_json,
+    ]
+    failed = 0
+    for t in tests:
+        try:
+            t()
+        except AssertionError as e:
+            print(f"  ✗ {t.__name__}: {e}")
+            failed += 1
+        except Exception as e:
+            print(f"  ✗ {t.__name__}: {type(e).__name__}: {e}")
+            failed += 1
+    print("-" * 60)
+    if failed:
+        print(f"FAIL: {failed}/{len(tests)}")
+        return 1
+    print(f"OK: {len(tests)}/{len(tests)}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,208 @@
+#!/usr/bin/env python3
+"""
+Unit tests for per-job span tracing (app/services/tracing.py).
+
+No network: HTTP goes through an httpx.MockTransport. Verifies:
+  1. Spans nest through the contextvar: sequential children share their
+     parent's track, concurrent siblings (asyncio.gather) get their own
+     tracks, and spans pick up nct_id / field from the audit context.
+  2. Outside a bound job (or with tracing off) span() is a no-op.
+  3. The trace file is append-only Chrome JSON-array form. A rebind
+     (resume) appends to it, load() skips a torn last line and returns
+     {"traceEvents": [...]}.
+  4. resilient_get emits a GET span with the status, plus a backoff span
+     for each 429 retry.
+  5. GET /api/jobs/{id}/trace serves the trace, 404 when there is none.
+
+Usage:
+    cd <agent_annotate_dir>
+    python3 scripts/test_tracing.py
+"""
+
+from __future__ import annotations
+
+import asyncio
+import json
+import sys
+import tempfile
+from pathlib import Path
+
+THIS_DIR = Path(__file__).resolve().parent
+PKG_ROOT = THIS_DIR.parent
+if str(PKG_ROOT) not in sys.path:
+    sys.path.insert(0, str(PKG_ROOT))
+
+import httpx  # noqa: E402
+
+from app.services.audit_trail import audit_recorder  # noqa: E402
+from app.services.tracing import Tracer, tracer  # noqa: E402
+
+
+def _spans(trace: dict) -> dict[str, dict]:
+    return {e["name"]: e for e in trace["traceEvents"] if e["ph"] == "X"}
+
+
+def _within(child: dict, parent: dict) -> bool:
+    return (parent["ts"] <= child["ts"]
+            and child["ts"] + child["dur"] <= parent["ts"] + parent["dur"] + 1)
+
+
+def test_nesting_and_tracks():
+    t = Tracer(Path(tempfile.mkdtemp()))
+
+    async def agent(name: str, delay: float):
+        with t.span(name, "research"):
+            await asyncio.sleep(delay)
+
+    async def run():
+        token = t.bind_job("job1")
+        audit = audit_recorder.set_context(nct_id="NCT00000001", field="peptide")
+        try:
+            with t.span("trial", "trial") as span:
+                with t.span("protocol", "research"):
+                    await asyncio.sleep(0.01)
+                await asyncio.gather(agent("pubmed", 0.03), agent("uniprot", 0.02))
+                span.set(fields=1)
+        finally:
+            audit_recorder.reset(audit)
+            t.unbind_job("job1", token)
+
+    asyncio.run(run())
+    spans = _spans(t.load("job1"))
+    trial, protocol = spans["trial"], spans["protocol"]
+    pubmed, uniprot = spans["pubmed"], spans["uniprot"]
+    assert protocol["tid"] == trial["tid"]  # sequential: parent's track
+    assert len({pubmed["tid"], uniprot["tid"]}) == 2  # concurrent: separate tracks
+    assert trial["tid"] in (pubmed["tid"], uniprot["tid"])
+    for child in (protocol, pubmed, uniprot):
+        assert _within(child, trial), child["name"]
+    assert trial["args"] == {"nct_id": "NCT00000001", "field": "peptide", "fields": 1}
+    assert trial["cat"] == "trial" and pubmed["dur"] >= 25_000
+    print("  ✓ nested spans; concurrent siblings get tracks; audit context tags")
+
+
+def test_noop_when_unbound():
+    t = Tracer(Path(tempfile.mkdtemp()) / "traces")
+    with t.span("orphan") as span:
+        span.set(x=1)
+    t.set_enabled(False)
+    assert t.bind_job("job2") is None
+    with t.span("disabled"):
+        pass
+    t.unbind_job("job2", None)
+    assert t.load("job2") is None
+    assert not t.traces_dir().exists()
+    print("  ✓ span() is a no-op outside a bound job or when disabled")
+
+
+def test_append_and_load():
+    t = Tracer(Path(tempfile.mkdtemp()))
+    for run in ("first", "second"):  # second binding = resumed job
+        token = t.bind_job("job3")
+        with t.span(run):
+            pass
+        t.unbind_job("job3", token)
+    path = t.path_for("job3")
+    text = path.read_text()
+    assert text.startswith("[\n") and text.count("[\n") == 1
+    assert text.rstrip().endswith(",")  # JSON-array form, no closing bracket
+    with open(path, "a") as f:
+        f.write('{"name":"torn","ph":"X"')  # crash mid-write
+    trace = t.load("job3")
+    assert set(_spans(trace)) == {"first", "second"}
+    assert trace["displayTimeUnit"] == "ms"
+    json.dumps(trace)
+    print("  ✓ append-only trace file survives resume and a torn last line")
+
+
+def test_http_spans():
+    from agents.research.http_utils import resilient_get
+
+    attempts = []
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        attempts.append(request.url)
+        if len(attempts) == 1:
+            return httpx.Response(429, headers={"Retry-After": "0"})
+        return httpx.Response(200, json={})
+
+    old_dir = tracer._traces_dir
+    tracer._traces_dir = Path(tempfile.mkdtemp())
+
+    async def run():
+        token = tracer.bind_job("job4")
+        try:
+            async with httpx.AsyncClient(transport=httpx.MockTransport(handler)) as client:
+                await resilient_get("https://trace-test.example/api/x", client=client)
+        finally:
+            tracer.unbind_job("job4", token)
+
+    try:
+        asyncio.run(run())
+        spans = _spans(tracer.load("job4"))
+    finally:
+        tracer._traces_dir = old_dir
+    get = spans["GET trace-test.example"]
+    assert get["cat"] == "http" and get["args"]["status"] == 200
+    assert get["args"]["path"] == "/api/x"
+    assert spans["backoff"]["args"]["reason"] == 429
+    assert _within(spans["backoff"], get)
+    print("  ✓ resilient_get: GET span with status, backoff span per 429")
+
+
+def test_endpoint():
+    from fastapi import FastAPI
+    from fastapi.testclient import TestClient
+
+    from app.routers import jobs
+
+    old_dir = tracer._traces_dir
+    tracer._traces_dir = Path(tempfile.mkdtemp())
+    try:
+        token = tracer.bind_job("job5")
+        with tracer.span("trial"):
+            pass
+        tracer.unbind_job("job5", token)
+
+        app = FastAPI()
+        app.include_router(jobs.router)
+        client = TestClient(app)
+        resp = client.get("/api/jobs/job5/trace")
+        assert resp.status_code == 200
+        assert "trial" in _spans(resp.json())
+        assert client.get("/api/jobs/nope/trace").status_code == 404
+    finally:
+        tracer._traces_dir = old_dir
+    print("  ✓ GET /api/jobs/{id}/trace serves the trace (404 if none)")
+
+
+def main() -> int:
+    print("Span tracing tests")
+    print("-" * 60)
+    tests = [
+        test_nesting_and_tracks,
+        test_noop_when_unbound,
+        test_append_and_load,
+        test_http_spans,
+        test_endpoint,
+    ]
+    failed = 0
+    for t in tests:
+        try:
+            t()
+        except AssertionError as e:
+            print(f"  ✗ {t.__name__}: {e}")
+            failed += 1
+        except Exception as e:
+            print(f"  ✗ {t.__name__}: {type(e).__name__}: {e}")
+            failed += 1
+    print("-" * 60)
+    if failed:
+        print(f"FAIL: {failed}/{len(tests)}")
+        return 1
+    print(f"OK: {len(tests)}/{len(tests)}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,194 @@
+#!/usr/bin/env python3
+"""
+Unit tests for TrialWorkScheduler — lanes, the shared Ollama slot, and
+cross-job (nct, config_hash, commit) work-item dedup.
+
+No network, no LLM. Verifies:
+  1. Lane assignment by size and explicit priority.
+  2. Waiting interactive mini-batches take the Ollama slot before batch ones.
+  3. First claimant owns an item; later claimants get the in-flight future.
+  4. complete() wakes waiters with the owning job_id and records the source.
+  5. abandon() / release_job() wake waiters with None so they recompute.
+  6. Different config hashes / commits never share an item.
+
+Usage:
+    cd <agent_annotate_dir>
+    python3 scripts/test_work_scheduler.py
+"""
+
+from __future__ import annotations
+
+import asyncio
+import sys
+from pathlib import Path
+
+THIS_DIR = Path(__file__).resolve().parent
+PKG_ROOT = THIS_DIR.parent
+if str(PKG_ROOT) not in sys.path:
+    sys.path.insert(0, str(PKG_ROOT))
+
+from app.services.work_scheduler import (  # noqa: E402
+    LANE_BATCH,
+    LANE_INTERACTIVE,
+    STAGE_ANNOTATION,
+    STAGE_RESEARCH,
+    TrialWorkScheduler,
+    WorkItemKey,
+)
+
+
+async def test_lane_assignment():
+    sched = TrialWorkScheduler()
+    assert sched.lane_for(10) == LANE_INTERACTIVE
+    assert sched.lane_for(600) == LANE_BATCH
+    assert sched.lane_for(600, priority="interactive") == LANE_INTERACTIVE
+    assert sched.lane_for(5, priority="batch") == LANE_BATCH
+    assert sched.lane_for(5, priority="bogus") == LANE_INTERACTIVE
+    print("  ✓ lane assignment by size + explicit priority")
+
+
+async def test_interactive_jumps_batch_queue():
+    sched = TrialWorkScheduler()
+    order: list[str] = []
+    release_first = asyncio.Event()
+
+    async def holder():
+        async with sched.ollama_slot(LANE_BATCH):
+            order.append("batch-0")
+            await release_first.wait()
+
+    async def worker(name: str, lane: str):
+        async with sched.ollama_slot(lane):
+            order.append(name)
+            await asyncio.sleep(0)
+
+    t0 = asyncio.create_task(holder())
+    await asyncio.sleep(0)
+    # Batch mini-batches queue up first, then an interactive one arrives.
+    t1 = asyncio.create_task(worker("batch-1", LANE_BATCH))
+    t2 = asyncio.create_task(worker("batch-2", LANE_BATCH))
+    await asyncio.sleep(0)
+    t3 = asyncio.create_task(worker("interactive-1", LANE_INTERACTIVE))
+    await asyncio.sleep(0)
+    assert sched.stats()["ollama_slot_waiting"] == {
+        LANE_INTERACTIVE: 1, LANE_BATCH: 2,
+    }, sched.stats()
+
+    release_first.set()
+    await asyncio.gather(t0, t1, t2, t3)
+    assert order == ["batch-0", "interactive-1", "batch-1", "batch-2"], order
+    assert not sched.stats()["ollama_slot_held"]
+    print("  ✓ interactive mini-batch takes the slot ahead of queued batch ones")
+
+
+async def test_cancelled_waiter_does_not_leak_slot():
+    sched = TrialWorkScheduler()
+    gate_open = asyncio.Event()
+
+    async def holder():
+        async with sched.ollama_slot(LANE_BATCH):
+            await gate_open.wait()
+
+    async def waiter():
+        async with sched.ollama_slot(LANE_INTERACTIVE):
+            pass
+
+    t0 = asyncio.create_task(holder())
+    await asyncio.sleep(0)
+    t1 = asyncio.create_task(waiter())
+    await asyncio.sleep(0)
+    t1.cancel()
+    gate_open.set()
+    await t0
+    try:
+        await t1
+    except asyncio.CancelledError:
+        pass
+    # Slot must be acquirable again.
+    await asyncio.wait_for(sched._gate.acquire(LANE_BATCH), timeout=1)
+    sched._gate.release()
+    print("  ✓ cancelled waiter does not leak the Ollama slot")
+
+
+async def test_claim_complete_fanout():
+    sched = TrialWorkScheduler()
+    key = WorkItemKey("NCT00000001", "cfg1", "abc123")
+
+    assert sched.claim(STAGE_ANNOTATION, key, "jobA") is None  # A owns
+    assert sched.claim(STAGE_ANNOTATION, key, "jobA") is None  # re-claim by owner
+    fut = sched.claim(STAGE_ANNOTATION, key, "jobB")
+    assert fut is not None and not fut.done()
+
+    sched.complete(STAGE_ANNOTATION, key, "jobA")
+    assert await fut == "jobA"
+    assert sched.completed_source(STAGE_ANNOTATION, key) == "jobA"
+    # Research stage for the same key is independent.
+    assert sched.completed_source(STAGE_RESEARCH, key) is None
+    print("  ✓ claim → complete fans the owning job_id out to waiters")
+
+
+async def test_abandon_and_release_job_wake_waiters():
+    sched = TrialWorkScheduler()
+    k1 = WorkItemKey("NCT00000001", "cfg1", "abc123")
+    k2 = WorkItemKey("NCT00000002", "cfg1", "abc123")
+
+    sched.claim(STAGE_RESEARCH, k1, "jobA")
+    sched.claim(STAGE_RESEARCH, k2, "jobA")
+    f1 = sched.claim(STAGE_RESEARCH, k1, "jobB")
+    f2 = sched.claim(STAGE_RESEARCH, k2, "jobB")
+
+    sched.abandon(STAGE_RESEARCH, k1)
+    assert await f1 is None
+    assert sched.release_job("jobA") == 1
+    assert await f2 is None
+    assert sched.completed_source(STAGE_RESEARCH, k2) is None
+    # After release, jobB can take ownership.
+    assert sched.claim(STAGE_RESEARCH, k2, "jobB") is None
+    print("  ✓ abandon / release_job wake waiters with None")
+
+
+async def test_key_isolation():
+    sched = TrialWorkScheduler()
+    base = WorkItemKey("NCT00000001", "cfg1", "abc123")
+    other_cfg = WorkItemKey("NCT00000001", "cfg2", "abc123")
+    other_commit = WorkItemKey("NCT00000001", "cfg1", "def456")
+
+    sched.claim(STAGE_ANNOTATION, base, "jobA")
+    assert sched.claim(STAGE_ANNOTATION, other_cfg, "jobB") is None
+    assert sched.claim(STAGE_ANNOTATION, other_commit, "jobC") is None
+    sched.complete(STAGE_ANNOTATION, base, "jobA")
+    assert sched.completed_source(STAGE_ANNOTATION, other_cfg) is None
+    print("  ✓ config_hash / commit are part of the item identity")
+
+
+async def main() -> int:
+    print("TrialWorkScheduler tests")
+    print("-" * 60)
+    tests = [
+        test_lane_assignment,
+        test_interactive_jumps_batch_queue,
+        test_cancelled_waiter_does_not_leak_slot,
+        test_claim_complete_fanout,
+        test_abandon_and_release_job_wake_waiters,
+        test_key_isolation,
+    ]
+    failed = 0
+    for t in tests:
+        try:
+            await t()
+        except AssertionError as e:
+            print(f"  ✗ {t.__name__}: {e}")
+            failed += 1
+        except Exception as e:
+            print(f"  ✗ {t.__name__}: {type(e).__name__}: {e}")
+            failed += 1
+    print("-" * 60)
+    if failed:
+        print(f"FAIL: {failed}/{len(tests)}")
+        return 1
+    print(f"OK: {len(tests)}/{len(tests)}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(asyncio.run(main()))
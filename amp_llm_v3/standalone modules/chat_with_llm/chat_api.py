@@ -45,9 +45,9 @@ from typing import Dict, List, Optional, Any
 from dataclasses import dataclass, field
 from enum import Enum
 from pathlib import Path
-from fastapi import FastAPI, HTTPException, UploadFile, File, Query
+from fastapi import FastAPI, HTTPException, UploadFile, File, Query, Request
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.responses import FileResponse, JSONResponse
+from fastapi.responses import FileResponse, JSONResponse, PlainTextResponse, StreamingResponse
 from pydantic import BaseModel, Field
 
 # Email notifications
@@ -60,6 +60,20 @@ from email_utils import (
 # Resource management
 from resource_manager import get_resource_manager, ResourceManager
 
+# Job status stream
+from job_events import job_events
+
+# Token-budgeted conversation context
+from context_manager import context_manager, ollama_summarizer
+
+# Metrics
+from metrics import (
+    OPENMETRICS_CONTENT_TYPE,
+    PROMETHEUS_CONTENT_TYPE,
+    metrics,
+    wants_openmetrics,
+)
+
 # Configuration
 try:
     from assistant_config import config
@@ -237,6 +251,84 @@ app.add_middleware(
 )
 
 
+# ============================================================================
+# Metrics
+# ============================================================================
+
+HTTP_LATENCY = metrics.histogram(
+    "chat_http_request_duration_seconds",
+    "Request handling time by route", ("method", "route", "status"),
+)
+LLM_LATENCY = metrics.histogram(
+    "chat_llm_request_duration_seconds",
+    "Ollama /api/chat round-trip time by model", ("model",),
+)
+LLM_TOKENS = metrics.counter(
+    "chat_llm_tokens_total",
+    "Tokens reported by Ollama by model and kind", ("model", "kind"),
+)
+LLM_TTFT = metrics.histogram(
+    "chat_llm_time_to_first_token_seconds",
+    "Streamed replies: time from the Ollama request to its first token, by model", ("model",),
+)
+LLM_STREAMS = metrics.counter(
+    "chat_llm_streams_total",
+    "Streamed replies by model and outcome (completed, cancelled, error)", ("model", "outcome"),
+)
+
+
+@app.middleware("http")
+async def record_request_metrics(request: Request, call_next):
+    start = time.perf_counter()
+    status = "500"
+    try:
+        response = await call_next(request)
+        status = str(response.status_code)
+        return response
+    finally:
+        # Label by route template, not raw path, so job IDs don't explode cardinality.
+        route = request.scope.get("route")
+        HTTP_LATENCY.labels(
+            request.method, getattr(route, "path", "unmatched"), status,
+        ).observe(time.perf_counter() - start)
+
+
+@metrics.register_collector
+def _collect_resources():
+    mgr = get_resource_manager()
+    yield ("chat_queue_depth", "gauge", "Jobs or requests waiting for a slot",
+           [({"pool": pool.name}, len(pool.queue)) for pool in (mgr.llm_slots, mgr.trial_slots)])
+    yield ("chat_slots_active", "gauge", "Slots currently held",
+           [({"pool": pool.name}, pool.active) for pool in (mgr.llm_slots, mgr.trial_slots)])
+    yield ("chat_csv_jobs", "gauge", "CSV annotation jobs by status",
+           [({"status": status.value},
+             sum(1 for j in job_manager.jobs.values() if j.status == status))
+            for status in JobStatus])
+
+
+@metrics.register_collector
+def _collect_context():
+    s = context_manager.stats()
+    yield ("chat_context_folds_total", "counter",
+           "Times older turns were folded into a running summary", [({}, s["folds"])])
+    yield ("chat_context_summaries_total", "counter", "Running-summary LLM calls by outcome",
+           [({"outcome": "ok"}, s["summaries"]), ({"outcome": "error"}, s["summary_errors"]),
+            ({"outcome": "cached"}, s["summary_cache_hits"])])
+    yield ("chat_context_prefix_total", "counter",
+           "Chat turns whose prompt extends the previous one (Ollama KV-cache reuse)",
+           [({"outcome": "reused"}, s["prefix_reused"]), ({"outcome": "rebuilt"}, s["prefix_rebuilt"])])
+
+
+@app.get("/metrics", response_class=PlainTextResponse)
+async def scrape_metrics(request: Request):
+    """Prometheus / OpenMetrics scrape endpoint."""
+    openmetrics = wants_openmetrics(request.headers.get("accept", ""))
+    return PlainTextResponse(
+        metrics.render(openmetrics=openmetrics),
+        media_type=OPENMETRICS_CONTENT_TYPE if openmetrics else PROMETHEUS_CONTENT_TYPE,
+    )
+
+
 # Startup event to initialize job manager
 @app.on_event("startup")
 async def startup_event():
@@ -427,6 +519,14 @@ async def fetch_csv_metadata(model: str) -> Dict[str, Any]:
     return metadata
 
 
+def _mark_job_queued(job: AnnotationJob, info: Dict[str, Any]):
+    """Show a job's queue position while it waits for an LLM slot."""
+    job.status = JobStatus.PENDING
+    job.progress = f"Queued (position {info.get('queue_position', '?')}): {info.get('reason', 'Waiting for resources')}"
+    job.updated_at = datetime.now()
+    logger.info(f"⏳ Job {job.job_id}: Queued - {info.get('reason')}")
+
+
 async def process_csv_job(
     job_id: str,
     csv_content: bytes,
@@ -437,7 +537,9 @@ async def process_csv_job(
 ):
     """
     Background task to process CSV annotation.
-    Processes each trial individually and updates progress in real-time.
+    Waits for an LLM job slot, then annotates trials concurrently (each
+    holding a shared per-trial LLM request slot) and updates progress in
+    real-time.
     """
     logger.info(f"🚀 Job {job_id}: Background task STARTED")
 
@@ -448,20 +550,12 @@ async def process_csv_job(
 
     # Request resource slot (memory check + concurrency limit)
     resource_mgr = get_resource_manager()
-    slot_result = await resource_mgr.request_llm_slot(
+    await resource_mgr.acquire_llm_slot(
         job_id=job_id,
-        metadata={"model": model, "type": "csv_annotation", "filename": original_filename}
+        metadata={"model": model, "type": "csv_annotation", "filename": original_filename},
+        on_queued=lambda info: _mark_job_queued(job, info)
     )
 
-    if not slot_result.get("granted"):
-        # Job is queued - update status and wait
-        job.status = JobStatus.PENDING
-        job.progress = f"Queued (position {slot_result.get('queue_position', '?')}): {slot_result.get('reason', 'Waiting for resources')}"
-        job.updated_at = datetime.now()
-        logger.info(f"⏳ Job {job_id}: Queued - {slot_result.get('reason')}")
-        # The queue processor will restart this job when resources are available
-        return
-
     job.status = JobStatus.PROCESSING
     job.progress = "Parsing CSV..."
     job.updated_at = datetime.now()
@@ -494,26 +588,25 @@ async def process_csv_job(
         job.progress = "Runner service connected, starting annotation..."
         job.updated_at = datetime.now()
         
-        # Track consecutive failures for model reset
-        consecutive_failures = 0
-        
-        # Create a persistent client for all requests (reduced timeout to 120s)
-        async with httpx.AsyncClient(timeout=120.0) as client:
-            # Process each NCT ID individually
-            for i, nct_id in enumerate(nct_ids):
-                job.processed_trials = i
-                job.progress = f"Processing {i + 1}/{len(nct_ids)}: {nct_id}"
-                job.updated_at = datetime.now()
-                
-                logger.info(f"📝 Job {job_id}: Processing {nct_id} ({i + 1}/{len(nct_ids)})")
-                
-                trial_start = time.time()
-                max_retries = 3
-                result_saved = False
-                
-                for attempt in range(max_retries):
-                    try:
-                        # Call batch-annotate with single NCT ID
+        # Requests to the model share its gate; a reset drains them first
+        # (other trials of this and other jobs may be generating on it).
+        model_gate = resource_mgr.model_gate(model)
+        in_flight: List[str] = []
+        done_count = 0
+
+        async def annotate_trial(client: httpx.AsyncClient, i: int, nct_id: str):
+            """Annotate one NCT with retries; appends to results / errors."""
+            trial_start = time.time()
+            max_retries = 3
+            result_saved = False
+            # Bad responses for this trial; counted per trial so concurrent
+            # trials' results don't trip (or clear) each other's reset.
+            bad_responses = 0
+            
+            for attempt in range(max_retries):
+                try:
+                    # Call batch-annotate with single NCT ID
+                    async with model_gate.request():
                         response = await client.post(
                             f"{RUNNER_SERVICE_URL}/batch-annotate",
                             json={
@@ -524,186 +617,231 @@ async def process_csv_job(
                                 "output_format": "llm_optimized"  # Use optimized format for CSV batch
                             }
                         )
+                    
+                    if response.status_code == 200:
+                        data = response.json()
+                        trial_results = data.get("results", [])
                         
-                        if response.status_code == 200:
-                            data = response.json()
-                            trial_results = data.get("results", [])
+                        if trial_results:
+                            result = trial_results[0]
+                            result["processing_time"] = round(time.time() - trial_start, 1)
                             
-                            if trial_results:
-                                result = trial_results[0]
-                                result["processing_time"] = round(time.time() - trial_start, 1)
-                                
-                                # ALWAYS use the original nct_id, never trust LLM output
-                                result["nct_id"] = nct_id
-                                
-                                # Log what we received from runner
-                                logger.info(f"📦 Job {job_id}: Runner returned keys for {nct_id}: {list(result.keys())}")
-                                
-                                # Detect success: has annotation AND parsed_data with actual content
-                                has_annotation = bool(result.get("annotation"))
-                                has_error = bool(result.get("error"))
-                                
-                                # Check if parsed_data has actual useful content
-                                parsed_data = result.get("parsed_data", {})
-                                has_parsed_data = bool(parsed_data and len(parsed_data) > 3)  # Need at least a few fields
-                                
-                                # Also check for garbage responses (hallucinations)
-                                annotation_text = str(result.get("annotation", ""))
-                                is_garbage = (
-                                    "# Instruction" in annotation_text or
-                                    "# User:" in annotation_text or
-                                    "### Solution" in annotation_text
-                                )
-                                
-                                # Mark as success only if: has parsed_data, no error, and not garbage
-                                is_success = has_parsed_data and not has_error and not is_garbage
+                            # ALWAYS use the original nct_id, never trust LLM output
+                            result["nct_id"] = nct_id
+                            
+                            # Log what we received from runner
+                            logger.info(f"📦 Job {job_id}: Runner returned keys for {nct_id}: {list(result.keys())}")
+                            
+                            # Detect success: has annotation AND parsed_data with actual content
+                            has_annotation = bool(result.get("annotation"))
+                            has_error = bool(result.get("error"))
+                            
+                            # Check if parsed_data has actual useful content
+                            parsed_data = result.get("parsed_data", {})
+                            has_parsed_data = bool(parsed_data and len(parsed_data) > 3)  # Need at least a few fields
+                            
+                            # Also check for garbage responses (hallucinations)
+                            annotation_text = str(result.get("annotation", ""))
+                            is_garbage = (
+                                "# Instruction" in annotation_text or
+                                "# User:" in annotation_text or
+                                "### Solution" in annotation_text
+                            )
+                            
+                            # Mark as success only if: has parsed_data, no error, and not garbage
+                            is_success = has_parsed_data and not has_error and not is_garbage
+                            
+                            if is_success:
+                                result["_success"] = True
+                                results.append(result)
+                                result_saved = True
+                                logger.info(f"✅ Job {job_id}: {nct_id} completed successfully (annotation length: {len(annotation_text)}, parsed fields: {len(parsed_data)})")
+                                break  # Success - exit retry loop
+                            else:
+                                # Garbage or empty - retry if we have attempts left
+                                reason = "No annotation" if not has_annotation else \
+                                         "Empty parsed_data" if not has_parsed_data else \
+                                         "Garbage/hallucinated response" if is_garbage else \
+                                         result.get("error", "Unknown error")
+                                bad_responses += 1
                                 
-                                if is_success:
-                                    result["_success"] = True
+                                if attempt < max_retries - 1:
+                                    logger.warning(f"⚠️ Job {job_id}: {nct_id} got bad response ({reason}), retrying ({attempt + 1}/{max_retries})...")
+                                    
+                                    # If garbage, try to reset the model
+                                    if is_garbage:
+                                        logger.info(f"🔄 Job {job_id}: Attempting model reset after garbage response...")
+                                        try:
+                                            async with model_gate.reset() as needed:
+                                                if needed:
+                                                    # Send a tiny request with keep_alive=0 to unload, then reload
+                                                    async with httpx.AsyncClient(timeout=30.0) as reset_client:
+                                                        await reset_client.post(
+                                                            f"{config.OLLAMA_BASE_URL}/api/generate",
+                                                            json={
+                                                                "model": model,
+                                                                "prompt": "test",
+                                                                "keep_alive": 0  # Unload after this
+                                                            }
+                                                        )
+                                                        await asyncio.sleep(2)
+                                                        # Reload by doing a fresh request
+                                                        await reset_client.post(
+                                                            f"{config.OLLAMA_BASE_URL}/api/generate",
+                                                            json={
+                                                                "model": model,
+                                                                "prompt": "Hello",
+                                                                "keep_alive": "5m"
+                                                            }
+                                                        )
+                                            logger.info(f"✅ Job {job_id}: Model reset complete")
+                                        except Exception as reset_err:
+                                            logger.warning(f"⚠️ Job {job_id}: Model reset failed: {reset_err}")
+                                    
+                                    await asyncio.sleep(3)  # Longer wait after garbage
+                                    continue
+                                else:
+                                    # Last attempt failed
+                                    result["_success"] = False
                                     results.append(result)
                                     result_saved = True
-                                    consecutive_failures = 0  # Reset failure counter
-                                    logger.info(f"✅ Job {job_id}: {nct_id} completed successfully (annotation length: {len(annotation_text)}, parsed fields: {len(parsed_data)})")
-                                    break  # Success - exit retry loop
-                                else:
-                                    # Garbage or empty - retry if we have attempts left
-                                    reason = "No annotation" if not has_annotation else \
-                                             "Empty parsed_data" if not has_parsed_data else \
-                                             "Garbage/hallucinated response" if is_garbage else \
-                                             result.get("error", "Unknown error")
+                                    errors.append({
+                                        "nct_id": nct_id,
+                                        "error": reason
+                                    })
+                                    logger.warning(f"⚠️ Job {job_id}: {nct_id} failed after {max_retries} attempts: {reason}")
                                     
-                                    if attempt < max_retries - 1:
-                                        logger.warning(f"⚠️ Job {job_id}: {nct_id} got bad response ({reason}), retrying ({attempt + 1}/{max_retries})...")
-                                        
-                                        # If garbage, try to reset the model
-                                        if is_garbage:
-                                            logger.info(f"🔄 Job {job_id}: Attempting model reset after garbage response...")
-                                            try:
-                                                # Send a tiny request with keep_alive=0 to unload, then reload
-                                                async with httpx.AsyncClient(timeout=30.0) as reset_client:
-                                                    await reset_client.post(
-                                                        f"{config.OLLAMA_BASE_URL}/api/generate",
-                                                        json={
-                                                            "model": model,
-                                                            "prompt": "test",
-                                                            "keep_alive": 0  # Unload after this
-                                                        }
-                                                    )
-                                                    await asyncio.sleep(2)
-                                                    # Reload by doing a fresh request
-                                                    await reset_client.post(
-                                                        f"{config.OLLAMA_BASE_URL}/api/generate",
-                                                        json={
-                                                            "model": model,
-                                                            "prompt": "Hello",
-                                                            "keep_alive": "5m"
-                                                        }
-                                                    )
-                                                logger.info(f"✅ Job {job_id}: Model reset complete")
-                                            except Exception as reset_err:
-                                                logger.warning(f"⚠️ Job {job_id}: Model reset failed: {reset_err}")
-                                        
-                                        await asyncio.sleep(3)  # Longer wait after garbage
-                                        continue
-                                    else:
-                                        # Last attempt failed - track consecutive failures
-                                        consecutive_failures += 1
-                                        
-                                        result["_success"] = False
-                                        results.append(result)
-                                        result_saved = True
-                                        errors.append({
-                                            "nct_id": nct_id,
-                                            "error": reason
-                                        })
-                                        logger.warning(f"⚠️ Job {job_id}: {nct_id} failed after {max_retries} attempts: {reason}")
-                                        
-                                        # If 3+ consecutive failures, do a hard model reset
-                                        if consecutive_failures >= 3:
-                                            logger.warning(f"🔄 Job {job_id}: {consecutive_failures} consecutive failures, doing hard model reset...")
-                                            try:
-                                                async with httpx.AsyncClient(timeout=60.0) as reset_client:
-                                                    # Unload model completely
-                                                    await reset_client.post(
-                                                        f"{config.OLLAMA_BASE_URL}/api/generate",
-                                                        json={"model": model, "prompt": "", "keep_alive": 0}
-                                                    )
-                                                    await asyncio.sleep(5)
-                                                    # Reload fresh
-                                                    await reset_client.post(
-                                                        f"{config.OLLAMA_BASE_URL}/api/generate",
-                                                        json={"model": model, "prompt": "Initialize", "keep_alive": "10m"}
-                                                    )
-                                                logger.info(f"✅ Job {job_id}: Hard model reset complete")
-                                                consecutive_failures = 0
-                                            except Exception as e:
-                                                logger.error(f"❌ Job {job_id}: Hard reset failed: {e}")
-                            else:
-                                if attempt < max_retries - 1:
-                                    logger.warning(f"⚠️ Job {job_id}: {nct_id} no results, retrying ({attempt + 1}/{max_retries})...")
-                                    await asyncio.sleep(2)
-                                    continue
-                                errors.append({
-                                    "nct_id": nct_id,
-                                    "error": "No result returned from runner"
-                                })
-                                result_saved = True
-                            break  # Exit retry loop
-                            
+                                    # Every attempt got a bad response: hard model reset
+                                    if bad_responses >= max_retries:
+                                        logger.warning(f"🔄 Job {job_id}: {nct_id} got {bad_responses} consecutive bad responses, doing hard model reset...")
+                                        try:
+                                            async with model_gate.reset() as needed:
+                                                if needed:
+                                                    async with httpx.AsyncClient(timeout=60.0) as reset_client:
+                                                        # Unload model completely
+                                                        await reset_client.post(
+                                                            f"{config.OLLAMA_BASE_URL}/api/generate",
+                                                            json={"model": model, "prompt": "", "keep_alive": 0}
+                                                        )
+                                                        await asyncio.sleep(5)
+                                                        # Reload fresh
+                                                        await reset_client.post(
+                                                            f"{config.OLLAMA_BASE_URL}/api/generate",
+                                                            json={"model": model, "prompt": "Initialize", "keep_alive": "10m"}
+                                                        )
+                                            logger.info(f"✅ Job {job_id}: Hard model reset complete")
+                                        except Exception as e:
+                                            logger.error(f"❌ Job {job_id}: Hard reset failed: {e}")
                         else:
-                            error_text = response.text[:200]
                             if attempt < max_retries - 1:
-                                logger.warning(f"⚠️ Job {job_id}: {nct_id} HTTP {response.status_code}, retrying ({attempt + 1}/{max_retries})...")
-                                await asyncio.sleep(2)  # Wait before retry
+                                logger.warning(f"⚠️ Job {job_id}: {nct_id} no results, retrying ({attempt + 1}/{max_retries})...")
+                                await asyncio.sleep(2)
                                 continue
                             errors.append({
                                 "nct_id": nct_id,
-                                "error": f"HTTP {response.status_code}: {error_text}"
+                                "error": "No result returned from runner"
                             })
-                            logger.error(f"❌ Job {job_id}: {nct_id} HTTP error: {response.status_code}")
-                            
-                    except httpx.TimeoutException:
-                        if attempt < max_retries - 1:
-                            logger.warning(f"⚠️ Job {job_id}: {nct_id} timed out, retrying ({attempt + 1}/{max_retries})...")
-                            await asyncio.sleep(2)
-                            continue
-                        errors.append({
-                            "nct_id": nct_id,
-                            "error": "Request timed out after retries"
-                        })
-                        logger.error(f"❌ Job {job_id}: {nct_id} timed out after {max_retries} attempts")
+                            result_saved = True
+                        break  # Exit retry loop
                         
-                    except httpx.ConnectError as e:
+                    else:
+                        error_text = response.text[:200]
                         if attempt < max_retries - 1:
-                            logger.warning(f"⚠️ Job {job_id}: {nct_id} connection error, retrying ({attempt + 1}/{max_retries})...")
-                            await asyncio.sleep(5)  # Longer wait for connection issues
+                            logger.warning(f"⚠️ Job {job_id}: {nct_id} HTTP {response.status_code}, retrying ({attempt + 1}/{max_retries})...")
+                            await asyncio.sleep(2)  # Wait before retry
                             continue
                         errors.append({
                             "nct_id": nct_id,
-                            "error": f"Connection error: {str(e)}"
+                            "error": f"HTTP {response.status_code}: {error_text}"
                         })
-                        logger.error(f"❌ Job {job_id}: {nct_id} connection error after {max_retries} attempts: {e}")
+                        logger.error(f"❌ Job {job_id}: {nct_id} HTTP error: {response.status_code}")
                         
-                    except Exception as e:
-                        logger.error(f"❌ Job {job_id}: {nct_id} unexpected error: {e}", exc_info=True)
-                        errors.append({
-                            "nct_id": nct_id,
-                            "error": str(e)
-                        })
-                        break  # Don't retry unexpected errors
-                
+                except httpx.TimeoutException:
+                    if attempt < max_retries - 1:
+                        logger.warning(f"⚠️ Job {job_id}: {nct_id} timed out, retrying ({attempt + 1}/{max_retries})...")
+                        await asyncio.sleep(2)
+                        continue
+                    errors.append({
+                        "nct_id": nct_id,
+                        "error": "Request timed out after retries"
+                    })
+                    logger.error(f"❌ Job {job_id}: {nct_id} timed out after {max_retries} attempts")
+                    
+                except httpx.ConnectError as e:
+                    if attempt < max_retries - 1:
+                        logger.warning(f"⚠️ Job {job_id}: {nct_id} connection error, retrying ({attempt + 1}/{max_retries})...")
+                        await asyncio.sleep(5)  # Longer wait for connection issues
+                        continue
+                    errors.append({
+                        "nct_id": nct_id,
+                        "error": f"Connection error: {str(e)}"
+                    })
+                    logger.error(f"❌ Job {job_id}: {nct_id} connection error after {max_retries} attempts: {e}")
+                    
+                except Exception as e:
+                    logger.error(f"❌ Job {job_id}: {nct_id} unexpected error: {e}", exc_info=True)
+                    errors.append({
+                        "nct_id": nct_id,
+                        "error": str(e)
+                    })
+                    break  # Don't retry unexpected errors
+
+        async def trial_worker(client: httpx.AsyncClient, pending: "asyncio.Queue[tuple]"):
+            nonlocal done_count, last_heartbeat
+            while True:
+                try:
+                    i, nct_id = pending.get_nowait()
+                except asyncio.QueueEmpty:
+                    return
+                async with resource_mgr.trial_slot(job_id, nct_id):
+                    in_flight.append(nct_id)
+                    job.current_nct = nct_id
+                    job.progress = f"Processing {done_count + 1}/{len(nct_ids)}: {', '.join(in_flight)}"
+                    job.updated_at = datetime.now()
+                    logger.info(f"📝 Job {job_id}: Processing {nct_id} ({i + 1}/{len(nct_ids)})")
+                    try:
+                        await annotate_trial(client, i, nct_id)
+                    finally:
+                        in_flight.remove(nct_id)
+
+                done_count += 1
+                job.processed_trials = done_count
+                job.progress = f"Processed {done_count}/{len(nct_ids)}" + (
+                    f" (in progress: {', '.join(in_flight)})" if in_flight else ""
+                )
+                job.updated_at = datetime.now()
+
                 # Log progress every 10 trials
-                if (i + 1) % 10 == 0:
+                if done_count % 10 == 0:
                     elapsed = time.time() - start_time
-                    avg_time = elapsed / (i + 1)
-                    remaining = avg_time * (len(nct_ids) - i - 1)
-                    logger.info(f"📊 Job {job_id}: Progress {i + 1}/{len(nct_ids)} ({(i+1)/len(nct_ids)*100:.1f}%) - ETA: {remaining/60:.1f} min")
-                
+                    avg_time = elapsed / done_count
+                    remaining = avg_time * (len(nct_ids) - done_count)
+                    logger.info(f"📊 Job {job_id}: Progress {done_count}/{len(nct_ids)} ({done_count/len(nct_ids)*100:.1f}%) - ETA: {remaining/60:.1f} min")
+
                 # Heartbeat every 30 seconds
                 if time.time() - last_heartbeat > 30:
-                    logger.info(f"💓 Job {job_id}: Still alive - processed {i}/{len(nct_ids)} trials")
+                    logger.info(f"💓 Job {job_id}: Still alive - processed {done_count}/{len(nct_ids)} trials")
                     last_heartbeat = time.time()
-        
+
+        # Each job keeps up to trial_concurrency() trials in flight; the
+        # shared trial slots (and their memory floor) decide how many run.
+        pending: asyncio.Queue = asyncio.Queue()
+        for item in enumerate(nct_ids):
+            pending.put_nowait(item)
+        workers = min(resource_mgr.trial_concurrency(), len(nct_ids))
+
+        # Create a persistent client for all requests (reduced timeout to 120s)
+        async with httpx.AsyncClient(
+            timeout=120.0,
+            limits=httpx.Limits(max_connections=workers + 2, max_keepalive_connections=workers)
+        ) as client:
+            await asyncio.gather(*(trial_worker(client, pending) for _ in range(workers)))
+
+        # Trials finish out of order; keep the output in input order.
+        order = {nct: idx for idx, nct in enumerate(nct_ids)}
+        results.sort(key=lambda r: order.get(r.get("nct_id"), len(order)))
+        errors.sort(key=lambda e: order.get(e.get("nct_id"), len(order)))
+
         logger.info(f"🏁 Job {job_id}: All trials processed, generating CSV...")
         
         # All trials processed
@@ -765,6 +903,7 @@ async def process_csv_job(
         job.status = JobStatus.COMPLETED
         job.progress = "Completed"
         job.updated_at = datetime.now()
+        job_events.notify()
 
         logger.info(f"✅ Job {job_id} completed: {successful} success, {failed} errors in {duration:.1f}s")
         logger.info(f"📊 Job {job_id} result object: total={job.result['total']}, successful={job.result['successful']}, failed={job.result['failed']}, time={job.result['total_time_seconds']}")
@@ -824,6 +963,7 @@ async def process_csv_job(
         job.error = str(e)
         job.progress = "Failed"
         job.updated_at = datetime.now()
+        job_events.notify()
 
         # Send failure email notification if requested
         if job.notification_email:
@@ -1128,6 +1268,14 @@ async def annotate_trials_via_runner(
 # Chat Routes
 # ============================================================================
 
+# Folds older turns into a conversation's running summary (context_manager.py)
+summarize_turns = ollama_summarizer(config.OLLAMA_BASE_URL)
+
+# While Ollama loads the model / evaluates the prompt no tokens flow; an SSE
+# comment this often keeps proxies (Cloudflare cuts idle responses at 100 s)
+# from dropping the stream.
+STREAM_KEEPALIVE_SECONDS = float(os.getenv("CHAT_STREAM_KEEPALIVE_SECONDS", "15"))
+
 @app.post("/chat/init")
 async def init_chat(request: ChatInitRequest):
     """Initialize a new chat conversation"""
@@ -1228,6 +1376,7 @@ async def send_message(request: ChatMessageRequest):
                 "_output_path": str(output_path)
             }
             job_manager.jobs[job_id] = job
+            job_events.notify()
             logger.info(f"📄 Generated CSV for single annotation: {csv_filename}")
         
         # Format response
@@ -1272,16 +1421,21 @@ Total Time: {summary.processing_time_seconds:.1f}s
     
     # Call Ollama
     try:
+        # Running summary + recent turns, within the num_ctx budget
+        prompt = await context_manager.build_prompt(
+            request.conversation_id, conv["model"], conv["messages"], summarize_turns
+        )
         async with httpx.AsyncClient(timeout=300.0) as client:
-            response = await client.post(
-                f"{config.OLLAMA_BASE_URL}/api/chat",
-                json={
-                    "model": conv["model"],
-                    "messages": conv["messages"],
-                    "temperature": request.temperature,
-                    "stream": False
-                }
-            )
+            with LLM_LATENCY.labels(conv["model"]).time():
+                response = await client.post(
+                    f"{config.OLLAMA_BASE_URL}/api/chat",
+                    json={
+                        "model": conv["model"],
+                        "messages": prompt,
+                        "options": context_manager.options(temperature=request.temperature),
+                        "stream": False
+                    }
+                )
             
             if response.status_code != 200:
                 raise HTTPException(
@@ -1291,6 +1445,12 @@ Total Time: {summary.processing_time_seconds:.1f}s
             
             data = response.json()
             assistant_message = data["message"]["content"]
+            LLM_TOKENS.labels(conv["model"], "prompt").inc(data.get("prompt_eval_count") or 0)
+            LLM_TOKENS.labels(conv["model"], "completion").inc(data.get("eval_count") or 0)
+            context_manager.record_reply(
+                request.conversation_id, conv["model"], prompt,
+                assistant_message, data.get("prompt_eval_count"),
+            )
             
             # Add assistant message
             conv["messages"].append({
@@ -1318,6 +1478,172 @@ Total Time: {summary.processing_time_seconds:.1f}s
         raise HTTPException(status_code=500, detail=str(e))
 
 
+def _sse(event: str, data: Dict[str, Any]) -> str:
+    return f"event: {event}\ndata: {json.dumps(data)}\n\n"
+
+
+async def _with_keepalive(iterator, interval: float):
+    """Items from an async iterator, plus None after every ``interval`` idle seconds."""
+    pending = asyncio.ensure_future(iterator.__anext__())
+    try:
+        while True:
+            done, _ = await asyncio.wait({pending}, timeout=interval)
+            if not done:
+                yield None
+                continue
+            try:
+                item = pending.result()
+            except StopAsyncIteration:
+                return
+            yield item
+            pending = asyncio.ensure_future(iterator.__anext__())
+    finally:
+        pending.cancel()
+
+
+async def _stream_reply(conversation_id: str, conv: Dict[str, Any], temperature: float):
+    """SSE frames for one streamed reply (see stream_message)."""
+    model = conv["model"]
+    start_time = time.time()
+    parts: List[str] = []
+    outcome = "error"
+    # Get the response headers out before the prompt is built, which may
+    # itself call the LLM to fold older turns into the summary.
+    yield ": stream open\n\n"
+    try:
+        prompt = await context_manager.build_prompt(
+            conversation_id, model, conv["messages"], summarize_turns
+        )
+        # Generous read timeout: it bounds the gap between two lines, and the
+        # first line waits for the model to load.
+        timeout = httpx.Timeout(300.0, connect=10.0)
+        async with httpx.AsyncClient(timeout=timeout) as client:
+            sent = time.perf_counter()
+            async with client.stream(
+                "POST",
+                f"{config.OLLAMA_BASE_URL}/api/chat",
+                json={
+                    "model": model,
+                    "messages": prompt,
+                    "options": context_manager.options(temperature=temperature),
+                    "stream": True
+                }
+            ) as response:
+                if response.status_code != 200:
+                    body = (await response.aread()).decode(errors="replace")
+                    yield _sse("error", {"detail": f"Ollama error: {body}"})
+                    return
+
+                # Pull-based: the next NDJSON line is read only after the
+                # previous frame was sent, so a slow client slows the read
+                # from Ollama instead of buffering here.
+                final: Dict[str, Any] = {}
+                time_to_first_token = None
+                lines = _with_keepalive(response.aiter_lines(), STREAM_KEEPALIVE_SECONDS)
+                try:
+                    async for line in lines:
+                        if line is None:
+                            yield ": keep-alive\n\n"
+                            continue
+                        if not line.strip():
+                            continue
+                        chunk = json.loads(line)
+                        if chunk.get("error"):
+                            raise RuntimeError(chunk["error"])
+                        content = (chunk.get("message") or {}).get("content", "")
+                        if content:
+                            if time_to_first_token is None:
+                                time_to_first_token = time.perf_counter() - sent
+                                LLM_TTFT.labels(model).observe(time_to_first_token)
+                            parts.append(content)
+                            yield _sse("token", {"content": content})
+                        if chunk.get("done"):
+                            final = chunk
+                            break
+                finally:
+                    await lines.aclose()
+            LLM_LATENCY.labels(model).observe(time.perf_counter() - sent)
+
+        assistant_message = "".join(parts)
+        LLM_TOKENS.labels(model, "prompt").inc(final.get("prompt_eval_count") or 0)
+        LLM_TOKENS.labels(model, "completion").inc(final.get("eval_count") or 0)
+        context_manager.record_reply(
+            conversation_id, model, prompt, assistant_message, final.get("prompt_eval_count"),
+        )
+        conv["messages"].append({
+            "role": "assistant",
+            "content": assistant_message
+        })
+        outcome = "completed"
+        yield _sse("done", {
+            "conversation_id": conversation_id,
+            "message": {"role": "assistant", "content": assistant_message},
+            "model": model,
+            "annotation_mode": False,
+            "processing_time_seconds": round(time.time() - start_time, 2),
+            "time_to_first_token_seconds": (
+                round(time_to_first_token, 3) if time_to_first_token is not None else None
+            ),
+            "prompt_eval_count": final.get("prompt_eval_count"),
+            "eval_count": final.get("eval_count"),
+        })
+
+    except (asyncio.CancelledError, GeneratorExit):
+        # Client went away. Leaving the ``async with`` blocks closed the
+        # Ollama connection, which stops the generation.
+        outcome = "cancelled"
+        logger.info(f"Stream for {conversation_id} cancelled after {len(parts)} chunks")
+        raise
+    except httpx.ConnectError:
+        yield _sse("error", {"detail": f"Cannot connect to Ollama at {config.OLLAMA_BASE_URL}"})
+    except Exception as e:
+        logger.error(f"❌ Streamed chat error: {e}", exc_info=True)
+        yield _sse("error", {"detail": str(e)})
+    finally:
+        LLM_STREAMS.labels(model, outcome).inc()
+        if outcome != "completed" and parts:
+            # Keep the history in line with what the user saw.
+            conv["messages"].append({
+                "role": "assistant",
+                "content": "".join(parts)
+            })
+
+
+@app.post("/chat/message/stream")
+async def stream_message(request: ChatMessageRequest):
+    """
+    Send a message and stream the reply as Server-Sent Events.
+
+    Events: ``token`` ({"content"}) per chunk from Ollama, then either
+    ``done`` (the /chat/message response fields plus token counts and
+    time_to_first_token_seconds) or ``error`` ({"detail"}). Comment lines
+    are keep-alives. Disconnecting stops the generation; the partial reply
+    is kept in the conversation.
+
+    Normal chat only; annotation requests use /chat/message or /chat/annotate.
+    """
+    if request.conversation_id not in conversations:
+        raise HTTPException(status_code=404, detail="Conversation not found")
+
+    conv = conversations[request.conversation_id]
+    if conv.get("annotation_mode") and request.nct_ids:
+        raise HTTPException(
+            status_code=400,
+            detail="Annotation requests are not streamed; use /chat/message or /chat/annotate"
+        )
+
+    conv["messages"].append({
+        "role": "user",
+        "content": request.message
+    })
+
+    return StreamingResponse(
+        _stream_reply(request.conversation_id, conv, request.temperature),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+
 # ============================================================================
 # Async Annotation Routes (fixes Cloudflare 524 timeout)
 # ============================================================================
@@ -1347,19 +1673,12 @@ async def process_manual_annotation_job(
 
     # Request resource slot (memory check + concurrency limit)
     resource_mgr = get_resource_manager()
-    slot_result = await resource_mgr.request_llm_slot(
+    await resource_mgr.acquire_llm_slot(
         job_id=job_id,
-        metadata={"model": model, "type": "manual_annotation", "nct_count": len(nct_ids)}
+        metadata={"model": model, "type": "manual_annotation", "nct_count": len(nct_ids)},
+        on_queued=lambda info: _mark_job_queued(job, info)
     )
 
-    if not slot_result.get("granted"):
-        # Job is queued - update status and wait
-        job.status = JobStatus.PENDING
-        job.progress = f"Queued (position {slot_result.get('queue_position', '?')}): {slot_result.get('reason', 'Waiting for resources')}"
-        job.updated_at = datetime.now()
-        logger.info(f"⏳ Job {job_id}: Queued - {slot_result.get('reason')}")
-        return
-
     try:
         job.status = JobStatus.PROCESSING
         job.progress = f"Starting annotation of {len(nct_ids)} trial(s)..."
@@ -1490,6 +1809,7 @@ async def process_manual_annotation_job(
         job.progress = "Completed"
         job.processed_trials = len(nct_ids)
         job.updated_at = datetime.now()
+        job_events.notify()
 
         logger.info(f"✅ Job {job_id} completed: {successful} success, {failed} errors in {duration:.1f}s")
 
@@ -1535,6 +1855,7 @@ async def process_manual_annotation_job(
         job.error = str(e)
         job.progress = "Failed"
         job.updated_at = datetime.now()
+        job_events.notify()
 
         if job.notification_email:
             send_annotation_failed_email(
@@ -1583,6 +1904,7 @@ async def annotate_manual(request: ManualAnnotationRequest):
         notification_email=request.notification_email
     )
     job_manager.jobs[job_id] = job
+    job_events.notify()
 
     if request.notification_email:
         logger.info(f"📧 Job {job_id} will notify {request.notification_email} on completion")
@@ -1683,6 +2005,7 @@ async def annotate_csv(
             notification_email=notification_email
         )
         job_manager.jobs[job_id] = job
+        job_events.notify()
 
         if notification_email:
             logger.info(f"📧 Job {job_id} will notify {notification_email} on completion")
@@ -1814,6 +2137,43 @@ async def download_annotation_results(job_id: str):
     )
 
 
+def _job_row(job: AnnotationJob, now: datetime) -> Dict[str, Any]:
+    """Summary row for the jobs list and the job event stream."""
+    # Finished jobs stop the clock at their last update.
+    finished = job.status in (JobStatus.COMPLETED, JobStatus.FAILED)
+    elapsed_seconds = ((job.updated_at if finished else now) - job.created_at).total_seconds()
+
+    # Calculate progress percentage
+    percent = 0
+    if job.total_trials > 0:
+        percent = round((job.processed_trials / job.total_trials) * 100)
+
+    return {
+        "job_id": job.job_id,
+        "status": job.status.value,
+        "progress": job.progress,
+        "current_step": job.current_step,
+        "current_nct": job.current_nct,
+        "model": job.model,
+        "total_trials": job.total_trials,
+        "processed_trials": job.processed_trials,
+        "percent_complete": percent,
+        "original_filename": job.original_filename,
+        "notification_email": job.notification_email,
+        "created_at": job.created_at.isoformat(),
+        "elapsed_seconds": round(elapsed_seconds),
+        "has_result": job.result is not None
+    }
+
+
+def _job_rows() -> List[Dict[str, Any]]:
+    now = datetime.now()
+    return [_job_row(job, now) for job in list(job_manager.jobs.values())]
+
+
+job_events.set_source(_job_rows)
+
+
 @app.get("/chat/jobs")
 async def list_annotation_jobs():
     """
@@ -1825,33 +2185,7 @@ async def list_annotation_jobs():
     - notification_email (if set)
     - created_at, elapsed time
     """
-    jobs_list = []
-    now = datetime.now()
-
-    for job_id, job in job_manager.jobs.items():
-        elapsed_seconds = (now - job.created_at).total_seconds()
-
-        # Calculate progress percentage
-        percent = 0
-        if job.total_trials > 0:
-            percent = round((job.processed_trials / job.total_trials) * 100)
-
-        jobs_list.append({
-            "job_id": job.job_id,
-            "status": job.status.value,
-            "progress": job.progress,
-            "current_step": job.current_step,
-            "current_nct": job.current_nct,
-            "model": job.model,
-            "total_trials": job.total_trials,
-            "processed_trials": job.processed_trials,
-            "percent_complete": percent,
-            "original_filename": job.original_filename,
-            "notification_email": job.notification_email,
-            "created_at": job.created_at.isoformat(),
-            "elapsed_seconds": round(elapsed_seconds),
-            "has_result": job.result is not None
-        })
+    jobs_list = _job_rows()
 
     # Sort by created_at descending (newest first)
     jobs_list.sort(key=lambda x: x["created_at"], reverse=True)
@@ -1863,6 +2197,20 @@ async def list_annotation_jobs():
     }
 
 
+@app.get("/chat/jobs/events")
+async def job_event_stream():
+    """
+    Server-sent job list: a snapshot, then per-job deltas as jobs change.
+
+    Same rows as GET /chat/jobs; replaces polling it (see job_events.py).
+    """
+    return StreamingResponse(
+        job_events.sse(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+
 @app.delete("/chat/jobs/{job_id}")
 async def cancel_annotation_job(job_id: str):
     """
@@ -1896,6 +2244,7 @@ async def cancel_annotation_job(job_id: str):
     job.error = "Cancelled by user"
     job.progress = "Cancelled"
     job.updated_at = datetime.now()
+    job_events.notify()
 
     logger.info(f"🛑 Job {job_id} cancelled by user")
 
@@ -1922,6 +2271,7 @@ async def clear_completed_jobs():
 
     for job_id in jobs_to_remove:
         del job_manager.jobs[job_id]
+    job_events.notify()
 
     logger.info(f"🧹 Cleared {len(jobs_to_remove)} completed/failed jobs")
 
@@ -1950,6 +2300,7 @@ async def delete_conversation(conversation_id: str):
     if conversation_id not in conversations:
         raise HTTPException(status_code=404, detail="Conversation not found")
     del conversations[conversation_id]
+    context_manager.forget(conversation_id)
     return {"status": "deleted", "conversation_id": conversation_id}
 
 
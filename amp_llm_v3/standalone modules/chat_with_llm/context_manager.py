@@ -0,0 +1,396 @@
+"""
+Token-Budgeted Conversation Context
+===================================
+
+``/chat/message`` used to send a conversation's entire history to Ollama on
+every turn. Long annotation-assistant sessions grew the prompt without bound:
+turn latency rose with history length, and once the history passed the
+model's context window Ollama silently cut off the start.
+
+``ContextManager`` builds each turn's prompt within a token budget:
+- Every message's token count is estimated once and cached. Ollama reports
+  how many prompt tokens it evaluated; a count above our estimate proves the
+  estimate low, so the per-model scale only ever moves up.
+- The prompt is a running summary of older turns (as a system message) plus
+  the most recent turns, and fits within ``CHAT_NUM_CTX`` minus a reserve for
+  the reply.
+- When the prompt would exceed the budget, the oldest turns are folded into
+  the summary until the prompt is back under ``CHAT_CONTEXT_LOW_WATER`` of
+  the budget, always keeping the last ``CHAT_KEEP_RECENT_MESSAGES``
+  messages. Folding in steps leaves the prompt prefix (summary plus
+  earlier turns) unchanged from one turn to the next. Ollama then reuses
+  its KV cache for that prefix and evaluates only the new turn. ``stats()``
+  counts how often the prefix carried over.
+- Summaries are produced by the conversation's own model and cached by
+  their input, so a retried turn does not summarize again. If summarizing
+  fails, the folded turns are dropped (a plain sliding window) and the
+  summary records how many were left out.
+
+The full history stays in the conversation (for ``GET /chat/conversations``);
+only the prompt is windowed.
+
+Configuration (via .env):
+- CHAT_NUM_CTX: Context window requested from Ollama, in tokens (default: 8192)
+- CHAT_RESPONSE_RESERVE_TOKENS: Part of the window kept free for the reply (default: 1024)
+- CHAT_SUMMARY_TOKENS: Length cap for the running summary (default: 512)
+- CHAT_KEEP_RECENT_MESSAGES: Messages never folded into the summary (default: 4)
+- CHAT_CONTEXT_LOW_WATER: Fraction of the budget a fold shrinks the prompt to (default: 0.6)
+- CHAT_CHARS_PER_TOKEN: Starting characters-per-token estimate (default: 3.5)
+"""
+
+import asyncio
+import hashlib
+import logging
+import os
+from collections import OrderedDict
+from dataclasses import dataclass, field
+from typing import Awaitable, Callable, Dict, List, Optional, Tuple
+
+import httpx
+
+logger = logging.getLogger(__name__)
+
+# =============================================================================
+# Configuration
+# =============================================================================
+
+CHAT_NUM_CTX = int(os.getenv("CHAT_NUM_CTX", "8192"))
+CHAT_RESPONSE_RESERVE_TOKENS = int(os.getenv("CHAT_RESPONSE_RESERVE_TOKENS", "1024"))
+CHAT_SUMMARY_TOKENS = int(os.getenv("CHAT_SUMMARY_TOKENS", "512"))
+CHAT_KEEP_RECENT_MESSAGES = int(os.getenv("CHAT_KEEP_RECENT_MESSAGES", "4"))
+CHAT_CONTEXT_LOW_WATER = float(os.getenv("CHAT_CONTEXT_LOW_WATER", "0.6"))
+CHAT_CHARS_PER_TOKEN = float(os.getenv("CHAT_CHARS_PER_TOKEN", "3.5"))
+
+# Chat templates wrap each message in role markers.
+MESSAGE_OVERHEAD_TOKENS = 4
+SUMMARY_CACHE_SIZE = 256
+
+SUMMARY_PREFIX = "Summary of the earlier conversation:\n"
+SUMMARY_INSTRUCTIONS = (
+    "You maintain a running summary of a conversation between a user and a "
+    "clinical-trial annotation assistant. Merge the previous summary with the "
+    "new messages into one concise summary. Keep NCT IDs, drug names, "
+    "annotation values, decisions and open questions; drop pleasantries. "
+    "Reply with the summary only."
+)
+
+Message = Dict[str, str]
+# (model, previous summary, messages to fold) -> new summary
+Summarizer = Callable[[str, str, List[Message]], Awaitable[str]]
+
+
+@dataclass
+class ConversationContext:
+    """Per-conversation window state."""
+    summary: str = ""
+    summary_tokens: int = 0
+    omitted: int = 0  # folded messages that could not be summarized
+    summarized_upto: int = 0  # messages[:summarized_upto] are in the summary
+    # Per message: (content length, estimated tokens, digest)
+    counts: List[Tuple[int, int, str]] = field(default_factory=list)
+    # Digests of the last prompt sent plus its reply
+    last_sequence: List[str] = field(default_factory=list)
+    lock: asyncio.Lock = field(default_factory=asyncio.Lock)
+
+
+class ContextManager:
+    """Builds token-budgeted prompts with rolling summaries."""
+
+    def __init__(
+        self,
+        num_ctx: int = CHAT_NUM_CTX,
+        response_reserve: int = CHAT_RESPONSE_RESERVE_TOKENS,
+        summary_tokens: int = CHAT_SUMMARY_TOKENS,
+        keep_recent: int = CHAT_KEEP_RECENT_MESSAGES,
+        low_water: float = CHAT_CONTEXT_LOW_WATER,
+        chars_per_token: float = CHAT_CHARS_PER_TOKEN,
+    ):
+        self.num_ctx = num_ctx
+        self.budget = max(num_ctx - response_reserve, 256)
+        self.summary_tokens = summary_tokens
+        self.keep_recent = max(keep_recent, 1)
+        self.low_water = low_water
+        self.chars_per_token = chars_per_token
+        self._contexts: Dict[str, ConversationContext] = {}
+        self._scale: Dict[str, float] = {}
+        self._summary_cache: "OrderedDict[str, str]" = OrderedDict()
+        self._stats = {
+            "turns": 0,
+            "folds": 0,
+            "folded_messages": 0,
+            "summaries": 0,
+            "summary_cache_hits": 0,
+            "summary_errors": 0,
+            "prefix_reused": 0,
+            "prefix_rebuilt": 0,
+        }
+
+    # -------------------------------------------------------------------------
+    # Token counting
+    # -------------------------------------------------------------------------
+
+    def count_tokens(self, text: str) -> int:
+        """Unscaled token estimate for one message body."""
+        return int(len(text) / self.chars_per_token) + MESSAGE_OVERHEAD_TOKENS
+
+    def _scaled(self, model: str, tokens: int) -> int:
+        return int(tokens * self._scale.get(model, 1.0))
+
+    def _sync_counts(self, ctx: ConversationContext, messages: List[Message]) -> None:
+        counts = ctx.counts
+        del counts[len(messages):]
+        for i, msg in enumerate(messages):
+            content = msg.get("content") or ""
+            if i < len(counts) and counts[i][0] == len(content):
+                continue
+            digest = hashlib.sha1(f"{msg.get('role')}\0{content}".encode()).hexdigest()
+            entry = (len(content), self.count_tokens(content), digest)
+            if i < len(counts):
+                counts[i] = entry
+            else:
+                counts.append(entry)
+
+    def estimate(self, model: str, messages: List[Message]) -> int:
+        """Scaled token estimate for a list of messages."""
+        raw = sum(self.count_tokens(m.get("content") or "") for m in messages)
+        return self._scaled(model, raw)
+
+    # -------------------------------------------------------------------------
+    # Prompt building
+    # -------------------------------------------------------------------------
+
+    def context(self, conversation_id: str) -> ConversationContext:
+        ctx = self._contexts.get(conversation_id)
+        if ctx is None:
+            ctx = self._contexts[conversation_id] = ConversationContext()
+        return ctx
+
+    def forget(self, conversation_id: str) -> None:
+        self._contexts.pop(conversation_id, None)
+
+    def options(self, **extra) -> Dict:
+        """Ollama ``options`` for a chat turn."""
+        return {"num_ctx": self.num_ctx, **extra}
+
+    def _window_tokens(self, model: str, ctx: ConversationContext, start: int) -> int:
+        raw = sum(c[1] for c in ctx.counts[start:])
+        return self._scaled(model, raw + ctx.summary_tokens)
+
+    async def build_prompt(
+        self,
+        conversation_id: str,
+        model: str,
+        messages: List[Message],
+        summarize: Summarizer,
+    ) -> List[Message]:
+        """Messages to send for this turn: running summary plus recent turns."""
+        ctx = self.context(conversation_id)
+        async with ctx.lock:
+            self._sync_counts(ctx, messages)
+            if ctx.summarized_upto > len(messages):
+                # History was replaced; start over.
+                ctx.summary, ctx.summary_tokens, ctx.summarized_upto, ctx.omitted = "", 0, 0, 0
+            if self._window_tokens(model, ctx, ctx.summarized_upto) > self.budget:
+                await self._fold(ctx, model, messages, summarize)
+
+            prompt: List[Message] = []
+            summary_text = self._summary_text(ctx)
+            if summary_text:
+                prompt.append({"role": "system", "content": summary_text})
+            prompt.extend(
+                {"role": m["role"], "content": m.get("content") or ""}
+                for m in messages[ctx.summarized_upto:]
+            )
+
+            sequence = [hashlib.sha1(summary_text.encode()).hexdigest()] if summary_text else []
+            sequence += [c[2] for c in ctx.counts[ctx.summarized_upto:]]
+            last = ctx.last_sequence
+            if last and sequence[:len(last)] == last:
+                self._stats["prefix_reused"] += 1
+            elif last:
+                self._stats["prefix_rebuilt"] += 1
+            ctx.last_sequence = sequence
+            self._stats["turns"] += 1
+            return prompt
+
+    @staticmethod
+    def _summary_text(ctx: ConversationContext) -> str:
+        if not ctx.summary and not ctx.omitted:
+            return ""
+        text = SUMMARY_PREFIX + (ctx.summary or "(unavailable)")
+        if ctx.omitted:
+            text += f"\n({ctx.omitted} earlier messages could not be summarized and were left out.)"
+        return text
+
+    async def _fold(
+        self,
+        ctx: ConversationContext,
+        model: str,
+        messages: List[Message],
+        summarize: Summarizer,
+    ) -> None:
+        start = ctx.summarized_upto
+        last = len(messages) - 1  # the new user turn is always sent
+        soft_stop = max(len(messages) - self.keep_recent, start)
+        target = int(self.budget * self.low_water)
+        summary_room = self.summary_tokens
+
+        k = start
+        remaining = sum(c[1] for c in ctx.counts[k:])
+        while k < soft_stop and self._scaled(model, remaining + summary_room) > target:
+            remaining -= ctx.counts[k][1]
+            k += 1
+        # Recent turns alone too big: fold into them, never past the last.
+        while k < last and self._scaled(model, remaining + summary_room) > self.budget:
+            remaining -= ctx.counts[k][1]
+            k += 1
+        # Start the window on a user turn when one is available.
+        while k < last and messages[k].get("role") == "assistant":
+            k += 1
+        if k <= start:
+            logger.warning(
+                f"Latest message alone exceeds the {self.budget}-token budget; "
+                f"Ollama will truncate it"
+            )
+            return
+
+        folded = messages[start:k]
+        ctx.summary, omitted = await self._summarize(model, ctx.summary, folded, summarize)
+        ctx.omitted += omitted
+        ctx.summary_tokens = self.count_tokens(self._summary_text(ctx))
+        ctx.summarized_upto = k
+        self._stats["folds"] += 1
+        self._stats["folded_messages"] += len(folded)
+        logger.info(
+            f"Folded {len(folded)} messages into the running summary "
+            f"({k}/{len(messages)} summarized, ~{ctx.summary_tokens} summary tokens)"
+        )
+
+    def _chunks(self, model: str, messages: List[Message]) -> List[List[Message]]:
+        """Split folded messages into pieces that fit one summarization call."""
+        room = max(self.budget - 2 * self.summary_tokens - 256, 256)
+        max_chars = int(room * self.chars_per_token / self._scale.get(model, 1.0))
+        chunks: List[List[Message]] = []
+        chunk: List[Message] = []
+        used = 0
+        for m in messages:
+            content = m.get("content") or ""
+            if len(content) > max_chars:
+                half = max_chars // 2
+                content = content[:half] + "\n[...]\n" + content[-half:]
+            tokens = self._scaled(model, self.count_tokens(content))
+            if chunk and used + tokens > room:
+                chunks.append(chunk)
+                chunk, used = [], 0
+            chunk.append({"role": m.get("role", "user"), "content": content})
+            used += tokens
+        if chunk:
+            chunks.append(chunk)
+        return chunks
+
+    async def _summarize(
+        self,
+        model: str,
+        summary: str,
+        folded: List[Message],
+        summarize: Summarizer,
+    ) -> Tuple[str, int]:
+        """``(new summary, messages that could not be summarized)``."""
+        omitted = 0
+        for chunk in self._chunks(model, folded):
+            key = hashlib.sha1(
+                "\0".join([model, summary] + [f"{m['role']}:{m['content']}" for m in chunk]).encode()
+            ).hexdigest()
+            cached = self._summary_cache.get(key)
+            if cached is not None:
+                self._summary_cache.move_to_end(key)
+                self._stats["summary_cache_hits"] += 1
+                summary = cached
+                continue
+            try:
+                new_summary = (await summarize(model, summary, chunk)).strip()
+                if not new_summary:
+                    raise ValueError("empty summary")
+            except Exception as e:
+                self._stats["summary_errors"] += 1
+                logger.warning(f"Summarizing {len(chunk)} messages failed, dropping them: {e}")
+                omitted += len(chunk)
+                continue
+            self._stats["summaries"] += 1
+            self._summary_cache[key] = new_summary
+            if len(self._summary_cache) > SUMMARY_CACHE_SIZE:
+                self._summary_cache.popitem(last=False)
+            summary = new_summary
+        return summary, omitted
+
+    # -------------------------------------------------------------------------
+    # Feedback from Ollama
+    # -------------------------------------------------------------------------
+
+    def record_reply(
+        self,
+        conversation_id: str,
+        model: str,
+        prompt: List[Message],
+        reply: str,
+        prompt_eval_count: Optional[int],
+    ) -> None:
+        """Note the reply (next turn's prefix) and calibrate the estimate.
+
+        ``prompt_eval_count`` is at most the true prompt size (less when
+        Ollama reused a cached prefix), so it can only show the estimate
+        was low.
+        """
+        ctx = self._contexts.get(conversation_id)
+        if ctx is not None:
+            digest = hashlib.sha1(f"assistant\0{reply}".encode()).hexdigest()
+            ctx.last_sequence = ctx.last_sequence + [digest]
+        raw = sum(self.count_tokens(m.get("content") or "") for m in prompt)
+        if prompt_eval_count and raw and prompt_eval_count > raw * self._scale.get(model, 1.0):
+            self._scale[model] = min(prompt_eval_count / raw, 3.0)
+            logger.info(f"Token estimate for {model} scaled to {self._scale[model]:.2f}x")
+
+    def stats(self) -> Dict:
+        return {
+            **self._stats,
+            "conversations": len(self._contexts),
+            "summary_cache_entries": len(self._summary_cache),
+            "num_ctx": self.num_ctx,
+            "budget": self.budget,
+        }
+
+
+def ollama_summarizer(base_url: str, timeout: float = 300.0) -> Summarizer:
+    """Summarizer that asks the conversation's own model via ``/api/chat``."""
+
+    async def summarize(model: str, summary: str, messages: List[Message]) -> str:
+        transcript = "\n\n".join(f"{m['role'].upper()}: {m['content']}" for m in messages)
+        user = (
+            f"Previous summary:\n{summary or '(none)'}\n\n"
+            f"New messages:\n{transcript}\n\nUpdated summary:"
+        )
+        async with httpx.AsyncClient(timeout=timeout) as client:
+            response = await client.post(
+                f"{base_url}/api/chat",
+                json={
+                    "model": model,
+                    "messages": [
+                        {"role": "system", "content": SUMMARY_INSTRUCTIONS},
+                        {"role": "user", "content": user},
+                    ],
+                    "stream": False,
+                    "options": {
+                        "num_ctx": context_manager.num_ctx,
+                        "num_predict": context_manager.summary_tokens,
+                        "temperature": 0.1,
+                    },
+                },
+            )
+            response.raise_for_status()
+            return response.json()["message"]["content"]
+
+    return summarize
+
+
+# Global context manager instance
+context_manager = ContextManager()
@@ -0,0 +1,21 @@
+"""
+Job status event stream (SSE snapshot, then deltas) for the chat service's /chat/jobs/events.
+
+``JobEventHub`` is shared with the other services and lives in
+``amp_llm_v3/amp_shared/job_events.py``; this module re-exports it and owns
+the singleton.
+"""
+
+import sys
+from pathlib import Path
+
+_AMP_ROOT = str(Path(__file__).resolve().parents[2])
+if _AMP_ROOT not in sys.path:
+    sys.path.append(_AMP_ROOT)
+
+from amp_shared.job_events import JobEventHub, apply_delta, diff_rows, format_sse  # noqa: E402
+
+__all__ = ["JobEventHub", "apply_delta", "diff_rows", "format_sse", "job_events"]
+
+# Module-level singleton; chat_api sets its source.
+job_events = JobEventHub()
@@ -5,12 +5,21 @@ Resource Manager for LLM Services
 Manages system resources to prevent memory exhaustion:
 - Checks available memory before starting LLM jobs
 - Queues jobs when memory is insufficient
-- Automatically starts queued jobs when memory clears
+- Starts queued jobs as soon as a slot is released or memory clears
+- Limits concurrent per-trial LLM requests across all jobs
+- Drains in-flight requests to a model before it is unloaded/reset
 - Rate limits API calls to prevent hitting external limits
 
+Admission is event-driven: a released slot is handed straight to the next
+waiter, and memory is re-sampled only while the head of a queue is blocked
+on it (there is no OS event for "memory became free").
+
 Configuration (via .env):
-- MEMORY_MIN_FREE_GB: Minimum free RAM required (default: 6)
+- MEMORY_MIN_FREE_GB: Minimum free RAM required to start a job (default: 6)
 - MAX_CONCURRENT_LLM_JOBS: Maximum simultaneous LLM jobs (default: 2)
+- MAX_CONCURRENT_LLM_REQUESTS: Max per-trial LLM requests in flight across all jobs (default: 4)
+- TRIAL_MEMORY_MIN_FREE_GB: Minimum free RAM to start another trial request (default: 2)
+- MEMORY_RECHECK_SECONDS: Memory sampling interval while a queue is blocked on memory (default: 2)
 - NCT_MAX_CONCURRENT_REQUESTS: Max concurrent NCT API calls (default: 3)
 - NCT_RATE_LIMIT_PER_SECOND: API calls per second limit (default: 2)
 """
@@ -22,7 +31,8 @@ import time
 from pathlib import Path
 from dataclasses import dataclass, field
 from datetime import datetime
-from typing import Dict, List, Optional, Callable, Any
+from contextlib import asynccontextmanager
+from typing import AsyncIterator, Dict, List, Optional, Callable, Any
 from enum import Enum
 from collections import deque
 
@@ -51,9 +61,14 @@ logger = logging.getLogger(__name__)
 
 # Memory thresholds (in GB)
 MEMORY_MIN_FREE_GB = float(os.getenv("MEMORY_MIN_FREE_GB", "6"))
+# Lower floor for one more trial request: the model is already loaded once
+# a job is running, so each extra request only needs context memory.
+TRIAL_MEMORY_MIN_FREE_GB = float(os.getenv("TRIAL_MEMORY_MIN_FREE_GB", "2"))
+MEMORY_RECHECK_SECONDS = float(os.getenv("MEMORY_RECHECK_SECONDS", "2"))
 
 # Concurrency limits
 MAX_CONCURRENT_LLM_JOBS = int(os.getenv("MAX_CONCURRENT_LLM_JOBS", "2"))
+MAX_CONCURRENT_LLM_REQUESTS = int(os.getenv("MAX_CONCURRENT_LLM_REQUESTS", "4"))
 NCT_MAX_CONCURRENT_REQUESTS = int(os.getenv("NCT_MAX_CONCURRENT_REQUESTS", "3"))
 NCT_RATE_LIMIT_PER_SECOND = float(os.getenv("NCT_RATE_LIMIT_PER_SECOND", "2"))
 
@@ -202,6 +217,152 @@ class ConcurrencySemaphore:
         await self.release()
 
 
+class ModelGate:
+    """
+    Shared/exclusive gate for one Ollama model.
+
+    Trial requests hold it shared (``request``). A model reset (unload with
+    ``keep_alive: 0``, then reload) holds it exclusively (``reset``): it waits
+    for every in-flight request to finish, and new requests wait behind it,
+    so an unload never cuts off another trial's generation.
+
+    ``reset`` yields False when another reset finished while this one was
+    waiting; the caller can skip its own, the model was just reloaded.
+    """
+
+    def __init__(self):
+        self._cond = asyncio.Condition()
+        self.active = 0
+        self.resetting = False
+        self._waiting_resets = 0
+        self._resets = 0
+
+    @asynccontextmanager
+    async def request(self) -> AsyncIterator[None]:
+        async with self._cond:
+            await self._cond.wait_for(lambda: not self.resetting and not self._waiting_resets)
+            self.active += 1
+        try:
+            yield
+        finally:
+            async with self._cond:
+                self.active -= 1
+                self._cond.notify_all()
+
+    @asynccontextmanager
+    async def reset(self) -> AsyncIterator[bool]:
+        async with self._cond:
+            generation = self._resets
+            self._waiting_resets += 1
+            try:
+                await self._cond.wait_for(lambda: not self.resetting and self.active == 0)
+            finally:
+                self._waiting_resets -= 1
+                self._cond.notify_all()
+            self.resetting = True
+        try:
+            yield self._resets == generation
+        finally:
+            async with self._cond:
+                self.resetting = False
+                self._resets += 1
+                self._cond.notify_all()
+
+
+class SlotPool:
+    """
+    FIFO admission pool with a free-memory floor per waiter.
+
+    ``acquire`` either takes a slot at once or parks the caller on a future.
+    Every state change (release, new waiter, memory recheck) calls
+    ``dispatch``, which hands free slots to waiters in order. A head waiter
+    that doesn't fit in memory blocks the ones behind it, so a large job
+    can't be starved by smaller ones.
+    """
+
+    def __init__(
+        self,
+        name: str,
+        capacity: int,
+        memory_monitor: MemoryMonitor,
+        on_start: Optional[Callable[[QueuedJob], None]] = None
+    ):
+        self.name = name
+        self.capacity = max(1, capacity)
+        self.memory_monitor = memory_monitor
+        self.on_start = on_start
+        self.active = 0
+        self.queue: deque[QueuedJob] = deque()
+        self._futures: Dict[int, asyncio.Future] = {}
+
+    @property
+    def memory_blocked(self) -> bool:
+        return bool(self.queue) and self.queue[0].status == QueueStatus.WAITING_MEMORY
+
+    def _fits(self, job: QueuedJob) -> bool:
+        return self.memory_monitor.has_sufficient_memory(job.memory_required_gb)
+
+    def try_acquire(self, job: QueuedJob) -> bool:
+        """Take a slot now if nobody is queued ahead and it fits."""
+        if self.queue or self.active >= self.capacity or not self._fits(job):
+            return False
+        self._grant(job)
+        return True
+
+    def enqueue(self, job: QueuedJob) -> asyncio.Future:
+        """Queue ``job`` (by priority, then FIFO); the future resolves on grant."""
+        fut = asyncio.get_running_loop().create_future()
+        self._futures[id(job)] = fut
+        index = len(self.queue)
+        for i, queued in enumerate(self.queue):
+            if job.priority > queued.priority:
+                index = i
+                break
+        self.queue.insert(index, job)
+        self.dispatch()
+        return fut
+
+    def remove(self, job: QueuedJob) -> bool:
+        """Drop a waiter that gave up; lets the ones behind it move up."""
+        self._futures.pop(id(job), None)
+        try:
+            self.queue.remove(job)
+        except ValueError:
+            return False
+        self.dispatch()
+        return True
+
+    def release(self) -> None:
+        self.active = max(0, self.active - 1)
+        self.dispatch()
+
+    def dispatch(self) -> List[QueuedJob]:
+        """Hand free slots to waiters in order. Returns the jobs started."""
+        started = []
+        while self.queue and self.active < self.capacity:
+            job = self.queue[0]
+            if not self._fits(job):
+                job.status = QueueStatus.WAITING_MEMORY
+                break
+            self.queue.popleft()
+            self._grant(job)
+            fut = self._futures.pop(id(job), None)
+            if fut is not None and not fut.done():
+                fut.set_result(None)
+            if self.on_start:
+                self.on_start(job)
+            started.append(job)
+        for i, queued in enumerate(self.queue):
+            queued.queue_position = i + 1
+        return started
+
+    def _grant(self, job: QueuedJob) -> None:
+        self.active += 1
+        job.status = QueueStatus.RUNNING
+        job.started_at = datetime.now()
+        job.queue_position = 0
+
+
 # =============================================================================
 # Resource Manager (Singleton)
 # =============================================================================
@@ -213,6 +374,7 @@ class ResourceManager:
     Manages:
     - Memory-based job queuing
     - Concurrent LLM job limits
+    - Per-trial LLM request slots shared by running jobs
     - NCT API rate limiting
     """
 
@@ -231,13 +393,15 @@ class ResourceManager:
         self._initialized = True
         self.memory_monitor = MemoryMonitor()
 
-        # Job queue
-        self.job_queue: deque[QueuedJob] = deque()
+        # Job-level slots (one per running LLM job) and trial-level slots
+        # (per-trial LLM requests in flight, shared by all running jobs).
+        self.llm_slots = SlotPool(
+            "llm_jobs", MAX_CONCURRENT_LLM_JOBS, self.memory_monitor,
+            on_start=self._on_job_started
+        )
+        self.trial_slots = SlotPool("llm_requests", MAX_CONCURRENT_LLM_REQUESTS, self.memory_monitor)
         self.running_jobs: Dict[str, QueuedJob] = {}
-        self._queue_lock = asyncio.Lock()
-
-        # LLM concurrency control
-        self.llm_semaphore = ConcurrencySemaphore(MAX_CONCURRENT_LLM_JOBS)
+        self._model_gates: Dict[str, ModelGate] = {}
 
         # NCT API rate limiting
         self.nct_rate_limiter = RateLimiter(
@@ -246,159 +410,233 @@ class ResourceManager:
         )
         self.nct_semaphore = ConcurrencySemaphore(NCT_MAX_CONCURRENT_REQUESTS)
 
-        # Background task for processing queue
+        # Background task that re-samples memory while a queue is blocked on it
         self._queue_processor_task = None
+        self._memory_blocked: Optional[asyncio.Event] = None
 
         logger.info(f"📊 ResourceManager initialized:")
-        logger.info(f"   - Min free memory: {MEMORY_MIN_FREE_GB} GB")
-        logger.info(f"   - Max concurrent LLM jobs: {MAX_CONCURRENT_LLM_JOBS}")
+        logger.info(f"   - Min free memory: {MEMORY_MIN_FREE_GB} GB (per trial request: {TRIAL_MEMORY_MIN_FREE_GB} GB)")
+        logger.info(f"   - Max concurrent LLM jobs: {MAX_CONCURRENT_LLM_JOBS}, LLM requests: {MAX_CONCURRENT_LLM_REQUESTS}")
         logger.info(f"   - NCT rate limit: {NCT_RATE_LIMIT_PER_SECOND}/s, max concurrent: {NCT_MAX_CONCURRENT_REQUESTS}")
 
+    @property
+    def job_queue(self) -> deque:
+        """Jobs waiting for an LLM job slot, in admission order."""
+        return self.llm_slots.queue
+
     def start_queue_processor(self):
-        """Start the background queue processor."""
+        """Start the background memory watcher (call on app startup)."""
+        if self._memory_blocked is None:
+            self._memory_blocked = asyncio.Event()
         if self._queue_processor_task is None or self._queue_processor_task.done():
             self._queue_processor_task = asyncio.create_task(self._process_queue())
             logger.info("🚀 Queue processor started")
 
     async def _process_queue(self):
-        """Background task that processes the job queue."""
+        """Re-check memory while a queue head waits on it; idle otherwise.
+
+        Slot releases dispatch waiters directly, so this task only exists
+        for the memory condition, which has no event to wait on.
+        """
         while True:
             try:
-                await asyncio.sleep(2)  # Check every 2 seconds
-
-                async with self._queue_lock:
-                    if not self.job_queue:
-                        continue
-
-                    # Check if we can start the next job
-                    job = self.job_queue[0]
-
-                    # Check memory
-                    if not self.memory_monitor.has_sufficient_memory(job.memory_required_gb):
-                        job.status = QueueStatus.WAITING_MEMORY
-                        continue
-
-                    # Check concurrency
-                    if self.llm_semaphore.active_count >= MAX_CONCURRENT_LLM_JOBS:
-                        continue
+                await self._memory_blocked.wait()
+                await asyncio.sleep(MEMORY_RECHECK_SECONDS)
+                self._dispatch()
+            except asyncio.CancelledError:
+                break
+            except Exception as e:
+                logger.error(f"Queue processor error: {e}")
 
-                    # Start the job
-                    job = self.job_queue.popleft()
-                    job.status = QueueStatus.RUNNING
-                    job.started_at = datetime.now()
-                    self.running_jobs[job.job_id] = job
+    def _dispatch(self):
+        """Run admission on both pools and arm/disarm the memory watcher."""
+        self.llm_slots.dispatch()
+        self.trial_slots.dispatch()
+        if self.llm_slots.memory_blocked or self.trial_slots.memory_blocked:
+            self.start_queue_processor()
+            self._memory_blocked.set()
+        elif self._memory_blocked is not None:
+            self._memory_blocked.clear()
+
+    def _on_job_started(self, job: QueuedJob):
+        self.running_jobs[job.job_id] = job
+        logger.info(f"🚀 Starting queued job {job.job_id}")
+        if job.callback:
+            try:
+                asyncio.create_task(job.callback())
+            except Exception as e:
+                logger.error(f"Job callback error: {e}")
 
-                    # Update queue positions
-                    for i, queued_job in enumerate(self.job_queue):
-                        queued_job.queue_position = i + 1
+    def _slot_reason(self, required_memory: float, mem_info: Dict[str, Any]) -> str:
+        if mem_info.get("available_gb", 999.0) < required_memory:
+            return f"Insufficient memory ({mem_info.get('available_gb', '?')}GB available, {required_memory}GB required)"
+        if self.llm_slots.active >= self.llm_slots.capacity:
+            return f"Max concurrent jobs reached ({MAX_CONCURRENT_LLM_JOBS})"
+        return "Waiting behind earlier queued jobs"
 
-                    logger.info(f"🚀 Starting queued job {job.job_id}")
+    async def acquire_llm_slot(
+        self,
+        job_id: str,
+        memory_required_gb: float = None,
+        metadata: Dict = None,
+        on_queued: Optional[Callable[[Dict[str, Any]], None]] = None
+    ) -> Dict[str, Any]:
+        """
+        Wait for an LLM job slot.
 
-                    # Call the callback if provided
-                    if job.callback:
-                        try:
-                            asyncio.create_task(job.callback())
-                        except Exception as e:
-                            logger.error(f"Job callback error: {e}")
+        Returns once the job may start. If it has to queue, ``on_queued`` is
+        called with the same info ``request_llm_slot`` returns (position,
+        reason) so the caller can show it. Cancelling the waiting task
+        removes the job from the queue.
+        """
+        required_memory = memory_required_gb or MEMORY_MIN_FREE_GB
+        job = QueuedJob(
+            job_id=job_id,
+            job_type="llm_annotation",
+            memory_required_gb=required_memory,
+            metadata=metadata or {}
+        )
+        if self.llm_slots.try_acquire(job):
+            self.running_jobs[job_id] = job
+            logger.info(f"✅ LLM slot granted for job {job_id}")
+            return {"granted": True, "active_jobs": self.llm_slots.active}
 
-            except asyncio.CancelledError:
-                break
-            except Exception as e:
-                logger.error(f"Queue processor error: {e}")
+        fut = self.llm_slots.enqueue(job)
+        self._dispatch()
+        if not fut.done():
+            mem_info = self.memory_monitor.get_memory_info()
+            info = {
+                "granted": False,
+                "queued": True,
+                "queue_position": job.queue_position,
+                "reason": self._slot_reason(required_memory, mem_info),
+                "memory_info": mem_info,
+                "active_jobs": self.llm_slots.active
+            }
+            logger.info(f"⏳ Job {job_id} queued at position {job.queue_position}: {info['reason']}")
+            if on_queued:
+                on_queued(info)
+        try:
+            await fut
+        except asyncio.CancelledError:
+            if fut.done() and not fut.cancelled():
+                await self.release_llm_slot(job_id)  # granted as we were cancelled
+            else:
+                self.llm_slots.remove(job)
+                self._dispatch()
+            raise
+        logger.info(f"✅ LLM slot granted for job {job_id} after queueing")
+        return {"granted": True, "active_jobs": self.llm_slots.active}
 
     async def request_llm_slot(
         self,
         job_id: str,
         memory_required_gb: float = None,
-        metadata: Dict = None
+        metadata: Dict = None,
+        callback: Optional[Callable] = None
     ) -> Dict[str, Any]:
         """
-        Request a slot for an LLM job.
+        Request a slot for an LLM job without waiting.
 
         Returns immediately with either:
         - {"granted": True} - Job can start now
-        - {"granted": False, "queue_position": N, "reason": "..."} - Job is queued
+        - {"granted": False, "queue_position": N, "reason": "..."} - Job is queued;
+          ``callback`` is started as soon as the slot is granted. Callers that
+          can simply wait should use ``acquire_llm_slot`` instead.
         """
         required_memory = memory_required_gb or MEMORY_MIN_FREE_GB
-
-        # Check current memory
         mem_info = self.memory_monitor.get_memory_info()
-
-        # Check if we can start immediately
-        can_start = (
-            mem_info.get("sufficient", True) and
-            self.llm_semaphore.active_count < MAX_CONCURRENT_LLM_JOBS
+        job = QueuedJob(
+            job_id=job_id,
+            job_type="llm_annotation",
+            memory_required_gb=required_memory,
+            callback=callback,
+            metadata=metadata or {}
         )
-
-        if can_start:
-            await self.llm_semaphore.acquire()
-            self.running_jobs[job_id] = QueuedJob(
-                job_id=job_id,
-                job_type="llm_annotation",
-                memory_required_gb=required_memory,
-                status=QueueStatus.RUNNING,
-                started_at=datetime.now(),
-                metadata=metadata or {}
-            )
+        if self.llm_slots.try_acquire(job):
+            self.running_jobs[job_id] = job
             logger.info(f"✅ LLM slot granted for job {job_id}")
             return {
                 "granted": True,
                 "memory_info": mem_info,
-                "active_jobs": self.llm_semaphore.active_count
+                "active_jobs": self.llm_slots.active
             }
 
-        # Queue the job
-        async with self._queue_lock:
-            job = QueuedJob(
-                job_id=job_id,
-                job_type="llm_annotation",
-                memory_required_gb=required_memory,
-                queue_position=len(self.job_queue) + 1,
-                metadata=metadata or {}
-            )
-
-            if not mem_info.get("sufficient", True):
-                job.status = QueueStatus.WAITING_MEMORY
-
-            self.job_queue.append(job)
-
-            reason = (
-                f"Insufficient memory ({mem_info.get('available_gb', '?')}GB available, {required_memory}GB required)"
-                if not mem_info.get("sufficient", True)
-                else f"Max concurrent jobs reached ({MAX_CONCURRENT_LLM_JOBS})"
-            )
-
-            logger.info(f"⏳ Job {job_id} queued at position {job.queue_position}: {reason}")
-
-            return {
-                "granted": False,
-                "queued": True,
-                "queue_position": job.queue_position,
-                "reason": reason,
-                "memory_info": mem_info,
-                "active_jobs": self.llm_semaphore.active_count
-            }
+        self.llm_slots.enqueue(job)
+        self._dispatch()
+        reason = self._slot_reason(required_memory, mem_info)
+        logger.info(f"⏳ Job {job_id} queued at position {job.queue_position}: {reason}")
+        return {
+            "granted": False,
+            "queued": True,
+            "queue_position": job.queue_position,
+            "reason": reason,
+            "memory_info": mem_info,
+            "active_jobs": self.llm_slots.active
+        }
 
     async def release_llm_slot(self, job_id: str):
-        """Release an LLM slot when job completes."""
+        """Release an LLM slot when job completes; the next queued job starts at once."""
         if job_id in self.running_jobs:
             del self.running_jobs[job_id]
-            await self.llm_semaphore.release()
+            self.llm_slots.release()
+            self._dispatch()
             logger.info(f"🔓 LLM slot released for job {job_id}")
 
     async def cancel_queued_job(self, job_id: str) -> bool:
         """Cancel a queued job."""
-        async with self._queue_lock:
-            for i, job in enumerate(self.job_queue):
-                if job.job_id == job_id:
-                    self.job_queue.remove(job)
-                    # Update positions
-                    for j, remaining_job in enumerate(self.job_queue):
-                        remaining_job.queue_position = j + 1
-                    logger.info(f"❌ Cancelled queued job {job_id}")
-                    return True
+        for job in list(self.llm_slots.queue):
+            if job.job_id == job_id:
+                self.llm_slots.remove(job)
+                self._dispatch()
+                logger.info(f"❌ Cancelled queued job {job_id}")
+                return True
         return False
 
+    @asynccontextmanager
+    async def trial_slot(self, job_id: str, nct_id: str = "") -> AsyncIterator[None]:
+        """
+        Hold one per-trial LLM request slot.
+
+        Shared FIFO across running jobs, so concurrent jobs interleave their
+        trials. A new trial also waits while free memory is below
+        TRIAL_MEMORY_MIN_FREE_GB.
+        """
+        entry = QueuedJob(
+            job_id=job_id,
+            job_type="llm_request",
+            memory_required_gb=TRIAL_MEMORY_MIN_FREE_GB,
+            metadata={"nct_id": nct_id}
+        )
+        if not self.trial_slots.try_acquire(entry):
+            fut = self.trial_slots.enqueue(entry)
+            self._dispatch()
+            try:
+                await fut
+            except asyncio.CancelledError:
+                if fut.done() and not fut.cancelled():
+                    self.trial_slots.release()
+                else:
+                    self.trial_slots.remove(entry)
+                self._dispatch()
+                raise
+        try:
+            yield
+        finally:
+            self.trial_slots.release()
+            self._dispatch()
+
+    def trial_concurrency(self) -> int:
+        """How many trials one job should keep in flight."""
+        return self.trial_slots.capacity
+
+    def model_gate(self, model: str) -> ModelGate:
+        """The gate that orders requests and resets for ``model`` across jobs."""
+        gate = self._model_gates.get(model)
+        if gate is None:
+            gate = self._model_gates[model] = ModelGate()
+        return gate
+
     def get_queue_status(self) -> Dict[str, Any]:
         """Get current queue status."""
         mem_info = self.memory_monitor.get_memory_info()
@@ -408,6 +646,12 @@ class ResourceManager:
             "running_jobs": len(self.running_jobs),
             "queued_jobs": len(self.job_queue),
             "max_concurrent": MAX_CONCURRENT_LLM_JOBS,
+            "llm_requests": {
+                "active": self.trial_slots.active,
+                "max_concurrent": self.trial_slots.capacity,
+                "waiting": len(self.trial_slots.queue),
+                "waiting_memory": self.trial_slots.memory_blocked,
+            },
             "queue": [
                 {
                     "job_id": job.job_id,
@@ -0,0 +1,199 @@
+#!/usr/bin/env python3
+"""
+Streamed chat replies (chat_api.py POST /chat/message/stream).
+
+No network, no LLM: Ollama is an httpx.MockTransport whose NDJSON body is
+paced by the test. Verifies:
+  1. Event order: the stream-open comment, token events in generation
+     order, then one done event carrying the joined reply, which is also
+     appended to the conversation.
+  2. Keep-alive comments are sent while Ollama stalls (model loading).
+  3. Closing the stream (client disconnect) after the first token closes
+     the Ollama response, stops reading it, and keeps the partial reply.
+  4. An Ollama error line ends the stream with an error event.
+
+Usage:
+    cd <chat_with_llm_dir>
+    python3 scripts/test_chat_stream.py
+"""
+
+from __future__ import annotations
+
+import asyncio
+import json
+import sys
+from pathlib import Path
+
+THIS_DIR = Path(__file__).resolve().parent
+PKG_ROOT = THIS_DIR.parent
+if str(PKG_ROOT) not in sys.path:
+    sys.path.insert(0, str(PKG_ROOT))
+
+import httpx  # noqa: E402
+
+import chat_api  # noqa: E402
+
+
+class OllamaStream(httpx.AsyncByteStream):
+    """NDJSON /api/chat body; ``delays[i]`` seconds before line i."""
+
+    def __init__(self, tokens: list[str], delays: list[float], error: str = ""):
+        self.tokens, self.delays, self.error = tokens, delays, error
+        self.sent = 0
+        self.closed = False
+
+    async def __aiter__(self):
+        for i, token in enumerate(self.tokens):
+            await asyncio.sleep(self.delays[i] if i < len(self.delays) else 0)
+            self.sent += 1
+            yield (json.dumps({"message": {"content": token}, "done": False}) + "\n").encode()
+        if self.error:
+            yield (json.dumps({"error": self.error}) + "\n").encode()
+            return
+        yield (json.dumps({"done": True, "prompt_eval_count": 12, "eval_count": len(self.tokens)}) + "\n").encode()
+
+    async def aclose(self):
+        self.closed = True
+
+
+class FakeOllama:
+    def __init__(self, stream: OllamaStream):
+        self.stream = stream
+        self.requests: list[dict] = []
+
+    async def handle(self, request: httpx.Request) -> httpx.Response:
+        self.requests.append(json.loads(request.content))
+        return httpx.Response(200, stream=self.stream)
+
+
+def _frames(chunks: list[str]) -> list[tuple[str, object]]:
+    """(event, data) per SSE frame; comments come back as ("comment", text)."""
+    frames = []
+    for frame in "".join(chunks).split("\n\n"):
+        if not frame:
+            continue
+        if frame.startswith(":"):
+            frames.append(("comment", frame[1:].strip()))
+            continue
+        fields = dict(line.split(": ", 1) for line in frame.split("\n"))
+        frames.append((fields["event"], json.loads(fields["data"])))
+    return frames
+
+
+def _conversation(conversation_id: str) -> dict:
+    conv = {
+        "id": conversation_id, "model": "stub-model", "annotation_mode": False,
+        "messages": [{"role": "user", "content": "Which peptide is in NCT00000001?"}],
+    }
+    chat_api.conversations[conversation_id] = conv
+    return conv
+
+
+async def _collect(ollama: FakeOllama, conversation_id: str, stop_after_tokens: int = 0):
+    """Run _stream_reply against ``ollama``; optionally hang up after N tokens."""
+    real_client = httpx.AsyncClient
+
+    class FakeClient(real_client):
+        def __init__(self, *args, **kwargs):
+            kwargs["transport"] = httpx.MockTransport(ollama.handle)
+            super().__init__(*args, **kwargs)
+
+    conv = chat_api.conversations[conversation_id]
+    httpx.AsyncClient = FakeClient
+    chunks: list[str] = []
+    stream = chat_api._stream_reply(conversation_id, conv, 0.2)
+    try:
+        async for chunk in stream:
+            chunks.append(chunk)
+            if stop_after_tokens and chunk.startswith("event: token"):
+                stop_after_tokens -= 1
+                if not stop_after_tokens:
+                    break
+    finally:
+        await stream.aclose()
+        httpx.AsyncClient = real_client
+    return _frames(chunks)
+
+
+def test_event_order():
+    conv = _conversation("order")
+    ollama = FakeOllama(OllamaStream(["The ", "peptide ", "is ", "LL-37."], [0.0] * 4))
+    frames = asyncio.run(_collect(ollama, "order"))
+    kinds = [kind for kind, _ in frames]
+    assert kinds == ["comment", "token", "token", "token", "token", "done"], kinds
+    assert [d["content"] for k, d in frames if k == "token"] == ["The ", "peptide ", "is ", "LL-37."]
+    done = frames[-1][1]
+    assert done["message"] == {"role": "assistant", "content": "The peptide is LL-37."}, done
+    assert done["eval_count"] == 4 and done["time_to_first_token_seconds"] is not None
+    assert conv["messages"][-1] == {"role": "assistant", "content": "The peptide is LL-37."}
+    assert ollama.requests[0]["stream"] is True
+    print("  ✓ open comment, tokens in order, then done")
+
+
+def test_keepalive_during_stall():
+    _conversation("stall")
+    chat_api.STREAM_KEEPALIVE_SECONDS, keepalive = 0.02, chat_api.STREAM_KEEPALIVE_SECONDS
+    try:
+        ollama = FakeOllama(OllamaStream(["slow ", "start"], [0.15, 0.0]))
+        frames = asyncio.run(_collect(ollama, "stall"))
+    finally:
+        chat_api.STREAM_KEEPALIVE_SECONDS = keepalive
+    kinds = [kind if kind != "comment" else data for kind, data in frames]
+    first_token = kinds.index("token")
+    assert kinds[0] == "stream open", kinds
+    assert kinds[1:first_token].count("keep-alive") >= 3, kinds
+    assert kinds[first_token:] == ["token", "token", "done"], kinds
+    print(f"  ✓ {kinds.count('keep-alive')} keep-alives while Ollama stalled")
+
+
+def test_cancel_stops_upstream():
+    conv = _conversation("cancel")
+    upstream = OllamaStream([f"t{i} " for i in range(50)], [0.01] * 50)
+    frames = asyncio.run(_collect(FakeOllama(upstream), "cancel", stop_after_tokens=2))
+    assert [k for k, _ in frames] == ["comment", "token", "token"], frames
+    assert upstream.closed, "Ollama response was not closed"
+    sent = upstream.sent
+    asyncio.run(asyncio.sleep(0.05))
+    assert upstream.sent == sent and sent < 50, sent
+    assert conv["messages"][-1] == {"role": "assistant", "content": "t0 t1 "}, conv["messages"][-1]
+    print(f"  ✓ disconnect closed Ollama after {sent}/50 lines; partial reply kept")
+
+
+def test_ollama_error_line():
+    _conversation("error")
+    ollama = FakeOllama(OllamaStream(["partial"], [0.0], error="model crashed"))
+    frames = asyncio.run(_collect(ollama, "error"))
+    assert [k for k, _ in frames] == ["comment", "token", "error"], frames
+    assert frames[-1][1]["detail"] == "model crashed"
+    print("  ✓ Ollama error ends the stream with an error event")
+
+
+def main() -> int:
+    print("Chat streaming tests")
+    print("-" * 60)
+    tests = [
+        test_event_order,
+        test_keepalive_during_stall,
+        test_cancel_stops_upstream,
+        test_ollama_error_line,
+    ]
+    failed = 0
+    for t in tests:
+        try:
+            t()
+        except AssertionError as e:
+            print(f"  ✗ {t.__name__}: {e}")
+            failed += 1
+        except Exception as e:
+            print(f"  ✗ {t.__name__}: {type(e).__name__}: {e}")
+            failed += 1
+    print("-" * 60)
+    if failed:
+        print(f"FAIL: {failed}/{len(tests)}")
+        return 1
+    print(f"OK: {len(tests)}/{len(tests)}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
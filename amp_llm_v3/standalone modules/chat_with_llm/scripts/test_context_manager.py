@@ -0,0 +1,164 @@
+#!/usr/bin/env python3
+"""
+Unit tests for token-budgeted chat prompts (context_manager.py).
+
+No network, no LLM: the summarizer is a stub that records what it is asked
+to fold. Verifies:
+  1. Over a long conversation every prompt fits the num_ctx budget (minus
+     the reply reserve), measured with the manager's own estimate.
+  2. Older turns are folded into the running summary exactly once, in
+     order, and the summary rides along as one system message.
+  3. The most recent CHAT_KEEP_RECENT_MESSAGES messages are always sent
+     verbatim; a retried turn doesn't summarize again; a failing summarizer
+     degrades to a sliding window that says how much it left out.
+
+Usage:
+    cd <chat_with_llm_dir>
+    python3 scripts/test_context_manager.py
+"""
+
+from __future__ import annotations
+
+import asyncio
+import sys
+from pathlib import Path
+
+THIS_DIR = Path(__file__).resolve().parent
+PKG_ROOT = THIS_DIR.parent
+if str(PKG_ROOT) not in sys.path:
+    sys.path.insert(0, str(PKG_ROOT))
+
+from context_manager import SUMMARY_PREFIX, ContextManager  # noqa: E402
+
+MODEL = "stub-model"
+
+
+class StubSummarizer:
+    def __init__(self, fail: bool = False):
+        self.fail = fail
+        self.folded: list[str] = []
+        self.calls = 0
+
+    async def __call__(self, model, summary, messages):
+        self.calls += 1
+        if self.fail:
+            raise RuntimeError("summarizer down")
+        self.folded.extend(m["content"] for m in messages)
+        return f"summary #{self.calls} through {messages[-1]['content'][:12]}"
+
+
+def _manager() -> ContextManager:
+    # budget = 1024 - 256 = 768 tokens; ~55 tokens per message below.
+    return ContextManager(
+        num_ctx=1024, response_reserve=256, summary_tokens=64,
+        keep_recent=4, low_water=0.6, chars_per_token=4.0,
+    )
+
+
+def _message(i: int) -> dict:
+    role = "user" if i % 2 == 0 else "assistant"
+    return {"role": role, "content": f"msg-{i:03d} " + "x" * 200}
+
+
+def _conversation(manager, summarize, turns: int, conversation_id: str = "c1"):
+    """Yield (history, prompt) after each user turn."""
+    history: list[dict] = []
+
+    async def run():
+        out = []
+        for turn in range(turns):
+            history.append(_message(2 * turn))
+            prompt = await manager.build_prompt(conversation_id, MODEL, list(history), summarize)
+            out.append((list(history), prompt))
+            history.append(_message(2 * turn + 1))
+        return out
+
+    return asyncio.run(run())
+
+
+def test_prompt_stays_within_budget():
+    manager, summarize = _manager(), StubSummarizer()
+    for history, prompt in _conversation(manager, summarize, turns=40):
+        tokens = manager.estimate(MODEL, prompt)
+        assert tokens <= manager.budget, (len(history), tokens, manager.budget)
+    assert manager.stats()["folds"] > 0
+    full = manager.estimate(MODEL, history)
+    assert full > 5 * manager.budget, full  # the history itself is far over budget
+    print(f"  ✓ 40 turns, every prompt <= {manager.budget} tokens (history ~{full})")
+
+
+def test_older_turns_folded_into_summary():
+    manager, summarize = _manager(), StubSummarizer()
+    history, prompt = _conversation(manager, summarize, turns=40)[-1]
+    sent = [m["content"] for m in prompt if m["role"] != "system"]
+    # Every message is either folded (once, in order) or still sent.
+    assert summarize.folded + sent == [m["content"] for m in history], summarize.folded[:3]
+    system = [m for m in prompt if m["role"] == "system"]
+    assert len(system) == 1 and prompt[0] is system[0], prompt[:2]
+    last_folded = summarize.folded[-1][:12]
+    assert system[0]["content"] == SUMMARY_PREFIX + f"summary #{summarize.calls} through {last_folded}", system
+    assert manager.stats()["folded_messages"] == len(summarize.folded)
+    print(f"  ✓ {len(summarize.folded)} older messages folded in order, {len(sent)} sent")
+
+
+def test_recent_turns_kept_verbatim():
+    manager, summarize = _manager(), StubSummarizer()
+    for history, prompt in _conversation(manager, summarize, turns=40):
+        tail = history[-manager.keep_recent:]
+        assert prompt[-len(tail):] == tail, len(history)
+        # Nothing after the summary is altered or reordered.
+        body = [m for m in prompt if m["role"] != "system"]
+        assert body == history[len(history) - len(body):]
+    print("  ✓ last keep_recent messages always sent verbatim")
+
+
+def test_retry_and_summarizer_failure():
+    manager, summarize = _manager(), StubSummarizer()
+    first = _conversation(manager, summarize, turns=20)
+    calls = summarize.calls
+    # Replaying the same turns (window state lost, e.g. a retried request
+    # after forget) folds the same chunks, which hit the summary cache.
+    manager.forget("c1")
+    again = _conversation(manager, summarize, turns=20)
+    assert summarize.calls == calls, (calls, summarize.calls)
+    assert manager.stats()["summary_cache_hits"] == calls
+    assert [p for _, p in again] == [p for _, p in first]
+
+    manager, broken = _manager(), StubSummarizer(fail=True)
+    history, prompt = _conversation(manager, broken, turns=20)[-1]
+    assert manager.estimate(MODEL, prompt) <= manager.budget
+    note = prompt[0]["content"]
+    assert prompt[0]["role"] == "system" and "could not be summarized" in note, note
+    assert prompt[-manager.keep_recent:] == history[-manager.keep_recent:]
+    print("  ✓ retried folds reuse summaries; failed summaries become a sliding window")
+
+
+def main() -> int:
+    print("Chat context manager tests")
+    print("-" * 60)
+    tests = [
+        test_prompt_stays_within_budget,
+        test_older_turns_folded_into_summary,
+        test_recent_turns_kept_verbatim,
+        test_retry_and_summarizer_failure,
+    ]
+    failed = 0
+    for t in tests:
+        try:
+            t()
+        except AssertionError as e:
+            print(f"  ✗ {t.__name__}: {e}")
+            failed += 1
+        except Exception as e:
+            print(f"  ✗ {t.__name__}: {type(e).__name__}: {e}")
+            failed += 1
+    print("-" * 60)
+    if failed:
+        print(f"FAIL: {failed}/{len(tests)}")
+        return 1
+    print(f"OK: {len(tests)}/{len(tests)}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
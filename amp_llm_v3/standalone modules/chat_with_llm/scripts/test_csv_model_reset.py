@@ -0,0 +1,201 @@
+#!/usr/bin/env python3
+"""
+Model resets in concurrent CSV jobs (chat_api.process_csv_job).
+
+No network, no LLM: the runner and Ollama are httpx.MockTransport fakes.
+Verifies:
+  1. A model unload (keep_alive: 0) never starts while another trial's
+     runner request is in flight, and no runner request starts between the
+     unload and the reload.
+  2. Failures are counted per trial: good trials next to bad ones finish,
+     and each bad trial gets exactly its own hard reset.
+  3. ModelGate: a reset waits for in-flight requests, requests queue behind
+     a waiting reset, and a reset queued behind another one is skipped.
+
+Usage:
+    cd <chat_with_llm_dir>
+    python3 scripts/test_csv_model_reset.py
+"""
+
+from __future__ import annotations
+
+import asyncio
+import json
+import sys
+import tempfile
+from pathlib import Path
+
+THIS_DIR = Path(__file__).resolve().parent
+PKG_ROOT = THIS_DIR.parent
+if str(PKG_ROOT) not in sys.path:
+    sys.path.insert(0, str(PKG_ROOT))
+
+import httpx  # noqa: E402
+
+import chat_api  # noqa: E402
+from resource_manager import ModelGate  # noqa: E402
+
+BAD = {"NCT00000003", "NCT00000006"}
+GOOD_PARSED = {"classification": "AMP", "delivery_mode": "IV", "outcome": "Positive", "peptide": "True"}
+
+
+class FakeServices:
+    """Runner /batch-annotate and Ollama /api/generate, recording overlaps."""
+
+    def __init__(self):
+        self.runner_in_flight = 0
+        self.resetting = False
+        self.violations: list[str] = []
+        self.unloads = 0
+        self.runner_calls: dict[str, int] = {}
+
+    async def handle(self, request: httpx.Request) -> httpx.Response:
+        path = request.url.path
+        if path == "/health":
+            return httpx.Response(200, json={"status": "healthy"})
+        if path == "/batch-annotate":
+            nct_id = json.loads(request.content)["nct_ids"][0]
+            self.runner_calls[nct_id] = self.runner_calls.get(nct_id, 0) + 1
+            if self.resetting:
+                self.violations.append(f"{nct_id} started during a model reset")
+            self.runner_in_flight += 1
+            try:
+                await asyncio.sleep(0.01)
+            finally:
+                self.runner_in_flight -= 1
+            if nct_id in BAD:
+                result = {"nct_id": nct_id, "annotation": "# Instruction: ...", "parsed_data": {}}
+            else:
+                result = {"nct_id": nct_id, "annotation": "ok", "parsed_data": GOOD_PARSED}
+            return httpx.Response(200, json={"results": [result]})
+        if path == "/api/generate":
+            if json.loads(request.content).get("keep_alive") == 0:
+                self.unloads += 1
+                if self.runner_in_flight:
+                    self.violations.append(
+                        f"unload with {self.runner_in_flight} runner request(s) in flight"
+                    )
+                self.resetting = True
+            else:
+                self.resetting = False
+            return httpx.Response(200, json={"response": ""})
+        return httpx.Response(404)
+
+
+def _run_job(fake: FakeServices, nct_ids: list[str], model: str) -> "chat_api.AnnotationJob":
+    # Each test uses its own model name: a model's gate belongs to the event
+    # loop that first used it, and every asyncio.run() starts a new one.
+    real_client, real_sleep = httpx.AsyncClient, asyncio.sleep
+
+    class FakeClient(real_client):
+        def __init__(self, *args, **kwargs):
+            kwargs["transport"] = httpx.MockTransport(fake.handle)
+            super().__init__(*args, **kwargs)
+
+    async def fast_sleep(delay, *args):
+        return await real_sleep(min(delay, 0.01), *args)
+
+    job_id = "reset-test"
+    job = chat_api.AnnotationJob(job_id=job_id, model=model)
+    chat_api.job_manager.jobs[job_id] = job
+    csv_bytes = ("nct_id\n" + "\n".join(nct_ids) + "\n").encode()
+    output_dir = chat_api.OUTPUT_DIR
+    httpx.AsyncClient, asyncio.sleep = FakeClient, fast_sleep
+    chat_api.OUTPUT_DIR = Path(tempfile.mkdtemp())
+    try:
+        asyncio.run(chat_api.process_csv_job(
+            job_id, csv_bytes, "trials.csv", model, 0.1, "no-conversation",
+        ))
+    finally:
+        httpx.AsyncClient, asyncio.sleep = real_client, real_sleep
+        chat_api.OUTPUT_DIR = output_dir
+        chat_api.job_manager.jobs.pop(job_id, None)
+    return job
+
+
+def test_reset_never_overlaps_in_flight_trial():
+    fake = FakeServices()
+    nct_ids = [f"NCT{n:08d}" for n in range(1, 13)]
+    job = _run_job(fake, nct_ids, "fake-model-overlap")
+    assert job.status == chat_api.JobStatus.COMPLETED, (job.status, job.error)
+    assert fake.violations == [], fake.violations
+    assert job.result["successful"] == 10 and job.result["failed"] == 2, job.result
+    assert fake.unloads > 0, "bad trials should have reset the model"
+    print(f"  ✓ {fake.unloads} unloads, none overlapping a runner request")
+
+
+def test_failures_counted_per_trial():
+    fake = FakeServices()
+    nct_ids = [f"NCT{n:08d}" for n in range(1, 9)]
+    job = _run_job(fake, nct_ids, "fake-model-per-trial")
+    # Good trials succeed first time; bad ones use all three attempts.
+    assert all(fake.runner_calls[n] == 1 for n in nct_ids if n not in BAD), fake.runner_calls
+    assert all(fake.runner_calls[n] == 3 for n in BAD), fake.runner_calls
+    assert {e["nct_id"] for e in job.result["errors"]} == BAD, job.result["errors"]
+    # Per bad trial: two soft resets (attempts 1-2) plus one hard reset,
+    # minus any reset skipped because another finished while it waited.
+    assert 1 <= fake.unloads <= 3 * len(BAD), fake.unloads
+    print("  ✓ failures counted per trial")
+
+
+def test_model_gate_ordering():
+    async def scenario():
+        gate = ModelGate()
+        events: list[str] = []
+        release = asyncio.Event()
+
+        async def request(name, hold=None):
+            async with gate.request():
+                events.append(f"{name}+")
+                if hold:
+                    await hold.wait()
+                events.append(f"{name}-")
+
+        async def reset(name):
+            async with gate.reset() as needed:
+                events.append(f"{name}:{'reset' if needed else 'skip'}")
+
+        first = asyncio.create_task(request("a", hold=release))
+        await asyncio.sleep(0)
+        resets = [asyncio.create_task(reset("r1")), asyncio.create_task(reset("r2"))]
+        await asyncio.sleep(0)
+        late = asyncio.create_task(request("b"))
+        await asyncio.sleep(0.01)
+        assert events == ["a+"], events  # resets wait for a; b waits behind them
+        release.set()
+        await asyncio.gather(first, late, *resets)
+        return events
+
+    events = asyncio.run(scenario())
+    assert events == ["a+", "a-", "r1:reset", "r2:skip", "b+", "b-"], events
+    print("  ✓ ModelGate drains requests, queues new ones, coalesces resets")
+
+
+def main() -> int:
+    print("CSV job model reset tests")
+    print("-" * 60)
+    tests = [
+        test_reset_never_overlaps_in_flight_trial,
+        test_failures_counted_per_trial,
+        test_model_gate_ordering,
+    ]
+    failed = 0
+    for t in tests:
+        try:
+            t()
+        except AssertionError as e:
+            print(f"  ✗ {t.__name__}: {e}")
+            failed += 1
+        except Exception as e:
+            print(f"  ✗ {t.__name__}: {type(e).__name__}: {e}")
+            failed += 1
+    print("-" * 60)
+    if failed:
+        print(f"FAIL: {failed}/{len(tests)}")
+        return 1
+    print(f"OK: {len(tests)}/{len(tests)}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -12,6 +12,7 @@ Features:
 - Async processing for performance
 - Dynamic API registry for easy extensibility
 - NCT ID-based file naming with duplicate detection
+- Search status and result versions persisted in SQLite (nct_store.py)
 
 Installation:
     pip install fastapi uvicorn aiohttp requests python-dotenv beautifulsoup4
@@ -22,6 +23,8 @@ Usage:
 API Endpoints:
     GET /api/registry - List all available APIs
     POST /api/search/{nct_id}
+    POST /api/search/batch - Start searches for several NCT IDs at once
+    POST /api/search/batch/wait - Long-poll until those searches finish
     GET /api/search/{nct_id}/status
     GET /api/results/{nct_id}
     POST /api/results/{nct_id}/check-duplicate - Check if file exists
@@ -50,7 +53,7 @@ else:
     load_dotenv()  # Try default locations
 
 from fastapi import FastAPI, HTTPException, BackgroundTasks
-from fastapi.responses import JSONResponse, FileResponse
+from fastapi.responses import JSONResponse, Response
 from fastapi.middleware.cors import CORSMiddleware
 from pydantic import BaseModel, Field
 from typing import Optional, List, Dict, Any
@@ -58,15 +61,18 @@ from datetime import datetime
 import asyncio
 import json
 import logging
-import re
 
 # Port configuration from .env
 NCT_SERVICE_PORT = int(os.getenv("NCT_SERVICE_PORT", "9002"))
 MAIN_SERVER_PORT = int(os.getenv("MAIN_SERVER_PORT", "9000"))
 
 from nct_core import NCTSearchEngine
-from nct_models import SearchRequest, SearchResponse, SearchStatus, SearchSummary, SearchConfig
+from nct_models import (
+    SearchRequest, SearchResponse, SearchStatus, SearchSummary, SearchConfig,
+    BatchSearchRequest, BatchWaitRequest,
+)
 from nct_api_registry import APIRegistry
+from nct_store import parse_filename, store_from_env, version_filename
 
 # Configure logging
 logging.basicConfig(
@@ -101,8 +107,25 @@ app.add_middleware(
 # Global search engine instance
 search_engine = NCTSearchEngine()
 
-# In-memory status tracking (use Redis/database in production)
-search_status_db: Dict[str, SearchStatus] = {}
+# Search status and result versions, persisted in results/nct_results.db
+# (see nct_store.py). search_status_db holds the live status objects the
+# search engine updates; the store is written at each status transition.
+result_store = store_from_env()
+search_status_db: Dict[str, SearchStatus] = result_store.load_statuses()
+
+# Set when a search finishes (completed or failed), so callers can await
+# completion instead of polling /status. Replaced when a search is re-queued,
+# and dropped once set (later waits see the finished status instead).
+search_done_events: Dict[str, asyncio.Event] = {}
+
+# Searches started by the batch endpoint (kept so they aren't collected).
+_batch_tasks: set = set()
+
+# Batch searches running at once; the rest stay "queued" until a slot frees.
+# A 500-ID batch would otherwise open hundreds of searches against the same
+# upstream APIs together.
+MAX_CONCURRENT_SEARCHES = int(os.getenv("NCT_MAX_CONCURRENT_SEARCHES", "20"))
+_search_slots = asyncio.Semaphore(MAX_CONCURRENT_SEARCHES)
 
 
 # ============================================================================
@@ -145,77 +168,83 @@ class SaveResponse(BaseModel):
 # Helper Functions for File Management
 # ============================================================================
 
-def get_next_version_filename(nct_id: str, results_dir: Path) -> str:
+def get_next_version_filename(nct_id: str) -> str:
     """
     Get the next available versioned filename for an NCT ID.
     
     Args:
         nct_id: The NCT identifier (e.g., NCT12345678)
-        results_dir: Directory where results are stored
         
     Returns:
         Filename like "NCT12345678.json" or "NCT12345678_1.json"
     """
-    base_filename = f"{nct_id}.json"
-    base_path = results_dir / base_filename
-    
-    # If base file doesn't exist, use it
-    if not base_path.exists():
-        return base_filename
-    
-    # Find next available version number
-    version = 1
-    while True:
-        versioned_filename = f"{nct_id}_{version}.json"
-        versioned_path = results_dir / versioned_filename
-        if not versioned_path.exists():
-            return versioned_filename
-        version += 1
-        
-        # Safety check to prevent infinite loops
-        if version > 1000:
-            raise ValueError(f"Too many versions for {nct_id}")
+    # One index lookup; pruned versions' numbers are not reused.
+    latest = result_store.latest_version(nct_id)
+    return version_filename(nct_id, 0 if latest is None else latest + 1)
 
 
-def find_existing_files(nct_id: str, results_dir: Path) -> List[str]:
+def find_existing_files(nct_id: str) -> List[str]:
     """
     Find all existing files for a given NCT ID.
     
     Args:
         nct_id: The NCT identifier
-        results_dir: Directory where results are stored
         
     Returns:
         List of existing filenames (base + all versions)
     """
-    pattern = re.compile(rf"^{re.escape(nct_id)}(_\d+)?\.json$")
-    existing = []
+    return result_store.versions(nct_id)
+
+
+def _save_status(status: SearchStatus) -> None:
+    """Persist a status transition; a store error must not fail the search."""
+    try:
+        result_store.save_status(status)
+    except Exception as e:
+        logger.error(f"Could not persist status for {status.job_id}: {e}")
+
+
+def _store_save(nct_id: str, results: Any, request: SaveRequest, message: str) -> SaveResponse:
+    """Store ``results`` under the filename a save request asks for."""
+    # Determine target filename
+    if request.custom_filename:
+        # Use custom filename if provided
+        target_filename = f"{request.custom_filename}.json"
+    elif request.overwrite:
+        # Overwrite base file
+        target_filename = f"{nct_id}.json"
+    else:
+        # Get next versioned filename
+        target_filename = get_next_version_filename(nct_id)
     
-    if results_dir.exists():
-        for file in results_dir.iterdir():
-            if file.is_file() and pattern.match(file.name):
-                existing.append(file.name)
+    parsed = parse_filename(target_filename)
+    version = parsed[1] if parsed and parsed[0] == nct_id else None
+    was_duplicate = result_store.exists(target_filename)
     
-    # Sort to show base file first, then versions in order
-    existing.sort(key=lambda x: (
-        0 if x == f"{nct_id}.json" else int(x.split('_')[1].split('.')[0])
-    ))
+    try:
+        file_size = result_store.put(target_filename, nct_id, results, version)
+        result_store.prune()
+    except Exception as e:
+        logger.error(f"Error saving results for {nct_id}: {e}")
+        raise HTTPException(
+            status_code=500,
+            detail=f"Error saving results: {str(e)}"
+        )
     
-    return existing
-
-
-def get_file_info(filepath: Path) -> Dict[str, Any]:
-    """Get information about a file."""
-    if not filepath.exists():
-        return None
+    logger.info(
+        f"Saved results for {nct_id} to {target_filename} "
+        f"({'overwrite' if was_duplicate and request.overwrite else 'new file'})"
+    )
     
-    stat = filepath.stat()
-    return {
-        "size_bytes": stat.st_size,
-        "size_formatted": _format_file_size(stat.st_size),
-        "modified": datetime.fromtimestamp(stat.st_mtime).isoformat(),
-        "created": datetime.fromtimestamp(stat.st_ctime).isoformat()
-    }
+    return SaveResponse(
+        success=True,
+        filename=target_filename,
+        filepath=f"{result_store.path.absolute()}#{target_filename}",
+        message=f"{message} {target_filename}",
+        size_bytes=file_size,
+        was_duplicate=was_duplicate,
+        overwritten=request.overwrite and was_duplicate
+    )
 
 
 # ============================================================================
@@ -244,6 +273,7 @@ async def shutdown_event():
     """Cleanup on shutdown."""
     logger.info("Shutting down NCT Lookup API")
     await search_engine.close()
+    result_store.close()
 
 
 @app.get("/")
@@ -280,6 +310,7 @@ async def health_check():
         "status": "healthy",
         "timestamp": datetime.utcnow().isoformat(),
         "active_searches": len([s for s in search_status_db.values() if s.status == "running"]),
+        "result_store": result_store.stats(),
         "registered_apis": len(APIRegistry.get_all_apis())
     }
 
@@ -325,23 +356,8 @@ async def get_api_registry():
     }
 
 
-@app.post("/api/search/{nct_id}", response_model=SearchResponse)
-async def search_nct(
-    nct_id: str,
-    request: SearchRequest,
-    background_tasks: BackgroundTasks
-):
-    """
-    Initiate NCT search across databases.
-    
-    Args:
-        nct_id: NCT number (e.g., NCT12345678)
-        request: Search configuration with selected databases
-        
-    Returns:
-        Search response with job ID and initial status
-    """
-    # Validate NCT format
+def _validate_nct_id(nct_id: str) -> str:
+    """Normalize an NCT ID, raising 400 when it isn't NCT + 8 digits."""
     nct_id = nct_id.upper().strip()
     if not nct_id.startswith("NCT") or len(nct_id) != 11:
         raise HTTPException(
@@ -355,8 +371,11 @@ async def search_nct(
             status_code=400,
             detail=f"Invalid NCT format: {nct_id}. The 8 characters after 'NCT' must be digits"
         )
-    
-    # Validate selected databases
+    return nct_id
+
+
+def _validate_databases(request: SearchRequest) -> None:
+    """Raise 400 when the request names databases the registry doesn't know."""
     if request.databases:
         valid_ids, invalid_ids = APIRegistry.validate_api_ids(request.databases)
         if invalid_ids:
@@ -365,11 +384,18 @@ async def search_nct(
                 status_code=400,
                 detail=f"Invalid database IDs: {invalid_ids}. Available: {available}"
             )
-    
+
+
+def _queue_search(nct_id: str, request: SearchRequest, schedule) -> SearchResponse:
+    """
+    Start a search for a validated NCT ID unless one is running or done.
+
+    ``schedule(func, *args)`` runs the search in the background.
+    """
     # Check if search already exists (unless force=True)
     if not request.force and nct_id in search_status_db:
         existing = search_status_db[nct_id]
-        if existing.status == "running":
+        if existing.status in ("queued", "running"):
             return SearchResponse(
                 job_id=nct_id,
                 status=existing.status,
@@ -378,8 +404,7 @@ async def search_nct(
             )
         elif existing.status == "completed":
             # Verify results file actually exists before claiming completion
-            results_file = Path(f"results/{nct_id}.json")
-            if results_file.exists():
+            if result_store.exists(f"{nct_id}.json"):
                 return SearchResponse(
                     job_id=nct_id,
                     status=existing.status,
@@ -396,9 +421,7 @@ async def search_nct(
         if nct_id in search_status_db:
             del search_status_db[nct_id]
         # Also delete cached results file
-        results_file = Path(f"results/{nct_id}.json")
-        if results_file.exists():
-            results_file.unlink()
+        if result_store.delete([f"{nct_id}.json"]):
             logger.info(f"🗑️ Deleted cached results for {nct_id} (force=True)")
     
     # Create status entry
@@ -409,13 +432,11 @@ async def search_nct(
         databases_to_search=_get_database_list(request)
     )
     search_status_db[nct_id] = status
+    search_done_events[nct_id] = asyncio.Event()
+    _save_status(status)
     
     # Start background search
-    background_tasks.add_task(
-        _execute_search,
-        nct_id,
-        request
-    )
+    schedule(_execute_search, nct_id, request)
     
     logger.info(f"Queued search for {nct_id} with databases: {status.databases_to_search}")
     
@@ -427,6 +448,123 @@ async def search_nct(
     )
 
 
+async def _bounded(func, *args):
+    async with _search_slots:
+        await func(*args)
+
+
+def _spawn(func, *args) -> None:
+    """Run a search as its own task, at most MAX_CONCURRENT_SEARCHES at once."""
+    task = asyncio.create_task(_bounded(func, *args))
+    _batch_tasks.add(task)
+    task.add_done_callback(_batch_tasks.discard)
+
+
+# Declared before /api/search/{nct_id} so "batch" isn't taken for an NCT ID.
+@app.post("/api/search/batch")
+async def search_batch(request: BatchSearchRequest):
+    """
+    Initiate searches for several NCT IDs in one request.
+    
+    Each valid ID is queued exactly as POST /api/search/{nct_id} would queue
+    it, and all searches run concurrently. An invalid ID is reported under
+    ``errors`` without failing the rest.
+    
+    Returns:
+        ``{"jobs": [{"nct_id", "job_id", "status", "message"}], "errors": [{"nct_id", "error"}]}``
+    """
+    _validate_databases(request)
+    
+    jobs, errors = [], []
+    for raw_id in dict.fromkeys(request.nct_ids):
+        try:
+            nct_id = _validate_nct_id(raw_id)
+        except HTTPException as e:
+            errors.append({"nct_id": raw_id, "error": e.detail})
+            continue
+        response = _queue_search(nct_id, request, _spawn)
+        jobs.append({
+            "nct_id": nct_id,
+            "job_id": response.job_id,
+            "status": response.status,
+            "message": response.message,
+        })
+    
+    logger.info(f"Batch search: {len(jobs)} queued or cached, {len(errors)} rejected")
+    return {"jobs": jobs, "errors": errors}
+
+
+@app.post("/api/search/batch/wait")
+async def wait_for_batch(request: BatchWaitRequest):
+    """
+    Long-poll a set of searches.
+    
+    Answers as soon as every listed search has finished, or after
+    ``timeout`` seconds with whatever has finished by then. Callers repeat
+    the request with the IDs still ``pending``.
+    
+    Returns:
+        ``{"completed": [...], "failed": [{"nct_id", "error"}], "pending": [...]}``.
+        Completed entries are the GET /api/results/{nct_id} body when
+        ``include_results`` is set, otherwise ``{"nct_id"}``.
+    """
+    nct_ids = list(dict.fromkeys(n.upper().strip() for n in request.nct_ids))
+    if request.timeout > 0:
+        # Coroutines are only created when they'll be awaited.
+        waits = [
+            search_done_events[n].wait()
+            for n in nct_ids
+            if n in search_done_events
+            and n in search_status_db
+            and search_status_db[n].status in ("queued", "running")
+        ]
+        if waits:
+            try:
+                await asyncio.wait_for(asyncio.gather(*waits), request.timeout)
+            except asyncio.TimeoutError:
+                pass
+    
+    completed, failed, pending = [], [], []
+    for nct_id in nct_ids:
+        status = search_status_db.get(nct_id)
+        if status is None:
+            failed.append({"nct_id": nct_id, "error": f"No search found for {nct_id}"})
+        elif status.status in ("queued", "running"):
+            pending.append(nct_id)
+        elif status.status == "failed":
+            failed.append({"nct_id": nct_id, "error": status.error or "Search failed"})
+        elif not request.include_results:
+            completed.append({"nct_id": nct_id})
+        else:
+            try:
+                completed.append(_load_results(nct_id))
+            except HTTPException as e:
+                failed.append({"nct_id": nct_id, "error": e.detail})
+    
+    return {"completed": completed, "failed": failed, "pending": pending}
+
+
+@app.post("/api/search/{nct_id}", response_model=SearchResponse)
+async def search_nct(
+    nct_id: str,
+    request: SearchRequest,
+    background_tasks: BackgroundTasks
+):
+    """
+    Initiate NCT search across databases.
+    
+    Args:
+        nct_id: NCT number (e.g., NCT12345678)
+        request: Search configuration with selected databases
+        
+    Returns:
+        Search response with job ID and initial status
+    """
+    nct_id = _validate_nct_id(nct_id)
+    _validate_databases(request)
+    return _queue_search(nct_id, request, background_tasks.add_task)
+
+
 @app.get("/api/search/{nct_id}/status")
 async def get_search_status(nct_id: str):
     """
@@ -471,20 +609,21 @@ async def get_results(nct_id: str):
     Returns:
         Complete search results with summary
     """
-    nct_id = nct_id.upper().strip()
-    
+    return _load_results(nct_id.upper().strip())
+
+
+def _load_results(nct_id: str) -> Dict[str, Any]:
+    """Saved results for a finished search, with summary and file info."""
     # Check if results exist
-    results_file = Path(f"results/{nct_id}.json")
-    if not results_file.exists():
+    filename = f"{nct_id}.json"
+    results = result_store.get(filename)
+    if results is None:
         raise HTTPException(
             status_code=404,
             detail=f"Results file not found for {nct_id}"
         )
     
     try:
-        with open(results_file, 'r', encoding='utf-8') as f:
-            results = json.load(f)
-        
         # Generate summary
         summary = _generate_summary(results)
         
@@ -492,7 +631,7 @@ async def get_results(nct_id: str):
             "nct_id": nct_id,
             "summary": summary,
             "results": results,
-            "file_info": get_file_info(results_file)
+            "file_info": result_store.file_info(filename)
         }
     except Exception as e:
         logger.error(f"Error loading results for {nct_id}: {e}")
@@ -518,11 +657,9 @@ async def check_duplicate(nct_id: str):
         Information about existing files and suggested filename
     """
     nct_id = nct_id.upper().strip()
-    results_dir = Path("results")
-    results_dir.mkdir(exist_ok=True)
     
     # Find existing files
-    existing_files = find_existing_files(nct_id, results_dir)
+    existing_files = find_existing_files(nct_id)
     base_filename = f"{nct_id}.json"
     base_exists = base_filename in existing_files
     
@@ -536,7 +673,7 @@ async def check_duplicate(nct_id: str):
         )
     
     # Get suggested filename (next available version)
-    suggested = get_next_version_filename(nct_id, results_dir)
+    suggested = get_next_version_filename(nct_id)
     
     return DuplicateCheckResponse(
         exists=True,
@@ -564,68 +701,16 @@ async def save_results(nct_id: str, request: SaveRequest):
         Save response with file information
     """
     nct_id = nct_id.upper().strip()
-    results_dir = Path("results")
-    results_dir.mkdir(exist_ok=True)
     
     # Load results from temporary location
-    temp_results_file = results_dir / f"{nct_id}.json"
-    if not temp_results_file.exists():
+    results = result_store.get(f"{nct_id}.json")
+    if results is None:
         raise HTTPException(
             status_code=404,
             detail=f"No results found for {nct_id}. Please run a search first."
         )
     
-    try:
-        with open(temp_results_file, 'r', encoding='utf-8') as f:
-            results = json.load(f)
-    except Exception as e:
-        raise HTTPException(
-            status_code=500,
-            detail=f"Error loading results: {str(e)}"
-        )
-    
-    # Determine target filename
-    if request.custom_filename:
-        # Use custom filename if provided
-        target_filename = f"{request.custom_filename}.json"
-    elif request.overwrite:
-        # Overwrite base file
-        target_filename = f"{nct_id}.json"
-    else:
-        # Get next versioned filename
-        target_filename = get_next_version_filename(nct_id, results_dir)
-    
-    target_path = results_dir / target_filename
-    was_duplicate = target_path.exists()
-    
-    # Save the file
-    try:
-        with open(target_path, 'w', encoding='utf-8') as f:
-            json.dump(results, f, indent=2, ensure_ascii=False)
-        
-        file_size = target_path.stat().st_size
-        
-        logger.info(
-            f"Saved results for {nct_id} to {target_filename} "
-            f"({'overwrite' if was_duplicate and request.overwrite else 'new file'})"
-        )
-        
-        return SaveResponse(
-            success=True,
-            filename=target_filename,
-            filepath=str(target_path.absolute()),
-            message=f"Results saved successfully to {target_filename}",
-            size_bytes=file_size,
-            was_duplicate=was_duplicate,
-            overwritten=request.overwrite and was_duplicate
-        )
-        
-    except Exception as e:
-        logger.error(f"Error saving results for {nct_id}: {e}")
-        raise HTTPException(
-            status_code=500,
-            detail=f"Error saving results: {str(e)}"
-        )
+    return _store_save(nct_id, results, request, "Results saved successfully to")
 
 
 @app.get("/api/results/{nct_id}/download")
@@ -648,18 +733,18 @@ async def download_results(nct_id: str, version: Optional[int] = None):
     else:
         filename = f"{nct_id}.json"
     
-    results_file = Path(f"results/{filename}")
-    if not results_file.exists():
+    content = result_store.get_text(filename)
+    if content is None:
         raise HTTPException(
             status_code=404,
             detail=f"Results file not found: {filename}"
         )
     
     # Return file for download
-    return FileResponse(
-        path=str(results_file),
+    return Response(
+        content=content,
         media_type='application/json',
-        filename=filename
+        headers={"Content-Disposition": f'attachment; filename="{filename}"'}
     )
 
 
@@ -685,28 +770,18 @@ async def delete_search(nct_id: str, version: Optional[int] = None):
         Deletion confirmation
     """
     nct_id = nct_id.upper().strip()
-    results_dir = Path("results")
-    deleted_files = []
     
     if version is not None:
         # Delete specific version
-        filename = f"{nct_id}_{version}.json"
-        results_file = results_dir / filename
-        if results_file.exists():
-            results_file.unlink()
-            deleted_files.append(filename)
+        deleted_files = result_store.delete([f"{nct_id}_{version}.json"])
     else:
         # Delete all versions
-        existing_files = find_existing_files(nct_id, results_dir)
-        for filename in existing_files:
-            filepath = results_dir / filename
-            if filepath.exists():
-                filepath.unlink()
-                deleted_files.append(filename)
+        deleted_files = result_store.delete(find_existing_files(nct_id))
         
         # Remove from status db
         if nct_id in search_status_db:
             del search_status_db[nct_id]
+        result_store.delete_status(nct_id)
     
     if not deleted_files:
         raise HTTPException(
@@ -728,11 +803,13 @@ async def delete_search(nct_id: str, version: Optional[int] = None):
 async def _execute_search(nct_id: str, request: SearchRequest):
     """Execute search in background."""
     status = search_status_db[nct_id]
+    done = search_done_events.get(nct_id)
     
     try:
         # Update status
         status.status = "running"
         status.updated_at = datetime.utcnow()
+        _save_status(status)
         
         logger.info(f"Starting search for {nct_id}")
         
@@ -748,18 +825,14 @@ async def _execute_search(nct_id: str, request: SearchRequest):
         # Clean empty values from results before saving
         cleaned_results = clean_empty_values(results)
 
-        # Save results to temporary location (will be renamed on save)
-        results_dir = Path("results")
-        results_dir.mkdir(exist_ok=True)
-
-        output_file = results_dir / f"{nct_id}.json"
-        with open(output_file, 'w', encoding='utf-8') as f:
-            json.dump(cleaned_results, f, indent=2, ensure_ascii=False)
+        # Save results as the working copy (versioned on save)
+        result_store.put(f"{nct_id}.json", nct_id, cleaned_results, version=0)
         
         # Update status
         status.status = "completed"
         status.progress = 100
         status.updated_at = datetime.utcnow()
+        _save_status(status)
         
         logger.info(f"Completed search for {nct_id}")
         
@@ -768,6 +841,15 @@ async def _execute_search(nct_id: str, request: SearchRequest):
         status.status = "failed"
         status.error = str(e)
         status.updated_at = datetime.utcnow()
+        _save_status(status)
+    
+    finally:
+        if done is not None:
+            # set() wakes every current waiter; a re-queued search has
+            # already replaced the entry with its own event.
+            done.set()
+            if search_done_events.get(nct_id) is done:
+                del search_done_events[nct_id]
 
 
 def _get_database_list(request: SearchRequest) -> List[str]:
@@ -1001,17 +1083,14 @@ async def get_llm_optimized_results(nct_id: str, include_tools: bool = True):
     """
     nct_id = nct_id.upper().strip()
 
-    results_file = Path(f"results/{nct_id}.json")
-    if not results_file.exists():
+    raw_results = result_store.get(f"{nct_id}.json")
+    if raw_results is None:
         raise HTTPException(
             status_code=404,
             detail=f"Results not found for {nct_id}. Run a search first."
         )
 
     try:
-        with open(results_file, 'r', encoding='utf-8') as f:
-            raw_results = json.load(f)
-
         # Clean empty values first
         cleaned = clean_empty_values(raw_results)
 
@@ -1398,64 +1477,18 @@ async def save_clean_results(nct_id: str, request: SaveRequest):
     removing all null, empty string, empty list, and empty dict values.
     """
     nct_id = nct_id.upper().strip()
-    results_dir = Path("results")
-    results_dir.mkdir(exist_ok=True)
 
-    temp_results_file = results_dir / f"{nct_id}.json"
-    if not temp_results_file.exists():
+    results = result_store.get(f"{nct_id}.json")
+    if results is None:
         raise HTTPException(
             status_code=404,
             detail=f"No results found for {nct_id}. Please run a search first."
         )
 
-    try:
-        with open(temp_results_file, 'r', encoding='utf-8') as f:
-            results = json.load(f)
-
-        # Clean empty values
-        cleaned_results = clean_empty_values(results)
-
-    except Exception as e:
-        raise HTTPException(
-            status_code=500,
-            detail=f"Error loading results: {str(e)}"
-        )
-
-    # Determine target filename
-    if request.custom_filename:
-        target_filename = f"{request.custom_filename}.json"
-    elif request.overwrite:
-        target_filename = f"{nct_id}.json"
-    else:
-        target_filename = get_next_version_filename(nct_id, results_dir)
+    # Clean empty values
+    cleaned_results = clean_empty_values(results)
 
-    target_path = results_dir / target_filename
-    was_duplicate = target_path.exists()
-
-    try:
-        with open(target_path, 'w', encoding='utf-8') as f:
-            json.dump(cleaned_results, f, indent=2, ensure_ascii=False)
-
-        file_size = target_path.stat().st_size
-
-        logger.info(f"Saved cleaned results for {nct_id} to {target_filename}")
-
-        return SaveResponse(
-            success=True,
-            filename=target_filename,
-            filepath=str(target_path.absolute()),
-            message=f"Cleaned results saved to {target_filename}",
-            size_bytes=file_size,
-            was_duplicate=was_duplicate,
-            overwritten=request.overwrite and was_duplicate
-        )
-
-    except Exception as e:
-        logger.error(f"Error saving cleaned results for {nct_id}: {e}")
-        raise HTTPException(
-            status_code=500,
-            detail=f"Error saving results: {str(e)}"
-        )
+    return _store_save(nct_id, cleaned_results, request, "Cleaned results saved to")
 
 
 if __name__ == "__main__":
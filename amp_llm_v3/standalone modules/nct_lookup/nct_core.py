@@ -30,6 +30,7 @@ from nct_clients import (
     EBIProteinsClient
 )
 from nct_models import SearchConfig
+from nct_mirror import mirror_from_env
 
 logger = logging.getLogger(__name__)
 
@@ -49,6 +50,10 @@ class NCTSearchEngine:
 
         if not self.ncbi_key:
             logger.warning("NCBI_API_KEY not set - using default rate limits")
+
+        # Offline CT.gov mirror (CTGOV_MIRROR=1): protocols are served from
+        # disk and only stale or missing records hit the live API.
+        self.mirror = mirror_from_env()
     
     async def initialize(self):
         """Initialize search engine and clients."""
@@ -115,8 +120,17 @@ class NCTSearchEngine:
             status.current_database = "clinicaltrials"
             status.progress = 10
         
-        logger.info(f"Fetching ClinicalTrials.gov data for {nct_id}")
-        ct_data = await self.clients['clinicaltrials'].fetch(nct_id)
+        # Mirror reads/writes are SQLite + zlib; keep them off the event loop.
+        ct_data = (
+            await asyncio.to_thread(self.mirror.get, nct_id) if self.mirror else None
+        )
+        if ct_data is not None:
+            logger.info(f"Serving ClinicalTrials.gov data for {nct_id} from mirror")
+        else:
+            logger.info(f"Fetching ClinicalTrials.gov data for {nct_id}")
+            ct_data = await self.clients['clinicaltrials'].fetch(nct_id)
+            if self.mirror and "error" not in ct_data:
+                await asyncio.to_thread(self.mirror.put, ct_data)
         
         if "error" in ct_data:
             logger.error(f"Failed to fetch trial data: {ct_data['error']}")
@@ -0,0 +1,66 @@
+"""
+NCT Offline Mirror
+==================
+
+Read-through access to the offline ClinicalTrials.gov mirror that
+agent_annotate maintains. Both services share one SQLite file and one
+implementation (``amp_llm_v3/amp_shared/ctgov_mirror.py``):
+
+    studies(nct_id PRIMARY KEY, last_update_post_date, checked_at, body)
+
+where ``body`` is the zlib-compressed v2 study JSON. Fill or refresh it with
+``agent_annotate/scripts/ctgov_mirror.py import|sync``.
+
+Enable with CTGOV_MIRROR=1. Settings:
+    CTGOV_MIRROR_PATH          default: amp_llm_v3/ct_database/ctgov_mirror.db
+    CTGOV_MIRROR_MAX_AGE_DAYS  records checked longer ago are refetched (7)
+"""
+
+import logging
+import os
+import sys
+from pathlib import Path
+from typing import Any, Dict, Optional
+
+_AMP_ROOT = str(Path(__file__).resolve().parents[2])
+if _AMP_ROOT not in sys.path:
+    sys.path.append(_AMP_ROOT)
+
+from amp_shared import ctgov_mirror as shared  # noqa: E402
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_MIRROR_PATH = Path(__file__).parent.parent.parent / "ct_database" / "ctgov_mirror.db"
+
+
+class CTGovMirror(shared.CTGovMirror):
+    """The shared mirror with a fixed max age and hit/miss counts for NCTSearchEngine."""
+
+    def __init__(self, path: Path, max_age_days: float = 7.0):
+        super().__init__(path)
+        self.max_age = max_age_days * 86400
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, nct_id: str, max_age: Optional[float] = None) -> Optional[Dict[str, Any]]:
+        """Mirrored study if present and checked within max_age, else None."""
+        study = super().get(nct_id, self.max_age if max_age is None else max_age)
+        if study is None:
+            self.misses += 1
+        else:
+            self.hits += 1
+        return study
+
+
+def mirror_from_env() -> Optional[CTGovMirror]:
+    """The mirror configured by CTGOV_MIRROR*, or None when disabled."""
+    if os.getenv("CTGOV_MIRROR", "0").strip() not in ("1", "true", "yes"):
+        return None
+    path = Path(os.getenv("CTGOV_MIRROR_PATH") or DEFAULT_MIRROR_PATH)
+    try:
+        mirror = CTGovMirror(path, float(os.getenv("CTGOV_MIRROR_MAX_AGE_DAYS", "7")))
+    except Exception as e:
+        logger.warning(f"CT.gov mirror unavailable at {path}: {e}")
+        return None
+    logger.info(f"Serving ClinicalTrials.gov records from mirror {path}")
+    return mirror
@@ -50,13 +50,39 @@ class SearchRequest(BaseModel):
 
 class SearchResponse(BaseModel):
     """Response model for search initiation."""
-    
+
     job_id: str = Field(description="NCT number used as job ID")
     status: str = Field(description="Current status (queued, running, completed, failed)")
     message: str = Field(description="Human-readable status message")
     created_at: datetime = Field(description="Search creation timestamp")
 
 
+class BatchSearchRequest(SearchRequest):
+    """Request model for starting several NCT searches in one call."""
+
+    nct_ids: List[str] = Field(
+        min_length=1,
+        max_length=500,
+        description="NCT numbers to search; each runs concurrently with the same options"
+    )
+
+
+class BatchWaitRequest(BaseModel):
+    """Request model for long-polling a set of searches until they finish."""
+
+    nct_ids: List[str] = Field(min_length=1, max_length=500)
+    timeout: float = Field(
+        default=30.0,
+        ge=0,
+        le=120,
+        description="Seconds to wait for all searches to finish before answering"
+    )
+    include_results: bool = Field(
+        default=True,
+        description="Return each completed search's results (as GET /api/results/{nct_id})"
+    )
+
+
 class SearchStatus(BaseModel):
     """Model for tracking search status."""
     
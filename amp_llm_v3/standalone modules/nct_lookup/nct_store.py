@@ -0,0 +1,322 @@
+"""
+NCT Result Store
+================
+
+Search status and saved results for the NCT Lookup API, in one SQLite file
+(default ``results/nct_results.db``) instead of ``search_status_db`` alone
+and one JSON file per result version:
+
+    searches(nct_id PRIMARY KEY, status, created_at, updated_at, error, ...)
+    files(filename PRIMARY KEY, nct_id, version, created_at, modified_at,
+          superseded_at, size_bytes, stored_bytes, body)
+
+``files`` holds what used to be ``results/<filename>``: the working copy of
+the latest search (``NCT12345678.json``, version 0), saved versions
+(``NCT12345678_<n>.json``, version n) and custom-named saves (version
+NULL). ``body`` is the zlib-compressed JSON text, byte-for-byte what the
+file held. The next version and the versions listed by check-duplicate
+come from the ``(nct_id, version)`` index, not from globbing the
+directory.
+
+A saved version is superseded when a newer version of the same trial is
+saved. Superseded versions older than ``NCT_RESULTS_VERSION_TTL_DAYS`` are
+pruned at startup and after saves (at most hourly).
+
+Search status is written at each transition (queued, running, completed,
+failed), so a restart keeps finished searches. A search that was queued or
+running when the service stopped comes back as failed, with
+"Interrupted by service restart", and can be re-run.
+
+On first start, existing ``results/NCT*.json`` files are imported (and left
+in place).
+
+Settings:
+    NCT_RESULTS_DB                default: results/nct_results.db
+    NCT_RESULTS_VERSION_TTL_DAYS  superseded versions kept this long (30; 0 keeps all)
+"""
+
+import json
+import logging
+import os
+import re
+import sqlite3
+import threading
+import time
+import zlib
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+from nct_models import SearchStatus
+
+logger = logging.getLogger(__name__)
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS searches (
+    nct_id TEXT PRIMARY KEY,
+    status TEXT NOT NULL,
+    progress INTEGER NOT NULL DEFAULT 0,
+    completed_databases TEXT NOT NULL DEFAULT '[]',
+    databases_to_search TEXT NOT NULL DEFAULT '[]',
+    created_at TEXT NOT NULL,
+    updated_at TEXT,
+    error TEXT
+);
+CREATE TABLE IF NOT EXISTS files (
+    filename TEXT PRIMARY KEY,
+    nct_id TEXT NOT NULL,
+    version INTEGER,
+    created_at REAL NOT NULL,
+    modified_at REAL NOT NULL,
+    superseded_at REAL,
+    size_bytes INTEGER NOT NULL,
+    stored_bytes INTEGER NOT NULL,
+    body BLOB NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_files_nct_version ON files(nct_id, version);
+CREATE INDEX IF NOT EXISTS idx_files_superseded ON files(superseded_at)
+    WHERE superseded_at IS NOT NULL;
+"""
+
+# PRAGMA user_version once results/*.json has been imported.
+_IMPORTED = 1
+
+_FILENAME = re.compile(r"^(NCT\d{8})(?:_(\d+))?\.json$")
+
+INTERRUPTED = "Interrupted by service restart"
+
+
+def parse_filename(filename: str) -> Optional[tuple]:
+    """``(nct_id, version)`` for ``NCT12345678[_<n>].json``, else None."""
+    m = _FILENAME.match(filename)
+    return (m.group(1), int(m.group(2) or 0)) if m else None
+
+
+def version_filename(nct_id: str, version: int) -> str:
+    """``NCT12345678.json`` for version 0, ``NCT12345678_<n>.json`` otherwise."""
+    return f"{nct_id}.json" if version == 0 else f"{nct_id}_{version}.json"
+
+
+def _encode(data: Any) -> bytes:
+    # Same text the JSON files held, so downloads are unchanged.
+    return json.dumps(data, indent=2, ensure_ascii=False).encode("utf-8")
+
+
+class ResultStore:
+    """SQLite-backed search status and versioned result payloads."""
+
+    def __init__(self, path: Path, version_ttl_days: float = 30.0, prune_interval: float = 3600.0):
+        self.path = Path(path)
+        self.version_ttl = version_ttl_days * 86400
+        self.prune_interval = prune_interval
+        self._last_prune = 0.0
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(str(self.path), check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.executescript(_SCHEMA)
+        self._conn.commit()
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
+
+    # -- search status --------------------------------------------------------
+
+    def save_status(self, status: SearchStatus) -> None:
+        """Record a search's state (called at each status transition)."""
+        with self._lock, self._conn:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO searches (nct_id, status, progress, completed_databases, "
+                "databases_to_search, created_at, updated_at, error) VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                (
+                    status.job_id, status.status, status.progress,
+                    json.dumps(status.completed_databases), json.dumps(status.databases_to_search),
+                    status.created_at.isoformat(),
+                    status.updated_at.isoformat() if status.updated_at else None,
+                    status.error,
+                ),
+            )
+
+    def delete_status(self, nct_id: str) -> None:
+        with self._lock, self._conn:
+            self._conn.execute("DELETE FROM searches WHERE nct_id = ?", (nct_id,))
+
+    def load_statuses(self) -> Dict[str, SearchStatus]:
+        """All recorded searches; ones left queued/running are marked failed."""
+        with self._lock, self._conn:
+            self._conn.execute(
+                "UPDATE searches SET status = 'failed', error = ?, updated_at = ? "
+                "WHERE status IN ('queued', 'running')",
+                (INTERRUPTED, datetime.utcnow().isoformat()),
+            )
+            rows = self._conn.execute(
+                "SELECT nct_id, status, progress, completed_databases, databases_to_search, "
+                "created_at, updated_at, error FROM searches"
+            ).fetchall()
+        return {
+            nct_id: SearchStatus(
+                job_id=nct_id, status=state, progress=progress,
+                completed_databases=json.loads(done), databases_to_search=json.loads(todo),
+                created_at=datetime.fromisoformat(created),
+                updated_at=datetime.fromisoformat(updated) if updated else None,
+                error=error,
+            )
+            for nct_id, state, progress, done, todo, created, updated, error in rows
+        }
+
+    # -- result files ---------------------------------------------------------
+
+    def put(self, filename: str, nct_id: str, data: Any, version: Optional[int] = None) -> int:
+        """Store ``data`` as ``filename``; returns its size as a JSON file.
+
+        Saving version n > 0 supersedes the trial's older saved versions.
+        """
+        text = _encode(data)
+        body = zlib.compress(text, 6)
+        now = time.time()
+        with self._lock, self._conn:
+            self._conn.execute(
+                "INSERT INTO files (filename, nct_id, version, created_at, modified_at, "
+                "size_bytes, stored_bytes, body) VALUES (?, ?, ?, ?, ?, ?, ?, ?) "
+                "ON CONFLICT(filename) DO UPDATE SET nct_id = excluded.nct_id, "
+                "version = excluded.version, modified_at = excluded.modified_at, "
+                "superseded_at = NULL, size_bytes = excluded.size_bytes, "
+                "stored_bytes = excluded.stored_bytes, body = excluded.body",
+                (filename, nct_id, version, now, now, len(text), len(body), body),
+            )
+            if version:
+                self._conn.execute(
+                    "UPDATE files SET superseded_at = ? WHERE nct_id = ? AND version > 0 "
+                    "AND version < ? AND superseded_at IS NULL",
+                    (now, nct_id, version),
+                )
+        return len(text)
+
+    def get_text(self, filename: str) -> Optional[bytes]:
+        """The file's JSON text, or None when there is no such file."""
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT body FROM files WHERE filename = ?", (filename,)
+            ).fetchone()
+        return zlib.decompress(row[0]) if row else None
+
+    def get(self, filename: str) -> Optional[Any]:
+        text = self.get_text(filename)
+        return json.loads(text) if text is not None else None
+
+    def exists(self, filename: str) -> bool:
+        with self._lock:
+            return self._conn.execute(
+                "SELECT 1 FROM files WHERE filename = ?", (filename,)
+            ).fetchone() is not None
+
+    def file_info(self, filename: str) -> Optional[Dict[str, Any]]:
+        """Size and timestamps, as ``get_file_info`` reported for the file."""
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT size_bytes, stored_bytes, modified_at, created_at FROM files "
+                "WHERE filename = ?", (filename,)
+            ).fetchone()
+        if row is None:
+            return None
+        size, stored, modified, created = row
+        return {
+            "size_bytes": size,
+            "stored_bytes": stored,
+            "modified": datetime.fromtimestamp(modified).isoformat(),
+            "created": datetime.fromtimestamp(created).isoformat(),
+        }
+
+    def versions(self, nct_id: str) -> List[str]:
+        """The trial's working copy and saved versions, in version order."""
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT filename FROM files WHERE nct_id = ? AND version IS NOT NULL "
+                "ORDER BY version", (nct_id,)
+            ).fetchall()
+        return [r[0] for r in rows]
+
+    def latest_version(self, nct_id: str) -> Optional[int]:
+        """Highest stored version (0 = only the working copy), or None."""
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT MAX(version) FROM files WHERE nct_id = ?", (nct_id,)
+            ).fetchone()
+        return row[0]
+
+    def delete(self, filenames: List[str]) -> List[str]:
+        """Delete files; returns the ones that existed."""
+        deleted = [f for f in filenames if self.exists(f)]
+        with self._lock, self._conn:
+            self._conn.executemany("DELETE FROM files WHERE filename = ?", [(f,) for f in deleted])
+        return deleted
+
+    # -- maintenance ----------------------------------------------------------
+
+    def prune(self, force: bool = False) -> int:
+        """Delete superseded versions older than the TTL (at most every prune_interval)."""
+        now = time.time()
+        if self.version_ttl <= 0 or (not force and now - self._last_prune < self.prune_interval):
+            return 0
+        self._last_prune = now
+        with self._lock, self._conn:
+            cur = self._conn.execute(
+                "DELETE FROM files WHERE superseded_at IS NOT NULL AND superseded_at < ?",
+                (now - self.version_ttl,),
+            )
+        if cur.rowcount:
+            logger.info(f"Pruned {cur.rowcount} superseded result version(s)")
+        return cur.rowcount
+
+    def import_directory(self, results_dir: Path) -> int:
+        """One-time import of ``NCT*.json`` / ``NCT*_<n>.json`` result files."""
+        with self._lock:
+            if self._conn.execute("PRAGMA user_version").fetchone()[0] >= _IMPORTED:
+                return 0
+        imported = 0
+        files = sorted(
+            (*parsed, p)
+            for p in (results_dir.iterdir() if results_dir.exists() else [])
+            if p.is_file() and (parsed := parse_filename(p.name))
+        )
+        for nct_id, version, p in files:
+            try:
+                data = json.loads(p.read_text(encoding="utf-8"))
+            except Exception as e:
+                logger.warning(f"Skipping unreadable result file {p}: {e}")
+                continue
+            self.put(p.name, nct_id, data, version)
+            imported += 1
+        with self._lock, self._conn:
+            self._conn.execute(f"PRAGMA user_version = {_IMPORTED}")
+        if imported:
+            logger.info(f"Imported {imported} result file(s) from {results_dir} into {self.path}")
+        return imported
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            files, size, stored, superseded = self._conn.execute(
+                "SELECT COUNT(*), COALESCE(SUM(size_bytes), 0), COALESCE(SUM(stored_bytes), 0), "
+                "COUNT(superseded_at) FROM files"
+            ).fetchone()
+            searches = self._conn.execute("SELECT COUNT(*) FROM searches").fetchone()[0]
+        return {
+            "searches": searches,
+            "files": files,
+            "superseded": superseded,
+            "json_bytes": size,
+            "stored_bytes": stored,
+        }
+
+
+def store_from_env(results_dir: Path = Path("results")) -> ResultStore:
+    """The store configured by NCT_RESULTS_*, with old result files imported."""
+    store = ResultStore(
+        Path(os.getenv("NCT_RESULTS_DB") or results_dir / "nct_results.db"),
+        version_ttl_days=float(os.getenv("NCT_RESULTS_VERSION_TTL_DAYS", "30")),
+    )
+    store.import_directory(results_dir)
+    store.prune(force=True)
+    return store
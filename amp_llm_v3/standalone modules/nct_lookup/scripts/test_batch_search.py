@@ -0,0 +1,250 @@
+#!/usr/bin/env python3
+"""
+Batch search endpoints (nct_api.py /api/search/batch and /batch/wait).
+
+No network: the search engine is replaced by a fake whose searches finish
+when the test releases them, and the result store is a temp database.
+Requests go through the FastAPI app on an httpx.ASGITransport.
+Verifies:
+  1. /api/search/batch is routed to the batch handler, not taken as an NCT
+     ID by /api/search/{nct_id}; invalid IDs are reported per ID.
+  2. /batch/wait answers as soon as every search has finished, well before
+     its timeout, with each search's results.
+  3. Searches still running at the timeout come back as ``pending``;
+     failed and unknown searches under ``failed``.
+  4. timeout=0 answers immediately without creating un-awaited waits.
+  5. At most MAX_CONCURRENT_SEARCHES batch searches run at once; the rest
+     stay queued. A finished search's done-event is dropped.
+
+Usage:
+    cd <nct_lookup_dir>
+    python3 scripts/test_batch_search.py
+"""
+
+from __future__ import annotations
+
+import asyncio
+import gc
+import os
+import sys
+import tempfile
+import time
+import warnings
+from pathlib import Path
+
+THIS_DIR = Path(__file__).resolve().parent
+PKG_ROOT = THIS_DIR.parent
+if str(PKG_ROOT) not in sys.path:
+    sys.path.insert(0, str(PKG_ROOT))
+
+os.environ["NCT_RESULTS_DB"] = str(Path(tempfile.mkdtemp()) / "nct_results.db")
+
+import httpx  # noqa: E402
+
+import nct_api  # noqa: E402
+
+
+class FakeSearchEngine:
+    """search() finishes when release(nct_id) is called; fail() makes it raise."""
+
+    def __init__(self):
+        self.gates: dict[str, asyncio.Event] = {}
+        self.errors: dict[str, str] = {}
+        self.calls: list[str] = []
+        self.open = False
+
+    def _gate(self, nct_id: str) -> asyncio.Event:
+        gate = self.gates.setdefault(nct_id, asyncio.Event())
+        if self.open:
+            gate.set()
+        return gate
+
+    def release_all(self) -> None:
+        self.open = True
+        self.release(*self.gates)
+
+    def release(self, *nct_ids: str) -> None:
+        for nct_id in nct_ids:
+            self._gate(nct_id).set()
+
+    def fail(self, nct_id: str, error: str) -> None:
+        self.errors[nct_id] = error
+        self.release(nct_id)
+
+    async def search(self, nct_id, config, status):
+        self.calls.append(nct_id)
+        await self._gate(nct_id).wait()
+        if nct_id in self.errors:
+            raise RuntimeError(self.errors[nct_id])
+        return {"nct_id": nct_id, "sources": {"clinical_trials": {"data": {"title": nct_id}}}}
+
+
+def _run(scenario) -> None:
+    """Run ``scenario(client, engine)`` against the app with a fresh fake engine."""
+    async def main():
+        engine = FakeSearchEngine()
+        real_search = nct_api.search_engine.search
+        nct_api.search_engine.search = engine.search
+        nct_api.search_status_db.clear()
+        nct_api.search_done_events.clear()
+        transport = httpx.ASGITransport(app=nct_api.app)
+        try:
+            async with httpx.AsyncClient(transport=transport, base_url="http://nct") as client:
+                await scenario(client, engine)
+        finally:
+            engine.release_all()
+            await asyncio.gather(*nct_api._batch_tasks)
+            nct_api.search_engine.search = real_search
+
+    asyncio.run(main())
+
+
+def _ids(n: int, start: int = 1) -> list[str]:
+    return [f"NCT{start + i:08d}" for i in range(n)]
+
+
+async def _start(client: httpx.AsyncClient, nct_ids: list[str]) -> dict:
+    r = await client.post("/api/search/batch", json={"nct_ids": nct_ids})
+    assert r.status_code == 200, r.text
+    return r.json()
+
+
+def test_batch_route_precedes_nct_route():
+    async def scenario(client, engine):
+        body = await _start(client, _ids(2) + ["bogus"])
+        assert [j["nct_id"] for j in body["jobs"]] == _ids(2), body
+        assert all(j["status"] == "queued" for j in body["jobs"])
+        assert [e["nct_id"] for e in body["errors"]] == ["bogus"], body
+        await asyncio.sleep(0)
+        assert sorted(engine.calls) == _ids(2)
+        # The wait route must not be taken for /api/search/{nct_id} either.
+        r = await client.post("/api/search/batch/wait", json={"nct_ids": _ids(2), "timeout": 0})
+        assert r.status_code == 200 and r.json()["pending"] == _ids(2), r.text
+
+    _run(scenario)
+    print("  ✓ /api/search/batch routes before /api/search/{nct_id}")
+
+
+def test_wait_returns_when_all_done():
+    async def scenario(client, engine):
+        ids = _ids(3)
+        await _start(client, ids)
+
+        async def finish():
+            await asyncio.sleep(0.05)
+            engine.release(*ids)
+
+        asyncio.get_running_loop().create_task(finish())
+        started = time.perf_counter()
+        r = await client.post("/api/search/batch/wait", json={"nct_ids": ids, "timeout": 10})
+        elapsed = time.perf_counter() - started
+        body = r.json()
+        assert elapsed < 2, elapsed
+        assert body["pending"] == [] and body["failed"] == [], body
+        assert [c["nct_id"] for c in body["completed"]] == ids
+        assert body["completed"][0]["results"]["sources"]["clinical_trials"]["data"]["title"] == ids[0]
+
+    _run(scenario)
+    print("  ✓ long-poll answers as soon as every search finished")
+
+
+def test_wait_reports_pending_and_failed():
+    async def scenario(client, engine):
+        done, slow, broken = _ids(3)
+        await _start(client, [done, slow, broken])
+        engine.release(done)
+        engine.fail(broken, "CT.gov unreachable")
+        started = time.perf_counter()
+        r = await client.post("/api/search/batch/wait", json={
+            "nct_ids": [done, slow, broken, "NCT09999999"], "timeout": 0.2,
+            "include_results": False,
+        })
+        elapsed = time.perf_counter() - started
+        body = r.json()
+        assert 0.15 <= elapsed < 2, elapsed
+        assert body["completed"] == [{"nct_id": done}], body
+        assert body["pending"] == [slow], body
+        assert body["failed"] == [
+            {"nct_id": broken, "error": "CT.gov unreachable"},
+            {"nct_id": "NCT09999999", "error": "No search found for NCT09999999"},
+        ], body
+
+    _run(scenario)
+    print("  ✓ unfinished searches come back pending; failures are reported")
+
+
+def test_zero_timeout_creates_no_waits():
+    async def scenario(client, engine):
+        ids = _ids(3)
+        await _start(client, ids)
+        with warnings.catch_warnings(record=True) as caught:
+            warnings.simplefilter("always")
+            started = time.perf_counter()
+            r = await client.post("/api/search/batch/wait", json={"nct_ids": ids, "timeout": 0})
+            elapsed = time.perf_counter() - started
+            gc.collect()
+        assert elapsed < 1 and r.json()["pending"] == ids, r.text
+        never_awaited = [w for w in caught if "never awaited" in str(w.message)]
+        assert not never_awaited, [str(w.message) for w in never_awaited]
+
+    _run(scenario)
+    print("  ✓ timeout=0 answers at once without un-awaited coroutines")
+
+
+def test_concurrency_bound_and_event_cleanup():
+    async def scenario(client, engine):
+        real_slots = nct_api._search_slots
+        nct_api._search_slots = asyncio.Semaphore(2)
+        try:
+            ids = _ids(5)
+            await _start(client, ids)
+            for _ in range(3):
+                await asyncio.sleep(0)
+            assert sorted(engine.calls) == ids[:2], engine.calls
+            assert [nct_api.search_status_db[n].status for n in ids[2:]] == ["queued"] * 3
+            assert set(nct_api.search_done_events) == set(ids)
+
+            engine.release_all()
+            r = await client.post("/api/search/batch/wait", json={
+                "nct_ids": ids, "timeout": 5, "include_results": False,
+            })
+            assert [c["nct_id"] for c in r.json()["completed"]] == ids, r.text
+            assert sorted(engine.calls) == ids
+            assert nct_api.search_done_events == {}
+        finally:
+            nct_api._search_slots = real_slots
+
+    _run(scenario)
+    print("  ✓ batch searches share a bounded pool; done-events are dropped")
+
+
+def main() -> int:
+    print("Batch search endpoint tests")
+    print("-" * 60)
+    tests = [
+        test_batch_route_precedes_nct_route,
+        test_wait_returns_when_all_done,
+        test_wait_reports_pending_and_failed,
+        test_zero_timeout_creates_no_waits,
+        test_concurrency_bound_and_event_cleanup,
+    ]
+    failed = 0
+    for t in tests:
+        try:
+            t()
+        except AssertionError as e:
+            print(f"  ✗ {t.__name__}: {e}")
+            failed += 1
+        except Exception as e:
+            print(f"  ✗ {t.__name__}: {type(e).__name__}: {e}")
+            failed += 1
+    print("-" * 60)
+    if failed:
+        print(f"FAIL: {failed}/{len(tests)}")
+        return 1
+    print(f"OK: {len(tests)}/{len(tests)}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,289 @@
+#!/usr/bin/env python3
+"""
+Search status and versioned results in SQLite (nct_store.py ResultStore).
+
+No network. Each test uses its own store on a temp database; the clock is
+replaced where TTLs matter. Verifies:
+  1. Saving version n supersedes the trial's older saved versions only,
+     and latest_version/versions come from the index.
+  2. nct_api names the next save MAX(version)+1 (pruned numbers aren't
+     reused), check-duplicate suggests it, and download serves each version.
+  3. results/*.json are imported once: PRAGMA user_version marks the import
+     and later starts skip the directory.
+  4. Searches left queued or running come back failed with
+     "Interrupted by service restart"; finished ones are unchanged.
+  5. Pruning drops superseded versions past the TTL and keeps the latest
+     version and the working copy; unforced prunes are rate-limited.
+  6. Bodies are zlib-compressed and round-trip to the exact JSON text.
+
+Usage:
+    cd <nct_lookup_dir>
+    python3 scripts/test_result_store.py
+"""
+
+from __future__ import annotations
+
+import asyncio
+import json
+import os
+import sqlite3
+import sys
+import tempfile
+import zlib
+from datetime import datetime
+from pathlib import Path
+from types import SimpleNamespace
+
+THIS_DIR = Path(__file__).resolve().parent
+PKG_ROOT = THIS_DIR.parent
+if str(PKG_ROOT) not in sys.path:
+    sys.path.insert(0, str(PKG_ROOT))
+
+os.environ["NCT_RESULTS_DB"] = str(Path(tempfile.mkdtemp()) / "nct_results.db")
+
+import httpx  # noqa: E402
+
+import nct_store  # noqa: E402
+from nct_models import SearchStatus  # noqa: E402
+from nct_store import INTERRUPTED, ResultStore  # noqa: E402
+
+NCT = "NCT01234567"
+DAY = 86400
+
+
+def _store(**kwargs) -> ResultStore:
+    return ResultStore(Path(tempfile.mkdtemp()) / "nct_results.db", **kwargs)
+
+
+def _payload(n: int) -> dict:
+    return {"nct_id": NCT, "run": n, "sources": {"pubmed": {"data": {"pmids": list(range(n))}}}}
+
+
+def _superseded(store: ResultStore) -> dict:
+    rows = store._conn.execute("SELECT filename, superseded_at FROM files").fetchall()
+    return {name: at is not None for name, at in rows}
+
+
+class Clock:
+    """Stands in for nct_store's ``time`` module."""
+
+    def __init__(self, now: float = 1_700_000_000.0):
+        self.now = now
+
+    def time(self) -> float:
+        return self.now
+
+
+def _with_clock(test):
+    def run():
+        real = nct_store.time
+        nct_store.time = Clock()
+        try:
+            test(nct_store.time)
+        finally:
+            nct_store.time = real
+    run.__name__ = test.__name__
+    return run
+
+
+def test_versions_and_supersession():
+    store = _store()
+    assert store.latest_version(NCT) is None
+    store.put(f"{NCT}.json", NCT, _payload(0), version=0)
+    store.put(f"{NCT}_1.json", NCT, _payload(1), version=1)
+    store.put("NCT07654321_1.json", "NCT07654321", _payload(1), version=1)
+    store.put("my_export.json", NCT, _payload(9), version=None)
+    assert _superseded(store) == {
+        f"{NCT}.json": False, f"{NCT}_1.json": False,
+        "NCT07654321_1.json": False, "my_export.json": False,
+    }
+    store.put(f"{NCT}_2.json", NCT, _payload(2), version=2)
+    assert _superseded(store) == {
+        f"{NCT}.json": False, f"{NCT}_1.json": True, f"{NCT}_2.json": False,
+        "NCT07654321_1.json": False, "my_export.json": False,
+    }
+    assert store.latest_version(NCT) == 2
+    assert store.versions(NCT) == [f"{NCT}.json", f"{NCT}_1.json", f"{NCT}_2.json"]
+    # Re-running the search overwrites the working copy without touching versions.
+    store.put(f"{NCT}.json", NCT, _payload(5), version=0)
+    assert store.get(f"{NCT}.json")["run"] == 5 and _superseded(store)[f"{NCT}_1.json"]
+    print("  ✓ a new version supersedes older ones of the same trial only")
+
+
+@_with_clock
+def test_api_names_next_version(clock):
+    import nct_api
+
+    store = _store(version_ttl_days=1)
+    real_store = nct_api.result_store
+    nct_api.result_store = store
+
+    async def scenario():
+        transport = httpx.ASGITransport(app=nct_api.app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://nct") as client:
+            r = await client.post(f"/api/results/{NCT}/save", json={})
+            assert r.status_code == 404, r.text
+            store.put(f"{NCT}.json", NCT, _payload(0), version=0)
+            names = []
+            for _ in range(3):
+                r = await client.post(f"/api/results/{NCT}/save", json={})
+                names.append(r.json()["filename"])
+                clock.now += 2 * DAY
+            assert names == [f"{NCT}_1.json", f"{NCT}_2.json", f"{NCT}_3.json"], names
+            # _1 and _2 were superseded more than a day ago; the next save prunes them.
+            store._last_prune = 0
+            r = await client.post(f"/api/results/{NCT}/save", json={})
+            assert r.json()["filename"] == f"{NCT}_4.json", r.json()
+            assert store.versions(NCT) == [f"{NCT}.json", f"{NCT}_3.json", f"{NCT}_4.json"]
+            r = await client.post(f"/api/results/{NCT}/check-duplicate")
+            assert r.json()["suggested_filename"] == f"{NCT}_5.json", r.json()
+            assert r.json()["existing_files"] == store.versions(NCT)
+            r = await client.get(f"/api/results/{NCT}/download", params={"version": 3})
+            assert r.content == store.get_text(f"{NCT}_3.json")
+            assert r.headers["content-disposition"] == f'attachment; filename="{NCT}_3.json"'
+
+    try:
+        asyncio.run(scenario())
+    finally:
+        nct_api.result_store = real_store
+    print("  ✓ saves are named MAX(version)+1; pruned numbers aren't reused")
+
+
+def test_legacy_import_once():
+    results_dir = Path(tempfile.mkdtemp())
+    (results_dir / f"{NCT}.json").write_text(json.dumps(_payload(0)))
+    (results_dir / f"{NCT}_3.json").write_text(json.dumps(_payload(3)))
+    (results_dir / "NCT07654321_1.json").write_text("{not json")
+    (results_dir / "notes.json").write_text("{}")
+    db = Path(tempfile.mkdtemp()) / "nct_results.db"
+
+    store = ResultStore(db)
+    assert store._conn.execute("PRAGMA user_version").fetchone()[0] == 0
+    assert store.import_directory(results_dir) == 2
+    assert store.versions(NCT) == [f"{NCT}.json", f"{NCT}_3.json"]
+    assert store.get(f"{NCT}_3.json") == _payload(3)
+    assert not store.exists("notes.json") and not store.exists("NCT07654321_1.json")
+    assert (results_dir / f"{NCT}.json").exists(), "legacy files are left in place"
+
+    (results_dir / "NCT07654321.json").write_text(json.dumps(_payload(1)))
+    assert store.import_directory(results_dir) == 0
+    store.close()
+    reopened = ResultStore(db)
+    assert reopened._conn.execute("PRAGMA user_version").fetchone()[0] == nct_store._IMPORTED
+    assert reopened.import_directory(results_dir) == 0
+    assert not reopened.exists("NCT07654321.json")
+    print("  ✓ result files imported once; user_version marks it")
+
+
+def test_interrupted_searches_fail_on_restart():
+    db = Path(tempfile.mkdtemp()) / "nct_results.db"
+    store = ResultStore(db)
+    created = datetime(2026, 1, 2, 3, 4, 5)
+    for nct_id, state in (("NCT00000001", "queued"), ("NCT00000002", "running"),
+                          ("NCT00000003", "completed"), ("NCT00000004", "failed")):
+        store.save_status(SearchStatus(
+            job_id=nct_id, status=state, progress=40, created_at=created,
+            completed_databases=["clinicaltrials"], databases_to_search=["clinicaltrials", "pubmed"],
+            error="CT.gov timeout" if state == "failed" else None,
+        ))
+    store.close()
+
+    statuses = ResultStore(db).load_statuses()
+    assert {n: s.status for n, s in statuses.items()} == {
+        "NCT00000001": "failed", "NCT00000002": "failed",
+        "NCT00000003": "completed", "NCT00000004": "failed",
+    }
+    assert statuses["NCT00000001"].error == INTERRUPTED
+    assert statuses["NCT00000002"].error == INTERRUPTED
+    assert statuses["NCT00000002"].updated_at is not None
+    assert statuses["NCT00000004"].error == "CT.gov timeout"
+    done = statuses["NCT00000003"]
+    assert (done.progress, done.created_at, done.error) == (40, created, None)
+    assert done.databases_to_search == ["clinicaltrials", "pubmed"]
+    # The failure is written back, not just reported.
+    row = sqlite3.connect(db).execute(
+        "SELECT status, error FROM searches WHERE nct_id = 'NCT00000002'").fetchone()
+    assert row == ("failed", INTERRUPTED), row
+    print("  ✓ queued/running searches come back failed after a restart")
+
+
+@_with_clock
+def test_prune_keeps_latest(clock):
+    store = _store(version_ttl_days=30, prune_interval=30 * DAY)
+    store.put(f"{NCT}.json", NCT, _payload(0), version=0)
+    for v in (1, 2, 3):
+        store.put(f"{NCT}_{v}.json", NCT, _payload(v), version=v)
+        clock.now += 10 * DAY
+    # Day 30: _1 and _2 were superseded on days 10 and 20, within the TTL.
+    assert store.prune(force=True) == 0
+    clock.now += 15 * DAY
+    # Day 45: _1 has expired, but the last prune was only 15 days ago.
+    assert store.prune() == 0, "unforced prune ran within the interval"
+    assert store.prune(force=True) == 1
+    assert store.versions(NCT) == [f"{NCT}.json", f"{NCT}_2.json", f"{NCT}_3.json"]
+    clock.now += 365 * DAY
+    assert store.prune() == 1
+    # _3 was never superseded, so it outlives any TTL, as does the working copy.
+    assert store.versions(NCT) == [f"{NCT}.json", f"{NCT}_3.json"]
+    assert store.latest_version(NCT) == 3
+
+    keep_all = _store(version_ttl_days=0)
+    keep_all.put(f"{NCT}_1.json", NCT, _payload(1), version=1)
+    keep_all.put(f"{NCT}_2.json", NCT, _payload(2), version=2)
+    clock.now += 365 * DAY
+    assert keep_all.prune(force=True) == 0 and len(keep_all.versions(NCT)) == 2
+    print("  ✓ superseded versions pruned after the TTL; latest version kept")
+
+
+def test_zlib_round_trip():
+    store = _store()
+    data = {
+        "nct_id": NCT, "title": "Peptide LL-37 — phase Ⅱ, µg/kg dosing",
+        "nested": {"empty": [], "null": None, "floats": [0.1, 1e-07], "flag": True},
+        "abstracts": ["antimicrobial peptide " * 40] * 5,
+    }
+    size = store.put(f"{NCT}.json", NCT, data, version=0)
+    text = json.dumps(data, indent=2, ensure_ascii=False).encode("utf-8")
+    assert store.get_text(f"{NCT}.json") == text
+    assert store.get(f"{NCT}.json") == data
+    body, stored = store._conn.execute(
+        "SELECT body, stored_bytes FROM files WHERE filename = ?", (f"{NCT}.json",)).fetchone()
+    assert zlib.decompress(body) == text and stored == len(body) < size == len(text)
+    info = store.file_info(f"{NCT}.json")
+    assert info["size_bytes"] == len(text) and info["stored_bytes"] == len(body)
+    assert store.get("missing.json") is None and store.file_info("missing.json") is None
+    assert store.stats()["json_bytes"] == len(text)
+    print(f"  ✓ zlib round-trip is exact ({len(text)} → {len(body)} bytes)")
+
+
+def main() -> int:
+    print("Result store tests")
+    print("-" * 60)
+    tests = [
+        test_versions_and_supersession,
+        test_api_names_next_version,
+        test_legacy_import_once,
+        test_interrupted_searches_fail_on_restart,
+        test_prune_keeps_latest,
+        test_zlib_round_trip,
+    ]
+    failed = 0
+    for t in tests:
+        try:
+            t()
+        except AssertionError as e:
+            print(f"  ✗ {t.__name__}: {e}")
+            failed += 1
+        except Exception as e:
+            print(f"  ✗ {t.__name__}: {type(e).__name__}: {e}")
+            failed += 1
+    print("-" * 60)
+    if failed:
+        print(f"FAIL: {failed}/{len(tests)}")
+        return 1
+    print(f"OK: {len(tests)}/{len(tests)}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,40 @@
+"""
+Runner service metrics registry, rendered by ``GET /metrics``.
+
+The registry implementation is shared by the services and lives in
+``amp_llm_v3/amp_shared/metrics.py``; this module re-exports it and owns
+the Runner service singleton (metric names are prefixed ``runner_``).
+"""
+
+import sys
+from pathlib import Path
+
+_AMP_ROOT = str(Path(__file__).resolve().parents[2])
+if _AMP_ROOT not in sys.path:
+    sys.path.append(_AMP_ROOT)
+
+from amp_shared.metrics import (  # noqa: E402
+    DEFAULT_BUCKETS,
+    OPENMETRICS_CONTENT_TYPE,
+    PROMETHEUS_CONTENT_TYPE,
+    Counter,
+    Gauge,
+    Histogram,
+    MetricsRegistry,
+    wants_openmetrics,
+)
+
+__all__ = [
+    "DEFAULT_BUCKETS",
+    "OPENMETRICS_CONTENT_TYPE",
+    "PROMETHEUS_CONTENT_TYPE",
+    "Counter",
+    "Gauge",
+    "Histogram",
+    "MetricsRegistry",
+    "metrics",
+    "wants_openmetrics",
+]
+
+# Module-level singleton.
+metrics = MetricsRegistry(namespace="runner")
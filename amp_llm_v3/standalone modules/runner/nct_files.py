@@ -0,0 +1,249 @@
+"""
+In-memory index of the runner's NCT result files.
+
+``find_nct_file`` used to stat ``{nct}.json``, glob ``{nct}_v*.json`` and
+re-read the whole file on every request, and ``_has_extended_data`` walked
+the payload again each time, so a batch of N cached trials cost N directory
+scans and N JSON parses. The index replaces that with:
+
+- ``NCT -> latest file``, built by one directory scan at startup. An exact
+  ``{nct}.json`` wins over versioned files, and versions sort numerically
+  (``_v10`` after ``_v9``).
+- A small LRU of parsed payloads, each with its "has extended data" flag
+  computed once when the file is loaded. A cached payload is served only
+  while the file's size and mtime still match, so a file overwritten from
+  outside is re-read (one stat per hit instead of a read and parse).
+- ``record_write`` for the runner's own writes, which updates the entry and
+  caches the payload it just saved.
+
+Files dropped into the directory by something other than the runner are
+picked up by a rescan when a lookup misses and the last scan is older than
+``RUNNER_INDEX_RESCAN_SECONDS``. A file deleted underneath the index is
+dropped from it on the next load that fails to open it.
+
+Configuration (.env):
+    RUNNER_PAYLOAD_CACHE_SIZE    parsed payloads kept in memory (default 128)
+    RUNNER_INDEX_RESCAN_SECONDS  minimum seconds between miss rescans (default 30)
+"""
+
+import json
+import logging
+import os
+import re
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Callable, Dict, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+# NCT12345678.json (version None) or NCT12345678_v3.json (version 3).
+_FILENAME_RE = re.compile(r"^(NCT\d+)(?:_v(\d+))?\.json$", re.IGNORECASE)
+
+
+@dataclass
+class FileEntry:
+    nct_id: str
+    path: Path
+    version: Optional[int]
+    size: int
+
+
+# (st_size, st_mtime_ns): a cached payload is valid while this is unchanged.
+Signature = Tuple[int, int]
+
+
+def _signature(st: os.stat_result) -> Signature:
+    return (st.st_size, st.st_mtime_ns)
+
+
+def _rank(entry: FileEntry) -> Tuple[int, int]:
+    # The unversioned file is what the runner writes, so it outranks any _vN.
+    return (1, 0) if entry.version is None else (0, entry.version)
+
+
+class NCTFileIndex:
+    """NCT ID -> latest result file, with an LRU of parsed payloads."""
+
+    def __init__(
+        self,
+        results_dir: Path,
+        has_extended: Callable[[dict], bool],
+        cache_size: int = 128,
+        rescan_interval: float = 30.0,
+    ) -> None:
+        self.results_dir = Path(results_dir)
+        self._has_extended = has_extended
+        self._cache_size = max(0, cache_size)
+        self._rescan_interval = rescan_interval
+        self._lock = threading.Lock()
+        self._files: Dict[str, FileEntry] = {}  # filename -> entry
+        self._latest: Dict[str, FileEntry] = {}  # NCT ID -> entry
+        # NCT ID -> (path, payload, has_extended, file signature when read)
+        self._payloads: "OrderedDict[str, Tuple[Path, dict, bool, Optional[Signature]]]" = OrderedDict()
+        self._last_scan = 0.0
+        self._stats = {"hits": 0, "misses": 0, "stale": 0, "loads": 0, "scans": 0}
+
+    # -- index maintenance ----------------------------------------------------
+
+    def scan(self) -> int:
+        """Rebuild the index from one directory listing. Returns the file count."""
+        files: Dict[str, FileEntry] = {}
+        try:
+            with os.scandir(self.results_dir) as it:
+                for de in it:
+                    if not de.name.endswith(".json") or not de.is_file():
+                        continue
+                    match = _FILENAME_RE.match(de.name)
+                    if match:
+                        nct_id = match.group(1).upper()
+                        version = int(match.group(2)) if match.group(2) else None
+                    else:
+                        nct_id, version = Path(de.name).stem.split("_")[0], None
+                    files[de.name] = FileEntry(nct_id, Path(de.path), version, de.stat().st_size)
+        except FileNotFoundError:
+            pass
+        with self._lock:
+            self._files = files
+            self._latest = {}
+            for entry in files.values():
+                if not _FILENAME_RE.match(entry.path.name):
+                    continue
+                current = self._latest.get(entry.nct_id)
+                if current is None or _rank(entry) > _rank(current):
+                    self._latest[entry.nct_id] = entry
+            # Drop payloads whose file is no longer the latest one.
+            for nct_id, (path, *_) in list(self._payloads.items()):
+                latest = self._latest.get(nct_id)
+                if latest is None or latest.path != path:
+                    del self._payloads[nct_id]
+            self._last_scan = time.monotonic()
+            self._stats["scans"] += 1
+        logger.info(f"📇 Indexed {len(files)} result files ({len(self._latest)} trials)")
+        return len(files)
+
+    def record_write(self, nct_id: str, path: Path, data: dict) -> None:
+        """Register a file the runner just wrote, and cache its payload."""
+        nct_id = nct_id.strip().upper()
+        path = Path(path)
+        match = _FILENAME_RE.match(path.name)
+        version = int(match.group(2)) if match and match.group(2) else None
+        try:
+            signature = _signature(path.stat())
+        except OSError:
+            signature = None
+        entry = FileEntry(nct_id, path, version, signature[0] if signature else 0)
+        with self._lock:
+            self._files[path.name] = entry
+            current = self._latest.get(nct_id)
+            if current is None or current.path == path or _rank(entry) >= _rank(current):
+                self._latest[nct_id] = entry
+                self._remember(nct_id, path, data, signature)
+
+    def _forget(self, entry: FileEntry) -> None:
+        with self._lock:
+            self._files.pop(entry.path.name, None)
+            if self._latest.get(entry.nct_id) is entry:
+                del self._latest[entry.nct_id]
+            self._payloads.pop(entry.nct_id, None)
+
+    def _remember(self, nct_id: str, path: Path, data: dict,
+                  signature: Optional[Signature]) -> Tuple[Path, dict, bool]:
+        # Caller holds the lock.
+        has_extended = self._has_extended(data)
+        if self._cache_size:
+            self._payloads[nct_id] = (path, data, has_extended, signature)
+            self._payloads.move_to_end(nct_id)
+            while len(self._payloads) > self._cache_size:
+                self._payloads.popitem(last=False)
+        return path, data, has_extended
+
+    # -- lookups --------------------------------------------------------------
+
+    def latest(self, nct_id: str) -> Optional[FileEntry]:
+        """Latest file for ``nct_id``; rescans on a miss if the index is stale."""
+        nct_id = nct_id.strip().upper()
+        with self._lock:
+            entry = self._latest.get(nct_id)
+            stale = time.monotonic() - self._last_scan >= self._rescan_interval
+        if entry is None and stale:
+            self.scan()
+            with self._lock:
+                entry = self._latest.get(nct_id)
+        return entry
+
+    def load(self, nct_id: str) -> Tuple[Optional[Path], Optional[dict], bool]:
+        """(path, payload, has_extended) for the latest file, or (None, None, False).
+
+        Cached payloads are shared; callers must not mutate them. A cached
+        payload whose file changed size or mtime since it was read (or is
+        gone) is not served; the file is read again.
+        """
+        nct_id = nct_id.strip().upper()
+        with self._lock:
+            cached = self._payloads.get(nct_id)
+        if cached is not None:
+            path, data, has_extended, signature = cached
+            try:
+                current = _signature(os.stat(path))
+            except OSError:
+                current = None
+            with self._lock:
+                if current is not None and current == signature:
+                    if nct_id in self._payloads:
+                        self._payloads.move_to_end(nct_id)
+                    self._stats["hits"] += 1
+                    return path, data, has_extended
+                if self._payloads.get(nct_id) is cached:
+                    del self._payloads[nct_id]
+                self._stats["stale"] += 1
+        with self._lock:
+            self._stats["misses"] += 1
+
+        entry = self.latest(nct_id)
+        if entry is None:
+            return None, None, False
+        try:
+            with open(entry.path, "r") as f:
+                signature = _signature(os.fstat(f.fileno()))
+                data = json.load(f)
+        except FileNotFoundError:
+            logger.warning(f"⚠️ Indexed file {entry.path.name} is gone; dropping it")
+            self._forget(entry)
+            return None, None, False
+        except Exception as e:
+            logger.error(f"❌ Error reading {entry.path}: {e}")
+            return None, None, False
+        with self._lock:
+            self._stats["loads"] += 1
+            if self._latest.get(nct_id) is not entry:
+                # A write replaced the entry while we were reading.
+                return entry.path, data, self._has_extended(data)
+            entry.size = signature[0]
+            return self._remember(nct_id, entry.path, data, signature)
+
+    def files(self) -> List[FileEntry]:
+        """Every indexed .json file, sorted by filename."""
+        with self._lock:
+            return [self._files[name] for name in sorted(self._files)]
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                **self._stats,
+                "files": len(self._files),
+                "trials": len(self._latest),
+                "cached_payloads": len(self._payloads),
+                "cache_size": self._cache_size,
+            }
+
+
+def index_from_env(results_dir: Path, has_extended: Callable[[dict], bool]) -> NCTFileIndex:
+    return NCTFileIndex(
+        results_dir,
+        has_extended,
+        cache_size=int(os.getenv("RUNNER_PAYLOAD_CACHE_SIZE", "128")),
+        rescan_interval=float(os.getenv("RUNNER_INDEX_RESCAN_SECONDS", "30")),
+    )
@@ -49,12 +49,20 @@ import uuid
 from datetime import datetime
 from pathlib import Path
 from typing import Optional, List, Dict, Any
-from fastapi import FastAPI, HTTPException, UploadFile, File, Form
+from fastapi import FastAPI, HTTPException, UploadFile, File, Form, Request
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.responses import StreamingResponse, FileResponse
+from fastapi.responses import StreamingResponse, FileResponse, PlainTextResponse
 from pydantic import BaseModel, Field
 import time
 
+from metrics import (
+    OPENMETRICS_CONTENT_TYPE,
+    PROMETHEUS_CONTENT_TYPE,
+    metrics,
+    wants_openmetrics,
+)
+from nct_files import index_from_env
+
 # Setup logging with detail
 logging.basicConfig(
     level=logging.INFO,
@@ -85,6 +93,46 @@ app.add_middleware(
 )
 
 
+# ============================================================================
+# Metrics
+# ============================================================================
+
+HTTP_LATENCY = metrics.histogram(
+    "runner_http_request_duration_seconds",
+    "Request handling time by route", ("method", "route", "status"),
+)
+ANNOTATION_LATENCY = metrics.histogram(
+    "runner_annotation_duration_seconds",
+    "LLM Assistant /annotate round-trip time by model", ("model", "outcome"),
+)
+
+
+@app.middleware("http")
+async def record_request_metrics(request: Request, call_next):
+    start = time.perf_counter()
+    status = "500"
+    try:
+        response = await call_next(request)
+        status = str(response.status_code)
+        return response
+    finally:
+        # Label by route template, not raw path, so NCT IDs don't explode cardinality.
+        route = request.scope.get("route")
+        HTTP_LATENCY.labels(
+            request.method, getattr(route, "path", "unmatched"), status,
+        ).observe(time.perf_counter() - start)
+
+
+@app.get("/metrics", response_class=PlainTextResponse)
+async def scrape_metrics(request: Request):
+    """Prometheus / OpenMetrics scrape endpoint."""
+    openmetrics = wants_openmetrics(request.headers.get("accept", ""))
+    return PlainTextResponse(
+        metrics.render(openmetrics=openmetrics),
+        media_type=OPENMETRICS_CONTENT_TYPE if openmetrics else PROMETHEUS_CONTENT_TYPE,
+    )
+
+
 # ============================================================================
 # Configuration - loaded from .env
 # ============================================================================
@@ -207,45 +255,15 @@ class CSVAnnotationResponse(BaseModel):
 
 def find_nct_file(nct_id: str) -> tuple[Optional[Path], Optional[dict]]:
     """
-    Find existing JSON file for NCT ID.
+    Find existing JSON file for NCT ID (exact {nct}.json, else highest _vN).
     Returns (file_path, data) or (None, None) if not found.
+
+    Served from the in-memory file index; see nct_files.py.
     """
-    nct_id = nct_id.strip().upper()
-    
-    logger.info(f"🔍 Looking for file for {nct_id} in {RESULTS_DIR}")
-    
-    # Look for exact match first
-    exact_file = RESULTS_DIR / f"{nct_id}.json"
-    if exact_file.exists():
-        logger.info(f"📄 Found existing file: {exact_file.name}")
-        try:
-            with open(exact_file, 'r') as f:
-                data = json.load(f)
-                logger.info(f"✅ Successfully loaded {exact_file.name}")
-                return exact_file, data
-        except Exception as e:
-            logger.error(f"❌ Error reading {exact_file}: {e}")
-            return None, None
-    
-    # Look for versioned files (e.g., NCT12345678_v1.json)
-    import glob
-    pattern = str(RESULTS_DIR / f"{nct_id}_v*.json")
-    files = sorted(glob.glob(pattern), reverse=True)
-    
-    if files:
-        file_path = Path(files[0])
-        logger.info(f"📄 Found versioned file: {file_path.name}")
-        try:
-            with open(file_path, 'r') as f:
-                data = json.load(f)
-                logger.info(f"✅ Successfully loaded {file_path.name}")
-                return file_path, data
-        except Exception as e:
-            logger.error(f"❌ Error reading {file_path}: {e}")
-            return None, None
-    
-    logger.info(f"📂 No file found for {nct_id}")
-    return None, None
+    file_path, data, _ = nct_files.load(nct_id)
+    if file_path is None:
+        logger.info(f"📂 No file found for {nct_id.strip().upper()}")
+    return file_path, data
 
 
 async def fetch_and_save_nct_data(nct_id: str, force: bool = False) -> tuple[Optional[dict], Optional[str]]:
@@ -342,6 +360,7 @@ async def fetch_and_save_nct_data(nct_id: str, force: bool = False) -> tuple[Opt
                             output_file = RESULTS_DIR / f"{nct_id}.json"
                             with open(output_file, 'w') as f:
                                 json.dump(trial_data, f, indent=2)
+                            nct_files.record_write(nct_id, output_file, trial_data)
                             
                             logger.info(f"✅ Saved to {output_file.name}")
                             return trial_data, None
@@ -407,6 +426,21 @@ def _has_extended_data(data: dict) -> bool:
     return True
 
 
+# NCT ID -> latest result file, plus parsed payloads with their
+# _has_extended_data flag. Built once here; fetch_and_save_nct_data keeps it
+# current.
+nct_files = index_from_env(RESULTS_DIR, _has_extended_data)
+nct_files.scan()
+metrics.register_cache("nct_files", nct_files.stats, size="cached_payloads")
+
+
+@metrics.register_collector
+def _collect_nct_files():
+    stats = nct_files.stats()
+    yield ("runner_result_files", "gauge", "NCT result files in the results directory",
+           [({}, stats["files"])])
+
+
 async def get_or_fetch_nct_data(nct_id: str) -> tuple[Optional[dict], str, Optional[str], Optional[str]]:
     """
     Get NCT data - from file if exists, otherwise fetch and save.
@@ -422,14 +456,14 @@ async def get_or_fetch_nct_data(nct_id: str) -> tuple[Optional[dict], str, Optio
     logger.info(f"{'='*60}")
 
     # Try to find existing file
-    file_path, data = find_nct_file(nct_id)
+    file_path, data, has_extended = nct_files.load(nct_id)
 
     # Track if we need to force a refresh
     force_refresh = False
 
     if data:
         # Check if the cached data has extended API results (UniProt for sequences)
-        if _has_extended_data(data):
+        if has_extended:
             logger.info(f"✅ Using cached data from file (has extended/UniProt data)")
             return data, "file", str(file_path) if file_path else None, None
         else:
@@ -522,6 +556,7 @@ async def annotate_single_trial(
                 )
             
             # Send annotation request
+            llm_start = time.perf_counter()
             response = await client.post(
                 f"{LLM_ASSISTANT_URL}/annotate",
                 json={
@@ -535,6 +570,9 @@ async def annotate_single_trial(
                     "use_extraction_prompt": True
                 }
             )
+            ANNOTATION_LATENCY.labels(
+                model, "ok" if response.status_code == 200 else "error",
+            ).observe(time.perf_counter() - llm_start)
             
             if response.status_code != 200:
                 error_text = response.text
@@ -640,7 +678,7 @@ async def health_check():
         llm_error = str(e)
     
     # Count available files
-    files_count = len(list(RESULTS_DIR.glob("*.json")))
+    file_stats = nct_files.stats()
     
     return {
         "status": "healthy",
@@ -659,7 +697,8 @@ async def health_check():
         },
         "storage": {
             "results_dir": str(RESULTS_DIR),
-            "files_count": files_count
+            "files_count": file_stats["files"],
+            "index": file_stats
         }
     }
 
@@ -900,20 +939,15 @@ async def batch_annotate(request: BatchAnnotationRequest):
 @app.get("/files")
 async def list_files():
     """List all available NCT data files"""
-    files = []
-    for file_path in sorted(RESULTS_DIR.glob("*.json")):
-        try:
-            nct_id = file_path.stem.split('_')[0]
-            size_bytes = file_path.stat().st_size
-            
-            files.append({
-                "nct_id": nct_id,
-                "filename": file_path.name,
-                "size_kb": round(size_bytes / 1024, 2),
-                "path": str(file_path)
-            })
-        except Exception as e:
-            logger.error(f"Error processing file {file_path}: {e}")
+    files = [
+        {
+            "nct_id": entry.nct_id,
+            "filename": entry.path.name,
+            "size_kb": round(entry.size / 1024, 2),
+            "path": str(entry.path)
+        }
+        for entry in nct_files.files()
+    ]
     
     return {
         "total_files": len(files),
@@ -926,9 +960,9 @@ async def get_file_info(nct_id: str):
     """Get info about files for a specific NCT ID"""
     nct_id = nct_id.strip().upper()
     
-    file_path, data = find_nct_file(nct_id)
+    entry = nct_files.latest(nct_id)
     
-    if not file_path:
+    if not entry:
         raise HTTPException(
             status_code=404,
             detail=f"No file found for {nct_id}"
@@ -936,9 +970,9 @@ async def get_file_info(nct_id: str):
     
     return {
         "nct_id": nct_id,
-        "filename": file_path.name,
-        "size_kb": round(file_path.stat().st_size / 1024, 2),
-        "path": str(file_path),
+        "filename": entry.path.name,
+        "size_kb": round(entry.size / 1024, 2),
+        "path": str(entry.path),
         "exists": True
     }
 
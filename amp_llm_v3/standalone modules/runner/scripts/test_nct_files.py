@@ -0,0 +1,226 @@
+#!/usr/bin/env python3
+"""
+In-memory index of the runner's result files (nct_files.py NCTFileIndex).
+
+No network. Each test indexes its own temp directory; the rescan clock is
+replaced where the interval matters. Verifies:
+  1. Versions sort numerically (_v10 beats _v9) and an exact {nct}.json
+     beats any _vN.
+  2. record_write updates the entry and caches the payload (a later load
+     is a hit), unless a higher-ranked file already exists.
+  3. The payload cache evicts the least recently used trial.
+  4. A miss rescans the directory only once the rescan interval has passed.
+  5. A file deleted underneath the index is forgotten on the next load.
+  6. A file overwritten from outside is re-read instead of served stale.
+
+Usage:
+    cd <runner_dir>
+    python3 scripts/test_nct_files.py
+"""
+
+from __future__ import annotations
+
+import json
+import os
+import sys
+import tempfile
+from pathlib import Path
+
+THIS_DIR = Path(__file__).resolve().parent
+PKG_ROOT = THIS_DIR.parent
+if str(PKG_ROOT) not in sys.path:
+    sys.path.insert(0, str(PKG_ROOT))
+
+import nct_files  # noqa: E402
+from nct_files import NCTFileIndex  # noqa: E402
+
+
+def _has_extended(data: dict) -> bool:
+    return bool(data.get("extended"))
+
+
+def _dir(files: dict[str, dict]) -> Path:
+    results_dir = Path(tempfile.mkdtemp())
+    for name, body in files.items():
+        (results_dir / name).write_text(json.dumps(body))
+    return results_dir
+
+
+def _index(results_dir: Path, **kwargs) -> NCTFileIndex:
+    index = NCTFileIndex(results_dir, _has_extended, **kwargs)
+    index.scan()
+    return index
+
+
+class Clock:
+    """Stands in for nct_files' ``time`` module."""
+
+    def __init__(self, now: float = 1000.0):
+        self.now = now
+
+    def monotonic(self) -> float:
+        return self.now
+
+
+def _with_clock(test):
+    def run():
+        real = nct_files.time
+        nct_files.time = Clock()
+        try:
+            test(nct_files.time)
+        finally:
+            nct_files.time = real
+    run.__name__ = test.__name__
+    return run
+
+
+def test_latest_file_ranking():
+    index = _index(_dir({
+        "NCT00000001_v9.json": {"v": 9},
+        "NCT00000001_v10.json": {"v": 10},
+        "NCT00000001_v2.json": {"v": 2},
+        "NCT00000002_v99.json": {"v": 99},
+        "NCT00000002.json": {"v": "exact", "extended": True},
+        "notes.json": {},
+    }))
+    assert index.latest("NCT00000001").path.name == "NCT00000001_v10.json"
+    assert index.latest("nct00000001 ").version == 10
+    path, data, has_extended = index.load("NCT00000002")
+    assert (path.name, data, has_extended) == ("NCT00000002.json", {"v": "exact", "extended": True}, True)
+    assert len(index.files()) == 6 and index.stats()["trials"] == 2
+    assert index.latest("notes") is None
+    print("  ✓ _v10 beats _v9; exact {nct}.json beats any _vN")
+
+
+def test_record_write():
+    results_dir = _dir({"NCT00000001_v9.json": {"v": 9}})
+    index = _index(results_dir)
+    exact = results_dir / "NCT00000001.json"
+    exact.write_text(json.dumps({"v": "new", "extended": True}))
+    index.record_write("nct00000001", exact, {"v": "new", "extended": True})
+    entry = index.latest("NCT00000001")
+    assert entry.path == exact and entry.version is None and entry.size == exact.stat().st_size
+    loads = index.stats()["loads"]
+    assert index.load("NCT00000001") == (exact, {"v": "new", "extended": True}, True)
+    assert index.stats()["loads"] == loads and index.stats()["hits"] == 1
+
+    # A lower-ranked write is indexed but doesn't replace the latest file.
+    older = results_dir / "NCT00000001_v10.json"
+    older.write_text(json.dumps({"v": 10}))
+    index.record_write("NCT00000001", older, {"v": 10})
+    assert index.latest("NCT00000001").path == exact
+    assert index.load("NCT00000001")[1] == {"v": "new", "extended": True}
+    assert "NCT00000001_v10.json" in {e.path.name for e in index.files()}
+    print("  ✓ record_write updates the entry and caches the payload")
+
+
+def test_lru_eviction():
+    index = _index(_dir({f"NCT0000000{i}.json": {"n": i} for i in range(1, 4)}), cache_size=2)
+    index.load("NCT00000001")
+    index.load("NCT00000002")
+    index.load("NCT00000001")  # now most recently used
+    index.load("NCT00000003")  # evicts NCT00000002
+    assert list(index._payloads) == ["NCT00000001", "NCT00000003"]
+    assert index.stats()["cached_payloads"] == 2
+    before = index.stats()
+    index.load("NCT00000001")
+    index.load("NCT00000002")
+    after = index.stats()
+    assert after["hits"] - before["hits"] == 1 and after["loads"] - before["loads"] == 1
+    assert list(index._payloads) == ["NCT00000001", "NCT00000002"]
+
+    uncached = _index(_dir({"NCT00000001.json": {"n": 1}}), cache_size=0)
+    uncached.load("NCT00000001")
+    uncached.load("NCT00000001")
+    assert uncached.stats()["loads"] == 2 and uncached.stats()["cached_payloads"] == 0
+    print("  ✓ least recently used payload is evicted")
+
+
+@_with_clock
+def test_rescan_on_miss(clock):
+    results_dir = _dir({"NCT00000001.json": {"n": 1}})
+    index = _index(results_dir, rescan_interval=30)
+    (results_dir / "NCT00000002.json").write_text(json.dumps({"n": 2}))
+
+    clock.now += 10
+    assert index.load("NCT00000002") == (None, None, False)
+    assert index.stats()["scans"] == 1, "rescanned before the interval"
+    assert index.load("NCT00000001")[1] == {"n": 1}
+    assert index.stats()["scans"] == 1, "a hit must not rescan"
+
+    clock.now += 25
+    path, data, _ = index.load("NCT00000002")
+    assert path.name == "NCT00000002.json" and data == {"n": 2}
+    assert index.stats()["scans"] == 2
+    print("  ✓ a miss rescans only after the rescan interval")
+
+
+def test_forget_vanished_file():
+    results_dir = _dir({"NCT00000001.json": {"n": 1}, "NCT00000002.json": {"n": 2}})
+    index = _index(results_dir, rescan_interval=3600)
+    index.load("NCT00000001")
+    (results_dir / "NCT00000001.json").unlink()
+    (results_dir / "NCT00000002.json").unlink()
+
+    assert index.load("NCT00000001") == (None, None, False)  # cached, then gone
+    assert index.load("NCT00000002") == (None, None, False)  # never cached
+    assert index.latest("NCT00000001") is None and index.latest("NCT00000002") is None
+    assert index.files() == [] and index.stats()["cached_payloads"] == 0
+    print("  ✓ a vanished file is dropped from the index")
+
+
+def test_outside_overwrite_not_served_stale():
+    results_dir = _dir({"NCT00000001.json": {"n": 1}})
+    path = results_dir / "NCT00000001.json"
+    index = _index(results_dir)
+    assert index.load("NCT00000001")[1] == {"n": 1}
+    assert index.load("NCT00000001")[1] == {"n": 1}
+    assert index.stats()["hits"] == 1
+
+    path.write_text(json.dumps({"n": 1, "extended": True}))
+    assert index.load("NCT00000001")[1:] == ({"n": 1, "extended": True}, True)
+    assert index.latest("NCT00000001").size == path.stat().st_size
+
+    # Same size, newer mtime: still re-read.
+    path.write_text(json.dumps({"n": 2, "extended": True}))
+    st = path.stat()
+    os.utime(path, ns=(st.st_atime_ns, st.st_mtime_ns + 1_000_000_000))
+    assert index.load("NCT00000001")[1] == {"n": 2, "extended": True}
+    stats = index.stats()
+    assert stats["stale"] == 2 and stats["loads"] == 3, stats
+    assert index.load("NCT00000001")[1] == {"n": 2, "extended": True}
+    assert index.stats()["hits"] == 2
+    print("  ✓ a file overwritten from outside is re-read, not served stale")
+
+
+def main() -> int:
+    print("NCT file index tests")
+    print("-" * 60)
+    tests = [
+        test_latest_file_ranking,
+        test_record_write,
+        test_lru_eviction,
+        test_rescan_on_miss,
+        test_forget_vanished_file,
+        test_outside_overwrite_not_served_stale,
+    ]
+    failed = 0
+    for t in tests:
+        try:
+            t()
+        except AssertionError as e:
+            print(f"  ✗ {t.__name__}: {e}")
+            failed += 1
+        except Exception as e:
+            print(f"  ✗ {t.__name__}: {type(e).__name__}: {e}")
+            failed += 1
+    print("-" * 60)
+    if failed:
+        print(f"FAIL: {failed}/{len(tests)}")
+        return 1
+    print(f"OK: {len(tests)}/{len(tests)}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
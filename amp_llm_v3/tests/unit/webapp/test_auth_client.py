@@ -0,0 +1,212 @@
+"""
+tests/unit/webapp/test_auth_client.py
+
+Token validation cache, single-flight and local JWT verification in
+webapp/auth_client.py. The auth service is an httpx.MockTransport; no
+network. Local verification tests sign HS256 tokens with a shared secret
+and are skipped without PyJWT.
+"""
+
+import asyncio
+import sys
+import time
+from pathlib import Path
+from types import SimpleNamespace
+
+import httpx
+import pytest
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[3]))
+
+from webapp import auth_client  # noqa: E402
+from webapp.auth_client import _TokenCache, validate_token_async  # noqa: E402
+
+USER = {"user": {"id": 7, "email": "a@example.com"}, "apps": ["amp_llm"], "features": {}}
+
+
+class FakeAuthService:
+    """/api/v1/auth/validate: ``valid`` tokens get USER, others 401."""
+
+    def __init__(self, valid=("good",), delay=0.0):
+        self.valid = set(valid)
+        self.delay = delay
+        self.calls = []
+
+    async def handle(self, request: httpx.Request) -> httpx.Response:
+        token = request.headers["Authorization"][len("Bearer "):]
+        self.calls.append(token)
+        if self.delay:
+            await asyncio.sleep(self.delay)
+        if token in self.valid:
+            return httpx.Response(200, json=USER)
+        return httpx.Response(401, json={"detail": "invalid"})
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    """Replace auth_client's clock; advance with ``clock.now += seconds``."""
+    fake = SimpleNamespace(now=1_000_000.0)
+    fake.time = lambda: fake.now
+    monkeypatch.setattr(auth_client, "time", fake)
+    return fake
+
+
+@pytest.fixture
+def auth_service(monkeypatch, clock):
+    service = FakeAuthService()
+    monkeypatch.setattr(auth_client, "LOCAL_VERIFY", False)
+    monkeypatch.setattr(auth_client, "_cache", _TokenCache(auth_client._CACHE_MAX))
+    monkeypatch.setattr(auth_client, "_inflight", {})
+    monkeypatch.setattr(auth_client, "_client", httpx.AsyncClient(
+        base_url=auth_client.AUTH_SERVICE_URL,
+        transport=httpx.MockTransport(service.handle),
+    ))
+    return service
+
+
+async def test_concurrent_validations_share_one_call(auth_service):
+    """Concurrent misses for one token make a single auth-service call."""
+    auth_service.delay = 0.05
+    users = await asyncio.gather(*(validate_token_async("good") for _ in range(20)))
+    assert auth_service.calls == ["good"]
+    assert all(u["id"] == 7 and u["apps"] == ["amp_llm"] for u in users)
+    assert auth_client._inflight == {}
+
+
+async def test_single_flight_is_per_token_and_app(auth_service):
+    auth_service.valid.add("other")
+    auth_service.delay = 0.05
+    await asyncio.gather(
+        validate_token_async("good"), validate_token_async("good"),
+        validate_token_async("good", app_slug="amp_llm"),
+        validate_token_async("other"),
+    )
+    assert sorted(auth_service.calls) == ["good", "good", "other"]
+
+
+async def test_cancelled_waiter_does_not_cancel_shared_lookup(auth_service):
+    auth_service.delay = 0.05
+    first = asyncio.ensure_future(validate_token_async("good"))
+    second = asyncio.ensure_future(validate_token_async("good"))
+    await asyncio.sleep(0.01)
+    first.cancel()
+    assert (await second)["id"] == 7
+    assert auth_service.calls == ["good"]
+
+
+async def test_cached_until_ttl_expires(auth_service, clock):
+    await validate_token_async("good")
+    clock.now += auth_client._CACHE_TTL - 1
+    await validate_token_async("good")
+    assert auth_service.calls == ["good"]
+
+    clock.now += 2
+    await validate_token_async("good")
+    assert auth_service.calls == ["good", "good"]
+
+
+async def test_failed_validation_is_not_cached(auth_service):
+    assert await validate_token_async("bad") is None
+    assert await validate_token_async("bad") is None
+    assert auth_service.calls == ["bad", "bad"]
+    assert len(auth_client._cache) == 0
+
+
+async def test_unreachable_service_serves_stale_user_only(auth_service, clock, monkeypatch):
+    await validate_token_async("good")
+    clock.now += auth_client._CACHE_TTL + 1
+
+    def unreachable(request):
+        raise httpx.ConnectError("down", request=request)
+
+    monkeypatch.setattr(auth_client, "_client", httpx.AsyncClient(
+        base_url=auth_client.AUTH_SERVICE_URL, transport=httpx.MockTransport(unreachable),
+    ))
+    assert (await validate_token_async("good"))["id"] == 7
+    assert await validate_token_async("never-seen") is None
+
+
+def test_token_cache_ttl(clock):
+    cache = _TokenCache(10)
+    cache.set("k", {"id": 1}, ttl=5)
+    assert cache.get("k") == {"id": 1}
+    clock.now += 5
+    assert cache.get("k") is None
+    assert cache.get("k", allow_stale=True) == {"id": 1}
+
+
+def test_token_cache_lru_bound(clock):
+    cache = _TokenCache(3)
+    for key in "abc":
+        cache.set(key, {"id": key}, ttl=30)
+    assert cache.get("a") == {"id": "a"}  # a is now most recently used
+    cache.set("d", {"id": "d"}, ttl=30)
+    assert len(cache) == 3
+    assert cache.get("b") is None
+    assert [cache.get(k)["id"] for k in "acd"] == ["a", "c", "d"]
+
+
+# -- local verification (AUTH_LOCAL_VERIFY) ----------------------------------
+
+SECRET = "test-signing-secret-of-at-least-32-bytes"
+needs_jwt = pytest.mark.skipif(auth_client.jwt is None, reason="PyJWT not installed")
+
+
+@pytest.fixture
+def local_verify(monkeypatch, auth_service, clock):
+    monkeypatch.setattr(auth_client, "LOCAL_VERIFY", True)
+    monkeypatch.setattr(auth_client, "JWT_ALGORITHMS", ["HS256"])
+    monkeypatch.setattr(auth_client, "_public_key", (SECRET, clock.now))
+    return auth_service
+
+
+def _token(secret=SECRET, expires_in=300, **claims) -> str:
+    payload = {"sub": "7", "email": "a@example.com", "exp": int(time.time()) + expires_in}
+    payload.update(claims)
+    return auth_client.jwt.encode(payload, secret, algorithm="HS256")
+
+
+@needs_jwt
+async def test_local_verify_valid_token(local_verify):
+    token = _token(apps=["amp_llm"])
+    user = await validate_token_async(token, app_slug="amp_llm")
+    assert user["id"] == "7" and user["apps"] == ["amp_llm"]
+    assert local_verify.calls == []
+    assert (await validate_token_async(token, app_slug="amp_llm")) is user  # cached
+
+
+@needs_jwt
+async def test_local_verify_expired_token(local_verify):
+    token = _token(expires_in=-60, apps=["amp_llm"])
+    local_verify.valid.add(token)
+    assert await validate_token_async(token, app_slug="amp_llm") is None
+    assert local_verify.calls == []
+    assert len(auth_client._cache) == 0
+
+
+@needs_jwt
+async def test_local_verify_apps_claim_without_app_denies(local_verify):
+    token = _token(apps=["dbamp"])
+    local_verify.valid.add(token)
+    assert await validate_token_async(token, app_slug="amp_llm") is None
+    assert local_verify.calls == []
+
+
+@needs_jwt
+async def test_local_verify_no_apps_claim_asks_auth_service(local_verify):
+    """Without an apps claim the token can't answer an app check locally."""
+    token = _token()
+    local_verify.valid.add(token)
+    user = await validate_token_async(token, app_slug="amp_llm")
+    assert user["id"] == 7 and user["apps"] == ["amp_llm"]
+    assert local_verify.calls == [token]
+    # No app to check: the token alone is enough.
+    assert (await validate_token_async(token))["id"] == "7"
+    assert local_verify.calls == [token]
+
+
+@needs_jwt
+async def test_local_verify_bad_signature_defers_to_auth_service(local_verify):
+    token = _token(secret="another-signing-secret-of-32-bytes!!", apps=["amp_llm"])
+    assert await validate_token_async(token, app_slug="amp_llm") is None
+    assert local_verify.calls == [token]
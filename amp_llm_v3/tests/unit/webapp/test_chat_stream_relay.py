@@ -0,0 +1,200 @@
+"""
+tests/unit/webapp/test_chat_stream_relay.py
+
+Streamed chat replies through the webapp: the SSE relay in
+webapp/server.py (/chat/message/stream) and the /ws/chat WebSocket in
+webapp/main.py. The chat service and Ollama are fakes; no network.
+"""
+
+import asyncio
+import os
+import sys
+from pathlib import Path
+
+import httpx
+import pytest
+
+ROOT = Path(__file__).resolve().parents[3]
+sys.path.insert(0, str(ROOT))
+sys.path.insert(0, str(ROOT / "src"))
+os.environ.setdefault("API_KEY_1", "test-key")
+
+from starlette.testclient import TestClient  # noqa: E402
+
+from webapp import main, server  # noqa: E402
+from webapp.upstreams import UpstreamClients  # noqa: E402
+
+FRAMES = [
+    b": stream open\n\n",
+    b'event: token\ndata: {"content": "The "}\n\n',
+    b": keep-alive\n\n",
+    b'event: token\ndata: {"content": "answer"}\n\n',
+    b'event: done\ndata: {"message": {"role": "assistant", "content": "The answer"}}\n\n',
+]
+
+
+class ChatServiceStream(httpx.AsyncByteStream):
+    """SSE body of the chat service, one frame per chunk."""
+
+    def __init__(self, frames, delay=0.0):
+        self.frames = frames
+        self.delay = delay
+        self.sent = 0
+        self.closed = False
+
+    async def __aiter__(self):
+        for frame in self.frames:
+            await asyncio.sleep(self.delay)
+            self.sent += 1
+            yield frame
+
+    async def aclose(self):
+        self.closed = True
+
+
+@pytest.fixture
+def chat_service(monkeypatch):
+    """Route the relay's "chat_stream" upstream to a fake; yields the request log."""
+    state = {"requests": [], "stream": ChatServiceStream(FRAMES), "status": 200}
+
+    def handler(request):
+        state["requests"].append(request)
+        if state["status"] != 200:
+            return httpx.Response(state["status"], json={"detail": "Conversation not found"})
+        return httpx.Response(200, stream=state["stream"])
+
+    client = httpx.AsyncClient(transport=httpx.MockTransport(handler))
+    monkeypatch.setitem(server.upstreams._clients, "chat_stream", client)
+    yield state
+
+
+def _request():
+    return server.ChatMessageRequest(conversation_id="c1", message="Which peptide?")
+
+
+async def test_relay_passes_frames_through_in_order(chat_service):
+    response = await server.stream_chat_message(_request())
+    assert response.media_type == "text/event-stream"
+    assert response.headers["x-accel-buffering"] == "no"
+
+    chunks = [chunk async for chunk in response.body_iterator]
+
+    assert chunks == FRAMES
+    assert chat_service["stream"].closed
+    sent = chat_service["requests"][0]
+    assert sent.url.path == "/chat/message/stream"
+    assert b'"conversation_id":"c1"' in sent.content.replace(b" ", b"")
+
+
+async def test_relay_disconnect_closes_upstream(chat_service):
+    upstream = ChatServiceStream([b": keep-alive\n\n"] * 50, delay=0.01)
+    chat_service["stream"] = upstream
+    response = await server.stream_chat_message(_request())
+
+    body = response.body_iterator
+    first = await body.__anext__()
+    await body.aclose()
+    sent = upstream.sent
+    await asyncio.sleep(0.05)
+
+    assert first == b": keep-alive\n\n"
+    assert upstream.closed
+    assert upstream.sent == sent < 50
+
+
+async def test_relay_upstream_error_is_raised(chat_service):
+    chat_service["status"] = 404
+
+    with pytest.raises(server.HTTPException) as err:
+        await server.stream_chat_message(_request())
+
+    assert err.value.status_code == 404
+    assert err.value.detail == "Conversation not found"
+
+
+async def test_streams_have_their_own_pool():
+    """Open streams must not take connections from the short chat requests."""
+    pools = UpstreamClients()
+    try:
+        assert pools.get("chat_stream") is not pools.get("chat")
+        assert pools.get("chat_stream") is pools.get("chat_stream")
+    finally:
+        await pools.aclose()
+
+
+class FakeSessionManager:
+    """stream_prompt yields ``tokens`` ``delay`` seconds apart."""
+
+    def __init__(self, tokens, delay=0.0):
+        self.tokens = tokens
+        self.delay = delay
+        self.yielded = 0
+        self.closed = False
+
+    def stream_prompt(self, model, prompt):
+        async def generate():
+            try:
+                for token in self.tokens:
+                    await asyncio.sleep(self.delay)
+                    self.yielded += 1
+                    yield token
+            finally:
+                self.closed = True
+
+        return generate()
+
+
+@pytest.fixture
+def ws_client(monkeypatch):
+    def connect(session):
+        monkeypatch.setattr(main, "session_manager", session)
+        return TestClient(main.app).websocket_connect("/ws/chat")
+
+    return connect
+
+
+def test_ws_tokens_then_response(ws_client):
+    session = FakeSessionManager(["The ", "answer"])
+    with ws_client(session) as ws:
+        ws.send_json({"type": "chat", "model": "m", "prompt": "q"})
+        messages = [ws.receive_json() for _ in range(3)]
+
+    assert [m["type"] for m in messages] == ["token", "token", "response"]
+    assert [m["content"] for m in messages] == ["The ", "answer", "The answer"]
+    assert messages[-1]["time_to_first_token"] is not None
+    assert session.closed
+
+
+def test_ws_ping_answered_while_streaming(ws_client):
+    session = FakeSessionManager(["a", "b", "c", "d"], delay=0.05)
+    with ws_client(session) as ws:
+        ws.send_json({"type": "chat", "model": "m", "prompt": "q"})
+        assert ws.receive_json() == {"type": "token", "content": "a"}
+        ws.send_json({"type": "ping"})
+        messages = [ws.receive_json()]
+        while messages[-1]["type"] != "response":
+            messages.append(ws.receive_json())
+
+    # The pong is sent before the reply finishes, not queued behind it.
+    assert messages[0] == {"type": "pong"}
+    assert [m["content"] for m in messages[1:-1]] == ["b", "c", "d"]
+    assert messages[-1]["content"] == "abcd"
+
+
+def test_ws_cancel_stops_generation(ws_client):
+    session = FakeSessionManager([f"t{i}" for i in range(100)], delay=0.01)
+    with ws_client(session) as ws:
+        ws.send_json({"type": "chat", "model": "m", "prompt": "q"})
+        assert ws.receive_json()["type"] == "token"
+        ws.send_json({"type": "cancel"})
+        message = ws.receive_json()
+        while message["type"] == "token":
+            message = ws.receive_json()
+        assert message == {"type": "cancelled"}
+        ws.send_json({"type": "ping"})
+        while (message := ws.receive_json())["type"] == "token":
+            pass
+        assert message == {"type": "pong"}
+
+    assert session.closed
+    assert session.yielded < 100
@@ -0,0 +1,197 @@
+"""
+tests/unit/webapp/test_job_stream.py
+
+The merged job stream in webapp/job_stream.py: one upstream subscription
+per backend, fanned out to every browser as snapshot + delta SSE frames.
+The backend is an httpx.MockTransport streaming frames the test pushes;
+no network.
+"""
+
+import asyncio
+import json
+import sys
+from pathlib import Path
+from types import SimpleNamespace
+
+import httpx
+import pytest
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[3]))
+
+from amp_shared.job_events import apply_delta, format_sse  # noqa: E402
+from webapp import job_stream as job_stream_module  # noqa: E402
+from webapp.job_stream import JobStream, Upstream  # noqa: E402
+
+
+def _job(job_id, status="pending"):
+    return {"job_id": job_id, "status": status, "created_at": f"2026-01-01T00:00:0{job_id[-1]}"}
+
+
+class FakeBackend:
+    """``/chat/jobs/events``: each connection streams the frames pushed with send()."""
+
+    def __init__(self):
+        self.streams = []
+        self.closed = 0
+
+    @property
+    def connections(self):
+        return len(self.streams)
+
+    def send(self, event):
+        """Push an event to the newest connection."""
+        self.streams[-1].put_nowait(format_sse(event))
+
+    def handle(self, request):
+        assert request.url.path == "/chat/jobs/events"
+        queue = asyncio.Queue()
+        self.streams.append(queue)
+
+        async def body():
+            try:
+                while True:
+                    frame = await queue.get()
+                    if frame is None:
+                        return
+                    yield frame.encode()
+            finally:
+                self.closed += 1
+
+        return httpx.Response(200, content=body(), headers={"content-type": "text/event-stream"})
+
+    async def connected(self, n):
+        for _ in range(100):
+            if self.connections >= n:
+                return
+            await asyncio.sleep(0.02)
+        raise AssertionError(f"{self.connections} upstream connections, expected {n}")
+
+
+@pytest.fixture
+def backend(monkeypatch):
+    """Route JobStream's upstream client to a FakeBackend."""
+    fake = FakeBackend()
+    transport = httpx.MockTransport(fake.handle)
+    monkeypatch.setattr(job_stream_module, "httpx", SimpleNamespace(
+        AsyncClient=lambda **kw: httpx.AsyncClient(transport=transport, **kw),
+        Timeout=httpx.Timeout,
+    ))
+    return fake
+
+
+@pytest.fixture
+async def stream():
+    js = JobStream(
+        [Upstream("chat", "main", "http://chat", "/chat/jobs/events", "/chat/jobs")],
+        idle_timeout=0.2,
+    )
+    yield js
+    await js.stop()
+
+
+class Browser:
+    """An EventSource reading JobStream.sse(), rebuilding the merged rows."""
+
+    def __init__(self, js):
+        self.frames = js.sse()
+        self.rows = {}
+        self.last_event_id = None
+
+    async def next(self):
+        while True:
+            frame = await asyncio.wait_for(self.frames.__anext__(), 3.0)
+            fields = dict(
+                line.split(": ", 1) for line in frame.strip().splitlines() if ": " in line
+            )
+            if "data" in fields:
+                event = json.loads(fields["data"])
+                self.last_event_id = int(fields["id"])
+                apply_delta(self.rows, event, "key")
+                return event
+
+    def status(self, job_id):
+        return self.rows[f"chat:main:{job_id}"]["status"]
+
+    async def close(self):
+        await self.frames.aclose()
+
+
+async def test_fan_out_shares_one_upstream(backend, stream):
+    first = Browser(stream)
+    pending = asyncio.ensure_future(first.next())
+    await backend.connected(1)
+    backend.send({"type": "snapshot", "seq": 0, "jobs": [_job("j1")]})
+    assert (await pending)["type"] == "snapshot"
+    second = Browser(stream)
+    assert (await second.next())["type"] == "snapshot"
+    assert first.status("j1") == second.status("j1") == "pending"
+
+    backend.send({"type": "delta", "seq": 1, "upsert": [{"job_id": "j1", "status": "processing"}], "remove": []})
+    deltas = await asyncio.gather(first.next(), second.next())
+    assert [d["type"] for d in deltas] == ["delta", "delta"]
+    assert first.status("j1") == second.status("j1") == "processing"
+    assert backend.connections == 1
+    assert stream.hub.stats()["subscribers"] == 2
+    await first.close()
+    await second.close()
+
+
+async def test_reconnect_gets_current_snapshot(backend, stream):
+    """A browser reconnecting (EventSource sends Last-Event-ID) is resynced
+    with a snapshot of the current state, including what changed while it
+    was away."""
+    browser = Browser(stream)
+    pending = asyncio.ensure_future(browser.next())
+    await backend.connected(1)
+    backend.send({"type": "snapshot", "seq": 0, "jobs": [_job("j1")]})
+    await pending
+    backend.send({"type": "delta", "seq": 1, "upsert": [_job("j2")], "remove": []})
+    await browser.next()
+    last_event_id = browser.last_event_id
+    await browser.close()
+
+    backend.send({"type": "delta", "seq": 2, "upsert": [{"job_id": "j1", "status": "completed"}], "remove": ["j2"]})
+    await asyncio.sleep(0.05)
+
+    again = Browser(stream)
+    event = await again.next()
+    assert event["type"] == "snapshot"
+    assert again.last_event_id > last_event_id
+    assert again.status("j1") == "completed" and "chat:main:j2" not in again.rows
+    assert backend.connections == 1  # the upstream outlived the short gap
+    await again.close()
+
+
+async def test_upstream_sequence_gap_resubscribes(backend, stream):
+    browser = Browser(stream)
+    pending = asyncio.ensure_future(browser.next())
+    await backend.connected(1)
+    backend.send({"type": "snapshot", "seq": 0, "jobs": [_job("j1")]})
+    await pending
+
+    backend.send({"type": "delta", "seq": 5, "upsert": [_job("j9")], "remove": []})
+    await backend.connected(2)
+    backend.send({"type": "snapshot", "seq": 5, "jobs": [_job("j1", "completed")]})
+    while "chat:main:j1" not in browser.rows or browser.status("j1") != "completed":
+        await browser.next()
+    assert "chat:main:j9" not in browser.rows
+    await browser.close()
+
+
+async def test_last_browser_leaving_stops_upstreams(backend, stream):
+    browser = Browser(stream)
+    pending = asyncio.ensure_future(browser.next())
+    await backend.connected(1)
+    backend.send({"type": "snapshot", "seq": 0, "jobs": [_job("j1")]})
+    await pending
+    assert stream.running
+
+    await browser.close()
+    assert stream.hub.stats()["subscribers"] == 0
+    for _ in range(100):
+        if not stream.running:
+            break
+        await asyncio.sleep(0.02)
+    assert not stream.running
+    assert backend.closed == 1  # the upstream connection was closed
+    assert stream.stats()["upstreams"]["chat:main"] == {"mode": "starting", "jobs": 0}
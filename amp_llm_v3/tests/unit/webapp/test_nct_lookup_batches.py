@@ -0,0 +1,93 @@
+"""
+tests/unit/webapp/test_nct_lookup_batches.py
+
+/nct-lookup in webapp/server.py against a fake NCT service that, like
+nct_api.py, rejects batch submits and waits of more than 500 IDs. The fake
+is an httpx.MockTransport; no network.
+"""
+
+import json
+import os
+import sys
+from pathlib import Path
+
+import httpx
+import pytest
+from fastapi import BackgroundTasks
+
+ROOT = Path(__file__).resolve().parents[3]
+sys.path.insert(0, str(ROOT))
+sys.path.insert(0, str(ROOT / "src"))
+os.environ.setdefault("API_KEY_1", "test-key")
+
+from webapp import server  # noqa: E402
+
+
+class FakeNCTService:
+    """Batch submit + wait; each search is pending for one wait round."""
+
+    def __init__(self, fail_submit_containing=None):
+        self.fail_submit_containing = fail_submit_containing
+        self.submits = []
+        self.waits = []
+        self.polled = set()
+
+    def handle(self, request: httpx.Request) -> httpx.Response:
+        body = json.loads(request.content)
+        ids = body["nct_ids"]
+        if len(ids) > server.NCT_BATCH_MAX:
+            return httpx.Response(422, json={"detail": "too many IDs"})
+        if request.url.path == "/api/search/batch":
+            self.submits.append(ids)
+            if self.fail_submit_containing in ids:
+                return httpx.Response(503, json={"detail": "busy"})
+            return httpx.Response(200, json={
+                "jobs": [{"nct_id": n, "job_id": n, "status": "queued"} for n in ids],
+                "errors": [],
+            })
+        assert request.url.path == "/api/search/batch/wait"
+        self.waits.append(ids)
+        pending = [n for n in ids if n not in self.polled]
+        self.polled.update(ids)
+        return httpx.Response(200, json={
+            "completed": [{"nct_id": n} for n in ids if n not in pending],
+            "failed": [],
+            "pending": pending,
+        })
+
+
+@pytest.fixture
+def nct_service(monkeypatch):
+    service = FakeNCTService()
+    client = httpx.AsyncClient(transport=httpx.MockTransport(service.handle))
+    monkeypatch.setitem(server.upstreams._clients, "nct", client)
+    return service
+
+
+def _ids(n):
+    return [f"NCT{i:08d}" for i in range(1, n + 1)]
+
+
+async def _lookup(nct_ids):
+    return await server.nct_lookup(
+        server.NCTLookupRequest(nct_ids=nct_ids), BackgroundTasks(), api_key="test-key",
+    )
+
+
+async def test_large_lookup_is_chunked(nct_service):
+    response = await _lookup(_ids(1200))
+
+    assert [len(c) for c in nct_service.submits] == [500, 500, 200]
+    assert [len(c) for c in nct_service.waits] == [500, 500, 200] * 2
+    assert sorted(r["nct_id"] for r in response.results) == _ids(1200)
+    assert response.summary["failed"] == 0
+
+
+async def test_failed_submit_chunk_reports_only_its_ids(nct_service):
+    nct_service.fail_submit_containing = "NCT00000600"
+    response = await _lookup(_ids(700))
+
+    assert len(response.results) == 500
+    errors = response.summary["errors"]
+    assert [e["nct_id"] for e in errors] == _ids(700)[500:]
+    assert {e["error"] for e in errors} == {"busy"}
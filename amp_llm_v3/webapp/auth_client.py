@@ -4,6 +4,13 @@ Amphoraxe Auth Client - Lightweight module for validating auth cookies.
 Drop this file into any Amphoraxe app (dbAMP, VC DataRoom, AMP LLMs, Tasker)
 to validate the central amp_auth cookie against the auth service.
 
+Validated users are kept in a TTL + LRU cache (30 s). From async code use
+``validate_token_async``: it never blocks the event loop, and concurrent
+requests with the same uncached token share one auth-service call. With
+AUTH_LOCAL_VERIFY=1 (and PyJWT installed), signed tokens are verified
+in-process against the auth service's public key (AUTH_PUBLIC_KEY_FILE, or
+fetched from AUTH_PUBLIC_KEY_URL and cached for an hour).
+
 Usage:
     from auth_client import get_auth_user, require_auth_user
 
@@ -18,30 +25,98 @@ Usage:
         pass
 """
 
+import asyncio
+import logging
+import os
 import time
+from collections import OrderedDict
+from pathlib import Path
 import httpx
 from typing import Optional
 from fastapi import Request, HTTPException, status
 
+try:
+    import jwt  # PyJWT, only needed for AUTH_LOCAL_VERIFY
+except ImportError:
+    jwt = None
+
+logger = logging.getLogger(__name__)
+
 # Auth service URL (localhost since all services run on the same machine)
 AUTH_SERVICE_URL = "http://localhost:8300"
 COOKIE_NAME = "amp_auth"
 
-# In-process cache: token -> (user_dict, expiry_timestamp)
-_cache: dict = {}
 _CACHE_TTL = 30  # seconds
 _CACHE_MAX = 1000
 
+# Local verification of signed (JWT) session tokens. Off by default: a
+# locally verified token stays valid until its exp even after logout, so
+# enable it only where the auth service issues short-lived tokens.
+LOCAL_VERIFY = os.getenv("AUTH_LOCAL_VERIFY", "").lower() in ("1", "true", "yes")
+PUBLIC_KEY_FILE = os.getenv("AUTH_PUBLIC_KEY_FILE", "")
+PUBLIC_KEY_URL = os.getenv(
+    "AUTH_PUBLIC_KEY_URL", f"{AUTH_SERVICE_URL}/api/v1/auth/public-key"
+)
+JWT_ALGORITHMS = [
+    a.strip() for a in os.getenv("AUTH_JWT_ALGORITHMS", "RS256,ES256,EdDSA").split(",")
+    if a.strip()
+]
+_PUBLIC_KEY_TTL = 3600  # seconds
+
+
+class _TokenCache:
+    """TTL + LRU cache: token key -> (user, expiry).
+
+    Expired entries are kept (until evicted) so a user stays logged in
+    while the auth service is unreachable, as before.
+    """
+
+    def __init__(self, max_size: int):
+        self._max = max_size
+        self._data: OrderedDict = OrderedDict()
+
+    def get(self, key: str, allow_stale: bool = False) -> Optional[dict]:
+        entry = self._data.get(key)
+        if entry is None:
+            return None
+        user, expiry = entry
+        if time.time() >= expiry and not allow_stale:
+            return None
+        self._data.move_to_end(key)
+        return user
 
-def _cleanup_cache():
-    now = time.time()
-    expired = [k for k, (_, exp) in _cache.items() if now > exp]
-    for k in expired:
-        del _cache[k]
-    if len(_cache) > _CACHE_MAX:
-        oldest = sorted(_cache.items(), key=lambda x: x[1][1])
-        for k, _ in oldest[:len(_cache) - _CACHE_MAX]:
-            del _cache[k]
+    def set(self, key: str, user: dict, ttl: float) -> None:
+        self._data[key] = (user, time.time() + ttl)
+        self._data.move_to_end(key)
+        while len(self._data) > self._max:
+            self._data.popitem(last=False)
+
+    def clear(self) -> None:
+        self._data.clear()
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+
+_cache = _TokenCache(_CACHE_MAX)
+# cache key -> Future of the in-flight auth-service call (single-flight)
+_inflight: dict = {}
+_client: Optional[httpx.AsyncClient] = None
+# (key, fetched_at) for local verification
+_public_key: Optional[tuple] = None
+_public_key_lock: Optional[asyncio.Lock] = None
+
+
+def _cache_key(token: str, app_slug: Optional[str]) -> str:
+    return f"{token}:{app_slug or ''}"
+
+
+def _user_from_response(data: dict) -> Optional[dict]:
+    user = data.get("user")
+    if user:
+        user["apps"] = data.get("apps", [])
+        user["features"] = data.get("features", {})
+    return user
 
 
 def validate_token(token: str, app_slug: str = None) -> Optional[dict]:
@@ -49,20 +124,16 @@ def validate_token(token: str, app_slug: str = None) -> Optional[dict]:
 
     Returns user dict with app access info, or None if invalid.
     Results are cached for 30 seconds.
+
+    Blocking; async code should use ``validate_token_async``.
     """
     if not token:
         return None
 
-    cache_key = f"{token}:{app_slug or ''}"
-    now = time.time()
-
-    # Check cache
-    if cache_key in _cache:
-        user, expiry = _cache[cache_key]
-        if now < expiry:
-            return user
-
-    _cleanup_cache()
+    cache_key = _cache_key(token, app_slug)
+    user = _cache.get(cache_key)
+    if user is not None:
+        return user
 
     # Call auth service
     try:
@@ -76,22 +147,176 @@ def validate_token(token: str, app_slug: str = None) -> Optional[dict]:
             timeout=5.0,
         )
         if response.status_code == 200:
-            data = response.json()
-            user = data.get("user")
+            user = _user_from_response(response.json())
             if user:
-                user["apps"] = data.get("apps", [])
-                user["features"] = data.get("features", {})
-                _cache[cache_key] = (user, now + _CACHE_TTL)
+                _cache.set(cache_key, user, _CACHE_TTL)
                 return user
     except httpx.RequestError:
         # Auth service unreachable - check cache even if expired
-        if cache_key in _cache:
-            return _cache[cache_key][0]
+        return _cache.get(cache_key, allow_stale=True)
+
+    return None
+
+
+async def validate_token_async(token: str, app_slug: str = None) -> Optional[dict]:
+    """Non-blocking ``validate_token``.
+
+    A cache hit returns without awaiting anything. With AUTH_LOCAL_VERIFY
+    set, JWT-shaped tokens are verified in-process against the cached
+    public key. Otherwise concurrent misses for the same token share one
+    call to the auth service.
+    """
+    if not token:
         return None
 
+    cache_key = _cache_key(token, app_slug)
+    user = _cache.get(cache_key)
+    if user is not None:
+        return user
+
+    if LOCAL_VERIFY and jwt is not None and token.count(".") == 2:
+        verified = await _verify_locally(token, app_slug)
+        if verified is not None:
+            user, ttl = verified
+            if user:
+                _cache.set(cache_key, user, ttl)
+            return user
+
+    future = _inflight.get(cache_key)
+    if future is None:
+        future = asyncio.ensure_future(_fetch_user(token, app_slug, cache_key))
+        _inflight[cache_key] = future
+        future.add_done_callback(lambda _: _inflight.pop(cache_key, None))
+    # shield: one caller giving up (client disconnect) must not cancel the
+    # lookup the other waiters share.
+    return await asyncio.shield(future)
+
+
+async def _fetch_user(token: str, app_slug: Optional[str], cache_key: str) -> Optional[dict]:
+    global _client
+    if _client is None or _client.is_closed:
+        _client = httpx.AsyncClient(base_url=AUTH_SERVICE_URL, timeout=5.0)
+    try:
+        params = {"app": app_slug} if app_slug else {}
+        response = await _client.get(
+            "/api/v1/auth/validate",
+            headers={"Authorization": f"Bearer {token}"},
+            params=params,
+        )
+        if response.status_code == 200:
+            user = _user_from_response(response.json())
+            if user:
+                _cache.set(cache_key, user, _CACHE_TTL)
+                return user
+    except httpx.RequestError:
+        # Auth service unreachable - check cache even if expired
+        return _cache.get(cache_key, allow_stale=True)
     return None
 
 
+async def _verify_locally(token: str, app_slug: Optional[str]) -> Optional[tuple]:
+    """Verify a signed token in-process.
+
+    Returns (user or None, cache ttl), or None to defer to the auth service
+    (no public key available, the token isn't one of ours, or it carries no
+    apps claim to check ``app_slug`` against).
+    """
+    key = await _get_public_key()
+    if key is None:
+        return None
+    try:
+        claims = jwt.decode(token, key, algorithms=JWT_ALGORITHMS)
+    except jwt.ExpiredSignatureError:
+        return None, 0
+    except jwt.InvalidSignatureError:
+        # Possibly a rotated key: refetch once, then let the service decide.
+        await _get_public_key(refresh=True)
+        return None
+    except jwt.InvalidTokenError:
+        return None
+
+    user = _user_from_claims(claims)
+    if not user:
+        return None, 0
+    if app_slug and not has_app_access(user, app_slug):
+        # A token without an apps claim says nothing about app access;
+        # only an explicit list that lacks the app is a denial.
+        if not _has_apps_claim(claims):
+            return None
+        return None, 0
+    ttl = _CACHE_TTL
+    if claims.get("exp"):
+        ttl = min(ttl, max(0.0, claims["exp"] - time.time()))
+    return user, ttl
+
+
+def _user_from_claims(claims: dict) -> Optional[dict]:
+    """User dict in the /validate shape from a token's claims."""
+    if isinstance(claims.get("user"), dict):
+        user = dict(claims["user"])
+    elif claims.get("sub"):
+        user = {k: v for k, v in claims.items() if k not in ("exp", "iat", "nbf", "iss", "aud")}
+        user.setdefault("id", claims["sub"])
+    else:
+        return None
+    user["apps"] = claims.get("apps", user.get("apps", []))
+    user["features"] = claims.get("features", user.get("features", {}))
+    return user
+
+
+def _has_apps_claim(claims: dict) -> bool:
+    user = claims.get("user")
+    return "apps" in claims or (isinstance(user, dict) and "apps" in user)
+
+
+def _public_key_fresh() -> bool:
+    if _public_key is None:
+        return False
+    key, fetched_at = _public_key
+    # A failed fetch is retried after a minute, not on every request.
+    return time.time() - fetched_at < (_PUBLIC_KEY_TTL if key else 60)
+
+
+async def _get_public_key(refresh: bool = False):
+    """The auth service's token-signing public key, cached for an hour."""
+    global _public_key, _public_key_lock
+    if not refresh and _public_key_fresh():
+        return _public_key[0]
+    if _public_key_lock is None:
+        _public_key_lock = asyncio.Lock()
+    async with _public_key_lock:
+        if _public_key is not None and (
+            (not refresh and _public_key_fresh())
+            or time.time() - _public_key[1] < 60  # refetched a moment ago
+        ):
+            return _public_key[0]
+        key = None
+        try:
+            if PUBLIC_KEY_FILE:
+                key = Path(PUBLIC_KEY_FILE).read_text()
+            else:
+                async with httpx.AsyncClient(timeout=5.0) as client:
+                    response = await client.get(PUBLIC_KEY_URL)
+                if response.status_code == 200:
+                    if "json" in response.headers.get("content-type", ""):
+                        key = response.json().get("public_key")
+                    else:
+                        key = response.text
+        except (OSError, ValueError, httpx.RequestError) as e:
+            logger.warning(f"Auth public key unavailable: {e}")
+        # On a failed refetch keep using the previous key.
+        _public_key = (key or (_public_key[0] if _public_key else None), time.time())
+        return _public_key[0]
+
+
+async def aclose() -> None:
+    """Close the pooled auth-service client (app shutdown)."""
+    global _client
+    if _client is not None:
+        await _client.aclose()
+        _client = None
+
+
 def get_token_from_request(request: Request) -> Optional[str]:
     """Extract amp_auth token from request cookie or Authorization header."""
     token = request.cookies.get(COOKIE_NAME)
@@ -108,7 +333,7 @@ async def get_auth_user(request: Request, app_slug: str = None) -> Optional[dict
     token = get_token_from_request(request)
     if not token:
         return None
-    return validate_token(token, app_slug)
+    return await validate_token_async(token, app_slug)
 
 
 async def get_auth_user_optional(request: Request) -> Optional[dict]:
@@ -0,0 +1,294 @@
+"""
+Merged job status stream for the jobs panel.
+
+The jobs badge used to poll ``/api/chat/jobs`` every 10 s from every open
+tab, and each poll fetched the job lists of four backends (chat and
+agent-annotate, on both branches). ``JobStream`` instead keeps one
+subscription per backend to that backend's job event stream
+(``/chat/jobs/events`` and ``/api/jobs/events``), keeps a merged in-memory
+snapshot, and serves it to browsers as a second stream of diffs
+(``/api/chat/jobs/events``):
+
+- Each ``Upstream`` applies its backend's snapshot/delta events to a local
+  copy of that backend's rows. A sequence gap or a dropped connection
+  reconnects for a fresh snapshot. If a backend is down its jobs drop out
+  of the list, as they did with polling. A backend without the stream
+  endpoint (404) is polled once per ``poll_interval`` instead, shared by
+  every browser, and the stream is retried every ``stream_retry`` seconds.
+- Merged rows are keyed ``service:branch:job_id``. Annotate rows are
+  normalized to the shape ``/api/chat/jobs`` has always returned.
+- The upstream subscriptions start with the first browser and stop
+  ``idle_timeout`` seconds after the last one leaves. While they are
+  running, ``GET /api/chat/jobs`` is answered from the snapshot.
+"""
+
+import asyncio
+import json
+import logging
+import os
+import time
+from typing import Callable, Dict, List, Optional
+
+import httpx
+
+from amp_shared.job_events import JobEventHub, apply_delta
+
+logger = logging.getLogger(__name__)
+
+# agent-annotate's /api routes want a user cookie or its shared shard
+# token; server-side calls from here send the token when it is configured.
+ANNOTATE_SHARD_TOKEN = os.getenv("AGENT_ANNOTATE_SHARD_TOKEN", "")
+
+ACTIVE_STATUSES = {
+    "chat": ("pending", "processing"),
+    "annotate": ("queued", "running"),
+}
+
+
+def annotate_headers() -> Dict[str, str]:
+    return {"X-Shard-Token": ANNOTATE_SHARD_TOKEN} if ANNOTATE_SHARD_TOKEN else {}
+
+
+def normalize_chat_job(job: dict, branch: str) -> dict:
+    return {**job, "branch": branch, "service": "chat"}
+
+
+def normalize_annotate_job(job: dict, branch: str) -> dict:
+    return {
+        "job_id": job["job_id"],
+        "status": job["status"],
+        "created_at": job["created_at"],
+        "branch": branch,
+        "service": "annotate",
+        "total_trials": job.get("total_trials", 0),
+        "completed_trials": job.get("completed_trials", 0),
+    }
+
+
+def summarize_jobs(jobs: List[dict]) -> dict:
+    """The ``/api/chat/jobs`` response body for a merged job list."""
+    jobs = sorted(jobs, key=lambda j: j.get("created_at") or "", reverse=True)
+    active = sum(1 for j in jobs if j["status"] in ACTIVE_STATUSES.get(j["service"], ()))
+    return {"jobs": jobs, "total": len(jobs), "active": active}
+
+
+class Upstream:
+    """One backend's job rows, kept current from its event stream."""
+
+    def __init__(
+        self,
+        service: str,
+        branch: str,
+        base_url: str,
+        events_path: str,
+        list_path: str,
+        headers: Optional[Dict[str, str]] = None,
+    ):
+        self.service = service
+        self.branch = branch
+        self.base_url = base_url
+        self.events_path = events_path
+        self.list_path = list_path
+        self.headers = headers or {}
+        self.rows: Dict[str, dict] = {}
+        self.mode = "starting"  # starting | streaming | polling | down
+        self.synced = False
+
+    @property
+    def name(self) -> str:
+        return f"{self.service}:{self.branch}"
+
+    def normalize(self, job: dict) -> dict:
+        if self.service == "annotate":
+            return normalize_annotate_job(job, self.branch)
+        return normalize_chat_job(job, self.branch)
+
+    def _set_rows(self, rows: Dict[str, dict], mode: str, on_change: Callable[[], None]) -> None:
+        self.rows = rows
+        self.mode = mode
+        self.synced = True
+        on_change()
+
+    async def run(
+        self,
+        client: httpx.AsyncClient,
+        on_change: Callable[[], None],
+        poll_interval: float,
+        stream_retry: float,
+    ) -> None:
+        backoff = 1.0
+        while True:
+            try:
+                status = await self._stream(client, on_change)
+                if status == 404:
+                    logger.info(f"{self.name} has no job event stream; polling")
+                    await self._poll(client, on_change, poll_interval, stream_retry)
+                else:
+                    # The backend closed the stream (restart); reconnect
+                    # and keep showing the last rows meanwhile.
+                    await asyncio.sleep(1.0)
+                backoff = 1.0
+                continue
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.debug(f"Job stream from {self.name} dropped: {e}")
+            if self.rows or self.mode != "down":
+                self._set_rows({}, "down", on_change)
+            await asyncio.sleep(backoff)
+            backoff = min(backoff * 2, 30.0)
+
+    async def _stream(self, client: httpx.AsyncClient, on_change: Callable[[], None]) -> int:
+        """Follow the backend's stream until it ends; returns the HTTP status."""
+        # The backend sends a keep-alive every 15 s, so a silent minute
+        # means the connection is gone.
+        timeout = httpx.Timeout(10.0, read=60.0)
+        url = f"{self.base_url}{self.events_path}"
+        async with client.stream("GET", url, headers=self.headers, timeout=timeout) as resp:
+            if resp.status_code != 200:
+                if resp.status_code == 404:
+                    return 404
+                raise RuntimeError(f"HTTP {resp.status_code}")
+            rows: Dict[str, dict] = {}
+            seq = None
+            data: List[str] = []
+            async for line in resp.aiter_lines():
+                if line.startswith("data:"):
+                    data.append(line[5:].lstrip())
+                    continue
+                if line or not data:
+                    continue  # id / event / retry / comment lines
+                event = json.loads("\n".join(data))
+                data = []
+                if event["type"] == "delta" and event["seq"] != (seq or 0) + 1:
+                    raise RuntimeError(f"sequence gap ({seq} -> {event['seq']})")
+                seq = event["seq"]
+                apply_delta(rows, event, "job_id")
+                self._set_rows({k: self.normalize(r) for k, r in rows.items()}, "streaming", on_change)
+        return 200
+
+    async def _poll(
+        self,
+        client: httpx.AsyncClient,
+        on_change: Callable[[], None],
+        poll_interval: float,
+        stream_retry: float,
+    ) -> None:
+        deadline = time.monotonic() + stream_retry
+        while time.monotonic() < deadline:
+            resp = await client.get(f"{self.base_url}{self.list_path}", headers=self.headers, timeout=10.0)
+            resp.raise_for_status()
+            data = resp.json()
+            # chat returns {"jobs": [...]}, agent-annotate a bare list
+            jobs = data.get("jobs", []) if isinstance(data, dict) else data
+            rows = {str(j["job_id"]): self.normalize(j) for j in jobs}
+            if rows != self.rows or self.mode != "polling":
+                self._set_rows(rows, "polling", on_change)
+            await asyncio.sleep(poll_interval)
+
+
+class JobStream:
+    """Upstream subscriptions plus the merged browser-facing hub."""
+
+    def __init__(
+        self,
+        upstreams: List[Upstream],
+        poll_interval: float = 10.0,
+        stream_retry: float = 300.0,
+        idle_timeout: float = 60.0,
+    ):
+        self.upstreams = upstreams
+        self.poll_interval = poll_interval
+        self.stream_retry = stream_retry
+        self.idle_timeout = idle_timeout
+        # Rows only change when an upstream does, which notifies; the
+        # interval tick is a backstop.
+        self.hub = JobEventHub(self._merged_rows, key="key", interval=30.0)
+        self._client: Optional[httpx.AsyncClient] = None
+        self._tasks: List[asyncio.Task] = []
+        self._reaper: Optional[asyncio.Task] = None
+        self._idle_since: Optional[float] = None
+
+    def _merged_rows(self) -> List[dict]:
+        return [
+            {**row, "key": f"{u.service}:{u.branch}:{job_id}"}
+            for u in self.upstreams
+            for job_id, row in u.rows.items()
+        ]
+
+    @property
+    def running(self) -> bool:
+        return bool(self._tasks)
+
+    def is_live(self) -> bool:
+        """True once every upstream has reported (or been found down)."""
+        return self.running and all(u.synced or u.mode == "down" for u in self.upstreams)
+
+    def summary(self) -> dict:
+        return summarize_jobs([{k: v for k, v in r.items() if k != "key"} for r in self._merged_rows()])
+
+    def start(self) -> None:
+        self._idle_since = None
+        if self._tasks:
+            return
+        self._client = httpx.AsyncClient(timeout=10.0)
+        for u in self.upstreams:
+            u.rows, u.mode, u.synced = {}, "starting", False
+        self._tasks = [
+            asyncio.create_task(u.run(self._client, self.hub.notify, self.poll_interval, self.stream_retry))
+            for u in self.upstreams
+        ]
+        self._reaper = asyncio.create_task(self._reap_when_idle())
+
+    async def _reap_when_idle(self) -> None:
+        while True:
+            await asyncio.sleep(min(self.idle_timeout, 10.0))
+            if self.hub.stats()["subscribers"]:
+                self._idle_since = None
+            elif self._idle_since is None:
+                self._idle_since = time.monotonic()
+            elif time.monotonic() - self._idle_since >= self.idle_timeout:
+                logger.info("No job stream subscribers; closing upstream subscriptions")
+                await self.stop(reaper=False)
+                return
+
+    async def stop(self, reaper: bool = True) -> None:
+        # Swap state out before awaiting, so a subscriber arriving
+        # meanwhile starts a fresh set of upstreams.
+        tasks, self._tasks = self._tasks, []
+        client, self._client = self._client, None
+        if reaper and self._reaper is not None:
+            tasks.append(self._reaper)
+        self._reaper = None
+        for u in self.upstreams:
+            u.rows, u.mode, u.synced = {}, "starting", False
+        for t in tasks:
+            t.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+        if client is not None:
+            await client.aclose()
+
+    aclose = stop
+
+    async def sse(self):
+        """Browser-facing SSE stream (merged snapshot, then diffs)."""
+        self.start()
+        # Give the upstreams a moment so the first snapshot is complete.
+        for _ in range(20):
+            if self.is_live():
+                break
+            await asyncio.sleep(0.1)
+        # A browser disconnect closes this generator; close the hub's with
+        # it so the subscriber is dropped now, not when it is collected.
+        frames = self.hub.sse()
+        try:
+            async for frame in frames:
+                yield frame
+        finally:
+            await frames.aclose()
+
+    def stats(self) -> dict:
+        return {
+            **self.hub.stats(),
+            "upstreams": {u.name: {"mode": u.mode, "jobs": len(u.rows)} for u in self.upstreams},
+        }
@@ -2,12 +2,13 @@
 AMP_LLM Web Application - FastAPI Server
 Serves web interface and handles LLM interactions
 """
-from fastapi import FastAPI, WebSocket, HTTPException
+from fastapi import FastAPI, WebSocket, WebSocketDisconnect, HTTPException
 from fastapi.staticfiles import StaticFiles
 from fastapi.responses import HTMLResponse, FileResponse
 from fastapi.middleware.cors import CORSMiddleware
 import asyncio
 import json
+import time
 from pathlib import Path
 from typing import Optional
 
@@ -118,7 +119,15 @@ async def generate(request: dict):
 
 @app.websocket("/ws/chat")
 async def websocket_chat(websocket: WebSocket):
-    """WebSocket endpoint for streaming chat"""
+    """
+    WebSocket endpoint for streaming chat.
+
+    Client messages: {"type": "chat", "model", "prompt"}, {"type": "cancel"}
+    and {"type": "ping"}. A reply arrives as "token" messages as Ollama
+    generates, then one "response" with the full text (or an "error").
+    Tokens are read from Ollama only as fast as they are sent on, and a
+    cancel or a disconnect stops the generation.
+    """
     await websocket.accept()
     
     if not session_manager:
@@ -129,6 +138,34 @@ async def websocket_chat(websocket: WebSocket):
         await websocket.close()
         return
     
+    generation: Optional[asyncio.Task] = None
+    
+    async def stream_reply(model: str, prompt: str):
+        parts = []
+        start = time.perf_counter()
+        first_token = None
+        stream = session_manager.stream_prompt(model=model, prompt=prompt)
+        try:
+            async for text in stream:
+                if first_token is None:
+                    first_token = time.perf_counter() - start
+                parts.append(text)
+                await websocket.send_json({"type": "token", "content": text})
+            
+            logger.info(f"Streamed {len(parts)} chunks from {model}; first token after {first_token or 0:.2f}s")
+            await websocket.send_json({
+                "type": "response",
+                "content": "".join(parts),
+                "time_to_first_token": round(first_token, 3) if first_token is not None else None
+            })
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            logger.error(f"Streaming error: {e}")
+            await websocket.send_json({"type": "error", "message": str(e)})
+        finally:
+            await stream.aclose()
+    
     try:
         while True:
             # Receive message from client
@@ -137,26 +174,33 @@ async def websocket_chat(websocket: WebSocket):
             message_type = data.get("type")
             
             if message_type == "chat":
-                model = data.get("model")
-                prompt = data.get("prompt")
-                
-                # Send response (can be extended for streaming)
-                response = await session_manager.send_prompt(
-                    model=model,
-                    prompt=prompt
+                if generation and not generation.done():
+                    await websocket.send_json({
+                        "type": "error",
+                        "message": "A reply is still streaming; send cancel first"
+                    })
+                    continue
+                # Runs alongside this loop so cancel / ping are still read
+                generation = asyncio.create_task(
+                    stream_reply(data.get("model"), data.get("prompt"))
                 )
-                
-                await websocket.send_json({
-                    "type": "response",
-                    "content": response
-                })
+            
+            elif message_type == "cancel":
+                if generation and not generation.done():
+                    generation.cancel()
+                    await websocket.send_json({"type": "cancelled"})
             
             elif message_type == "ping":
                 await websocket.send_json({"type": "pong"})
     
+    except WebSocketDisconnect:
+        logger.info("WebSocket client disconnected")
     except Exception as e:
         logger.error(f"WebSocket error: {e}")
         await websocket.close()
+    finally:
+        if generation and not generation.done():
+            generation.cancel()
 
 
 @app.get("/health")
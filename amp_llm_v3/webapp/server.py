@@ -4,7 +4,7 @@ COMPLETE VERSION - All endpoints included
 """
 from fastapi import FastAPI, HTTPException, Depends, UploadFile, File, BackgroundTasks
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.responses import FileResponse, HTMLResponse, Response
+from fastapi.responses import FileResponse, HTMLResponse, Response, StreamingResponse
 from fastapi.staticfiles import StaticFiles
 from pydantic import BaseModel, Field
 from typing import Optional, List, Dict, Any
@@ -25,7 +25,13 @@ from amp_llm.llm.utils.session import OllamaSessionManager
 # Note: NCT lookup now uses standalone API service
 from webapp.config import settings
 from webapp.auth import verify_api_key
-from webapp.auth_client import get_token_from_request, validate_token
+from webapp import auth_client
+from webapp.auth_client import get_token_from_request, validate_token_async
+from webapp.job_stream import (
+    JobStream, Upstream, annotate_headers, normalize_annotate_job, normalize_chat_job,
+    summarize_jobs,
+)
+from webapp.upstreams import upstreams
 
 # ============================================================================
 # CRITICAL FIX: Configure MIME types
@@ -98,7 +104,7 @@ class LLMAuthMiddleware(BaseHTTPMiddleware):
         # Try amp_auth cookie first
         token = get_token_from_request(request)
         if token:
-            user = validate_token(token, app_slug="amp-llm")
+            user = await validate_token_async(token, app_slug="amp-llm")
             if user:
                 request.state.user = user
                 return await call_next(request)
@@ -321,6 +327,16 @@ OTHER_ANNOTATE_SERVICE_URL = f"http://localhost:{OTHER_ANNOTATE_PORT}"
 logger.info(f"Branch: {CURRENT_BRANCH} (chat port {settings.chat_service_port}), other branch: {OTHER_BRANCH} (chat port {OTHER_CHAT_PORT})")
 logger.info(f"Agent-annotate: {ANNOTATE_PORT} (current), {OTHER_ANNOTATE_PORT} (other)")
 
+# One job event subscription per backend, merged for the jobs panel
+job_stream = JobStream([
+    Upstream("chat", CURRENT_BRANCH, CHAT_SERVICE_URL, "/chat/jobs/events", "/chat/jobs"),
+    Upstream("chat", OTHER_BRANCH, OTHER_CHAT_SERVICE_URL, "/chat/jobs/events", "/chat/jobs"),
+    Upstream("annotate", CURRENT_BRANCH, ANNOTATE_SERVICE_URL, "/api/jobs/events", "/api/jobs",
+             headers=annotate_headers()),
+    Upstream("annotate", OTHER_BRANCH, OTHER_ANNOTATE_SERVICE_URL, "/api/jobs/events", "/api/jobs",
+             headers=annotate_headers()),
+])
+
 # ============================================================================
 # Request/Response Models
 # ============================================================================
@@ -474,7 +490,7 @@ async def health_check():
     
     chat_service_alive = False
     try:
-        async with httpx.AsyncClient() as client:
+        async with upstreams.client("chat") as client:
             response = await client.get(f"{CHAT_SERVICE_URL}/health", timeout=5.0)
             chat_service_alive = response.status_code == 200
     except Exception as e:
@@ -482,7 +498,7 @@ async def health_check():
     
     nct_service_alive = False
     try:
-        async with httpx.AsyncClient() as client:
+        async with upstreams.client("nct") as client:
             response = await client.get(f"{NCT_SERVICE_URL}/health", timeout=5.0)
             nct_service_alive = response.status_code == 200
     except Exception as e:
@@ -513,7 +529,7 @@ async def list_models():
     try:
         logger.info(f"Proxying /models request to {CHAT_SERVICE_URL}/models")
         
-        async with httpx.AsyncClient(timeout=10.0) as client:
+        async with upstreams.client("chat", timeout=10.0) as client:
             response = await client.get(
                 f"{CHAT_SERVICE_URL}/models",
                 headers={"Content-Type": "application/json"}
@@ -575,7 +591,7 @@ async def initialize_chat(request: InitChatRequest):
     try:
         logger.info(f"Initializing chat with model: {request.model}")
         
-        async with httpx.AsyncClient(timeout=30.0) as client:
+        async with upstreams.client("chat", timeout=30.0) as client:
             response = await client.post(
                 f"{CHAT_SERVICE_URL}/chat/init",
                 json=request.dict(),
@@ -604,7 +620,7 @@ async def send_chat_message(request: ChatMessageRequest):
     try:
         logger.info(f"Sending message to conversation: {request.conversation_id}")
         
-        async with httpx.AsyncClient(timeout=120.0) as client:
+        async with upstreams.client("chat", timeout=120.0) as client:
             response = await client.post(
                 f"{CHAT_SERVICE_URL}/chat/message",
                 json=request.dict(),
@@ -623,11 +639,59 @@ async def send_chat_message(request: ChatMessageRequest):
         raise HTTPException(status_code=500, detail=str(e))
 
 
+@app.post("/chat/message/stream")
+async def stream_chat_message(request: ChatMessageRequest):
+    """
+    Stream a chat reply as Server-Sent Events - relayed from the chat service.
+
+    Bytes are passed on as they arrive, unbuffered. The chat service is read
+    only as fast as the browser takes the relay, and the upstream request is
+    closed when the browser disconnects, which stops the generation.
+    """
+    # No overall deadline: the read timeout bounds each gap, and the chat
+    # service sends keep-alives while the model is loading. Streams have
+    # their own pool so they can't starve the short chat requests.
+    client = upstreams.get("chat_stream")
+    try:
+        upstream = await client.send(
+            client.build_request(
+                "POST", f"{CHAT_SERVICE_URL}/chat/message/stream", json=request.dict(),
+                timeout=httpx.Timeout(10.0, read=330.0),
+            ),
+            stream=True,
+        )
+    except httpx.HTTPError as e:
+        logger.error(f"Error starting chat stream: {e}")
+        raise HTTPException(status_code=503, detail=f"Chat service unavailable: {e}")
+
+    if upstream.status_code != 200:
+        body = await upstream.aread()
+        await upstream.aclose()
+        try:
+            detail = json.loads(body)["detail"]
+        except (ValueError, KeyError, TypeError):
+            detail = body.decode(errors="replace")
+        raise HTTPException(status_code=upstream.status_code, detail=detail)
+
+    async def relay():
+        try:
+            async for chunk in upstream.aiter_raw():
+                yield chunk
+        finally:
+            await upstream.aclose()
+
+    return StreamingResponse(
+        relay(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+
 @app.get("/chat/conversations")
 async def list_conversations():
     """List all conversations - proxied to chat service."""
     try:
-        async with httpx.AsyncClient(timeout=10.0) as client:
+        async with upstreams.client("chat", timeout=10.0) as client:
             response = await client.get(f"{CHAT_SERVICE_URL}/conversations")
             if response.status_code == 200:
                 return response.json()
@@ -643,7 +707,7 @@ async def list_conversations():
 async def get_conversation(conversation_id: str):
     """Get conversation history - proxied to chat service."""
     try:
-        async with httpx.AsyncClient(timeout=10.0) as client:
+        async with upstreams.client("chat", timeout=10.0) as client:
             response = await client.get(f"{CHAT_SERVICE_URL}/conversations/{conversation_id}")
             if response.status_code == 200:
                 return response.json()
@@ -659,7 +723,7 @@ async def get_conversation(conversation_id: str):
 async def delete_conversation(conversation_id: str):
     """Delete a conversation - proxied to chat service."""
     try:
-        async with httpx.AsyncClient(timeout=10.0) as client:
+        async with upstreams.client("chat", timeout=10.0) as client:
             response = await client.delete(f"{CHAT_SERVICE_URL}/conversations/{conversation_id}")
             if response.status_code == 200:
                 return response.json()
@@ -679,7 +743,7 @@ async def delete_conversation(conversation_id: str):
 async def get_model_parameters_proxy():
     """Proxy model parameters request to chat service."""
     try:
-        async with httpx.AsyncClient(timeout=10.0) as client:
+        async with upstreams.client("chat", timeout=10.0) as client:
             response = await client.get(f"{CHAT_SERVICE_URL}/chat/model-parameters")
             if response.status_code == 200:
                 return response.json()
@@ -696,7 +760,7 @@ async def get_model_parameters_proxy():
 async def update_model_parameters_proxy(request: dict):
     """Proxy model parameters update to chat service."""
     try:
-        async with httpx.AsyncClient(timeout=10.0) as client:
+        async with upstreams.client("chat", timeout=10.0) as client:
             response = await client.post(
                 f"{CHAT_SERVICE_URL}/chat/model-parameters",
                 json=request
@@ -716,7 +780,7 @@ async def update_model_parameters_proxy(request: dict):
 async def reset_model_parameters_proxy():
     """Proxy model parameters reset to chat service."""
     try:
-        async with httpx.AsyncClient(timeout=10.0) as client:
+        async with upstreams.client("chat", timeout=10.0) as client:
             response = await client.post(f"{CHAT_SERVICE_URL}/chat/model-parameters/reset")
             if response.status_code == 200:
                 return response.json()
@@ -733,7 +797,7 @@ async def reset_model_parameters_proxy():
 async def apply_model_preset_proxy(preset_name: str):
     """Proxy model preset application to chat service."""
     try:
-        async with httpx.AsyncClient(timeout=10.0) as client:
+        async with upstreams.client("chat", timeout=10.0) as client:
             response = await client.post(f"{CHAT_SERVICE_URL}/chat/model-parameters/preset/{preset_name}")
             if response.status_code == 200:
                 return response.json()
@@ -750,7 +814,7 @@ async def apply_model_preset_proxy(preset_name: str):
 async def get_email_config_proxy():
     """Proxy email configuration check to chat service."""
     try:
-        async with httpx.AsyncClient(timeout=10.0) as client:
+        async with upstreams.client("chat", timeout=10.0) as client:
             response = await client.get(f"{CHAT_SERVICE_URL}/chat/email-config")
             if response.status_code == 200:
                 return response.json()
@@ -765,69 +829,53 @@ async def get_email_config_proxy():
 
 @app.get("/api/chat/jobs")
 async def list_jobs_proxy():
-    """Fetch jobs from both main and dev chat services, tagged by branch."""
-    all_jobs = []
-    total = 0
-    active = 0
-
-    async with httpx.AsyncClient(timeout=10.0) as client:
-        # Fetch from both branches concurrently
-        branches = [
-            (CURRENT_BRANCH, CHAT_SERVICE_URL),
-            (OTHER_BRANCH, OTHER_CHAT_SERVICE_URL),
-        ]
-        for branch_name, chat_url in branches:
-            try:
-                response = await client.get(f"{chat_url}/chat/jobs")
-                if response.status_code == 200:
-                    data = response.json()
-                    for job in data.get("jobs", []):
-                        job["branch"] = branch_name
-                        job["service"] = "chat"
-                    all_jobs.extend(data.get("jobs", []))
-                    total += data.get("total", 0)
-                    active += data.get("active", 0)
-            except Exception as e:
-                logger.debug(f"Could not fetch jobs from {branch_name} ({chat_url}): {e}")
-
-        # Fetch agent-annotate jobs from both branches
-        annotate_branches = [
-            (CURRENT_BRANCH, ANNOTATE_SERVICE_URL),
-            (OTHER_BRANCH, OTHER_ANNOTATE_SERVICE_URL),
-        ]
-        for branch_name, annotate_url in annotate_branches:
-            try:
-                response = await client.get(f"{annotate_url}/api/jobs")
-                if response.status_code == 200:
-                    data = response.json()
-                    for job in data:  # agent-annotate returns a list directly
-                        normalized = {
-                            "job_id": job["job_id"],
-                            "status": job["status"],
-                            "created_at": job["created_at"],
-                            "branch": branch_name,
-                            "service": "annotate",
-                            "total_trials": job.get("total_trials", 0),
-                            "completed_trials": job.get("completed_trials", 0),
-                        }
-                        all_jobs.append(normalized)
-                        if job["status"] in ("queued", "running"):
-                            active += 1
-                        total += 1
-            except Exception as e:
-                logger.debug(f"Could not fetch annotate jobs from {branch_name}: {e}")
+    """Fetch jobs from both main and dev chat and annotate services, tagged by branch.
+
+    Served from the job stream's snapshot while it is running; otherwise
+    the four backends are queried concurrently.
+    """
+    if job_stream.is_live():
+        return job_stream.summary()
+
+    async def fetch(service, branch_name, url, headers=None):
+        try:
+            response = await upstreams.get(service).get(url, headers=headers, timeout=10.0)
+            if response.status_code == 200:
+                data = response.json()
+                if service == "chat":
+                    return [normalize_chat_job(job, branch_name) for job in data.get("jobs", [])]
+                # agent-annotate returns a list directly
+                return [normalize_annotate_job(job, branch_name) for job in data]
+        except Exception as e:
+            logger.debug(f"Could not fetch {service} jobs from {branch_name} ({url}): {e}")
+        return []
+
+    results = await asyncio.gather(
+        fetch("chat", CURRENT_BRANCH, f"{CHAT_SERVICE_URL}/chat/jobs"),
+        fetch("chat", OTHER_BRANCH, f"{OTHER_CHAT_SERVICE_URL}/chat/jobs"),
+        fetch("annotate", CURRENT_BRANCH, f"{ANNOTATE_SERVICE_URL}/api/jobs", annotate_headers()),
+        fetch("annotate", OTHER_BRANCH, f"{OTHER_ANNOTATE_SERVICE_URL}/api/jobs", annotate_headers()),
+    )
+
+    # Newest first
+    return summarize_jobs([job for jobs in results for job in jobs])
 
-    # Sort by created_at descending (newest first)
-    all_jobs.sort(key=lambda j: j.get("created_at", ""), reverse=True)
 
-    return {"jobs": all_jobs, "total": total, "active": active}
+@app.get("/api/chat/jobs/events")
+async def job_events_stream():
+    """Server-sent merged job list: a snapshot, then diffs (see job_stream.py)."""
+    return StreamingResponse(
+        job_stream.sse(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
 
 
 @app.get("/api/chat/resources")
 async def get_resources_proxy():
     """Proxy resource status to chat service."""
     try:
-        async with httpx.AsyncClient(timeout=10.0) as client:
+        async with upstreams.client("chat", timeout=10.0) as client:
             response = await client.get(f"{CHAT_SERVICE_URL}/chat/resources")
             if response.status_code == 200:
                 return response.json()
@@ -845,7 +893,7 @@ async def cancel_job_proxy(job_id: str, branch: str = CURRENT_BRANCH):
     """Proxy job cancellation to the correct branch's chat service."""
     chat_url = CHAT_SERVICE_URL if branch == CURRENT_BRANCH else OTHER_CHAT_SERVICE_URL
     try:
-        async with httpx.AsyncClient(timeout=10.0) as client:
+        async with upstreams.client("chat", timeout=10.0) as client:
             response = await client.delete(f"{chat_url}/chat/jobs/{job_id}")
             if response.status_code == 200:
                 return response.json()
@@ -862,7 +910,7 @@ async def cancel_job_proxy(job_id: str, branch: str = CURRENT_BRANCH):
 async def clear_completed_jobs_proxy():
     """Clear completed jobs from both branch chat services."""
     total_cleared = 0
-    async with httpx.AsyncClient(timeout=10.0) as client:
+    async with upstreams.client("chat", timeout=10.0) as client:
         for branch_name, chat_url in [(CURRENT_BRANCH, CHAT_SERVICE_URL), (OTHER_BRANCH, OTHER_CHAT_SERVICE_URL)]:
             try:
                 response = await client.delete(f"{chat_url}/chat/jobs/completed")
@@ -883,7 +931,7 @@ async def get_annotate_job_detail(job_id: str, branch: str = CURRENT_BRANCH):
     """Proxy agent-annotate job detail to the correct branch's annotate service."""
     url = ANNOTATE_SERVICE_URL if branch == CURRENT_BRANCH else OTHER_ANNOTATE_SERVICE_URL
     try:
-        async with httpx.AsyncClient(timeout=10.0) as client:
+        async with upstreams.client("annotate", timeout=10.0) as client:
             resp = await client.get(f"{url}/api/jobs/{job_id}")
             if resp.status_code == 200:
                 return resp.json()
@@ -903,7 +951,7 @@ async def cancel_annotate_job(job_id: str, branch: str = CURRENT_BRANCH):
     """Proxy agent-annotate job cancellation to the correct branch's annotate service."""
     url = ANNOTATE_SERVICE_URL if branch == CURRENT_BRANCH else OTHER_ANNOTATE_SERVICE_URL
     try:
-        async with httpx.AsyncClient(timeout=10.0) as client:
+        async with upstreams.client("annotate", timeout=10.0) as client:
             resp = await client.post(f"{url}/api/jobs/{job_id}/cancel")
             if resp.status_code == 200:
                 return resp.json()
@@ -923,7 +971,7 @@ async def download_annotate_csv(job_id: str, branch: str = CURRENT_BRANCH):
     """Proxy agent-annotate CSV download to the correct branch's annotate service."""
     url = ANNOTATE_SERVICE_URL if branch == CURRENT_BRANCH else OTHER_ANNOTATE_SERVICE_URL
     try:
-        async with httpx.AsyncClient(timeout=30.0) as client:
+        async with upstreams.client("annotate", timeout=30.0) as client:
             resp = await client.get(f"{url}/api/results/{job_id}/csv")
             if resp.status_code == 200:
                 content_disp = resp.headers.get("content-disposition", "")
@@ -957,7 +1005,7 @@ async def annotate_manual_proxy(request: dict):
     try:
         logger.info(f"📝 Proxying manual annotation request: {len(request.get('nct_ids', []))} NCT IDs")
 
-        async with httpx.AsyncClient(timeout=30.0) as client:
+        async with upstreams.client("chat", timeout=30.0) as client:
             response = await client.post(
                 f"{CHAT_SERVICE_URL}/chat/annotate",
                 json=request,
@@ -1055,7 +1103,7 @@ async def process_csv_annotation(
     try:
         csv_annotation_jobs[job_id]["progress"] = "Sending to annotation service..."
 
-        async with httpx.AsyncClient(timeout=1800.0) as client:
+        async with upstreams.client("chat", timeout=1800.0) as client:
             files = {"file": (filename, contents, "text/csv")}
             params = {
                 "conversation_id": conversation_id,
@@ -1148,7 +1196,7 @@ async def download_job_csv_proxy(job_id: str, branch: str = CURRENT_BRANCH):
     try:
         logger.info(f"📥 Proxying job CSV download: {job_id} (branch: {branch})")
 
-        async with httpx.AsyncClient(timeout=60.0) as client:
+        async with upstreams.client("chat", timeout=60.0) as client:
             response = await client.get(f"{chat_url}/chat/download/{job_id}")
 
             if response.status_code == 200:
@@ -1191,7 +1239,7 @@ async def download_csv_proxy(filename: str):
         
         logger.info(f"📥 Proxying CSV download: {filename}")
         
-        async with httpx.AsyncClient(timeout=60.0) as client:
+        async with upstreams.client("runner", timeout=60.0) as client:
             response = await client.get(f"{RUNNER_SERVICE_URL}/download-csv/{filename}")
             
             if response.status_code == 200:
@@ -1256,6 +1304,17 @@ async def chat(request: ChatRequest, api_key: str = Depends(verify_api_key)):
 # NCT Lookup Endpoint - Proxy to Standalone API
 # ============================================================================
 
+# Overall deadline for /nct-lookup, and the length of each long-poll.
+NCT_LOOKUP_MAX_WAIT = 300.0
+NCT_WAIT_SECONDS = 25.0
+# Most IDs the NCT service takes in one batch submit or wait request.
+NCT_BATCH_MAX = 500
+
+
+def _nct_chunks(nct_ids: List[str]) -> List[List[str]]:
+    return [nct_ids[i:i + NCT_BATCH_MAX] for i in range(0, len(nct_ids), NCT_BATCH_MAX)]
+
+
 @app.post("/nct-lookup", response_model=NCTLookupResponse)
 async def nct_lookup(
     request: NCTLookupRequest, 
@@ -1267,93 +1326,82 @@ async def nct_lookup(
     
     This proxies requests to the standalone NCT lookup service running
     on port 9002, which provides comprehensive trial data from multiple sources.
+    IDs are submitted in batches of up to NCT_BATCH_MAX (searched
+    concurrently there), and completion is awaited by long-polling each
+    batch of pending IDs rather than by per-ID status polls.
     """
     logger.info(f"NCT Lookup: {len(request.nct_ids)} trials")
     
     results = []
     errors = []
-    search_jobs = {}
+    pending: List[str] = []
     
+    # Batched submits, then long-polls that return as soon as every search
+    # in the batch has finished (or after NCT_WAIT_SECONDS with what has).
     try:
-        async with httpx.AsyncClient(timeout=300.0) as client:
-            # Initiate searches for each NCT number
-            for nct_id in request.nct_ids:
-                try:
-                    search_request = {
-                        "include_extended": request.use_extended_apis
-                    }
-                    
-                    if request.databases:
-                        search_request["databases"] = request.databases
-                    
-                    response = await client.post(
-                        f"{NCT_SERVICE_URL}/api/search/{nct_id}",
-                        json=search_request
-                    )
-                    
-                    if response.status_code == 200:
-                        data = response.json()
-                        search_jobs[nct_id] = data["job_id"]
-                        logger.info(f"Initiated search for {nct_id}: {data['status']}")
-                    else:
-                        error_data = response.json()
-                        errors.append({
-                            "nct_id": nct_id,
-                            "error": error_data.get("detail", f"HTTP {response.status_code}")
-                        })
-                
-                except Exception as e:
-                    logger.error(f"Error initiating search for {nct_id}: {e}")
-                    errors.append({"nct_id": nct_id, "error": str(e)})
-            
-            # Poll for results
-            max_wait = 300  # 5 minutes max
-            poll_interval = 2  # Check every 2 seconds
-            start_time = asyncio.get_event_loop().time()
-            
-            while search_jobs and (asyncio.get_event_loop().time() - start_time) < max_wait:
-                completed_jobs = []
-                
-                for nct_id, job_id in list(search_jobs.items()):
+        async with upstreams.client("nct", timeout=30.0) as client:
+            for chunk in _nct_chunks(request.nct_ids):
+                search_request: Dict[str, Any] = {
+                    "nct_ids": chunk,
+                    "include_extended": request.use_extended_apis,
+                }
+                if request.databases:
+                    search_request["databases"] = request.databases
+                response = await client.post(f"{NCT_SERVICE_URL}/api/search/batch", json=search_request)
+                if response.status_code != 200:
                     try:
-                        status_response = await client.get(
-                            f"{NCT_SERVICE_URL}/api/search/{job_id}/status"
+                        detail = response.json().get("detail", f"HTTP {response.status_code}")
+                    except ValueError:
+                        detail = f"HTTP {response.status_code}"
+                    errors.extend({"nct_id": nct_id, "error": detail} for nct_id in chunk)
+                    continue
+                data = response.json()
+                errors.extend(data.get("errors", []))
+                pending.extend(job["job_id"] for job in data.get("jobs", []))
+            logger.info(f"Initiated {len(pending)} searches")
+            
+            deadline = asyncio.get_running_loop().time() + NCT_LOOKUP_MAX_WAIT
+            while pending:
+                remaining = deadline - asyncio.get_running_loop().time()
+                if remaining <= 0:
+                    break
+                wait = min(NCT_WAIT_SECONDS, remaining)
+                chunks = _nct_chunks(pending)
+                replies = await asyncio.gather(
+                    *(
+                        client.post(
+                            f"{NCT_SERVICE_URL}/api/search/batch/wait",
+                            json={"nct_ids": chunk, "timeout": wait},
+                            timeout=wait + 30.0,
                         )
-                        
-                        if status_response.status_code == 200:
-                            status_data = status_response.json()
-                            
-                            if status_data["status"] == "completed":
-                                results_response = await client.get(
-                                    f"{NCT_SERVICE_URL}/api/results/{job_id}"
-                                )
-                                
-                                if results_response.status_code == 200:
-                                    result_data = results_response.json()
-                                    results.append(result_data)
-                                    completed_jobs.append(nct_id)
-                                    logger.info(f"Retrieved results for {nct_id}")
-                            
-                            elif status_data["status"] == "failed":
-                                errors.append({
-                                    "nct_id": nct_id,
-                                    "error": status_data.get("error", "Search failed")
-                                })
-                                completed_jobs.append(nct_id)
-                    
-                    except Exception as e:
-                        logger.error(f"Error checking status for {nct_id}: {e}")
-                        errors.append({"nct_id": nct_id, "error": str(e)})
-                        completed_jobs.append(nct_id)
-                
-                for nct_id in completed_jobs:
-                    del search_jobs[nct_id]
-                
-                if search_jobs:
-                    await asyncio.sleep(poll_interval)
+                        for chunk in chunks
+                    ),
+                    return_exceptions=True,
+                )
+                pending, wait_failed = [], False
+                for chunk, response in zip(chunks, replies):
+                    if isinstance(response, httpx.TimeoutException):
+                        pending.extend(chunk)
+                        continue
+                    if isinstance(response, BaseException):
+                        raise response
+                    if response.status_code != 200:
+                        logger.error(f"NCT batch wait returned {response.status_code}: {response.text}")
+                        pending.extend(chunk)
+                        wait_failed = True
+                        continue
+                    data = response.json()
+                    results.extend(data.get("completed", []))
+                    errors.extend(data.get("failed", []))
+                    pending.extend(data.get("pending", []))
+                logger.info(
+                    f"NCT lookup: {len(results)} done, {len(errors)} failed, {len(pending)} pending"
+                )
+                if wait_failed:
+                    break
             
             # Handle timeouts
-            for nct_id in search_jobs.keys():
+            for nct_id in pending:
                 errors.append({"nct_id": nct_id, "error": "Search timeout"})
     
     except Exception as e:
@@ -1378,7 +1426,7 @@ async def nct_search_proxy(
 ):
     """Proxy NCT search requests to the NCT service."""
     try:
-        async with httpx.AsyncClient(timeout=30.0) as client:
+        async with upstreams.client("nct", timeout=30.0) as client:
             response = await client.post(
                 f"{NCT_SERVICE_URL}/api/search/{nct_id}",
                 json=request,
@@ -1409,7 +1457,7 @@ async def nct_status_proxy(
 ):
     """Proxy NCT status requests to the NCT service."""
     try:
-        async with httpx.AsyncClient(timeout=10.0) as client:
+        async with upstreams.client("nct", timeout=10.0) as client:
             response = await client.get(
                 f"{NCT_SERVICE_URL}/api/search/{job_id}/status"
             )
@@ -1433,7 +1481,7 @@ async def nct_results_proxy(
 ):
     """Proxy NCT results requests to the NCT service."""
     try:
-        async with httpx.AsyncClient(timeout=30.0) as client:
+        async with upstreams.client("nct", timeout=30.0) as client:
             response = await client.get(
                 f"{NCT_SERVICE_URL}/api/results/{job_id}"
             )
@@ -1454,7 +1502,7 @@ async def nct_results_proxy(
 async def nct_registry_proxy(api_key: str = Depends(verify_api_key)):
     """Proxy NCT registry requests to the NCT service."""
     try:
-        async with httpx.AsyncClient(timeout=10.0) as client:
+        async with upstreams.client("nct", timeout=10.0) as client:
             response = await client.get(f"{NCT_SERVICE_URL}/api/registry")
             
             if response.status_code == 200:
@@ -1689,6 +1737,13 @@ async def startup_event():
     logger.info("=" * 60)
 
 
+@app.on_event("shutdown")
+async def shutdown_event():
+    await auth_client.aclose()
+    await job_stream.aclose()
+    await upstreams.aclose()
+
+
 if __name__ == "__main__":
     import uvicorn
     uvicorn.run(
@@ -34,6 +34,9 @@ const app = {
     // Jobs management
     jobsPollingInterval: null,
     jobsPanelOpen: false,
+    jobsStream: null,      // EventSource on /api/chat/jobs/events
+    jobsStreamRows: null,  // key -> job row, kept current by the stream
+    jobsStreamSeq: 0,
 
     nct2step: {
         currentNCT: null,
@@ -66,6 +69,12 @@ const app = {
         const jobsList = document.getElementById('jobs-list');
         if (!jobsList) return;
 
+        // The job stream already holds the current list
+        if (this.jobsStreamRows) {
+            this.renderStreamedJobs();
+            return;
+        }
+
         jobsList.innerHTML = '<div class="loading">Loading jobs...</div>';
 
         try {
@@ -306,19 +315,89 @@ const app = {
     },
 
     startJobsPolling() {
-        // Poll for job updates every 10 seconds
+        // Prefer the server-pushed job stream; poll every 10 seconds if
+        // the browser or server doesn't support it.
         if (this.jobsPollingInterval) {
             clearInterval(this.jobsPollingInterval);
+            this.jobsPollingInterval = null;
+        }
+        if (window.EventSource) {
+            this.startJobsStream();
+        } else {
+            this.startPollingFallback();
         }
+    },
+
+    startJobsStream() {
+        if (this.jobsStream) {
+            this.jobsStream.close();
+        }
+        let opened = false;
+        const stream = new EventSource(`${this.API_BASE}/api/chat/jobs/events`);
+        this.jobsStream = stream;
+
+        stream.onopen = () => { opened = true; };
+        stream.addEventListener('snapshot', (e) => {
+            const event = JSON.parse(e.data);
+            this.jobsStreamRows = {};
+            for (const job of event.jobs) {
+                this.jobsStreamRows[job.key] = job;
+            }
+            this.jobsStreamSeq = event.seq;
+            this.renderStreamedJobs();
+        });
+        stream.addEventListener('delta', (e) => {
+            const event = JSON.parse(e.data);
+            if (!this.jobsStreamRows || event.seq !== this.jobsStreamSeq + 1) {
+                // Missed an event: reconnect for a fresh snapshot
+                this.startJobsStream();
+                return;
+            }
+            for (const key of event.remove) {
+                delete this.jobsStreamRows[key];
+            }
+            for (const change of event.upsert) {
+                this.jobsStreamRows[change.key] = { ...this.jobsStreamRows[change.key], ...change };
+            }
+            this.jobsStreamSeq = event.seq;
+            this.renderStreamedJobs();
+        });
+        stream.onerror = () => {
+            this.jobsStreamRows = null;
+            // EventSource retries dropped connections by itself; it gives up
+            // (CLOSED) when the endpoint is missing or refuses the request.
+            if (stream.readyState === EventSource.CLOSED && this.jobsStream === stream) {
+                this.jobsStream = null;
+                if (!opened) {
+                    console.debug('Job stream unavailable, polling instead');
+                    this.startPollingFallback();
+                } else {
+                    setTimeout(() => this.startJobsPolling(), 5000);
+                }
+            }
+        };
+    },
 
+    startPollingFallback() {
         // Initial fetch
         this.fetchJobCount();
-
         this.jobsPollingInterval = setInterval(() => {
             this.fetchJobCount();
         }, 10000);
     },
 
+    renderStreamedJobs() {
+        const jobs = Object.values(this.jobsStreamRows || {});
+        jobs.sort((a, b) => (b.created_at || '').localeCompare(a.created_at || ''));
+        const active = jobs.filter(j => j.service === 'annotate'
+            ? (j.status === 'queued' || j.status === 'running')
+            : (j.status === 'pending' || j.status === 'processing')).length;
+        this.updateJobsBadge(active);
+        if (this.jobsPanelOpen) {
+            this.renderJobsList(jobs);
+        }
+    },
+
     async fetchJobCount() {
         try {
             const response = await fetch(`${this.API_BASE}/api/chat/jobs`);
@@ -2870,6 +2949,12 @@ const app = {
             
             this.addMessage('chat-container', 'user', message);
             
+            // Tokens as they are generated; the one-shot request below is
+            // the fallback for servers or browsers without streaming.
+            if (await this.streamChatReply(message)) {
+                return;
+            }
+            
             const loadingId = this.addMessage('chat-container', 'assistant', '🤔 Thinking...');
             
             try {
@@ -2941,6 +3026,125 @@ const app = {
         }
     },
 
+    // Sends a chat message to /chat/message/stream and renders the reply
+    // into one assistant bubble as SSE token events arrive. Returns false,
+    // without showing anything, when streaming isn't available so the
+    // caller can use /chat/message; true once the stream was handled
+    // (errors included, which are shown inline).
+    async streamChatReply(message) {
+        if (!window.ReadableStream || !window.TextDecoder) {
+            return false;
+        }
+        
+        const loadingId = this.addMessage('chat-container', 'assistant', '🤔 Thinking...');
+        let response;
+        try {
+            response = await fetch(`${this.API_BASE}/chat/message/stream`, {
+                method: 'POST',
+                headers: {
+                    'Content-Type': 'application/json',
+                    'Accept': 'text/event-stream',
+                    'Authorization': `Bearer ${this.apiKey}`
+                },
+                body: JSON.stringify({
+                    conversation_id: this.currentConversationId,
+                    message: message,
+                    temperature: 0.7
+                })
+            });
+        } catch (error) {
+            document.getElementById(loadingId)?.remove();
+            this.addMessage('chat-container', 'error', `❌ Error: ${error.message}`);
+            return true;
+        }
+        
+        if (response.status === 404 || response.status === 405 || !response.body) {
+            // Older server without the streaming route
+            document.getElementById(loadingId)?.remove();
+            return false;
+        }
+        if (!response.ok) {
+            document.getElementById(loadingId)?.remove();
+            let errorMessage = `HTTP ${response.status}`;
+            try {
+                const errorData = await response.json();
+                errorMessage = errorData.detail || errorMessage;
+            } catch (e) {}
+            this.addMessage('chat-container', 'error', `❌ Error: ${errorMessage}`);
+            return true;
+        }
+        
+        const container = document.getElementById('chat-container');
+        const contentEl = document.getElementById(loadingId)?.querySelector('.content');
+        let text = '';
+        let finished = false;
+        
+        const handleFrame = (frame) => {
+            let event = 'message';
+            const data = [];
+            for (const line of frame.split('\n')) {
+                if (line.startsWith('event:')) {
+                    event = line.slice(6).trim();
+                } else if (line.startsWith('data:')) {
+                    data.push(line.slice(5).replace(/^ /, ''));
+                }
+            }
+            if (data.length === 0) {
+                return;  // keep-alive comment
+            }
+            const payload = JSON.parse(data.join('\n'));
+            if (event === 'token') {
+                text += payload.content;
+            } else if (event === 'done') {
+                finished = true;
+                text = payload.message.content;
+                console.log(`⚡ First token after ${payload.time_to_first_token_seconds}s, ` +
+                            `done in ${payload.processing_time_seconds}s`);
+            } else if (event === 'error') {
+                finished = true;
+                this.addMessage('chat-container', 'error', `❌ Error: ${payload.detail}`);
+                return;
+            }
+            if (contentEl) {
+                contentEl.textContent = text;
+                container.scrollTop = container.scrollHeight;
+            }
+        };
+        
+        const reader = response.body.getReader();
+        const decoder = new TextDecoder();
+        let buffer = '';
+        try {
+            while (true) {
+                const { value, done } = await reader.read();
+                if (done) {
+                    break;
+                }
+                buffer += decoder.decode(value, { stream: true });
+                let end;
+                while ((end = buffer.indexOf('\n\n')) >= 0) {
+                    handleFrame(buffer.slice(0, end));
+                    buffer = buffer.slice(end + 2);
+                }
+            }
+        } catch (error) {
+            console.error('Chat stream error:', error);
+        }
+        
+        if (!text) {
+            document.getElementById(loadingId)?.remove();
+        }
+        if (!finished) {
+            this.addMessage('chat-container', 'error',
+                '❌ The connection dropped before the reply finished' +
+                (text ? ' (partial reply shown above)' : ''));
+        }
+        if (text) {
+            this.saveCurrentChat();
+        }
+        return true;
+    },
+
     // =========================================================================
     // Annotation Mode - Trial Annotation
     // =========================================================================
@@ -0,0 +1,113 @@
+"""
+Pooled HTTP clients for the services the webapp proxies to.
+
+Every proxy route used to open its own ``httpx.AsyncClient`` per request,
+paying for a new connection pool and TCP handshake each time, and closing
+keep-alive connections that the next request could have reused. The
+webapp now holds one pooled client per upstream service (``chat``, ``nct``,
+``annotate``, ``runner``) for its lifetime. Both branches of a service share the
+service's client; httpx pools connections per host:port inside it.
+
+Routes keep their own timeouts::
+
+    async with upstreams.client("chat", timeout=10.0) as client:
+        response = await client.get(f"{CHAT_SERVICE_URL}/conversations")
+
+``client()`` yields the shared client with that timeout applied to each
+request, and closes nothing on exit. ``aclose()`` closes every pool at
+shutdown.
+
+Streamed chat replies use their own ``chat_stream`` pool. A stream holds
+its connection for the whole reply, so sharing the ``chat`` pool would
+let a burst of open streams use up MAX_CONNECTIONS and queue the short
+conversation and model requests behind them.
+"""
+
+import logging
+from contextlib import asynccontextmanager
+from typing import AsyncIterator, Dict, Optional
+
+import httpx
+
+logger = logging.getLogger(__name__)
+
+# Keep-alive connections held per service, and the cap on open ones. The
+# webapp's fan-out is at most a few dozen concurrent requests per service.
+MAX_CONNECTIONS = 50
+MAX_KEEPALIVE = 20
+KEEPALIVE_EXPIRY = 30.0
+
+# Per-service (max_connections, max_keepalive) overrides. Streams are
+# long-lived, so more may be open at once, and few are worth keeping idle.
+SERVICE_LIMITS = {
+    "chat_stream": (100, 5),
+}
+
+
+class TimeoutClient:
+    """A shared ``httpx.AsyncClient`` with a per-route default timeout."""
+
+    def __init__(self, client: httpx.AsyncClient, timeout) -> None:
+        self._client = client
+        self.timeout = timeout
+
+    def build_request(self, method: str, url, **kwargs) -> httpx.Request:
+        kwargs.setdefault("timeout", self.timeout)
+        return self._client.build_request(method, url, **kwargs)
+
+    async def send(self, request: httpx.Request, **kwargs) -> httpx.Response:
+        return await self._client.send(request, **kwargs)
+
+    async def request(self, method: str, url, **kwargs) -> httpx.Response:
+        kwargs.setdefault("timeout", self.timeout)
+        return await self._client.request(method, url, **kwargs)
+
+    async def get(self, url, **kwargs) -> httpx.Response:
+        return await self.request("GET", url, **kwargs)
+
+    async def post(self, url, **kwargs) -> httpx.Response:
+        return await self.request("POST", url, **kwargs)
+
+    async def delete(self, url, **kwargs) -> httpx.Response:
+        return await self.request("DELETE", url, **kwargs)
+
+
+class UpstreamClients:
+    """One lazily created, pooled ``httpx.AsyncClient`` per upstream service."""
+
+    def __init__(self) -> None:
+        self._clients: Dict[str, httpx.AsyncClient] = {}
+
+    def get(self, service: str) -> httpx.AsyncClient:
+        client = self._clients.get(service)
+        if client is None or client.is_closed:
+            max_connections, max_keepalive = SERVICE_LIMITS.get(
+                service, (MAX_CONNECTIONS, MAX_KEEPALIVE)
+            )
+            client = httpx.AsyncClient(
+                timeout=30.0,
+                limits=httpx.Limits(
+                    max_connections=max_connections,
+                    max_keepalive_connections=max_keepalive,
+                    keepalive_expiry=KEEPALIVE_EXPIRY,
+                ),
+            )
+            self._clients[service] = client
+        return client
+
+    @asynccontextmanager
+    async def client(self, service: str, timeout=30.0) -> AsyncIterator[TimeoutClient]:
+        """The service's shared client with ``timeout`` as the per-request default."""
+        yield TimeoutClient(self.get(service), timeout)
+
+    async def aclose(self, service: Optional[str] = None) -> None:
+        """Close one service's pool, or all of them (app shutdown)."""
+        names = [service] if service else list(self._clients)
+        for name in names:
+            client = self._clients.pop(name, None)
+            if client is not None:
+                await client.aclose()
+
+
+# Module-level singleton, closed by the webapp's shutdown hook.
+upstreams = UpstreamClients()